@@ -25,7 +25,9 @@ DEFAULT_CONFIG = {
     "duplicate_window_seconds": 60,
     "order_timeout_seconds": 30,
     "enable_partial_fill_protection": True,
-    "use_monthly_expiry": True
+    "use_monthly_expiry": True,
+    "state_fsync_policy": "interval",
+    "state_compact_every": 1000
 }
 
 def load_config() -> Dict:
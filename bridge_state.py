@@ -1,89 +1,234 @@
 """
 Position state management with persistence
+
+State lives in memory; every change is appended as one JSON line to a
+journal next to the state file, and the journal is periodically compacted
+into the state file (snapshot). Startup loads the snapshot and replays the
+journal, so webhook latency does not grow with the number of positions and
+a crash mid-write can at most lose the torn last journal line.
 """
 import os
 import json
+import time
 import hashlib
 import logging
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Dict, Optional, List
 
 logger = logging.getLogger(__name__)
 
+# Journal fsync policies
+FSYNC_ALWAYS = 'always'      # fsync after every entry (survives power loss)
+FSYNC_INTERVAL = 'interval'  # fsync at most every fsync_interval seconds
+FSYNC_NEVER = 'never'        # leave it to the OS (survives process crash only)
+FSYNC_POLICIES = (FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER)
+
+
 class StateManager:
-    """Manages position state with disk persistence"""
-    
-    def __init__(self, state_file='position_state.json', duplicate_window=60):
+    """Manages position state with journal + snapshot persistence"""
+
+    def __init__(self, state_file='position_state.json', duplicate_window=60,
+                 journal_file=None, fsync_policy=FSYNC_INTERVAL, fsync_interval=1.0,
+                 compact_every=1000):
+        """
+        Args:
+            state_file: Snapshot file (same format as the old full-state file)
+            duplicate_window: Seconds a signal hash is remembered for dedup
+            journal_file: Append-only journal (default: <state_file>.journal)
+            fsync_policy: 'always', 'interval' or 'never'
+            fsync_interval: Seconds between fsyncs for the 'interval' policy
+            compact_every: Journal entries before folding them into a snapshot
+        """
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"fsync_policy must be one of {FSYNC_POLICIES}, got {fsync_policy!r}")
         self.state_file = state_file
+        self.journal_file = journal_file or os.path.splitext(state_file)[0] + '.journal'
         self.duplicate_window = duplicate_window
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
         self.positions: Dict = {}
-        self.recent_signals: List[Dict] = []
+        # hash -> signal entry, in arrival order (oldest first)
+        self._signals: "OrderedDict[str, Dict]" = OrderedDict()
+        self._journal = None
+        self._journal_entries = 0
+        self._last_fsync = 0.0
+        self._lock = threading.RLock()
         self.load_state()
-    
+
+    @property
+    def recent_signals(self) -> List[Dict]:
+        """Signals inside the dedup window, oldest first"""
+        return list(self._signals.values())
+
     def load_state(self):
-        """Load state from disk"""
-        if os.path.exists(self.state_file):
-            try:
-                with open(self.state_file, 'r') as f:
-                    data = json.load(f)
+        """Load the snapshot, replay the journal and reopen it for appends"""
+        with self._lock:
+            self.positions = {}
+            self._signals.clear()
+            if os.path.exists(self.state_file):
+                try:
+                    with open(self.state_file, 'r') as f:
+                        data = json.load(f)
                     self.positions = data.get('positions', {})
-                    self.recent_signals = data.get('recent_signals', [])
-                logger.info(f"State loaded: {len(self.positions)} positions")
-            except Exception as e:
-                logger.error(f"Failed to load state: {e}")
-                self.positions = {}
-                self.recent_signals = []
+                    for entry in data.get('recent_signals', []):
+                        self._signals[entry['hash']] = entry
+                except Exception as e:
+                    logger.error(f"Failed to load state: {e}")
+                    self.positions = {}
+                    self._signals.clear()
+            else:
+                logger.info("No existing state file, starting fresh")
+
+            replayed = self._replay_journal()
+            self._expire_signals()
+            self._open_journal()
+            logger.info(f"State loaded: {len(self.positions)} positions ({replayed} journal entries replayed)")
+
+    def _replay_journal(self) -> int:
+        """Apply journal entries on top of the snapshot; drop a torn tail"""
+        if not os.path.exists(self.journal_file):
+            return 0
+
+        replayed = 0
+        valid_bytes = 0
+        with open(self.journal_file, 'rb') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError("incomplete line")
+                    self._apply(json.loads(line))
+                except Exception as e:
+                    logger.warning(f"Discarding journal from byte {valid_bytes}: {e}")
+                    break
+                valid_bytes += len(line)
+                replayed += 1
+
+        if valid_bytes < os.path.getsize(self.journal_file):
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(valid_bytes)
+        self._journal_entries = replayed
+        return replayed
+
+    def _apply(self, entry: Dict):
+        """Apply one journal entry to the in-memory state (idempotent)"""
+        op = entry['op']
+        if op == 'put':
+            self.positions[entry['id']] = entry['data']
+        elif op == 'del':
+            self.positions.pop(entry['id'], None)
+        elif op == 'set':
+            if entry['id'] in self.positions:
+                self.positions[entry['id']][entry['field']] = entry['value']
+        elif op == 'signal':
+            self._signals[entry['signal']['hash']] = entry['signal']
         else:
-            logger.info("No existing state file, starting fresh")
-    
-    def save_state(self):
-        """Persist state to disk"""
+            raise ValueError(f"unknown op {op!r}")
+
+    def _open_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self.journal_file, 'a', encoding='utf-8')
+
+    def _append(self, entry: Dict):
+        """Write one entry to the journal (caller holds the lock)"""
         try:
-            data = {
-                'positions': self.positions,
-                'recent_signals': self.recent_signals[-100:],  # Keep last 100
-                'last_updated': datetime.now().isoformat()
-            }
-            with open(self.state_file, 'w') as f:
-                json.dump(data, f, indent=2)
-            logger.debug("State saved successfully")
+            self._journal.write(json.dumps(entry, separators=(',', ':'), default=str) + '\n')
+            self._journal.flush()
+            now = time.monotonic()
+            if self.fsync_policy == FSYNC_ALWAYS or (
+                self.fsync_policy == FSYNC_INTERVAL and now - self._last_fsync >= self.fsync_interval
+            ):
+                os.fsync(self._journal.fileno())
+                self._last_fsync = now
+            self._journal_entries += 1
         except Exception as e:
-            logger.error(f"Failed to save state: {e}")
-    
+            logger.error(f"Failed to journal state change: {e}")
+            return
+
+        if self._journal_entries >= self.compact_every:
+            self.save_state()
+
+    def save_state(self):
+        """Write a snapshot atomically and truncate the journal (compaction)"""
+        with self._lock:
+            try:
+                self._expire_signals()
+                data = {
+                    'positions': self.positions,
+                    'recent_signals': list(self._signals.values()),
+                    'last_updated': datetime.now().isoformat()
+                }
+                tmp_file = self.state_file + '.tmp'
+                with open(tmp_file, 'w') as f:
+                    json.dump(data, f, indent=2, default=str)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self.state_file)
+
+                # Entries are idempotent: a crash before this truncate just replays them again
+                self._journal.truncate(0)
+                self._journal_entries = 0
+                logger.debug("State snapshot saved, journal compacted")
+            except Exception as e:
+                logger.error(f"Failed to save state: {e}")
+
+    def close(self):
+        """Compact and close the journal (call on shutdown)"""
+        with self._lock:
+            if self._journal is None:
+                return
+            self.save_state()
+            self._journal.close()
+            self._journal = None
+
     def add_position(self, position_id: str, position_data: Dict):
         """Add or update a position"""
-        self.positions[position_id] = position_data
-        self.save_state()
+        with self._lock:
+            self.positions[position_id] = position_data
+            self._append({'op': 'put', 'id': position_id, 'data': position_data})
         logger.info(f"Position added/updated: {position_id}")
-    
+
     def remove_position(self, position_id: str):
         """Remove a position"""
-        if position_id in self.positions:
-            del self.positions[position_id]
-            self.save_state()
-            logger.info(f"Position removed: {position_id}")
-        else:
-            logger.warning(f"Attempted to remove non-existent position: {position_id}")
-    
+        with self._lock:
+            if position_id in self.positions:
+                del self.positions[position_id]
+                self._append({'op': 'del', 'id': position_id})
+                logger.info(f"Position removed: {position_id}")
+            else:
+                logger.warning(f"Attempted to remove non-existent position: {position_id}")
+
     def get_position(self, position_id: str) -> Optional[Dict]:
         """Get position by ID"""
         return self.positions.get(position_id)
-    
+
     def get_all_positions(self) -> Dict:
         """Get all open positions"""
         return {k: v for k, v in self.positions.items() if v.get('status') == 'open'}
-    
+
     def get_position_count(self) -> int:
         """Count open positions"""
         return len(self.get_all_positions())
-    
+
+    def _expire_signals(self):
+        """Drop signals older than the dedup window (oldest are first)"""
+        cutoff = (datetime.now() - timedelta(seconds=self.duplicate_window)).isoformat()
+        while self._signals:
+            oldest = next(iter(self._signals.values()))
+            if oldest['received_at'] > cutoff:
+                break
+            self._signals.popitem(last=False)
+
     def is_duplicate_signal(self, signal: Dict) -> bool:
         """
         Check if signal is a duplicate within time window
-        
+
         Args:
             signal: Signal dictionary with type, position, timestamp
-            
+
         Returns:
             True if duplicate, False otherwise
         """
@@ -91,37 +236,30 @@ class StateManager:
         signal_hash = hashlib.md5(
             f"{signal.get('type')}_{signal.get('position')}_{signal.get('timestamp')}".encode()
         ).hexdigest()
-        
-        # Clean old signals beyond window
-        cutoff_time = datetime.now() - timedelta(seconds=self.duplicate_window)
-        self.recent_signals = [
-            s for s in self.recent_signals 
-            if datetime.fromisoformat(s['received_at']) > cutoff_time
-        ]
-        
-        # Check for duplicate
-        for recent in self.recent_signals:
-            if recent['hash'] == signal_hash:
+
+        with self._lock:
+            self._expire_signals()
+
+            if signal_hash in self._signals:
                 logger.warning(f"Duplicate signal detected: {signal.get('type')} {signal.get('position')}")
                 return True
-        
-        # Add to recent signals
-        self.recent_signals.append({
-            'hash': signal_hash,
-            'received_at': datetime.now().isoformat(),
-            'type': signal.get('type'),
-            'position': signal.get('position')
-        })
-        self.save_state()
-        
+
+            entry = {
+                'hash': signal_hash,
+                'received_at': datetime.now().isoformat(),
+                'type': signal.get('type'),
+                'position': signal.get('position')
+            }
+            self._signals[signal_hash] = entry
+            self._append({'op': 'signal', 'signal': entry})
+
         return False
-    
+
     def update_position_field(self, position_id: str, field: str, value):
         """Update a single field in position"""
-        if position_id in self.positions:
-            self.positions[position_id][field] = value
-            self.save_state()
-        else:
-            logger.error(f"Cannot update field for non-existent position: {position_id}")
-
-
+        with self._lock:
+            if position_id in self.positions:
+                self.positions[position_id][field] = value
+                self._append({'op': 'set', 'id': position_id, 'field': field, 'value': value})
+            else:
+                logger.error(f"Cannot update field for non-existent position: {position_id}")
@@ -0,0 +1,122 @@
+"""Partition margin/position snapshots by month
+
+Revision ID: 003_partition_snapshots
+Revises: 002_excluded_margin
+Create Date: 2026-10-18
+
+Converts margin_snapshots (on timestamp) and position_snapshots (on created_at)
+to native monthly RANGE partitions so day/week queries prune to one or two
+partitions and retention becomes DETACH/DROP. Partition maintenance (future
+partitions, Parquet archival, drop) is done by the Portfolio Manager job in
+portfolio_manager/core/partition_maintenance.py - it shares this database.
+
+Partitioning requires the partition key in every unique constraint:
+- Primary keys become (id, timestamp) / (id, created_at)
+- The position_snapshots.snapshot_id -> margin_snapshots.id foreign key is
+  dropped (the ORM relationship still joins on it; the column stays indexed)
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import text
+
+from app.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '003_partition_snapshots'
+down_revision: Union[str, None] = '002_excluded_margin'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA = settings.mm_schema
+MONTHS_AHEAD = 3
+
+# table -> (partition key, index statements recreated after conversion)
+TABLES = {
+    'margin_snapshots': ('timestamp', [
+        'CREATE INDEX idx_margin_snapshots_config_time ON {schema}.margin_snapshots (config_id, "timestamp")',
+        'CREATE INDEX idx_margin_snapshots_timestamp ON {schema}.margin_snapshots ("timestamp")',
+    ]),
+    'position_snapshots': ('created_at', [
+        'CREATE INDEX idx_position_snapshots_snapshot ON {schema}.position_snapshots (snapshot_id)',
+    ]),
+}
+
+
+def _add_months(d: date, months: int) -> date:
+    index = d.year * 12 + (d.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _convert(table: str, key: str, indexes) -> None:
+    conn = op.get_bind()
+    qualified = f'{SCHEMA}.{table}'
+    legacy = f'{table}_legacy'
+
+    seq = conn.execute(text("SELECT pg_get_serial_sequence(:t, 'id')"), {'t': qualified}).scalar()
+    first = conn.execute(text(f'SELECT MIN("{key}") FROM {qualified}')).scalar()
+
+    op.execute(f'ALTER TABLE {qualified} RENAME TO {legacy}')
+    op.execute(f'UPDATE {SCHEMA}.{legacy} SET "{key}" = NOW() WHERE "{key}" IS NULL')
+    op.execute(
+        f'CREATE TABLE {qualified} (LIKE {SCHEMA}.{legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+        f'PARTITION BY RANGE ("{key}")'
+    )
+    op.execute(f'ALTER TABLE {qualified} ALTER COLUMN "{key}" SET NOT NULL')
+
+    this_month = date.today().replace(day=1)
+    month = min(first.date().replace(day=1), this_month) if first else this_month
+    last = _add_months(this_month, MONTHS_AHEAD)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE {qualified}_p{month:%Y%m} PARTITION OF {qualified} "
+            f"FOR VALUES FROM ('{month}') TO ('{_add_months(month, 1)}')"
+        )
+        month = _add_months(month, 1)
+    op.execute(f'CREATE TABLE {qualified}_pdefault PARTITION OF {qualified} DEFAULT')
+
+    op.execute(f'INSERT INTO {qualified} SELECT * FROM {SCHEMA}.{legacy}')
+    if seq:
+        op.execute(f'ALTER SEQUENCE {seq} OWNED BY {qualified}.id')
+    op.execute(f'DROP TABLE {SCHEMA}.{legacy} CASCADE')
+
+    op.execute(f'ALTER TABLE {qualified} ADD PRIMARY KEY (id, "{key}")')
+    for statement in indexes:
+        op.execute(statement.format(schema=SCHEMA))
+
+
+def _revert(table: str, key: str, indexes) -> None:
+    conn = op.get_bind()
+    qualified = f'{SCHEMA}.{table}'
+    legacy = f'{table}_partitioned'
+
+    seq = conn.execute(text("SELECT pg_get_serial_sequence(:t, 'id')"), {'t': qualified}).scalar()
+
+    op.execute(f'ALTER TABLE {qualified} RENAME TO {legacy}')
+    op.execute(f'CREATE TABLE {qualified} (LIKE {SCHEMA}.{legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+    op.execute(f'INSERT INTO {qualified} SELECT * FROM {SCHEMA}.{legacy}')
+    if seq:
+        op.execute(f'ALTER SEQUENCE {seq} OWNED BY {qualified}.id')
+    op.execute(f'DROP TABLE {SCHEMA}.{legacy} CASCADE')
+    op.execute(f'ALTER TABLE {qualified} ADD PRIMARY KEY (id)')
+    for statement in indexes:
+        op.execute(statement.format(schema=SCHEMA))
+
+
+def upgrade() -> None:
+    """Convert snapshot tables to monthly partitions."""
+    # position_snapshots first so its FK to margin_snapshots leaves with the legacy table
+    _convert('position_snapshots', *TABLES['position_snapshots'])
+    _convert('margin_snapshots', *TABLES['margin_snapshots'])
+
+
+def downgrade() -> None:
+    """Convert snapshot tables back to plain tables and restore the FK."""
+    _revert('margin_snapshots', *TABLES['margin_snapshots'])
+    _revert('position_snapshots', *TABLES['position_snapshots'])
+    op.execute(
+        f'ALTER TABLE {SCHEMA}.position_snapshots ADD CONSTRAINT position_snapshots_snapshot_id_fkey '
+        f'FOREIGN KEY (snapshot_id) REFERENCES {SCHEMA}.margin_snapshots (id)'
+    )
@@ -0,0 +1,127 @@
+"""Add continuous aggregate tables for margin history
+
+Revision ID: 004_margin_rollups
+Revises: 003_partition_snapshots
+Create Date: 2026-10-18
+
+Adds the rollup tables the history and analytics endpoints read instead of
+raw rows, and backfills them from existing data:
+- margin_rollups: per-15-minute and per-day (IST) buckets of margin_snapshots,
+  maintained by capture_snapshot
+- weekday_rollups: per index/weekday/month sums of daily_summary,
+  maintained by generate_daily_summary
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004_margin_rollups'
+down_revision: Union[str, None] = '003_partition_snapshots'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA = settings.mm_schema
+
+# Bucket expressions in IST, returned as timestamptz
+BUCKETS = {
+    '15m': (
+        "(date_trunc('hour', \"timestamp\" AT TIME ZONE 'Asia/Kolkata') "
+        "+ floor(extract(minute FROM \"timestamp\" AT TIME ZONE 'Asia/Kolkata') / 15) * interval '15 minutes') "
+        "AT TIME ZONE 'Asia/Kolkata'"
+    ),
+    '1d': "date_trunc('day', \"timestamp\" AT TIME ZONE 'Asia/Kolkata') AT TIME ZONE 'Asia/Kolkata'",
+}
+
+
+def upgrade() -> None:
+    """Create rollup tables and backfill them."""
+    op.create_table(
+        'margin_rollups',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('config_id', sa.Integer(), sa.ForeignKey(f'{SCHEMA}.daily_config.id'), nullable=False),
+        sa.Column('resolution', sa.String(4), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('sample_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('sum_utilization_pct', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('min_utilization_pct', sa.Float(), nullable=False),
+        sa.Column('max_utilization_pct', sa.Float(), nullable=False),
+        sa.Column('last_utilization_pct', sa.Float(), nullable=False),
+        sa.Column('max_intraday_margin', sa.Float(), nullable=False),
+        sa.Column('max_short_count', sa.Integer(), server_default='0'),
+        sa.Column('max_long_count', sa.Integer(), server_default='0'),
+        sa.Column('last_hedge_cost', sa.Float(), server_default='0'),
+        sa.Column('last_pnl', sa.Float(), server_default='0'),
+        sa.Column('first_timestamp', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('last_timestamp', sa.DateTime(timezone=True), nullable=False),
+        sa.UniqueConstraint('config_id', 'resolution', 'bucket_start', name='uq_margin_rollups_bucket'),
+        schema=SCHEMA
+    )
+    op.create_index(
+        'idx_margin_rollups_resolution_bucket', 'margin_rollups',
+        ['resolution', 'bucket_start'], schema=SCHEMA
+    )
+
+    op.create_table(
+        'weekday_rollups',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('index_name', sa.String(20), nullable=False),
+        sa.Column('day_of_week', sa.Integer(), nullable=False),
+        sa.Column('day_name', sa.String(20), nullable=False),
+        sa.Column('month_start', sa.Date(), nullable=False),
+        sa.Column('trading_days', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('sum_max_utilization_pct', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('sum_hedge_cost', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('sum_pnl', sa.Float(), nullable=False, server_default='0'),
+        sa.UniqueConstraint('index_name', 'day_of_week', 'month_start', name='uq_weekday_rollups_bucket'),
+        schema=SCHEMA
+    )
+
+    # Backfill from existing snapshots (last_* values from the latest snapshot in each bucket)
+    for resolution, bucket in BUCKETS.items():
+        op.execute(f"""
+            INSERT INTO {SCHEMA}.margin_rollups (
+                config_id, resolution, bucket_start, sample_count, sum_utilization_pct,
+                min_utilization_pct, max_utilization_pct, last_utilization_pct, max_intraday_margin,
+                max_short_count, max_long_count, last_hedge_cost, last_pnl,
+                first_timestamp, last_timestamp
+            )
+            SELECT
+                config_id, '{resolution}', bucket, COUNT(*), SUM(utilization_pct),
+                MIN(utilization_pct), MAX(utilization_pct),
+                (array_agg(utilization_pct ORDER BY "timestamp" DESC))[1],
+                MAX(intraday_margin),
+                MAX(short_positions_count), MAX(long_positions_count),
+                (array_agg(total_hedge_cost ORDER BY "timestamp" DESC))[1],
+                (array_agg(total_pnl ORDER BY "timestamp" DESC))[1],
+                MIN("timestamp"), MAX("timestamp")
+            FROM (
+                SELECT *, {bucket} AS bucket
+                FROM {SCHEMA}.margin_snapshots
+                WHERE error_message IS NULL
+            ) s
+            GROUP BY config_id, bucket
+        """)
+
+    op.execute(f"""
+        INSERT INTO {SCHEMA}.weekday_rollups (
+            index_name, day_of_week, day_name, month_start,
+            trading_days, sum_max_utilization_pct, sum_hedge_cost, sum_pnl
+        )
+        SELECT
+            index_name, day_of_week, MIN(day_name), date_trunc('month', date)::date,
+            COUNT(*), SUM(max_utilization_pct), SUM(COALESCE(total_hedge_cost, 0)), SUM(COALESCE(total_pnl, 0))
+        FROM {SCHEMA}.daily_summary
+        GROUP BY index_name, day_of_week, date_trunc('month', date)
+    """)
+
+
+def downgrade() -> None:
+    """Drop rollup tables."""
+    op.drop_table('weekday_rollups', schema=SCHEMA)
+    op.drop_index('idx_margin_rollups_resolution_bucket', table_name='margin_rollups', schema=SCHEMA)
+    op.drop_table('margin_rollups', schema=SCHEMA)
@@ -32,6 +32,7 @@ from app.api.hedge_schemas import (
 )
 from app.services.strategy_scheduler import StrategySchedulerService
 from app.services.hedge_orchestrator import AutoHedgeOrchestrator
+from app.services.option_chain_store import OptionChainStore
 from app.services.hedge_executor import HedgeExecutorService
 from app.services.hedge_selector import HedgeStrikeSelectorService, HedgeCandidate
 from app.services.margin_calculator import MarginCalculatorService
@@ -114,6 +115,28 @@ def set_orchestrator(orchestrator: AutoHedgeOrchestrator):
     _orchestrator = orchestrator
 
 
+def _wake_orchestrator(reason: str):
+    """Let a running orchestrator react now (and rebuild timers on schedule/session edits)."""
+    orchestrator = get_orchestrator()
+    if orchestrator:
+        orchestrator.wake(reason)
+
+
+# Global option chain store (set by main.py on startup, independent of auto-hedge)
+_chain_store: Optional[OptionChainStore] = None
+
+
+def get_chain_store() -> Optional[OptionChainStore]:
+    """Get the shared option chain store."""
+    return _chain_store
+
+
+def set_chain_store(chain_store: OptionChainStore):
+    """Set the shared option chain store."""
+    global _chain_store
+    _chain_store = chain_store
+
+
 # ============================================================
 # Status Endpoints
 # ============================================================
@@ -310,6 +333,11 @@ async def toggle_auto_hedge(
     status = "enabled" if request.enabled else "disabled"
     logger.info(f"[HEDGE_API] Auto-hedge {status} for session {session.session_date}")
 
+    # Let the orchestrator pick up the toggle now rather than at its next timer
+    orchestrator = get_orchestrator()
+    if orchestrator:
+        orchestrator.wake("toggle")
+
     return ToggleResponse(
         success=True,
         auto_hedge_enabled=request.enabled,
@@ -375,6 +403,7 @@ async def reset_dry_run(db: AsyncSession = Depends(get_db)):
     # Reset orchestrator's in-memory simulated margin tracking
     if orchestrator:
         orchestrator.reset_simulated_margin()
+        orchestrator.wake("reset-dry-run")
 
     logger.info(
         f"[HEDGE_API] Reset dry run: deleted {txn_count} transactions, "
@@ -520,6 +549,7 @@ async def update_schedule(
         db.add(schedule)
 
     await db.commit()
+    _wake_orchestrator("schedule")
 
     logger.info(
         f"[HEDGE_API] Updated schedule for {request.day_of_week}: "
@@ -657,6 +687,7 @@ async def create_session(
         db.add(session)
 
     await db.commit()
+    _wake_orchestrator("session")
     await db.refresh(session)
 
     logger.info(
@@ -739,6 +770,7 @@ async def delete_session(
     )
 
     await db.commit()
+    _wake_orchestrator("session")
 
     logger.info(
         f"[HEDGE_API] Deleted session {session_date}: "
@@ -1000,6 +1032,7 @@ async def auto_create_session(
     )
     db.add(session)
     await db.commit()
+    _wake_orchestrator("session")
     await db.refresh(session)
 
     logger.info(
@@ -1174,17 +1207,32 @@ async def manual_hedge_buy(
     if not session:
         raise HTTPException(400, "No session found. Create a session first.")
 
-    # Calculate simulated strike based on index name and offset
-    # In real mode, we'd fetch the current spot price
-    simulated_spot = 24000 if request.index_name == "NIFTY" else 80000  # Placeholder
+    # Strike from spot +/- offset; spot, listed strikes and premium come from
+    # the shared chain store, with placeholders if it is unavailable
+    chain = None
+    spot = None
+    chain_store = get_chain_store()
+    if chain_store:
+        try:
+            spot = await chain_store.get_spot(request.index_name)
+            chain = await chain_store.get(
+                request.index_name, datetime.strptime(request.expiry_date, "%Y-%m-%d").date()
+            )
+        except Exception as e:
+            logger.warning(f"[HEDGE_API] Option chain unavailable for manual buy: {e}")
+    simulated_spot = spot or (24000 if request.index_name == "NIFTY" else 80000)
     if request.option_type == "PE":
         simulated_strike = simulated_spot - request.strike_offset
     else:
         simulated_strike = simulated_spot + request.strike_offset
 
-    # Round strike to nearest valid strike (50 for NIFTY, 100 for SENSEX)
-    strike_gap = 50 if request.index_name == "NIFTY" else 100
-    simulated_strike = round(simulated_strike / strike_gap) * strike_gap
+    if chain is not None and len(chain) > 0:
+        simulated_strike = chain.nearest_strike(simulated_strike)
+    else:
+        # Round strike to nearest valid strike (50 for NIFTY, 100 for SENSEX)
+        strike_gap = 50 if request.index_name == "NIFTY" else 100
+        simulated_strike = round(simulated_strike / strike_gap) * strike_gap
+    premium = (chain.ltp(simulated_strike, request.option_type) if chain is not None else None) or 5.0
 
     # Get lot size for the index
     index_upper = request.index_name.upper()
@@ -1202,8 +1250,8 @@ async def manual_hedge_buy(
         "lots": request.lots,
         "lot_size": lot_size,
         "quantity": quantity,
-        "estimated_premium": 5.0,  # Would be fetched from option chain
-        "estimated_cost": quantity * 5.0,
+        "estimated_premium": premium,
+        "estimated_cost": quantity * premium,
         "reason": request.reason or "Manual hedge via UI",
         "session_id": session.id,
         "session_date": str(session.session_date),
@@ -1237,7 +1285,7 @@ async def manual_hedge_buy(
     candidate = HedgeCandidate(
         strike=simulated_strike,
         option_type=request.option_type,
-        ltp=5.0,  # Will be fetched
+        ltp=premium,
         otm_distance=request.strike_offset,
         estimated_margin_benefit=0,
         cost_per_lot=0,
@@ -17,13 +17,14 @@ from app.services.margin_service import margin_service
 from app.services.position_service import position_service
 from app.services.openalgo_service import openalgo_service, OpenAlgoError
 from app.services.analytics_service import analytics_service
-from app.utils.date_utils import today_ist, get_day_of_week, get_day_name, now_ist, format_datetime_ist, get_market_status
+from app.utils.date_utils import today_ist, get_day_of_week, get_day_name, now_ist, format_datetime_ist, get_market_status, day_range_ist
 from app.api.schemas import (
     ConfigRequest, ConfigCreateResponse, ConfigResponse,
     BaselineRequest, ManualBaselineRequest, BaselineCaptureResponse,
     CurrentMarginResponse, MarginData, PositionSummary, M2MData,
     PositionsResponse, PositionsFilter, PositionData, ExcludedPosition, PositionsSummary,
     HistoryResponse, HistoryConfig, HistorySnapshot,
+    RangeHistoryResponse, RangeHistoryPoint,
     SummaryResponse, DailySummaryData,
     AnalyticsResponse, DayOfWeekAnalytics,
     SnapshotCaptureResponse,
@@ -375,12 +376,15 @@ async def get_positions(
 @router.get("/history", response_model=HistoryResponse)
 async def get_history(
     history_date: Optional[str] = Query(None, description="Date (YYYY-MM-DD), defaults to today"),
+    points: Optional[int] = Query(None, ge=10, le=5000, description="Downsample to about this many points"),
+    method: str = Query('lttb', pattern='^(lttb|minmax)$', description="Downsampling method"),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get day's snapshots for charting.
 
-    Returns all 5-minute snapshots for the specified date.
+    Returns all 5-minute snapshots for the specified date, or about `points`
+    of them when set (LTTB keeps the chart's shape, minmax keeps every spike).
     """
     if history_date:
         try:
@@ -399,14 +403,7 @@ async def get_history(
     if not config:
         raise HTTPException(404, f"No configuration for {target_date}")
 
-    # Get snapshots
-    result = await db.execute(
-        select(MarginSnapshot)
-        .where(MarginSnapshot.config_id == config.id)
-        .where(MarginSnapshot.error_message.is_(None))
-        .order_by(MarginSnapshot.timestamp)
-    )
-    snapshots = result.scalars().all()
+    snapshots = await analytics_service.get_day_history(db, config, points, method)
 
     return HistoryResponse(
         success=True,
@@ -419,20 +416,52 @@ async def get_history(
             baseline_margin=config.baseline_margin or 0,
         ),
         snapshots=[
-            HistorySnapshot(
-                timestamp=format_datetime_ist(s.timestamp),
-                intraday_margin=s.intraday_margin,
-                utilization_pct=s.utilization_pct,
-                short_count=s.short_positions_count,
-                long_count=s.long_positions_count,
-                hedge_cost=s.total_hedge_cost,
-                total_pnl=s.total_pnl,
-            )
+            HistorySnapshot(**{**s, 'timestamp': format_datetime_ist(s['timestamp'])})
             for s in snapshots
         ],
     )
 
 
+@router.get("/history/range", response_model=RangeHistoryResponse)
+async def get_range_history(
+    start_date: str = Query(..., description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD), defaults to today"),
+    points: int = Query(300, ge=10, le=5000, description="Downsample to about this many points"),
+    method: str = Query('lttb', pattern='^(lttb|minmax)$', description="Downsampling method"),
+    resolution: Optional[str] = Query(None, pattern='^(15m|1d)$', description="Bucket size, defaults by range length"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get utilization across a date range for charting.
+
+    Reads the 15-minute or daily rollups (one row per bucket) instead of raw
+    snapshots, then downsamples to `points`.
+    """
+    try:
+        start_dt = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end_dt = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else today_ist()
+    except ValueError:
+        raise HTTPException(400, "Invalid date format")
+
+    if end_dt < start_dt:
+        raise HTTPException(400, "end_date is before start_date")
+
+    used_resolution, buckets = await analytics_service.get_range_history(
+        db, start_dt, end_dt, points=points, method=method, resolution=resolution
+    )
+
+    return RangeHistoryResponse(
+        success=True,
+        start_date=start_dt.strftime('%Y-%m-%d'),
+        end_date=end_dt.strftime('%Y-%m-%d'),
+        resolution=used_resolution,
+        points=[
+            RangeHistoryPoint(**{**b, 'bucket_start': format_datetime_ist(b['bucket_start'])})
+            for b in buckets
+        ],
+    )
+
+
 # ============================================================
 # Summary Endpoint
 # ============================================================
@@ -585,9 +614,12 @@ async def get_status(
             has_eod_summary = True
 
             # Get snapshot count efficiently (don't load all rows)
+            day_start, day_end = day_range_ist(config.date)
             snapshot_count_result = await db.execute(
                 select(func.count(MarginSnapshot.id))
                 .where(MarginSnapshot.config_id == config.id)
+                .where(MarginSnapshot.timestamp >= day_start)
+                .where(MarginSnapshot.timestamp < day_end)
                 .where(MarginSnapshot.error_message.is_(None))
             )
             snapshot_count = snapshot_count_result.scalar() or 0
@@ -191,6 +191,28 @@ class HistoryResponse(BaseModel):
     snapshots: List[HistorySnapshot]
 
 
+class RangeHistoryPoint(BaseModel):
+    """One rolled-up bucket for range charts."""
+    bucket_start: str
+    samples: int
+    avg_utilization_pct: float
+    min_utilization_pct: float
+    max_utilization_pct: float
+    last_utilization_pct: float
+    max_intraday_margin: float
+    hedge_cost: float
+    total_pnl: float
+
+
+class RangeHistoryResponse(BaseModel):
+    """Response for range history endpoint."""
+    success: bool
+    start_date: str
+    end_date: str
+    resolution: str
+    points: List[RangeHistoryPoint]
+
+
 # ============================================================
 # Response Schemas - Summary
 # ============================================================
@@ -61,6 +61,12 @@ class Settings(BaseSettings):
     hedge_min_premium: float = 2.0           # Min LTP for hedge strike
     hedge_max_premium: float = 6.0           # Max LTP for hedge strike
 
+    # Option Chain Store (shared chain/spot snapshots)
+    option_chain_refresh_seconds: float = 30.0            # Background refresh cadence
+    option_chain_near_entry_refresh_seconds: float = 5.0  # Cadence near scheduled entries
+    option_chain_near_entry_window_minutes: int = 10      # Entry counts as near within this
+    option_chain_max_age_seconds: float = 60.0            # Refetch on read if older
+
     # Hedge Safety
     hedge_max_cost_per_day: float = 50000.0  # ₹50K max daily spend
     hedge_cooldown_seconds: int = 120        # Min time between actions
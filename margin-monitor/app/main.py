@@ -10,7 +10,7 @@ import logging
 from app.config import settings
 from app.database import init_db
 from app.api.routes import router as api_router
-from app.api.hedge_routes import router as hedge_router, set_orchestrator
+from app.api.hedge_routes import router as hedge_router, set_orchestrator, set_chain_store
 
 # Configure logging
 logging.basicConfig(
@@ -34,6 +34,31 @@ async def lifespan(app: FastAPI):
     from app.services.scheduler_service import scheduler_service
     from app.database import async_session_maker
     scheduler_service.set_db_session_maker(async_session_maker)
+
+    # Shared option chain store: used by the margin scheduler, hedge routes and
+    # (when enabled) the auto-hedge orchestrator, so it runs regardless of auto-hedge
+    from app.services.option_chain_store import OptionChainStore
+    from app.services.openalgo_service import OpenAlgoService
+    from app.services.strategy_scheduler import StrategySchedulerService
+
+    openalgo = OpenAlgoService(
+        base_url=settings.openalgo_base_url,
+        api_key=settings.openalgo_api_key
+    )
+    scheduler = StrategySchedulerService(async_session_maker())
+    chain_store = OptionChainStore(
+        openalgo,
+        scheduler=scheduler,
+        refresh_seconds=settings.option_chain_refresh_seconds,
+        near_entry_refresh_seconds=settings.option_chain_near_entry_refresh_seconds,
+        near_entry_window_minutes=settings.option_chain_near_entry_window_minutes,
+        max_age_seconds=settings.option_chain_max_age_seconds
+    )
+    app.state.chain_store = chain_store
+    set_chain_store(chain_store)
+    scheduler_service.set_chain_store(chain_store)
+    chain_store.start()
+
     scheduler_service.start()
     logger.info("Scheduler started")
 
@@ -44,10 +69,11 @@ async def lifespan(app: FastAPI):
             from app.services.hedge_orchestrator import AutoHedgeOrchestrator
             from app.services.hedge_executor import HedgeExecutorService
             from app.services.hedge_selector import HedgeStrikeSelectorService
-            from app.services.strategy_scheduler import StrategySchedulerService
             from app.services.margin_calculator import MarginCalculatorService
+            from app.services.span_margin import SpanMarginEstimator
+            from app.services.hedge_solver import HedgeBasketSolver
             from app.services.telegram_service import TelegramService
-            from app.services.openalgo_service import OpenAlgoService, openalgo_service
+            from app.services.openalgo_service import openalgo_service
             from app.database import get_db
 
             # Create services - use factory for long-running orchestrator
@@ -59,20 +85,19 @@ async def lifespan(app: FastAPI):
                 async with async_session_maker() as session:
                     yield session
 
-            openalgo = OpenAlgoService(
-                base_url=settings.openalgo_base_url,
-                api_key=settings.openalgo_api_key
-            )
             telegram = TelegramService(
                 bot_token=settings.telegram_bot_token,
                 chat_id=settings.telegram_chat_id
             )
             margin_calc = MarginCalculatorService()
+            span_estimator = SpanMarginEstimator()
             # Initialize services with correct parameters
-            scheduler = StrategySchedulerService(async_session_maker())
             selector = HedgeStrikeSelectorService(
                 openalgo=openalgo,
-                margin_calculator=margin_calc
+                margin_calculator=margin_calc,
+                span_estimator=span_estimator,
+                solver=HedgeBasketSolver(),
+                chain_store=chain_store
             )
             executor = HedgeExecutorService(async_session_maker(), openalgo, telegram)
 
@@ -222,13 +247,20 @@ async def lifespan(app: FastAPI):
                 margin_calc=margin_calc,
                 hedge_selector=selector,
                 hedge_executor=executor,
-                telegram=telegram
+                telegram=telegram,
+                span_estimator=span_estimator,
+                chain_store=chain_store
             )
 
             # Store in app state and hedge_routes module for API access
             app.state.orchestrator = orchestrator
             set_orchestrator(orchestrator)
 
+            # Re-check immediately when any positionbook fetch sees positions
+            # change or an order is placed
+            from app.services.openalgo_service import add_event_listener
+            add_event_listener(orchestrator.wake)
+
             # Start orchestrator in background with dry_run setting
             import asyncio
             asyncio.create_task(orchestrator.start(dry_run=settings.auto_hedge_dry_run))
@@ -245,6 +277,7 @@ async def lifespan(app: FastAPI):
     if orchestrator:
         await orchestrator.stop()
         logger.info("Auto-Hedge Orchestrator stopped")
+    await chain_store.stop()
     scheduler_service.stop()
     logger.info("Margin Monitor stopped")
 
@@ -6,6 +6,8 @@ from app.models.db_models import (
     MarginSnapshot,
     PositionSnapshot,
     DailySummary,
+    MarginRollup,
+    WeekdayRollup,
 )
 
 # Auto-Hedge Models
@@ -44,6 +46,8 @@ __all__ = [
     'MarginSnapshot',
     'PositionSnapshot',
     'DailySummary',
+    'MarginRollup',
+    'WeekdayRollup',
     # Auto-Hedge
     'StrategySchedule',
     'DailySession',
@@ -5,7 +5,7 @@ Margin Monitor - Database Models (SQLAlchemy ORM)
 from datetime import datetime, date
 from sqlalchemy import (
     Column, Integer, String, Float, Date, DateTime, Text, ForeignKey,
-    Index, Boolean
+    Index, Boolean, UniqueConstraint
 )
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -93,7 +93,12 @@ class MarginSnapshot(Base):
 
     # Relationships
     config = relationship("DailyConfig", back_populates="snapshots")
-    positions = relationship("PositionSnapshot", back_populates="snapshot")
+    # No FK since partitioning (alembic 003): join condition is explicit
+    positions = relationship(
+        "PositionSnapshot",
+        primaryjoin="MarginSnapshot.id == foreign(PositionSnapshot.snapshot_id)",
+        back_populates="snapshot"
+    )
 
 
 class PositionSnapshot(Base):
@@ -106,7 +111,8 @@ class PositionSnapshot(Base):
     )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    snapshot_id = Column(Integer, ForeignKey(f'{SCHEMA}.margin_snapshots.id'), nullable=False)
+    # References margin_snapshots.id; no FK constraint (partitioned tables, alembic 003)
+    snapshot_id = Column(Integer, nullable=False)
 
     # Position data from OpenAlgo
     symbol = Column(String(50), nullable=False)
@@ -127,7 +133,11 @@ class PositionSnapshot(Base):
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
     # Relationships
-    snapshot = relationship("MarginSnapshot", back_populates="positions")
+    snapshot = relationship(
+        "MarginSnapshot",
+        primaryjoin="MarginSnapshot.id == foreign(PositionSnapshot.snapshot_id)",
+        back_populates="positions"
+    )
 
 
 class DailySummary(Base):
@@ -176,3 +186,67 @@ class DailySummary(Base):
 
     # Relationships
     config = relationship("DailyConfig", back_populates="summary")
+
+
+class MarginRollup(Base):
+    """
+    Continuous aggregate of margin snapshots per 15-minute or per-day bucket.
+
+    Updated by capture_snapshot in the same transaction as the snapshot, so
+    range charts read one row per bucket instead of every snapshot.
+    """
+
+    __tablename__ = 'margin_rollups'
+    __table_args__ = (
+        UniqueConstraint('config_id', 'resolution', 'bucket_start', name='uq_margin_rollups_bucket'),
+        Index('idx_margin_rollups_resolution_bucket', 'resolution', 'bucket_start'),
+        {'schema': SCHEMA}
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    config_id = Column(Integer, ForeignKey(f'{SCHEMA}.daily_config.id'), nullable=False)
+    resolution = Column(String(4), nullable=False)  # '15m' or '1d'
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+
+    # Utilization over the bucket
+    sample_count = Column(Integer, nullable=False, default=0)
+    sum_utilization_pct = Column(Float, nullable=False, default=0.0)
+    min_utilization_pct = Column(Float, nullable=False)
+    max_utilization_pct = Column(Float, nullable=False)
+    last_utilization_pct = Column(Float, nullable=False)
+    max_intraday_margin = Column(Float, nullable=False)
+
+    # Position metrics (last value in bucket)
+    max_short_count = Column(Integer, default=0)
+    max_long_count = Column(Integer, default=0)
+    last_hedge_cost = Column(Float, default=0.0)
+    last_pnl = Column(Float, default=0.0)
+
+    first_timestamp = Column(DateTime(timezone=True), nullable=False)
+    last_timestamp = Column(DateTime(timezone=True), nullable=False)
+
+
+class WeekdayRollup(Base):
+    """
+    Continuous aggregate of daily summaries per index, weekday and month.
+
+    Updated by generate_daily_summary, so day-of-week analytics sum at most
+    one row per weekday per month instead of every summary.
+    """
+
+    __tablename__ = 'weekday_rollups'
+    __table_args__ = (
+        UniqueConstraint('index_name', 'day_of_week', 'month_start', name='uq_weekday_rollups_bucket'),
+        {'schema': SCHEMA}
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    index_name = Column(String(20), nullable=False)
+    day_of_week = Column(Integer, nullable=False)
+    day_name = Column(String(20), nullable=False)
+    month_start = Column(Date, nullable=False)
+
+    trading_days = Column(Integer, nullable=False, default=0)
+    sum_max_utilization_pct = Column(Float, nullable=False, default=0.0)
+    sum_hedge_cost = Column(Float, nullable=False, default=0.0)
+    sum_pnl = Column(Float, nullable=False, default=0.0)
@@ -245,6 +245,44 @@ class LotSizes:
             return self.NIFTY
 
 
+@dataclass
+class SpanParameters:
+    """
+    Parameters for the local SPAN-style margin estimator.
+
+    Approximates exchange SPAN for index options: scanning risk is the worst
+    loss over price scan x volatility scan scenarios, plus exposure margin on
+    short option notional. Values are per index.
+    """
+
+    # Price scan range as fraction of spot (worst-case 1-day move)
+    price_scan_pct: Dict[str, float] = field(default_factory=lambda: {
+        "NIFTY": 0.06,
+        "BANKNIFTY": 0.07,
+        "SENSEX": 0.06
+    })
+
+    # Volatility scan range (absolute change in annualized IV)
+    vol_scan: float = 0.04
+
+    # Extreme move scenarios: multiple of price scan range, loss weight
+    extreme_move_multiple: float = 2.0
+    extreme_move_weight: float = 0.35
+
+    # Exposure margin on short option notional (fraction of spot x qty)
+    exposure_margin_pct: float = 0.02
+
+    # IV used when a leg has no LTP to imply it from
+    default_iv: Dict[str, float] = field(default_factory=lambda: {
+        "NIFTY": 0.13,
+        "BANKNIFTY": 0.15,
+        "SENSEX": 0.13
+    })
+
+    # Floor on time to expiry (years) so 0DTE legs keep some time value
+    min_time_years: float = 1.0 / (365 * 24)
+
+
 # ================================================================
 # EXCHANGE MAPPINGS
 # ================================================================
@@ -276,3 +314,4 @@ DAY_TO_INDEX_EXPIRY = {
 MARGIN_CONSTANTS = MarginConstants()
 HEDGE_CONFIG = HedgeConfig()
 LOT_SIZES = LotSizes()
+SPAN_PARAMS = SpanParameters()
@@ -10,6 +10,9 @@ from app.services.scheduler_service import scheduler_service
 # Auto-Hedge Services
 from app.services.strategy_scheduler import StrategySchedulerService
 from app.services.margin_calculator import MarginCalculatorService
+from app.services.span_margin import SpanMarginEstimator
+from app.services.hedge_solver import HedgeBasketSolver
+from app.services.option_chain_store import OptionChainStore, ChainSnapshot
 from app.services.hedge_selector import HedgeStrikeSelectorService
 from app.services.hedge_executor import HedgeExecutorService
 from app.services.telegram_service import TelegramService, telegram_service
@@ -26,6 +29,10 @@ __all__ = [
     # Auto-Hedge
     'StrategySchedulerService',
     'MarginCalculatorService',
+    'SpanMarginEstimator',
+    'HedgeBasketSolver',
+    'OptionChainStore',
+    'ChainSnapshot',
     'HedgeStrikeSelectorService',
     'HedgeExecutorService',
     'TelegramService',
@@ -2,23 +2,292 @@
 Margin Monitor - Analytics Service
 
 Provides day-of-week and historical analytics.
+
+History for charts is served from continuous aggregates rather than raw rows:
+- margin_rollups: per-15-minute and per-day buckets, updated on every
+  snapshot capture
+- weekday_rollups: per index/weekday/month sums, updated on every EOD summary
+Series are then downsampled (LTTB or min/max) to the requested point count.
 """
 
 import logging
-from datetime import date, timedelta
-from typing import List, Dict, Any
+from datetime import date, datetime, time, timedelta
+from typing import List, Dict, Any, Optional, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
-from app.models.db_models import DailySummary
+from app.models.db_models import DailyConfig, DailySummary, MarginSnapshot, MarginRollup, WeekdayRollup
+from app.utils.date_utils import IST, day_range_ist
+from app.utils.downsample import downsample_indices
 
 logger = logging.getLogger(__name__)
 
+# Rollup resolutions maintained on capture
+ROLLUP_RESOLUTIONS = ('15m', '1d')
+
+# Ranges up to this many days chart from 15-minute buckets, longer ones from daily
+RANGE_15M_MAX_DAYS = 5
+
+
+def bucket_start(timestamp: datetime, resolution: str) -> datetime:
+    """Start of the IST bucket containing timestamp."""
+    local = timestamp.astimezone(IST) if timestamp.tzinfo else IST.localize(timestamp)
+    if resolution == '1d':
+        return IST.localize(datetime.combine(local.date(), time.min))
+    if resolution == '15m':
+        return local.replace(minute=local.minute - local.minute % 15, second=0, microsecond=0)
+    raise ValueError(f"Unknown rollup resolution: {resolution}")
+
+
+def _month_start(d: date) -> date:
+    return d.replace(day=1)
+
+
+def _next_month_start(d: date) -> date:
+    return (d.replace(day=1) + timedelta(days=32)).replace(day=1)
+
 
 class AnalyticsService:
     """Service for analytics and historical analysis."""
 
+    # ============================================================
+    # Continuous aggregates (write side)
+    # ============================================================
+
+    async def update_snapshot_rollups(self, db: AsyncSession, snapshot: MarginSnapshot):
+        """
+        Fold a new snapshot into its 15-minute and daily rollups.
+
+        Runs in the caller's transaction; the caller commits.
+
+        Args:
+            db: Database session
+            snapshot: Flushed MarginSnapshot (error snapshots are not rolled up)
+        """
+        for resolution in ROLLUP_RESOLUTIONS:
+            start = bucket_start(snapshot.timestamp, resolution)
+            result = await db.execute(
+                select(MarginRollup)
+                .where(MarginRollup.config_id == snapshot.config_id)
+                .where(MarginRollup.resolution == resolution)
+                .where(MarginRollup.bucket_start == start)
+            )
+            rollup = result.scalar_one_or_none()
+
+            utilization = snapshot.utilization_pct
+            if rollup is None:
+                db.add(MarginRollup(
+                    config_id=snapshot.config_id,
+                    resolution=resolution,
+                    bucket_start=start,
+                    sample_count=1,
+                    sum_utilization_pct=utilization,
+                    min_utilization_pct=utilization,
+                    max_utilization_pct=utilization,
+                    last_utilization_pct=utilization,
+                    max_intraday_margin=snapshot.intraday_margin,
+                    max_short_count=snapshot.short_positions_count or 0,
+                    max_long_count=snapshot.long_positions_count or 0,
+                    last_hedge_cost=snapshot.total_hedge_cost or 0.0,
+                    last_pnl=snapshot.total_pnl or 0.0,
+                    first_timestamp=snapshot.timestamp,
+                    last_timestamp=snapshot.timestamp,
+                ))
+                continue
+
+            rollup.sample_count += 1
+            rollup.sum_utilization_pct += utilization
+            rollup.min_utilization_pct = min(rollup.min_utilization_pct, utilization)
+            rollup.max_utilization_pct = max(rollup.max_utilization_pct, utilization)
+            rollup.last_utilization_pct = utilization
+            rollup.max_intraday_margin = max(rollup.max_intraday_margin, snapshot.intraday_margin)
+            rollup.max_short_count = max(rollup.max_short_count or 0, snapshot.short_positions_count or 0)
+            rollup.max_long_count = max(rollup.max_long_count or 0, snapshot.long_positions_count or 0)
+            rollup.last_hedge_cost = snapshot.total_hedge_cost or 0.0
+            rollup.last_pnl = snapshot.total_pnl or 0.0
+            rollup.last_timestamp = snapshot.timestamp
+
+    async def update_weekday_rollup(
+        self,
+        db: AsyncSession,
+        summary: DailySummary,
+        previous: Optional[Tuple[float, float, float]] = None
+    ):
+        """
+        Fold a daily summary into its index/weekday/month rollup.
+
+        Runs in the caller's transaction; the caller commits.
+
+        Args:
+            db: Database session
+            summary: New or regenerated DailySummary
+            previous: (max_utilization_pct, total_hedge_cost, total_pnl) the
+                summary held before a regeneration, replaced rather than re-counted
+        """
+        month = _month_start(summary.date)
+        result = await db.execute(
+            select(WeekdayRollup)
+            .where(WeekdayRollup.index_name == summary.index_name)
+            .where(WeekdayRollup.day_of_week == summary.day_of_week)
+            .where(WeekdayRollup.month_start == month)
+        )
+        rollup = result.scalar_one_or_none()
+        if rollup is None:
+            rollup = WeekdayRollup(
+                index_name=summary.index_name,
+                day_of_week=summary.day_of_week,
+                day_name=summary.day_name,
+                month_start=month,
+                trading_days=0,
+                sum_max_utilization_pct=0.0,
+                sum_hedge_cost=0.0,
+                sum_pnl=0.0,
+            )
+            db.add(rollup)
+
+        old_util, old_cost, old_pnl = previous or (0.0, 0.0, 0.0)
+        if previous is None:
+            rollup.trading_days += 1
+        rollup.sum_max_utilization_pct += summary.max_utilization_pct - old_util
+        rollup.sum_hedge_cost += (summary.total_hedge_cost or 0.0) - old_cost
+        rollup.sum_pnl += (summary.total_pnl or 0.0) - old_pnl
+
+    # ============================================================
+    # History for charts (read side)
+    # ============================================================
+
+    async def get_day_history(
+        self,
+        db: AsyncSession,
+        config: DailyConfig,
+        points: Optional[int] = None,
+        method: str = 'lttb'
+    ) -> List[Dict[str, Any]]:
+        """
+        Get a day's snapshots, optionally downsampled.
+
+        Args:
+            db: Database session
+            config: Day's configuration
+            points: Target point count (None = every snapshot)
+            method: 'lttb' or 'minmax', applied to utilization
+
+        Returns:
+            List of snapshot dicts in timestamp order.
+        """
+        # Only the charted columns (timestamp bound prunes to the day's monthly partition)
+        day_start, day_end = day_range_ist(config.date)
+        result = await db.execute(
+            select(
+                MarginSnapshot.timestamp,
+                MarginSnapshot.intraday_margin,
+                MarginSnapshot.utilization_pct,
+                MarginSnapshot.short_positions_count,
+                MarginSnapshot.long_positions_count,
+                MarginSnapshot.total_hedge_cost,
+                MarginSnapshot.total_pnl,
+            )
+            .where(MarginSnapshot.config_id == config.id)
+            .where(MarginSnapshot.timestamp >= day_start)
+            .where(MarginSnapshot.timestamp < day_end)
+            .where(MarginSnapshot.error_message.is_(None))
+            .order_by(MarginSnapshot.timestamp)
+        )
+        rows = result.all()
+
+        if points:
+            keep = downsample_indices(
+                [r.timestamp.timestamp() for r in rows], [r.utilization_pct for r in rows], points, method
+            )
+            rows = [rows[i] for i in keep]
+
+        return [
+            {
+                'timestamp': r.timestamp,
+                'intraday_margin': r.intraday_margin,
+                'utilization_pct': r.utilization_pct,
+                'short_count': r.short_positions_count or 0,
+                'long_count': r.long_positions_count or 0,
+                'hedge_cost': r.total_hedge_cost or 0.0,
+                'total_pnl': r.total_pnl or 0.0,
+            }
+            for r in rows
+        ]
+
+    async def get_range_history(
+        self,
+        db: AsyncSession,
+        start_date: date,
+        end_date: date,
+        points: int = 300,
+        method: str = 'lttb',
+        resolution: Optional[str] = None
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Get rolled-up utilization for a date range, downsampled to points.
+
+        Args:
+            db: Database session
+            start_date: First day (inclusive)
+            end_date: Last day (inclusive)
+            points: Target point count
+            method: 'lttb' or 'minmax', applied to max utilization
+            resolution: '15m' or '1d' (None = by range length)
+
+        Returns:
+            (resolution, list of bucket dicts in time order)
+        """
+        if resolution is None:
+            span_days = (end_date - start_date).days + 1
+            resolution = '15m' if span_days <= RANGE_15M_MAX_DAYS else '1d'
+
+        range_start = day_range_ist(start_date)[0]
+        range_end = day_range_ist(end_date)[1]
+        result = await db.execute(
+            select(
+                MarginRollup.bucket_start,
+                MarginRollup.sample_count,
+                MarginRollup.sum_utilization_pct,
+                MarginRollup.min_utilization_pct,
+                MarginRollup.max_utilization_pct,
+                MarginRollup.last_utilization_pct,
+                MarginRollup.max_intraday_margin,
+                MarginRollup.last_hedge_cost,
+                MarginRollup.last_pnl,
+            )
+            .where(MarginRollup.resolution == resolution)
+            .where(MarginRollup.bucket_start >= range_start)
+            .where(MarginRollup.bucket_start < range_end)
+            .order_by(MarginRollup.bucket_start)
+        )
+        rows = result.all()
+
+        if points:
+            keep = downsample_indices(
+                [r.bucket_start.timestamp() for r in rows], [r.max_utilization_pct for r in rows], points, method
+            )
+            rows = [rows[i] for i in keep]
+
+        return resolution, [
+            {
+                'bucket_start': r.bucket_start,
+                'samples': r.sample_count,
+                'avg_utilization_pct': round(r.sum_utilization_pct / r.sample_count, 2) if r.sample_count else 0.0,
+                'min_utilization_pct': r.min_utilization_pct,
+                'max_utilization_pct': r.max_utilization_pct,
+                'last_utilization_pct': r.last_utilization_pct,
+                'max_intraday_margin': r.max_intraday_margin,
+                'hedge_cost': r.last_hedge_cost or 0.0,
+                'total_pnl': r.last_pnl or 0.0,
+            }
+            for r in rows
+        ]
+
+    # ============================================================
+    # Day-of-week and summaries
+    # ============================================================
+
     async def get_day_of_week_analytics(
         self,
         db: AsyncSession,
@@ -35,32 +304,60 @@ class AnalyticsService:
             List of analytics per day of week.
         """
         cutoff_date = date.today() - timedelta(days=period_days)
+        # Whole months come from weekday_rollups, the leading partial month
+        # from daily_summary - at most a month of raw rows
+        first_full_month = cutoff_date if cutoff_date.day == 1 else _next_month_start(cutoff_date)
 
-        result = await db.execute(
+        rollups = await db.execute(
+            select(
+                WeekdayRollup.day_of_week,
+                WeekdayRollup.day_name,
+                WeekdayRollup.index_name,
+                func.sum(WeekdayRollup.trading_days).label('trading_days'),
+                func.sum(WeekdayRollup.sum_max_utilization_pct).label('sum_max_utilization'),
+                func.sum(WeekdayRollup.sum_hedge_cost).label('sum_hedge_cost'),
+                func.sum(WeekdayRollup.sum_pnl).label('sum_pnl'),
+            )
+            .where(WeekdayRollup.month_start >= first_full_month)
+            .group_by(WeekdayRollup.day_of_week, WeekdayRollup.day_name, WeekdayRollup.index_name)
+        )
+        partial = await db.execute(
             select(
+                DailySummary.day_of_week,
                 DailySummary.day_name,
                 DailySummary.index_name,
                 func.count(DailySummary.id).label('trading_days'),
-                func.avg(DailySummary.max_utilization_pct).label('avg_max_utilization'),
-                func.avg(DailySummary.total_hedge_cost).label('avg_hedge_cost'),
-                func.avg(DailySummary.total_pnl).label('avg_pnl'),
+                func.sum(DailySummary.max_utilization_pct).label('sum_max_utilization'),
+                func.sum(DailySummary.total_hedge_cost).label('sum_hedge_cost'),
+                func.sum(DailySummary.total_pnl).label('sum_pnl'),
             )
             .where(DailySummary.date >= cutoff_date)
-            .group_by(DailySummary.day_name, DailySummary.index_name, DailySummary.day_of_week)
-            .order_by(DailySummary.day_of_week)
+            .where(DailySummary.date < first_full_month)
+            .group_by(DailySummary.day_of_week, DailySummary.day_name, DailySummary.index_name)
         )
 
-        rows = result.all()
+        totals: Dict[Tuple[int, str], Dict[str, Any]] = {}
+        for row in list(rollups.all()) + list(partial.all()):
+            if not row.trading_days:
+                continue
+            entry = totals.setdefault((row.day_of_week, row.index_name), {
+                'day_name': row.day_name, 'days': 0, 'util': 0.0, 'cost': 0.0, 'pnl': 0.0
+            })
+            entry['days'] += row.trading_days
+            entry['util'] += row.sum_max_utilization or 0
+            entry['cost'] += row.sum_hedge_cost or 0
+            entry['pnl'] += row.sum_pnl or 0
 
         analytics = []
-        for row in rows:
+        for (_, index_name), entry in sorted(totals.items()):
+            days = entry['days']
             analytics.append({
-                'day_name': row.day_name,
-                'index_name': row.index_name,
-                'trading_days': row.trading_days,
-                'avg_max_utilization': round(row.avg_max_utilization or 0, 1),
-                'avg_hedge_cost': round(row.avg_hedge_cost or 0, 2),
-                'avg_pnl': round(row.avg_pnl or 0, 2),
+                'day_name': entry['day_name'],
+                'index_name': index_name,
+                'trading_days': days,
+                'avg_max_utilization': round(entry['util'] / days, 1),
+                'avg_hedge_cost': round(entry['cost'] / days, 2),
+                'avg_pnl': round(entry['pnl'] / days, 2),
             })
 
         return analytics
@@ -83,13 +380,21 @@ class AnalyticsService:
             List of daily summary dictionaries.
         """
         result = await db.execute(
-            select(DailySummary)
+            select(
+                DailySummary.date,
+                DailySummary.day_name,
+                DailySummary.index_name,
+                DailySummary.num_baskets,
+                DailySummary.max_utilization_pct,
+                DailySummary.total_hedge_cost,
+                DailySummary.total_pnl,
+            )
             .where(DailySummary.date >= start_date)
             .where(DailySummary.date <= end_date)
             .order_by(DailySummary.date.desc())
         )
 
-        summaries = result.scalars().all()
+        summaries = result.all()
 
         return [
             {
@@ -98,8 +403,8 @@ class AnalyticsService:
                 'index_name': s.index_name,
                 'num_baskets': s.num_baskets,
                 'max_utilization_pct': round(s.max_utilization_pct, 1),
-                'total_hedge_cost': round(s.total_hedge_cost, 2),
-                'total_pnl': round(s.total_pnl, 2),
+                'total_hedge_cost': round(s.total_hedge_cost or 0, 2),
+                'total_pnl': round(s.total_pnl or 0, 2),
             }
             for s in summaries
         ]
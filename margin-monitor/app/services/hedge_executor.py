@@ -505,7 +505,7 @@ class HedgeExecutorService:
             )
 
         # Get current price (simplified - use actual quote in production)
-        current_price = hedge.entry_price * 0.5  # Assume 50% decay for simplicity
+        current_price = float(hedge.entry_price) * 0.5  # Assume 50% decay for simplicity
 
         # Don't sell if value too low
         if current_price < self.config.min_exit_value:
@@ -582,7 +582,7 @@ class HedgeExecutorService:
                 )
 
             # Calculate P&L
-            pnl = (current_price - hedge.entry_price) * hedge.quantity
+            pnl = (current_price - float(hedge.entry_price)) * hedge.quantity
 
             # Update transaction
             transaction.order_id = order_id
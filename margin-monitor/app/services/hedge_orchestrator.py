@@ -12,7 +12,7 @@ The main coordination service that:
 import logging
 import asyncio
 from datetime import datetime, date, time, timedelta
-from typing import Optional
+from typing import Optional, List
 
 import pytz
 from sqlalchemy import select
@@ -23,10 +23,13 @@ from app.models.hedge_constants import IndexName, ExpiryType, HEDGE_CONFIG, LOT_
 from app.services.strategy_scheduler import StrategySchedulerService, UpcomingEntry
 from app.services.margin_calculator import MarginCalculatorService
 from app.services.hedge_selector import HedgeStrikeSelectorService
+from app.services.option_chain_store import OptionChainStore
 from app.services.hedge_executor import HedgeExecutorService
+from app.services.span_margin import SpanMarginEstimator, OptionBook, time_to_expiry_years
 from app.services.telegram_service import TelegramService, telegram_service
 from app.services.margin_service import MarginService
 from app.services.position_service import position_service
+from app.services.wakeup_queue import WakeupQueue
 
 logger = logging.getLogger(__name__)
 
@@ -36,16 +39,33 @@ IST = pytz.timezone('Asia/Kolkata')
 MARKET_OPEN = time(9, 15)
 MARKET_CLOSE = time(15, 30)
 
+# Wake-up timer that re-reads the positionbook; a change (seen by
+# openalgo_service) wakes a full check through wake("positions")
+POSITION_WATCH = "position-watch"
+
+# wake() reasons after which today's entry timers are rebuilt
+SCHEDULE_EVENTS = ("toggle", "reset-dry-run", "schedule", "session")
+
 # Simulation constants for dry run mode
 HEDGE_DIMINISHING_FACTOR = 0.85  # Each additional hedge provides 85% of previous benefit
 MAX_SIMULATED_HEDGES = 100  # Maximum tracked simulated hedges (memory limit)
 
+# Dry-run reduction at full hedge coverage when no SPAN estimator is configured
+# From Sensibull: ₹3.13Cr -> ₹1.37Cr = 56% reduction (SENSEX 0DTE empirical)
+FALLBACK_MAX_REDUCTION_PCT = 0.56
+
 
 class AutoHedgeOrchestrator:
     """
     Main orchestrator that monitors margin and triggers hedge actions.
 
-    Runs as a background task during market hours, checking every 30 seconds:
+    Runs as a background task during market hours. Instead of polling, it
+    sleeps on a wake-up queue built from today's schedule and wakes at
+    entry - lookahead, entry + post-entry delay, each periodic-check
+    boundary, and immediately on external events (see wake()): position
+    changes and orders seen by openalgo_service (the positionbook is
+    re-read every poll interval so changes are seen even when nothing else
+    fetches it), toggles and schedule/session edits:
     1. Is an entry imminent?
     2. Would that entry breach the budget?
     3. If yes, buy hedges
@@ -61,7 +81,9 @@ class AutoHedgeOrchestrator:
         hedge_selector: HedgeStrikeSelectorService = None,
         hedge_executor: HedgeExecutorService = None,
         telegram: TelegramService = None,
-        config = None
+        config = None,
+        span_estimator: SpanMarginEstimator = None,
+        chain_store: OptionChainStore = None
     ):
         """
         Initialize the orchestrator.
@@ -75,6 +97,10 @@ class AutoHedgeOrchestrator:
             hedge_executor: Hedge executor service
             telegram: Telegram notification service
             config: Hedge configuration
+            span_estimator: Local margin estimator for dry-run hedge benefit
+                (flat coverage x 56% model is used if not provided)
+            chain_store: Shared option chain store; today's chain is tracked
+                from session load and spot is read from it
         """
         self.db_factory = db_factory  # Store factory, not session
         self.margin_service = margin_service
@@ -84,11 +110,13 @@ class AutoHedgeOrchestrator:
         self.hedge_executor = hedge_executor
         self.telegram = telegram or telegram_service
         self.config = config or HEDGE_CONFIG
+        self.span_estimator = span_estimator
+        self.chain_store = chain_store
 
         self._is_running = False
         self._session: Optional[DailySession] = None
         self._session_cache: Optional[dict] = None  # Cached session data to avoid lazy loading
-        self._poll_interval = 30  # Lightweight time check every 30 seconds
+        self._poll_interval = 30  # Re-check interval while an entry is imminent
         self._last_full_check: Optional[datetime] = None
         self._full_check_interval = 300  # Full margin check every 5 mins (for excess hedges)
         self._dry_run = False  # Set to True for paper trading
@@ -105,6 +133,12 @@ class AutoHedgeOrchestrator:
         self._pending_post_entry_checks: dict = {}
         self._post_entry_delay_seconds: int = 60  # Check 1 minute after entry
 
+        # Event-driven scheduling: timers from today's schedule + external events
+        self._wakeups = WakeupQueue(lambda: self._now_ist())
+        self._timers_date: Optional[date] = None
+        self._timers_stale = False  # Schedule changed; rebuild entry timers
+        self._entry_timer_keys: set = set()
+
     def _now_ist(self) -> datetime:
         """Get current time in IST."""
         return datetime.now(IST)
@@ -169,21 +203,130 @@ class AutoHedgeOrchestrator:
             f"baskets={self._session_cache['baskets']}"
         )
 
-        # Main monitoring loop - lightweight 30s poll
+        # Main monitoring loop - sleeps until the next timer or event
+        self._wakeups.schedule("periodic", self._now_ist())
+        self._wakeups.schedule(POSITION_WATCH, self._now_ist())
         while self._is_running:
+            await self._schedule_entry_timers()
+            reasons = await self._wakeups.wait()
+            if not self._is_running:
+                break
+            if POSITION_WATCH in reasons:
+                await self._watch_positions()
+                reasons = [r for r in reasons if r != POSITION_WATCH]
+                if not reasons:
+                    continue
             try:
-                await self._check_and_act()
+                await self._check_and_act(reasons)
             except Exception as e:
                 logger.error(f"[ORCHESTRATOR] Error in check cycle: {e}")
                 await self.telegram.send_message(
                     f"❌ *Auto-hedge error:* {str(e)[:100]}"
                 )
             finally:
-                await asyncio.sleep(self._poll_interval)  # 30 seconds
+                self._schedule_next_periodic()
+
+    def wake(self, reason: str = "event"):
+        """
+        Run a full check cycle now instead of at the next timer.
+
+        Called on external events: position changes and orders (via
+        openalgo_service listeners), an auto-hedge toggle, a dry-run reset
+        or a schedule/session edit. The latter also rebuild today's entry
+        timers from the current schedule.
+        """
+        if reason in SCHEDULE_EVENTS:
+            self._timers_stale = True
+        self._wakeups.notify(reason)
+
+    async def _schedule_entry_timers(self):
+        """
+        Queue wake-ups for today's remaining entries (once per day, and
+        again after a schedule change).
+
+        Each entry gets one timer at entry - lookahead and one at
+        entry + post-entry delay.
+        """
+        now = self._now_ist()
+        if self._timers_date == now.date() and not self._timers_stale:
+            return
+
+        try:
+            schedule = await self.scheduler.get_today_schedule(force_refresh=self._timers_stale)
+        except Exception as e:
+            logger.warning(f"[ORCHESTRATOR] Could not load schedule for timers: {e}")
+            return
+
+        for key in self._entry_timer_keys:
+            self._wakeups.cancel(key)
+        self._entry_timer_keys = set()
+
+        lookahead = timedelta(minutes=self.config.lookahead_minutes)
+        post_delay = timedelta(seconds=self._post_entry_delay_seconds)
+        count = 0
+        for entry in schedule:
+            entry_datetime = IST.localize(datetime.combine(now.date(), entry.entry_time))
+            if entry_datetime + post_delay <= now:
+                continue
+            if entry_datetime > now:
+                key = self._pre_entry_key(entry_datetime)
+                self._wakeups.schedule(key, max(now, entry_datetime - lookahead))
+                self._entry_timer_keys.add(key)
+            key = self._post_entry_key(entry_datetime)
+            self._wakeups.schedule(key, entry_datetime + post_delay)
+            self._entry_timer_keys.add(key)
+            count += 1
+
+        self._timers_date = now.date()
+        self._timers_stale = False
+        logger.info(f"[ORCHESTRATOR] Scheduled wake-ups for {count} entries")
+
+    def _next_market_open(self, now: datetime) -> datetime:
+        market_open = IST.localize(datetime.combine(now.date(), MARKET_OPEN))
+        if now >= market_open:
+            market_open += timedelta(days=1)
+        return market_open
+
+    async def _watch_positions(self):
+        """
+        Re-read the positionbook (5s-cached) so a position change wakes a
+        check within one poll interval, then queue the next read.
+        """
+        now = self._now_ist()
+        if not self._is_market_hours():
+            self._wakeups.schedule(POSITION_WATCH, self._next_market_open(now))
+            return
+        await self._get_positions()
+        self._wakeups.schedule(POSITION_WATCH, now + timedelta(seconds=self._poll_interval))
+
+    def _schedule_next_periodic(self):
+        """Queue the next periodic check (or market open, when closed)."""
+        now = self._now_ist()
+        if not self._is_market_hours():
+            self._wakeups.schedule("periodic", self._next_market_open(now))
+            return
+
+        if self._last_full_check is not None:
+            due = self._last_full_check + timedelta(seconds=self._full_check_interval)
+        else:
+            due = now
+        # A check that could not complete is retried, not spun on
+        if due <= now:
+            due = now + timedelta(seconds=self._poll_interval)
+        self._wakeups.schedule("periodic", due)
+
+    @staticmethod
+    def _pre_entry_key(entry_datetime: datetime) -> str:
+        return f"pre-entry:{entry_datetime.strftime('%H:%M:%S')}"
+
+    @staticmethod
+    def _post_entry_key(entry_datetime: datetime) -> str:
+        return f"post-entry:{entry_datetime.strftime('%H:%M:%S')}"
 
     async def stop(self):
         """Stop the auto-hedge monitoring loop."""
         self._is_running = False
+        self._wakeups.notify("stop")
         logger.info("[ORCHESTRATOR] Stopped")
         await self.telegram.send_system_status(status="Stopped")
 
@@ -240,16 +383,18 @@ class AutoHedgeOrchestrator:
 
         return hedge_capacity
 
-    async def _check_and_act(self):
+    async def _check_and_act(self, reasons: Optional[List[str]] = None):
         """
-        Main check cycle - lightweight 30-second poll.
+        Main check cycle - runs when a wake-up timer or event fires.
 
         Only fetches margin data (API calls) when:
         1. Entry is imminent (within 5 mins) - proactive hedging
         2. Post-entry check is due (1 min after entry) - reactive check
         3. Full periodic check (every 5 mins) - excess hedges, critical util
+        4. An external event was notified via wake()
 
-        This reduces API calls from every 30s to only when needed.
+        Args:
+            reasons: Wake-up reasons from the queue (timer keys and events)
         """
         # Only run during market hours
         if not self._is_market_hours():
@@ -283,6 +428,15 @@ class AutoHedgeOrchestrator:
             needs_margin_check = True
             check_reasons.append("periodic")
 
+        # 4. External events (toggle, position change) always run a check
+        events = [
+            r for r in (reasons or [])
+            if not r.startswith(("pre-entry:", "post-entry:")) and r != "periodic"
+        ]
+        if events:
+            needs_margin_check = True
+            check_reasons.extend(f"event:{r}" for r in events)
+
         # If no checks needed, just log and return (lightweight poll)
         if not needs_margin_check:
             # Silent poll - no logging to reduce noise
@@ -316,8 +470,9 @@ class AutoHedgeOrchestrator:
         real_util = margin_data['utilization_pct']
         real_intraday = margin_data.get('intraday_margin', 0)
 
-        # In dry run mode, calculate simulated utilization based on COVERAGE
-        # SPAN margin gives ~56% reduction when fully hedged (from Sensibull: ₹3.13Cr -> ₹1.37Cr)
+        # In dry run mode, calculate simulated utilization from the simulated hedges:
+        # SPAN-estimated reduction when an estimator is configured, otherwise
+        # coverage x 56% (SENSEX 0DTE empirical)
         if self._dry_run and (self._simulated_ce_qty > 0 or self._simulated_pe_qty > 0):
             # Get current positions to calculate coverage
             positions = await self._get_positions()
@@ -339,10 +494,9 @@ class AutoHedgeOrchestrator:
             else:
                 avg_coverage = 0
 
-            # SPAN margin reduction: ~56% when fully hedged (SENSEX 0DTE empirical)
-            # From Sensibull: ₹3.13Cr -> ₹1.37Cr = 56% reduction at full coverage
-            MAX_REDUCTION_PCT = 0.56
-            reduction_pct = avg_coverage * MAX_REDUCTION_PCT
+            reduction_pct = await self._estimate_simulated_reduction(filtered)
+            if reduction_pct is None:
+                reduction_pct = avg_coverage * FALLBACK_MAX_REDUCTION_PCT
             simulated_intraday = real_intraday * (1 - reduction_pct)
             simulated_util = (simulated_intraday / total_budget) * 100 if total_budget > 0 else 0
 
@@ -362,6 +516,11 @@ class AutoHedgeOrchestrator:
             current_intraday = real_intraday
             logger.info(f"[ORCHESTRATOR] util={current_util:.1f}%, intraday=₹{current_intraday:,.0f}")
 
+        # Broker margin for the positions the SPAN estimator models (total used,
+        # less margin excluded as PM/long-term), used to calibrate its scale.
+        # Intraday margin is net of the baseline, so it is not comparable.
+        book_margin = self._book_margin(margin_data, real_intraday - current_intraday)
+
         # Update last full check time
         self._last_full_check = now
 
@@ -386,17 +545,23 @@ class AutoHedgeOrchestrator:
             await self._handle_critical_utilization(
                 current_util=current_util,
                 current_intraday=current_intraday,
-                total_budget=total_budget
+                total_budget=total_budget,
+                book_margin=book_margin
             )
             return
 
         # 4. PROACTIVE HEDGING: Entry is imminent
         if is_imminent and upcoming:
+            # Re-check until the entry, in case this cycle's hedge did not land
+            retry_at = now + timedelta(seconds=self._poll_interval)
+            if retry_at < upcoming.entry_datetime:
+                self._wakeups.schedule(self._pre_entry_key(upcoming.entry_datetime), retry_at)
             await self._handle_imminent_entry(
                 upcoming=upcoming,
                 current_util=current_util,
                 current_intraday=current_intraday,
-                total_budget=total_budget
+                total_budget=total_budget,
+                book_margin=book_margin
             )
         elif needs_periodic:
             # Only check hedge exit on periodic checks when idle
@@ -421,7 +586,8 @@ class AutoHedgeOrchestrator:
         upcoming: UpcomingEntry,
         current_util: float,
         current_intraday: float,
-        total_budget: float
+        total_budget: float,
+        book_margin: Optional[float] = None
     ):
         """
         Handle logic when a strategy entry is imminent.
@@ -464,7 +630,8 @@ class AutoHedgeOrchestrator:
                 current_util=current_util,
                 requirement=requirement,
                 current_intraday=current_intraday,
-                total_budget=total_budget
+                total_budget=total_budget,
+                book_margin=book_margin
             )
         else:
             # Send info alert if close to threshold
@@ -487,7 +654,7 @@ class AutoHedgeOrchestrator:
         today = now.date()
 
         # Convert entry time to full datetime
-        entry_datetime = datetime.combine(today, entry_time, tzinfo=IST)
+        entry_datetime = IST.localize(datetime.combine(today, entry_time))
 
         # Only schedule if entry is in the future or just passed
         if entry_datetime < now - timedelta(minutes=5):
@@ -499,6 +666,7 @@ class AutoHedgeOrchestrator:
         # Don't duplicate if already scheduled
         key = entry_datetime.isoformat()
         if key not in self._pending_post_entry_checks:
+            self._wakeups.schedule(self._post_entry_key(entry_datetime), check_time)
             self._pending_post_entry_checks[key] = {
                 'check_time': check_time,
                 'portfolio_name': portfolio_name,
@@ -539,7 +707,8 @@ class AutoHedgeOrchestrator:
         current_util: float,
         requirement,
         current_intraday: float,
-        total_budget: float
+        total_budget: float,
+        book_margin: Optional[float] = None
     ):
         """Execute hedge buy before strategy entry."""
         index = IndexName(entry.index_name)
@@ -587,7 +756,9 @@ class AutoHedgeOrchestrator:
             short_positions=short_positions,
             num_baskets=num_baskets,
             hedge_capacity=hedge_capacity,
-            allocation_mode='equal'  # Equal allocation for proactive hedging
+            allocation_mode='equal',  # Equal allocation for proactive hedging
+            book=await self._build_option_book(filtered),
+            current_margin=book_margin
         )
 
         if not selection.selected:
@@ -661,7 +832,8 @@ class AutoHedgeOrchestrator:
         self,
         current_util: float,
         current_intraday: float,
-        total_budget: float
+        total_budget: float,
+        book_margin: Optional[float] = None
     ):
         """
         Handle reactive hedging when utilization is critically high.
@@ -737,7 +909,9 @@ class AutoHedgeOrchestrator:
             short_positions=short_positions,
             num_baskets=num_baskets,
             hedge_capacity=hedge_capacity,
-            allocation_mode='proportional'  # Proportional for reactive hedging
+            allocation_mode='proportional',  # Proportional for reactive hedging
+            book=await self._build_option_book(filtered),
+            current_margin=book_margin
         )
 
         if not selection or not selection.selected:
@@ -994,6 +1168,7 @@ class AutoHedgeOrchestrator:
                     'expiry_date': session.expiry_date.isoformat() if session.expiry_date else None,
                     'expiry_type': session.expiry_type
                 }
+                await self._track_option_chain()
                 return session
 
         # No session exists - could create one based on day of week
@@ -1193,6 +1368,86 @@ class AutoHedgeOrchestrator:
             f"(total CE={self._simulated_ce_qty}, PE={self._simulated_pe_qty})"
         )
 
+    async def _build_option_book(self, filtered) -> OptionBook:
+        """
+        Option book for the session's index/expiry: broker shorts and longs,
+        plus simulated hedges from the DB in dry run mode.
+        """
+        book = OptionBook.from_positions(
+            filtered['short_positions'] + filtered['long_positions']
+        )
+        if self._dry_run:
+            legs = await self._get_db_hedge_legs()
+            if legs:
+                book = book.add(
+                    [leg['strike'] for leg in legs],
+                    [leg['option_type'] == 'CE' for leg in legs],
+                    [leg['quantity'] for leg in legs]
+                )
+        return book
+
+    async def _estimate_simulated_reduction(self, filtered) -> Optional[float]:
+        """
+        SPAN-estimated fractional margin reduction from dry-run hedges.
+
+        Returns:
+            Reduction fraction, or None if no estimator/positions to price
+        """
+        if not self.span_estimator:
+            return None
+
+        book = OptionBook.from_positions(filtered['short_positions'] + filtered['long_positions'])
+        if not len(book):
+            return None
+
+        try:
+            legs = await self._get_db_hedge_legs()
+            index = IndexName(self._session_cache['index'])
+            spot = await self._get_spot_price(index, book)
+            t = time_to_expiry_years(date.fromisoformat(self._session_cache['expiry_date']))
+            return self.span_estimator.hedge_reduction_pct(index, book, legs, spot, t)
+        except Exception as e:
+            logger.warning(f"[ORCHESTRATOR] SPAN estimate failed, using coverage model: {e}")
+            return None
+
+    async def _track_option_chain(self):
+        """Load today's chain into the store so it is refreshed in the background."""
+        if not self.chain_store or not self._session_cache.get('expiry_date'):
+            return
+        try:
+            await self.chain_store.get(
+                self._session_cache['index'],
+                date.fromisoformat(self._session_cache['expiry_date'])
+            )
+        except Exception as e:
+            logger.warning(f"[ORCHESTRATOR] Could not load option chain: {e}")
+
+    async def _get_spot_price(self, index: IndexName, book: OptionBook) -> float:
+        """Spot from the chain store or hedge selector, else the mean short strike."""
+        if self.chain_store:
+            spot = await self.chain_store.get_spot(index)
+            if spot:
+                return spot
+        if self.hedge_selector:
+            return await self.hedge_selector.get_spot_price(index)
+        shorts = book.strikes[book.quantity < 0]
+        return float(shorts.mean()) if len(shorts) else float(book.strikes.mean())
+
+    @staticmethod
+    def _book_margin(margin_data: dict, simulated_reduction: float = 0.0) -> Optional[float]:
+        """
+        Broker margin attributable to the option book, for SPAN calibration.
+
+        Total used margin less excluded (PM/long-term) margin, less any
+        simulated hedge reduction in dry run. None when the broker total is
+        not reported (the selector then uses an uncalibrated estimate).
+        """
+        total_used = margin_data.get('used_margin')
+        if not total_used:
+            return None
+        book_margin = total_used - (margin_data.get('excluded') or 0.0) - simulated_reduction
+        return book_margin if book_margin > 0 else None
+
     async def _get_current_margin(self) -> Optional[dict]:
         """
         Get current margin data from margin service.
@@ -1293,6 +1548,41 @@ class AutoHedgeOrchestrator:
 
         return 0, 0, 0
 
+    async def _get_db_hedge_legs(self) -> list:
+        """
+        Query database for simulated hedge legs, aggregated by strike.
+
+        Returns:
+            List of dicts with strike, option_type, quantity
+        """
+        if not self._session_cache:
+            return []
+
+        from app.models.hedge_models import HedgeTransaction
+        from sqlalchemy import func
+
+        try:
+            async with self.db_factory() as db:
+                result = await db.execute(
+                    select(
+                        HedgeTransaction.strike,
+                        HedgeTransaction.option_type,
+                        func.sum(HedgeTransaction.quantity).label('quantity')
+                    )
+                    .where(HedgeTransaction.session_id == self._session_cache['id'])
+                    .where(HedgeTransaction.action == 'BUY')
+                    .where(HedgeTransaction.order_status == 'DRY_RUN')
+                    .group_by(HedgeTransaction.strike, HedgeTransaction.option_type)
+                )
+                return [
+                    {'strike': row.strike, 'option_type': row.option_type, 'quantity': int(row.quantity)}
+                    for row in result
+                ]
+        except Exception as e:
+            logger.error(f"[ORCHESTRATOR] Error querying hedge legs: {e}")
+
+        return []
+
     async def _log_strategy_execution(
         self,
         portfolio_name: str,
@@ -0,0 +1,618 @@
+"""
+Auto-Hedge System - Historical Replay
+
+Replays past trading days through the real AutoHedgeOrchestrator,
+HedgeExecutorService and HedgeStrikeSelectorService to evaluate hedge
+parameters (critical threshold, lookahead, cooldown, daily cost cap) offline.
+
+Each day runs against:
+- a simulated clock, advanced from one orchestrator wake-up to the next
+  (the same timers the live loop sleeps on, so a day replays in seconds)
+- a simulated broker built from the stored margin and position snapshots,
+  which fills hedge orders at the limit price and lowers intraday margin by
+  the SPAN-estimated benefit of the hedges bought so far
+- an in-memory SQLite copy of the auto_hedge tables, seeded with the day's
+  session and strategy schedule
+
+Hedges actually bought on the day are stripped from the snapshots (and their
+estimated margin benefit added back), so every parameter set starts from the
+same unhedged book. Days run in parallel across processes.
+"""
+
+import asyncio
+import bisect
+import itertools
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.database import Base
+from app.models.db_models import DailyConfig, MarginSnapshot, PositionSnapshot
+from app.models.hedge_constants import HEDGE_CONFIG, HedgeConfig, IndexName
+from app.models.hedge_models import (
+    HEDGE_SCHEMA, StrategySchedule, DailySession, HedgeTransaction,
+    StrategyExecution, ActiveHedge
+)
+from app.services.hedge_executor import HedgeExecutorService
+from app.services.hedge_orchestrator import AutoHedgeOrchestrator, IST, MARKET_CLOSE
+from app.services.hedge_selector import HedgeStrikeSelectorService
+from app.services.margin_calculator import MarginCalculatorService
+from app.services.position_service import position_service
+from app.services.span_margin import SpanMarginEstimator, OptionBook, time_to_expiry_years
+from app.services.strategy_scheduler import StrategySchedulerService, ScheduledEntry
+from app.services.telegram_service import TelegramService
+from app.utils.symbol_parser import parse_symbol
+
+logger = logging.getLogger(__name__)
+
+HEDGE_TABLES = [
+    StrategySchedule.__table__, DailySession.__table__, HedgeTransaction.__table__,
+    StrategyExecution.__table__, ActiveHedge.__table__
+]
+
+
+# ============================================================
+# Replay inputs and outputs
+# ============================================================
+
+@dataclass
+class ReplaySnapshot:
+    """Margin and broker positions at one stored snapshot."""
+    timestamp: datetime
+    intraday_margin: float
+    positions: List[dict]  # OpenAlgo positionbook format
+
+
+@dataclass
+class ReplayDay:
+    """Everything needed to replay one trading day."""
+    session_date: date
+    index_name: str
+    expiry_date: date
+    expiry_type: str
+    num_baskets: int
+    total_budget: float
+    schedule: List[ScheduledEntry]
+    snapshots: List[ReplaySnapshot]
+    recorded_hedge_symbols: List[str] = field(default_factory=list)
+    recorded_hedge_cost: float = 0.0
+
+
+@dataclass
+class ReplayParams:
+    """One parameter set; unset fields keep HEDGE_CONFIG defaults."""
+    name: str
+    overrides: Dict[str, Any] = field(default_factory=dict)
+
+    def config(self) -> HedgeConfig:
+        return replace(HEDGE_CONFIG, **self.overrides)
+
+
+@dataclass
+class DayResult:
+    """Outcome of replaying one day with one parameter set."""
+    session_date: date
+    params: str
+    hedge_cost: float          # Premium paid for hedge buys
+    hedge_proceeds: float      # Premium received from hedge exits
+    hedge_orders: int
+    peak_utilization: float    # With replayed hedges
+    unhedged_peak_utilization: float
+    breach_count: int          # Snapshots at or above the breach level
+    recorded_hedge_cost: float  # What was actually spent on the day
+
+    @property
+    def net_cost(self) -> float:
+        return self.hedge_cost - self.hedge_proceeds
+
+
+# ============================================================
+# Simulated clock and broker
+# ============================================================
+
+class SimulatedClock:
+    """Replay time; only moves forward."""
+
+    def __init__(self, start: datetime):
+        self._now = start
+
+    def now(self) -> datetime:
+        return self._now
+
+    def advance_to(self, when: datetime):
+        if when > self._now:
+            self._now = when
+
+
+class SimulatedBroker:
+    """
+    OpenAlgo stand-in driven by stored snapshots.
+
+    Implements the OpenAlgoService calls the hedge services make
+    (get_positions, get_funds, get_quotes, get_option_chain, place_order).
+    """
+
+    def __init__(
+        self,
+        day: ReplayDay,
+        clock: SimulatedClock,
+        estimator: Optional[SpanMarginEstimator] = None
+    ):
+        self.day = day
+        self.clock = clock
+        self.estimator = estimator or SpanMarginEstimator()
+        self.index = IndexName(day.index_name)
+        self._times = [s.timestamp for s in day.snapshots]
+        self._recorded = set(day.recorded_hedge_symbols)
+        self._unhedged_intraday: Dict[int, float] = {}
+        self._order_ids = itertools.count(1)
+        # (fill time, symbol, strike, option_type, signed quantity, price)
+        self.fills: List[Tuple[datetime, str, int, str, int, float]] = []
+
+    # ---------------- OpenAlgoService interface ----------------
+
+    async def get_positions(self) -> List[dict]:
+        return self.positions_at(self.clock.now())
+
+    async def get_funds(self) -> dict:
+        status = self.margin_at(self.clock.now())
+        return {
+            "used_margin": status["intraday_margin"],
+            "available_cash": 0.0,
+            "collateral": 0.0,
+            "m2m_realized": 0.0,
+            "m2m_unrealized": 0.0,
+        }
+
+    async def get_quotes(self, symbol: str, exchange: str = "NSE") -> dict:
+        # No index quotes are stored; callers infer spot from short strikes
+        return {}
+
+    async def get_option_chain(self, symbol: str, exchange: str = "NFO", expiry: str = None) -> List[dict]:
+        # No chain is stored; callers fall back to the LTP estimation model
+        return []
+
+    async def place_order(
+        self,
+        symbol: str,
+        exchange: str,
+        action: str,
+        quantity: int,
+        product: str = "NRML",
+        price_type: str = "MARKET",
+        price: float = 0.0
+    ) -> dict:
+        parsed = parse_symbol(symbol)
+        if not parsed:
+            raise ValueError(f"Unparseable symbol {symbol}")
+        signed = quantity if action == "BUY" else -quantity
+        self.fills.append((
+            self.clock.now(), symbol, parsed.strike, parsed.option_type, signed, float(price)
+        ))
+        order_id = f"SIM-{next(self._order_ids)}"
+        return {"orderid": order_id, "order_id": order_id}
+
+    # ---------------- Replay state ----------------
+
+    def snapshot_index(self, at: datetime) -> Optional[int]:
+        """Index of the latest snapshot at or before at."""
+        pos = bisect.bisect_right(self._times, at) - 1
+        return pos if pos >= 0 else None
+
+    def hedge_legs(self, at: datetime) -> Dict[str, Tuple[int, str, int, float]]:
+        """Replayed hedge holdings at time at: symbol -> (strike, type, qty, avg price)."""
+        legs: Dict[str, Tuple[int, str, int, float]] = {}
+        for when, symbol, strike, option_type, qty, price in self.fills:
+            if when > at:
+                break
+            _, _, held, avg = legs.get(symbol, (strike, option_type, 0, 0.0))
+            if qty > 0:
+                avg = (avg * held + price * qty) / (held + qty)
+            legs[symbol] = (strike, option_type, held + qty, avg)
+        return {s: leg for s, leg in legs.items() if leg[2] > 0}
+
+    def positions_at(self, at: datetime) -> List[dict]:
+        """Stored positions (recorded hedges removed) plus replayed hedges."""
+        index = self.snapshot_index(at)
+        positions = [] if index is None else [
+            p for p in self.day.snapshots[index].positions if p["symbol"] not in self._recorded
+        ]
+        exchange = "BFO" if self.index == IndexName.SENSEX else "NFO"
+        for symbol, (_, _, qty, avg) in self.hedge_legs(at).items():
+            positions.append({
+                "symbol": symbol, "exchange": exchange, "product": "NRML",
+                "quantity": qty, "average_price": avg, "ltp": avg, "pnl": 0.0,
+            })
+        return positions
+
+    def margin_at(self, at: datetime) -> dict:
+        """Margin status at time at, in the orchestrator's margin-service format."""
+        index = self.snapshot_index(at)
+        intraday = 0.0
+        if index is not None:
+            intraday = self._unhedged(index)
+            legs = self.hedge_legs(at)
+            if legs and intraday > 0:
+                book = self._book(self.day.snapshots[index].positions, strip=True)
+                hedged = book.add(
+                    [leg[0] for leg in legs.values()],
+                    [leg[1] == "CE" for leg in legs.values()],
+                    [leg[2] for leg in legs.values()]
+                )
+                intraday *= self._margin_ratio(hedged, book, at)
+
+        budget = self.day.total_budget
+        return {
+            "utilization_pct": (intraday / budget) * 100 if budget > 0 else 0,
+            "used_margin": intraday,
+            "available": 0.0,
+            "intraday_margin": intraday,
+            "total_budget": budget,
+        }
+
+    def _unhedged(self, index: int) -> float:
+        """Recorded intraday margin with the day's real hedges' benefit added back."""
+        if index not in self._unhedged_intraday:
+            snapshot = self.day.snapshots[index]
+            intraday = snapshot.intraday_margin
+            if self._recorded and intraday > 0:
+                with_hedges = self._book(snapshot.positions, strip=False)
+                without = self._book(snapshot.positions, strip=True)
+                ratio = self._margin_ratio(with_hedges, without, snapshot.timestamp)
+                # Stripping hedges never lowers margin (one-sided hedges can estimate slightly above 1)
+                if 0 < ratio < 1:
+                    intraday /= ratio
+            self._unhedged_intraday[index] = intraday
+        return self._unhedged_intraday[index]
+
+    def _book(self, positions: List[dict], strip: bool) -> OptionBook:
+        if strip:
+            positions = [p for p in positions if p["symbol"] not in self._recorded]
+        filtered = position_service.filter_positions(
+            positions, self.day.index_name, self.day.expiry_date.isoformat()
+        )
+        return OptionBook.from_positions(filtered["short_positions"] + filtered["long_positions"])
+
+    def _margin_ratio(self, book: OptionBook, reference: OptionBook, at: datetime) -> float:
+        """Estimated margin of book relative to reference (1.0 if not estimable)."""
+        shorts = reference.strikes[reference.quantity < 0]
+        if len(shorts) == 0:
+            return 1.0
+        spot = float(shorts.mean())
+        t = time_to_expiry_years(self.day.expiry_date, at)
+        base = self.estimator.estimate(self.index, reference, spot, t).total
+        if base <= 0:
+            return 1.0
+        return max(0.0, self.estimator.estimate(self.index, book, spot, t).total / base)
+
+
+class ReplayMarginAdapter:
+    """Margin service for the orchestrator, backed by the simulated broker."""
+
+    def __init__(self, broker: SimulatedBroker):
+        self.broker = broker
+
+    async def get_current_status(self) -> dict:
+        return self.broker.margin_at(self.broker.clock.now())
+
+    async def get_filtered_positions(self) -> list:
+        return await self.broker.get_positions()
+
+    async def get_position_summary(self) -> dict:
+        filtered = position_service.filter_positions(
+            await self.broker.get_positions(),
+            self.broker.day.index_name,
+            self.broker.day.expiry_date.isoformat()
+        )
+        return position_service.get_summary(filtered)
+
+
+class ReplayHedgeExecutor(HedgeExecutorService):
+    """Executor that sends orders straight to the simulated broker."""
+
+    async def _place_order(self, symbol, exchange, action, quantity, price, max_retries=3) -> dict:
+        # No rate limiting, retries or circuit breaker against the simulated broker
+        return await self.openalgo.place_order(
+            symbol=symbol, exchange=exchange, action=action, quantity=quantity,
+            price_type="MARKET" if price == 0 else "LIMIT", price=price
+        )
+
+
+class SilentTelegram(TelegramService):
+    """Telegram service that never sends."""
+
+    def __init__(self):
+        super().__init__(bot_token="replay", chat_id="replay")
+        self.enabled = False
+
+
+# ============================================================
+# Replay engine
+# ============================================================
+
+@asynccontextmanager
+async def _replay_database(day: ReplayDay):
+    """In-memory SQLite with the auto_hedge schema prefix removed, seeded for day."""
+    engine = create_async_engine("sqlite+aiosqlite://").execution_options(
+        schema_translate_map={HEDGE_SCHEMA: None}
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=HEDGE_TABLES)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    day_name = day.session_date.strftime("%A")
+    async with session_maker() as db:
+        db.add(DailySession(
+            session_date=day.session_date, day_of_week=day_name, index_name=day.index_name,
+            expiry_type=day.expiry_type, expiry_date=day.expiry_date,
+            num_baskets=day.num_baskets, total_budget=day.total_budget,
+            auto_hedge_enabled=True
+        ))
+        for entry in day.schedule:
+            db.add(StrategySchedule(
+                day_of_week=day_name, index_name=entry.index_name, expiry_type=entry.expiry_type,
+                portfolio_name=entry.portfolio_name, entry_time=entry.entry_time,
+                exit_time=entry.exit_time, is_active=True
+            ))
+        await db.commit()
+
+    try:
+        yield session_maker
+    finally:
+        await engine.dispose()
+
+
+async def replay_day(day: ReplayDay, params: ReplayParams, breach_pct: float = 100.0) -> DayResult:
+    """
+    Replay one day through the orchestrator with one parameter set.
+
+    Args:
+        day: Day to replay
+        params: Hedge config overrides
+        breach_pct: Utilization at or above which a snapshot counts as a breach
+
+    Returns:
+        DayResult with cost, peak utilization and breach count
+    """
+    if not day.snapshots:
+        return DayResult(day.session_date, params.name, 0.0, 0.0, 0, 0.0, 0.0, 0, day.recorded_hedge_cost)
+
+    config = params.config()
+    start = day.snapshots[0].timestamp
+    clock = SimulatedClock(start)
+    broker = SimulatedBroker(day, clock)
+    telegram = SilentTelegram()
+
+    async with _replay_database(day) as session_maker:
+        @asynccontextmanager
+        async def db_factory():
+            async with session_maker() as session:
+                yield session
+
+        async with session_maker() as scheduler_db, session_maker() as executor_db:
+            scheduler = StrategySchedulerService(scheduler_db, config=config)
+            margin_calc = MarginCalculatorService(config=config)
+            selector = HedgeStrikeSelectorService(openalgo=broker, margin_calculator=margin_calc, config=config)
+            executor = ReplayHedgeExecutor(executor_db, broker, telegram, config=config)
+            orchestrator = AutoHedgeOrchestrator(
+                db_factory=db_factory,
+                margin_service=ReplayMarginAdapter(broker),
+                scheduler=scheduler,
+                margin_calc=margin_calc,
+                hedge_selector=selector,
+                hedge_executor=executor,
+                telegram=telegram,
+                config=config
+            )
+            for service in (orchestrator, scheduler, executor, selector):
+                service._now_ist = clock.now
+
+            orchestrator._is_running = True
+            orchestrator._session = await orchestrator._get_or_create_session()
+            await orchestrator._schedule_entry_timers()
+            orchestrator._wakeups.schedule("periodic", start)
+
+            close = IST.localize(datetime.combine(day.session_date, MARKET_CLOSE))
+            while True:
+                due = orchestrator._wakeups.next_due()
+                if due is None or due > close:
+                    break
+                clock.advance_to(due)
+                reasons = orchestrator._wakeups.pop_due(clock.now())
+                try:
+                    await orchestrator._check_and_act(reasons)
+                except Exception as e:
+                    logger.error(f"[REPLAY] {day.session_date} check failed at {clock.now()}: {e}")
+                orchestrator._schedule_next_periodic()
+
+    hedged = [broker.margin_at(s.timestamp)["utilization_pct"] for s in day.snapshots]
+    unhedged = [
+        broker._unhedged(i) / day.total_budget * 100 if day.total_budget > 0 else 0
+        for i in range(len(day.snapshots))
+    ]
+    buys = [qty * price for _, _, _, _, qty, price in broker.fills if qty > 0]
+    sells = [-qty * price for _, _, _, _, qty, price in broker.fills if qty < 0]
+
+    return DayResult(
+        session_date=day.session_date,
+        params=params.name,
+        hedge_cost=sum(buys),
+        hedge_proceeds=sum(sells),
+        hedge_orders=len(broker.fills),
+        peak_utilization=max(hedged),
+        unhedged_peak_utilization=max(unhedged),
+        breach_count=sum(u >= breach_pct for u in hedged),
+        recorded_hedge_cost=day.recorded_hedge_cost
+    )
+
+
+def _replay_job(day: ReplayDay, params: ReplayParams, breach_pct: float) -> DayResult:
+    logging.getLogger("app").setLevel(logging.WARNING)
+    return asyncio.run(replay_day(day, params, breach_pct))
+
+
+def run_replay(
+    days: List[ReplayDay],
+    param_sets: List[ReplayParams],
+    processes: Optional[int] = None,
+    breach_pct: float = 100.0
+) -> List[DayResult]:
+    """
+    Replay every day with every parameter set, in parallel across processes.
+
+    Args:
+        days: Days from load_replay_days()
+        param_sets: Parameter sets to compare
+        processes: Worker processes (None = CPU count, 1 = run in-process)
+        breach_pct: Utilization at or above which a snapshot counts as a breach
+
+    Returns:
+        DayResults ordered by (parameter set, day)
+    """
+    jobs = [(day, params) for params in param_sets for day in days]
+    if processes == 1:
+        return [_replay_job(day, params, breach_pct) for day, params in jobs]
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(_replay_job, day, params, breach_pct) for day, params in jobs]
+        return [f.result() for f in futures]
+
+
+def parameter_grid(grid: Dict[str, Iterable[Any]]) -> List[ReplayParams]:
+    """Cartesian product of config overrides, e.g. {'cooldown_seconds': [60, 120]}."""
+    keys = sorted(grid)
+    params = []
+    for values in itertools.product(*(list(grid[k]) for k in keys)):
+        overrides = dict(zip(keys, values))
+        name = ",".join(f"{k}={v}" for k, v in overrides.items()) or "default"
+        params.append(ReplayParams(name=name, overrides=overrides))
+    return params
+
+
+def summarize(results: List[DayResult]) -> Dict[str, dict]:
+    """Per parameter set: total net cost, worst and mean peak utilization, breaches."""
+    summary: Dict[str, dict] = {}
+    for name, group in itertools.groupby(sorted(results, key=lambda r: r.params), key=lambda r: r.params):
+        group = list(group)
+        summary[name] = {
+            "days": len(group),
+            "net_cost": sum(r.net_cost for r in group),
+            "hedge_orders": sum(r.hedge_orders for r in group),
+            "max_peak_utilization": max(r.peak_utilization for r in group),
+            "avg_peak_utilization": sum(r.peak_utilization for r in group) / len(group),
+            "breaches": sum(r.breach_count for r in group),
+            "recorded_cost": sum(r.recorded_hedge_cost for r in group),
+        }
+    return summary
+
+
+# ============================================================
+# Loading days from the database
+# ============================================================
+
+def _expiry_type(session_date: date, expiry_date: date) -> str:
+    days = (expiry_date - session_date).days
+    return "0DTE" if days <= 0 else "1DTE" if days == 1 else "2DTE"
+
+
+async def load_replay_days(session_maker, start: date, end: date) -> List[ReplayDay]:
+    """
+    Build ReplayDays from stored margin snapshots, position snapshots,
+    strategy schedule and hedge transactions.
+
+    Args:
+        session_maker: Async session maker for the production database
+        start: First day (inclusive)
+        end: Last day (inclusive)
+
+    Returns:
+        One ReplayDay per configured day with at least one snapshot
+    """
+    days: List[ReplayDay] = []
+    async with session_maker() as db:
+        configs = (await db.execute(
+            select(DailyConfig)
+            .where(DailyConfig.date >= start, DailyConfig.date <= end)
+            .order_by(DailyConfig.date)
+        )).scalars().all()
+
+        for config in configs:
+            snapshot_rows = (await db.execute(
+                select(MarginSnapshot.id, MarginSnapshot.timestamp, MarginSnapshot.intraday_margin)
+                .where(MarginSnapshot.config_id == config.id)
+                .order_by(MarginSnapshot.timestamp)
+            )).all()
+            if not snapshot_rows:
+                continue
+
+            positions: Dict[int, List[dict]] = {row.id: [] for row in snapshot_rows}
+            position_rows = (await db.execute(
+                select(
+                    PositionSnapshot.snapshot_id, PositionSnapshot.symbol, PositionSnapshot.exchange,
+                    PositionSnapshot.product, PositionSnapshot.quantity, PositionSnapshot.average_price,
+                    PositionSnapshot.ltp, PositionSnapshot.pnl
+                ).where(PositionSnapshot.snapshot_id.in_(list(positions)))
+            )).all()
+            for row in position_rows:
+                positions[row.snapshot_id].append({
+                    "symbol": row.symbol, "exchange": row.exchange, "product": row.product,
+                    "quantity": row.quantity, "average_price": row.average_price,
+                    "ltp": row.ltp, "pnl": row.pnl,
+                })
+
+            schedule_rows = (await db.execute(
+                select(StrategySchedule)
+                .where(StrategySchedule.day_of_week == config.day_name)
+                .where(StrategySchedule.is_active == True)
+                .order_by(StrategySchedule.entry_time)
+            )).scalars().all()
+
+            session = (await db.execute(
+                select(DailySession).where(DailySession.session_date == config.date)
+            )).scalar_one_or_none()
+            hedge_symbols: List[str] = []
+            hedge_cost = 0.0
+            if session:
+                txns = (await db.execute(
+                    select(HedgeTransaction.symbol, HedgeTransaction.total_cost)
+                    .where(HedgeTransaction.session_id == session.id)
+                    .where(HedgeTransaction.action == "BUY")
+                    .where(HedgeTransaction.order_status == "SUCCESS")
+                )).all()
+                hedge_symbols = sorted({t.symbol for t in txns})
+                hedge_cost = float(sum(t.total_cost or 0 for t in txns))
+
+            days.append(ReplayDay(
+                session_date=config.date,
+                index_name=config.index_name,
+                expiry_date=config.expiry_date,
+                expiry_type=session.expiry_type if session else _expiry_type(config.date, config.expiry_date),
+                num_baskets=config.num_baskets,
+                total_budget=float(config.total_budget),
+                schedule=[
+                    ScheduledEntry(
+                        portfolio_name=r.portfolio_name, entry_time=r.entry_time, exit_time=r.exit_time,
+                        index_name=r.index_name, expiry_type=r.expiry_type
+                    )
+                    for r in schedule_rows
+                ],
+                snapshots=[
+                    ReplaySnapshot(
+                        timestamp=row.timestamp if row.timestamp.tzinfo else IST.localize(row.timestamp),
+                        intraday_margin=float(row.intraday_margin),
+                        positions=positions[row.id]
+                    )
+                    for row in snapshot_rows
+                ],
+                recorded_hedge_symbols=hedge_symbols,
+                recorded_hedge_cost=hedge_cost
+            ))
+
+    logger.info(f"[REPLAY] Loaded {len(days)} days from {start} to {end}")
+    return days
@@ -7,14 +7,21 @@ Finds the most cost-effective hedges that provide required margin reduction.
 
 import logging
 from dataclasses import dataclass
+from datetime import date, datetime, timedelta
 from typing import List, Optional, Dict, Any
 
+import numpy as np
+
 from app.models.hedge_constants import (
     IndexName, ExpiryType,
     HEDGE_CONFIG, LOT_SIZES, MARGIN_CONSTANTS
 )
 from app.services.margin_calculator import MarginCalculatorService
 from app.services.openalgo_service import OpenAlgoService
+from app.services.span_margin import SpanMarginEstimator, OptionBook, time_to_expiry_years
+from app.services.hedge_solver import HedgeBasketSolver
+from app.services.option_chain_store import OptionChainStore, ChainSnapshot, CHAIN_SYMBOLS
+from app.utils.date_utils import IST
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +65,13 @@ class HedgeStrikeSelectorService:
     The goal is to minimize hedge cost while achieving required margin reduction.
     Uses a greedy algorithm to select hedges with best MBPR first.
 
+    With a SpanMarginEstimator, MBPR is the true marginal benefit of each
+    candidate (or CE+PE pair) against the current book, re-evaluated after
+    every pick; without one, the flat per-side constant benefit is used.
+
+    With a HedgeBasketSolver, the greedy pass is replaced by a minimum-cost
+    basket over strikes x lots (see hedge_solver.py).
+
     Core responsibilities:
     - Get spot price for index
     - Find valid hedge candidates (premium and OTM distance in range)
@@ -70,7 +84,10 @@ class HedgeStrikeSelectorService:
         openalgo: OpenAlgoService = None,
         margin_calculator: MarginCalculatorService = None,
         config = None,
-        lot_sizes = None
+        lot_sizes = None,
+        span_estimator: SpanMarginEstimator = None,
+        solver: HedgeBasketSolver = None,
+        chain_store: OptionChainStore = None
     ):
         """
         Initialize the hedge selector.
@@ -80,17 +97,31 @@ class HedgeStrikeSelectorService:
             margin_calculator: Margin calculator service
             config: HedgeConfig (uses global default if not provided)
             lot_sizes: LotSizes (uses global default if not provided)
+            span_estimator: Local margin estimator for marginal-benefit ranking
+                (constant per-side benefit is used if not provided)
+            solver: Basket solver; selects by min-cost optimization instead
+                of greedy MBPR when provided
+            chain_store: Shared option chain store; chain and spot are read
+                from its snapshots instead of calling the broker per request
         """
         self.openalgo = openalgo or OpenAlgoService()
         self.margin_calc = margin_calculator or MarginCalculatorService()
         self.config = config or HEDGE_CONFIG
         self.lot_sizes = lot_sizes or LOT_SIZES
+        self.span_estimator = span_estimator
+        self.solver = solver
+        self.chain_store = chain_store
+
+    def _now_ist(self) -> datetime:
+        """Get current time in IST."""
+        return datetime.now(IST)
 
     async def get_spot_price(self, index: IndexName) -> float:
         """
         Get current spot price for index using quotes API.
 
-        Falls back to position-based inference if quotes API unavailable.
+        Reads the chain store's spot when configured. Falls back to
+        position-based inference if quotes API unavailable.
 
         Args:
             index: NIFTY or SENSEX
@@ -106,6 +137,12 @@ class HedgeStrikeSelectorService:
         }
         config = spot_config.get(index, spot_config[IndexName.NIFTY])
 
+        # Shared store first: spot from the last chain refresh
+        if self.chain_store is not None:
+            ltp = await self.chain_store.get_spot(index)
+            if ltp is not None:
+                return ltp
+
         # Try quotes API first (preferred method)
         try:
             quotes = await self.openalgo.get_quotes(
@@ -213,11 +250,14 @@ class HedgeStrikeSelectorService:
         per_side_benefit = total_benefit / 2  # CE and PE each contribute half
 
         # Try to get real LTPs from option chain API
-        option_chain_data = await self._fetch_option_chain(index, expiry_type)
-        use_real_ltp = len(option_chain_data) > 0
+        option_chain = await self._fetch_option_chain(index, expiry_type)
+        use_real_ltp = option_chain is not None and len(option_chain) > 0
 
         if use_real_ltp:
-            logger.info(f"[HEDGE_SELECTOR] Using real LTPs from option chain ({len(option_chain_data)} strikes)")
+            logger.info(
+                f"[HEDGE_SELECTOR] Using real LTPs from option chain "
+                f"({len(option_chain)} strikes, v{option_chain.version})"
+            )
         else:
             logger.warning(f"[HEDGE_SELECTOR] Using estimated LTPs (option chain unavailable)")
 
@@ -227,70 +267,37 @@ class HedgeStrikeSelectorService:
         strike_step = 50 if index == IndexName.NIFTY else 100
 
         for opt_type in option_types:
-            # Determine strike range based on option type
-            if opt_type == 'CE':
-                # CE hedges are above spot
-                start_strike = int(spot_price + min_otm)
-                end_strike = int(spot_price + max_otm)
-            else:  # PE
-                # PE hedges are below spot
-                start_strike = int(spot_price - max_otm)
-                end_strike = int(spot_price - min_otm)
-
-            # Round to strike step
-            start_strike = (start_strike // strike_step) * strike_step
-            end_strike = ((end_strike // strike_step) + 1) * strike_step
-
-            for strike in range(start_strike, end_strike, strike_step):
-                # Skip if this strike is already sold (cannot buy hedge at sold strike)
-                if sold_strikes:
-                    sold_list = sold_strikes.get(opt_type, [])
-                    if strike in sold_list:
-                        logger.debug(
-                            f"[HEDGE_SELECTOR] Skipping {strike} {opt_type} - already sold"
-                        )
-                        continue
-
-                # Calculate OTM distance
-                if opt_type == 'CE':
-                    otm_distance = strike - int(spot_price)
-                else:
-                    otm_distance = int(spot_price) - strike
-
-                # Skip if outside OTM range
-                if otm_distance < min_otm or otm_distance > max_otm:
-                    continue
-
-                # Get LTP (real or estimated)
-                if use_real_ltp:
-                    ltp = self._get_ltp_from_chain(option_chain_data, strike, opt_type)
-                    if ltp is None:
-                        # Strike not in chain, skip or estimate
-                        ltp = self._estimate_ltp(otm_distance, index, expiry_type)
-                else:
-                    ltp = self._estimate_ltp(otm_distance, index, expiry_type)
-
-                # Skip if outside premium range
-                if not (self.config.min_premium <= ltp <= self.config.max_premium):
-                    continue
-
-                # Calculate costs
-                cost_per_lot = ltp * lot_size
-                total_cost = cost_per_lot * total_lots
-
-                # Calculate MBPR (Margin Benefit Per Rupee)
-                mbpr = per_side_benefit / total_cost if total_cost > 0 else 0
+            # Score the whole strike ladder for this side at once
+            strikes, otm_distance, ltp = self._strike_ladder(
+                opt_type, spot_price, min_otm, max_otm, strike_step,
+                (sold_strikes or {}).get(opt_type, []),
+                option_chain if use_real_ltp else None,
+                index, expiry_type
+            )
+
+            # Skip if outside premium range
+            in_range = (ltp >= self.config.min_premium) & (ltp <= self.config.max_premium)
+            strikes, otm_distance, ltp = strikes[in_range], otm_distance[in_range], ltp[in_range]
+
+            # Calculate costs and MBPR (Margin Benefit Per Rupee)
+            cost_per_lot = ltp * lot_size
+            total_cost = cost_per_lot * total_lots
+            mbpr = np.where(total_cost > 0, per_side_benefit / np.maximum(total_cost, 1e-9), 0.0)
 
+            for strike, otm, price, per_lot, cost, score in zip(
+                strikes.tolist(), otm_distance.tolist(), ltp.tolist(),
+                cost_per_lot.tolist(), total_cost.tolist(), mbpr.tolist()
+            ):
                 candidates.append(HedgeCandidate(
                     strike=strike,
                     option_type=opt_type,
-                    ltp=ltp,
-                    otm_distance=otm_distance,
+                    ltp=price,
+                    otm_distance=otm,
                     estimated_margin_benefit=per_side_benefit,
-                    cost_per_lot=cost_per_lot,
-                    total_cost=total_cost,
+                    cost_per_lot=per_lot,
+                    total_cost=cost,
                     total_lots=total_lots,
-                    mbpr=mbpr
+                    mbpr=score
                 ))
 
         # Sort by MBPR (highest first)
@@ -304,69 +311,98 @@ class HedgeStrikeSelectorService:
         self,
         index: IndexName,
         expiry_type: ExpiryType
-    ) -> Dict[str, Dict[str, float]]:
+    ) -> Optional[ChainSnapshot]:
         """
-        Fetch option chain data from API.
+        Fetch option chain data, from the shared store when configured.
 
         Returns:
-            Dict mapping strike -> {CE: ltp, PE: ltp}
+            ChainSnapshot with sorted strikes and CE/PE LTP columns, or None
+            if the chain could not be fetched
         """
+        expiry = self._expiry_date(expiry_type)
         try:
-            # Map index to option chain symbol
-            symbol_map = {
-                IndexName.NIFTY: ("NIFTY", "NFO"),
-                IndexName.SENSEX: ("SENSEX", "BFO")
-            }
-            symbol, exchange = symbol_map.get(index, ("NIFTY", "NFO"))
-
-            # Calculate expiry date based on expiry_type
-            from datetime import date, timedelta
-            today = date.today()
-            if expiry_type == ExpiryType.ZERO_DTE:
-                expiry = today
-            elif expiry_type == ExpiryType.ONE_DTE:
-                expiry = today + timedelta(days=1)
-            else:
-                expiry = today + timedelta(days=2)
-
-            expiry_str = expiry.strftime("%Y-%m-%d")
+            if self.chain_store is not None:
+                return await self.chain_store.get(index, expiry)
+
+            symbol, exchange = CHAIN_SYMBOLS.get(index.value, CHAIN_SYMBOLS[IndexName.NIFTY.value])
 
             # Fetch from API
             chain_data = await self.openalgo.get_option_chain(
                 symbol=symbol,
                 exchange=exchange,
-                expiry=expiry_str
+                expiry=expiry.strftime("%Y-%m-%d")
             )
+            return ChainSnapshot.from_entries(index, expiry, chain_data or [])
 
-            # Parse into strike -> {CE: ltp, PE: ltp} format
-            result: Dict[str, Dict[str, float]] = {}
+        except Exception as e:
+            logger.warning(f"[HEDGE_SELECTOR] Failed to fetch option chain: {e}")
+            return None
 
-            for entry in chain_data:
-                strike = entry.get("strike") or entry.get("strike_price")
-                if strike is None:
-                    continue
+    def _strike_ladder(
+        self,
+        option_type: str,
+        spot_price: float,
+        min_otm: int,
+        max_otm: int,
+        strike_step: int,
+        sold: List[int],
+        chain: Optional[ChainSnapshot],
+        index: IndexName,
+        expiry_type: ExpiryType
+    ):
+        """
+        Candidate strikes for one side with OTM distance and LTP, as arrays.
 
-                strike = int(strike)
-                if strike not in result:
-                    result[strike] = {}
+        Strikes within [min_otm, max_otm] of spot, excluding sold strikes.
+        LTP comes from the chain where present, else the estimation model.
 
-                # Handle different response formats
-                if "ce_ltp" in entry:
-                    result[strike]["CE"] = float(entry["ce_ltp"])
-                if "pe_ltp" in entry:
-                    result[strike]["PE"] = float(entry["pe_ltp"])
-                if "ltp" in entry and "option_type" in entry:
-                    result[strike][entry["option_type"]] = float(entry["ltp"])
+        Returns:
+            Tuple of (strikes, otm_distance, ltp) arrays
+        """
+        if option_type == 'CE':
+            # CE hedges are above spot
+            start_strike = int(spot_price + min_otm)
+            end_strike = int(spot_price + max_otm)
+        else:
+            # PE hedges are below spot
+            start_strike = int(spot_price - max_otm)
+            end_strike = int(spot_price - min_otm)
 
-            return result
+        # Round to strike step
+        start_strike = (start_strike // strike_step) * strike_step
+        end_strike = ((end_strike // strike_step) + 1) * strike_step
 
-        except Exception as e:
-            logger.warning(f"[HEDGE_SELECTOR] Failed to fetch option chain: {e}")
-            return {}
+        strikes = np.arange(start_strike, end_strike, strike_step)
+        if option_type == 'CE':
+            otm_distance = strikes - int(spot_price)
+        else:
+            otm_distance = int(spot_price) - strikes
+
+        # Cannot buy hedge at sold strike; skip if outside OTM range
+        keep = (otm_distance >= min_otm) & (otm_distance <= max_otm)
+        if sold:
+            keep &= ~np.isin(strikes, sold)
+        strikes, otm_distance = strikes[keep], otm_distance[keep]
+
+        ltp = self._estimate_ltp(otm_distance, index, expiry_type)
+        if chain is not None and len(chain):
+            chain_ltp = chain.ltps(strikes, option_type)
+            ltp = np.where(np.isnan(chain_ltp), ltp, chain_ltp)
+
+        return strikes, otm_distance, np.asarray(ltp, dtype=float)
+
+    def _expiry_date(self, expiry_type: ExpiryType) -> date:
+        """Calendar expiry date for an expiry type, counted from today."""
+        today = self._now_ist().date()
+        if expiry_type == ExpiryType.ZERO_DTE:
+            return today
+        elif expiry_type == ExpiryType.ONE_DTE:
+            return today + timedelta(days=1)
+        return today + timedelta(days=2)
 
     def _get_ltp_from_chain(
         self,
-        chain: Dict[str, Dict[str, float]],
+        chain: ChainSnapshot,
         strike: int,
         option_type: str
     ) -> Optional[float]:
@@ -374,17 +410,14 @@ class HedgeStrikeSelectorService:
         Get LTP for a specific strike and option type from chain data.
 
         Args:
-            chain: Option chain data {strike -> {CE: ltp, PE: ltp}}
+            chain: Option chain snapshot
             strike: Strike price
             option_type: 'CE' or 'PE'
 
         Returns:
             LTP or None if not found
         """
-        strike_data = chain.get(strike)
-        if strike_data:
-            return strike_data.get(option_type)
-        return None
+        return chain.ltp(strike, option_type)
 
     def _estimate_ltp(
         self,
@@ -398,12 +431,12 @@ class HedgeStrikeSelectorService:
         In production, this should be replaced with actual option chain data.
 
         Args:
-            otm_distance: Points from ATM
+            otm_distance: Points from ATM (scalar or array)
             index: NIFTY or SENSEX
             expiry_type: 0DTE, 1DTE, or 2DTE
 
         Returns:
-            Estimated LTP
+            Estimated LTP (float, or array for array input)
         """
         # Simplified decay model based on OTM distance
         # More OTM = lower premium
@@ -421,9 +454,11 @@ class HedgeStrikeSelectorService:
         if index == IndexName.SENSEX:
             decay_rate *= 0.8  # SENSEX less volatile
 
-        estimated_ltp = base_premium * (1 - decay_rate * otm_distance / 10)
+        estimated_ltp = base_premium * (1 - decay_rate * np.asarray(otm_distance) / 10)
 
-        return max(0.05, min(estimated_ltp, 20.0))  # Clamp to realistic range
+        # Clamp to realistic range; accepts a scalar or a ladder of distances
+        clamped = np.clip(estimated_ltp, 0.05, 20.0)
+        return float(clamped) if clamped.ndim == 0 else clamped
 
     async def select_optimal_hedges(
         self,
@@ -433,7 +468,9 @@ class HedgeStrikeSelectorService:
         short_positions: List[Dict[str, Any]],
         num_baskets: int,
         hedge_capacity: Optional[Dict[str, Any]] = None,
-        allocation_mode: str = 'proportional'  # 'proportional' or 'equal'
+        allocation_mode: str = 'proportional',  # 'proportional' or 'equal'
+        book: Optional[OptionBook] = None,
+        current_margin: Optional[float] = None
     ) -> HedgeSelection:
         """
         Select optimal hedges to achieve required margin reduction with minimum cost.
@@ -453,7 +490,13 @@ class HedgeStrikeSelectorService:
             short_positions: Current short positions (to determine which sides need hedging)
             num_baskets: Number of baskets
             hedge_capacity: Optional dict with remaining_ce_capacity/remaining_pe_capacity
-            allocation_mode: 'proportional' (based on short qty) or 'equal' (50/50)
+            allocation_mode: 'proportional' (based on short qty) or 'equal' (50/50);
+                ignored when ranking with the SPAN estimator
+            book: Full option book (shorts, longs, simulated hedges) for the SPAN
+                estimator; built from short_positions if not provided
+            current_margin: Broker total used margin for the book (not intraday
+                margin net of baseline), used to calibrate the estimator's
+                absolute benefit
 
         Returns:
             HedgeSelection with selected candidates
@@ -559,12 +602,15 @@ class HedgeStrikeSelectorService:
                 f"[HEDGE_SELECTOR] Excluding sold strikes: CE={sold_strikes['CE']}, PE={sold_strikes['PE']}"
             )
 
+        spot_price = await self.get_spot_price(index) if self.span_estimator else None
+
         # Find candidates (excluding sold strikes)
         candidates = await self.find_hedge_candidates(
             index=index,
             expiry_type=expiry_type,
             option_types=option_types,
             num_baskets=num_baskets,
+            spot_price=spot_price,
             sold_strikes=sold_strikes
         )
 
@@ -579,6 +625,32 @@ class HedgeStrikeSelectorService:
                 fully_covered=False
             )
 
+        if self.solver:
+            return self._select_by_solver(
+                index=index,
+                expiry_type=expiry_type,
+                candidates=candidates,
+                book=book if book is not None else OptionBook.from_positions(short_positions),
+                spot_price=spot_price,
+                margin_reduction_needed=margin_reduction_needed,
+                hedge_capacity=hedge_capacity,
+                current_margin=current_margin,
+                side_ratios={'CE': ce_ratio if 'CE' in option_types else 0,
+                             'PE': pe_ratio if 'PE' in option_types else 0}
+            )
+
+        if self.span_estimator:
+            return self._select_by_marginal_benefit(
+                index=index,
+                expiry_type=expiry_type,
+                candidates=candidates,
+                book=book if book is not None else OptionBook.from_positions(short_positions),
+                spot_price=spot_price,
+                margin_reduction_needed=margin_reduction_needed,
+                hedge_capacity=hedge_capacity,
+                current_margin=current_margin
+            )
+
         # Proportional selection: allocate hedges based on short qty ratio
         # If CE:PE ratio is 25%:75%, allocate margin reduction budget accordingly
         selected: List[HedgeCandidate] = []
@@ -707,6 +779,225 @@ class HedgeStrikeSelectorService:
             fully_covered=fully_covered
         )
 
+    def _select_by_marginal_benefit(
+        self,
+        index: IndexName,
+        expiry_type: ExpiryType,
+        candidates: List[HedgeCandidate],
+        book: OptionBook,
+        spot_price: float,
+        margin_reduction_needed: float,
+        hedge_capacity: Optional[Dict[str, Any]],
+        current_margin: Optional[float]
+    ) -> HedgeSelection:
+        """
+        Greedy selection by SPAN-estimated marginal benefit per rupee.
+
+        Each round prices every remaining candidate and every CE+PE pair
+        against the book plus hedges already picked, in one vectorized pass,
+        and takes the best positive benefit per rupee. Pairs matter because a
+        one-sided hedge on a straddle barely moves the worst scenario.
+        """
+        lot_size = self.lot_sizes.get_lot_size(index)
+        t = time_to_expiry_years(self._expiry_date(expiry_type), self._now_ist())
+        scale = self._calibration(index, book, spot_price, t, current_margin)
+        side_capacity = self._side_capacity(hedge_capacity)
+        remaining = list(candidates)
+        selected: List[HedgeCandidate] = []
+        total_benefit = 0.0
+        total_cost = 0.0
+
+        while total_benefit < margin_reduction_needed and remaining:
+            # Size each candidate to what its side can still absorb
+            sized = []
+            for candidate in remaining:
+                lots = candidate.total_lots
+                if side_capacity[candidate.option_type] != float('inf'):
+                    lots = min(lots, int(side_capacity[candidate.option_type] // lot_size))
+                if lots > 0:
+                    sized.append((candidate, lots))
+            if not sized:
+                break
+
+            legs = OptionBook.empty().add(
+                [c.strike for c, _ in sized],
+                [c.option_type == 'CE' for c, _ in sized],
+                [lots * lot_size for _, lots in sized],
+                [c.ltp for c, _ in sized]
+            )
+            combos = self._single_and_pair_combinations([c.option_type for c, _ in sized])
+            _, benefits = self.span_estimator.marginal_benefits(
+                index, book, legs, spot_price, t, combos
+            )
+            benefits = benefits * scale
+            costs = combos @ np.array([c.cost_per_lot * lots for c, lots in sized])
+            scores = np.where((benefits > 0) & (costs > 0), benefits / np.maximum(costs, 1e-9), -np.inf)
+
+            best = int(np.argmax(scores))
+            if not np.isfinite(scores[best]):
+                logger.info("[HEDGE_SELECTOR] No remaining candidate reduces estimated margin")
+                break
+
+            picked = np.flatnonzero(combos[best])
+            for i in picked:
+                candidate, lots = sized[i]
+                cost = candidate.cost_per_lot * lots
+                selected.append(HedgeCandidate(
+                    strike=candidate.strike,
+                    option_type=candidate.option_type,
+                    ltp=candidate.ltp,
+                    otm_distance=candidate.otm_distance,
+                    estimated_margin_benefit=float(benefits[best] * cost / costs[best]),
+                    cost_per_lot=candidate.cost_per_lot,
+                    total_cost=cost,
+                    total_lots=lots,
+                    mbpr=float(scores[best])
+                ))
+                side_capacity[candidate.option_type] -= lots * lot_size
+                remaining.remove(candidate)
+            book = book.add(
+                legs.strikes[picked], legs.is_call[picked], legs.quantity[picked], legs.ltp[picked]
+            )
+            total_benefit += float(benefits[best])
+            total_cost += float(costs[best])
+
+        fully_covered = total_benefit >= margin_reduction_needed
+
+        logger.info(
+            f"[HEDGE_SELECTOR] SPAN selection: {len(selected)} hedges, "
+            f"cost=₹{total_cost:,.0f}, benefit=₹{total_benefit:,.0f}, "
+            f"needed=₹{margin_reduction_needed:,.0f}, covered={fully_covered}, "
+            f"calibration={scale:.2f}"
+        )
+
+        return HedgeSelection(
+            candidates=candidates,
+            selected=selected,
+            total_cost=total_cost,
+            total_margin_benefit=total_benefit,
+            margin_reduction_needed=margin_reduction_needed,
+            fully_covered=fully_covered
+        )
+
+    def _select_by_solver(
+        self,
+        index: IndexName,
+        expiry_type: ExpiryType,
+        candidates: List[HedgeCandidate],
+        book: OptionBook,
+        spot_price: Optional[float],
+        margin_reduction_needed: float,
+        hedge_capacity: Optional[Dict[str, Any]],
+        current_margin: Optional[float],
+        side_ratios: Dict[str, float]
+    ) -> HedgeSelection:
+        """
+        Minimum-premium basket over strikes x lots.
+
+        With the SPAN estimator the CE/PE split comes from the scenario
+        losses; otherwise each side must cover its allocation ratio of the
+        reduction using the constant per-side benefit.
+        """
+        lot_size = self.lot_sizes.get_lot_size(index)
+        is_call = np.array([c.option_type == 'CE' for c in candidates])
+        cost_per_lot = np.array([c.cost_per_lot for c in candidates])
+        max_lots = np.array([c.total_lots for c in candidates])
+        capacity_lots = {
+            side: None if remaining == float('inf') else int(remaining // lot_size)
+            for side, remaining in self._side_capacity(hedge_capacity).items()
+        }
+
+        if self.span_estimator:
+            t = time_to_expiry_years(self._expiry_date(expiry_type), self._now_ist())
+            legs = OptionBook.empty().add(
+                [c.strike for c in candidates], is_call,
+                [lot_size] * len(candidates), [c.ltp for c in candidates]
+            )
+            solution = self.solver.solve_span(
+                self.span_estimator, index, book, legs, cost_per_lot, max_lots, capacity_lots,
+                spot_price, t, margin_reduction_needed,
+                scale=self._calibration(index, book, spot_price, t, current_margin)
+            )
+        else:
+            gain_per_lot = np.array([c.estimated_margin_benefit / c.total_lots for c in candidates])
+            solution = self.solver.solve_linear(
+                is_call, cost_per_lot, gain_per_lot, max_lots,
+                {side: margin_reduction_needed * ratio for side, ratio in side_ratios.items()},
+                capacity_lots
+            )
+
+        mbpr = solution.benefit / solution.cost if solution.cost > 0 else 0.0
+        selected: List[HedgeCandidate] = []
+        for candidate, lots in zip(candidates, solution.lots.tolist()):
+            if lots <= 0:
+                continue
+            cost = candidate.cost_per_lot * lots
+            selected.append(HedgeCandidate(
+                strike=candidate.strike,
+                option_type=candidate.option_type,
+                ltp=candidate.ltp,
+                otm_distance=candidate.otm_distance,
+                # Basket benefit attributed in proportion to premium
+                estimated_margin_benefit=solution.benefit * cost / solution.cost,
+                cost_per_lot=candidate.cost_per_lot,
+                total_cost=cost,
+                total_lots=lots,
+                mbpr=mbpr
+            ))
+        selected.sort(key=lambda c: (c.option_type, c.otm_distance))
+
+        logger.info(
+            f"[HEDGE_SELECTOR] Solver selection: {len(selected)} strikes, "
+            f"cost=₹{solution.cost:,.0f}, benefit=₹{solution.benefit:,.0f}, "
+            f"needed=₹{margin_reduction_needed:,.0f}, covered={solution.fully_covered}"
+        )
+
+        return HedgeSelection(
+            candidates=candidates,
+            selected=selected,
+            total_cost=solution.cost,
+            total_margin_benefit=solution.benefit,
+            margin_reduction_needed=margin_reduction_needed,
+            fully_covered=solution.fully_covered
+        )
+
+    def _calibration(
+        self,
+        index: IndexName,
+        book: OptionBook,
+        spot_price: float,
+        t: float,
+        current_margin: Optional[float]
+    ) -> float:
+        """Broker margin / estimated margin for the book (1.0 if unknown)."""
+        model_margin = self.span_estimator.estimate(index, book, spot_price, t).total
+        return current_margin / model_margin if current_margin and model_margin > 0 else 1.0
+
+    @staticmethod
+    def _side_capacity(hedge_capacity: Optional[Dict[str, Any]]) -> Dict[str, float]:
+        """Remaining hedge quantity per side (inf when capacity is not tracked)."""
+        if not hedge_capacity:
+            return {'CE': float('inf'), 'PE': float('inf')}
+        return {
+            'CE': hedge_capacity.get('remaining_ce_capacity', float('inf')),
+            'PE': hedge_capacity.get('remaining_pe_capacity', float('inf')),
+        }
+
+    @staticmethod
+    def _single_and_pair_combinations(option_types: List[str]) -> np.ndarray:
+        """Rows: each candidate alone, then every CE+PE pair."""
+        n = len(option_types)
+        ce = [i for i, t in enumerate(option_types) if t == 'CE']
+        pe = [i for i, t in enumerate(option_types) if t == 'PE']
+        combos = np.zeros((n + len(ce) * len(pe), n))
+        combos[np.arange(n), np.arange(n)] = 1.0
+        row = n
+        for i in ce:
+            for j in pe:
+                combos[row, i] = combos[row, j] = 1.0
+                row += 1
+        return combos
+
     async def find_best_single_hedge(
         self,
         index: IndexName,
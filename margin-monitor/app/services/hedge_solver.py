@@ -0,0 +1,294 @@
+"""
+Auto-Hedge System - Hedge Basket Solver
+
+Chooses hedge lots across the whole strike ladder to reach a margin
+reduction at minimum premium, instead of greedily taking one strike at a
+time by MBPR.
+
+SPAN margin is the worst scenario loss, and long CE hedges only pay off in
+up-move scenarios while long PE hedges only pay off in down-move scenarios.
+Reaching a target margin therefore splits into two independent covering
+problems: CE lots must bring the worst up-move loss to the target, and PE
+lots must do the same for the worst down-move loss. Each side is a bounded
+knapsack solved by dynamic programming over (lots used, gain reached), which
+handles the per-strike lot limit and the side's hedge capacity exactly.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+from app.models.hedge_constants import IndexName
+from app.services.span_margin import SpanMarginEstimator, OptionBook
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SideSolution:
+    """Lots chosen per candidate on one side."""
+    lots: np.ndarray
+    cost: float
+    gain: float
+    feasible: bool  # True if the gain target was reached
+
+
+@dataclass
+class BasketSolution:
+    """Lots chosen per candidate across both sides."""
+    lots: np.ndarray
+    cost: float
+    benefit: float  # Margin reduction in INR (SPAN re-estimate when available)
+    fully_covered: bool
+
+
+class HedgeBasketSolver:
+    """
+    Minimum-cost hedge basket solver.
+
+    Core responsibilities:
+    - Solve one side: min premium s.t. gain >= target, lots per strike <= bound,
+      total lots <= capacity
+    - Fall back to the maximum reachable gain when the target is infeasible
+    - Split a margin reduction into CE and PE targets from the SPAN scenario
+      losses, and re-solve until the full re-estimate meets the reduction
+    """
+
+    def __init__(self, resolution: int = 400, max_refinements: int = 3):
+        """
+        Initialize the solver.
+
+        Args:
+            resolution: Gain buckets between 0 and the target. Gains are
+                rounded down to a bucket, so solutions never under-deliver on
+                the linearized target; higher values cost more time and are
+                closer to the true optimum
+            max_refinements: Re-solves with a raised target when the full
+                SPAN re-estimate of the basket falls short
+        """
+        self.resolution = resolution
+        self.max_refinements = max_refinements
+
+    def solve_side(
+        self,
+        cost_per_lot: np.ndarray,
+        gain_per_lot: np.ndarray,
+        max_lots: np.ndarray,
+        target_gain: float,
+        capacity_lots: Optional[int] = None
+    ) -> SideSolution:
+        """
+        Bounded knapsack (covering form) for one option side.
+
+        Args:
+            cost_per_lot: Premium per lot for each candidate strike
+            gain_per_lot: Margin gain per lot for each candidate strike
+            max_lots: Upper bound on lots for each candidate strike
+            target_gain: Gain to reach
+            capacity_lots: Upper bound on total lots across strikes
+
+        Returns:
+            SideSolution; if the target cannot be reached, the cheapest
+            basket with the largest reachable gain
+        """
+        n = len(cost_per_lot)
+        lots = np.zeros(n, dtype=int)
+        if target_gain <= 0:
+            return SideSolution(lots=lots, cost=0.0, gain=0.0, feasible=True)
+
+        cost_per_lot = np.asarray(cost_per_lot, dtype=float)
+        gain_per_lot = np.asarray(gain_per_lot, dtype=float)
+        max_lots = np.asarray(max_lots, dtype=int)
+
+        useful = (gain_per_lot > 0) & (max_lots > 0)
+        if not useful.any():
+            return SideSolution(lots=lots, cost=0.0, gain=0.0, feasible=False)
+
+        total_bound = int(max_lots[useful].sum())
+        if capacity_lots is not None:
+            capacity_lots = max(0, min(int(capacity_lots), total_bound))
+            if capacity_lots == 0:
+                return SideSolution(lots=lots, cost=0.0, gain=0.0, feasible=False)
+        # Lots dimension only matters when total lots are capped
+        k_size = capacity_lots + 1 if capacity_lots is not None else 1
+
+        g_max = self.resolution
+        unit = target_gain / g_max
+
+        # Binary-split each bounded item into 0/1 items of 1, 2, 4, ... lots
+        items = []  # (candidate index, lots, cost, gain buckets)
+        for i in np.flatnonzero(useful):
+            remaining = int(max_lots[i]) if capacity_lots is None else min(int(max_lots[i]), capacity_lots)
+            chunk = 1
+            while remaining > 0:
+                take = min(chunk, remaining)
+                weight = min(int(gain_per_lot[i] * take // unit), g_max)
+                items.append((i, take, cost_per_lot[i] * take, weight))
+                remaining -= take
+                chunk *= 2
+
+        # dp[k, g] = min cost using k lots (or any number, if uncapped) with
+        # gain of at least g buckets. prev[item, k, g] is the bucket the item
+        # was added from, or -1 if the item did not improve (k, g).
+        dp = np.full((k_size, g_max + 1), np.inf)
+        dp[0, 0] = 0.0
+        prev = np.full((len(items), k_size, g_max + 1), -1, dtype=np.int16)
+        buckets = np.arange(g_max + 1)
+
+        for item, (_, m, cost, weight) in enumerate(items):
+            step = m if capacity_lots is not None else 0
+            if step >= k_size or weight == 0:
+                continue
+            source_g = np.maximum(buckets - weight, 0)
+            candidate = dp[:k_size - step, source_g] + cost
+            better = candidate < dp[step:]
+            prev[item, step:] = np.where(better, source_g, -1)
+            dp[step:] = np.where(better, candidate, dp[step:])
+
+        # Best final state: reach the target at min cost, else the highest gain bucket
+        reachable = np.isfinite(dp)
+        best_g = int(np.flatnonzero(reachable.any(axis=0)).max())
+        k = int(np.argmin(np.where(reachable[:, best_g], dp[:, best_g], np.inf)))
+        g = best_g
+
+        for item in range(len(items) - 1, -1, -1):
+            source_g = prev[item, k, g]
+            if source_g < 0:
+                continue
+            i, m, _, _ = items[item]
+            lots[i] += m
+            if capacity_lots is not None:
+                k -= m
+            g = int(source_g)
+
+        return SideSolution(
+            lots=lots,
+            cost=float((lots * cost_per_lot).sum()),
+            gain=float((lots * gain_per_lot).sum()),
+            feasible=best_g == g_max
+        )
+
+    def solve_linear(
+        self,
+        is_call: np.ndarray,
+        cost_per_lot: np.ndarray,
+        gain_per_lot: np.ndarray,
+        max_lots: np.ndarray,
+        side_targets: Dict[str, float],
+        capacity_lots: Dict[str, Optional[int]]
+    ) -> BasketSolution:
+        """
+        Solve both sides against fixed per-side targets with additive gains.
+
+        Used when no SPAN estimator is configured (constant per-side benefit).
+        """
+        is_call = np.asarray(is_call, dtype=bool)
+        lots = np.zeros(len(is_call), dtype=int)
+        feasible = True
+        for side, mask in (('CE', is_call), ('PE', ~is_call)):
+            if not mask.any() or side_targets.get(side, 0) <= 0:
+                continue
+            solution = self.solve_side(
+                cost_per_lot[mask], gain_per_lot[mask], max_lots[mask],
+                side_targets[side], capacity_lots.get(side)
+            )
+            lots[mask] = solution.lots
+            feasible &= solution.feasible
+        return BasketSolution(
+            lots=lots,
+            cost=float((lots * cost_per_lot).sum()),
+            benefit=float((lots * gain_per_lot).sum()),
+            fully_covered=feasible
+        )
+
+    def solve_span(
+        self,
+        estimator: SpanMarginEstimator,
+        index: Union[IndexName, str],
+        book: OptionBook,
+        candidates: OptionBook,
+        cost_per_lot: np.ndarray,
+        max_lots: np.ndarray,
+        capacity_lots: Dict[str, Optional[int]],
+        spot: float,
+        t: float,
+        margin_reduction_needed: float,
+        scale: float = 1.0
+    ) -> BasketSolution:
+        """
+        Minimum-premium basket reaching a SPAN-estimated margin reduction.
+
+        Args:
+            estimator: SPAN-style estimator
+            index: Index the book is on
+            book: Current option legs
+            candidates: One lot of each candidate hedge (quantity = lot size)
+            cost_per_lot: Premium per lot for each candidate
+            max_lots: Upper bound on lots for each candidate
+            capacity_lots: Remaining hedge capacity in lots per side (None = no cap)
+            spot: Current index level
+            t: Time to expiry in years
+            margin_reduction_needed: Target reduction in INR (broker terms)
+            scale: Broker margin / estimated margin, to convert the target
+
+        Returns:
+            BasketSolution with the benefit re-estimated on the final basket
+        """
+        price_moves, _, _ = estimator.scenario_grid(index)
+        book_pnl = book.quantity @ estimator.leg_scenario_pnl(
+            index, book.strikes, book.is_call, book.ltp, spot, t
+        ) if len(book) else np.zeros(len(price_moves))
+        lot_pnl = estimator.leg_scenario_pnl(
+            index, candidates.strikes, candidates.is_call, candidates.ltp, spot, t
+        ) * candidates.quantity[:, None]
+
+        losses = -book_pnl
+        base_margin = estimator.estimate(index, book, spot, t).total
+        worst = max(float(losses.max()), 0.0)
+        needed = margin_reduction_needed / scale if scale > 0 else margin_reduction_needed
+
+        sides = {'CE': (candidates.is_call, price_moves > 0), 'PE': (~candidates.is_call, price_moves < 0)}
+        extra = 0.0
+        solution = None
+        for _ in range(self.max_refinements + 1):
+            target_scan = worst - needed - extra
+            lots = np.zeros(len(candidates), dtype=int)
+            feasible = True
+            for side, (mask, scenarios) in sides.items():
+                if not mask.any() or not scenarios.any():
+                    continue
+                # Linearize on this side's worst scenario
+                scenario = np.flatnonzero(scenarios)[int(losses[scenarios].argmax())]
+                target_gain = losses[scenario] - target_scan
+                if target_gain <= 0:
+                    continue
+                side_solution = self.solve_side(
+                    cost_per_lot[mask], lot_pnl[mask, scenario], max_lots[mask],
+                    target_gain, capacity_lots.get(side)
+                )
+                lots[mask] = side_solution.lots
+                feasible &= side_solution.feasible
+
+            projected = estimator.project_margins(
+                index, book, candidates, spot, t, combinations=lots[None, :]
+            )[0]
+            benefit = (base_margin - float(projected)) * scale
+            solution = BasketSolution(
+                lots=lots,
+                cost=float((lots * cost_per_lot).sum()),
+                benefit=benefit,
+                fully_covered=benefit >= margin_reduction_needed
+            )
+            if solution.fully_covered or not feasible:
+                break
+            # Other scenarios (or the flat ones) still bind: raise the target
+            extra += (margin_reduction_needed - benefit) / scale
+
+        logger.info(
+            f"[HEDGE_SOLVER] {int(solution.lots.sum())} lots over "
+            f"{int((solution.lots > 0).sum())} strikes, cost=₹{solution.cost:,.0f}, "
+            f"benefit=₹{solution.benefit:,.0f}, needed=₹{margin_reduction_needed:,.0f}"
+        )
+        return solution
@@ -17,14 +17,15 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert
 
 from app.models.db_models import DailyConfig, MarginSnapshot, PositionSnapshot, DailySummary
 from app.services.openalgo_service import openalgo_service, FundsData
 from app.services.position_service import position_service
 from app.services.pm_client import pm_client, ExcludedMarginResult
-from app.utils.date_utils import now_ist, format_datetime_ist
-from app.utils.symbol_parser import parse_symbol, get_position_type
+from app.services.analytics_service import analytics_service
+from app.utils.date_utils import now_ist, format_datetime_ist, day_range_ist
+from app.utils.symbol_parser import parse_symbol, get_position_type, expiry_as_date
 
 logger = logging.getLogger(__name__)
 
@@ -74,7 +75,7 @@ class MarginService:
                 continue
 
             try:
-                expiry_date = datetime.strptime(parsed.expiry_date, "%Y-%m-%d").date()
+                expiry_date = expiry_as_date(parsed.expiry_date)
             except ValueError:
                 continue
 
@@ -252,9 +253,10 @@ class MarginService:
             data = await self.get_current_margin(config, db)
 
             # Create snapshot
+            captured_at = now_ist()
             snapshot = MarginSnapshot(
                 config_id=config.id,
-                timestamp=now_ist(),
+                timestamp=captured_at,
                 total_margin_used=data['funds']['used_margin'],
                 available_cash=data['funds']['available_cash'],
                 collateral=data['funds']['collateral'],
@@ -275,26 +277,13 @@ class MarginService:
             db.add(snapshot)
             await db.flush()
 
-            # Store position details
-            for category in ['short_positions', 'long_positions', 'closed_positions']:
-                for pos in data['filtered_positions'][category]:
-                    parsed = parse_symbol(pos['symbol'])
-                    if parsed:
-                        pos_snapshot = PositionSnapshot(
-                            snapshot_id=snapshot.id,
-                            symbol=pos['symbol'],
-                            exchange=pos['exchange'],
-                            product=pos['product'],
-                            quantity=pos['quantity'],
-                            average_price=pos['average_price'],
-                            ltp=pos['ltp'],
-                            pnl=pos['pnl'],
-                            position_type=get_position_type(pos['quantity']),
-                            option_type=parsed.option_type,
-                            strike_price=parsed.strike,
-                            expiry_date=datetime.strptime(parsed.expiry_date, '%Y-%m-%d').date(),
-                        )
-                        db.add(pos_snapshot)
+            # Store position details in one multi-row INSERT
+            rows = self.build_position_rows(snapshot.id, data['filtered_positions'], captured_at)
+            if rows:
+                await db.execute(insert(PositionSnapshot), rows)
+
+            # Continuous aggregates commit with the snapshot
+            await analytics_service.update_snapshot_rollups(db, snapshot)
 
             await db.commit()
             logger.info(f"Captured snapshot: utilization={data['margin']['utilization_pct']:.1f}%")
@@ -325,6 +314,46 @@ class MarginService:
 
             return None
 
+    @staticmethod
+    def build_position_rows(
+        snapshot_id: int,
+        filtered_positions: Dict[str, List[Dict[str, Any]]],
+        created_at: datetime
+    ) -> List[Dict[str, Any]]:
+        """
+        Build PositionSnapshot column dicts for a bulk insert.
+
+        Args:
+            snapshot_id: Parent MarginSnapshot ID
+            filtered_positions: Output of PositionService.filter_positions
+            created_at: Row timestamp (partition key - same for the whole snapshot)
+
+        Returns:
+            List of column dicts; unparseable symbols are skipped.
+        """
+        rows = []
+        for category in ('short_positions', 'long_positions', 'closed_positions'):
+            for pos in filtered_positions[category]:
+                parsed = parse_symbol(pos['symbol'])
+                if not parsed:
+                    continue
+                rows.append({
+                    'snapshot_id': snapshot_id,
+                    'symbol': pos['symbol'],
+                    'exchange': pos['exchange'],
+                    'product': pos['product'],
+                    'quantity': pos['quantity'],
+                    'average_price': pos['average_price'],
+                    'ltp': pos['ltp'],
+                    'pnl': pos['pnl'],
+                    'position_type': get_position_type(pos['quantity']),
+                    'option_type': parsed.option_type,
+                    'strike_price': parsed.strike,
+                    'expiry_date': expiry_as_date(parsed.expiry_date),
+                    'created_at': created_at,
+                })
+        return rows
+
     async def generate_daily_summary(
         self,
         config: DailyConfig,
@@ -342,13 +371,25 @@ class MarginService:
         """
         try:
             # Get all snapshots for today
+            day_start, day_end = day_range_ist(config.date)
             result = await db.execute(
-                select(MarginSnapshot)
+                select(
+                    MarginSnapshot.timestamp,
+                    MarginSnapshot.intraday_margin,
+                    MarginSnapshot.utilization_pct,
+                    MarginSnapshot.short_positions_count,
+                    MarginSnapshot.long_positions_count,
+                    MarginSnapshot.closed_positions_count,
+                    MarginSnapshot.total_hedge_cost,
+                    MarginSnapshot.total_pnl,
+                )
                 .where(MarginSnapshot.config_id == config.id)
+                .where(MarginSnapshot.timestamp >= day_start)
+                .where(MarginSnapshot.timestamp < day_end)
                 .where(MarginSnapshot.error_message.is_(None))
                 .order_by(MarginSnapshot.timestamp)
             )
-            snapshots = result.scalars().all()
+            snapshots = result.all()
 
             if not snapshots:
                 logger.warning(f"No snapshots found for config {config.id}")
@@ -373,8 +414,12 @@ class MarginService:
                 select(DailySummary).where(DailySummary.config_id == config.id)
             )
             summary = existing.scalar_one_or_none()
+            previous = None
 
             if summary:
+                # Replaced (not re-counted) in the weekday rollup
+                previous = (summary.max_utilization_pct, summary.total_hedge_cost or 0.0, summary.total_pnl or 0.0)
+
                 # Update existing
                 summary.max_intraday_margin = max_intraday
                 summary.max_utilization_pct = max_utilization
@@ -412,6 +457,8 @@ class MarginService:
                 )
                 db.add(summary)
 
+            await analytics_service.update_weekday_rollup(db, summary, previous)
+
             await db.commit()
             logger.info(f"Generated EOD summary: max_utilization={max_utilization:.1f}%")
 
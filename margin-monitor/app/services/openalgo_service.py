@@ -5,30 +5,73 @@ Margin Monitor - OpenAlgo API Client Service
 import httpx
 import logging
 import time
-from typing import List, TypedDict, Optional, Tuple, Any
+from collections import OrderedDict
+from typing import Callable, List, TypedDict, Optional, Tuple, Any
 
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
-# Simple in-memory cache with TTL
-_cache: dict[str, Tuple[float, Any]] = {}
+# Simple in-memory cache with TTL, bounded to the most recently used keys
+# (option chains are keyed per expiry, so keys accumulate over a session)
+_cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
 CACHE_TTL_SECONDS = 5  # 5 second cache to prevent API hammering
+CACHE_MAX_ENTRIES = 64
 
 
 def _get_cached(key: str) -> Optional[Any]:
     """Get value from cache if not expired."""
     if key in _cache:
         timestamp, value = _cache[key]
-        if time.time() - timestamp < CACHE_TTL_SECONDS:
+        if time.monotonic() - timestamp < CACHE_TTL_SECONDS:
+            _cache.move_to_end(key)
             return value
         del _cache[key]
     return None
 
 
 def _set_cached(key: str, value: Any) -> None:
-    """Store value in cache with current timestamp."""
-    _cache[key] = (time.time(), value)
+    """Store value in cache with current timestamp, evicting the oldest keys."""
+    _cache[key] = (time.monotonic(), value)
+    _cache.move_to_end(key)
+    while len(_cache) > CACHE_MAX_ENTRIES:
+        _cache.popitem(last=False)
+
+
+# Broker event listeners, called with "positions" when a fresh positionbook
+# differs from the previous one (whoever fetched it) and "orders" when an
+# order is accepted. The auto-hedge orchestrator registers its wake() here.
+_event_listeners: List[Callable[[str], None]] = []
+_position_signature: Optional[frozenset] = None
+
+
+def add_event_listener(callback: Callable[[str], None]) -> None:
+    """Register a callback for broker position/order events."""
+    _event_listeners.append(callback)
+
+
+def remove_event_listener(callback: Callable[[str], None]) -> None:
+    """Unregister a callback added with add_event_listener."""
+    if callback in _event_listeners:
+        _event_listeners.remove(callback)
+
+
+def _notify(reason: str) -> None:
+    for callback in list(_event_listeners):
+        try:
+            callback(reason)
+        except Exception as e:
+            logger.warning(f"Broker event listener failed for {reason}: {e}")
+
+
+def _check_positions_changed(positions: List[dict]) -> None:
+    """Notify listeners when open positions (symbol, quantity) differ from the last fetch."""
+    global _position_signature
+    signature = frozenset((p['symbol'], p['quantity']) for p in positions if p['quantity'])
+    previous, _position_signature = _position_signature, signature
+    if previous is not None and signature != previous:
+        logger.info("Positions changed since last fetch, notifying listeners")
+        _notify("positions")
 
 
 class FundsData(TypedDict):
@@ -188,6 +231,7 @@ class OpenAlgoService:
                     })
 
                 _set_cached("positions", positions)
+                _check_positions_changed(positions)
                 return positions
 
             except httpx.HTTPStatusError as e:
@@ -376,6 +420,10 @@ class OpenAlgoService:
                 order_id = result.get("data", {}).get("orderid", result.get("orderid"))
                 logger.info(f"[OPENALGO] Order placed successfully: {order_id}")
 
+                # The positionbook is about to change; the next read must see it
+                _cache.pop("positions", None)
+                _notify("orders")
+
                 return {
                     "order_id": order_id,
                     "status": "success",
@@ -0,0 +1,417 @@
+"""
+Auto-Hedge System - Option Chain Store
+
+Holds the latest option chain per (index, expiry) as sorted NumPy arrays and
+refreshes it in the background, so the selector, orchestrator and routes
+read one shared snapshot instead of each downloading and re-parsing the
+chain from the broker.
+
+Snapshots are immutable: a refresh builds a new ChainSnapshot with a higher
+version and swaps it in, so a consumer holding a snapshot always sees one
+consistent set of strikes, LTPs and spot.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.models.hedge_constants import IndexName
+from app.services.openalgo_service import OpenAlgoService
+
+logger = logging.getLogger(__name__)
+
+# Index -> (option chain symbol, exchange)
+CHAIN_SYMBOLS = {
+    IndexName.NIFTY.value: ("NIFTY", "NFO"),
+    IndexName.SENSEX.value: ("SENSEX", "BFO"),
+}
+
+# Index -> (spot symbol, exchange); OpenAlgo requires *_INDEX exchanges for index quotes
+SPOT_SYMBOLS = {
+    IndexName.NIFTY.value: ("NIFTY", "NSE_INDEX"),
+    IndexName.SENSEX.value: ("SENSEX", "BSE_INDEX"),
+}
+
+
+def _index_key(index: Union[IndexName, str]) -> str:
+    return index.value if isinstance(index, IndexName) else str(index)
+
+
+def _read_only(values: np.ndarray) -> np.ndarray:
+    values.setflags(write=False)
+    return values
+
+
+@dataclass(frozen=True)
+class ChainSnapshot:
+    """
+    Option chain for one (index, expiry) at one point in time.
+
+    Strikes are sorted ascending; CE/PE LTP columns are aligned with them
+    and hold NaN where the broker returned no price.
+    """
+    index: str
+    expiry: date
+    version: int
+    strikes: np.ndarray
+    ce_ltp: np.ndarray
+    pe_ltp: np.ndarray
+    spot: Optional[float] = None
+    fetched_at: float = field(default_factory=time.monotonic)
+
+    @classmethod
+    def from_entries(
+        cls,
+        index: Union[IndexName, str],
+        expiry: date,
+        entries: List[dict],
+        version: int = 0,
+        spot: Optional[float] = None
+    ) -> "ChainSnapshot":
+        """
+        Build a snapshot from OpenAlgo option chain entries.
+
+        Accepts rows with either ce_ltp/pe_ltp columns or one row per
+        option with ltp and option_type.
+        """
+        by_strike: Dict[int, List[float]] = {}
+        for entry in entries:
+            strike = entry.get("strike") or entry.get("strike_price")
+            if strike is None:
+                continue
+            try:
+                row = by_strike.setdefault(int(float(strike)), [np.nan, np.nan])
+                if entry.get("ce_ltp") is not None:
+                    row[0] = float(entry["ce_ltp"])
+                if entry.get("pe_ltp") is not None:
+                    row[1] = float(entry["pe_ltp"])
+                if entry.get("ltp") is not None and entry.get("option_type") in ("CE", "PE"):
+                    row[0 if entry["option_type"] == "CE" else 1] = float(entry["ltp"])
+            except (TypeError, ValueError):
+                continue
+
+        strikes = np.fromiter(by_strike.keys(), dtype=np.int64, count=len(by_strike))
+        ltp = np.array(list(by_strike.values()), dtype=float).reshape(-1, 2)
+        order = np.argsort(strikes, kind="stable")
+
+        return cls(
+            index=_index_key(index),
+            expiry=expiry,
+            version=version,
+            strikes=_read_only(strikes[order]),
+            ce_ltp=_read_only(ltp[order, 0]),
+            pe_ltp=_read_only(ltp[order, 1]),
+            spot=spot
+        )
+
+    def __len__(self) -> int:
+        return len(self.strikes)
+
+    @property
+    def age_seconds(self) -> float:
+        """Seconds since the chain was fetched."""
+        return time.monotonic() - self.fetched_at
+
+    def column(self, option_type: str) -> np.ndarray:
+        """LTP column for 'CE' or 'PE'."""
+        return self.ce_ltp if option_type == "CE" else self.pe_ltp
+
+    def ltps(self, strikes, option_type: str) -> np.ndarray:
+        """
+        LTPs for many strikes at once (binary search per strike).
+
+        Returns:
+            Float array aligned with strikes; NaN where the strike is not
+            in the chain or has no price
+        """
+        strikes = np.asarray(strikes, dtype=np.int64)
+        if len(self.strikes) == 0:
+            return np.full(strikes.shape, np.nan)
+        pos = np.searchsorted(self.strikes, strikes)
+        pos = np.minimum(pos, len(self.strikes) - 1)
+        found = self.strikes[pos] == strikes
+        return np.where(found, self.column(option_type)[pos], np.nan)
+
+    def ltp(self, strike: int, option_type: str) -> Optional[float]:
+        """LTP for one strike, or None if not available."""
+        value = float(self.ltps([strike], option_type)[0])
+        return None if np.isnan(value) else value
+
+    def nearest_strike(self, price: float) -> Optional[int]:
+        """Listed strike closest to price (ties go to the lower strike)."""
+        if len(self.strikes) == 0:
+            return None
+        pos = int(np.searchsorted(self.strikes, price))
+        if pos == 0:
+            return int(self.strikes[0])
+        if pos == len(self.strikes):
+            return int(self.strikes[-1])
+        below, above = self.strikes[pos - 1], self.strikes[pos]
+        return int(below if price - below <= above - price else above)
+
+    def strikes_between(self, low: float, high: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Strikes in [low, high] with their CE and PE LTPs (views, no copy).
+
+        Returns:
+            Tuple of (strikes, ce_ltp, pe_ltp)
+        """
+        start = int(np.searchsorted(self.strikes, low, side="left"))
+        end = int(np.searchsorted(self.strikes, high, side="right"))
+        return self.strikes[start:end], self.ce_ltp[start:end], self.pe_ltp[start:end]
+
+    def same_prices(self, other: Optional["ChainSnapshot"]) -> bool:
+        """True if other has identical strikes, LTPs and spot."""
+        return (
+            other is not None
+            and other.spot == self.spot
+            and np.array_equal(other.strikes, self.strikes)
+            and np.array_equal(other.ce_ltp, self.ce_ltp, equal_nan=True)
+            and np.array_equal(other.pe_ltp, self.pe_ltp, equal_nan=True)
+        )
+
+
+class OptionChainStore:
+    """
+    Shared, versioned option chain cache.
+
+    Core responsibilities:
+    - Serve the latest ChainSnapshot per (index, expiry), fetching on a miss
+      or when the snapshot is older than max_age_seconds
+    - Collapse concurrent fetches of the same key into one broker call
+    - Refresh every tracked key in the background, faster when a scheduled
+      strategy entry is near
+    - Drop snapshots for past expiries
+    """
+
+    def __init__(
+        self,
+        openalgo: OpenAlgoService,
+        scheduler=None,
+        refresh_seconds: float = 30.0,
+        near_entry_refresh_seconds: float = 5.0,
+        near_entry_window_minutes: int = 10,
+        max_age_seconds: float = 60.0
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            openalgo: OpenAlgo service for chain and quote calls
+            scheduler: StrategySchedulerService; when provided, the refresh
+                cadence tightens while an entry is within the near-entry window
+            refresh_seconds: Background refresh interval away from entries
+            near_entry_refresh_seconds: Refresh interval near entries
+            near_entry_window_minutes: How far ahead an entry counts as near
+            max_age_seconds: Oldest snapshot get() returns without refetching
+        """
+        self.openalgo = openalgo
+        self.scheduler = scheduler
+        self.refresh_seconds = refresh_seconds
+        self.near_entry_refresh_seconds = near_entry_refresh_seconds
+        self.near_entry_window_minutes = near_entry_window_minutes
+        self.max_age_seconds = max_age_seconds
+
+        self._snapshots: Dict[Tuple[str, date], ChainSnapshot] = {}
+        self._spots: Dict[str, Tuple[float, float]] = {}  # index -> (monotonic time, spot)
+        self._locks: Dict[Tuple[str, date], asyncio.Lock] = {}
+        self._version = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def version(self) -> int:
+        """Version of the most recently stored snapshot."""
+        return self._version
+
+    def peek(self, index: Union[IndexName, str], expiry: date) -> Optional[ChainSnapshot]:
+        """Latest snapshot without fetching, or None."""
+        return self._snapshots.get((_index_key(index), expiry))
+
+    async def get(
+        self,
+        index: Union[IndexName, str],
+        expiry: date,
+        max_age_seconds: Optional[float] = None
+    ) -> ChainSnapshot:
+        """
+        Latest snapshot for (index, expiry), refreshed if missing or stale.
+
+        The key is tracked for background refresh from the first call.
+        """
+        key = (_index_key(index), expiry)
+        max_age = self.max_age_seconds if max_age_seconds is None else max_age_seconds
+
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None and snapshot.age_seconds <= max_age:
+            return snapshot
+
+        async with self._lock(key):
+            # Another caller may have refreshed while we waited
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None and snapshot.age_seconds <= max_age:
+                return snapshot
+            return await self._refresh(key)
+
+    async def refresh(self, index: Union[IndexName, str], expiry: date) -> ChainSnapshot:
+        """Fetch (index, expiry) now and store the new snapshot."""
+        key = (_index_key(index), expiry)
+        async with self._lock(key):
+            return await self._refresh(key)
+
+    async def get_spot(
+        self,
+        index: Union[IndexName, str],
+        max_age_seconds: Optional[float] = None
+    ) -> Optional[float]:
+        """
+        Index spot from the last refresh, or from the quotes API if stale.
+
+        Returns:
+            Spot price, or None if the quotes API is unavailable
+        """
+        index_key = _index_key(index)
+        max_age = self.max_age_seconds if max_age_seconds is None else max_age_seconds
+        cached = self._spots.get(index_key)
+        if cached is not None and time.monotonic() - cached[0] <= max_age:
+            return cached[1]
+        return await self._fetch_spot(index_key)
+
+    async def refresh_interval(self) -> float:
+        """Seconds until the next background refresh."""
+        if self.scheduler is not None:
+            try:
+                entries = await self.scheduler.get_entries_in_window(self.near_entry_window_minutes)
+                if entries:
+                    return self.near_entry_refresh_seconds
+            except Exception as e:
+                logger.warning(f"[CHAIN_STORE] Schedule lookup failed: {e}")
+        return self.refresh_seconds
+
+    async def refresh_all(self) -> int:
+        """
+        Refresh every tracked key once; drop keys whose expiry has passed.
+
+        Returns:
+            Number of keys refreshed
+        """
+        today = date.today()
+        for key in [k for k in self._snapshots if k[1] < today]:
+            self._snapshots.pop(key, None)
+            self._locks.pop(key, None)
+            logger.info(f"[CHAIN_STORE] Dropped expired chain {key[0]} {key[1]}")
+
+        keys = list(self._snapshots)
+        for index_key in {k[0] for k in keys}:
+            await self._fetch_spot(index_key)
+        for key in keys:
+            try:
+                async with self._lock(key):
+                    await self._refresh(key, fetch_spot=False)
+            except Exception as e:
+                logger.warning(f"[CHAIN_STORE] Refresh failed for {key[0]} {key[1]}: {e}")
+        return len(keys)
+
+    def start(self):
+        """Start the background refresh loop on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info("[CHAIN_STORE] Background refresh started")
+
+    async def stop(self):
+        """Stop the background refresh loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("[CHAIN_STORE] Background refresh stopped")
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh_all()
+            except Exception as e:
+                logger.error(f"[CHAIN_STORE] Error in refresh cycle: {e}")
+            await asyncio.sleep(await self.refresh_interval())
+
+    def _lock(self, key: Tuple[str, date]) -> asyncio.Lock:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    async def _refresh(self, key: Tuple[str, date], fetch_spot: bool = True) -> ChainSnapshot:
+        index_key, expiry = key
+        symbol, exchange = CHAIN_SYMBOLS.get(index_key, CHAIN_SYMBOLS[IndexName.NIFTY.value])
+        previous = self._snapshots.get(key)
+        try:
+            entries = await self.openalgo.get_option_chain(
+                symbol=symbol,
+                exchange=exchange,
+                expiry=expiry.strftime("%Y-%m-%d")
+            )
+        except Exception as e:
+            if previous is None:
+                raise
+            logger.warning(
+                f"[CHAIN_STORE] Chain fetch failed for {index_key} {expiry}, "
+                f"keeping v{previous.version}: {e}"
+            )
+            return previous
+
+        if not entries and previous is not None:
+            # An empty response is a broker/API failure, not an empty chain
+            logger.warning(
+                f"[CHAIN_STORE] Empty chain for {index_key} {expiry}, keeping v{previous.version}"
+            )
+            return previous
+
+        spot = await self._fetch_spot(index_key) if fetch_spot else self._spots.get(index_key, (0, None))[1]
+        snapshot = ChainSnapshot.from_entries(index_key, expiry, entries or [], spot=spot)
+
+        if previous is None and not entries:
+            # First fetch came back empty: track the key (version 0) for retry
+            self._snapshots[key] = snapshot
+            return snapshot
+
+        if snapshot.same_prices(previous):
+            # Nothing moved: keep the version (and arrays) consumers already hold
+            snapshot = ChainSnapshot(
+                index=index_key, expiry=expiry, version=previous.version,
+                strikes=previous.strikes, ce_ltp=previous.ce_ltp, pe_ltp=previous.pe_ltp,
+                spot=spot
+            )
+        else:
+            self._version += 1
+            snapshot = ChainSnapshot(
+                index=index_key, expiry=expiry, version=self._version,
+                strikes=snapshot.strikes, ce_ltp=snapshot.ce_ltp, pe_ltp=snapshot.pe_ltp,
+                spot=spot
+            )
+            logger.debug(
+                f"[CHAIN_STORE] {index_key} {expiry} v{snapshot.version}: "
+                f"{len(snapshot)} strikes, spot={spot}"
+            )
+
+        self._snapshots[key] = snapshot
+        return snapshot
+
+    async def _fetch_spot(self, index_key: str) -> Optional[float]:
+        symbol, exchange = SPOT_SYMBOLS.get(index_key, SPOT_SYMBOLS[IndexName.NIFTY.value])
+        try:
+            quotes = await self.openalgo.get_quotes(symbol=symbol, exchange=exchange)
+            if quotes and "ltp" in quotes:
+                spot = float(quotes["ltp"])
+                self._spots[index_key] = (time.monotonic(), spot)
+                return spot
+        except Exception as e:
+            logger.warning(f"[CHAIN_STORE] Quotes API failed for {index_key}: {e}")
+        cached = self._spots.get(index_key)
+        return cached[1] if cached else None
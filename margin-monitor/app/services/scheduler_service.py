@@ -24,11 +24,16 @@ class SchedulerService:
     def __init__(self):
         self.scheduler = AsyncIOScheduler(timezone=IST)
         self._db_session_maker = None
+        self._chain_store = None
 
     def set_db_session_maker(self, session_maker):
         """Set the database session maker."""
         self._db_session_maker = session_maker
 
+    def set_chain_store(self, chain_store):
+        """Set the shared option chain store (kept warm for today's index/expiry)."""
+        self._chain_store = chain_store
+
     def setup(self):
         """Configure all scheduled jobs."""
 
@@ -166,6 +171,20 @@ class SchedulerService:
 
             except Exception as e:
                 logger.error(f"Failed to capture snapshot: {e}")
+                return
+
+        await self._track_option_chain(config)
+
+    async def _track_option_chain(self, config):
+        """Make sure today's chain is tracked by the store's background refresh."""
+        if not self._chain_store or not config.expiry_date:
+            return
+        if self._chain_store.peek(config.index_name, config.expiry_date) is not None:
+            return
+        try:
+            await self._chain_store.get(config.index_name, config.expiry_date)
+        except Exception as e:
+            logger.warning(f"Failed to load option chain for {config.index_name}: {e}")
 
     async def _generate_eod_summary(self):
         """Generate end-of-day summary."""
@@ -0,0 +1,391 @@
+"""
+Auto-Hedge System - Local SPAN-style Margin Estimator
+
+Prices the option book over a SPAN-like scenario grid (price scan x
+volatility scan, plus two weighted extreme moves) with vectorized Black-76,
+so projected margin for any number of candidate hedges is computed in one
+NumPy pass without broker margin calls.
+
+Margin = scanning risk (worst weighted scenario loss) + exposure margin on
+short option notional. Absolute levels are approximate; callers rank hedges
+by the difference between projected margins and may calibrate against the
+broker-reported margin for the same book.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.models.hedge_constants import IndexName, SpanParameters, SPAN_PARAMS
+from app.utils.date_utils import IST, now_ist
+from app.utils.symbol_parser import parse_symbol
+
+logger = logging.getLogger(__name__)
+
+EXPIRY_CLOSE = time(15, 30)
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+# Implied volatility search bounds (annualized)
+MIN_IV = 0.01
+MAX_IV = 3.0
+
+# Abramowitz & Stegun 7.1.26 coefficients (|error| < 1.5e-7)
+_ERF_P = 0.3275911
+_ERF_A = (0.254829592, -0.284496736, 1.421413741, -1.453152027, 1.061405429)
+
+
+def _norm_cdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal CDF, vectorized (NumPy has no erf)."""
+    z = np.abs(x) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + _ERF_P * z)
+    a1, a2, a3, a4, a5 = _ERF_A
+    poly = t * (a1 + t * (a2 + t * (a3 + t * (a4 + t * a5))))
+    erf = 1.0 - poly * np.exp(-z * z)
+    return 0.5 * (1.0 + np.sign(x) * erf)
+
+
+def black76_price(
+    forward: np.ndarray,
+    strike: np.ndarray,
+    t: float,
+    sigma: np.ndarray,
+    is_call: np.ndarray
+) -> np.ndarray:
+    """
+    Black-76 option value with zero discounting (premium is settled upfront
+    and holding periods are intraday). All array arguments broadcast.
+
+    Args:
+        forward: Underlying forward/spot level
+        strike: Strike price
+        t: Time to expiry in years
+        sigma: Annualized volatility
+        is_call: True for CE, False for PE
+
+    Returns:
+        Option value per unit
+    """
+    forward = np.asarray(forward, dtype=float)
+    strike = np.asarray(strike, dtype=float)
+    vol_t = np.maximum(np.asarray(sigma, dtype=float) * np.sqrt(t), 1e-12)
+    d1 = (np.log(forward / strike) + 0.5 * vol_t * vol_t) / vol_t
+    d2 = d1 - vol_t
+    call = forward * _norm_cdf(d1) - strike * _norm_cdf(d2)
+    put = strike * _norm_cdf(-d2) - forward * _norm_cdf(-d1)
+    return np.where(is_call, call, put)
+
+
+def implied_vol(
+    price: np.ndarray,
+    forward: float,
+    strike: np.ndarray,
+    t: float,
+    is_call: np.ndarray,
+    iterations: int = 60
+) -> np.ndarray:
+    """
+    Vectorized bisection for Black-76 implied volatility.
+
+    Prices at or below intrinsic map to MIN_IV, prices above the MAX_IV value
+    map to MAX_IV; NaN prices stay NaN.
+    """
+    price = np.asarray(price, dtype=float)
+    strike = np.asarray(strike, dtype=float)
+    lo = np.full(price.shape, MIN_IV)
+    hi = np.full(price.shape, MAX_IV)
+    for _ in range(iterations):
+        mid = 0.5 * (lo + hi)
+        too_high = black76_price(forward, strike, t, mid, is_call) > price
+        hi = np.where(too_high, mid, hi)
+        lo = np.where(too_high, lo, mid)
+    return np.where(np.isnan(price), np.nan, 0.5 * (lo + hi))
+
+
+def time_to_expiry_years(
+    expiry: date,
+    now: Optional[datetime] = None,
+    min_years: float = SPAN_PARAMS.min_time_years
+) -> float:
+    """Years from now to expiry-day close (15:30 IST), floored at min_years."""
+    now = now or now_ist()
+    close = IST.localize(datetime.combine(expiry, EXPIRY_CLOSE))
+    return max((close - now).total_seconds() / SECONDS_PER_YEAR, min_years)
+
+
+@dataclass
+class OptionBook:
+    """Option legs as parallel arrays. quantity is signed units (+long, -short)."""
+    strikes: np.ndarray
+    is_call: np.ndarray
+    quantity: np.ndarray
+    ltp: np.ndarray  # NaN where unknown
+
+    @classmethod
+    def empty(cls) -> 'OptionBook':
+        return cls(np.empty(0), np.empty(0, dtype=bool), np.empty(0), np.empty(0))
+
+    @classmethod
+    def from_positions(cls, positions: Sequence[dict]) -> 'OptionBook':
+        """
+        Build from broker position dicts (symbol, quantity, optional ltp).
+        Closed and unparseable positions are skipped.
+        """
+        strikes, is_call, quantity, ltp = [], [], [], []
+        for pos in positions:
+            qty = pos.get('quantity', 0)
+            parsed = parse_symbol(pos.get('symbol', ''))
+            if not qty or not parsed:
+                continue
+            strikes.append(parsed.strike)
+            is_call.append(parsed.option_type == 'CE')
+            quantity.append(qty)
+            ltp.append(pos.get('ltp') or np.nan)
+        return cls(
+            np.asarray(strikes, dtype=float),
+            np.asarray(is_call, dtype=bool),
+            np.asarray(quantity, dtype=float),
+            np.asarray(ltp, dtype=float)
+        )
+
+    def add(
+        self,
+        strikes: Sequence[float],
+        is_call: Sequence[bool],
+        quantity: Sequence[float],
+        ltp: Optional[Sequence[float]] = None
+    ) -> 'OptionBook':
+        """Return a new book with the given legs appended."""
+        strikes = np.asarray(strikes, dtype=float)
+        ltp = np.full(strikes.shape, np.nan) if ltp is None else np.asarray(ltp, dtype=float)
+        return OptionBook(
+            np.concatenate([self.strikes, strikes]),
+            np.concatenate([self.is_call, np.asarray(is_call, dtype=bool)]),
+            np.concatenate([self.quantity, np.asarray(quantity, dtype=float)]),
+            np.concatenate([self.ltp, ltp])
+        )
+
+    def __len__(self) -> int:
+        return len(self.strikes)
+
+
+@dataclass
+class MarginEstimate:
+    """Estimated margin for one book."""
+    scanning_risk: float
+    exposure_margin: float
+    total: float
+    worst_scenario: int  # Index into the scenario grid
+
+
+class SpanMarginEstimator:
+    """
+    SPAN-style margin estimator for index option books.
+
+    Scenario grid (16 scenarios, as in exchange SPAN): price moves of
+    0, ±1/3, ±2/3, ±1 price scan range, each with volatility up and down,
+    plus ±extreme_move_multiple x range at unchanged vol weighted by
+    extreme_move_weight.
+
+    Core responsibilities:
+    - Estimate margin for the current book
+    - Project margin for many candidate hedges (or hedge combinations) at once
+    - Report marginal benefit per candidate
+    """
+
+    def __init__(self, params: SpanParameters = None):
+        """
+        Initialize the estimator.
+
+        Args:
+            params: SpanParameters (uses global default if not provided)
+        """
+        self.params = params or SPAN_PARAMS
+        self._grids: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    def scenario_grid(self, index: Union[IndexName, str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get (price_moves, vol_moves, weights) for an index.
+
+        price_moves are fractions of spot, vol_moves absolute IV changes.
+        """
+        key = getattr(index, 'value', index)
+        grid = self._grids.get(key)
+        if grid is None:
+            scan = self.params.price_scan_pct.get(key, self.params.price_scan_pct['NIFTY'])
+            vol = self.params.vol_scan
+            price_moves, vol_moves, weights = [], [], []
+            for fraction in (0.0, 1 / 3, -1 / 3, 2 / 3, -2 / 3, 1.0, -1.0):
+                for vol_move in (vol, -vol):
+                    price_moves.append(fraction * scan)
+                    vol_moves.append(vol_move)
+                    weights.append(1.0)
+            for sign in (1.0, -1.0):
+                price_moves.append(sign * self.params.extreme_move_multiple * scan)
+                vol_moves.append(0.0)
+                weights.append(self.params.extreme_move_weight)
+            grid = (np.array(price_moves), np.array(vol_moves), np.array(weights))
+            self._grids[key] = grid
+        return grid
+
+    def leg_scenario_pnl(
+        self,
+        index: Union[IndexName, str],
+        strikes: np.ndarray,
+        is_call: np.ndarray,
+        ltp: np.ndarray,
+        spot: float,
+        t: float
+    ) -> np.ndarray:
+        """
+        Weighted value change per unit long for each leg in each scenario.
+
+        Legs with an LTP are valued at their implied vol, others at the
+        index default IV.
+
+        Returns:
+            Array of shape (n_legs, n_scenarios)
+        """
+        price_moves, vol_moves, weights = self.scenario_grid(index)
+        if len(strikes) == 0:
+            return np.zeros((0, len(weights)))
+
+        key = getattr(index, 'value', index)
+        default_iv = self.params.default_iv.get(key, self.params.default_iv['NIFTY'])
+        iv = implied_vol(ltp, spot, strikes, t, is_call)
+        iv = np.where(np.isnan(iv), default_iv, iv)
+
+        base = black76_price(spot, strikes, t, iv, is_call)
+        shocked = black76_price(
+            spot * (1.0 + price_moves)[None, :],
+            strikes[:, None],
+            t,
+            np.maximum(iv[:, None] + vol_moves[None, :], MIN_IV),
+            is_call[:, None]
+        )
+        return (shocked - base[:, None]) * weights[None, :]
+
+    def _exposure(self, quantity: np.ndarray, spot: float) -> np.ndarray:
+        return np.maximum(-quantity, 0.0) * spot * self.params.exposure_margin_pct
+
+    def estimate(
+        self,
+        index: Union[IndexName, str],
+        book: OptionBook,
+        spot: float,
+        t: float
+    ) -> MarginEstimate:
+        """
+        Estimate margin for a book.
+
+        Args:
+            index: Index the book is on
+            book: Option legs
+            spot: Current index level
+            t: Time to expiry in years
+
+        Returns:
+            MarginEstimate
+        """
+        pnl = book.quantity @ self.leg_scenario_pnl(
+            index, book.strikes, book.is_call, book.ltp, spot, t
+        ) if len(book) else np.zeros(len(self.scenario_grid(index)[2]))
+        scanning = max(float(-pnl.min()), 0.0)
+        exposure = float(self._exposure(book.quantity, spot).sum())
+        return MarginEstimate(
+            scanning_risk=scanning,
+            exposure_margin=exposure,
+            total=scanning + exposure,
+            worst_scenario=int(pnl.argmin())
+        )
+
+    def project_margins(
+        self,
+        index: Union[IndexName, str],
+        book: OptionBook,
+        candidates: OptionBook,
+        spot: float,
+        t: float,
+        combinations: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Projected total margin after adding candidate legs to the book.
+
+        Args:
+            index: Index the book is on
+            book: Current option legs
+            candidates: Candidate legs (quantity = size of each candidate)
+            spot: Current index level
+            t: Time to expiry in years
+            combinations: Optional (n_combos, n_candidates) multipliers; row i
+                adds sum_j combinations[i, j] x candidate j. Default adds each
+                candidate on its own (identity).
+
+        Returns:
+            Array of projected margins, one per candidate (or combination)
+        """
+        base_pnl = book.quantity @ self.leg_scenario_pnl(
+            index, book.strikes, book.is_call, book.ltp, spot, t
+        ) if len(book) else 0.0
+        candidate_pnl = self.leg_scenario_pnl(
+            index, candidates.strikes, candidates.is_call, candidates.ltp, spot, t
+        ) * candidates.quantity[:, None]
+        candidate_exposure = self._exposure(candidates.quantity, spot)
+
+        if combinations is None:
+            pnl = base_pnl + candidate_pnl
+            exposure = candidate_exposure
+        else:
+            combinations = np.asarray(combinations, dtype=float)
+            pnl = base_pnl + combinations @ candidate_pnl
+            exposure = combinations @ candidate_exposure
+
+        scanning = np.maximum(-pnl.min(axis=1), 0.0)
+        return scanning + self._exposure(book.quantity, spot).sum() + exposure
+
+    def marginal_benefits(
+        self,
+        index: Union[IndexName, str],
+        book: OptionBook,
+        candidates: OptionBook,
+        spot: float,
+        t: float,
+        combinations: Optional[np.ndarray] = None
+    ) -> Tuple[float, np.ndarray]:
+        """
+        Margin reduction from each candidate (or combination).
+
+        Returns:
+            Tuple of (current book margin, array of reductions)
+        """
+        base = self.estimate(index, book, spot, t).total
+        return base, base - self.project_margins(index, book, candidates, spot, t, combinations)
+
+    def hedge_reduction_pct(
+        self,
+        index: Union[IndexName, str],
+        book: OptionBook,
+        hedges: List[dict],
+        spot: float,
+        t: float
+    ) -> float:
+        """
+        Fractional margin reduction from adding hedge legs to a book.
+
+        Args:
+            hedges: Dicts with strike, option_type, quantity
+
+        Returns:
+            Reduction as a fraction of the unhedged margin (0 if book is empty)
+        """
+        base = self.estimate(index, book, spot, t).total
+        if base <= 0 or not hedges:
+            return 0.0
+        hedged = self.estimate(index, book.add(
+            [h['strike'] for h in hedges],
+            [h['option_type'] == 'CE' for h in hedges],
+            [h['quantity'] for h in hedges]
+        ), spot, t).total
+        return max(0.0, 1.0 - hedged / base)
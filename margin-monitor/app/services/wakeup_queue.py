@@ -0,0 +1,113 @@
+"""
+Auto-Hedge System - Wake-up Queue
+
+Priority queue of named timers plus an immediate-notify channel, used by the
+orchestrator to sleep until the next moment something can need doing
+(entry lookahead, post-entry check, periodic check) instead of polling.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class WakeupQueue:
+    """
+    Named timers ordered by due time, plus immediate events.
+
+    Core responsibilities:
+    - schedule(key, when): set or move the timer for key (one timer per key)
+    - notify(reason): wake the waiter now, e.g. on a toggle or position change
+    - wait(): sleep until the earliest timer is due or an event arrives, and
+      return the reasons that fired
+    """
+
+    def __init__(self, clock: Callable[[], datetime], max_wait_seconds: float = 60.0):
+        """
+        Initialize the queue.
+
+        Args:
+            clock: Returns the current (timezone-aware) time; timers use the
+                same timezone
+            max_wait_seconds: Longest single sleep, so wall-clock jumps are
+                noticed; waking early with nothing due just sleeps again
+        """
+        self._clock = clock
+        self.max_wait_seconds = max_wait_seconds
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._timers: Dict[str, Tuple[datetime, int]] = {}  # key -> live (when, seq)
+        self._seq = itertools.count()
+        self._events: List[str] = []
+        self._event = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def schedule(self, key: str, when: datetime):
+        """Set the timer for key, replacing any earlier timer with the same key."""
+        seq = next(self._seq)
+        self._timers[key] = (when, seq)
+        heapq.heappush(self._heap, (when, seq, key))
+        # The waiter may be sleeping towards a later timer
+        self._event.set()
+
+    def cancel(self, key: str):
+        """Remove the timer for key, if any (lazily dropped from the heap)."""
+        self._timers.pop(key, None)
+
+    def notify(self, reason: str):
+        """Wake the waiter immediately with reason."""
+        self._events.append(reason)
+        self._event.set()
+
+    def next_due(self) -> Optional[datetime]:
+        """Due time of the earliest live timer, or None."""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> List[str]:
+        """Remove and return the keys of all timers due at or before now."""
+        due = []
+        self._drop_stale()
+        while self._heap and self._heap[0][0] <= now:
+            _, _, key = heapq.heappop(self._heap)
+            del self._timers[key]
+            due.append(key)
+            self._drop_stale()
+        return due
+
+    async def wait(self) -> List[str]:
+        """
+        Sleep until a timer is due or an event is notified.
+
+        Returns:
+            Notified event reasons followed by due timer keys (never empty)
+        """
+        while True:
+            self._event.clear()
+            reasons = self._events + self.pop_due(self._clock())
+            self._events = []
+            if reasons:
+                return reasons
+
+            timeout = self.max_wait_seconds
+            next_due = self.next_due()
+            if next_due is not None:
+                timeout = min(timeout, max(0.0, (next_due - self._clock()).total_seconds()))
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _drop_stale(self):
+        # Heap entries whose key was rescheduled or cancelled
+        while self._heap:
+            when, seq, key = self._heap[0]
+            if self._timers.get(key) == (when, seq):
+                return
+            heapq.heappop(self._heap)
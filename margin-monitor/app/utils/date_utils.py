@@ -2,7 +2,8 @@
 Margin Monitor - Date/Time Utilities
 """
 
-from datetime import datetime, date
+from datetime import datetime, date, time, timedelta
+from typing import Tuple
 import pytz
 
 # Indian Standard Time
@@ -19,6 +20,17 @@ def today_ist() -> date:
     return now_ist().date()
 
 
+def day_range_ist(d: date) -> Tuple[datetime, datetime]:
+    """
+    Get [start, end) of an IST calendar day as tz-aware datetimes.
+
+    Used as a timestamp bound on snapshot queries so Postgres prunes to the
+    monthly partition containing the day.
+    """
+    start = IST.localize(datetime.combine(d, time.min))
+    return start, IST.localize(datetime.combine(d + timedelta(days=1), time.min))
+
+
 def get_day_of_week(d: date) -> int:
     """Get day of week (0=Monday, 4=Friday)."""
     return d.weekday()
@@ -0,0 +1,102 @@
+"""
+Margin Monitor - Time Series Downsampling
+
+Picks a subset of points that preserves the visual shape of a series, so
+charts get a fixed number of points however many snapshots a range holds.
+
+- lttb: Largest-Triangle-Three-Buckets (Steinarsson, 2013) - keeps the point
+  in each bucket forming the largest triangle with its neighbours
+- minmax: keeps the minimum and maximum of each bucket - never hides a spike
+"""
+
+from typing import Sequence
+
+import numpy as np
+
+DOWNSAMPLE_METHODS = ('lttb', 'minmax')
+
+
+def lttb_indices(x: Sequence[float], y: Sequence[float], threshold: int) -> np.ndarray:
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    Args:
+        x: Monotonic x values (e.g. epoch seconds)
+        y: Values
+        threshold: Number of points to keep
+
+    Returns:
+        Sorted indices; all indices when the series already fits.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # First and last points are always kept; the rest split into threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    kept = np.empty(threshold, dtype=int)
+    kept[0] = 0
+    kept[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point for the final bucket)
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean() if next_end > end else x[n - 1]
+        avg_y = y[end:next_end].mean() if next_end > end else y[n - 1]
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+
+    return kept
+
+
+def minmax_indices(y: Sequence[float], threshold: int) -> np.ndarray:
+    """
+    Indices of each bucket's minimum and maximum.
+
+    Args:
+        y: Values
+        threshold: Approximate number of points to keep (two per bucket)
+
+    Returns:
+        Sorted unique indices, including the first and last point.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if threshold >= n or threshold < 4:
+        return np.arange(n)
+
+    buckets = (threshold - 2) // 2
+    edges = np.linspace(1, n - 1, buckets + 1).astype(int)
+    kept = [0, n - 1]
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end > start:
+            kept.append(start + int(np.argmin(y[start:end])))
+            kept.append(start + int(np.argmax(y[start:end])))
+    return np.unique(kept)
+
+
+def downsample_indices(
+    x: Sequence[float],
+    y: Sequence[float],
+    threshold: int,
+    method: str = 'lttb'
+) -> np.ndarray:
+    """
+    Indices to keep when reducing a series to about threshold points.
+
+    Raises:
+        ValueError: Unknown method
+    """
+    if method == 'lttb':
+        return lttb_indices(x, y, threshold)
+    if method == 'minmax':
+        return minmax_indices(y, threshold)
+    raise ValueError(f"Unknown downsampling method: {method}")
@@ -12,7 +12,8 @@ Pattern: ^(NIFTY|SENSEX|BANKNIFTY|FINNIFTY)(DD)(MMM)(YY)(STRIKE)(CE|PE)$
 """
 
 import re
-from datetime import datetime
+from datetime import datetime, date
+from functools import lru_cache
 from typing import Optional, NamedTuple
 
 
@@ -40,10 +41,14 @@ SYMBOL_PATTERN = re.compile(
 )
 
 
+@lru_cache(maxsize=4096)
 def parse_symbol(symbol: str) -> Optional[ParsedSymbol]:
     """
     Parse option symbol to extract components.
 
+    Memoized: the same few hundred symbols are re-parsed on every 5-minute
+    snapshot, and ParsedSymbol is immutable so cached results are safe to share.
+
     Args:
         symbol: Trading symbol (e.g., NIFTY30DEC2525800PE)
 
@@ -95,6 +100,23 @@ def parse_symbol(symbol: str) -> Optional[ParsedSymbol]:
     )
 
 
+@lru_cache(maxsize=256)
+def expiry_as_date(expiry_date: str) -> date:
+    """
+    Convert a ParsedSymbol.expiry_date string (YYYY-MM-DD) to a date (memoized).
+
+    Args:
+        expiry_date: Expiry date string, e.g. '2025-12-30'
+
+    Returns:
+        datetime.date
+
+    Raises:
+        ValueError: If the string is not a valid YYYY-MM-DD date
+    """
+    return datetime.strptime(expiry_date, '%Y-%m-%d').date()
+
+
 def is_matching_expiry(symbol: str, target_expiry: str) -> bool:
     """
     Check if symbol matches the target expiry date.
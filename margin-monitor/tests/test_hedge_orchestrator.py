@@ -302,3 +302,172 @@ class TestMonitoringLoop:
 
                 # Outside market hours, _check_and_act returns early
                 # so we verify the check doesn't proceed to hedge logic
+
+
+# ============================================================
+# Dry Run SPAN Estimate Tests
+# ============================================================
+
+class TestSimulatedReduction:
+    """Tests for dry-run margin reduction from simulated hedges."""
+
+    FILTERED = {
+        'short_positions': [
+            {'symbol': 'NIFTY06JAN2525000CE', 'quantity': -650, 'ltp': 150.0},
+            {'symbol': 'NIFTY06JAN2525000PE', 'quantity': -650, 'ltp': 140.0},
+        ],
+        'long_positions': [],
+        'closed_positions': [],
+        'excluded_positions': [],
+    }
+
+    @pytest.mark.asyncio
+    async def test_without_estimator_returns_none(self, orchestrator):
+        """Falls back to the coverage model when no estimator is configured."""
+        assert await orchestrator._estimate_simulated_reduction(self.FILTERED) is None
+
+    @pytest.mark.asyncio
+    async def test_span_reduction_from_db_hedge_legs(self, orchestrator, mock_hedge_selector):
+        """Simulated CE+PE wings reduce estimated margin; one wing alone does not."""
+        from app.services.span_margin import SpanMarginEstimator
+        orchestrator.span_estimator = SpanMarginEstimator()
+        mock_hedge_selector.get_spot_price = AsyncMock(return_value=25000.0)
+
+        pair = [
+            {'strike': 25500, 'option_type': 'CE', 'quantity': 650},
+            {'strike': 24500, 'option_type': 'PE', 'quantity': 650},
+        ]
+        with patch.object(orchestrator, '_get_db_hedge_legs', AsyncMock(return_value=pair)):
+            paired = await orchestrator._estimate_simulated_reduction(self.FILTERED)
+        with patch.object(orchestrator, '_get_db_hedge_legs', AsyncMock(return_value=pair[:1])):
+            one_sided = await orchestrator._estimate_simulated_reduction(self.FILTERED)
+
+        assert 0.2 < paired < 0.8
+        assert one_sided == pytest.approx(0.0, abs=0.02)
+
+    def test_book_margin_uses_total_used(self, orchestrator):
+        """SPAN calibration uses total used margin, not intraday net of baseline."""
+        margin_data = {
+            'used_margin': 9_000_000.0, 'intraday_margin': 4_000_000.0,
+            'baseline': 3_000_000.0, 'excluded': 2_000_000.0,
+        }
+
+        assert orchestrator._book_margin(margin_data) == 7_000_000.0
+        assert orchestrator._book_margin(margin_data, simulated_reduction=1_000_000.0) == 6_000_000.0
+        assert orchestrator._book_margin({'intraday_margin': 4_000_000.0}) is None
+
+
+# ============================================================
+# Event-Driven Timer Tests
+# ============================================================
+
+class TestEventDrivenTimers:
+    """Tests for wake-up timers built from today's schedule."""
+
+    NOW = datetime(2025, 1, 2, 9, 0, 0)
+
+    def _now(self):
+        import pytz
+        return pytz.timezone('Asia/Kolkata').localize(self.NOW)
+
+    @pytest.mark.asyncio
+    async def test_entry_timers_at_lookahead_and_post_entry(self, orchestrator, mock_strategy_scheduler):
+        from app.services.strategy_scheduler import ScheduledEntry
+        mock_strategy_scheduler.get_today_schedule = AsyncMock(return_value=[
+            ScheduledEntry("P1", time(8, 0), None, "NIFTY", "0DTE"),   # Long past
+            ScheduledEntry("P2", time(9, 16), None, "NIFTY", "0DTE"),
+        ])
+
+        with patch.object(orchestrator, '_now_ist', self._now):
+            await orchestrator._schedule_entry_timers()
+            await orchestrator._schedule_entry_timers()  # Once per day
+            due = orchestrator._wakeups.pop_due(self._now() + timedelta(hours=1))
+
+        assert mock_strategy_scheduler.get_today_schedule.await_count == 1
+        assert due == ["pre-entry:09:16:00", "post-entry:09:16:00"]
+        assert len(orchestrator._wakeups) == 0
+
+    @pytest.mark.asyncio
+    async def test_pre_entry_timer_is_exact(self, orchestrator, mock_strategy_scheduler):
+        from app.services.strategy_scheduler import ScheduledEntry
+        mock_strategy_scheduler.get_today_schedule = AsyncMock(return_value=[
+            ScheduledEntry("P2", time(9, 16), None, "NIFTY", "0DTE"),
+        ])
+
+        with patch.object(orchestrator, '_now_ist', self._now):
+            await orchestrator._schedule_entry_timers()
+
+        lookahead = timedelta(minutes=orchestrator.config.lookahead_minutes)
+        assert orchestrator._wakeups.next_due() == self._now() + timedelta(minutes=16) - lookahead
+
+    def test_periodic_waits_for_market_open(self, orchestrator):
+        with patch.object(orchestrator, '_now_ist', self._now):
+            orchestrator._schedule_next_periodic()
+        assert orchestrator._wakeups.next_due() == self._now() + timedelta(minutes=15)
+
+    def test_failed_check_retries_instead_of_spinning(self, orchestrator):
+        with patch.object(orchestrator, '_is_market_hours', return_value=True):
+            orchestrator._last_full_check = None
+            orchestrator._schedule_next_periodic()
+        delay = (orchestrator._wakeups.next_due() - orchestrator._now_ist()).total_seconds()
+        assert 0 < delay <= orchestrator._poll_interval
+
+    @pytest.mark.asyncio
+    async def test_external_event_runs_check(self, orchestrator):
+        """wake() forces a check cycle even with no timer due."""
+        orchestrator._last_full_check = orchestrator._now_ist()
+        with patch.object(orchestrator, '_is_market_hours', return_value=True), \
+             patch.object(orchestrator, '_is_auto_hedge_enabled', AsyncMock(return_value=False)) as enabled:
+            await orchestrator._check_and_act([])
+            assert enabled.await_count == 0
+
+            orchestrator.wake("toggle")
+            reasons = await orchestrator._wakeups.wait()
+            await orchestrator._check_and_act(reasons)
+            assert enabled.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_schedule_change_rebuilds_timers(self, orchestrator, mock_strategy_scheduler):
+        from app.services.strategy_scheduler import ScheduledEntry
+        mock_strategy_scheduler.get_today_schedule = AsyncMock(return_value=[
+            ScheduledEntry("P2", time(9, 16), None, "NIFTY", "0DTE"),
+        ])
+
+        with patch.object(orchestrator, '_now_ist', self._now):
+            await orchestrator._schedule_entry_timers()
+            mock_strategy_scheduler.get_today_schedule.return_value = [
+                ScheduledEntry("P3", time(9, 40), None, "NIFTY", "0DTE"),
+            ]
+            orchestrator.wake("schedule")
+            await orchestrator._schedule_entry_timers()
+            due = orchestrator._wakeups.pop_due(self._now() + timedelta(hours=1))
+
+        mock_strategy_scheduler.get_today_schedule.assert_awaited_with(force_refresh=True)
+        assert "pre-entry:09:16:00" not in due and "post-entry:09:16:00" not in due
+        assert "pre-entry:09:40:00" in due and "post-entry:09:40:00" in due
+
+    @pytest.mark.asyncio
+    async def test_position_change_wakes_orchestrator(self, orchestrator, monkeypatch):
+        import importlib
+        broker = importlib.import_module('app.services.openalgo_service')  # the module, not the instance
+        monkeypatch.setattr(broker, '_event_listeners', [])
+        monkeypatch.setattr(broker, '_position_signature', None)
+        broker.add_event_listener(orchestrator.wake)
+        positions = [{'symbol': 'NIFTY25JAN23500CE', 'quantity': -75}]
+
+        broker._check_positions_changed(positions)
+        broker._check_positions_changed(positions)
+        assert orchestrator._wakeups._events == []
+
+        broker._check_positions_changed(positions + [{'symbol': 'NIFTY25JAN23800CE', 'quantity': 75}])
+        assert await orchestrator._wakeups.wait() == ["positions"]
+
+    @pytest.mark.asyncio
+    async def test_position_watch_reads_positions_and_rearms(self, orchestrator):
+        with patch.object(orchestrator, '_is_market_hours', return_value=True), \
+             patch.object(orchestrator, '_get_positions', AsyncMock(return_value=[])) as get_positions:
+            await orchestrator._watch_positions()
+
+        get_positions.assert_awaited_once()
+        delay = (orchestrator._wakeups.next_due() - orchestrator._now_ist()).total_seconds()
+        assert 0 < delay <= orchestrator._poll_interval
@@ -0,0 +1,205 @@
+"""
+Tests for the historical hedge replay
+
+Tests cover:
+- Simulated broker positions, fills and margin
+- Replaying a synthetic day through the orchestrator
+- Parameter grid, parallel runs and summary
+- Loading replay days from stored snapshots
+"""
+
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.database import Base
+from app.models.db_models import SCHEMA, DailyConfig, MarginSnapshot, PositionSnapshot
+from app.models.hedge_models import HEDGE_SCHEMA, DailySession, HedgeTransaction, StrategySchedule
+from app.services.hedge_replay import (
+    ReplayDay, ReplaySnapshot, ReplayParams, SimulatedBroker, SimulatedClock,
+    replay_day, run_replay, parameter_grid, summarize, load_replay_days, HEDGE_TABLES
+)
+from app.services.strategy_scheduler import ScheduledEntry
+from app.utils.date_utils import IST
+
+DAY = date(2025, 12, 30)  # Tuesday
+BUDGET = 10_000_000.0
+
+
+def at(hour, minute):
+    return IST.localize(datetime.combine(DAY, time(hour, minute)))
+
+
+def straddle(lots):
+    qty = -65 * lots
+    return [
+        {"symbol": "NIFTY30DEC2525000CE", "exchange": "NFO", "product": "NRML",
+         "quantity": qty, "average_price": 100.0, "ltp": 100.0, "pnl": 0.0},
+        {"symbol": "NIFTY30DEC2525000PE", "exchange": "NFO", "product": "NRML",
+         "quantity": qty, "average_price": 100.0, "ltp": 100.0, "pnl": 0.0},
+    ]
+
+
+def make_day(peak_util=98.0, mid_util=75.0):
+    """Utilization steps up at two entries, 5-minute snapshots 09:15-15:30."""
+    snapshots = []
+    t = at(9, 15)
+    while t <= at(15, 30):
+        if t < at(9, 30):
+            util, lots = 40.0, 4
+        elif t < at(11, 0):
+            util, lots = mid_util, 8
+        else:
+            util, lots = peak_util, 10
+        snapshots.append(ReplaySnapshot(t, BUDGET * util / 100, straddle(lots)))
+        t += timedelta(minutes=5)
+
+    return ReplayDay(
+        session_date=DAY, index_name="NIFTY", expiry_date=DAY, expiry_type="0DTE",
+        num_baskets=10, total_budget=BUDGET,
+        schedule=[
+            ScheduledEntry("P1", time(9, 30), None, "NIFTY", "0DTE"),
+            ScheduledEntry("P2", time(11, 0), None, "NIFTY", "0DTE"),
+        ],
+        snapshots=snapshots
+    )
+
+
+class TestSimulatedBroker:
+    """Tests for the snapshot-driven broker."""
+
+    @pytest.mark.asyncio
+    async def test_positions_follow_clock(self):
+        day = make_day()
+        clock = SimulatedClock(at(9, 15))
+        broker = SimulatedBroker(day, clock)
+
+        assert (await broker.get_positions())[0]["quantity"] == -260
+        clock.advance_to(at(11, 2))
+        assert (await broker.get_positions())[0]["quantity"] == -650
+
+    @pytest.mark.asyncio
+    async def test_hedge_fill_lowers_margin(self):
+        day = make_day()
+        clock = SimulatedClock(at(12, 0))
+        broker = SimulatedBroker(day, clock)
+        before = broker.margin_at(clock.now())["utilization_pct"]
+
+        await broker.place_order("NIFTY30DEC2525300CE", "NFO", "BUY", 650, price=5.0)
+        await broker.place_order("NIFTY30DEC2524700PE", "NFO", "BUY", 650, price=5.0)
+
+        assert before == pytest.approx(98.0)
+        assert broker.margin_at(clock.now())["utilization_pct"] < before
+        assert len(await broker.get_positions()) == 4
+        # Earlier snapshots are unaffected
+        assert broker.margin_at(at(11, 30))["utilization_pct"] == pytest.approx(98.0)
+
+    def test_recorded_hedges_stripped(self):
+        day = make_day()
+        hedges = [
+            {"symbol": symbol, "exchange": "NFO", "product": "NRML",
+             "quantity": 650, "average_price": 5.0, "ltp": 5.0, "pnl": 0.0}
+            for symbol in ("NIFTY30DEC2525300CE", "NIFTY30DEC2524700PE")
+        ]
+        for snapshot in day.snapshots:
+            snapshot.positions.extend(hedges)
+        day.recorded_hedge_symbols = [h["symbol"] for h in hedges]
+        broker = SimulatedBroker(day, SimulatedClock(at(12, 0)))
+
+        assert len(broker.positions_at(at(12, 0))) == 2
+        # Recorded margin included the hedges' benefit; replay starts unhedged
+        assert broker.margin_at(at(12, 0))["utilization_pct"] > 98.0
+
+
+class TestReplay:
+    """Tests for replaying days through the orchestrator."""
+
+    @pytest.mark.asyncio
+    async def test_high_utilization_day_buys_hedges(self):
+        day = make_day()
+        result = await replay_day(day, ReplayParams("default"), breach_pct=95.0)
+        unhedged_breaches = sum(s.intraday_margin / BUDGET >= 0.95 for s in day.snapshots)
+
+        assert result.unhedged_peak_utilization == pytest.approx(98.0)
+        assert result.hedge_orders > 0
+        assert result.hedge_cost > 0
+        # The jump at the 11:00 entry is only hedged after it lands
+        assert result.breach_count < unhedged_breaches
+
+    @pytest.mark.asyncio
+    async def test_quiet_day_buys_nothing(self):
+        result = await replay_day(make_day(peak_util=45.0, mid_util=35.0), ReplayParams("default"))
+
+        assert result.hedge_orders == 0
+        assert result.breach_count == 0
+
+    def test_grid_runs_across_processes(self):
+        params = parameter_grid({"critical_threshold": [95.0, 99.0]})
+        results = run_replay([make_day()], params, processes=2)
+
+        assert [r.params for r in results] == ["critical_threshold=95.0", "critical_threshold=99.0"]
+        summary = summarize(results)
+        assert summary["critical_threshold=95.0"]["days"] == 1
+        # A threshold above the day's peak never triggers reactive hedging
+        assert summary["critical_threshold=99.0"]["hedge_orders"] <= summary["critical_threshold=95.0"]["hedge_orders"]
+
+
+class TestLoadReplayDays:
+    """Loading days from the margin and auto_hedge tables."""
+
+    @pytest.mark.asyncio
+    async def test_load_from_snapshots(self):
+        engine = create_async_engine("sqlite+aiosqlite://").execution_options(
+            schema_translate_map={SCHEMA: None, HEDGE_SCHEMA: None}
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[
+                DailyConfig.__table__, MarginSnapshot.__table__, PositionSnapshot.__table__, *HEDGE_TABLES
+            ])
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+        async with session_maker() as db:
+            config = DailyConfig(
+                date=DAY, day_of_week=1, day_name="Tuesday", index_name="NIFTY",
+                expiry_date=DAY, num_baskets=10, total_budget=BUDGET, baseline_margin=0.0
+            )
+            db.add(config)
+            db.add(StrategySchedule(
+                day_of_week="Tuesday", index_name="NIFTY", expiry_type="0DTE",
+                portfolio_name="P1", entry_time=time(9, 30), is_active=True
+            ))
+            session = DailySession(
+                session_date=DAY, day_of_week="Tuesday", index_name="NIFTY", expiry_type="0DTE",
+                expiry_date=DAY, num_baskets=10, total_budget=BUDGET
+            )
+            db.add(session)
+            await db.flush()
+            db.add(HedgeTransaction(
+                session_id=session.id, action="BUY", trigger_reason="TEST", symbol="NIFTY30DEC2525300CE",
+                exchange="NFO", strike=25300, option_type="CE", quantity=650, lots=10,
+                order_price=5.0, total_cost=3250.0, utilization_before=90.0, order_status="SUCCESS"
+            ))
+            snapshot = MarginSnapshot(
+                config_id=config.id, timestamp=at(9, 20), total_margin_used=4e6, available_cash=0.0,
+                collateral=0.0, baseline_margin=0.0, intraday_margin=4e6, utilization_pct=40.0
+            )
+            db.add(snapshot)
+            await db.flush()
+            db.add(PositionSnapshot(
+                snapshot_id=snapshot.id, symbol="NIFTY30DEC2525000CE", exchange="NFO", product="NRML",
+                quantity=-260, average_price=100.0, ltp=100.0, pnl=0.0, position_type="SHORT",
+                option_type="CE", strike_price=25000, expiry_date=DAY
+            ))
+            await db.commit()
+
+        days = await load_replay_days(session_maker, DAY, DAY)
+        await engine.dispose()
+
+        assert len(days) == 1
+        day = days[0]
+        assert day.expiry_type == "0DTE"
+        assert [e.portfolio_name for e in day.schedule] == ["P1"]
+        assert day.snapshots[0].positions[0]["quantity"] == -260
+        assert day.recorded_hedge_symbols == ["NIFTY30DEC2525300CE"]
+        assert day.recorded_hedge_cost == 3250.0
@@ -398,3 +398,87 @@ class TestFindBestSingleHedge:
         )
 
         assert result is None
+
+
+# ============================================================
+# SPAN Marginal Benefit Selection Tests
+# ============================================================
+
+class TestSpanSelection:
+    """Tests for select_optimal_hedges with a SpanMarginEstimator."""
+
+    @pytest.fixture
+    def span_selector(self, mock_openalgo, mock_margin_calc):
+        from app.services.span_margin import SpanMarginEstimator
+        return HedgeStrikeSelectorService(
+            openalgo=mock_openalgo,
+            margin_calculator=mock_margin_calc,
+            span_estimator=SpanMarginEstimator()
+        )
+
+    @pytest.mark.asyncio
+    async def test_selects_ce_pe_pair_for_straddle(self, span_selector):
+        """A one-sided hedge does not help a straddle, so a pair is picked."""
+        short_positions = [
+            {"symbol": "NIFTY30DEC2524500CE", "quantity": -650},
+            {"symbol": "NIFTY30DEC2524500PE", "quantity": -650}
+        ]
+
+        selection = await span_selector.select_optimal_hedges(
+            index=IndexName.NIFTY,
+            expiry_type=ExpiryType.ZERO_DTE,
+            margin_reduction_needed=50000,
+            short_positions=short_positions,
+            num_baskets=10
+        )
+
+        selected_types = sorted(h.option_type for h in selection.selected)
+        assert selected_types[:2] == ['CE', 'PE']
+        assert selection.total_margin_benefit > 0
+        assert selection.fully_covered
+
+    @pytest.mark.asyncio
+    async def test_respects_capacity(self, span_selector):
+        """Selected quantity per side never exceeds remaining capacity."""
+        short_positions = [
+            {"symbol": "NIFTY30DEC2524500CE", "quantity": -650},
+            {"symbol": "NIFTY30DEC2524500PE", "quantity": -650}
+        ]
+        capacity = {
+            'is_fully_hedged': False,
+            'remaining_ce_capacity': 130, 'remaining_pe_capacity': 130,
+            'short_ce_qty': 650, 'short_pe_qty': 650, 'long_ce_qty': 520, 'long_pe_qty': 520
+        }
+
+        selection = await span_selector.select_optimal_hedges(
+            index=IndexName.NIFTY,
+            expiry_type=ExpiryType.ZERO_DTE,
+            margin_reduction_needed=10_000_000,
+            short_positions=short_positions,
+            num_baskets=10,
+            hedge_capacity=capacity
+        )
+
+        for side in ('CE', 'PE'):
+            assert sum(h.total_lots * 65 for h in selection.selected if h.option_type == side) <= 130
+        assert not selection.fully_covered
+
+    @pytest.mark.asyncio
+    async def test_calibrates_to_broker_margin(self, span_selector):
+        """Benefit scales with the broker margin passed for the book."""
+        short_positions = [
+            {"symbol": "NIFTY30DEC2524500CE", "quantity": -650},
+            {"symbol": "NIFTY30DEC2524500PE", "quantity": -650}
+        ]
+        kwargs = dict(
+            index=IndexName.NIFTY,
+            expiry_type=ExpiryType.ZERO_DTE,
+            margin_reduction_needed=1,
+            short_positions=short_positions,
+            num_baskets=10
+        )
+
+        base = await span_selector.select_optimal_hedges(**kwargs, current_margin=1_000_000)
+        doubled = await span_selector.select_optimal_hedges(**kwargs, current_margin=2_000_000)
+
+        assert doubled.total_margin_benefit == pytest.approx(2 * base.total_margin_benefit)
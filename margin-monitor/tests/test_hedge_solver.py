@@ -0,0 +1,243 @@
+"""
+Tests for HedgeBasketSolver
+
+Tests cover:
+- Single-side bounded knapsack against brute force
+- Per-strike lot bounds and side capacity
+- Infeasible targets
+- SPAN side split for a short straddle
+- Selector solver mode and 200-strike timing
+"""
+
+import itertools
+import time
+
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.models.hedge_constants import IndexName, ExpiryType
+from app.services.hedge_selector import HedgeStrikeSelectorService
+from app.services.hedge_solver import HedgeBasketSolver
+from app.services.span_margin import SpanMarginEstimator, OptionBook
+
+
+LOT = 65
+SPOT = 25000.0
+T = 1 / 365
+
+
+def brute_force(cost, gain, bounds, target, capacity=None):
+    """Cheapest lot vector reaching target, or None."""
+    best = None
+    for combo in itertools.product(*[range(b + 1) for b in bounds]):
+        combo = np.array(combo)
+        if capacity is not None and combo.sum() > capacity:
+            continue
+        if (combo * gain).sum() >= target:
+            total = (combo * cost).sum()
+            if best is None or total < best:
+                best = total
+    return best
+
+
+@pytest.fixture
+def solver():
+    return HedgeBasketSolver()
+
+
+# ============================================================
+# Single Side Tests
+# ============================================================
+
+class TestSolveSide:
+    """Tests for the bounded knapsack on one side."""
+
+    def test_matches_brute_force(self, solver):
+        """Cost is within bucket rounding of the exact optimum."""
+        rng = np.random.default_rng(7)
+        for trial in range(60):
+            cost = rng.uniform(1, 10, 4)
+            gain = rng.uniform(0, 10, 4)
+            bounds = rng.integers(0, 4, 4)
+            target = rng.uniform(1, 30)
+            capacity = int(rng.integers(1, 8)) if trial % 2 else None
+
+            result = solver.solve_side(cost, gain, bounds, target, capacity)
+            best = brute_force(cost, gain, bounds, target, capacity)
+
+            if best is None:
+                assert not result.feasible
+            else:
+                assert result.feasible
+                assert result.gain >= target
+                assert result.cost <= best * 1.1 + 1e-9
+            assert np.all(result.lots <= bounds)
+            if capacity is not None:
+                assert result.lots.sum() <= capacity
+
+    def test_prefers_cheaper_benefit_not_cheaper_premium(self, solver):
+        """A pricier strike with much more gain per rupee wins."""
+        result = solver.solve_side(
+            cost_per_lot=np.array([100.0, 300.0]),
+            gain_per_lot=np.array([1000.0, 6000.0]),
+            max_lots=np.array([10, 10]),
+            target_gain=12000
+        )
+        assert result.lots.tolist() == [0, 2]
+
+    def test_infeasible_returns_max_reachable_gain(self, solver):
+        """Capacity too small: take the highest gain reachable."""
+        result = solver.solve_side(
+            cost_per_lot=np.array([100.0, 200.0]),
+            gain_per_lot=np.array([1000.0, 3000.0]),
+            max_lots=np.array([5, 5]),
+            target_gain=50000,
+            capacity_lots=3
+        )
+        assert not result.feasible
+        assert result.lots.tolist() == [0, 3]
+
+    def test_zero_target_selects_nothing(self, solver):
+        result = solver.solve_side(np.array([1.0]), np.array([1.0]), np.array([1]), 0)
+        assert result.feasible and result.lots.sum() == 0
+
+
+# ============================================================
+# SPAN Basket Tests
+# ============================================================
+
+class TestSolveSpan:
+    """Tests for the SPAN-driven CE/PE split."""
+
+    def test_straddle_needs_both_sides(self, solver):
+        """Reduction on a straddle is reached with CE and PE lots, within capacity."""
+        estimator = SpanMarginEstimator()
+        book = OptionBook.from_positions([
+            {"symbol": "NIFTY30DEC2525000CE", "quantity": -650, "ltp": 120.0},
+            {"symbol": "NIFTY30DEC2525000PE", "quantity": -650, "ltp": 115.0},
+        ])
+        strikes = np.r_[np.arange(25300, 26050, 50), np.arange(24700, 23950, -50)]
+        is_call = strikes > SPOT
+        legs = OptionBook.empty().add(strikes, is_call, [LOT] * len(strikes))
+        cost_per_lot = np.linspace(6, 2, len(strikes)) * LOT
+        base = estimator.estimate(IndexName.NIFTY, book, SPOT, T).total
+
+        solution = solver.solve_span(
+            estimator, IndexName.NIFTY, book, legs, cost_per_lot,
+            max_lots=np.full(len(strikes), 10),
+            capacity_lots={'CE': 10, 'PE': 10},
+            spot=SPOT, t=T, margin_reduction_needed=0.3 * base
+        )
+
+        assert solution.fully_covered
+        assert solution.lots[is_call].sum() > 0 and solution.lots[~is_call].sum() > 0
+        assert solution.lots[is_call].sum() <= 10 and solution.lots[~is_call].sum() <= 10
+        assert solution.benefit >= 0.3 * base
+
+
+# ============================================================
+# Selector Solver Mode Tests
+# ============================================================
+
+@pytest.fixture
+def mock_openalgo():
+    mock = AsyncMock()
+    mock.get_quotes = AsyncMock(return_value={"ltp": 24500})
+    mock.get_positions = AsyncMock(return_value=[])
+    mock.get_option_chain = AsyncMock(return_value=[])
+    return mock
+
+
+@pytest.fixture
+def mock_margin_calc():
+    mock = MagicMock()
+    mock.estimate_hedge_margin_benefit = MagicMock(return_value=100000)
+    return mock
+
+
+SHORTS = [
+    {"symbol": "NIFTY30DEC2524500CE", "quantity": -650},
+    {"symbol": "NIFTY30DEC2524500PE", "quantity": -650}
+]
+
+
+class TestSelectorSolverMode:
+    """Tests for select_optimal_hedges with a solver."""
+
+    @pytest.mark.asyncio
+    async def test_linear_mode_covers_each_side(self, mock_openalgo, mock_margin_calc):
+        """Without SPAN, each side covers its share at minimum premium."""
+        selector = HedgeStrikeSelectorService(
+            openalgo=mock_openalgo, margin_calculator=mock_margin_calc, solver=HedgeBasketSolver()
+        )
+
+        selection = await selector.select_optimal_hedges(
+            index=IndexName.NIFTY,
+            expiry_type=ExpiryType.ZERO_DTE,
+            margin_reduction_needed=80000,
+            short_positions=SHORTS,
+            num_baskets=10,
+            allocation_mode='equal'
+        )
+
+        assert selection.fully_covered
+        for side in ('CE', 'PE'):
+            side_benefit = sum(h.total_lots * 5000 for h in selection.selected if h.option_type == side)
+            assert side_benefit >= 40000
+
+    @pytest.mark.asyncio
+    async def test_span_mode_respects_capacity(self, mock_openalgo, mock_margin_calc):
+        """SPAN solver never exceeds remaining hedge capacity."""
+        selector = HedgeStrikeSelectorService(
+            openalgo=mock_openalgo, margin_calculator=mock_margin_calc,
+            span_estimator=SpanMarginEstimator(), solver=HedgeBasketSolver()
+        )
+        capacity = {
+            'is_fully_hedged': False,
+            'remaining_ce_capacity': 260, 'remaining_pe_capacity': 195,
+            'short_ce_qty': 650, 'short_pe_qty': 650, 'long_ce_qty': 390, 'long_pe_qty': 455
+        }
+
+        selection = await selector.select_optimal_hedges(
+            index=IndexName.NIFTY,
+            expiry_type=ExpiryType.ZERO_DTE,
+            margin_reduction_needed=10_000_000,
+            short_positions=SHORTS,
+            num_baskets=10,
+            hedge_capacity=capacity
+        )
+
+        assert sum(h.total_lots for h in selection.selected if h.option_type == 'CE') * LOT <= 260
+        assert sum(h.total_lots for h in selection.selected if h.option_type == 'PE') * LOT <= 195
+        assert not selection.fully_covered
+
+    @pytest.mark.asyncio
+    async def test_200_strike_chain_within_cycle(self, mock_openalgo, mock_margin_calc):
+        """Scoring and solving a 200-strike ladder fits well inside a 30s cycle."""
+        config = MagicMock(
+            min_premium=0.0, max_premium=1000.0,
+            min_otm_distance={"NIFTY": 50}, max_otm_distance={"NIFTY": 5000}
+        )
+        selector = HedgeStrikeSelectorService(
+            openalgo=mock_openalgo, margin_calculator=mock_margin_calc, config=config,
+            span_estimator=SpanMarginEstimator(), solver=HedgeBasketSolver()
+        )
+
+        start = time.perf_counter()
+        selection = await selector.select_optimal_hedges(
+            index=IndexName.NIFTY,
+            expiry_type=ExpiryType.ZERO_DTE,
+            margin_reduction_needed=200000,
+            short_positions=SHORTS,
+            num_baskets=10,
+            hedge_capacity={
+                'is_fully_hedged': False,
+                'remaining_ce_capacity': 650, 'remaining_pe_capacity': 650,
+                'short_ce_qty': 650, 'short_pe_qty': 650, 'long_ce_qty': 0, 'long_pe_qty': 0
+            }
+        )
+        elapsed = time.perf_counter() - start
+
+        assert len(selection.candidates) == 200
+        assert elapsed < 5.0
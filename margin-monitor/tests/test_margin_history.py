@@ -0,0 +1,267 @@
+"""
+Tests for downsampled margin history and continuous aggregates
+
+Tests cover:
+- LTTB and min/max downsampling
+- 15-minute and daily rollups maintained on snapshot capture
+- Weekday rollups maintained on EOD summary (including regeneration)
+- Day-of-week analytics combining rollups with the partial leading month
+- Range history resolution and point count
+"""
+
+from contextlib import asynccontextmanager
+from datetime import date, datetime, time, timedelta
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from app.database import Base
+from app.models.db_models import (
+    SCHEMA, DailyConfig, MarginSnapshot, PositionSnapshot, DailySummary, MarginRollup, WeekdayRollup
+)
+from app.services.analytics_service import AnalyticsService, bucket_start
+from app.services.margin_service import MarginService
+from app.utils.date_utils import IST
+from app.utils.downsample import lttb_indices, minmax_indices, downsample_indices
+
+DAY = date(2025, 12, 30)  # Tuesday
+
+
+def at(d, hour, minute):
+    return IST.localize(datetime.combine(d, time(hour, minute)))
+
+
+@asynccontextmanager
+async def sqlite_sessions():
+    """In-memory SQLite with the margin_monitor schema prefix removed."""
+    engine = create_async_engine('sqlite+aiosqlite://').execution_options(
+        schema_translate_map={SCHEMA: None}
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[
+            DailyConfig.__table__, MarginSnapshot.__table__, PositionSnapshot.__table__,
+            DailySummary.__table__, MarginRollup.__table__, WeekdayRollup.__table__
+        ])
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def make_config(db, d=DAY):
+    config = DailyConfig(
+        date=d, day_of_week=d.weekday(), day_name=d.strftime('%A'), index_name='NIFTY',
+        expiry_date=d, num_baskets=10, total_budget=10000000.0, baseline_margin=0.0,
+    )
+    db.add(config)
+    await db.flush()
+    return config
+
+
+def snapshot(config, timestamp, utilization):
+    return MarginSnapshot(
+        config_id=config.id, timestamp=timestamp, total_margin_used=0.0, available_cash=0.0,
+        collateral=0.0, baseline_margin=0.0, intraday_margin=utilization * 100000,
+        utilization_pct=utilization, short_positions_count=2, long_positions_count=0,
+        total_hedge_cost=0.0, total_pnl=utilization,
+    )
+
+
+# ============================================================
+# Downsampling Tests
+# ============================================================
+
+class TestDownsample:
+    """Tests for LTTB and min/max point selection."""
+
+    def test_lttb_keeps_endpoints_and_count(self):
+        x = np.arange(1000, dtype=float)
+        y = np.sin(x / 50)
+
+        keep = lttb_indices(x, y, 100)
+
+        assert len(keep) == 100
+        assert keep[0] == 0 and keep[-1] == 999
+        assert np.all(np.diff(keep) > 0)
+
+    def test_lttb_keeps_spike(self):
+        y = np.zeros(500)
+        y[237] = 100.0
+
+        keep = lttb_indices(np.arange(500), y, 20)
+
+        assert 237 in keep
+
+    def test_minmax_keeps_both_extremes(self):
+        y = np.zeros(500)
+        y[100], y[400] = 50.0, -50.0
+
+        keep = minmax_indices(y, 20)
+
+        assert 100 in keep and 400 in keep
+        assert len(keep) <= 20
+
+    def test_short_series_unchanged(self):
+        assert downsample_indices([1, 2, 3], [1, 2, 3], 10).tolist() == [0, 1, 2]
+        with pytest.raises(ValueError):
+            downsample_indices([1, 2, 3, 4], [1, 2, 3, 4], 3, method='average')
+
+
+# ============================================================
+# Rollup Tests
+# ============================================================
+
+class TestSnapshotRollups:
+    """Tests for 15-minute and daily rollups."""
+
+    def test_bucket_start(self):
+        ts = at(DAY, 10, 44)
+        assert bucket_start(ts, '15m') == at(DAY, 10, 30)
+        assert bucket_start(ts, '1d') == at(DAY, 0, 0)
+
+    @pytest.mark.asyncio
+    async def test_rollups_accumulate(self):
+        service = AnalyticsService()
+        async with sqlite_sessions() as session_maker:
+            async with session_maker() as db:
+                config = await make_config(db)
+                for minute, util in [(0, 40.0), (5, 60.0), (10, 50.0), (15, 70.0)]:
+                    snap = snapshot(config, at(DAY, 10, minute), util)
+                    db.add(snap)
+                    await db.flush()
+                    await service.update_snapshot_rollups(db, snap)
+                await db.commit()
+
+            async with session_maker() as db:
+                rows = (await db.execute(
+                    select(MarginRollup).order_by(MarginRollup.resolution, MarginRollup.bucket_start)
+                )).scalars().all()
+
+        fifteen = [r for r in rows if r.resolution == '15m']
+        daily = [r for r in rows if r.resolution == '1d']
+        assert [r.sample_count for r in fifteen] == [3, 1]
+        assert fifteen[0].max_utilization_pct == 60.0
+        assert fifteen[0].min_utilization_pct == 40.0
+        assert fifteen[0].last_utilization_pct == 50.0
+        assert len(daily) == 1
+        assert daily[0].sample_count == 4
+        assert daily[0].sum_utilization_pct == 220.0
+        assert daily[0].last_pnl == 70.0
+
+    @pytest.mark.asyncio
+    async def test_capture_snapshot_updates_rollups(self):
+        service = MarginService()
+        data = {
+            'funds': {'used_margin': 5000000.0, 'available_cash': 0.0, 'collateral': 0.0,
+                      'm2m_realized': 0.0, 'm2m_unrealized': 0.0},
+            'margin': {'baseline': 1000000.0, 'intraday_used': 4000000.0, 'utilization_pct': 40.0},
+            'positions': {'short_count': 2, 'short_qty': 130, 'long_count': 0, 'long_qty': 0,
+                          'closed_count': 0, 'hedge_cost': 0.0, 'total_pnl': 0.0},
+            'filtered_positions': {'short_positions': [], 'long_positions': [], 'closed_positions': []},
+        }
+        async with sqlite_sessions() as session_maker:
+            async with session_maker() as db:
+                config = await make_config(db)
+                await db.commit()
+            with patch.object(service, 'get_current_margin', AsyncMock(return_value=data)):
+                async with session_maker() as db:
+                    assert await service.capture_snapshot(config, db) is not None
+            async with session_maker() as db:
+                resolutions = (await db.execute(select(MarginRollup.resolution))).scalars().all()
+
+        assert sorted(resolutions) == ['15m', '1d']
+
+
+class TestWeekdayRollups:
+    """Tests for weekday rollups and day-of-week analytics."""
+
+    @pytest.mark.asyncio
+    async def test_regenerated_summary_replaces_values(self):
+        service = MarginService()
+        async with sqlite_sessions() as session_maker:
+            async with session_maker() as db:
+                config = await make_config(db)
+                snap = snapshot(config, at(DAY, 10, 0), 50.0)
+                db.add(snap)
+                await db.commit()
+
+            async with session_maker() as db:
+                await service.generate_daily_summary(config, db)
+            async with session_maker() as db:
+                db.add(snapshot(config, at(DAY, 11, 0), 80.0))
+                await db.commit()
+            async with session_maker() as db:
+                await service.generate_daily_summary(config, db)
+
+            async with session_maker() as db:
+                rollup = (await db.execute(select(WeekdayRollup))).scalar_one()
+
+        assert rollup.trading_days == 1
+        assert rollup.sum_max_utilization_pct == 80.0
+        assert rollup.sum_pnl == 80.0
+        assert rollup.month_start == date(2025, 12, 1)
+
+    @pytest.mark.asyncio
+    async def test_analytics_combines_rollups_and_partial_month(self):
+        service = AnalyticsService()
+        today = date.today()
+        days = [today - timedelta(days=n) for n in range(0, 60)]
+        async with sqlite_sessions() as session_maker:
+            async with session_maker() as db:
+                for i, d in enumerate(days):
+                    config = await make_config(db, d)
+                    summary = DailySummary(
+                        config_id=config.id, date=d, day_of_week=d.weekday(), day_name=d.strftime('%A'),
+                        index_name='NIFTY', num_baskets=10, total_budget=1e7, baseline_margin=0.0,
+                        max_intraday_margin=0.0, max_utilization_pct=float(i), total_hedge_cost=10.0,
+                        total_pnl=1.0,
+                    )
+                    db.add(summary)
+                    await service.update_weekday_rollup(db, summary)
+                await db.commit()
+
+            async with session_maker() as db:
+                analytics = await service.get_day_of_week_analytics(db, period_days=30)
+
+        # Same figures as aggregating the raw summaries
+        expected = {}
+        cutoff = today - timedelta(days=30)
+        for i, d in enumerate(days):
+            if d >= cutoff:
+                expected.setdefault(d.strftime('%A'), []).append(float(i))
+        assert {a['day_name']: a['trading_days'] for a in analytics} == {k: len(v) for k, v in expected.items()}
+        for a in analytics:
+            values = expected[a['day_name']]
+            assert a['avg_max_utilization'] == round(sum(values) / len(values), 1)
+            assert a['avg_hedge_cost'] == 10.0
+
+
+class TestRangeHistory:
+    """Tests for range history from rollups."""
+
+    @pytest.mark.asyncio
+    async def test_resolution_and_points(self):
+        service = AnalyticsService()
+        async with sqlite_sessions() as session_maker:
+            async with session_maker() as db:
+                for n in range(20):
+                    d = DAY - timedelta(days=n)
+                    config = await make_config(db, d)
+                    for minute in range(0, 60, 5):
+                        snap = snapshot(config, at(d, 10, minute), float(minute))
+                        db.add(snap)
+                        await db.flush()
+                        await service.update_snapshot_rollups(db, snap)
+                await db.commit()
+
+            async with session_maker() as db:
+                short_res, short = await service.get_range_history(db, DAY - timedelta(days=1), DAY, points=0)
+                long_res, long = await service.get_range_history(db, DAY - timedelta(days=19), DAY, points=10)
+                day_series = await service.get_day_history(db, config, points=5)
+
+        assert short_res == '15m' and len(short) == 8
+        assert short[0]['avg_utilization_pct'] == 5.0  # minutes 0, 5, 10
+        assert long_res == '1d' and len(long) == 10
+        assert all(p['max_utilization_pct'] == 55.0 for p in long)
+        assert len(day_series) == 5
@@ -0,0 +1,285 @@
+"""
+Tests for OptionChainStore
+
+Tests cover:
+- Snapshot parsing from both OpenAlgo chain formats
+- Binary-search strike lookups
+- Versioning and freshness (empty/failed fetches keep the last snapshot)
+- Concurrent reads sharing one broker call
+- Refresh cadence near scheduled entries
+- Selector reading chain and spot from the store
+"""
+
+import asyncio
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.models.hedge_constants import IndexName, ExpiryType
+from app.services.hedge_selector import HedgeStrikeSelectorService
+from app.services.option_chain_store import OptionChainStore, ChainSnapshot
+from app.services.openalgo_service import _cache, _get_cached, _set_cached, CACHE_MAX_ENTRIES
+
+
+EXPIRY = date.today()
+
+CHAIN = [
+    {"strike": 24900, "ce_ltp": 30.0, "pe_ltp": 420.0},
+    {"strike": 24800, "ce_ltp": 3.5, "pe_ltp": 250.0},
+    {"strike": 25000, "ce_ltp": 8.0},
+]
+
+
+@pytest.fixture
+def mock_openalgo():
+    mock = AsyncMock()
+    mock.get_option_chain = AsyncMock(return_value=CHAIN)
+    mock.get_quotes = AsyncMock(return_value={"ltp": 24850.0})
+    mock.get_positions = AsyncMock(return_value=[])
+    return mock
+
+
+@pytest.fixture
+def store(mock_openalgo):
+    return OptionChainStore(mock_openalgo)
+
+
+# ============================================================
+# Snapshot Tests
+# ============================================================
+
+class TestChainSnapshot:
+    """Tests for ChainSnapshot parsing and lookups."""
+
+    def test_sorted_columns(self):
+        snapshot = ChainSnapshot.from_entries(IndexName.NIFTY, EXPIRY, CHAIN)
+
+        assert snapshot.strikes.tolist() == [24800, 24900, 25000]
+        assert snapshot.ce_ltp.tolist() == [3.5, 30.0, 8.0]
+        assert np.isnan(snapshot.pe_ltp[2])
+
+    def test_per_option_rows(self):
+        """Rows with ltp + option_type merge into one strike."""
+        snapshot = ChainSnapshot.from_entries("NIFTY", EXPIRY, [
+            {"strike_price": "24800", "ltp": 3.5, "option_type": "CE"},
+            {"strike_price": "24800", "ltp": 250.0, "option_type": "PE"},
+            {"ltp": 1.0, "option_type": "CE"},
+        ])
+
+        assert len(snapshot) == 1
+        assert snapshot.ltp(24800, "PE") == 250.0
+
+    def test_lookups(self):
+        snapshot = ChainSnapshot.from_entries(IndexName.NIFTY, EXPIRY, CHAIN)
+
+        assert snapshot.ltp(24900, "CE") == 30.0
+        assert snapshot.ltp(24950, "CE") is None
+        assert snapshot.ltp(25000, "PE") is None
+        np.testing.assert_array_equal(
+            snapshot.ltps([24700, 24800, 25000, 25100], "CE"), [np.nan, 3.5, 8.0, np.nan]
+        )
+        assert snapshot.nearest_strike(24860) == 24900
+        assert snapshot.nearest_strike(20000) == 24800
+        strikes, ce, _ = snapshot.strikes_between(24850, 25000)
+        assert strikes.tolist() == [24900, 25000] and ce.tolist() == [30.0, 8.0]
+
+    def test_snapshot_is_read_only(self):
+        snapshot = ChainSnapshot.from_entries(IndexName.NIFTY, EXPIRY, CHAIN)
+        with pytest.raises(ValueError):
+            snapshot.ce_ltp[0] = 1.0
+
+    def test_empty_chain(self):
+        snapshot = ChainSnapshot.from_entries(IndexName.NIFTY, EXPIRY, [])
+        assert len(snapshot) == 0
+        assert snapshot.ltp(24800, "CE") is None
+        assert snapshot.nearest_strike(24800) is None
+
+
+# ============================================================
+# Store Tests
+# ============================================================
+
+class TestOptionChainStore:
+    """Tests for fetching, versioning and refresh cadence."""
+
+    @pytest.mark.asyncio
+    async def test_get_caches_until_stale(self, store, mock_openalgo):
+        first = await store.get(IndexName.NIFTY, EXPIRY)
+        second = await store.get(IndexName.NIFTY, EXPIRY)
+
+        assert second is first
+        assert first.spot == 24850.0
+        assert mock_openalgo.get_option_chain.await_count == 1
+        mock_openalgo.get_option_chain.assert_awaited_with(
+            symbol="NIFTY", exchange="NFO", expiry=EXPIRY.strftime("%Y-%m-%d")
+        )
+
+        await store.get(IndexName.NIFTY, EXPIRY, max_age_seconds=0)
+        assert mock_openalgo.get_option_chain.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_reads_share_one_fetch(self, store, mock_openalgo):
+        async def slow_chain(**kwargs):
+            await asyncio.sleep(0.01)
+            return CHAIN
+        mock_openalgo.get_option_chain.side_effect = slow_chain
+
+        snapshots = await asyncio.gather(*[store.get(IndexName.NIFTY, EXPIRY) for _ in range(10)])
+
+        assert mock_openalgo.get_option_chain.await_count == 1
+        assert all(s is snapshots[0] for s in snapshots)
+
+    @pytest.mark.asyncio
+    async def test_version_bumps_only_on_change(self, store, mock_openalgo):
+        first = await store.refresh(IndexName.NIFTY, EXPIRY)
+        unchanged = await store.refresh(IndexName.NIFTY, EXPIRY)
+
+        mock_openalgo.get_option_chain.return_value = [{"strike": 24800, "ce_ltp": 4.0}]
+        changed = await store.refresh(IndexName.NIFTY, EXPIRY)
+
+        assert unchanged.version == first.version
+        assert changed.version > first.version
+        # A consumer holding the old snapshot still sees the old prices
+        assert first.ltp(24800, "CE") == 3.5
+        assert changed.ltp(24800, "CE") == 4.0
+
+    @pytest.mark.asyncio
+    async def test_empty_or_failed_fetch_keeps_snapshot(self, store, mock_openalgo):
+        first = await store.refresh(IndexName.NIFTY, EXPIRY)
+
+        mock_openalgo.get_option_chain.return_value = []
+        empty = await store.refresh(IndexName.NIFTY, EXPIRY)
+        mock_openalgo.get_option_chain.side_effect = Exception("timeout")
+        failed = await store.refresh(IndexName.NIFTY, EXPIRY)
+
+        assert empty is first and failed is first
+        assert store.version == first.version
+        assert store.peek(IndexName.NIFTY, EXPIRY).ltp(24800, "CE") == 3.5
+
+    @pytest.mark.asyncio
+    async def test_empty_first_fetch_tracked_without_version(self, store, mock_openalgo):
+        mock_openalgo.get_option_chain.return_value = []
+        empty = await store.get(IndexName.NIFTY, EXPIRY)
+
+        assert len(empty) == 0 and empty.version == 0
+        assert store.version == 0
+
+        mock_openalgo.get_option_chain.return_value = CHAIN
+        assert await store.refresh_all() == 1
+        assert store.peek(IndexName.NIFTY, EXPIRY).version == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_all_drops_past_expiries(self, store, mock_openalgo):
+        await store.get(IndexName.NIFTY, EXPIRY)
+        await store.get(IndexName.NIFTY, EXPIRY - timedelta(days=1))
+
+        refreshed = await store.refresh_all()
+
+        assert refreshed == 1
+        assert store.peek(IndexName.NIFTY, EXPIRY - timedelta(days=1)) is None
+        # One quotes call per index per cycle
+        assert mock_openalgo.get_quotes.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_interval_tightens_near_entry(self, mock_openalgo):
+        scheduler = MagicMock()
+        scheduler.get_entries_in_window = AsyncMock(return_value=[])
+        store = OptionChainStore(
+            mock_openalgo, scheduler=scheduler,
+            refresh_seconds=30, near_entry_refresh_seconds=5, near_entry_window_minutes=10
+        )
+
+        assert await store.refresh_interval() == 30
+        scheduler.get_entries_in_window.return_value = [MagicMock()]
+        assert await store.refresh_interval() == 5
+        scheduler.get_entries_in_window.assert_awaited_with(10)
+
+    @pytest.mark.asyncio
+    async def test_start_and_stop(self, store, mock_openalgo):
+        await store.get(IndexName.NIFTY, EXPIRY)
+        store.start()
+        await asyncio.sleep(0)
+        await store.stop()
+        assert store._task is None
+
+    @pytest.mark.asyncio
+    async def test_spot_falls_back_to_last_known(self, store, mock_openalgo):
+        assert await store.get_spot(IndexName.SENSEX) == 24850.0
+        mock_openalgo.get_quotes.assert_awaited_with(symbol="SENSEX", exchange="BSE_INDEX")
+
+        mock_openalgo.get_quotes.side_effect = Exception("down")
+        assert await store.get_spot(IndexName.SENSEX, max_age_seconds=0) == 24850.0
+
+
+class TestOpenAlgoCacheBound:
+    """The module-level response cache stays bounded."""
+
+    def test_oldest_keys_evicted(self):
+        _cache.clear()
+        for i in range(CACHE_MAX_ENTRIES + 10):
+            _set_cached(f"optionchain:{i}", i)
+
+        assert len(_cache) == CACHE_MAX_ENTRIES
+        assert _get_cached("optionchain:0") is None
+        assert _get_cached(f"optionchain:{CACHE_MAX_ENTRIES + 9}") is not None
+        _cache.clear()
+
+
+# ============================================================
+# Selector Integration Tests
+# ============================================================
+
+class TestSelectorWithStore:
+    """Selector reads chain and spot from the shared store."""
+
+    @pytest.mark.asyncio
+    async def test_selector_uses_store(self, store, mock_openalgo):
+        margin_calc = MagicMock()
+        margin_calc.estimate_hedge_margin_benefit = MagicMock(return_value=100000)
+        selector = HedgeStrikeSelectorService(
+            openalgo=mock_openalgo, margin_calculator=margin_calc, chain_store=store
+        )
+
+        for _ in range(3):
+            candidates = await selector.find_hedge_candidates(
+                index=IndexName.NIFTY,
+                expiry_type=ExpiryType.ZERO_DTE,
+                option_types=['PE'],
+                num_baskets=10,
+                spot_price=25600
+            )
+
+        assert mock_openalgo.get_option_chain.await_count == 1
+        assert all(c.ltp != 250.0 for c in candidates if c.strike != 24800)
+        assert await selector.get_spot_price(IndexName.NIFTY) == 24850.0
+        assert mock_openalgo.get_quotes.await_count == 1
+
+
+class TestStoreConsumers:
+    """Margin scheduler and orchestrator share the store."""
+
+    @pytest.mark.asyncio
+    async def test_scheduler_tracks_today_chain(self, store, mock_openalgo):
+        from app.services.scheduler_service import SchedulerService
+        scheduler = SchedulerService()
+        scheduler.set_chain_store(store)
+        config = MagicMock(index_name="NIFTY", expiry_date=EXPIRY)
+
+        await scheduler._track_option_chain(config)
+        await scheduler._track_option_chain(config)
+
+        assert store.peek(IndexName.NIFTY, EXPIRY) is not None
+        assert mock_openalgo.get_option_chain.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_orchestrator_reads_spot_from_store(self, store, mock_openalgo):
+        from app.services.hedge_orchestrator import AutoHedgeOrchestrator
+        orchestrator = AutoHedgeOrchestrator(db_factory=MagicMock(), chain_store=store)
+        orchestrator._session_cache = {'index': 'NIFTY', 'expiry_date': EXPIRY.isoformat()}
+
+        await orchestrator._track_option_chain()
+
+        assert store.peek(IndexName.NIFTY, EXPIRY) is not None
+        assert await orchestrator._get_spot_price(IndexName.NIFTY, book=None) == 24850.0
@@ -0,0 +1,191 @@
+"""
+Tests and benchmark for batched snapshot persistence
+
+Runs capture_snapshot against an in-memory SQLite database (schema prefix
+translated away) with 500 positions, and compares the bulk INSERT path with
+the previous one-ORM-object-per-position path.
+"""
+
+import os
+import sys
+import time
+from contextlib import asynccontextmanager
+from datetime import date
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+# Add app to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Base
+from app.models.db_models import SCHEMA, DailyConfig, MarginSnapshot, PositionSnapshot, MarginRollup
+from app.services.margin_service import MarginService
+from app.utils.date_utils import now_ist
+from app.utils.symbol_parser import parse_symbol, expiry_as_date, get_position_type
+
+NUM_POSITIONS = 500
+
+
+def make_filtered_positions(n: int = NUM_POSITIONS):
+    """n positions across short/long/closed, 50-point strikes on one expiry."""
+    positions = {'short_positions': [], 'long_positions': [], 'closed_positions': []}
+    categories = list(positions)
+    for i in range(n):
+        strike = 20000 + 50 * (i // 2)
+        option_type = 'PE' if i % 2 else 'CE'
+        category = categories[i % 3]
+        quantity = {'short_positions': -65, 'long_positions': 65, 'closed_positions': 0}[category]
+        positions[category].append({
+            'symbol': f'NIFTY30DEC25{strike}{option_type}',
+            'exchange': 'NFO',
+            'product': 'NRML',
+            'quantity': quantity,
+            'average_price': 100.0,
+            'ltp': 95.0,
+            'pnl': 325.0,
+        })
+    return positions
+
+
+def margin_data(filtered):
+    return {
+        'funds': {'used_margin': 5000000.0, 'available_cash': 1000000.0, 'collateral': 0.0,
+                  'm2m_realized': 0.0, 'm2m_unrealized': 0.0},
+        'margin': {'baseline': 1000000.0, 'intraday_used': 4000000.0, 'utilization_pct': 80.0},
+        'positions': {'short_count': 0, 'short_qty': 0, 'long_count': 0, 'long_qty': 0,
+                      'closed_count': 0, 'hedge_cost': 0.0, 'total_pnl': 0.0},
+        'filtered_positions': filtered,
+    }
+
+
+@asynccontextmanager
+async def sqlite_sessions():
+    """In-memory SQLite with the margin_monitor schema prefix removed."""
+    engine = create_async_engine('sqlite+aiosqlite://').execution_options(
+        schema_translate_map={SCHEMA: None}
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[
+            DailyConfig.__table__, MarginSnapshot.__table__, PositionSnapshot.__table__,
+            MarginRollup.__table__
+        ])
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def make_config(session_maker):
+    async with session_maker() as db:
+        config = DailyConfig(
+            date=date(2025, 12, 30), day_of_week=1, day_name='Tuesday', index_name='NIFTY',
+            expiry_date=date(2025, 12, 30), num_baskets=10, total_budget=10000000.0,
+            baseline_margin=1000000.0,
+        )
+        db.add(config)
+        await db.commit()
+        return config
+
+
+async def capture_per_object(service, config, db):
+    """Previous implementation: one PositionSnapshot ORM object per position."""
+    data = await service.get_current_margin(config, db)
+    snapshot = MarginSnapshot(
+        config_id=config.id, timestamp=now_ist(),
+        total_margin_used=data['funds']['used_margin'], available_cash=data['funds']['available_cash'],
+        collateral=data['funds']['collateral'], baseline_margin=data['margin']['baseline'],
+        intraday_margin=data['margin']['intraday_used'], utilization_pct=data['margin']['utilization_pct'],
+    )
+    db.add(snapshot)
+    await db.flush()
+    for category in ['short_positions', 'long_positions', 'closed_positions']:
+        for pos in data['filtered_positions'][category]:
+            parsed = parse_symbol.__wrapped__(pos['symbol'])
+            db.add(PositionSnapshot(
+                snapshot_id=snapshot.id, symbol=pos['symbol'], exchange=pos['exchange'],
+                product=pos['product'], quantity=pos['quantity'], average_price=pos['average_price'],
+                ltp=pos['ltp'], pnl=pos['pnl'], position_type=get_position_type(pos['quantity']),
+                option_type=parsed.option_type, strike_price=parsed.strike,
+                expiry_date=expiry_as_date.__wrapped__(parsed.expiry_date),
+            ))
+    await db.commit()
+
+
+class TestBuildPositionRows:
+    """Tests for MarginService.build_position_rows."""
+
+    def test_rows_match_positions(self):
+        """Every parseable position becomes one row with parsed fields."""
+        filtered = make_filtered_positions(6)
+        filtered['short_positions'].append({**filtered['short_positions'][0], 'symbol': 'GARBAGE'})
+        captured_at = now_ist()
+
+        rows = MarginService.build_position_rows(42, filtered, captured_at)
+
+        assert len(rows) == 6
+        assert rows[0]['snapshot_id'] == 42
+        assert rows[0]['position_type'] == 'SHORT'
+        assert rows[0]['expiry_date'] == date(2025, 12, 30)
+        assert rows[0]['created_at'] is captured_at
+        assert {r['option_type'] for r in rows} == {'CE', 'PE'}
+
+    def test_symbol_parse_is_memoized(self):
+        """Repeated snapshots hit the parse cache."""
+        parse_symbol.cache_clear()
+        filtered = make_filtered_positions(30)
+        MarginService.build_position_rows(1, filtered, now_ist())
+        MarginService.build_position_rows(2, filtered, now_ist())
+
+        info = parse_symbol.cache_info()
+        assert info.misses == 30
+        assert info.hits == 30
+
+
+class TestCaptureSnapshotBulk:
+    """capture_snapshot persistence against SQLite."""
+
+    @pytest.mark.asyncio
+    async def test_capture_snapshot_inserts_all_positions(self):
+        """One snapshot row plus all 500 position rows are stored."""
+        service = MarginService()
+        filtered = make_filtered_positions()
+
+        async with sqlite_sessions() as session_maker:
+            config = await make_config(session_maker)
+            with patch.object(service, 'get_current_margin', AsyncMock(return_value=margin_data(filtered))):
+                async with session_maker() as db:
+                    snapshot = await service.capture_snapshot(config, db)
+
+            assert snapshot is not None
+            async with session_maker() as db:
+                count = (await db.execute(
+                    select(func.count(PositionSnapshot.id)).where(PositionSnapshot.snapshot_id == snapshot.id)
+                )).scalar()
+            assert count == NUM_POSITIONS
+
+    @pytest.mark.asyncio
+    async def test_benchmark_500_positions(self):
+        """Bulk INSERT is faster than per-object adds for a 500-position snapshot."""
+        service = MarginService()
+        filtered = make_filtered_positions()
+        rounds = 5
+
+        async with sqlite_sessions() as session_maker:
+            config = await make_config(session_maker)
+            with patch.object(service, 'get_current_margin', AsyncMock(return_value=margin_data(filtered))):
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    async with session_maker() as db:
+                        await capture_per_object(service, config, db)
+                per_object = (time.perf_counter() - start) / rounds
+
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    async with session_maker() as db:
+                        await service.capture_snapshot(config, db)
+                bulk = (time.perf_counter() - start) / rounds
+
+        print(f"\n500-position snapshot: per-object {per_object * 1000:.1f}ms, bulk {bulk * 1000:.1f}ms "
+              f"({per_object / bulk:.1f}x)")
+        assert bulk < per_object
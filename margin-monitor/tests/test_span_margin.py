@@ -0,0 +1,188 @@
+"""
+Tests for SpanMarginEstimator
+
+Tests cover:
+- Black-76 pricing and implied volatility
+- Scenario grid shape
+- Margin estimate for short straddles
+- Marginal benefit of one-sided vs paired hedges
+- Vectorized combinations matching individual estimates
+"""
+
+import time
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+from app.models.hedge_constants import IndexName
+from app.services.span_margin import (
+    SpanMarginEstimator,
+    OptionBook,
+    black76_price,
+    implied_vol,
+    time_to_expiry_years,
+)
+from app.utils.date_utils import IST
+
+
+SPOT = 25000.0
+QTY = 650  # 10 lots
+T = 1 / 365
+
+
+@pytest.fixture
+def estimator():
+    return SpanMarginEstimator()
+
+
+@pytest.fixture
+def straddle():
+    """Short ATM straddle, 10 lots per side."""
+    return OptionBook.from_positions([
+        {"symbol": "NIFTY30DEC2525000CE", "quantity": -QTY, "ltp": 120.0},
+        {"symbol": "NIFTY30DEC2525000PE", "quantity": -QTY, "ltp": 115.0},
+    ])
+
+
+def hedge_legs(ce_strikes, pe_strikes, qty=QTY):
+    return OptionBook.empty().add(
+        list(ce_strikes) + list(pe_strikes),
+        [True] * len(ce_strikes) + [False] * len(pe_strikes),
+        [qty] * (len(ce_strikes) + len(pe_strikes))
+    )
+
+
+# ============================================================
+# Pricing Tests
+# ============================================================
+
+class TestBlack76:
+    """Tests for vectorized pricing helpers."""
+
+    def test_put_call_parity(self):
+        """C - P = F - K with zero discounting."""
+        strikes = np.array([24000.0, 25000.0, 26000.0])
+        call = black76_price(SPOT, strikes, T, 0.15, True)
+        put = black76_price(SPOT, strikes, T, 0.15, False)
+        np.testing.assert_allclose(call - put, SPOT - strikes, atol=1e-4)
+
+    def test_implied_vol_round_trip(self):
+        """Implied vol recovers the pricing vol; NaN prices stay NaN."""
+        strikes = np.array([24500.0, 25000.0, 25500.0, 25500.0])
+        is_call = np.array([False, True, True, True])
+        prices = black76_price(SPOT, strikes, T, np.array([0.18, 0.13, 0.16, 0.16]), is_call)
+        prices[3] = np.nan
+
+        iv = implied_vol(prices, SPOT, strikes, T, is_call)
+
+        np.testing.assert_allclose(iv[:3], [0.18, 0.13, 0.16], atol=1e-4)
+        assert np.isnan(iv[3])
+
+    def test_time_to_expiry_floor(self):
+        """After expiry-day close, time is floored rather than negative."""
+        expiry = date(2025, 12, 30)
+        before = IST.localize(datetime(2025, 12, 30, 9, 30))
+        after = IST.localize(datetime(2025, 12, 30, 16, 0))
+
+        assert time_to_expiry_years(expiry, before) == pytest.approx(6 / (365 * 24))
+        assert time_to_expiry_years(expiry, after) == pytest.approx(1 / (365 * 24))
+
+
+# ============================================================
+# Margin Estimate Tests
+# ============================================================
+
+class TestEstimate:
+    """Tests for margin estimation."""
+
+    def test_scenario_grid_has_sixteen_scenarios(self, estimator):
+        price_moves, vol_moves, weights = estimator.scenario_grid(IndexName.NIFTY)
+        assert len(price_moves) == len(vol_moves) == len(weights) == 16
+        assert max(price_moves) == pytest.approx(0.12)
+        assert sorted(weights)[:2] == [0.35, 0.35]
+
+    def test_short_straddle_margin(self, estimator, straddle):
+        """Scanning risk is positive and exposure is 2% of short notional."""
+        estimate = estimator.estimate(IndexName.NIFTY, straddle, SPOT, T)
+
+        assert estimate.scanning_risk > 0
+        assert estimate.exposure_margin == pytest.approx(2 * QTY * SPOT * 0.02)
+        assert estimate.total == pytest.approx(estimate.scanning_risk + estimate.exposure_margin)
+
+    def test_empty_book_has_no_margin(self, estimator):
+        assert estimator.estimate(IndexName.NIFTY, OptionBook.empty(), SPOT, T).total == 0
+
+    def test_closed_and_unparseable_positions_skipped(self):
+        book = OptionBook.from_positions([
+            {"symbol": "NIFTY30DEC2525000CE", "quantity": 0},
+            {"symbol": "GARBAGE", "quantity": -65},
+            {"symbol": "NIFTY30DEC2525000PE", "quantity": -65},
+        ])
+        assert len(book) == 1
+        assert np.isnan(book.ltp[0])
+
+
+# ============================================================
+# Marginal Benefit Tests
+# ============================================================
+
+class TestMarginalBenefit:
+    """Tests for projected margins of candidate hedges."""
+
+    def test_one_sided_hedge_gives_no_benefit_on_straddle(self, estimator, straddle):
+        """The worst scenario moves to the unhedged side."""
+        _, benefits = estimator.marginal_benefits(
+            IndexName.NIFTY, straddle, hedge_legs([25500], []), SPOT, T
+        )
+        assert benefits[0] <= 0
+
+    def test_paired_hedge_reduces_margin(self, estimator, straddle):
+        """CE+PE pair reduces margin; nearer wings reduce it more."""
+        candidates = hedge_legs([25300, 25800], [24700, 24200])
+        combos = np.array([[1, 0, 1, 0], [0, 1, 0, 1]])
+
+        base, benefits = estimator.marginal_benefits(
+            IndexName.NIFTY, straddle, candidates, SPOT, T, combos
+        )
+
+        assert 0 < benefits[1] < benefits[0] < base
+
+    def test_combinations_match_individual_estimates(self, estimator, straddle):
+        """Vectorized projection equals estimating each combined book."""
+        candidates = hedge_legs([25300, 25500], [24500])
+        combos = np.array([[1, 0, 1], [0, 1, 1], [1, 1, 0]])
+
+        projected = estimator.project_margins(IndexName.NIFTY, straddle, candidates, SPOT, T, combos)
+
+        for row, margin in zip(combos, projected):
+            picked = np.flatnonzero(row)
+            book = straddle.add(
+                candidates.strikes[picked], candidates.is_call[picked], candidates.quantity[picked]
+            )
+            assert margin == pytest.approx(estimator.estimate(IndexName.NIFTY, book, SPOT, T).total)
+
+    def test_hedge_reduction_pct(self, estimator, straddle):
+        """Reduction for a 500-point wing pair is in the empirical range."""
+        reduction = estimator.hedge_reduction_pct(IndexName.NIFTY, straddle, [
+            {"strike": 25500, "option_type": "CE", "quantity": QTY},
+            {"strike": 24500, "option_type": "PE", "quantity": QTY},
+        ], SPOT, T)
+        assert 0.3 < reduction < 0.7
+
+    def test_all_pairs_priced_in_milliseconds(self, estimator, straddle):
+        """All CE x PE pairs over a 17-strike wing are priced in one pass."""
+        ce = np.arange(25200, 26050, 50)
+        candidates = hedge_legs(ce, 2 * SPOT - ce)
+        n = len(ce)
+        combos = np.zeros((n * n, 2 * n))
+        for i in range(n):
+            combos[i * n:(i + 1) * n, i] = 1
+            combos[i * n + np.arange(n), n + np.arange(n)] = 1
+
+        start = time.perf_counter()
+        projected = estimator.project_margins(IndexName.NIFTY, straddle, candidates, SPOT, T, combos)
+        elapsed = time.perf_counter() - start
+
+        assert projected.shape == (n * n,)
+        assert elapsed < 0.5
@@ -0,0 +1,95 @@
+"""
+Tests for WakeupQueue
+
+Tests cover:
+- Timer ordering and rescheduling by key
+- Immediate wake-up on notify
+- Sleeping until the earliest timer instead of polling
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services.wakeup_queue import WakeupQueue
+from app.utils.date_utils import IST
+
+
+def ist_now():
+    return datetime.now(IST)
+
+
+class TestTimers:
+    """Tests for schedule / cancel / pop_due."""
+
+    def test_pop_due_in_time_order(self):
+        queue = WakeupQueue(ist_now)
+        base = ist_now()
+        queue.schedule("b", base + timedelta(seconds=2))
+        queue.schedule("a", base + timedelta(seconds=1))
+        queue.schedule("c", base + timedelta(seconds=10))
+
+        assert queue.pop_due(base + timedelta(seconds=5)) == ["a", "b"]
+        assert len(queue) == 1
+
+    def test_reschedule_replaces_timer(self):
+        queue = WakeupQueue(ist_now)
+        base = ist_now()
+        queue.schedule("periodic", base + timedelta(seconds=1))
+        queue.schedule("periodic", base + timedelta(seconds=300))
+
+        assert queue.pop_due(base + timedelta(seconds=5)) == []
+        assert queue.next_due() == base + timedelta(seconds=300)
+
+    def test_cancel(self):
+        queue = WakeupQueue(ist_now)
+        queue.schedule("x", ist_now())
+        queue.cancel("x")
+        assert queue.next_due() is None
+        assert queue.pop_due(ist_now() + timedelta(days=1)) == []
+
+
+class TestWait:
+    """Tests for the async wait."""
+
+    @pytest.mark.asyncio
+    async def test_wakes_at_timer(self):
+        queue = WakeupQueue(ist_now)
+        queue.schedule("pre-entry:09:16:00", ist_now() + timedelta(milliseconds=50))
+
+        start = time.perf_counter()
+        reasons = await asyncio.wait_for(queue.wait(), timeout=2)
+
+        assert reasons == ["pre-entry:09:16:00"]
+        assert 0.04 <= time.perf_counter() - start < 1.0
+
+    @pytest.mark.asyncio
+    async def test_notify_wakes_immediately(self):
+        queue = WakeupQueue(ist_now)
+        queue.schedule("periodic", ist_now() + timedelta(minutes=5))
+
+        async def toggle():
+            await asyncio.sleep(0.01)
+            queue.notify("toggle")
+
+        start = time.perf_counter()
+        reasons, _ = await asyncio.gather(queue.wait(), toggle())
+
+        assert reasons == ["toggle"]
+        assert time.perf_counter() - start < 1.0
+        assert len(queue) == 1  # Periodic timer untouched
+
+    @pytest.mark.asyncio
+    async def test_earlier_timer_shortens_sleep(self):
+        """A timer added while waiting on a later one is honoured."""
+        queue = WakeupQueue(ist_now)
+        queue.schedule("periodic", ist_now() + timedelta(minutes=5))
+
+        async def add_timer():
+            await asyncio.sleep(0.01)
+            queue.schedule("post-entry:09:17:00", ist_now() + timedelta(milliseconds=20))
+
+        reasons, _ = await asyncio.wait_for(asyncio.gather(queue.wait(), add_timer()), timeout=2)
+        assert reasons == ["post-entry:09:17:00"]
@@ -2,6 +2,7 @@
 """
 OpenAlgo Trading Bridge - Main Application
 """
+import atexit
 import logging
 from flask import Flask, request, jsonify
 
@@ -31,7 +32,12 @@ CONFIG = load_config()
 app = Flask(__name__)
 
 # Initialize components
-state = StateManager(duplicate_window=CONFIG.get('duplicate_window_seconds', 60))
+state = StateManager(
+    duplicate_window=CONFIG.get('duplicate_window_seconds', 60),
+    fsync_policy=CONFIG.get('state_fsync_policy', 'interval'),
+    compact_every=CONFIG.get('state_compact_every', 1000)
+)
+atexit.register(state.close)
 openalgo = OpenAlgoClient(CONFIG['openalgo_url'], CONFIG['openalgo_api_key'])
 executor = SyntheticFuturesExecutor(openalgo, CONFIG)
 sizer = PositionSizer(openalgo, CONFIG)
@@ -300,6 +306,7 @@ if __name__ == '__main__':
     logger.info(f"Market Hours: {CONFIG['market_start_hour']}:{CONFIG['market_start_minute']:02d} - {CONFIG['market_end_hour']}:{CONFIG['market_end_minute']:02d}")
     logger.info(f"Partial Fill Protection: {'✓' if CONFIG['enable_partial_fill_protection'] else '✗'}")
     logger.info(f"Expiry: {'Monthly' if CONFIG['use_monthly_expiry'] else 'Weekly'}")
+    logger.info(f"State Journal: {state.journal_file} (fsync: {state.fsync_policy})")
     logger.info("=" * 60)
     logger.info("Webhook endpoint: http://localhost:5001/webhook")
     logger.info("Health check: http://localhost:5001/health")
@@ -0,0 +1,338 @@
+"""
+OHLC Strategy Simulator - Generates V9 signals from raw bars
+
+Replaces the TradingView trade-list round trip (SignalLoader): strategy
+rules run directly on OHLC bars and the resulting BASE_ENTRY / PYRAMID /
+EXIT signals feed PortfolioBacktestEngine.
+
+Rules (Tom Basso stop mode, as in the V9 Pine strategies):
+- Entry when flat and all 7 conditions hold; initial stop = close - k1 * ATR
+- Pyramid when price has moved > 1R from the base entry and at least
+  atr_pyramid_threshold ATRs from the last entry (up to max_pyramids)
+- Each layer trails its own stop at highest close - k2 * ATR (never lowered)
+  and exits on a close below it
+- Pine fills on bar close: a layer entered on a bar is first checked for
+  pyramids/stops on the next bar
+
+Design:
+- Indicators are precomputed for the whole history (core.indicators)
+- The per-bar state machine is a tight loop over NumPy arrays, compiled
+  with Numba when installed; otherwise it runs as plain Python
+- Lot sizes are left to the engine: base entries are sized by the
+  engine's Tom Basso sizer, pyramids get floor(base lots * ratio) and
+  the engine's pyramid gate applies the margin/risk constraints
+"""
+import logging
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.indicators import IndicatorParams, compute_indicators, get_indicator_params
+from core.models import InstrumentType, Signal, SignalType
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+logger = logging.getLogger(__name__)
+
+# Event kinds produced by the kernel
+EVENT_ENTRY = 0
+EVENT_PYRAMID = 1
+EVENT_EXIT = 2
+
+
+@dataclass(frozen=True)
+class StrategyRules:
+    """Position management inputs of the V9 Pine strategies (1R pyramid gate)"""
+    max_pyramids: int = 5
+    atr_pyramid_threshold: float = 0.5
+    pyramid_size_ratio: float = 0.5
+    basso_initial_atr_mult: float = 1.0
+    basso_trailing_atr_mult: float = 2.0
+
+
+V9_STRATEGY_RULES: Dict[str, StrategyRules] = {
+    InstrumentType.BANK_NIFTY.value: StrategyRules(),
+    InstrumentType.GOLD_MINI.value: StrategyRules(max_pyramids=3),
+    InstrumentType.SILVER_MINI.value: StrategyRules(
+        atr_pyramid_threshold=1.5, basso_initial_atr_mult=2.0, basso_trailing_atr_mult=3.0
+    ),
+}
+
+
+def get_strategy_rules(instrument: str) -> StrategyRules:
+    """V9 position management inputs for an instrument (BankNifty values if unknown)"""
+    return V9_STRATEGY_RULES.get(instrument, StrategyRules())
+
+
+def entry_conditions(
+    close: np.ndarray,
+    indicators: Dict[str, np.ndarray],
+    params: IndicatorParams
+) -> np.ndarray:
+    """Boolean array of bars where all 7 V9 entry conditions hold (NaN -> False)"""
+    with np.errstate(invalid='ignore'):
+        return (
+            (indicators['rsi'] > params.rsi_threshold)
+            & (close > indicators['ema'])
+            & (close > indicators['dc_upper'])
+            & (indicators['adx'] < params.adx_threshold)
+            & (indicators['er'] > params.er_threshold)
+            & (close > indicators['supertrend'])
+            & ~indicators['is_doji']
+        )
+
+
+@njit(cache=True)
+def _simulate_kernel(
+    close: np.ndarray,
+    atr: np.ndarray,
+    entry: np.ndarray,
+    max_pyramids: int,
+    atr_pyramid_threshold: float,
+    initial_mult: float,
+    trailing_mult: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per-bar Tom Basso state machine.
+
+    Returns:
+        (bar index, event kind, layer, stop) arrays, in fill order
+    """
+    n = len(close)
+    layers = max_pyramids + 1
+    capacity = n * 2 + layers
+    ev_bar = np.empty(capacity, np.int64)
+    ev_kind = np.empty(capacity, np.int64)
+    ev_layer = np.empty(capacity, np.int64)
+    ev_stop = np.empty(capacity, np.float64)
+    count = 0
+
+    active = np.zeros(layers, np.bool_)
+    stop = np.zeros(layers, np.float64)
+    highest = np.zeros(layers, np.float64)
+    base_entry = math.nan
+    base_stop = math.nan
+    last_entry = math.nan
+    pyramids = 0
+
+    for i in range(n):
+        c = close[i]
+        a = atr[i]
+        if math.isnan(a):
+            continue
+
+        in_position = False
+        for k in range(layers):
+            if active[k]:
+                in_position = True
+                break
+
+        if not in_position:
+            if entry[i]:
+                active[0] = True
+                stop[0] = c - initial_mult * a
+                highest[0] = c
+                base_entry = c
+                base_stop = stop[0]
+                last_entry = c
+                pyramids = 0
+                ev_bar[count] = i
+                ev_kind[count] = 0
+                ev_layer[count] = 0
+                ev_stop[count] = stop[0]
+                count += 1
+            continue
+
+        # Pyramid: 1R gate from the base entry and ATR spacing from the last entry
+        if pyramids < max_pyramids and active[0]:
+            if (c - base_entry) > (base_entry - base_stop) and (c - last_entry) / a >= atr_pyramid_threshold:
+                pyramids += 1
+                ev_bar[count] = i
+                ev_kind[count] = 1
+                ev_layer[count] = pyramids
+                ev_stop[count] = stop[0]
+                count += 1
+                active[pyramids] = True
+                stop[pyramids] = c - initial_mult * a
+                highest[pyramids] = c
+                last_entry = c
+
+        # Independent trailing stops per layer
+        for k in range(layers):
+            if not active[k]:
+                continue
+            if c > highest[k]:
+                highest[k] = c
+            trail = highest[k] - trailing_mult * a
+            if trail > stop[k]:
+                stop[k] = trail
+            if c < stop[k]:
+                ev_bar[count] = i
+                ev_kind[count] = 2
+                ev_layer[count] = k
+                ev_stop[count] = stop[k]
+                count += 1
+                active[k] = False
+
+    return ev_bar[:count], ev_kind[:count], ev_layer[:count], ev_stop[:count]
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if math.isnan(value) else float(value)
+
+
+def simulate_signals(
+    instrument: str,
+    bars: pd.DataFrame,
+    params: Optional[IndicatorParams] = None,
+    rules: Optional[StrategyRules] = None
+) -> List[Signal]:
+    """
+    Generate V9 signals for one instrument from OHLC bars.
+
+    Args:
+        instrument: Instrument name (e.g. "BANK_NIFTY")
+        bars: DataFrame with timestamp, open, high, low, close columns, oldest first
+        params: Indicator inputs (V9 values for the instrument by default)
+        rules: Position management inputs (V9 values by default)
+
+    Returns:
+        Signals in bar order; suggested_lots is 0 (sized by the engine)
+    """
+    params = params or get_indicator_params(instrument)
+    rules = rules or get_strategy_rules(instrument)
+
+    close = bars['close'].to_numpy(dtype=float)
+    indicators = compute_indicators(
+        bars['open'].to_numpy(dtype=float), bars['high'].to_numpy(dtype=float),
+        bars['low'].to_numpy(dtype=float), close, params
+    )
+    entry = entry_conditions(close, indicators, params)
+    ev_bar, ev_kind, ev_layer, ev_stop = _simulate_kernel(
+        close, indicators['atr'], entry, rules.max_pyramids, rules.atr_pyramid_threshold,
+        rules.basso_initial_atr_mult, rules.basso_trailing_atr_mult
+    )
+
+    timestamps = pd.to_datetime(bars['timestamp']).dt.to_pydatetime()
+    signal_types = (SignalType.BASE_ENTRY, SignalType.PYRAMID, SignalType.EXIT)
+    signals = []
+    for i, kind, layer, stop in zip(ev_bar.tolist(), ev_kind.tolist(), ev_layer.tolist(), ev_stop.tolist()):
+        signals.append(Signal(
+            timestamp=timestamps[i],
+            instrument=instrument,
+            signal_type=signal_types[kind],
+            position=f"Long_{layer + 1}",
+            price=float(close[i]),
+            stop=stop,
+            suggested_lots=0,
+            atr=float(indicators['atr'][i]),
+            er=float(np.nan_to_num(indicators['er'][i])),
+            supertrend=float(indicators['supertrend'][i]),
+            roc=_optional(indicators['roc'][i]),
+            reason='TOM_BASSO_STOP' if kind == EVENT_EXIT else None,
+        ))
+
+    logger.info(
+        f"Simulated {len(close)} bars for {instrument}: {len(signals)} signals "
+        f"({'numba' if NUMBA_AVAILABLE else 'python'} kernel)"
+    )
+    return signals
+
+
+def load_ohlc_csv(csv_path: str) -> pd.DataFrame:
+    """
+    Load OHLC bars from a TradingView chart export or broker history CSV.
+
+    Accepts a 'time', 'timestamp' or 'Date/Time' column (epoch seconds or
+    date strings) and case-insensitive open/high/low/close columns.
+    """
+    df = pd.read_csv(csv_path, encoding='utf-8-sig')
+    df.columns = [col.strip().lower() for col in df.columns]
+    for name in ('timestamp', 'time', 'date/time', 'datetime', 'date'):
+        if name in df.columns:
+            raw = df[name]
+            break
+    else:
+        raise ValueError(f"No timestamp column in {csv_path}")
+
+    if pd.api.types.is_numeric_dtype(raw):
+        timestamps = pd.to_datetime(raw, unit='s')
+    else:
+        timestamps = pd.to_datetime(raw)
+    bars = pd.DataFrame({
+        'timestamp': timestamps,
+        'open': df['open'], 'high': df['high'], 'low': df['low'], 'close': df['close'],
+    })
+    return bars.sort_values('timestamp', kind='stable').reset_index(drop=True)
+
+
+class OHLCStrategySimulator:
+    """Runs V9 rules over bars for several instruments and feeds a backtest engine"""
+
+    def __init__(
+        self,
+        params: Optional[Dict[str, IndicatorParams]] = None,
+        rules: Optional[Dict[str, StrategyRules]] = None
+    ):
+        self.params = params or {}
+        self.rules = rules or {}
+
+    def generate_signals(self, bars_by_instrument: Dict[str, pd.DataFrame]) -> List[Signal]:
+        """All instruments' signals merged chronologically (bar order kept within a timestamp)"""
+        signals: List[Signal] = []
+        for instrument, bars in bars_by_instrument.items():
+            signals.extend(simulate_signals(
+                instrument, bars, self.params.get(instrument), self.rules.get(instrument)
+            ))
+        signals.sort(key=lambda s: s.timestamp)
+        return signals
+
+    def _sized(self, signals: List[Signal], engine) -> '_SizedSignals':
+        return _SizedSignals(signals, engine, self.rules)
+
+    def run(self, engine, bars_by_instrument: Dict[str, pd.DataFrame]) -> Dict:
+        """
+        Simulate and run the signals through a PortfolioBacktestEngine.
+
+        Returns:
+            The engine's run_backtest() result
+        """
+        signals = self.generate_signals(bars_by_instrument)
+        return engine.run_backtest(self._sized(signals, engine))
+
+
+class _SizedSignals:
+    """
+    Signal sequence that fills in pyramid lots from the engine's base position
+    (Pine lot_b) as the engine consumes it; margin and risk limits are left to
+    the engine's pyramid gate.
+    """
+
+    def __init__(self, signals: List[Signal], engine, rules: Dict[str, StrategyRules]):
+        self._signals = signals
+        self._engine = engine
+        self._rules = rules
+
+    def __len__(self) -> int:
+        return len(self._signals)
+
+    def __iter__(self) -> Iterator[Signal]:
+        for signal in self._signals:
+            if signal.signal_type == SignalType.PYRAMID:
+                base = self._engine.base_positions.get(signal.instrument)
+                rules = self._rules.get(signal.instrument) or get_strategy_rules(signal.instrument)
+                signal.suggested_lots = int(math.floor(base.lots * rules.pyramid_size_ratio)) if base else 0
+            yield signal
@@ -8,6 +8,8 @@ import logging
 import requests
 from typing import Dict, List, Optional
 
+from core.tracing import traced
+
 logger = logging.getLogger(__name__)
 
 class OpenAlgoClient:
@@ -89,6 +91,7 @@ class OpenAlgoClient:
                 'error': str(e)
             }
 
+    @traced('broker.place_order')
     def place_order(self, symbol: str, action: str, quantity: int,
                     order_type: str = "MARKET", product: str = "NRML",
                     price: float = 0.0, exchange: str = "NFO",
@@ -153,6 +156,7 @@ class OpenAlgoClient:
             logger.error(f"Unexpected error placing order: {e}")
             return {"status": "error", "message": str(e)}
 
+    @traced('broker.get_order_status')
     def get_order_status(self, order_id: str) -> Optional[Dict]:
         """
         Get order status by order ID
@@ -190,6 +194,7 @@ class OpenAlgoClient:
             logger.error(f"Failed to get order status: {e}")
             return None
 
+    @traced('broker.get_orderbook')
     def get_orderbook(self) -> List[Dict]:
         """
         Get full orderbook (all orders for today)
@@ -301,6 +306,7 @@ class OpenAlgoClient:
 
         return None
 
+    @traced('broker.get_trade_fill_price')
     def get_trade_fill_price(self, order_id: str) -> Optional[float]:
         """
         Get actual fill price from tradebook for a completed order.
@@ -357,6 +363,7 @@ class OpenAlgoClient:
             logger.warning(f"Failed to get tradebook fill price for {order_id}: {e}")
             return None
 
+    @traced('broker.get_positions')
     def get_positions(self) -> List[Dict]:
         """
         Get current open positions from OpenAlgo
@@ -378,6 +385,7 @@ class OpenAlgoClient:
             # Return None to signal upstream that broker fetch failed (avoid false discrepancies)
             return None
 
+    @traced('broker.get_funds')
     def get_funds(self) -> Dict:
         """
         Get available margin/funds
@@ -399,6 +407,7 @@ class OpenAlgoClient:
             logger.error(f"Failed to get funds: {e}")
             return {}
 
+    @traced('broker.get_quote')
     def get_quote(self, symbol: str, exchange: str = None) -> Dict:
         """
         Get live quote for symbol
@@ -494,6 +503,7 @@ class OpenAlgoClient:
             logger.error(f"Failed to get quote for {symbol} ({actual_symbol}@{actual_exchange}): {e}")
             return {}
 
+    @traced('broker.modify_order')
     def modify_order(self, order_id: str, new_price: float,
                      symbol: str = None, action: str = None, exchange: str = None,
                      quantity: int = None, product: str = None,
@@ -553,6 +563,7 @@ class OpenAlgoClient:
             logger.error(f"Failed to modify order {order_id}: {e}")
             return {"status": "error", "message": str(e)}
 
+    @traced('broker.cancel_order')
     def cancel_order(self, order_id: str) -> Dict:
         """
         Cancel an open order
@@ -578,6 +589,7 @@ class OpenAlgoClient:
             logger.error(f"Failed to cancel order {order_id}: {e}")
             return {"status": "error", "message": str(e)}
 
+    @traced('broker.close_position')
     def close_position(self, symbol: str, quantity: int, product: str = "NRML",
                        exchange: str = "NFO") -> Dict:
         """
@@ -0,0 +1,460 @@
+"""
+Async DB Writer - Background batching for audit and execution-log writes
+
+Moves signal_audit, order_execution_log and signal_log INSERT/UPDATEs off the
+signal-processing path. Writes are queued in memory, made durable in a local
+write-ahead file, and flushed by a background thread in batches.
+
+Guarantees:
+1. Durability: every queued write is appended to the WAL before submit()
+   returns; on restart, writes not yet committed to Postgres are replayed
+2. Ordering: writes are applied in submission order (consecutive writes with
+   the same SQL are batched with execute_batch in one round trip)
+3. Bounded visibility delay: a batch is flushed at least every
+   flush_interval_seconds, so Telegram/API reads see records within that delay
+4. Backpressure: when the queue is full, submit() waits briefly and then
+   returns False so the caller falls back to a synchronous write
+5. Flush-on-shutdown: stop() drains the queue before returning
+
+WAL format (JSON Lines):
+    {"seq": 12, "table": "signal_audit", "sql": "...", "params": [...]}
+    {"committed": 12}
+The WAL is truncated whenever everything written to it has been committed.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import psycopg2
+from psycopg2.extras import Json, execute_batch
+
+logger = logging.getLogger(__name__)
+
+# Errors caused by the statement/row itself - retrying the same batch cannot succeed
+_DATA_ERRORS = (psycopg2.IntegrityError, psycopg2.DataError, psycopg2.ProgrammingError)
+
+
+class _Queued:
+    """
+    Returned instead of a row ID when a write was accepted by the writer.
+
+    Falsy (there is no ID to link child rows to), but distinguishable from
+    None, which callers treat as a failed write: `if result is QUEUED`.
+    """
+
+    __slots__ = ()
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __repr__(self) -> str:
+        return 'QUEUED'
+
+
+QUEUED = _Queued()
+
+
+def _encode_param(value: Any) -> Any:
+    """Encode a query parameter into a JSON-safe tagged form for the WAL"""
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, date):
+        return {'__date__': value.isoformat()}
+    if isinstance(value, Decimal):
+        return {'__decimal__': str(value)}
+    if isinstance(value, Json):
+        return {'__json__': value.adapted}
+    return value
+
+
+def _decode_param(value: Any) -> Any:
+    """Inverse of _encode_param"""
+    if isinstance(value, dict) and len(value) == 1:
+        if '__datetime__' in value:
+            return datetime.fromisoformat(value['__datetime__'])
+        if '__date__' in value:
+            return date.fromisoformat(value['__date__'])
+        if '__decimal__' in value:
+            return Decimal(value['__decimal__'])
+        if '__json__' in value:
+            return Json(value['__json__'])
+    return value
+
+
+class WriteOp:
+    """Single queued write (one statement with its parameters)"""
+
+    __slots__ = ('seq', 'table', 'sql', 'params')
+
+    def __init__(self, seq: int, table: str, sql: str, params: Sequence[Any]):
+        self.seq = seq
+        self.table = table
+        self.sql = sql
+        self.params = tuple(params)
+
+    def to_wal(self) -> str:
+        return json.dumps({
+            'seq': self.seq,
+            'table': self.table,
+            'sql': self.sql,
+            'params': [_encode_param(p) for p in self.params],
+        }, default=str)
+
+    @classmethod
+    def from_wal(cls, entry: Dict) -> 'WriteOp':
+        return cls(entry['seq'], entry['table'], entry['sql'],
+                   [_decode_param(p) for p in entry['params']])
+
+
+class AsyncDBWriter:
+    """
+    Background writer for audit-trail tables
+
+    Usage:
+        writer = AsyncDBWriter(db_manager, wal_path='.taskmaster/data/audit_wal.jsonl')
+        writer.start()
+        writer.submit('signal_audit', 'INSERT INTO signal_audit (...) VALUES (%s, ...)', params)
+        ...
+        writer.stop()  # flushes remaining writes
+    """
+
+    def __init__(
+        self,
+        db_manager,
+        wal_path: Optional[str] = None,
+        batch_size: int = 200,
+        flush_interval_seconds: float = 0.5,
+        max_queue_size: int = 10000,
+        enqueue_timeout_seconds: float = 0.05,
+        fsync: bool = False,
+        retry_delay_seconds: float = 1.0
+    ):
+        """
+        Initialize writer
+
+        Args:
+            db_manager: DatabaseStateManager (uses transaction())
+            wal_path: Write-ahead file path (None disables crash safety)
+            batch_size: Max writes applied per DB transaction
+            flush_interval_seconds: Max time a write waits before being flushed
+            max_queue_size: Queue length at which submit() applies backpressure
+            enqueue_timeout_seconds: How long submit() waits for space when full
+            fsync: fsync the WAL on every submit (durable across power loss,
+                   not just process crash)
+            retry_delay_seconds: Delay before retrying a failed batch
+        """
+        self.db = db_manager
+        self.wal_path = wal_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_seconds
+        self.max_queue_size = max_queue_size
+        self.enqueue_timeout = enqueue_timeout_seconds
+        self.fsync = fsync
+        self.retry_delay = retry_delay_seconds
+
+        self._queue: Deque[WriteOp] = deque()
+        self._cond = threading.Condition()
+        self._wal_lock = threading.Lock()
+        self._wal_file = None
+        self._next_seq = 1
+        self._last_committed_seq = 0
+        self._in_flight = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {
+            'submitted': 0,
+            'written': 0,
+            'batches': 0,
+            'batch_failures': 0,
+            'rejected_backpressure': 0,
+            'replayed': 0,
+            'dropped': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Replay any uncommitted WAL entries and start the background thread"""
+        if self._thread is not None and self._thread.is_alive():
+            logger.warning("[ASYNC-DB] Writer already running")
+            return
+
+        if self.wal_path:
+            self._recover_wal()
+            directory = os.path.dirname(self.wal_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._wal_file = open(self.wal_path, 'a')
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='async-db-writer', daemon=True)
+        self._thread.start()
+        logger.info(
+            f"[ASYNC-DB] Writer started (batch={self.batch_size}, "
+            f"flush={self.flush_interval}s, wal={self.wal_path or 'disabled'})"
+        )
+
+    def stop(self, timeout: float = 10.0) -> bool:
+        """
+        Flush remaining writes and stop the background thread
+
+        Returns:
+            True if the queue was fully drained
+        """
+        drained = self.flush(timeout=timeout)
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        with self._wal_lock:
+            if self._wal_file:
+                self._wal_file.close()
+                self._wal_file = None
+        logger.info(f"[ASYNC-DB] Writer stopped (drained={drained}, pending={self.pending})")
+        return drained
+
+    @property
+    def pending(self) -> int:
+        """Writes queued or currently being applied"""
+        with self._cond:
+            return len(self._queue) + self._in_flight
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+
+    def submit(self, table: str, sql: str, params: Sequence[Any]) -> bool:
+        """
+        Queue a write
+
+        Args:
+            table: Target table (for stats/logging)
+            sql: Parameterized statement (no RETURNING - the result is not read)
+            params: Statement parameters
+
+        Returns:
+            True if queued, False if the writer is stopped or saturated
+            (caller should write synchronously)
+        """
+        if self._thread is None or self._stop_event.is_set():
+            return False
+
+        with self._cond:
+            if len(self._queue) >= self.max_queue_size:
+                self._cond.wait_for(
+                    lambda: len(self._queue) < self.max_queue_size,
+                    timeout=self.enqueue_timeout
+                )
+                if len(self._queue) >= self.max_queue_size:
+                    self.stats['rejected_backpressure'] += 1
+                    logger.warning(f"[ASYNC-DB] Queue full ({len(self._queue)}), falling back to sync write")
+                    return False
+
+            with self._wal_lock:
+                op = WriteOp(self._next_seq, table, sql, params)
+                self._next_seq += 1
+                self._append_wal(op.to_wal())
+
+            self._queue.append(op)
+            self.stats['submitted'] += 1
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify_all()
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Block until all queued writes are committed
+
+        Returns:
+            True if drained within timeout
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._queue or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._thread is None or not self._thread.is_alive():
+                    return False
+                self._cond.wait(timeout=min(remaining, 0.1))
+        return True
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats)
+        stats['pending'] = self.pending
+        return stats
+
+    # ------------------------------------------------------------------
+    # Background thread
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._queue:
+                    if self._stop_event.is_set():
+                        return
+                    self._cond.wait(timeout=self.flush_interval)
+                elif len(self._queue) < self.batch_size and not self._stop_event.is_set():
+                    # Let a partial batch fill up for at most one flush interval
+                    self._cond.wait(timeout=self.flush_interval)
+                if not self._queue:
+                    continue
+                count = min(len(self._queue), self.batch_size)
+                batch = [self._queue.popleft() for _ in range(count)]
+                last_seq = batch[-1].seq
+                self._in_flight = count
+
+            try:
+                try:
+                    self._write_batch(batch)
+                    self.stats['written'] += count
+                except _DATA_ERRORS as e:
+                    # A bad row must not block the queue: apply one by one, drop rejects
+                    logger.error(f"[ASYNC-DB] Batch rejected ({e}), applying writes individually")
+                    self._write_individually(batch)
+            except Exception as e:
+                self.stats['batch_failures'] += 1
+                logger.error(f"[ASYNC-DB] Batch of {len(batch)} writes failed, will retry: {e}")
+                with self._cond:
+                    self._queue.extendleft(reversed(batch))
+                    self._in_flight = 0
+                    self._cond.notify_all()
+                self._stop_event.wait(self.retry_delay)
+                if self._stop_event.is_set():
+                    # Shutting down with DB down: writes stay in the WAL for replay
+                    return
+                continue
+
+            with self._cond:
+                self._in_flight = 0
+                self.stats['batches'] += 1
+                self._commit_wal(last_seq, queue_empty=not self._queue)
+                self._cond.notify_all()
+
+    def _write_individually(self, batch: List[WriteOp]):
+        """
+        Apply writes one per transaction, dropping those the DB rejects
+
+        Applied writes are removed from `batch` so that on a transient failure
+        only the remainder is re-queued. Only applied writes count as written;
+        rejects count as dropped.
+        """
+        while batch:
+            op = batch[0]
+            try:
+                self._write_batch([op])
+                self.stats['written'] += 1
+            except _DATA_ERRORS as e:
+                self.stats['dropped'] += 1
+                logger.error(
+                    f"[ASYNC-DB] Dropping {op.table} write seq={op.seq} rejected by DB: {e} "
+                    f"params={op.params!r}"
+                )
+            batch.pop(0)
+
+    def _write_batch(self, batch: List[WriteOp]):
+        """Apply a batch in one transaction, grouping consecutive identical statements"""
+        groups: List[Tuple[str, List[Tuple]]] = []
+        for op in batch:
+            if groups and groups[-1][0] == op.sql:
+                groups[-1][1].append(op.params)
+            else:
+                groups.append((op.sql, [op.params]))
+
+        with self.db.transaction() as conn:
+            with conn.cursor() as cur:
+                for sql, params_list in groups:
+                    if len(params_list) == 1:
+                        cur.execute(sql, params_list[0])
+                    else:
+                        execute_batch(cur, sql, params_list, page_size=self.batch_size)
+
+    # ------------------------------------------------------------------
+    # Write-ahead file
+    # ------------------------------------------------------------------
+
+    def _append_wal(self, line: str):
+        """Append a line to the WAL (caller holds _wal_lock)"""
+        if not self._wal_file:
+            return
+        self._wal_file.write(line + '\n')
+        self._wal_file.flush()
+        if self.fsync:
+            os.fsync(self._wal_file.fileno())
+
+    def _commit_wal(self, seq: int, queue_empty: bool):
+        """Record a committed sequence number; truncate the WAL when fully drained"""
+        with self._wal_lock:
+            self._last_committed_seq = seq
+            if not self._wal_file:
+                return
+            if queue_empty and seq == self._next_seq - 1:
+                self._wal_file.truncate(0)
+                self._wal_file.seek(0)
+            else:
+                self._append_wal(json.dumps({'committed': seq}))
+
+    def _recover_wal(self):
+        """Re-queue WAL entries that were not committed before the last shutdown/crash"""
+        if not os.path.exists(self.wal_path):
+            return
+
+        ops: List[WriteOp] = []
+        committed = 0
+        with open(self.wal_path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn final line from a crash mid-write
+                    logger.warning("[ASYNC-DB] Skipping corrupt WAL line")
+                    continue
+                if 'committed' in entry:
+                    committed = max(committed, entry['committed'])
+                else:
+                    ops.append(WriteOp.from_wal(entry))
+
+        pending = [op for op in ops if op.seq > committed]
+        max_seq = max([committed] + [op.seq for op in ops])
+        self._next_seq = max_seq + 1
+        self._last_committed_seq = committed
+
+        # Rewrite WAL with only the pending entries
+        with open(self.wal_path, 'w') as f:
+            for op in pending:
+                f.write(op.to_wal() + '\n')
+
+        self._queue.extend(pending)
+        self.stats['replayed'] = len(pending)
+        if pending:
+            logger.warning(f"[ASYNC-DB] Replaying {len(pending)} uncommitted writes from {self.wal_path}")
+
+
+# Global instance
+_async_db_writer: Optional[AsyncDBWriter] = None
+
+
+def init_async_db_writer(db_manager, wal_path: Optional[str] = None, **kwargs) -> AsyncDBWriter:
+    """Initialize and start global AsyncDBWriter instance"""
+    global _async_db_writer
+    _async_db_writer = AsyncDBWriter(db_manager, wal_path=wal_path, **kwargs)
+    _async_db_writer.start()
+    return _async_db_writer
+
+
+def get_async_db_writer() -> Optional[AsyncDBWriter]:
+    """Get global AsyncDBWriter instance"""
+    return _async_db_writer
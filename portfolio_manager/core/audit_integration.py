@@ -27,6 +27,7 @@ from core.signal_audit_service import (
     SignalAuditService, SignalOutcome, SignalAuditRecord
 )
 from core.order_execution_logger import OrderExecutionLogger, OrderLogEntry
+from core.async_db_writer import QUEUED, get_async_db_writer
 from core.signal_validator import (
     ConditionValidationResult, ExecutionValidationResult, SignalValidator
 )
@@ -52,8 +53,9 @@ class AuditIntegration:
         """
         self.db_pool = db_pool
         self.instance_id = instance_id
+        # Audit inserts stay inline (start_signal needs the ID); order log entries can be queued
         self.audit_service = SignalAuditService(db_pool)
-        self.order_logger = OrderExecutionLogger(db_pool)
+        self.order_logger = OrderExecutionLogger(db_pool, writer=get_async_db_writer())
 
         # Track active signal audits
         self._active_audits: Dict[str, int] = {}  # fingerprint -> audit_id
@@ -78,7 +80,8 @@ class AuditIntegration:
             received_at: When signal was received (defaults to now)
 
         Returns:
-            Audit ID (database ID) or None on failure
+            Audit ID (database ID), QUEUED if the insert was queued on the
+            background writer, or None on failure
         """
         try:
             start_time = time.time()
@@ -101,6 +104,8 @@ class AuditIntegration:
                 self._active_audits[fingerprint] = audit_id
                 self._audit_start_times[audit_id] = start_time
                 logger.debug(f"[AuditIntegration] Started audit for {fingerprint}, id={audit_id}")
+            elif audit_id is QUEUED:
+                logger.debug(f"[AuditIntegration] Audit for {fingerprint} queued (no ID to update)")
 
             return audit_id
 
@@ -0,0 +1,381 @@
+"""
+Audit Read Model - In-memory aggregates for Telegram bot queries
+
+The bot's /status, /stats, /signals, /orders and /sizing commands used to
+aggregate signal_audit and order_execution_log with fresh SQL on every call
+(COUNT/FILTER over N days, slippage AVG/STDDEV), loading the primary DB
+while trading is active.
+
+This read model is maintained incrementally by SignalAuditService and
+OrderExecutionLogger as records are written (inline or queued on the
+background writer), and answers the same queries from memory.
+
+Design:
+- Per-day buckets for the last RETENTION_DAYS days (the /stats maximum):
+  counts by outcome and instrument, processing time, and completed-order
+  slippage samples per (instrument, order_type) for percentiles
+- The most recent signals/orders in bounded deques, with the full audit
+  record (sizing, execution) for /sizing and /signal
+- warm() loads the same aggregates from the DB once at startup (one grouped
+  query per table); until then is_warm is False and readers use SQL
+- "days=N" means today plus the N-1 previous calendar days (days=1 is
+  today), rather than SQL's rolling N*24h window
+- Query results have the same shape as the SQL methods they replace
+- Thread-safe: writers are webhook/engine threads, readers the bot loop
+"""
+import logging
+import math
+import threading
+from collections import Counter, OrderedDict, defaultdict, deque
+from datetime import date, datetime, timedelta
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RETENTION_DAYS = 90
+RECENT_LIMIT = 200
+SLIPPAGE_PERCENTILES = (50, 90, 95)
+
+
+class _DayBucket:
+    """Aggregates for one calendar day"""
+
+    __slots__ = ('by_outcome', 'by_instrument', 'processing_ms_total', 'processing_ms_count', 'slippage')
+
+    def __init__(self):
+        self.by_outcome: Counter = Counter()
+        self.by_instrument: Counter = Counter()
+        self.processing_ms_total = 0
+        self.processing_ms_count = 0
+        # (instrument, order_type) -> [(slippage_pct, execution_duration_ms), ...]
+        self.slippage: Dict[Tuple[str, str], List[Tuple[float, Optional[int]]]] = defaultdict(list)
+
+
+def _percentile(ordered: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of a sorted list"""
+    if not ordered:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class AuditReadModel:
+    """Incrementally maintained signal/order aggregates"""
+
+    def __init__(self, retention_days: int = RETENTION_DAYS, recent_limit: int = RECENT_LIMIT):
+        self.retention_days = retention_days
+        self.recent_limit = recent_limit
+        self.is_warm = False
+
+        self._days: Dict[date, _DayBucket] = {}
+        self._recent_signals: Deque[Dict[str, Any]] = deque(maxlen=recent_limit)
+        self._recent_orders: Deque[Dict[str, Any]] = deque(maxlen=recent_limit)
+        # id -> record for the recent window (outcome/status updates, /sizing)
+        self._signals_by_id: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._orders_by_id: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Internal helpers (caller holds the lock)
+    # ------------------------------------------------------------------
+
+    def _bucket(self, day: date) -> _DayBucket:
+        bucket = self._days.get(day)
+        if bucket is None:
+            bucket = self._days[day] = _DayBucket()
+            cutoff = date.today() - timedelta(days=self.retention_days)
+            for old in [d for d in self._days if d <= cutoff]:
+                del self._days[old]
+        return bucket
+
+    def _buckets(self, days: int) -> List[_DayBucket]:
+        first = date.today() - timedelta(days=max(1, days) - 1)
+        return [bucket for day, bucket in self._days.items() if day >= first]
+
+    @staticmethod
+    def _remember(index: "OrderedDict[int, Dict[str, Any]]", key, row: Dict[str, Any], limit: int):
+        if isinstance(key, int):
+            index[key] = row
+            while len(index) > limit:
+                index.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Write side
+    # ------------------------------------------------------------------
+
+    def record_signal(self, record, audit_id=None):
+        """A SignalAuditRecord was written (audit_id is None/QUEUED when not yet known)"""
+        created_at = datetime.now()
+        outcome = getattr(record.outcome, 'value', record.outcome)
+        row = {
+            'id': audit_id if isinstance(audit_id, int) else None,
+            'signal_fingerprint': record.signal_fingerprint,
+            'instrument': record.instrument,
+            'signal_type': record.signal_type,
+            'position': record.position,
+            'signal_timestamp': record.signal_timestamp,
+            'outcome': outcome,
+            'outcome_reason': record.outcome_reason,
+            'processing_duration_ms': record.processing_duration_ms,
+            'created_at': created_at,
+            'validation_result': record.validation_result.to_dict() if record.validation_result else None,
+            'sizing_calculation': record.sizing_calculation.to_dict() if record.sizing_calculation else None,
+            'risk_assessment': record.risk_assessment.to_dict() if record.risk_assessment else None,
+            'order_execution': record.order_execution.to_dict() if record.order_execution else None,
+        }
+        with self._lock:
+            bucket = self._bucket(created_at.date())
+            bucket.by_outcome[outcome] += 1
+            bucket.by_instrument[record.instrument] += 1
+            if record.processing_duration_ms is not None:
+                bucket.processing_ms_total += record.processing_duration_ms
+                bucket.processing_ms_count += 1
+            self._recent_signals.appendleft(row)
+            self._remember(self._signals_by_id, row['id'], row, self.recent_limit)
+
+    def record_outcome(self, audit_id: int, outcome, outcome_reason: Optional[str] = None):
+        """An audit record's outcome changed (e.g. PROCESSED -> FAILED_ORDER)"""
+        outcome = getattr(outcome, 'value', outcome)
+        with self._lock:
+            row = self._signals_by_id.get(audit_id)
+            if row is None:
+                return
+            bucket = self._days.get(row['created_at'].date())
+            if bucket is not None and row['outcome'] != outcome:
+                bucket.by_outcome[row['outcome']] -= 1
+                bucket.by_outcome[outcome] += 1
+            row['outcome'] = outcome
+            row['outcome_reason'] = outcome_reason
+
+    def record_order_execution(self, audit_id: int, order_execution):
+        """Execution summary attached to an audit record"""
+        with self._lock:
+            row = self._signals_by_id.get(audit_id)
+            if row is not None:
+                row['order_execution'] = order_execution.to_dict()
+
+    def record_order(self, entry, log_id=None):
+        """An OrderLogEntry was written (log_id is None/QUEUED when not yet known)"""
+        row = {
+            'id': log_id if isinstance(log_id, int) else None,
+            'signal_audit_id': entry.signal_audit_id,
+            'position_id': entry.position_id,
+            'order_id': entry.order_id,
+            'broker_order_id': entry.broker_order_id,
+            'order_type': entry.order_type,
+            'action': entry.action,
+            'instrument': entry.instrument,
+            'symbol': entry.symbol,
+            'lots': entry.lots,
+            'signal_price': entry.signal_price,
+            'fill_price': entry.fill_price,
+            'slippage_pct': entry.slippage_pct,
+            'order_status': entry.order_status,
+            'status_message': entry.status_message,
+            'order_placed_at': entry.order_placed_at or datetime.now(),
+            'execution_duration_ms': entry.execution_duration_ms,
+            'created_at': datetime.now(),
+        }
+        with self._lock:
+            self._recent_orders.appendleft(row)
+            self._remember(self._orders_by_id, row['id'], row, self.recent_limit)
+            self._add_slippage(row)
+
+    def record_order_status(self, log_id: int, order_status: str, fill_price: Optional[float] = None,
+                            status_message: Optional[str] = None):
+        """An order log entry's status changed"""
+        with self._lock:
+            row = self._orders_by_id.get(log_id)
+            if row is None:
+                return
+            was_complete = row['order_status'] == 'COMPLETE' and row['slippage_pct'] is not None
+            row['order_status'] = order_status
+            if fill_price is not None:
+                row['fill_price'] = fill_price  # slippage_pct is fixed at insert, as in the table
+            if status_message is not None:
+                row['status_message'] = status_message
+            if not was_complete:
+                self._add_slippage(row)
+
+    def _add_slippage(self, row: Dict[str, Any]):
+        if row['order_status'] == 'COMPLETE' and row['slippage_pct'] is not None:
+            bucket = self._bucket(row['created_at'].date())
+            bucket.slippage[(row['instrument'], row['order_type'])].append(
+                (row['slippage_pct'], row['execution_duration_ms'])
+            )
+
+    # ------------------------------------------------------------------
+    # Warm-up
+    # ------------------------------------------------------------------
+
+    def warm(self, audit_service, order_logger, days: Optional[int] = None) -> bool:
+        """
+        Load aggregates from the database (call once at startup, before
+        signals are processed).
+
+        Returns:
+            True if both tables were loaded
+        """
+        days = days or self.retention_days
+        outcome_rows = audit_service.get_daily_outcome_counts(days=days)
+        slippage_rows = order_logger.get_slippage_samples(days=days)
+        recent_signals = audit_service.get_recent_signals(limit=self.recent_limit, lookback_days=days)
+        recent_orders = order_logger.get_recent_orders(limit=self.recent_limit, lookback_days=days)
+        if outcome_rows is None or slippage_rows is None:
+            logger.warning("[READ_MODEL] Warm-up failed - bot queries stay on SQL")
+            return False
+
+        with self._lock:
+            self._days.clear()
+            for row in outcome_rows:
+                bucket = self._bucket(row['day'])
+                bucket.by_outcome[row['outcome']] += row['count']
+                bucket.by_instrument[row['instrument']] += row['count']
+                bucket.processing_ms_total += int(row.get('total_processing_ms') or 0)
+                bucket.processing_ms_count += int(row.get('timed_count') or 0)
+            for row in slippage_rows:
+                bucket = self._bucket(row['day'])
+                bucket.slippage[(row['instrument'], row['order_type'])].append(
+                    (float(row['slippage_pct']), row.get('execution_duration_ms'))
+                )
+
+            self._recent_signals.clear()
+            self._signals_by_id.clear()
+            for row in reversed(recent_signals):
+                row = dict(row)
+                self._recent_signals.appendleft(row)
+                self._remember(self._signals_by_id, row.get('id'), row, self.recent_limit)
+
+            self._recent_orders.clear()
+            self._orders_by_id.clear()
+            for row in reversed(recent_orders):
+                row = dict(row)
+                self._recent_orders.appendleft(row)
+                self._remember(self._orders_by_id, row.get('id'), row, self.recent_limit)
+
+            self.is_warm = True
+
+        logger.info(
+            f"[READ_MODEL] Warmed from DB: {sum(r['count'] for r in outcome_rows)} signals, "
+            f"{len(slippage_rows)} completed orders over {days} days"
+        )
+        return True
+
+    # ------------------------------------------------------------------
+    # Read side (same shapes as SignalAuditService / OrderExecutionLogger)
+    # ------------------------------------------------------------------
+
+    def get_signal_stats(self, days: int = 7) -> Dict[str, Any]:
+        with self._lock:
+            by_outcome: Counter = Counter()
+            by_instrument: Counter = Counter()
+            total_ms = timed = 0
+            for bucket in self._buckets(days):
+                by_outcome.update(bucket.by_outcome)
+                by_instrument.update(bucket.by_instrument)
+                total_ms += bucket.processing_ms_total
+                timed += bucket.processing_ms_count
+
+        by_outcome = +by_outcome  # Drop zero counts left by outcome changes
+        by_instrument = +by_instrument
+        total = sum(by_outcome.values())
+        processed = by_outcome.get('PROCESSED', 0)
+        rejected = sum(count for outcome, count in by_outcome.items() if outcome.startswith('REJECTED'))
+        return {
+            'total_signals': total,
+            'processed': processed,
+            'rejected': rejected,
+            'failed': by_outcome.get('FAILED_ORDER', 0),
+            'instruments': len(by_instrument),
+            'avg_processing_ms': total_ms / timed if timed else None,
+            'processed_rate': processed / total if total else 0,
+            'rejection_rate': rejected / total if total else 0,
+            'by_outcome': dict(by_outcome),
+            'by_instrument': dict(by_instrument),
+        }
+
+    def get_rejection_reasons(self, days: int = 7) -> List[Dict[str, Any]]:
+        with self._lock:
+            by_outcome: Counter = Counter()
+            for bucket in self._buckets(days):
+                by_outcome.update(bucket.by_outcome)
+        by_outcome = +by_outcome
+        total = sum(by_outcome.values())
+        return [
+            {'outcome': outcome, 'count': count, 'percentage': round(count / total * 100, 1)}
+            for outcome, count in by_outcome.most_common()
+        ]
+
+    def get_recent_signals(self, limit: int = 10, instrument: Optional[str] = None,
+                           outcome=None, lookback_days: int = 31) -> List[Dict[str, Any]]:
+        outcome = getattr(outcome, 'value', outcome)
+        with self._lock:
+            rows = [
+                dict(row) for row in self._recent_signals
+                if (instrument is None or row['instrument'] == instrument)
+                and (outcome is None or row['outcome'] == outcome)
+            ]
+        return rows[:limit]
+
+    def get_audit_by_id(self, audit_id: int) -> Optional[Dict[str, Any]]:
+        """Recent audit record, or None if it is not in memory (caller falls back to SQL)"""
+        with self._lock:
+            row = self._signals_by_id.get(audit_id)
+            return dict(row) if row is not None and 'sizing_calculation' in row else None
+
+    def get_recent_orders(self, limit: int = 20, instrument: Optional[str] = None,
+                          status: Optional[str] = None, lookback_days: int = 31) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = [
+                dict(row) for row in self._recent_orders
+                if (instrument is None or row['instrument'] == instrument)
+                and (status is None or row['order_status'] == status)
+            ]
+        return rows[:limit]
+
+    def get_slippage_stats(self, days: int = 30, instrument: Optional[str] = None) -> Dict[str, Any]:
+        samples: Dict[Tuple[str, str], List[Tuple[float, Optional[int]]]] = defaultdict(list)
+        with self._lock:
+            for bucket in self._buckets(days):
+                for key, values in bucket.slippage.items():
+                    if instrument is None or key[0] == instrument:
+                        samples[key].extend(values)
+
+        statistics = []
+        for (inst, order_type), values in sorted(samples.items()):
+            slippage = sorted(v[0] for v in values)
+            durations = [v[1] for v in values if v[1] is not None]
+            count = len(slippage)
+            mean = sum(slippage) / count
+            stat = {
+                'instrument': inst,
+                'order_type': order_type,
+                'order_count': count,
+                'avg_slippage_pct': mean,
+                'min_slippage_pct': slippage[0],
+                'max_slippage_pct': slippage[-1],
+                'stddev_slippage_pct': (
+                    math.sqrt(sum((s - mean) ** 2 for s in slippage) / (count - 1)) if count > 1 else None
+                ),
+                'avg_duration_ms': sum(durations) / len(durations) if durations else None,
+            }
+            for pct in SLIPPAGE_PERCENTILES:
+                stat[f'p{pct}_slippage_pct'] = _percentile(slippage, pct)
+            statistics.append(stat)
+
+        return {'period_days': days, 'instrument_filter': instrument, 'statistics': statistics}
+
+
+_audit_read_model: Optional[AuditReadModel] = None
+
+
+def init_audit_read_model(**kwargs) -> AuditReadModel:
+    """Initialize global AuditReadModel instance"""
+    global _audit_read_model
+    _audit_read_model = AuditReadModel(**kwargs)
+    return _audit_read_model
+
+
+def get_audit_read_model() -> Optional[AuditReadModel]:
+    """Get global AuditReadModel instance"""
+    return _audit_read_model
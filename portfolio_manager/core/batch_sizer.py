@@ -0,0 +1,268 @@
+"""
+Batch What-If Position Sizing
+
+Vectorized form of TomBassoPositionSizer for sizing questions over many
+rows at once ("how many lots at each of these stops?", "what does the next
+pyramid look like at each price?"). The dashboard renders sizing ladders
+from one /sizing/batch call and the Telegram /sizing command uses the same
+code, so the formula is not re-implemented in the frontend.
+
+Design:
+- Inputs are columns (scalars broadcast against arrays), one row per
+  what-if scenario; no Signal objects, no per-row logging
+- Each function mirrors one TomBassoPositionSizer method exactly, including
+  its invalid-input results, limiter names and test-mode minimum
+  (tests/unit/test_batch_sizer.py checks row-by-row parity)
+- Results are dicts of numpy columns; to_json() converts them for HTTP
+- The live trading path keeps using TomBassoPositionSizer
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from core.config import get_instrument_config
+from core.models import InstrumentConfig, InstrumentType
+
+# Live engine sizes against 60% of equity as available margin
+DEFAULT_MARGIN_FRACTION = 0.6
+
+MODE_BASE = 'base'
+MODE_PYRAMID = 'pyramid'
+MODE_PEEL_OFF = 'peel_off'
+
+# Column inputs per mode: (required, optional)
+MODE_COLUMNS = {
+    MODE_BASE: (('price', 'stop'), ('atr', 'er', 'equity', 'available_margin')),
+    MODE_PYRAMID: (
+        ('price', 'stop', 'base_position_size', 'profit_after_base_risk'),
+        ('pyramid_count', 'available_margin', 'equity')
+    ),
+    MODE_PEEL_OFF: (('position_risk', 'position_vol', 'current_lots'), ('equity',)),
+}
+
+MAX_ROWS = 10000
+
+
+def _columns(*values) -> List[np.ndarray]:
+    """Broadcast scalars/sequences to equal-length float columns"""
+    arrays = np.broadcast_arrays(*[np.atleast_1d(np.asarray(v, dtype=float)) for v in values])
+    if arrays[0].ndim != 1:
+        raise ValueError("sizing inputs must be scalars or 1-D sequences")
+    return [np.array(a) for a in arrays]
+
+
+def size_base_entries(config: InstrumentConfig, price, stop, atr, er, equity, available_margin) -> Dict[str, np.ndarray]:
+    """
+    Base entry sizing per row (see TomBassoPositionSizer.calculate_base_entry_size)
+
+    Returns:
+        Columns lot_r, lot_v, lot_m, final_lots, limiter
+    """
+    price, stop, atr, er, equity, available_margin = _columns(price, stop, atr, er, equity, available_margin)
+    point_value = config.point_value
+    risk_per_point = price - stop
+    valid = risk_per_point > 0
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        risk_amount = equity * (config.initial_risk_percent / 100.0)
+        lot_r = np.where(valid, risk_amount / (risk_per_point * point_value) * er, 0.0)
+
+        # Volatility (Lot-V) is reference only, as for single signals
+        vol_per_lot = atr * point_value
+        lot_v = np.where(vol_per_lot > 0, equity * (config.initial_vol_percent / 100.0) / vol_per_lot, 0.0)
+
+    if config.margin_per_lot > 0:
+        lot_m = available_margin / config.margin_per_lot
+    else:
+        lot_m = np.zeros_like(available_margin)
+
+    final_lots = np.maximum(0, np.floor(np.minimum(lot_r, lot_m))).astype(int)
+    limiter = np.where(lot_r <= lot_m, 'risk', 'margin').astype(object)
+
+    # Invalid stop: every constraint reported as 0
+    return {
+        'lot_r': lot_r,
+        'lot_v': np.where(valid, lot_v, 0.0),
+        'lot_m': np.where(valid, lot_m, 0.0),
+        'final_lots': np.where(valid, final_lots, 0),
+        'limiter': np.where(valid, limiter, 'invalid_risk'),
+    }
+
+
+def size_pyramids(config: InstrumentConfig, price, stop, available_margin, base_position_size,
+                  profit_after_base_risk, pyramid_count=0, test_mode: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Pyramid sizing per row (see TomBassoPositionSizer.calculate_pyramid_size)
+
+    Returns:
+        Columns lot_a (margin), lot_b (geometric discipline), lot_c (risk
+        budget), final_lots, limiter
+    """
+    price, stop, available_margin, base_position_size, profit_after_base_risk, pyramid_count = _columns(
+        price, stop, available_margin, base_position_size, profit_after_base_risk, pyramid_count
+    )
+    pyramid_count = pyramid_count.astype(int)
+
+    lot_a = np.floor(available_margin / config.margin_per_lot)
+    lot_b = np.floor(base_position_size * 0.5 ** (pyramid_count + 1))
+
+    risk_per_point = price - stop
+    valid = risk_per_point > 0
+    risk_per_lot = risk_per_point * config.point_value
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lot_c = np.where(valid & (risk_per_lot > 0), np.floor(profit_after_base_risk * 0.5 / risk_per_lot), 0.0)
+
+    smallest = np.minimum(np.minimum(lot_a, lot_b), lot_c)
+    final_lots = np.maximum(0, np.floor(smallest)).astype(int)
+    geometric = np.char.add('geometric_0.5^', (pyramid_count + 1).astype(str)).astype(object)
+    limiter = np.where(smallest == lot_a, 'margin', np.where(smallest == lot_b, geometric, 'risk_budget'))
+
+    if test_mode:
+        bump = valid & (final_lots == 0) & (lot_a >= 1)
+        final_lots = np.where(bump, 1, final_lots)
+        limiter = np.where(bump, 'test_mode_min', limiter)
+
+    return {
+        'lot_a': lot_a,
+        'lot_b': lot_b,
+        'lot_c': lot_c,
+        'final_lots': np.where(valid, final_lots, 0),
+        'limiter': np.where(valid, limiter, 'invalid_risk').astype(object),
+    }
+
+
+def size_peel_offs(config: InstrumentConfig, position_risk, position_vol, equity, current_lots) -> Dict[str, np.ndarray]:
+    """
+    Peel-off lots per row (see TomBassoPositionSizer.calculate_peel_off_size)
+
+    Returns:
+        Columns risk_pct, vol_pct, lots_to_peel, reason
+    """
+    position_risk, position_vol, equity, current_lots = _columns(position_risk, position_vol, equity, current_lots)
+    ongoing_risk_pct = config.ongoing_risk_percent
+    ongoing_vol_pct = config.ongoing_vol_percent
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        risk_pct = position_risk / equity * 100
+        vol_pct = position_vol / equity * 100
+        over_risk = risk_pct > ongoing_risk_pct
+        over_vol = vol_pct > ongoing_vol_pct
+        risk_peel = np.where(
+            over_risk, np.ceil((position_risk - equity * ongoing_risk_pct / 100) / (position_risk / current_lots)), 0
+        )
+        vol_peel = np.where(
+            over_vol, np.ceil((position_vol - equity * ongoing_vol_pct / 100) / (position_vol / current_lots)), 0
+        )
+    lots_to_peel = np.minimum(np.maximum(np.nan_to_num(np.maximum(risk_peel, vol_peel)), 0), current_lots).astype(int)
+
+    reasons = []
+    for r_pct, v_pct, r_over, v_over in zip(risk_pct, vol_pct, over_risk, over_vol):
+        if r_over:
+            reason = f"risk_{r_pct:.1f}%_exceeds_{ongoing_risk_pct}%"
+            if v_over:
+                reason += f"_and_vol_{v_pct:.1f}%"
+        elif v_over:
+            reason = f"vol_{v_pct:.1f}%_exceeds_{ongoing_vol_pct}%"
+        else:
+            reason = ""
+        reasons.append(reason)
+
+    return {
+        'risk_pct': risk_pct,
+        'vol_pct': vol_pct,
+        'lots_to_peel': lots_to_peel,
+        'reason': np.array(reasons, dtype=object),
+    }
+
+
+def stop_ladder(price: float, stop: float, multipliers=(0.5, 0.75, 1.0, 1.25, 1.5, 2.0)) -> np.ndarray:
+    """Stops at multiples of the given stop distance (for sizing ladders)"""
+    return price - (price - stop) * np.asarray(multipliers, dtype=float)
+
+
+def what_if(instrument: str, mode: str, inputs: Dict[str, Any], equity: Optional[float] = None,
+            test_mode: bool = False) -> Dict[str, Any]:
+    """
+    Size a batch of what-if rows for one instrument.
+
+    Args:
+        instrument: InstrumentType value (e.g. 'BANK_NIFTY')
+        mode: 'base', 'pyramid' or 'peel_off'
+        inputs: Column name -> scalar or list (see MODE_COLUMNS); 'equity'
+                defaults to the `equity` argument, 'available_margin' to
+                60% of equity, 'er' to 1.0, 'atr' and 'pyramid_count' to 0
+        equity: Default equity (the live engine sizes on equity_high)
+        test_mode: Apply the pyramid test-mode 1-lot minimum
+
+    Returns:
+        {'instrument', 'mode', 'rows', 'inputs': {...}, 'results': {...}}
+        with every column as a list
+
+    Raises:
+        ValueError: Unknown instrument/mode, missing or malformed columns
+    """
+    try:
+        config = get_instrument_config(InstrumentType(instrument))
+    except ValueError:
+        raise ValueError(f"Unknown instrument: {instrument}") from None
+    if mode not in MODE_COLUMNS:
+        raise ValueError(f"Unknown mode: {mode} (expected one of {', '.join(MODE_COLUMNS)})")
+
+    required, optional = MODE_COLUMNS[mode]
+    unknown = set(inputs) - set(required) - set(optional)
+    if unknown:
+        raise ValueError(f"Unknown inputs for {mode}: {', '.join(sorted(unknown))}")
+    missing = [name for name in required if inputs.get(name) is None]
+    if missing:
+        raise ValueError(f"Missing inputs for {mode}: {', '.join(missing)}")
+
+    columns = dict(inputs)
+    if columns.get('equity') is None:
+        if equity is None:
+            raise ValueError("equity is required")
+        columns['equity'] = equity
+    if 'available_margin' in optional and columns.get('available_margin') is None:
+        columns['available_margin'] = np.asarray(columns['equity'], dtype=float) * DEFAULT_MARGIN_FRACTION
+
+    try:
+        if mode == MODE_BASE:
+            results = size_base_entries(
+                config, columns['price'], columns['stop'], columns.get('atr', 0.0), columns.get('er', 1.0),
+                columns['equity'], columns['available_margin']
+            )
+        elif mode == MODE_PYRAMID:
+            results = size_pyramids(
+                config, columns['price'], columns['stop'], columns['available_margin'],
+                columns['base_position_size'], columns['profit_after_base_risk'],
+                columns.get('pyramid_count', 0), test_mode=test_mode
+            )
+        else:
+            results = size_peel_offs(
+                config, columns['position_risk'], columns['position_vol'], columns['equity'], columns['current_lots']
+            )
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid sizing inputs: {e}") from None
+
+    rows = len(next(iter(results.values())))
+    if rows > MAX_ROWS:
+        raise ValueError(f"Too many rows: {rows} (max {MAX_ROWS})")
+
+    return {
+        'instrument': instrument,
+        'mode': mode,
+        'rows': rows,
+        'inputs': to_json({name: np.broadcast_to(np.asarray(value, dtype=float), (rows,))
+                           for name, value in columns.items()}),
+        'results': to_json(results),
+    }
+
+
+def to_json(columns: Dict[str, np.ndarray]) -> Dict[str, list]:
+    """Columns as JSON-serializable lists (non-finite floats become None)"""
+    out = {}
+    for name, column in columns.items():
+        if column.dtype.kind == 'f':
+            out[name] = [float(v) if np.isfinite(v) else None for v in column]
+        else:
+            out[name] = column.tolist()
+    return out
@@ -14,6 +14,8 @@ from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+from core.latency_metrics import get_latency_metrics, BROKER_CALL_LATENCY, BACKGROUND_TASK_LATENCY
+
 logger = logging.getLogger(__name__)
 
 
@@ -118,7 +120,8 @@ class BrokerSyncManager:
                     break  # Stop event set
 
                 # Perform sync
-                result = self.sync_now()
+                with get_latency_metrics().time(BACKGROUND_TASK_LATENCY, task='broker_sync'):
+                    result = self.sync_now()
 
                 # Only alert discrepancies if sync was successful (broker reachable)
                 if result.success:
@@ -169,7 +172,8 @@ class BrokerSyncManager:
             pm_positions = pm_state.get_open_positions()
 
             # Get broker positions via OpenAlgo
-            broker_positions = self._fetch_broker_positions()
+            with get_latency_metrics().time(BROKER_CALL_LATENCY, call='positions', instrument='all'):
+                broker_positions = self._fetch_broker_positions()
 
             if broker_positions is None:
                 logger.warning("[SYNC] Broker positions unavailable (fetch failed) - skipping discrepancy checks")
@@ -0,0 +1,550 @@
+"""
+Bulk Historical Import - COPY into staging, set-based merge, ledger rebuild
+
+Backfills years of history into portfolio_positions, strategy_trade_history
+and capital_transactions without row-at-a-time INSERTs or hand-written
+ledger migrations (scripts/import_from_csv.py, sync_historical_trade.py,
+012_rebuild_ledger_complete.sql).
+
+Design:
+- Input is CSV (header row) or Parquet (requires pyarrow, optional); rows are
+  streamed: each row is validated and normalized (defaults, signed amounts,
+  lot sizes) in Python and fed to COPY ... FROM STDIN through a file-like
+  reader, so the file is never held in memory
+- COPY lands in a temporary staging table; the merge is three set-based
+  statements per dataset: de-duplicate staging on the natural key (last row
+  wins), UPDATE target rows that differ, INSERT rows whose key is missing
+- Natural keys make re-runs idempotent: importing the same file twice
+  inserts and updates nothing the second time
+    positions: position_id
+    trades:    (strategy_id, position_id, closed_at)
+    capital:   (strategy_id, transaction_type, created_at, position_id)
+- The equity ledger is rebuilt in one window-function pass per strategy
+  (running SUM(amount) over created_at, id) and portfolio_state
+  closed_equity / initial_capital / equity_high follow from it
+- Everything runs in one transaction; dry_run rolls it back after reporting
+- ImportReport carries counts, COPY / merge timings and rows/second
+"""
+import csv
+import io
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from core.lot_size_history import get_lot_size_for_instrument
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pq = None
+    PYARROW_AVAILABLE = False
+
+TRANSACTION_TYPES = ('DEPOSIT', 'WITHDRAW', 'TRADING_PNL')
+
+# Rows buffered per COPY read() call
+COPY_CHUNK_ROWS = 5000
+
+PARQUET_BATCH_ROWS = 50000
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """One importable table"""
+    name: str
+    target: str
+    columns: Tuple[Tuple[str, str], ...]  # (column, Postgres type) in COPY order
+    required: Tuple[str, ...]
+    key: Tuple[str, ...]  # Natural key for idempotent merges
+
+    @property
+    def column_names(self) -> Tuple[str, ...]:
+        return tuple(name for name, _ in self.columns)
+
+    def column_type(self, name: str) -> str:
+        return dict(self.columns)[name]
+
+
+DATASETS: Dict[str, Dataset] = {
+    'positions': Dataset(
+        name='positions',
+        target='portfolio_positions',
+        columns=(
+            ('position_id', 'VARCHAR(50)'), ('instrument', 'VARCHAR(20)'), ('status', 'VARCHAR(20)'),
+            ('entry_timestamp', 'TIMESTAMP'), ('entry_price', 'NUMERIC(12,2)'),
+            ('lots', 'INTEGER'), ('quantity', 'INTEGER'),
+            ('initial_stop', 'NUMERIC(12,2)'), ('current_stop', 'NUMERIC(12,2)'), ('highest_close', 'NUMERIC(12,2)'),
+            ('realized_pnl', 'NUMERIC(15,2)'),
+            ('exit_timestamp', 'TIMESTAMP'), ('exit_price', 'NUMERIC(12,2)'), ('exit_reason', 'VARCHAR(50)'),
+            ('is_base_position', 'BOOLEAN'), ('is_test', 'BOOLEAN'), ('strategy_id', 'INTEGER'),
+        ),
+        required=('position_id', 'instrument', 'entry_timestamp', 'entry_price', 'lots', 'initial_stop'),
+        key=('position_id',),
+    ),
+    'trades': Dataset(
+        name='trades',
+        target='strategy_trade_history',
+        columns=(
+            ('strategy_id', 'INTEGER'), ('position_id', 'VARCHAR(50)'), ('instrument', 'VARCHAR(50)'),
+            ('symbol', 'VARCHAR(100)'), ('direction', 'VARCHAR(10)'), ('lots', 'INTEGER'),
+            ('entry_price', 'NUMERIC(15,2)'), ('exit_price', 'NUMERIC(15,2)'), ('realized_pnl', 'NUMERIC(15,2)'),
+            ('opened_at', 'TIMESTAMP'), ('closed_at', 'TIMESTAMP'),
+        ),
+        required=('position_id', 'instrument', 'realized_pnl', 'closed_at'),
+        key=('strategy_id', 'position_id', 'closed_at'),
+    ),
+    'capital': Dataset(
+        name='capital',
+        target='capital_transactions',
+        columns=(
+            ('strategy_id', 'INTEGER'), ('transaction_type', 'VARCHAR(20)'), ('amount', 'NUMERIC(15,2)'),
+            ('notes', 'TEXT'), ('created_at', 'TIMESTAMP'), ('created_by', 'VARCHAR(50)'),
+            ('position_id', 'VARCHAR(50)'),
+        ),
+        required=('transaction_type', 'amount', 'created_at'),
+        key=('strategy_id', 'transaction_type', 'created_at', 'position_id'),
+    ),
+}
+
+
+@dataclass
+class ImportReport:
+    """Outcome of one bulk import"""
+    dataset: str
+    source: str
+    dry_run: bool = False
+    rows_read: int = 0
+    rows_distinct: int = 0  # After de-duplicating on the natural key
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    ledger_entries_added: int = 0
+    ledger_rows_rebuilt: int = 0
+    strategies: List[int] = field(default_factory=list)
+    copy_seconds: float = 0.0
+    merge_seconds: float = 0.0
+    ledger_seconds: float = 0.0
+    total_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_read / self.total_seconds if self.total_seconds > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return dict(asdict(self), rows_per_second=round(self.rows_per_second, 1))
+
+
+# ===== INPUT =====
+
+def read_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream rows from a CSV (with header) or Parquet file
+
+    Raises:
+        RuntimeError: Parquet input without pyarrow installed
+    """
+    if path.lower().endswith('.parquet'):
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("Parquet input requires pyarrow (pip install pyarrow)")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=PARQUET_BATCH_ROWS):
+            yield from batch.to_pylist()
+    else:
+        with open(path, 'r', newline='') as f:
+            yield from csv.DictReader(f)
+
+
+def _parse_timestamp(value) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day).isoformat()
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00')).isoformat()
+
+
+def _parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ('1', 'true', 't', 'yes', 'y'):
+        return True
+    if text in ('0', 'false', 'f', 'no', 'n'):
+        return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+
+def _parse(value, pg_type: str):
+    """Python value for a column of the given Postgres type"""
+    if pg_type == 'INTEGER':
+        number = float(value)
+        if not number.is_integer():
+            raise ValueError(f"not an integer: {value!r}")
+        return int(number)
+    if pg_type.startswith('NUMERIC'):
+        return float(value)
+    if pg_type == 'TIMESTAMP':
+        return _parse_timestamp(value)
+    if pg_type == 'BOOLEAN':
+        return _parse_bool(value)
+    return str(value).strip()
+
+
+def normalize_row(dataset: Dataset, raw: Dict[str, Any], strategy_id: int = 1, line: int = 0) -> Tuple:
+    """
+    Validate one input row and fill defaults
+
+    Returns:
+        Values in dataset.columns order (None = NULL)
+
+    Raises:
+        ValueError: Unknown or missing columns, unparseable values
+    """
+    unknown = set(raw) - set(dataset.column_names)
+    if unknown:
+        raise ValueError(f"line {line}: unknown columns for {dataset.name}: {', '.join(sorted(unknown))}")
+
+    row = {}
+    for name, pg_type in dataset.columns:
+        value = raw.get(name)
+        if value is None or (isinstance(value, str) and not value.strip()):
+            row[name] = None
+            continue
+        try:
+            row[name] = _parse(value, pg_type)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"line {line}: invalid {name}: {e}") from None
+
+    missing = [name for name in dataset.required if row[name] is None]
+    if missing:
+        raise ValueError(f"line {line}: missing {', '.join(missing)}")
+
+    if row.get('strategy_id') is None:
+        row['strategy_id'] = strategy_id
+
+    if dataset.name == 'positions':
+        if row['status'] is None:
+            row['status'] = 'closed' if row['exit_timestamp'] else 'open'
+        if row['quantity'] is None:
+            try:
+                entry_date = datetime.fromisoformat(row['entry_timestamp']).date()
+                row['quantity'] = row['lots'] * get_lot_size_for_instrument(row['instrument'], entry_date)
+            except ValueError:
+                raise ValueError(f"line {line}: quantity required for instrument {row['instrument']}") from None
+        if row['current_stop'] is None:
+            row['current_stop'] = row['initial_stop']
+        if row['highest_close'] is None:
+            row['highest_close'] = row['entry_price']
+        if row['realized_pnl'] is None:
+            row['realized_pnl'] = 0.0
+        if row['is_base_position'] is None:
+            row['is_base_position'] = True
+        if row['is_test'] is None:
+            row['is_test'] = False
+
+    elif dataset.name == 'capital':
+        row['transaction_type'] = row['transaction_type'].upper()
+        if row['transaction_type'] not in TRANSACTION_TYPES:
+            raise ValueError(f"line {line}: invalid transaction_type {row['transaction_type']}")
+        if row['amount'] == 0:
+            raise ValueError(f"line {line}: amount must not be 0")
+        # Ledger amounts are signed: deposits add, withdrawals subtract
+        if row['transaction_type'] == 'DEPOSIT':
+            row['amount'] = abs(row['amount'])
+        elif row['transaction_type'] == 'WITHDRAW':
+            row['amount'] = -abs(row['amount'])
+        if row['created_by'] is None:
+            row['created_by'] = 'IMPORT'
+
+    return tuple(row[name] for name in dataset.column_names)
+
+
+class CopyStream(io.RawIOBase):
+    """File-like CSV reader over normalized rows, for cursor.copy_expert()"""
+
+    def __init__(self, rows: Iterable[Tuple], on_row: Optional[Callable[[Tuple], None]] = None):
+        self._rows = iter(rows)
+        self._on_row = on_row
+        self._buffer = b''
+        self.rows = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def _fill(self, size: int):
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator='\n')
+        for _ in range(COPY_CHUNK_ROWS):
+            try:
+                row = next(self._rows)
+            except StopIteration:
+                break
+            if self._on_row:
+                self._on_row(row)
+            # None -> empty unquoted field (NULL in COPY csv); booleans as t/f
+            writer.writerow(['t' if v is True else 'f' if v is False else v for v in row])
+            self.rows += 1
+            if out.tell() >= size:
+                break
+        self._buffer += out.getvalue().encode('utf-8')
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = 1 << 20
+        if len(self._buffer) < size:
+            self._fill(size - len(self._buffer))
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+
+# ===== SQL =====
+
+def _key_match(dataset: Dataset, left: str, right: str) -> str:
+    """Natural-key equality; nullable text keys compare via COALESCE so joins stay hashable"""
+    terms = []
+    for name in dataset.key:
+        if name in dataset.required or dataset.column_type(name) in ('INTEGER', 'TIMESTAMP'):
+            terms.append(f"{left}.{name} = {right}.{name}")
+        else:
+            terms.append(f"COALESCE({left}.{name}, '') = COALESCE({right}.{name}, '')")
+    return ' AND '.join(terms)
+
+
+def staging_sql(dataset: Dataset, staging: str) -> Tuple[str, str]:
+    """CREATE TEMP TABLE and COPY statements for a dataset's staging table"""
+    columns = ', '.join(f"{name} {pg_type}" for name, pg_type in dataset.columns)
+    create = f"CREATE TEMP TABLE {staging} (_line BIGSERIAL, {columns}) ON COMMIT DROP"
+    copy = f"COPY {staging} ({', '.join(dataset.column_names)}) FROM STDIN WITH (FORMAT csv)"
+    return create, copy
+
+
+def merge_sql(dataset: Dataset, staging: str) -> Tuple[str, str, str]:
+    """
+    De-duplicate, UPDATE-changed and INSERT-missing statements
+
+    Returns:
+        (dedup, update, insert); dedup creates <staging>_src with one row per key
+    """
+    source = f"{staging}_src"
+    names = dataset.column_names
+    dedup = (
+        f"CREATE TEMP TABLE {source} ON COMMIT DROP AS "
+        f"SELECT DISTINCT ON ({', '.join(dataset.key)}) {', '.join(names)} FROM {staging} "
+        f"ORDER BY {', '.join(dataset.key)}, _line DESC"
+    )
+
+    payload = [name for name in names if name not in dataset.key]
+    assignments = [f"{name} = s.{name}" for name in payload]
+    if dataset.target == 'portfolio_positions':
+        assignments += ["version = t.version + 1", "updated_at = CURRENT_TIMESTAMP"]
+    changed = f"({', '.join('t.' + n for n in payload)}) IS DISTINCT FROM ({', '.join('s.' + n for n in payload)})"
+    update = (
+        f"UPDATE {dataset.target} t SET {', '.join(assignments)} FROM {source} s "
+        f"WHERE {_key_match(dataset, 't', 's')} AND {changed}"
+    )
+
+    columns = list(names)
+    values = [f"s.{name}" for name in names]
+    if dataset.target == 'capital_transactions':
+        # Placeholders, set by the ledger rebuild in the same transaction
+        columns += ['equity_before', 'equity_after']
+        values += ['0', '0']
+    insert = (
+        f"INSERT INTO {dataset.target} ({', '.join(columns)}) "
+        f"SELECT {', '.join(values)} FROM {source} s "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {dataset.target} t WHERE {_key_match(dataset, 't', 's')})"
+    )
+    return dedup, update, insert
+
+
+# TRADING_PNL ledger entries for imported trades that have none yet
+TRADES_TO_LEDGER_SQL = """
+    INSERT INTO capital_transactions
+    (transaction_type, amount, notes, equity_before, equity_after, created_by, position_id, created_at, strategy_id)
+    SELECT 'TRADING_PNL', s.realized_pnl, s.instrument || ' trade P&L (import)', 0, 0, 'IMPORT',
+           s.position_id, s.closed_at, s.strategy_id
+    FROM {source} s
+    WHERE s.realized_pnl <> 0
+      AND NOT EXISTS (
+          SELECT 1 FROM capital_transactions c
+          WHERE c.strategy_id = s.strategy_id
+            AND c.transaction_type = 'TRADING_PNL'
+            AND c.position_id = s.position_id
+            AND c.created_at = s.closed_at
+      )
+"""
+
+STRATEGY_PNL_SQL = """
+    UPDATE trading_strategies ts
+    SET cumulative_realized_pnl = h.total_pnl,
+        updated_at = CURRENT_TIMESTAMP
+    FROM (
+        SELECT strategy_id, SUM(realized_pnl) AS total_pnl
+        FROM strategy_trade_history
+        WHERE strategy_id = ANY(%s)
+        GROUP BY strategy_id
+    ) h
+    WHERE ts.strategy_id = h.strategy_id
+      AND ts.cumulative_realized_pnl IS DISTINCT FROM h.total_pnl
+"""
+
+# Single window-function pass: running equity per strategy in ledger order
+LEDGER_REBUILD_SQL = """
+    WITH running AS (
+        SELECT id,
+               SUM(amount) OVER (
+                   PARTITION BY strategy_id ORDER BY created_at, id ROWS UNBOUNDED PRECEDING
+               ) AS equity_after
+        FROM capital_transactions
+        WHERE strategy_id = ANY(%s)
+    )
+    UPDATE capital_transactions c
+    SET equity_before = r.equity_after - c.amount,
+        equity_after = r.equity_after
+    FROM running r
+    WHERE c.id = r.id
+      AND (c.equity_after IS DISTINCT FROM r.equity_after
+           OR c.equity_before IS DISTINCT FROM r.equity_after - c.amount)
+"""
+
+PORTFOLIO_FROM_LEDGER_SQL = """
+    INSERT INTO portfolio_state (id, initial_capital, closed_equity, equity_high, version)
+    SELECT strategy_id,
+           COALESCE(SUM(amount) FILTER (WHERE transaction_type IN ('DEPOSIT', 'WITHDRAW')), 0),
+           (ARRAY_AGG(equity_after ORDER BY created_at DESC, id DESC))[1],
+           MAX(equity_after),
+           1
+    FROM capital_transactions
+    WHERE strategy_id = ANY(%s)
+    GROUP BY strategy_id
+    ON CONFLICT (id) DO UPDATE SET
+        initial_capital = EXCLUDED.initial_capital,
+        closed_equity = EXCLUDED.closed_equity,
+        equity_high = EXCLUDED.equity_high,
+        version = portfolio_state.version + 1,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+
+# ===== LOADER =====
+
+class BulkLoader:
+    """COPY-based importer over a DatabaseStateManager's pool"""
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+
+    def load(self, dataset_name: str, path: str, strategy_id: int = 1, rows: Optional[Iterable[Dict]] = None,
+             rebuild_ledger: bool = True, trades_to_ledger: bool = False, dry_run: bool = False) -> ImportReport:
+        """
+        Import one file into a dataset's table
+
+        Args:
+            dataset_name: 'positions', 'trades' or 'capital'
+            path: CSV or Parquet file (also the report's source label)
+            strategy_id: Default for rows without a strategy_id column
+            rows: Pre-parsed rows instead of reading path
+            rebuild_ledger: Recompute equity_before/after and portfolio_state
+                            for the affected strategies (capital, or trades with
+                            trades_to_ledger)
+            trades_to_ledger: Add missing TRADING_PNL entries for imported trades
+            dry_run: Report what would change, then roll back
+
+        Raises:
+            ValueError: Unknown dataset, invalid rows (nothing is written)
+        """
+        dataset = DATASETS.get(dataset_name)
+        if dataset is None:
+            raise ValueError(f"Unknown dataset: {dataset_name} (expected one of {', '.join(DATASETS)})")
+
+        report = ImportReport(dataset=dataset.name, source=path, dry_run=dry_run)
+        started = time.perf_counter()
+        staging = f"bulk_{dataset.name}"
+        strategies = set()
+
+        def normalized():
+            for line, raw in enumerate(rows if rows is not None else read_rows(path), start=2):
+                yield normalize_row(dataset, raw, strategy_id, line)
+
+        column_index = dataset.column_names.index('strategy_id')
+        stream = CopyStream(normalized(), on_row=lambda row: strategies.add(row[column_index]))
+
+        with self.db_manager.get_connection() as conn:
+            try:
+                cursor = conn.cursor()
+                create, copy = staging_sql(dataset, staging)
+                cursor.execute(create)
+                cursor.copy_expert(copy, stream)
+                report.rows_read = stream.rows
+                report.copy_seconds = time.perf_counter() - started
+
+                merge_started = time.perf_counter()
+                dedup, update, insert = merge_sql(dataset, staging)
+                cursor.execute(dedup)
+                report.rows_distinct = cursor.rowcount
+                cursor.execute(update)
+                report.updated = cursor.rowcount
+                cursor.execute(insert)
+                report.inserted = cursor.rowcount
+                report.unchanged = report.rows_distinct - report.updated - report.inserted
+
+                report.strategies = sorted(strategies)
+                if dataset.name == 'trades':
+                    if trades_to_ledger:
+                        cursor.execute(TRADES_TO_LEDGER_SQL.format(source=f"{staging}_src"))
+                        report.ledger_entries_added = cursor.rowcount
+                    cursor.execute(STRATEGY_PNL_SQL, (report.strategies,))
+                report.merge_seconds = time.perf_counter() - merge_started
+
+                if rebuild_ledger and report.strategies and (
+                        dataset.name == 'capital' or report.ledger_entries_added):
+                    ledger_started = time.perf_counter()
+                    report.ledger_rows_rebuilt = self._rebuild_ledger(cursor, report.strategies)
+                    report.ledger_seconds = time.perf_counter() - ledger_started
+
+                if dry_run:
+                    conn.rollback()
+                else:
+                    conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        # Cached portfolio state is stale after a ledger rebuild
+        if report.ledger_rows_rebuilt and not dry_run:
+            self.db_manager.invalidate_portfolio_state_cache()
+
+        report.total_seconds = time.perf_counter() - started
+        logger.info(
+            f"[IMPORT] {dataset.name} from {path}: {report.rows_read} rows "
+            f"({report.inserted} inserted, {report.updated} updated, {report.unchanged} unchanged) "
+            f"in {report.total_seconds:.2f}s = {report.rows_per_second:,.0f} rows/s"
+            f"{' (dry run, rolled back)' if dry_run else ''}"
+        )
+        return report
+
+    def rebuild_ledger(self, strategies: Sequence[int], dry_run: bool = False) -> int:
+        """Recompute the equity ledger and portfolio_state for strategies; returns rows changed"""
+        with self.db_manager.get_connection() as conn:
+            try:
+                changed = self._rebuild_ledger(conn.cursor(), list(strategies))
+                if dry_run:
+                    conn.rollback()
+                else:
+                    conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        if not dry_run:
+            self.db_manager.invalidate_portfolio_state_cache()
+        return changed
+
+    @staticmethod
+    def _rebuild_ledger(cursor, strategies: List[int]) -> int:
+        cursor.execute(LEDGER_REBUILD_SQL, (strategies,))
+        changed = cursor.rowcount
+        cursor.execute(PORTFOLIO_FROM_LEDGER_SQL, (strategies,))
+        logger.info(f"[IMPORT] Ledger rebuilt for strategies {strategies}: {changed} rows changed")
+        return changed
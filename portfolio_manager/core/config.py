@@ -79,6 +79,11 @@ class PortfolioConfig:
         self.pyramid_risk_block = 12.0  # Block new pyramids at 12%
         self.pyramid_vol_block = 4.0  # Block pyramids at 4% vol
 
+        # Correlation-aware VaR gate (core/risk_engine.py)
+        self.max_portfolio_var_percent = None  # Block entries above this 1-day VaR % of equity (None = off)
+        self.var_confidence = 0.99
+        self.var_window_days = 250
+
         # Equity calculation
         self.equity_mode = "blended"  # 'closed', 'open', or 'blended'
         self.blended_unrealized_weight = 0.5  # 50% of unrealized for blended
@@ -179,6 +184,12 @@ class PortfolioConfig:
         self.eod_max_signal_age_seconds: int = 90
         """Maximum age of EOD_MONITOR signal before it's considered stale"""
 
+        self.eod_prearm_enabled: bool = True
+        """Keep a pre-built order ticket per instrument, refreshed on every EOD_MONITOR signal"""
+
+        self.eod_prearm_price_band_pct: float = 0.25
+        """Max price move (%) from the armed signal before the ticket is rebuilt at T-30"""
+
         # Market close times (24-hour format, IST)
         # Note: MCX hours vary with US Daylight Saving Time
         # Summer (Mar-Nov): 23:30, Winter (Nov-Mar): 23:55
@@ -7,7 +7,10 @@ Provides persistence layer for all portfolio state with:
 - Write-through caching (L1 cache)
 - Crash recovery support
 - Connection retry logic with exponential backoff
+- Committed state changes handed to the warm-standby change log (optional)
+- Strategy-scoped views sharing one pool (multi-engine hosting, migration 017)
 """
+import copy
 import psycopg2
 from psycopg2 import pool
 from psycopg2.extras import RealDictCursor
@@ -19,6 +22,8 @@ import logging
 import time
 
 from core.models import Position, PortfolioState
+from core.tracing import traced
+from core.async_db_writer import get_async_db_writer
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +31,13 @@ logger = logging.getLogger(__name__)
 class DatabaseStateManager:
     """Persistent state manager using PostgreSQL"""
 
+    # Set on strategy-scoped views (see for_strategy); None = default book,
+    # which loads every open position, uses portfolio_state row 1 and the
+    # unfiltered pyramiding / ledger tables, so it runs with or without
+    # migration 017
+    strategy_id = None
+    _root = None
+
     def __init__(self, connection_config: dict, max_retries: int = 3):
         """
         Initialize database connection pool with retry logic
@@ -74,8 +86,63 @@ class DatabaseStateManager:
         self._position_cache = {}  # position_id → Position
         self._portfolio_state_cache = None
 
+        # Warm-standby change log (core.state_replication.StateReplicator), set by the leader
+        self.change_log = None
+
         logger.info("Database connection pool initialized")
 
+    def for_strategy(self, strategy_id: int) -> 'DatabaseStateManager':
+        """
+        View of this manager scoped to one strategy (multi-engine hosting)
+
+        The view shares the connection pool. Open positions, portfolio state
+        (row id = strategy_id), pyramiding state and the capital ledger are
+        read and written for strategy_id only. L1 caches are per view and the
+        warm-standby change log is not attached.
+
+        Args:
+            strategy_id: trading_strategies.strategy_id
+
+        Returns:
+            DatabaseStateManager view
+        """
+        view = copy.copy(self)
+        view.strategy_id = strategy_id
+        view._root = self._root or self
+        view._position_cache = {}
+        view._portfolio_state_cache = None
+        view.change_log = None
+        return view
+
+    @property
+    def _strategy(self) -> int:
+        """Strategy whose portfolio state, pyramiding state and ledger this manager uses"""
+        return self.strategy_id or 1
+
+    def _strategy_clause(self, keyword: str = 'AND') -> tuple:
+        """SQL condition and params limiting a query to a scoped view's strategy"""
+        if self.strategy_id is None:
+            return "", ()
+        return f" {keyword} strategy_id = %s", (self.strategy_id,)
+
+    def has_strategy_scoped_schema(self) -> bool:
+        """True once migration 017 (per-strategy state and ledger) is applied"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'pyramiding_state' AND column_name = 'strategy_id'
+            """)
+            return cursor.fetchone() is not None
+
+    def _ledger_insert_sql(self, entry: dict) -> str:
+        """INSERT ... RETURNING for a capital_transactions entry; scoped views also set strategy_id"""
+        if self.strategy_id is not None:
+            entry['strategy_id'] = self.strategy_id
+        columns = ', '.join(entry)
+        values = ', '.join(f'%({column})s' for column in entry)
+        return f"INSERT INTO capital_transactions ({columns}) VALUES ({values}) RETURNING id, created_at"
+
     @contextmanager
     def get_connection(self):
         """Get connection from pool with automatic return"""
@@ -115,6 +182,7 @@ class DatabaseStateManager:
 
     # ===== POSITION OPERATIONS =====
 
+    @traced('db.save_position')
     def save_position(self, position: Position) -> bool:
         """
         Insert or update position (upsert)
@@ -189,13 +257,16 @@ class DatabaseStateManager:
                     ce_entry_price = EXCLUDED.ce_entry_price,
                     version = portfolio_positions.version + 1,
                     updated_at = CURRENT_TIMESTAMP
+                RETURNING version
             """, pos_dict)
+            version = cursor.fetchone()[0] if self.change_log is not None else None
 
             # Update cache
             self._position_cache[position.position_id] = position
 
-            logger.info(f"Position saved: {position.position_id}")
-            return True
+        logger.info(f"Position saved: {position.position_id}")
+        self._replicate('position', {'row': pos_dict, 'version': version})
+        return True
 
     def get_position(self, position_id: str) -> Optional[Position]:
         """
@@ -234,10 +305,12 @@ class DatabaseStateManager:
         Returns:
             Dictionary of position_id -> Position
         """
+        scope, params = self._strategy_clause()
         with self.get_connection() as conn:
             cursor = conn.cursor(cursor_factory=RealDictCursor)
             cursor.execute(
-                "SELECT * FROM portfolio_positions WHERE status = 'open' ORDER BY entry_timestamp"
+                f"SELECT * FROM portfolio_positions WHERE status = 'open'{scope} ORDER BY entry_timestamp",
+                params
             )
 
             positions = {}
@@ -254,7 +327,7 @@ class DatabaseStateManager:
 
     def save_portfolio_state(self, state: PortfolioState, initial_capital: float, equity_high: float = None) -> bool:
         """
-        Save portfolio state (single-row table)
+        Save portfolio state (one row per strategy, id = strategy_id)
 
         Args:
             state: PortfolioState object
@@ -274,7 +347,7 @@ class DatabaseStateManager:
                 INSERT INTO portfolio_state
                 (id, initial_capital, closed_equity, equity_high, total_risk_amount, total_risk_percent,
                  total_vol_amount, margin_used, version)
-                VALUES (1, %s, %s, %s, %s, %s, %s, %s, 1)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 1)
                 ON CONFLICT (id) DO UPDATE SET
                     closed_equity = EXCLUDED.closed_equity,
                     equity_high = EXCLUDED.equity_high,
@@ -284,7 +357,9 @@ class DatabaseStateManager:
                     margin_used = EXCLUDED.margin_used,
                     version = portfolio_state.version + 1,
                     updated_at = CURRENT_TIMESTAMP
+                RETURNING version
             """, (
+                self._strategy,
                 initial_capital,
                 state.closed_equity,
                 equity_high,
@@ -293,6 +368,7 @@ class DatabaseStateManager:
                 state.total_vol_amount,
                 state.margin_used
             ))
+            version = cursor.fetchone()[0] if self.change_log is not None else None
 
             self._portfolio_state_cache = {
                 'initial_capital': initial_capital,
@@ -303,7 +379,11 @@ class DatabaseStateManager:
                 'total_vol_amount': state.total_vol_amount,
                 'margin_used': state.margin_used
             }
-            return True
+
+        self._replicate('portfolio', {
+            'closed_equity': state.closed_equity, 'equity_high': equity_high, 'version': version
+        })
+        return True
 
     def get_portfolio_state(self) -> Optional[dict]:
         """
@@ -318,7 +398,7 @@ class DatabaseStateManager:
 
         with self.get_connection() as conn:
             cursor = conn.cursor(cursor_factory=RealDictCursor)
-            cursor.execute("SELECT * FROM portfolio_state WHERE id = 1")
+            cursor.execute("SELECT * FROM portfolio_state WHERE id = %s", (self._strategy,))
             row = cursor.fetchone()
 
             if row:
@@ -345,15 +425,31 @@ class DatabaseStateManager:
         """
         with self.transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO pyramiding_state (instrument, last_pyramid_price, base_position_id)
-                VALUES (%s, %s, %s)
-                ON CONFLICT (instrument) DO UPDATE SET
-                    last_pyramid_price = EXCLUDED.last_pyramid_price,
-                    base_position_id = EXCLUDED.base_position_id,
-                    updated_at = CURRENT_TIMESTAMP
-            """, (instrument, last_pyramid_price, base_position_id))
-            return True
+            if self.strategy_id is None:
+                cursor.execute("""
+                    INSERT INTO pyramiding_state (instrument, last_pyramid_price, base_position_id)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (instrument) DO UPDATE SET
+                        last_pyramid_price = EXCLUDED.last_pyramid_price,
+                        base_position_id = EXCLUDED.base_position_id,
+                        updated_at = CURRENT_TIMESTAMP
+                """, (instrument, last_pyramid_price, base_position_id))
+            else:
+                cursor.execute("""
+                    INSERT INTO pyramiding_state (strategy_id, instrument, last_pyramid_price, base_position_id)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (strategy_id, instrument) DO UPDATE SET
+                        last_pyramid_price = EXCLUDED.last_pyramid_price,
+                        base_position_id = EXCLUDED.base_position_id,
+                        updated_at = CURRENT_TIMESTAMP
+                """, (self.strategy_id, instrument, last_pyramid_price, base_position_id))
+
+        self._replicate('pyramid', {
+            'instrument': instrument,
+            'last_pyramid_price': last_pyramid_price,
+            'base_position_id': base_position_id
+        })
+        return True
 
     def get_pyramiding_state(self) -> Dict[str, dict]:
         """
@@ -364,7 +460,8 @@ class DatabaseStateManager:
         """
         with self.get_connection() as conn:
             cursor = conn.cursor(cursor_factory=RealDictCursor)
-            cursor.execute("SELECT * FROM pyramiding_state")
+            scope, params = self._strategy_clause('WHERE')
+            cursor.execute(f"SELECT * FROM pyramiding_state{scope}", params)
 
             pyr_state = {}
             for row in cursor.fetchall():
@@ -385,13 +482,16 @@ class DatabaseStateManager:
         """
         with self.transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
+            scope, params = self._strategy_clause()
+            cursor.execute(f"""
                 DELETE FROM pyramiding_state
-                WHERE instrument = %s
-            """, (instrument,))
+                WHERE instrument = %s{scope}
+            """, (instrument,) + params)
             deleted = cursor.rowcount
             logger.info(f"Cleared pyramiding state for {instrument} (rows deleted: {deleted})")
-            return True
+
+        self._replicate('pyramid_cleared', {'instrument': instrument})
+        return True
 
     # ===== SIGNAL DEDUPLICATION =====
 
@@ -416,6 +516,7 @@ class DatabaseStateManager:
 
             return cursor.fetchone() is not None
 
+    @traced('db.log_signal')
     def log_signal(self, signal_data: dict, fingerprint: str,
                    instance_id: str, status: str) -> bool:
         """
@@ -428,29 +529,84 @@ class DatabaseStateManager:
             status: Processing status (accepted, rejected, blocked, executed)
 
         Returns:
-            True if successful
+            True if successful, False if signal_data has no timestamp
+
+        signal_timestamp is part of the dedup key (and the partition key), so
+        it must come from the payload: a wall-clock fallback would give every
+        retry of the same signal a new key and defeat ON CONFLICT.
+        """
+        signal_timestamp = signal_data.get('timestamp')
+        if not signal_timestamp:
+            logger.warning(
+                f"Signal log rejected (no timestamp in payload): fingerprint={fingerprint[:16]}"
+            )
+            return False
+
+        query = """
+            INSERT INTO signal_log
+            (instrument, signal_type, position, signal_timestamp, fingerprint,
+             processed_by_instance, processing_status, payload)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (fingerprint, signal_timestamp) DO UPDATE SET
+                is_duplicate = TRUE
         """
+        params = (
+            signal_data.get('instrument', 'UNKNOWN'),
+            signal_data.get('type', 'UNKNOWN'),
+            signal_data.get('position', 'UNKNOWN'),
+            signal_timestamp,
+            fingerprint,
+            instance_id,
+            status,
+            PsycopgJson(signal_data)
+        )
+
+        # Queue on the background writer when running; fall back to inline write
+        writer = get_async_db_writer()
+        if writer and writer.db is (self._root or self) and writer.submit('signal_log', query, params):
+            return True
+
         with self.transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO signal_log
-                (instrument, signal_type, position, signal_timestamp, fingerprint,
-                 processed_by_instance, processing_status, payload)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (fingerprint) DO UPDATE SET
-                    is_duplicate = TRUE
-            """, (
-                signal_data.get('instrument', 'UNKNOWN'),
-                signal_data.get('type', 'UNKNOWN'),
-                signal_data.get('position', 'UNKNOWN'),
-                signal_data.get('timestamp', datetime.now().isoformat()),
-                fingerprint,
-                instance_id,
-                status,
-                PsycopgJson(signal_data)
-            ))
+            cursor.execute(query, params)
             return True
 
+    # ===== WARM-STANDBY REPLICATION =====
+
+    def _replicate(self, kind: str, payload: dict):
+        """Hand a committed change to the warm-standby change log (if attached)"""
+        if self.change_log is not None:
+            self.change_log.publish(kind, payload)
+
+    def get_state_versions(self) -> dict:
+        """
+        Row versions of open positions and portfolio state
+
+        A standby compares these with the versions it has applied from the
+        change log before taking over without a full reload.
+
+        Returns:
+            {'positions': {position_id: version}, 'portfolio': version or None}
+        """
+        scope, params = self._strategy_clause()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT position_id, version FROM portfolio_positions WHERE status = 'open'{scope}", params)
+            positions = {row[0]: row[1] for row in cursor.fetchall()}
+            cursor.execute("SELECT version FROM portfolio_state WHERE id = %s", (self._strategy,))
+            row = cursor.fetchone()
+            return {'positions': positions, 'portfolio': row[0] if row else None}
+
+    def apply_replicated_position(self, row: dict) -> Position:
+        """Build a Position from a replicated row and refresh the L1 cache"""
+        position = self._dict_to_position(row)
+        self._position_cache[position.position_id] = position
+        return position
+
+    def invalidate_portfolio_state_cache(self):
+        """Drop cached portfolio state (changed by another instance)"""
+        self._portfolio_state_cache = None
+
     # ===== HELPER METHODS =====
 
     def _position_to_dict(self, position: Position) -> dict:
@@ -850,8 +1006,16 @@ class DatabaseStateManager:
         with self.transaction() as conn:
             cursor = conn.cursor(cursor_factory=RealDictCursor)
 
+            # A hosted strategy's first deposit creates its portfolio_state row
+            if self.strategy_id is not None:
+                cursor.execute("""
+                    INSERT INTO portfolio_state (id, initial_capital, closed_equity, equity_high)
+                    VALUES (%s, 0, 0, 0)
+                    ON CONFLICT (id) DO NOTHING
+                """, (self.strategy_id,))
+
             # Get current equity
-            cursor.execute("SELECT closed_equity FROM portfolio_state WHERE id = 1")
+            cursor.execute("SELECT closed_equity FROM portfolio_state WHERE id = %s", (self._strategy,))
             row = cursor.fetchone()
             if not row:
                 raise RuntimeError("Portfolio state not found in database")
@@ -870,12 +1034,9 @@ class DatabaseStateManager:
                     raise RuntimeError(f"Withdrawal of {amount} would result in negative equity. Current: {equity_before}")
 
             # Record transaction in ledger with signed amount
-            cursor.execute("""
-                INSERT INTO capital_transactions
-                (transaction_type, amount, notes, equity_before, equity_after, created_by)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                RETURNING id, created_at
-            """, (transaction_type, signed_amount, notes, equity_before, equity_after, created_by))
+            entry = {'transaction_type': transaction_type, 'amount': signed_amount, 'notes': notes,
+                   'equity_before': equity_before, 'equity_after': equity_after, 'created_by': created_by}
+            cursor.execute(self._ledger_insert_sql(entry), entry)
             tx_row = cursor.fetchone()
 
             # Update portfolio_state
@@ -884,8 +1045,10 @@ class DatabaseStateManager:
                 SET closed_equity = %s,
                     version = version + 1,
                     updated_at = CURRENT_TIMESTAMP
-                WHERE id = 1
-            """, (equity_after,))
+                WHERE id = %s
+                RETURNING version
+            """, (equity_after, self._strategy))
+            state_version = cursor.fetchone()['version'] if self.change_log is not None else None
 
             # Invalidate cache
             self._portfolio_state_cache = None
@@ -902,7 +1065,9 @@ class DatabaseStateManager:
             }
 
             logger.info(f"Capital {transaction_type}: {amount:,.2f} | Equity: {equity_before:,.2f} -> {equity_after:,.2f}")
-            return result
+
+        self._replicate('portfolio', {'closed_equity': equity_after, 'version': state_version})
+        return result
 
     def record_trading_pnl(self, position_id: str, instrument: str, pnl: float,
                           notes: str = None) -> dict:
@@ -929,11 +1094,12 @@ class DatabaseStateManager:
             cursor = conn.cursor(cursor_factory=RealDictCursor)
 
             # Get current equity from latest ledger entry
-            cursor.execute("""
-                SELECT equity_after FROM capital_transactions
+            scope, params = self._strategy_clause('WHERE')
+            cursor.execute(f"""
+                SELECT equity_after FROM capital_transactions{scope}
                 ORDER BY created_at DESC
                 LIMIT 1
-            """)
+            """, params)
             row = cursor.fetchone()
 
             if not row:
@@ -947,12 +1113,10 @@ class DatabaseStateManager:
             equity_after = equity_before + pnl  # pnl can be negative
 
             # Record transaction in ledger
-            cursor.execute("""
-                INSERT INTO capital_transactions
-                (transaction_type, amount, notes, equity_before, equity_after, created_by, position_id)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                RETURNING id, created_at
-            """, ('TRADING_PNL', pnl, notes, equity_before, equity_after, 'SYSTEM', position_id))
+            entry = {'transaction_type': 'TRADING_PNL', 'amount': pnl, 'notes': notes,
+                   'equity_before': equity_before, 'equity_after': equity_after, 'created_by': 'SYSTEM',
+                   'position_id': position_id}
+            cursor.execute(self._ledger_insert_sql(entry), entry)
             tx_row = cursor.fetchone()
 
             # Update portfolio_state to stay in sync
@@ -961,8 +1125,10 @@ class DatabaseStateManager:
                 SET closed_equity = %s,
                     version = version + 1,
                     updated_at = CURRENT_TIMESTAMP
-                WHERE id = 1
-            """, (equity_after,))
+                WHERE id = %s
+                RETURNING version
+            """, (equity_after, self._strategy))
+            state_version = cursor.fetchone()['version'] if self.change_log is not None else None
 
             # Invalidate cache
             self._portfolio_state_cache = None
@@ -980,7 +1146,9 @@ class DatabaseStateManager:
 
             pnl_str = f"+₹{pnl:,.2f}" if pnl >= 0 else f"-₹{abs(pnl):,.2f}"
             logger.info(f"Trading P&L recorded: {position_id} {pnl_str} | Equity: {equity_before:,.2f} -> {equity_after:,.2f}")
-            return result
+
+        self._replicate('portfolio', {'closed_equity': equity_after, 'version': state_version})
+        return result
 
     def get_capital_transactions(self, limit: int = 50, transaction_type: str = None) -> List[dict]:
         """
@@ -997,18 +1165,20 @@ class DatabaseStateManager:
             cursor = conn.cursor(cursor_factory=RealDictCursor)
 
             if transaction_type:
-                cursor.execute("""
+                scope, params = self._strategy_clause()
+                cursor.execute(f"""
                     SELECT * FROM capital_transactions
-                    WHERE transaction_type = %s
+                    WHERE transaction_type = %s{scope}
                     ORDER BY created_at DESC
                     LIMIT %s
-                """, (transaction_type, limit))
+                """, (transaction_type,) + params + (limit,))
             else:
-                cursor.execute("""
-                    SELECT * FROM capital_transactions
+                scope, params = self._strategy_clause('WHERE')
+                cursor.execute(f"""
+                    SELECT * FROM capital_transactions{scope}
                     ORDER BY created_at DESC
                     LIMIT %s
-                """, (limit,))
+                """, params + (limit,))
 
             return [dict(row) for row in cursor.fetchall()]
 
@@ -1036,12 +1206,13 @@ class DatabaseStateManager:
             cursor = conn.cursor(cursor_factory=RealDictCursor)
 
             # Get the latest transaction's equity_after (this is current equity)
-            cursor.execute("""
+            scope, params = self._strategy_clause('WHERE')
+            cursor.execute(f"""
                 SELECT equity_after, transaction_type, created_at
-                FROM capital_transactions
+                FROM capital_transactions{scope}
                 ORDER BY created_at DESC
                 LIMIT 1
-            """)
+            """, params)
             row = cursor.fetchone()
 
             if not row:
@@ -1055,13 +1226,13 @@ class DatabaseStateManager:
 
             # Also get summary for logging
             # Note: TRADING_PNL amounts are signed (positive=profit, negative=loss)
-            cursor.execute("""
+            cursor.execute(f"""
                 SELECT
                     COALESCE(SUM(CASE WHEN transaction_type = 'DEPOSIT' THEN amount ELSE 0 END), 0) as total_deposits,
                     COALESCE(SUM(CASE WHEN transaction_type = 'WITHDRAW' THEN amount ELSE 0 END), 0) as total_withdrawals,
                     COALESCE(SUM(CASE WHEN transaction_type = 'TRADING_PNL' THEN amount ELSE 0 END), 0) as total_trading_pnl
-                FROM capital_transactions
-            """)
+                FROM capital_transactions{scope}
+            """, params)
             summary = cursor.fetchone()
 
             logger.info(
@@ -1090,7 +1261,8 @@ class DatabaseStateManager:
         """
         with self.get_connection() as conn:
             cursor = conn.cursor(cursor_factory=RealDictCursor)
-            cursor.execute("SELECT * FROM capital_summary")
+            scope, params = self._strategy_clause('WHERE')
+            cursor.execute(f"SELECT * FROM capital_summary{scope}", params)
             row = cursor.fetchone()
 
             if row:
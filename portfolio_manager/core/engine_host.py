@@ -0,0 +1,370 @@
+"""
+Engine Host - Several strategies / accounts in one PM process
+
+run_live builds one LiveTradingEngine for the default book (strategy 1).
+With --tenants-config it also hosts one engine per extra strategy or broker
+account. The hosted engines share the Flask server, the PostgreSQL pool,
+broker HTTP sessions, a quote cache and the rollover / EOD schedulers, but
+each keeps its own portfolio state, pyramiding state and capital ledger.
+
+Design:
+- A tenant is keyed by name and owns a trading_strategies.strategy_id; its
+  engine runs on DatabaseStateManager.for_strategy(strategy_id) (migration
+  017), so positions, portfolio_state row and ledger entries are scoped
+- Tenant position IDs are prefixed "<tenant>:" (portfolio_positions.position_id
+  is global); the default tenant keeps unprefixed IDs
+- Webhooks are routed by path (/webhook/<tenant>) or payload field
+  ("tenant"); anything else goes to the default tenant. Scout EOD_MONITOR
+  updates carry no tenant, so they go to the default tenant and every
+  tenant holding the instrument
+- /status, /positions and /capital/* take ?tenant= (default tenant when
+  absent); /tenants summarises every engine
+- Each tenant has its own DuplicateDetector; the order fence is shared
+- BrokerPool keeps one client per account (tenants without an account trade
+  through the default client) and lets clients for the same OpenAlgo server
+  share one requests.Session; quotes go through one short-TTL QuoteCache
+- EngineHost exposes the engine methods the schedulers call and fans them
+  out over every engine, so one RolloverScheduler / EODScheduler serves all.
+  EOD phases run the tenants concurrently (the execution window is seconds
+  before close) under the fencing token of the scheduler job
+
+Config file (JSON):
+    {
+      "tenants": [
+        {"name": "swing", "strategy_id": 3, "account": "dhan2", "test_mode": false}
+      ],
+      "accounts": {
+        "dhan2": {"openalgo_url": "http://127.0.0.1:5001", "openalgo_api_key": "...",
+                  "broker": "dhan", "execution_mode": "analyzer"}
+      }
+    }
+"""
+import json
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT = 'default'
+DEFAULT_STRATEGY_ID = 1
+
+# Webhook payload field naming the tenant
+TENANT_FIELD = 'tenant'
+
+# Position IDs are VARCHAR(50): "<tenant>:<instrument>_<position>"
+TENANT_NAME_PATTERN = re.compile(r'^[a-z0-9_-]{1,12}$')
+
+
+@dataclass
+class TenantConfig:
+    """One hosted engine"""
+    name: str
+    strategy_id: int
+    account: Optional[str] = None  # Key into accounts; None = default broker client
+    test_mode: Optional[bool] = None  # None = same as the default engine
+
+
+def load_tenants_config(path: str) -> Tuple[List[TenantConfig], Dict[str, dict]]:
+    """
+    Read and validate a tenants config file
+
+    Returns:
+        (tenants, accounts)
+
+    Raises:
+        ValueError: Invalid names, duplicate names/strategies, strategy 1
+                    (the default book) or unknown accounts
+    """
+    with open(path, 'r') as f:
+        config = json.load(f)
+
+    accounts = config.get('accounts', {})
+    tenants = []
+    names = {DEFAULT_TENANT}
+    strategies = {DEFAULT_STRATEGY_ID}
+    for entry in config.get('tenants', []):
+        tenant = TenantConfig(
+            name=str(entry.get('name', '')).lower(),
+            strategy_id=int(entry['strategy_id']),
+            account=entry.get('account'),
+            test_mode=entry.get('test_mode')
+        )
+        if not TENANT_NAME_PATTERN.match(tenant.name):
+            raise ValueError(f"Invalid tenant name '{tenant.name}' (1-12 chars of a-z, 0-9, _ or -)")
+        if tenant.name in names:
+            raise ValueError(f"Duplicate tenant name '{tenant.name}'")
+        if tenant.strategy_id in strategies:
+            raise ValueError(f"Strategy {tenant.strategy_id} is already hosted (strategy 1 is the default book)")
+        if tenant.account is not None and tenant.account not in accounts:
+            raise ValueError(f"Tenant '{tenant.name}' uses unknown account '{tenant.account}'")
+        names.add(tenant.name)
+        strategies.add(tenant.strategy_id)
+        tenants.append(tenant)
+
+    return tenants, accounts
+
+
+class QuoteCache:
+    """Short-TTL quote cache shared by every hosted engine"""
+
+    def __init__(self, ttl_seconds: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._quotes: Dict[tuple, Tuple[float, dict]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple, fetch: Callable[[], dict]) -> dict:
+        """Cached quote for key, fetched when missing or older than the TTL"""
+        now = self._clock()
+        with self._lock:
+            cached = self._quotes.get(key)
+            if cached and now - cached[0] < self.ttl_seconds:
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        quote = fetch()
+        # Only cache usable quotes; errors are retried on the next call
+        if isinstance(quote, dict) and quote.get('ltp'):
+            with self._lock:
+                self._quotes[key] = (now, quote)
+        return quote
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {'ttl_seconds': self.ttl_seconds, 'symbols': len(self._quotes),
+                    'hits': self.hits, 'misses': self.misses}
+
+
+class CachedQuoteClient:
+    """Broker client whose get_quote goes through the shared QuoteCache"""
+
+    def __init__(self, client, cache: QuoteCache):
+        self._client = client
+        self._cache = cache
+
+    def get_quote(self, symbol: str, exchange: str = None) -> Dict:
+        if exchange is None:
+            return self._cache.get((symbol, None), lambda: self._client.get_quote(symbol))
+        return self._cache.get((symbol, exchange), lambda: self._client.get_quote(symbol, exchange))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class BrokerPool:
+    """One broker client per account, HTTP sessions shared per server"""
+
+    def __init__(self, quote_cache: QuoteCache, client_factory: Callable = None):
+        self.quote_cache = quote_cache
+        self._client_factory = client_factory
+        self._clients: Dict[Optional[str], CachedQuoteClient] = {}
+        self._sessions: Dict[str, Any] = {}
+
+    def add(self, account: Optional[str], client) -> CachedQuoteClient:
+        """Register an existing client (None = the default account)"""
+        self._share_session(client)
+        self._clients[account] = CachedQuoteClient(client, self.quote_cache)
+        return self._clients[account]
+
+    def get(self, account: Optional[str], config: Optional[dict] = None) -> CachedQuoteClient:
+        """
+        Client for an account, created from its config on first use
+
+        Raises:
+            ValueError: Unknown account with no config
+        """
+        if account in self._clients:
+            return self._clients[account]
+        if config is None:
+            raise ValueError(f"No broker config for account '{account}'")
+
+        factory = self._client_factory
+        if factory is None:
+            from brokers.factory import create_broker_client
+            factory = create_broker_client
+        broker_type = 'openalgo' if config.get('broker') in ('zerodha', 'dhan') else 'mock'
+        logger.info(f"[HOST] Creating broker client for account '{account}' ({broker_type})")
+        return self.add(account, factory(broker_type, config))
+
+    def _share_session(self, client):
+        """Reuse one requests.Session (connection pool) per OpenAlgo server"""
+        broker = getattr(client, 'real_broker', client)
+        base_url = getattr(broker, 'base_url', None)
+        if not base_url or not hasattr(broker, 'session'):
+            return
+        shared = self._sessions.get(base_url)
+        if shared is None:
+            self._sessions[base_url] = broker.session
+        elif broker.session is not shared:
+            broker.session.close()
+            broker.session = shared
+
+    @property
+    def accounts(self) -> List[Optional[str]]:
+        return list(self._clients)
+
+
+@dataclass
+class HostedEngine:
+    """A tenant's engine and its per-tenant webhook state"""
+    name: str
+    strategy_id: int
+    engine: Any
+    duplicate_detector: Any
+
+
+class EngineHost:
+    """Registry and router for the engines in this process"""
+
+    def __init__(self, routing_field: str = TENANT_FIELD, order_fence=None):
+        self.routing_field = routing_field
+        self.order_fence = order_fence  # carries the job's fencing token into EOD worker threads
+        self._engines: Dict[str, HostedEngine] = {}
+
+    def add(self, name: str, strategy_id: int, engine, duplicate_detector) -> HostedEngine:
+        """Register an engine; the first one added is the default tenant"""
+        if name in self._engines:
+            raise ValueError(f"Tenant '{name}' already hosted")
+        engine.strategy_id = strategy_id
+        engine.position_prefix = '' if name == DEFAULT_TENANT else f"{name}:"
+        hosted = HostedEngine(name, strategy_id, engine, duplicate_detector)
+        self._engines[name] = hosted
+        logger.info(f"[HOST] Hosting engine '{name}' (strategy {strategy_id})")
+        return hosted
+
+    @property
+    def primary(self) -> HostedEngine:
+        return self._engines[DEFAULT_TENANT]
+
+    def get(self, name: str) -> Optional[HostedEngine]:
+        return self._engines.get(name)
+
+    def resolve(self, tenant: Optional[str] = None, payload: Optional[dict] = None) -> HostedEngine:
+        """
+        Engine for a webhook: path segment, then payload field, then default
+
+        Raises:
+            ValueError: Unknown tenant
+        """
+        name = tenant
+        if name is None and isinstance(payload, dict):
+            name = payload.get(self.routing_field)
+        name = str(name).lower() if name else DEFAULT_TENANT
+        hosted = self._engines.get(name)
+        if hosted is None:
+            raise ValueError(f"Unknown tenant: {name}")
+        return hosted
+
+    def eod_monitor_targets(self, tenant: Optional[str], payload: Optional[dict],
+                            instrument: str) -> List[HostedEngine]:
+        """
+        Engines for an EOD_MONITOR update: the addressed tenant, or (none
+        given) the default tenant plus every tenant holding the instrument
+
+        Raises:
+            ValueError: Unknown tenant
+        """
+        if tenant is not None or (isinstance(payload, dict) and payload.get(self.routing_field)):
+            return [self.resolve(tenant, payload)]
+        return [self.primary] + [
+            hosted for hosted in self
+            if hosted.name != DEFAULT_TENANT and any(
+                getattr(position, 'instrument', None) == instrument
+                for position in hosted.engine.portfolio.positions.values()
+            )
+        ]
+
+    def __iter__(self) -> Iterator[HostedEngine]:
+        return iter(list(self._engines.values()))
+
+    def __len__(self) -> int:
+        return len(self._engines)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._engines)
+
+    def _call(self, hosted: HostedEngine, method: str, *args, **kwargs) -> Any:
+        try:
+            return getattr(hosted.engine, method)(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"[HOST] {method} failed for tenant '{hosted.name}': {e}")
+            return e
+
+    def _fan_out(self, method: str, *args, concurrent: bool = False, **kwargs) -> Dict[str, Any]:
+        """
+        Call an engine method on every tenant; one tenant failing does not stop the rest
+
+        With concurrent=True each tenant runs in its own thread, under the
+        caller's fencing token
+        """
+        engines = list(self)
+        if not concurrent or len(engines) < 2:
+            return {hosted.name: self._call(hosted, method, *args, **kwargs) for hosted in engines}
+
+        call = self._call
+        if self.order_fence is not None:
+            call = self.order_fence.bind(call)
+        with ThreadPoolExecutor(max_workers=len(engines), thread_name_prefix='pm-host') as pool:
+            futures = {hosted.name: pool.submit(call, hosted, method, *args, **kwargs) for hosted in engines}
+        return {name: future.result() for name, future in futures.items()}
+
+    # ===== Shared schedulers (same interface as LiveTradingEngine) =====
+
+    def check_and_rollover_positions(self, dry_run: bool = False, broker: str = "zerodha"):
+        """Rollover check for every engine, merged into one BatchRolloverResult"""
+        from live.rollover_executor import BatchRolloverResult
+
+        merged = BatchRolloverResult(total_positions=0, successful=0, failed=0)
+        for name, result in self._fan_out('check_and_rollover_positions', dry_run=dry_run, broker=broker).items():
+            if isinstance(result, Exception):
+                continue
+            merged.total_positions += result.total_positions
+            merged.successful += result.successful
+            merged.failed += result.failed
+            merged.results.extend(result.results)
+            merged.total_rollover_cost += result.total_rollover_cost
+        return merged
+
+    def _eod_fan_out(self, method: str, instrument: str) -> Dict:
+        results = {
+            name: {'success': False, 'error': str(result)} if isinstance(result, Exception) else result
+            for name, result in self._fan_out(method, instrument, concurrent=True).items()
+        }
+        merged = dict(results.get(DEFAULT_TENANT) or {})
+        merged['success'] = any(isinstance(r, dict) and r.get('success') for r in results.values())
+        merged['tenants'] = results
+        return merged
+
+    def eod_condition_check(self, instrument: str) -> Dict:
+        return self._eod_fan_out('eod_condition_check', instrument)
+
+    def eod_execute(self, instrument: str) -> Dict:
+        return self._eod_fan_out('eod_execute', instrument)
+
+    def eod_track(self, instrument: str) -> Dict:
+        return self._eod_fan_out('eod_track', instrument)
+
+    def get_status(self) -> Dict[str, dict]:
+        """Per-tenant summary for /tenants"""
+        status = {}
+        for hosted in self:
+            portfolio = hosted.engine.portfolio
+            status[hosted.name] = {
+                'strategy_id': hosted.strategy_id,
+                'position_prefix': hosted.engine.position_prefix,
+                'open_positions': len(portfolio.positions),
+                'closed_equity': portfolio.closed_equity,
+                'equity_high': portfolio.equity_high,
+                'signals_received': hosted.engine.stats.get('signals_received', 0),
+                'test_mode': hosted.engine.test_mode,
+            }
+        return status
@@ -16,7 +16,7 @@ Timeline:
 import logging
 import time
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -27,6 +27,9 @@ from core.models import (
 from core.config import PortfolioConfig
 from core.order_executor import ExecutionResult, ExecutionStatus
 
+if TYPE_CHECKING:
+    from core.eod_prearm import EODOrderTicket
+
 logger = logging.getLogger(__name__)
 
 
@@ -55,6 +58,8 @@ class EODExecutionContext:
     order_id: Optional[str] = None
     limit_price: Optional[float] = None
     lots: int = 0
+    symbol: Optional[str] = None      # Resolved broker symbol (None = instrument name)
+    exchange: Optional[str] = None
 
     # Timing
     started_at: Optional[datetime] = None
@@ -237,11 +242,11 @@ class EODExecutor:
             )
 
             order_response = self.openalgo.place_order(
-                symbol=context.instrument,
                 action=action,
                 quantity=context.lots,
                 order_type="LIMIT",
-                price=context.limit_price
+                price=context.limit_price,
+                **self._order_target(context)
             )
 
             if order_response.get('status') == 'success':
@@ -258,6 +263,60 @@ class EODExecutor:
 
         return context
 
+    def execute_ticket(
+        self,
+        ticket: 'EODOrderTicket',
+        eod_signal: EODMonitorSignal,
+        last_price: Optional[float] = None
+    ) -> EODExecutionContext:
+        """
+        Place a pre-armed order ticket (Phase 2 without re-preparation).
+
+        Only the final price check runs here: the ticket's band must still
+        contain the last price. Sizing, validation and symbol resolution
+        were done when the ticket was armed.
+
+        Args:
+            ticket: Valid ticket from EODPreArmer
+            eod_signal: Latest EOD monitor signal for the instrument
+            last_price: Price for the final check (default: latest signal price)
+
+        Returns:
+            Context in ORDER_TRACKING phase with order_id, or with error set
+        """
+        context = EODExecutionContext(
+            instrument=ticket.instrument,
+            phase=EODExecutionPhase.ORDER_PLACEMENT,
+            signal=eod_signal,
+            signal_type=ticket.signal_type,
+            limit_price=ticket.limit_price,
+            lots=ticket.lots,
+            symbol=ticket.symbol,
+            exchange=ticket.exchange,
+            started_at=datetime.now()
+        )
+
+        if last_price is None:
+            last_price = eod_signal.price
+        if not ticket.price_in_band(last_price):
+            context.error = (
+                f"Price {last_price:.2f} outside armed band "
+                f"[{ticket.band_low:.2f}, {ticket.band_high:.2f}]"
+            )
+            logger.warning(f"[EOD-Executor] {ticket.instrument}: {context.error}")
+            return context
+
+        return self.execute_order(context)
+
+    def _order_target(self, context: EODExecutionContext) -> Dict:
+        """place_order symbol/exchange kwargs for a context"""
+        if context.symbol is None:
+            return {'symbol': context.instrument}
+        target = {'symbol': context.symbol}
+        if context.exchange:
+            target['exchange'] = context.exchange
+        return target
+
     def track_order(self, context: EODExecutionContext) -> EODExecutionContext:
         """
         Track order to completion (Phase 3: Order Tracking).
@@ -360,11 +419,11 @@ class EODExecutor:
 
             # Place market order
             order_response = self.openalgo.place_order(
-                symbol=context.instrument,
                 action=action,
                 quantity=context.lots,
                 order_type="MARKET",
-                price=0  # Market order
+                price=0,  # Market order
+                **self._order_target(context)
             )
 
             if order_response.get('status') == 'success':
@@ -24,7 +24,7 @@ import logging
 import threading
 from datetime import datetime, timedelta, time
 from typing import Dict, Optional, List, Tuple
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 
 from core.models import (
     EODMonitorSignal, EODConditions, EODIndicators,
@@ -128,6 +128,10 @@ class EODMonitor:
         # Signal history for deduplication (last 24 hours)
         self._signal_history: List[Tuple[str, datetime]] = []
 
+        # StateReplicator while this instance is the HA leader (per-instrument
+        # state is replicated on every change so a standby can take over mid-EOD)
+        self.change_log = None
+
         logger.info("[EOD] EODMonitor initialized")
 
     def _get_today_str(self) -> str:
@@ -215,6 +219,7 @@ class EODMonitor:
             fingerprint = f"{instrument}:{signal.timestamp.isoformat()}"
             self._signal_history.append((fingerprint, datetime.now()))
             self._cleanup_history()
+            self._replicate(state)
 
             return True
 
@@ -297,6 +302,7 @@ class EODMonitor:
 
             # Mark execution started
             state.mark_execution_started()
+            self._replicate(state)
 
             logger.info(
                 f"[EOD] Prepared for execution: {instrument} {action.value} "
@@ -381,6 +387,7 @@ class EODMonitor:
 
             state = self._states[instrument]
             state.mark_execution_completed(result, signal_type, fingerprint)
+            self._replicate(state)
 
     def mark_order_placed(self, instrument: str, order_id: str):
         """Mark that an order has been placed"""
@@ -391,6 +398,7 @@ class EODMonitor:
             state = self._states[instrument]
             state.order_id = order_id
             state.order_placed_at = datetime.now()
+            self._replicate(state)
             logger.info(f"[EOD] Order placed for {instrument}: {order_id}")
 
     def mark_order_filled(self, instrument: str, fill_price: float):
@@ -402,6 +410,7 @@ class EODMonitor:
             state = self._states[instrument]
             state.order_filled = True
             state.order_fill_price = fill_price
+            self._replicate(state)
             logger.info(f"[EOD] Order filled for {instrument} @ {fill_price:.2f}")
 
     def was_executed_at_eod(
@@ -550,6 +559,71 @@ class EODMonitor:
 
         return int((close_datetime - now).total_seconds())
 
+    def _replicate(self, state: EODExecutionState):
+        """Hand an instrument's state to the change log (if attached); caller holds the lock"""
+        if self.change_log is not None:
+            self.change_log.publish('eod_state', self._state_snapshot(state))
+
+    @staticmethod
+    def _state_snapshot(state: EODExecutionState) -> Dict:
+        """Serializable copy of an EODExecutionState (signal in webhook form)"""
+        signal = None
+        if state.latest_signal is not None:
+            signal = asdict(state.latest_signal)
+            signal.pop('market_close_time', None)
+            signal.pop('seconds_to_close', None)
+            signal['type'] = 'EOD_MONITOR'
+            signal['timestamp'] = state.latest_signal.timestamp.isoformat()
+        return {
+            'instrument': state.instrument,
+            'date': state.date,
+            'signal': signal,
+            'signal_received_at': state.signal_received_at,
+            'execution_scheduled': state.execution_scheduled,
+            'execution_started': state.execution_started,
+            'execution_completed': state.execution_completed,
+            'execution_result': state.execution_result,
+            'order_id': state.order_id,
+            'order_placed_at': state.order_placed_at,
+            'order_filled': state.order_filled,
+            'order_fill_price': state.order_fill_price,
+            'executed_signal_type': state.executed_signal_type.value if state.executed_signal_type else None,
+            'executed_fingerprint': state.executed_fingerprint,
+        }
+
+    def restore_state(self, snapshot: Dict) -> bool:
+        """
+        Replace an instrument's state with a snapshot replicated from the HA leader.
+
+        Snapshots from a previous day are ignored.
+
+        Returns:
+            True if the state was restored
+        """
+        if snapshot['date'] != self._get_today_str():
+            return False
+        signal = EODMonitorSignal.from_dict(snapshot['signal']) if snapshot.get('signal') else None
+        executed = snapshot.get('executed_signal_type')
+        state = EODExecutionState(
+            instrument=snapshot['instrument'],
+            date=snapshot['date'],
+            latest_signal=signal,
+            signal_received_at=snapshot.get('signal_received_at'),
+            execution_scheduled=snapshot.get('execution_scheduled', False),
+            execution_started=snapshot.get('execution_started', False),
+            execution_completed=snapshot.get('execution_completed', False),
+            execution_result=snapshot.get('execution_result'),
+            order_id=snapshot.get('order_id'),
+            order_placed_at=snapshot.get('order_placed_at'),
+            order_filled=snapshot.get('order_filled', False),
+            order_fill_price=snapshot.get('order_fill_price'),
+            executed_signal_type=SignalType(executed) if executed else None,
+            executed_fingerprint=snapshot.get('executed_fingerprint'),
+        )
+        with self._lock:
+            self._states[state.instrument] = state
+        return True
+
     def _cleanup_history(self):
         """Remove old entries from signal history (older than 24 hours)"""
         cutoff = datetime.now() - timedelta(hours=24)
@@ -0,0 +1,209 @@
+"""
+EOD Pre-Arm - Cached order tickets for the T-30 execution job
+
+Every accepted EOD_MONITOR signal re-arms a fully built order ticket for its
+instrument: action, lots, limit price, resolved broker symbol and exchange,
+an acceptable price band and the validation outcome. At T-30 the execution
+job only checks the latest price against the band and places one order.
+
+Design:
+- Arming reuses EODExecutor.prepare_execution() so sizing, validation and
+  limit-price rules are the same as the unarmed path
+- Symbol resolution (SymbolMapper / ExpiryCalendar) happens at arm time
+- A ticket is only usable while it was built from the monitor's latest
+  signal and the PM position state it was armed with is unchanged
+- Multi-leg synthetic futures (Bank Nifty) are not armed; they take the
+  regular EOD path
+"""
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional
+
+from core.eod_executor import EODExecutor
+from core.models import EODMonitorSignal, SignalType
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EODOrderTicket:
+    """Pre-built EOD order for one instrument"""
+    instrument: str
+    signal_timestamp: datetime
+    armed_at: datetime
+    in_position: bool
+    pyramid_count: int
+
+    signal_type: Optional[SignalType] = None
+    action: Optional[str] = None
+    lots: int = 0
+    limit_price: Optional[float] = None
+    reference_price: Optional[float] = None
+    band_low: Optional[float] = None
+    band_high: Optional[float] = None
+    symbol: Optional[str] = None
+    exchange: Optional[str] = None
+
+    # Validation outcome
+    valid: bool = False
+    reason: Optional[str] = None
+
+    def price_in_band(self, price: float) -> bool:
+        """Check whether a price is still inside the armed band"""
+        if self.band_low is None or self.band_high is None:
+            return False
+        return self.band_low <= price <= self.band_high
+
+    def matches(self, eod_signal: EODMonitorSignal, in_position: bool, pyramid_count: int) -> bool:
+        """True if the ticket was armed from this signal and position state"""
+        return (
+            self.signal_timestamp == eod_signal.timestamp
+            and self.in_position == in_position
+            and self.pyramid_count == pyramid_count
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            'instrument': self.instrument,
+            'signal_type': self.signal_type.value if self.signal_type else None,
+            'action': self.action,
+            'lots': self.lots,
+            'limit_price': self.limit_price,
+            'reference_price': self.reference_price,
+            'band_low': self.band_low,
+            'band_high': self.band_high,
+            'symbol': self.symbol,
+            'exchange': self.exchange,
+            'valid': self.valid,
+            'reason': self.reason,
+            'signal_timestamp': self.signal_timestamp.isoformat() if self.signal_timestamp else None,
+            'armed_at': self.armed_at.isoformat() if self.armed_at else None,
+        }
+
+
+class EODPreArmer:
+    """
+    Keeps one armed EODOrderTicket per instrument.
+
+    Usage:
+        armer = EODPreArmer(executor, symbol_mapper)
+
+        # On each accepted EOD_MONITOR signal (position status from the PM)
+        ticket = armer.arm(eod_signal)
+
+        # At T-30
+        ticket = armer.get_ticket(instrument)
+        if ticket and ticket.valid and ticket.price_in_band(latest_price):
+            context = executor.execute_ticket(ticket, latest_signal)
+    """
+
+    def __init__(self, executor: EODExecutor, symbol_mapper=None, price_band_pct: float = 0.25):
+        """
+        Initialize EOD pre-armer.
+
+        Args:
+            executor: EODExecutor used to validate, size and price tickets
+            symbol_mapper: SymbolMapper for broker symbol resolution (None = internal names)
+            price_band_pct: Allowed move from the armed price before the ticket is stale (%)
+        """
+        self.executor = executor
+        self.symbol_mapper = symbol_mapper
+        self.price_band_pct = price_band_pct
+        self._tickets: Dict[str, EODOrderTicket] = {}
+        self._lock = threading.Lock()
+
+    def arm(self, eod_signal: EODMonitorSignal) -> EODOrderTicket:
+        """
+        Build and store the ticket for a signal.
+
+        The signal's position_status must already hold the PM's position
+        state (Gap 1: the PM is the authority, not TradingView).
+
+        Args:
+            eod_signal: Latest accepted EOD_MONITOR signal
+
+        Returns:
+            The armed ticket (valid=False with a reason if not executable)
+        """
+        instrument = eod_signal.instrument
+        position_status = eod_signal.position_status
+        ticket = EODOrderTicket(
+            instrument=instrument,
+            signal_timestamp=eod_signal.timestamp,
+            armed_at=datetime.now(),
+            in_position=position_status.in_position if position_status else False,
+            pyramid_count=position_status.pyramid_count if position_status else 0,
+            reference_price=eod_signal.price
+        )
+
+        self._build(ticket, eod_signal)
+
+        with self._lock:
+            self._tickets[instrument] = ticket
+
+        logger.debug(
+            f"[EOD-PreArm] {instrument}: armed valid={ticket.valid} "
+            f"action={ticket.action} lots={ticket.lots} symbol={ticket.symbol} "
+            f"reason={ticket.reason}"
+        )
+        return ticket
+
+    def _build(self, ticket: EODOrderTicket, eod_signal: EODMonitorSignal):
+        """Fill in validation, sizing, price band and symbol"""
+        signal_type = eod_signal.get_signal_type_to_execute()
+        if not signal_type:
+            ticket.reason = "no_action"
+            return
+        ticket.signal_type = signal_type
+
+        if eod_signal.sizing is None:
+            ticket.reason = "no_sizing"
+            return
+
+        context = self.executor.prepare_execution(ticket.instrument, eod_signal, signal_type)
+        if context.error:
+            ticket.reason = context.error
+            return
+
+        ticket.action = "SELL" if signal_type == SignalType.EXIT else "BUY"
+        ticket.lots = context.lots
+        ticket.limit_price = context.limit_price
+        ticket.band_low = round(eod_signal.price * (1 - self.price_band_pct / 100), 2)
+        ticket.band_high = round(eod_signal.price * (1 + self.price_band_pct / 100), 2)
+
+        if self.symbol_mapper:
+            try:
+                translated = self.symbol_mapper.translate(
+                    instrument=ticket.instrument,
+                    action=ticket.action,
+                    current_price=eod_signal.price
+                )
+            except Exception as e:
+                ticket.reason = f"symbol_translation_failed: {e}"
+                return
+            if translated.is_synthetic or len(translated.symbols) != 1:
+                ticket.reason = "multi_leg_instrument"
+                return
+            ticket.symbol = translated.symbols[0]
+            ticket.exchange = translated.exchange
+        else:
+            ticket.symbol = ticket.instrument
+
+        ticket.valid = True
+
+    def get_ticket(self, instrument: str) -> Optional[EODOrderTicket]:
+        """Get the armed ticket for an instrument"""
+        with self._lock:
+            return self._tickets.get(instrument)
+
+    def disarm(self, instrument: str):
+        """Drop the ticket for an instrument (after execution or at day reset)"""
+        with self._lock:
+            self._tickets.pop(instrument, None)
+
+    def get_all_tickets(self) -> Dict[str, EODOrderTicket]:
+        """Snapshot of all armed tickets"""
+        with self._lock:
+            return dict(self._tickets)
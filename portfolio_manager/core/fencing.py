@@ -0,0 +1,152 @@
+"""
+Order Fencing - Reject orders from a deposed HA leader locally
+
+With fast failover a new leader can take over while the old one still has
+work in flight (a signal being processed, an EOD job, a PM-initiated exit).
+Every broker call that places or modifies an order goes through
+FencedBrokerClient, which asks the coordinator whether this instance still
+holds the lease and, inside a fencing scope, whether the lease is the same
+one (same fencing token) that was held when the work started.
+
+Design:
+- The fence is created before the engine and attached to the coordinator
+  once it exists; without an attached fast-failover coordinator every order
+  is allowed (single instance / classic HA behaviour unchanged)
+- Tokens are captured per thread by OrderFence.scope(), so a signal that
+  started under token N is rejected if the instance lost and re-acquired
+  leadership (token N+1) while it was running; scheduled jobs (EOD phases,
+  rollover) run through OrderFence.fenced() so each run gets its own scope
+- Checks are local (lease deadline + token), no Redis round trip per order
+- With warm-standby replication, accepted orders are reported to the change
+  log until they reach a terminal status, so a promoted standby knows which
+  orders were in flight
+"""
+import functools
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, Optional
+
+from core.latency_metrics import get_latency_metrics, FENCED_ORDERS
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_ORDER_STATUSES = {'COMPLETE', 'FILLED', 'REJECTED', 'CANCELLED', 'CANCELED'}
+
+
+class OrderFence:
+    """Leadership gate for order placement"""
+
+    def __init__(self):
+        self._coordinator = None
+        self._local = threading.local()
+
+    def attach(self, coordinator):
+        """Start enforcing leadership of a fast-failover RedisCoordinator"""
+        self._coordinator = coordinator
+        logger.info(f"[FENCE] Order fencing enabled for instance {coordinator.instance_id}")
+
+    @property
+    def enabled(self) -> bool:
+        return self._coordinator is not None
+
+    @contextmanager
+    def scope(self) -> Iterator[Optional[int]]:
+        """Capture the current fencing token for work done in this thread"""
+        previous = getattr(self._local, 'token', None)
+        token = self._coordinator.fencing_token if self._coordinator else None
+        self._local.token = token
+        try:
+            yield token
+        finally:
+            self._local.token = previous
+
+    def fenced(self, fn: Callable) -> Callable:
+        """fn wrapped so every call runs inside its own scope() (scheduler jobs)"""
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with self.scope():
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def bind(self, fn: Callable) -> Callable:
+        """fn carrying this thread's current token into whichever thread runs it"""
+        token = getattr(self._local, 'token', None)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            previous = getattr(self._local, 'token', None)
+            self._local.token = token
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._local.token = previous
+        return wrapper
+
+    def violation(self) -> Optional[str]:
+        """None if orders are allowed, otherwise the rejection reason"""
+        if self._coordinator is None:
+            return None
+        return self._coordinator.fence_violation(getattr(self._local, 'token', None))
+
+
+class FencedBrokerClient:
+    """
+    Broker client proxy that rejects place/modify calls failing the fence.
+
+    Rejections return the broker's error shape ({'status': 'error', ...}) so
+    every executor handles them like a broker-side rejection. Reads and
+    cancellations pass through.
+    """
+
+    def __init__(self, broker, fence: OrderFence):
+        self._broker = broker
+        self._fence = fence
+        self.change_log = None  # StateReplicator while this instance is the HA leader
+        self._open_orders = set()  # order IDs reported as pending
+
+    def _rejected(self, call: str, reason: str) -> Dict:
+        get_latency_metrics().inc(FENCED_ORDERS, call=call)
+        logger.critical(f"[FENCE] {call} rejected locally: {reason}")
+        return {'status': 'error', 'error': f'fenced: {reason}'}
+
+    def place_order(self, *args, **kwargs) -> Dict:
+        reason = self._fence.violation()
+        if reason:
+            return self._rejected('place_order', reason)
+        result = self._broker.place_order(*args, **kwargs)
+        if self.change_log is not None and result and result.get('status') == 'success' and result.get('orderid'):
+            order = dict(zip(('symbol', 'action', 'quantity'), args), **kwargs)
+            order.update(order_id=str(result['orderid']), placed_at=datetime.now())
+            self._open_orders.add(order['order_id'])
+            self.change_log.publish('order_pending', order)
+        return result
+
+    def _order_done(self, order_id, status: str):
+        if self.change_log is not None and str(order_id) in self._open_orders:
+            self._open_orders.discard(str(order_id))
+            self.change_log.publish('order_done', {'order_id': str(order_id), 'status': status})
+
+    def modify_order(self, *args, **kwargs) -> Dict:
+        reason = self._fence.violation()
+        if reason:
+            return self._rejected('modify_order', reason)
+        return self._broker.modify_order(*args, **kwargs)
+
+    def get_order_status(self, order_id, *args, **kwargs):
+        result = self._broker.get_order_status(order_id, *args, **kwargs)
+        if isinstance(result, dict):
+            status = str(result.get('order_status') or result.get('status') or '').upper()
+            if status in TERMINAL_ORDER_STATUSES:
+                self._order_done(order_id, status)
+        return result
+
+    def cancel_order(self, order_id, *args, **kwargs) -> Dict:
+        result = self._broker.cancel_order(order_id, *args, **kwargs)
+        if result and result.get('status') == 'success':
+            self._order_done(order_id, 'CANCELLED')
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self._broker, name)
@@ -0,0 +1,737 @@
+"""
+Indicator Engine - Streaming V9 strategy indicators computed inside the PM
+
+Reproduces the indicators of BankNifty_TF_V9.0.pine, GoldMini_TF_V9.0.pine and
+SilverMini_TF_V9.0.pine so PM-side stop monitoring and EOD condition checks
+can run from locally built bars when TradingView alerts are late or missing.
+
+Design:
+- IndicatorEngine.update() is O(1) per bar: the Wilder/EMA smoothers are a
+  few floats each, and the lookbacks (Donchian, ER, ROC) live in fixed-size
+  ring buffers and a monotonic deque
+- compute_indicators() runs the same formulas over a full OHLC history with
+  NumPy array ops (only the recursive smoothers and SuperTrend loop per bar);
+  IndicatorEngine.warm_up() uses it and seeds the streaming state from the
+  last bar, so a restart does not replay history bar by bar
+- Pine semantics are kept exactly: ta.rma/ta.ema seed with an SMA,
+  ta.highest(high[1], n) excludes the current bar, ta.dmi uses ta.tr without
+  a first-bar value, and ta.supertrend direction -1 means uptrend
+
+Values that Pine would report as na are None in IndicatorSnapshot and NaN in
+the arrays returned by compute_indicators().
+"""
+import logging
+import math
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from core.models import EODConditions, EODIndicators, InstrumentType, MarketDataSignal
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class IndicatorParams:
+    """Indicator inputs of the V9 Pine strategies (defaults are the shared values)"""
+    rsi_period: int = 6
+    rsi_threshold: float = 70.0
+    ema_period: int = 200
+    dc_period: int = 20
+    adx_period: int = 30
+    adx_threshold: float = 25.0
+    er_period: int = 3
+    er_threshold: float = 0.8
+    roc_period: int = 15
+    st_period: int = 10
+    st_multiplier: float = 1.5
+    atr_period: int = 10             # atr_period_pyramid / basso_atr_period
+    doji_threshold: float = 0.1
+
+    @property
+    def warmup_bars(self) -> int:
+        """Bars after which every indicator has a value (and warm_up can seed state)"""
+        return max(
+            self.ema_period,
+            2 * self.adx_period + 1,    # ta.tr has no first-bar value, then two RMAs
+            self.rsi_period + 1,
+            self.dc_period + 1,
+            self.er_period + 1,
+            self.roc_period + 1,
+            self.st_period + 1,
+            self.atr_period,
+        )
+
+
+# Per-instrument inputs; only the ADX threshold differs between the V9 scripts
+V9_INDICATOR_PARAMS: Dict[str, IndicatorParams] = {
+    InstrumentType.BANK_NIFTY.value: IndicatorParams(adx_threshold=25.0),
+    InstrumentType.GOLD_MINI.value: IndicatorParams(adx_threshold=15.0),
+    InstrumentType.SILVER_MINI.value: IndicatorParams(adx_threshold=25.0),
+}
+
+
+def get_indicator_params(instrument: str) -> IndicatorParams:
+    """V9 indicator inputs for an instrument (shared defaults if unknown)"""
+    return V9_INDICATOR_PARAMS.get(instrument, IndicatorParams())
+
+
+@dataclass
+class Bar:
+    """One OHLC bar; timestamp is the bar open time (as in Pine `time`)"""
+    timestamp: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+
+
+@dataclass
+class IndicatorSnapshot:
+    """Indicator values after one bar (None where Pine would report na)"""
+    timestamp: Optional[datetime]
+    close: float
+    atr: Optional[float] = None
+    supertrend: Optional[float] = None
+    direction: Optional[int] = None     # -1 uptrend, 1 downtrend (Pine convention)
+    rsi: Optional[float] = None
+    ema: Optional[float] = None
+    dc_upper: Optional[float] = None
+    dc_lower: Optional[float] = None
+    di_plus: Optional[float] = None
+    di_minus: Optional[float] = None
+    adx: Optional[float] = None
+    er: Optional[float] = None
+    roc: Optional[float] = None
+    is_doji: bool = False
+    params: IndicatorParams = IndicatorParams()
+
+    @property
+    def ready(self) -> bool:
+        """True once every entry-condition input has a value"""
+        return None not in (
+            self.atr, self.supertrend, self.rsi, self.ema, self.dc_upper, self.adx, self.er
+        )
+
+    def to_conditions(self) -> EODConditions:
+        """Evaluate the 7 V9 entry conditions and the SuperTrend exit"""
+        p = self.params
+        c = self.close
+        conditions = EODConditions(
+            rsi_condition=self.rsi is not None and self.rsi > p.rsi_threshold,
+            ema_condition=self.ema is not None and c > self.ema,
+            dc_condition=self.dc_upper is not None and c > self.dc_upper,
+            adx_condition=self.adx is not None and self.adx < p.adx_threshold,
+            er_condition=self.er is not None and self.er > p.er_threshold,
+            st_condition=self.supertrend is not None and c > self.supertrend,
+            not_doji=not self.is_doji,
+            long_exit=self.supertrend is not None and c < self.supertrend,
+        )
+        conditions.long_entry = conditions.all_entry_conditions_met()
+        return conditions
+
+    def to_indicators(self) -> EODIndicators:
+        """Indicator values in the EOD_MONITOR payload shape"""
+        return EODIndicators(
+            rsi=self.rsi or 0.0,
+            ema=self.ema or 0.0,
+            dc_upper=self.dc_upper or 0.0,
+            adx=self.adx or 0.0,
+            er=self.er or 0.0,
+            supertrend=self.supertrend or 0.0,
+            atr=self.atr or 0.0,
+            roc=self.roc,
+        )
+
+    def to_market_data_signal(
+        self,
+        instrument: str,
+        timestamp: Optional[datetime] = None
+    ) -> Optional[MarketDataSignal]:
+        """
+        Build the MARKET_DATA signal the Scout indicator would have sent.
+
+        Returns:
+            MarketDataSignal, or None while ATR/SuperTrend are still warming up
+        """
+        if self.atr is None or self.supertrend is None:
+            return None
+        return MarketDataSignal(
+            timestamp=timestamp or self.timestamp or datetime.now(),
+            instrument=instrument,
+            price=self.close,
+            atr=self.atr,
+            supertrend=self.supertrend,
+        )
+
+
+# ============================================================
+# Streaming primitives
+# ============================================================
+
+class _Smoother:
+    """
+    Pine ta.rma (alpha=1/length) or ta.ema (alpha=2/(length+1)).
+
+    The first value is the SMA of the first `length` inputs; None inputs
+    (Pine na at the head of a series) are skipped.
+    """
+    __slots__ = ('length', 'alpha', 'value', '_count', '_sum')
+
+    def __init__(self, length: int, alpha: float):
+        self.length = length
+        self.alpha = alpha
+        self.value: Optional[float] = None
+        self._count = 0
+        self._sum = 0.0
+
+    @classmethod
+    def rma(cls, length: int) -> '_Smoother':
+        return cls(length, 1.0 / length)
+
+    @classmethod
+    def ema(cls, length: int) -> '_Smoother':
+        return cls(length, 2.0 / (length + 1))
+
+    def update(self, x: Optional[float]) -> Optional[float]:
+        if x is None:
+            return self.value
+        if self.value is not None:
+            self.value = self.alpha * x + (1 - self.alpha) * self.value
+            return self.value
+        self._count += 1
+        self._sum += x
+        if self._count == self.length:
+            self.value = self._sum / self.length
+        return self.value
+
+    def seed(self, value: float) -> None:
+        """Restore a smoother that is past its SMA seed"""
+        self.value = float(value)
+        self._count = self.length
+
+
+class _Ring:
+    """Fixed-capacity ring buffer; ago(k) is the value pushed k pushes back"""
+    __slots__ = ('_data', '_head', 'count')
+
+    def __init__(self, capacity: int):
+        self._data = [0.0] * capacity
+        self._head = 0
+        self.count = 0
+
+    def push(self, x: float) -> None:
+        self._data[self._head] = x
+        self._head = (self._head + 1) % len(self._data)
+        self.count += 1
+
+    def ago(self, k: int) -> Optional[float]:
+        if k < 1 or k > min(self.count, len(self._data)):
+            return None
+        return self._data[(self._head - k) % len(self._data)]
+
+
+class _RollingExtreme:
+    """Max (or min) of the last `length` pushed values via a monotonic deque"""
+    __slots__ = ('length', '_sign', '_deque', 'count')
+
+    def __init__(self, length: int, highest: bool = True):
+        self.length = length
+        self._sign = 1.0 if highest else -1.0
+        self._deque: Deque[Tuple[int, float]] = deque()
+        self.count = 0
+
+    def push(self, x: float) -> None:
+        key = self._sign * x
+        while self._deque and self._deque[-1][1] <= key:
+            self._deque.pop()
+        self._deque.append((self.count, key))
+        self.count += 1
+        while self._deque[0][0] <= self.count - 1 - self.length:
+            self._deque.popleft()
+
+    @property
+    def value(self) -> Optional[float]:
+        if self.count < self.length:
+            return None
+        return self._sign * self._deque[0][1]
+
+
+def _rsi_value(up: Optional[float], down: Optional[float]) -> Optional[float]:
+    if up is None or down is None:
+        return None
+    if down == 0:
+        return 100.0
+    if up == 0:
+        return 0.0
+    return 100.0 - 100.0 / (1.0 + up / down)
+
+
+def _directional_movement(up: float, down: float) -> Tuple[float, float]:
+    plus_dm = up if (up > down and up > 0) else 0.0
+    minus_dm = down if (down > up and down > 0) else 0.0
+    return plus_dm, minus_dm
+
+
+class IndicatorEngine:
+    """
+    Incremental V9 indicators for one instrument/timeframe.
+
+    Feed completed bars in order with update(); each call returns an
+    IndicatorSnapshot. warm_up() loads history before the first live bar.
+    """
+
+    def __init__(self, instrument: str, params: Optional[IndicatorParams] = None):
+        self.instrument = instrument
+        self.params = params or get_indicator_params(instrument)
+        self.bars_seen = 0
+        self.last: Optional[IndicatorSnapshot] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        p = self.params
+        self.bars_seen = 0
+        self.last = None
+        self._prev_high: Optional[float] = None
+        self._prev_low: Optional[float] = None
+        self._prev_close: Optional[float] = None
+        self._atr = _Smoother.rma(p.atr_period)
+        self._st_atr = _Smoother.rma(p.st_period)
+        self._rsi_up = _Smoother.rma(p.rsi_period)
+        self._rsi_down = _Smoother.rma(p.rsi_period)
+        self._ema = _Smoother.ema(p.ema_period)
+        self._dmi_tr = _Smoother.rma(p.adx_period)
+        self._dmi_plus = _Smoother.rma(p.adx_period)
+        self._dmi_minus = _Smoother.rma(p.adx_period)
+        self._adx = _Smoother.rma(p.adx_period)
+        self._di_plus: Optional[float] = None
+        self._di_minus: Optional[float] = None
+        self._highs = _RollingExtreme(p.dc_period, highest=True)
+        self._lows = _RollingExtreme(p.dc_period, highest=False)
+        self._closes = _Ring(max(p.er_period, p.roc_period) + 1)
+        self._upper_band: Optional[float] = None
+        self._lower_band: Optional[float] = None
+        self._supertrend: Optional[float] = None
+        self._prev_st_atr: Optional[float] = None
+
+    def update(
+        self,
+        open_: float,
+        high: float,
+        low: float,
+        close: float,
+        timestamp: Optional[datetime] = None
+    ) -> IndicatorSnapshot:
+        """Advance all indicators by one completed bar"""
+        p = self.params
+        prev_close = self._prev_close
+
+        # True range: ta.tr(true) for ATR/SuperTrend, ta.tr (na on first bar) for DMI
+        if prev_close is None:
+            tr_true = high - low
+            tr = None
+        else:
+            tr_true = max(high - low, abs(high - prev_close), abs(low - prev_close))
+            tr = tr_true
+        atr = self._atr.update(tr_true)
+        st_atr = self._st_atr.update(tr_true)
+
+        # RSI
+        if prev_close is None:
+            rsi = None
+        else:
+            change = close - prev_close
+            rsi = _rsi_value(
+                self._rsi_up.update(max(change, 0.0)),
+                self._rsi_down.update(max(-change, 0.0))
+            )
+
+        ema = self._ema.update(close)
+
+        # Donchian over the previous dc_period bars (current bar pushed below)
+        dc_upper = self._highs.value
+        dc_lower = self._lows.value
+
+        # DMI / ADX
+        if prev_close is not None:
+            plus_dm, minus_dm = _directional_movement(high - self._prev_high, self._prev_low - low)
+            trur = self._dmi_tr.update(tr)
+            plus_rma = self._dmi_plus.update(plus_dm)
+            minus_rma = self._dmi_minus.update(minus_dm)
+            if trur is not None and trur != 0:
+                # fixnan: keep the last DI values while TR smoothing is zero
+                self._di_plus = 100.0 * plus_rma / trur
+                self._di_minus = 100.0 * minus_rma / trur
+            if self._di_plus is not None:
+                di_sum = self._di_plus + self._di_minus
+                self._adx.update(abs(self._di_plus - self._di_minus) / (di_sum if di_sum != 0 else 1.0))
+        adx = 100.0 * self._adx.value if self._adx.value is not None else None
+
+        # Efficiency Ratio (non-directional) and ROC from the close ring
+        er = None
+        past = self._closes.ago(p.er_period)
+        if past is not None:
+            noise = abs(close - self._closes.ago(1))
+            for k in range(1, p.er_period):
+                noise += abs(self._closes.ago(k) - self._closes.ago(k + 1))
+            er = abs(close - past) / noise if noise != 0 else 0.0
+        roc = None
+        base = self._closes.ago(p.roc_period)
+        if base is not None and base != 0:
+            roc = 100.0 * (close - base) / base
+
+        supertrend, direction = self._update_supertrend(high, low, close, prev_close, st_atr)
+
+        body = abs(close - open_)
+        candle_range = high - low
+        is_doji = bool(candle_range > 0 and body / candle_range <= p.doji_threshold)
+
+        self._highs.push(high)
+        self._lows.push(low)
+        self._closes.push(close)
+        self._prev_high, self._prev_low, self._prev_close = high, low, close
+        self.bars_seen += 1
+
+        self.last = IndicatorSnapshot(
+            timestamp=timestamp, close=close, atr=atr, supertrend=supertrend,
+            direction=direction, rsi=rsi, ema=ema, dc_upper=dc_upper, dc_lower=dc_lower,
+            di_plus=self._di_plus, di_minus=self._di_minus,
+            adx=adx,
+            er=er, roc=roc, is_doji=is_doji, params=p,
+        )
+        return self.last
+
+    def update_bar(self, bar: Bar) -> IndicatorSnapshot:
+        return self.update(bar.open, bar.high, bar.low, bar.close, bar.timestamp)
+
+    def _update_supertrend(
+        self,
+        high: float,
+        low: float,
+        close: float,
+        prev_close: Optional[float],
+        atr: Optional[float]
+    ) -> Tuple[Optional[float], Optional[int]]:
+        """One step of ta.supertrend(st_multiplier, st_period)"""
+        prev_atr = self._prev_st_atr
+        self._prev_st_atr = atr
+        if atr is None:
+            return None, None
+
+        hl2 = (high + low) / 2.0
+        upper = hl2 + self.params.st_multiplier * atr
+        lower = hl2 - self.params.st_multiplier * atr
+        prev_upper = self._upper_band or 0.0
+        prev_lower = self._lower_band or 0.0
+        prev_close = prev_close if prev_close is not None else math.nan
+
+        if not (lower > prev_lower or prev_close < prev_lower):
+            lower = prev_lower
+        if not (upper < prev_upper or prev_close > prev_upper):
+            upper = prev_upper
+
+        if prev_atr is None:
+            direction = 1
+        elif self._supertrend == prev_upper:
+            direction = -1 if close > upper else 1
+        else:
+            direction = 1 if close < lower else -1
+
+        self._upper_band, self._lower_band = upper, lower
+        self._supertrend = lower if direction == -1 else upper
+        return self._supertrend, direction
+
+    def warm_up(
+        self,
+        open_: Sequence[float],
+        high: Sequence[float],
+        low: Sequence[float],
+        close: Sequence[float],
+        timestamps: Optional[Sequence[datetime]] = None
+    ) -> Optional[IndicatorSnapshot]:
+        """
+        Load an OHLC history (oldest first), replacing any existing state.
+
+        Histories long enough for every indicator to be seeded are computed
+        with compute_indicators() and the streaming state is taken from the
+        last bar; shorter ones are replayed through update().
+
+        Returns:
+            Snapshot for the last history bar (None for an empty history)
+        """
+        self._reset()
+        n = len(close)
+        if n == 0:
+            return None
+        ts = list(timestamps) if timestamps is not None else [None] * n
+        if n < self.params.warmup_bars + 1:
+            for i in range(n):
+                self.update(open_[i], high[i], low[i], close[i], ts[i])
+            return self.last
+
+        o, h, l, c = (np.asarray(a, dtype=float) for a in (open_, high, low, close))
+        series = _compute_series(o, h, l, c, self.params)
+        p = self.params
+
+        self._atr.seed(series['atr'][-1])
+        self._st_atr.seed(series['_st_atr'][-1])
+        self._rsi_up.seed(series['_rsi_up'][-1])
+        self._rsi_down.seed(series['_rsi_down'][-1])
+        self._ema.seed(series['ema'][-1])
+        self._dmi_tr.seed(series['_dmi_tr'][-1])
+        self._dmi_plus.seed(series['_dmi_plus'][-1])
+        self._dmi_minus.seed(series['_dmi_minus'][-1])
+        self._adx.seed(series['_adx'][-1])
+        self._di_plus = float(series['di_plus'][-1])
+        self._di_minus = float(series['di_minus'][-1])
+        for i in range(n - p.dc_period, n):
+            self._highs.push(float(h[i]))
+            self._lows.push(float(l[i]))
+        for i in range(max(0, n - (p.er_period + p.roc_period + 1)), n):
+            self._closes.push(float(c[i]))
+        self._upper_band = float(series['_upper_band'][-1])
+        self._lower_band = float(series['_lower_band'][-1])
+        self._supertrend = float(series['supertrend'][-1])
+        self._prev_st_atr = float(series['_st_atr'][-1])
+        self._prev_high, self._prev_low, self._prev_close = float(h[-1]), float(l[-1]), float(c[-1])
+        self.bars_seen = n
+
+        self.last = _snapshot_at(series, n - 1, float(c[-1]), ts[-1], p)
+        logger.info(
+            f"[INDICATORS] {self.instrument} warmed up from {n} bars: "
+            f"atr={self.last.atr:.2f}, supertrend={self.last.supertrend:.2f}"
+        )
+        return self.last
+
+
+# ============================================================
+# Vectorized computation (warm-up, backtests, parity checks)
+# ============================================================
+
+def _smooth_series(x: np.ndarray, length: int, alpha: float) -> np.ndarray:
+    """ta.rma / ta.ema over an array whose NaNs are only at the head"""
+    out = np.full(len(x), np.nan)
+    valid = np.flatnonzero(~np.isnan(x))
+    if len(valid) < length:
+        return out
+    seed = valid[0] + length - 1
+    value = float(np.sum(x[valid[0]:seed + 1])) / length
+    out[seed] = value
+    beta = 1.0 - alpha
+    for i in range(seed + 1, len(x)):
+        value = alpha * x[i] + beta * value
+        out[i] = value
+    return out
+
+
+def _rma(x: np.ndarray, length: int) -> np.ndarray:
+    return _smooth_series(x, length, 1.0 / length)
+
+
+def _fixnan(x: np.ndarray) -> np.ndarray:
+    """Carry the last non-NaN value forward (Pine fixnan)"""
+    idx = np.where(np.isnan(x), 0, np.arange(len(x)))
+    np.maximum.accumulate(idx, out=idx)
+    return x[idx]
+
+
+def _shifted_window(x: np.ndarray, length: int, reducer) -> np.ndarray:
+    """reducer over x[i-length .. i-1] (ta.highest(x[1], length) style)"""
+    out = np.full(len(x), np.nan)
+    if len(x) > length:
+        out[length:] = reducer(sliding_window_view(x[:-1], length), axis=1)
+    return out
+
+
+def _compute_series(
+    o: np.ndarray,
+    h: np.ndarray,
+    l: np.ndarray,
+    c: np.ndarray,
+    p: IndicatorParams
+) -> Dict[str, np.ndarray]:
+    n = len(c)
+    prev_c = np.concatenate(([np.nan], c[:-1]))
+
+    tr = np.fmax(h - l, np.fmax(np.abs(h - prev_c), np.abs(l - prev_c)))
+    tr[0] = np.nan
+    tr_true = tr.copy()
+    tr_true[0] = h[0] - l[0]
+    atr = _rma(tr_true, p.atr_period)
+    st_atr = _rma(tr_true, p.st_period)
+
+    change = c - prev_c
+    rsi_up = _rma(np.where(np.isnan(change), np.nan, np.maximum(change, 0.0)), p.rsi_period)
+    rsi_down = _rma(np.where(np.isnan(change), np.nan, np.maximum(-change, 0.0)), p.rsi_period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(rsi_down == 0, 100.0,
+                       np.where(rsi_up == 0, 0.0, 100.0 - 100.0 / (1.0 + rsi_up / rsi_down)))
+    rsi[np.isnan(rsi_up) | np.isnan(rsi_down)] = np.nan
+
+    ema = _smooth_series(c, p.ema_period, 2.0 / (p.ema_period + 1))
+
+    up = np.concatenate(([np.nan], np.diff(h)))
+    down = np.concatenate(([np.nan], -np.diff(l)))
+    plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+    minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+    plus_dm[0] = minus_dm[0] = np.nan
+    dmi_tr = _rma(tr, p.adx_period)
+    dmi_plus = _rma(plus_dm, p.adx_period)
+    dmi_minus = _rma(minus_dm, p.adx_period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        di_plus = _fixnan(np.where(dmi_tr != 0, 100.0 * dmi_plus / dmi_tr, np.nan))
+        di_minus = _fixnan(np.where(dmi_tr != 0, 100.0 * dmi_minus / dmi_tr, np.nan))
+    di_sum = di_plus + di_minus
+    adx_rma = _rma(np.abs(di_plus - di_minus) / np.where(di_sum == 0, 1.0, di_sum), p.adx_period)
+
+    dc_upper = _shifted_window(h, p.dc_period, np.max)
+    dc_lower = _shifted_window(l, p.dc_period, np.min)
+
+    er = np.full(n, np.nan)
+    if n > p.er_period:
+        noise = sliding_window_view(np.abs(np.diff(c)), p.er_period).sum(axis=1)
+        signal = np.abs(c[p.er_period:] - c[:-p.er_period])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            er[p.er_period:] = np.where(noise != 0, signal / noise, 0.0)
+
+    roc = np.full(n, np.nan)
+    if n > p.roc_period:
+        base = c[:-p.roc_period]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            roc[p.roc_period:] = np.where(base != 0, 100.0 * (c[p.roc_period:] - base) / base, np.nan)
+
+    body = np.abs(c - o)
+    candle_range = h - l
+    with np.errstate(divide='ignore', invalid='ignore'):
+        is_doji = (candle_range > 0) & (body / np.where(candle_range > 0, candle_range, 1.0) <= p.doji_threshold)
+
+    # SuperTrend is path dependent: one scalar pass
+    supertrend = np.full(n, np.nan)
+    direction = np.full(n, np.nan)
+    upper_band = np.full(n, np.nan)
+    lower_band = np.full(n, np.nan)
+    hl2 = (h + l) / 2.0
+    prev_upper = prev_lower = 0.0
+    prev_st = math.nan
+    for i in range(n):
+        a = st_atr[i]
+        if math.isnan(a):
+            continue
+        upper = hl2[i] + p.st_multiplier * a
+        lower = hl2[i] - p.st_multiplier * a
+        pc = prev_c[i]
+        if not (lower > prev_lower or pc < prev_lower):
+            lower = prev_lower
+        if not (upper < prev_upper or pc > prev_upper):
+            upper = prev_upper
+        if i == 0 or math.isnan(st_atr[i - 1]):
+            d = 1
+        elif prev_st == prev_upper:
+            d = -1 if c[i] > upper else 1
+        else:
+            d = 1 if c[i] < lower else -1
+        prev_st = lower if d == -1 else upper
+        supertrend[i], direction[i] = prev_st, d
+        upper_band[i], lower_band[i] = upper, lower
+        prev_upper, prev_lower = upper, lower
+
+    return {
+        'atr': atr, 'supertrend': supertrend, 'direction': direction, 'rsi': rsi, 'ema': ema,
+        'dc_upper': dc_upper, 'dc_lower': dc_lower, 'di_plus': di_plus, 'di_minus': di_minus,
+        'adx': 100.0 * adx_rma, 'er': er, 'roc': roc, 'is_doji': is_doji,
+        '_st_atr': st_atr, '_rsi_up': rsi_up, '_rsi_down': rsi_down, '_dmi_tr': dmi_tr,
+        '_dmi_plus': dmi_plus, '_dmi_minus': dmi_minus, '_adx': adx_rma,
+        '_upper_band': upper_band, '_lower_band': lower_band,
+    }
+
+
+def compute_indicators(
+    open_: Sequence[float],
+    high: Sequence[float],
+    low: Sequence[float],
+    close: Sequence[float],
+    params: Optional[IndicatorParams] = None
+) -> Dict[str, np.ndarray]:
+    """
+    V9 indicators over a full OHLC history (oldest first).
+
+    Returns:
+        Dict of arrays aligned with the input bars: atr, supertrend, direction,
+        rsi, ema, dc_upper, dc_lower, di_plus, di_minus, adx, er, roc (NaN
+        where Pine gives na) and is_doji (bool)
+    """
+    params = params or IndicatorParams()
+    o, h, l, c = (np.asarray(a, dtype=float) for a in (open_, high, low, close))
+    series = _compute_series(o, h, l, c, params)
+    return {k: v for k, v in series.items() if not k.startswith('_')}
+
+
+def _snapshot_at(
+    series: Dict[str, np.ndarray],
+    i: int,
+    close: float,
+    timestamp: Optional[datetime],
+    params: IndicatorParams
+) -> IndicatorSnapshot:
+    def value(key: str) -> Optional[float]:
+        v = series[key][i]
+        return None if np.isnan(v) else float(v)
+
+    direction = value('direction')
+    return IndicatorSnapshot(
+        timestamp=timestamp, close=close, atr=value('atr'), supertrend=value('supertrend'),
+        direction=int(direction) if direction is not None else None,
+        rsi=value('rsi'), ema=value('ema'), dc_upper=value('dc_upper'), dc_lower=value('dc_lower'),
+        di_plus=value('di_plus'), di_minus=value('di_minus'), adx=value('adx'),
+        er=value('er'), roc=value('roc'), is_doji=bool(series['is_doji'][i]), params=params,
+    )
+
+
+# ============================================================
+# Bar builder (broker quotes -> bars)
+# ============================================================
+
+class BarBuilder:
+    """
+    Aggregates price ticks into fixed-length bars anchored at the session open
+    (75 min from 09:15 for Bank Nifty, 60 min from 09:00 for MCX metals).
+
+    on_tick() returns the bar that a tick closes, so the caller can pass it
+    straight to IndicatorEngine.update_bar().
+    """
+
+    def __init__(self, interval_minutes: int, session_start: time):
+        self.interval = timedelta(minutes=interval_minutes)
+        self.session_start = session_start
+        self._bar: Optional[Bar] = None
+
+    def bar_start(self, ts: datetime) -> datetime:
+        anchor = datetime.combine(ts.date(), self.session_start, tzinfo=ts.tzinfo)
+        if ts < anchor:
+            return anchor
+        return anchor + ((ts - anchor) // self.interval) * self.interval
+
+    def on_tick(self, price: float, ts: datetime) -> Optional[Bar]:
+        start = self.bar_start(ts)
+        bar = self._bar
+        if bar is not None and start == bar.timestamp:
+            bar.high = max(bar.high, price)
+            bar.low = min(bar.low, price)
+            bar.close = price
+            return None
+        self._bar = Bar(timestamp=start, open=price, high=price, low=price, close=price)
+        return bar
+
+    def flush(self) -> Optional[Bar]:
+        """Close the bar in progress (e.g. at session end)"""
+        bar, self._bar = self._bar, None
+        return bar
+
+
+def replay_bars(engine: IndicatorEngine, bars: Sequence[Bar]) -> List[IndicatorSnapshot]:
+    """Feed bars through an engine one at a time (parity checks against TV exports)"""
+    return [engine.update_bar(bar) for bar in bars]
@@ -0,0 +1,309 @@
+"""
+Latency Metrics - Fixed-bucket histograms and counters for hot-path timing
+
+Records per-stage latency for the webhook pipeline (parse, dedup, leadership,
+safety, process_signal, DB log, broker quote, order placement, fill wait) and
+for background work (MARKET_DATA processing, broker sync, rollover).
+
+Design:
+- Fixed bucket boundaries: observe() is a bisect + two integer increments,
+  no sample lists are kept and nothing is sorted at read time
+- One small lock per series; the registry lock is only taken when a new
+  label combination is seen for the first time
+- Rendered in Prometheus text exposition format for GET /metrics
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Bucket upper bounds in milliseconds (+Inf is implicit)
+DEFAULT_LATENCY_BUCKETS_MS: Tuple[float, ...] = (
+    0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500,
+    1000, 2500, 5000, 10000, 30000, 60000
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    """Normalize a label dict into a hashable, order-independent key"""
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    """Format labels as {a="x",b="y"} (empty string if no labels)"""
+    items = list(key)
+    if extra:
+        items.append(extra)
+    if not items:
+        return ''
+    escaped = [
+        f'{k}="{v.replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for k, v in items
+    ]
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    """Single histogram series with fixed bucket boundaries (milliseconds)"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS_MS):
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        # Last slot is the +Inf overflow bucket
+        self._counts: List[int] = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value_ms: float):
+        """Record one observation"""
+        index = bisect.bisect_left(self.buckets, value_ms)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value_ms
+            self._count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        """Return (per-bucket counts, sum, count) as a consistent copy"""
+        with self._lock:
+            return list(self._counts), self._sum, self._count
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Estimate a percentile from bucket counts
+
+        Linear interpolation inside the bucket that contains the rank, the same
+        approach as Prometheus histogram_quantile(). Observations in the +Inf
+        bucket report the largest finite bound.
+
+        Args:
+            percentile: Percentile value (0-100)
+
+        Returns:
+            Estimated value in milliseconds (0.0 if no observations)
+        """
+        counts, _, total = self.snapshot()
+        if total == 0:
+            return 0.0
+
+        rank = (percentile / 100.0) * total
+        cumulative = 0
+        for i, bucket_count in enumerate(counts):
+            if cumulative + bucket_count >= rank and bucket_count > 0:
+                if i >= len(self.buckets):
+                    return float(self.buckets[-1])
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i]
+                fraction = (rank - cumulative) / bucket_count
+                return float(lower + (upper - lower) * fraction)
+            cumulative += bucket_count
+        return float(self.buckets[-1])
+
+
+class Counter:
+    """Single monotonically increasing counter series"""
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        with self._lock:
+            return self._value
+
+
+class LatencyMetricsRegistry:
+    """
+    Registry of labelled histograms and counters
+
+    Usage:
+        metrics = get_latency_metrics()
+        with metrics.time('webhook_stage_latency_ms', stage='parse', instrument='GOLD_MINI'):
+            ...
+        metrics.inc('webhook_requests_total', outcome='processed')
+        text = metrics.render_prometheus()
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS_MS):
+        self.buckets = tuple(sorted(buckets))
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._counters: Dict[str, Dict[LabelKey, Counter]] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, help_text: str):
+        """Set HELP text for a metric family"""
+        self._help[name] = help_text
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        """Get or create a histogram series"""
+        key = _label_key(labels)
+        family = self._histograms.get(name)
+        if family is not None:
+            series = family.get(key)
+            if series is not None:
+                return series
+        with self._lock:
+            family = self._histograms.setdefault(name, {})
+            series = family.get(key)
+            if series is None:
+                series = Histogram(self.buckets)
+                family[key] = series
+            return series
+
+    def counter(self, name: str, **labels) -> Counter:
+        """Get or create a counter series"""
+        key = _label_key(labels)
+        family = self._counters.get(name)
+        if family is not None:
+            series = family.get(key)
+            if series is not None:
+                return series
+        with self._lock:
+            family = self._counters.setdefault(name, {})
+            series = family.get(key)
+            if series is None:
+                series = Counter()
+                family[key] = series
+            return series
+
+    def observe(self, name: str, value_ms: float, **labels):
+        """Record a latency observation in milliseconds"""
+        self.histogram(name, **labels).observe(value_ms)
+
+    def inc(self, name: str, amount: float = 1.0, **labels):
+        """Increment a counter"""
+        self.counter(name, **labels).inc(amount)
+
+    @contextmanager
+    def time(self, name: str, **labels) -> Iterator[None]:
+        """Context manager that records elapsed wall time (ms), even on exception"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000.0, **labels)
+
+    def get_stats(self, name: str) -> Dict[str, Dict]:
+        """
+        Summary of a histogram family for JSON endpoints
+
+        Returns:
+            Dict keyed by formatted label string with count, avg and p50/p95/p99
+        """
+        stats = {}
+        for key, series in list(self._histograms.get(name, {}).items()):
+            _, total_sum, count = series.snapshot()
+            stats[_format_labels(key) or '{}'] = {
+                'count': count,
+                'avg_ms': total_sum / count if count else 0.0,
+                'p50_ms': series.percentile(50.0),
+                'p95_ms': series.percentile(95.0),
+                'p99_ms': series.percentile(99.0),
+            }
+        return stats
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in Prometheus text exposition format (0.0.4)"""
+        lines: List[str] = []
+
+        for name in sorted(self._counters):
+            lines.append(f'# HELP {name} {self._help.get(name, name)}')
+            lines.append(f'# TYPE {name} counter')
+            for key, series in sorted(list(self._counters[name].items())):
+                lines.append(f'{name}{_format_labels(key)} {_format_value(series.value)}')
+
+        for name in sorted(self._histograms):
+            lines.append(f'# HELP {name} {self._help.get(name, name)}')
+            lines.append(f'# TYPE {name} histogram')
+            for key, series in sorted(list(self._histograms[name].items())):
+                counts, total_sum, count = series.snapshot()
+                cumulative = 0
+                for bound, bucket_count in zip(series.buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    le = ('le', _format_value(bound))
+                    lines.append(f'{name}_bucket{_format_labels(key, le)} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(key)} {_format_value(total_sum)}')
+                lines.append(f'{name}_count{_format_labels(key)} {count}')
+
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def clear(self):
+        """Clear all metrics (for testing)"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+# Metric family names shared by instrumentation points
+WEBHOOK_STAGE_LATENCY = 'pm_webhook_stage_latency_ms'
+WEBHOOK_REQUESTS = 'pm_webhook_requests_total'
+BROKER_CALL_LATENCY = 'pm_broker_call_latency_ms'
+BACKGROUND_TASK_LATENCY = 'pm_background_task_latency_ms'
+COORDINATOR_DB_SYNC_LATENCY = 'pm_coordinator_db_sync_latency_ms'
+EOD_TRIGGER_TO_ACK_LATENCY = 'pm_eod_trigger_to_ack_latency_ms'
+FENCED_ORDERS = 'pm_fenced_orders_total'
+HA_TAKEOVER_LATENCY = 'pm_ha_takeover_latency_ms'
+
+
+# Global instance
+_latency_metrics: Optional[LatencyMetricsRegistry] = None
+_latency_metrics_lock = threading.Lock()
+
+
+def get_latency_metrics() -> LatencyMetricsRegistry:
+    """Get global LatencyMetricsRegistry instance (created on first use)"""
+    global _latency_metrics
+    if _latency_metrics is None:
+        with _latency_metrics_lock:
+            if _latency_metrics is None:
+                registry = LatencyMetricsRegistry()
+                registry.describe(
+                    WEBHOOK_STAGE_LATENCY,
+                    'Latency of each /webhook pipeline stage in milliseconds'
+                )
+                registry.describe(
+                    WEBHOOK_REQUESTS,
+                    'Webhook requests by signal type and outcome'
+                )
+                registry.describe(
+                    BROKER_CALL_LATENCY,
+                    'Latency of broker calls (quote, order placement, fill wait) in milliseconds'
+                )
+                registry.describe(
+                    BACKGROUND_TASK_LATENCY,
+                    'Latency of background tasks (broker sync, rollover) in milliseconds'
+                )
+                registry.describe(
+                    COORDINATOR_DB_SYNC_LATENCY,
+                    'Latency of Redis coordinator database syncs in milliseconds'
+                )
+                registry.describe(
+                    EOD_TRIGGER_TO_ACK_LATENCY,
+                    'Time from the EOD execution trigger to broker order acknowledgement in milliseconds'
+                )
+                registry.describe(
+                    FENCED_ORDERS,
+                    'Broker order calls rejected locally because this instance no longer holds the leader lease'
+                )
+                registry.describe(
+                    HA_TAKEOVER_LATENCY,
+                    'Time for a promoted standby to take over trading state (hot = replicated, cold = full recovery) in milliseconds'
+                )
+                _latency_metrics = registry
+    return _latency_metrics
@@ -14,13 +14,42 @@ Designed to integrate with SignalAuditService for complete audit trail.
 import logging
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Union
 
 from psycopg2.extras import RealDictCursor, Json
 
+from core.async_db_writer import QUEUED, _Queued
+from core.audit_read_model import get_audit_read_model
+from core.tracing import traced
+
 logger = logging.getLogger(__name__)
 
 
+_INSERT_ORDER_SQL = """
+    INSERT INTO order_execution_log (
+        signal_audit_id, position_id,
+        order_id, broker_order_id,
+        order_type, action, instrument, symbol, exchange,
+        quantity, lots,
+        signal_price, limit_price, fill_price, slippage_pct,
+        order_status, status_message,
+        order_placed_at, order_filled_at, execution_duration_ms,
+        parent_order_id, leg_number,
+        raw_response
+    ) VALUES (
+        %s, %s,
+        %s, %s,
+        %s, %s, %s, %s, %s,
+        %s, %s,
+        %s, %s, %s, %s,
+        %s, %s,
+        %s, %s, %s,
+        %s, %s,
+        %s
+    )
+"""
+
+
 @dataclass
 class OrderLogEntry:
     """Data structure for order execution log entry"""
@@ -79,78 +108,76 @@ class OrderExecutionLogger:
     Uses DatabaseStateManager for consistent connection handling.
     """
 
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, writer=None):
         """
         Initialize order execution logger.
 
         Args:
             db_manager: DatabaseStateManager instance with transaction() and get_connection() methods
+            writer: Optional AsyncDBWriter - when set, entries whose ID is not
+                    needed are queued and flushed in the background
         """
         self.db = db_manager
-        logger.info("[OrderExecutionLogger] Initialized")
+        self.writer = writer
+        logger.info(f"[OrderExecutionLogger] Initialized (async={writer is not None})")
 
-    def log_order(self, entry: OrderLogEntry) -> Optional[int]:
+    @traced('exec_log.log_order')
+    def log_order(self, entry: OrderLogEntry, allow_queue: bool = True) -> Union[int, _Queued, None]:
         """
         Log a single order execution entry.
 
         Args:
             entry: OrderLogEntry with order details
+            allow_queue: Queue on the background writer if one is configured
+                         (pass False when the returned ID is needed)
 
         Returns:
-            Database ID of the logged entry, or None on failure
+            Database ID of the logged entry, QUEUED when queued on the
+            background writer, or None on failure
         """
         # Calculate slippage if not already done
         entry.calculate_slippage()
 
-        query = """
-            INSERT INTO order_execution_log (
-                signal_audit_id, position_id,
-                order_id, broker_order_id,
-                order_type, action, instrument, symbol, exchange,
-                quantity, lots,
-                signal_price, limit_price, fill_price, slippage_pct,
-                order_status, status_message,
-                order_placed_at, order_filled_at, execution_duration_ms,
-                parent_order_id, leg_number,
-                raw_response
-            ) VALUES (
-                %s, %s,
-                %s, %s,
-                %s, %s, %s, %s, %s,
-                %s, %s,
-                %s, %s, %s, %s,
-                %s, %s,
-                %s, %s, %s,
-                %s, %s,
-                %s
-            )
-            RETURNING id
-        """
+        params = (
+            entry.signal_audit_id, entry.position_id,
+            entry.order_id, entry.broker_order_id,
+            entry.order_type, entry.action, entry.instrument, entry.symbol, entry.exchange,
+            entry.quantity, entry.lots,
+            entry.signal_price, entry.limit_price, entry.fill_price, entry.slippage_pct,
+            entry.order_status, entry.status_message,
+            entry.order_placed_at, entry.order_filled_at, entry.execution_duration_ms,
+            entry.parent_order_id, entry.leg_number,
+            Json(entry.raw_response) if entry.raw_response else None
+        )
+
+        if allow_queue and self.writer and self.writer.submit('order_execution_log', _INSERT_ORDER_SQL, params):
+            logger.debug(f"[OrderExecutionLogger] Queued order {entry.order_id}")
+            self._publish_order(entry, QUEUED)
+            return QUEUED
 
         try:
             with self.db.transaction() as conn:
                 with conn.cursor() as cur:
-                    cur.execute(query, (
-                        entry.signal_audit_id, entry.position_id,
-                        entry.order_id, entry.broker_order_id,
-                        entry.order_type, entry.action, entry.instrument, entry.symbol, entry.exchange,
-                        entry.quantity, entry.lots,
-                        entry.signal_price, entry.limit_price, entry.fill_price, entry.slippage_pct,
-                        entry.order_status, entry.status_message,
-                        entry.order_placed_at, entry.order_filled_at, entry.execution_duration_ms,
-                        entry.parent_order_id, entry.leg_number,
-                        Json(entry.raw_response) if entry.raw_response else None
-                    ))
+                    cur.execute(_INSERT_ORDER_SQL + " RETURNING id", params)
                     result = cur.fetchone()
                     conn.commit()
 
                     log_id = result[0] if result else None
                     logger.debug(f"[OrderExecutionLogger] Logged order {entry.order_id}, db_id={log_id}")
-                    return log_id
+            self._publish_order(entry, log_id)
+            return log_id
         except Exception as e:
             logger.error(f"[OrderExecutionLogger] Failed to log order: {e}")
             return None
 
+    @staticmethod
+    def _publish_order(entry: OrderLogEntry, log_id):
+        """Feed the in-memory read model used by the Telegram bot"""
+        read_model = get_audit_read_model()
+        if read_model is not None:
+            read_model.record_order(entry, log_id)
+
+    @traced('exec_log.log_simple_execution')
     def log_simple_execution(
         self,
         signal_audit_id: Optional[int],
@@ -184,7 +211,7 @@ class OrderExecutionLogger:
             exchange: Exchange code
 
         Returns:
-            Database ID of logged entry
+            Database ID of logged entry, QUEUED or None (see log_order)
         """
         entry = OrderLogEntry(
             signal_audit_id=signal_audit_id,
@@ -211,6 +238,7 @@ class OrderExecutionLogger:
 
         return self.log_order(entry)
 
+    @traced('exec_log.log_synthetic_execution')
     def log_synthetic_execution(
         self,
         signal_audit_id: Optional[int],
@@ -273,7 +301,8 @@ class OrderExecutionLogger:
         )
         parent_entry.calculate_slippage()
 
-        parent_id = self.log_order(parent_entry)
+        # Parent is always written inline - the legs need its ID
+        parent_id = self.log_order(parent_entry, allow_queue=False)
 
         if parent_id:
             # Log PE leg
@@ -330,6 +359,7 @@ class OrderExecutionLogger:
 
         return parent_id
 
+    @traced('exec_log.update_order_status')
     def update_order_status(
         self,
         log_id: int,
@@ -362,19 +392,30 @@ class OrderExecutionLogger:
             WHERE id = %s
         """
 
+        params = (
+            order_status,
+            fill_price,
+            status_message,
+            broker_order_id,
+            fill_price,  # For CASE condition
+            log_id
+        )
+
+        read_model = get_audit_read_model()
+        if self.writer and self.writer.submit('order_execution_log', query, params):
+            if read_model is not None:
+                read_model.record_order_status(log_id, order_status, fill_price, status_message)
+            return True
+
         try:
             with self.db.transaction() as conn:
                 with conn.cursor() as cur:
-                    cur.execute(query, (
-                        order_status,
-                        fill_price,
-                        status_message,
-                        broker_order_id,
-                        fill_price,  # For CASE condition
-                        log_id
-                    ))
+                    cur.execute(query, params)
                     conn.commit()
-                    return cur.rowcount > 0
+                    updated = cur.rowcount > 0
+            if updated and read_model is not None:
+                read_model.record_order_status(log_id, order_status, fill_price, status_message)
+            return updated
         except Exception as e:
             logger.error(f"[OrderExecutionLogger] Failed to update order status: {e}")
             return False
@@ -383,7 +424,8 @@ class OrderExecutionLogger:
         self,
         limit: int = 20,
         instrument: Optional[str] = None,
-        status: Optional[str] = None
+        status: Optional[str] = None,
+        lookback_days: int = 31
     ) -> List[Dict]:
         """
         Get recent order executions.
@@ -392,6 +434,7 @@ class OrderExecutionLogger:
             limit: Maximum number of orders to return
             instrument: Filter by instrument
             status: Filter by status
+            lookback_days: Only search this many days back (partition pruning)
 
         Returns:
             List of order execution records
@@ -399,7 +442,8 @@ class OrderExecutionLogger:
         query = """
             SELECT *
             FROM order_execution_log
-            WHERE (%s IS NULL OR instrument = %s)
+            WHERE created_at > NOW() - make_interval(days => %s)
+              AND (%s IS NULL OR instrument = %s)
               AND (%s IS NULL OR order_status = %s)
             ORDER BY order_placed_at DESC
             LIMIT %s
@@ -408,7 +452,7 @@ class OrderExecutionLogger:
         try:
             with self.db.get_connection() as conn:
                 with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                    cur.execute(query, (instrument, instrument, status, status, limit))
+                    cur.execute(query, (lookback_days, instrument, instrument, status, status, limit))
                     rows = cur.fetchall()
                     return [dict(row) for row in rows]
         except Exception as e:
@@ -512,6 +556,43 @@ class OrderExecutionLogger:
             logger.error(f"[OrderExecutionLogger] Failed to get slippage stats: {e}")
             return {"period_days": days, "statistics": []}
 
+    def get_slippage_samples(self, days: int = 90) -> Optional[List[Dict]]:
+        """
+        Per-order slippage of completed orders, by day.
+
+        Used once at startup to warm the Telegram read model (percentiles
+        need the individual samples, not just AVG/STDDEV).
+
+        Args:
+            days: Number of calendar days to include (today plus days-1 before)
+
+        Returns:
+            List of {day, instrument, order_type, slippage_pct,
+            execution_duration_ms}, or None if the query failed
+        """
+        query = """
+            SELECT
+                created_at::date as day,
+                instrument,
+                order_type,
+                slippage_pct,
+                execution_duration_ms
+            FROM order_execution_log
+            WHERE created_at >= CURRENT_DATE - make_interval(days => %s)
+              AND order_status = 'COMPLETE'
+              AND slippage_pct IS NOT NULL
+        """
+
+        try:
+            with self.db.get_connection() as conn:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    cur.execute(query, (days - 1,))
+                    rows = cur.fetchall()
+                    return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"[OrderExecutionLogger] Failed to get slippage samples: {e}")
+            return None
+
     def _map_execution_status(self, status: str) -> str:
         """
         Map executor status to database status.
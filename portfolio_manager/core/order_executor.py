@@ -13,6 +13,8 @@ from enum import Enum
 from typing import Optional, Dict
 
 from core.models import Signal
+from core.latency_metrics import get_latency_metrics, BROKER_CALL_LATENCY
+from core.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -121,6 +123,7 @@ class OrderExecutor(ABC):
 
         return self.openalgo.get_quote(instrument, exchange=exchange)
 
+    @traced('executor.place_order')
     def place_order(
         self,
         instrument: str,
@@ -189,15 +192,17 @@ class OrderExecutor(ABC):
         else:
             exchange = "NFO"  # Bank Nifty and other NSE derivatives
 
-        return self.openalgo.place_order(
-            symbol=actual_symbol,
-            action=action,
-            quantity=quantity,
-            order_type=order_type,
-            price=price,
-            exchange=exchange
-        )
+        with get_latency_metrics().time(BROKER_CALL_LATENCY, call='order_place', instrument=instrument):
+            return self.openalgo.place_order(
+                symbol=actual_symbol,
+                action=action,
+                quantity=quantity,
+                order_type=order_type,
+                price=price,
+                exchange=exchange
+            )
 
+    @traced('executor.get_order_status')
     def get_order_status(self, order_id: str) -> Dict:
         """
         Get order status from broker
@@ -210,6 +215,7 @@ class OrderExecutor(ABC):
         """
         return self.openalgo.get_order_status(order_id)
 
+    @traced('executor.modify_order')
     def modify_order(self, order_id: str, new_price: float,
                      symbol: str = None, action: str = None, exchange: str = None,
                      quantity: int = None, product: str = None) -> Dict:
@@ -244,6 +250,7 @@ class OrderExecutor(ABC):
             logger.warning("modify_order not available, using cancel+reorder fallback")
             return {'status': 'error', 'error': 'modify_order_not_available'}
 
+    @traced('executor.cancel_order')
     def cancel_order(self, order_id: str) -> Dict:
         """
         Cancel order
@@ -475,6 +482,7 @@ class SimpleLimitExecutor(OrderExecutor):
         self.timeout_seconds = timeout_seconds
         self.poll_interval_seconds = poll_interval_seconds
 
+    @traced('executor.simple_limit.execute')
     def execute(
         self,
         signal: Signal,
@@ -712,6 +720,7 @@ class ProgressiveExecutor(OrderExecutor):
                 self.improvement_steps.append(min(last_step + step_size, self.hard_slippage_limit))
                 last_step = self.improvement_steps[-1]
 
+    @traced('executor.progressive.execute')
     def execute(
         self,
         signal: Signal,
@@ -1309,6 +1318,7 @@ class SyntheticFuturesExecutor:
 
         logger.info("[SyntheticFuturesExecutor] Initialized with rollback protection")
 
+    @traced('synthetic.execute_entry')
     def execute_entry(
         self,
         instrument: str,
@@ -1374,7 +1384,8 @@ class SyntheticFuturesExecutor:
             ce_leg=ce_leg,
             quantity=quantity,
             lots=lots,
-            current_price=current_price
+            current_price=current_price,
+            instrument=instrument
         )
 
         # Store the ATM strike used for synthetic price calculation
@@ -1392,6 +1403,7 @@ class SyntheticFuturesExecutor:
 
         return result
 
+    @traced('synthetic.execute_exit')
     def execute_exit(
         self,
         instrument: str,
@@ -1486,7 +1498,8 @@ class SyntheticFuturesExecutor:
             ce_leg=ce_leg,
             quantity=quantity,
             lots=lots,
-            current_price=current_price
+            current_price=current_price,
+            instrument=instrument
         )
 
         # Store the strike used for synthetic exit price calculation
@@ -1510,7 +1523,8 @@ class SyntheticFuturesExecutor:
         ce_leg,
         quantity: int,
         lots: int,
-        current_price: float
+        current_price: float,
+        instrument: str = "BANK_NIFTY"
     ) -> SyntheticExecutionResult:
         """
         Execute two legs with rollback protection.
@@ -1530,7 +1544,8 @@ class SyntheticFuturesExecutor:
             exchange=pe_leg.exchange,
             action=pe_leg.action,
             quantity=quantity,
-            leg_type="PE"
+            leg_type="PE",
+            instrument=instrument
         )
 
         if not pe_result.success:
@@ -1556,7 +1571,8 @@ class SyntheticFuturesExecutor:
             exchange=ce_leg.exchange,
             action=ce_leg.action,
             quantity=quantity,
-            leg_type="CE"
+            leg_type="CE",
+            instrument=instrument
         )
 
         if not ce_result.success:
@@ -1578,7 +1594,8 @@ class SyntheticFuturesExecutor:
                 exchange=pe_leg.exchange,
                 action=rollback_action,
                 quantity=quantity,
-                leg_type="PE_ROLLBACK"
+                leg_type="PE_ROLLBACK",
+                instrument=instrument
             )
 
             if rollback_result.success:
@@ -1629,13 +1646,15 @@ class SyntheticFuturesExecutor:
             ce_symbol=ce_leg.symbol
         )
 
+    @traced('synthetic.leg')
     def _execute_single_leg(
         self,
         symbol: str,
         exchange: str,
         action: str,
         quantity: int,
-        leg_type: str
+        leg_type: str,
+        instrument: str = "BANK_NIFTY"
     ) -> LegExecutionResult:
         """
         Execute a single leg order with aggressive LIMIT order chasing.
@@ -1655,6 +1674,8 @@ class SyntheticFuturesExecutor:
             action: BUY or SELL
             quantity: Order quantity
             leg_type: "PE", "CE", or "PE_ROLLBACK"
+            instrument: Instrument for metric labels (not the per-strike symbol,
+                which would create unbounded series)
 
         Returns:
             LegExecutionResult
@@ -1683,15 +1704,16 @@ class SyntheticFuturesExecutor:
             )
 
             # Place initial LIMIT order with NRML
-            order_response = self.openalgo.place_order(
-                symbol=symbol,
-                action=action,
-                quantity=quantity,
-                order_type="LIMIT",
-                price=current_price,
-                exchange=exchange,
-                product="NRML"  # NRML for overnight positions
-            )
+            with get_latency_metrics().time(BROKER_CALL_LATENCY, call='order_place', instrument=instrument):
+                order_response = self.openalgo.place_order(
+                    symbol=symbol,
+                    action=action,
+                    quantity=quantity,
+                    order_type="LIMIT",
+                    price=current_price,
+                    exchange=exchange,
+                    product="NRML"  # NRML for overnight positions
+                )
 
             if order_response.get('status') != 'success':
                 return LegExecutionResult(
@@ -0,0 +1,432 @@
+"""
+Partition Maintenance - Monthly partitions, retention and Parquet archival
+
+Keeps the range-partitioned audit tables (migration 016, margin-monitor
+alembic 003) healthy:
+1. Creates partitions ahead of time so inserts never land in the DEFAULT partition
+2. Archives partitions older than their retention window to compressed Parquet
+3. Detaches and drops archived partitions (replaces DELETE-based cleanup)
+
+Partitions are named <table>_pYYYYMM and cover one calendar month.
+Archives are written to <archive_dir>/<table>/<partition>.parquet and are only
+dropped from Postgres after the file is written and its row count verified.
+
+Parquet export requires pyarrow (optional dependency). Without it, partitions
+past retention are left in place and a warning is logged.
+
+With several PM instances, pass leader_check (e.g. the Redis coordinator's
+is_leader) so only the leader runs the background pass; standbys re-check
+leadership every standby_poll_seconds.
+"""
+import json
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from psycopg2 import sql
+
+from core.latency_metrics import get_latency_metrics, BACKGROUND_TASK_LATENCY
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    pq = None
+    PYARROW_AVAILABLE = False
+
+PARTITION_SUFFIX_RE = re.compile(r'_p(\d{4})(\d{2})$')
+
+
+@dataclass
+class PartitionPolicy:
+    """Retention policy for one partitioned table"""
+    table: str                  # May be schema-qualified (margin_monitor.margin_snapshots)
+    retention_days: int
+    archive: bool = True        # Export to Parquet before dropping
+
+
+DEFAULT_POLICIES: List[PartitionPolicy] = [
+    PartitionPolicy('signal_audit', retention_days=90),
+    PartitionPolicy('order_execution_log', retention_days=90),
+    PartitionPolicy('signal_log', retention_days=7),
+    PartitionPolicy('leadership_history', retention_days=365),
+    PartitionPolicy('margin_monitor.margin_snapshots', retention_days=180),
+    PartitionPolicy('margin_monitor.position_snapshots', retention_days=180),
+]
+
+
+def month_start(d: date) -> date:
+    """First day of the month containing d"""
+    return date(d.year, d.month, 1)
+
+
+def add_months(d: date, months: int) -> date:
+    """First day of the month `months` after the month containing d"""
+    index = d.year * 12 + (d.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """Partition name for a table and month, e.g. signal_audit_p202601"""
+    return f"{table}_p{month:%Y%m}"
+
+
+def partition_bounds(name: str) -> Optional[Tuple[date, date]]:
+    """[start, end) month bounds parsed from a partition name, None for DEFAULT etc."""
+    match = PARTITION_SUFFIX_RE.search(name)
+    if not match:
+        return None
+    start = date(int(match.group(1)), int(match.group(2)), 1)
+    return start, add_months(start, 1)
+
+
+def _identifier(qualified_name: str) -> sql.Identifier:
+    """sql.Identifier for a possibly schema-qualified name"""
+    return sql.Identifier(*qualified_name.split('.'))
+
+
+class PartitionMaintenance:
+    """
+    Creates future partitions and archives/drops expired ones
+
+    Usage:
+        maintenance = PartitionMaintenance(db_manager, archive_dir='archive/partitions')
+        results = maintenance.run()                 # one pass
+        maintenance.start_background_maintenance()  # daily
+    """
+
+    def __init__(
+        self,
+        db_manager,
+        archive_dir: str = 'archive/partitions',
+        months_ahead: int = 3,
+        policies: Optional[List[PartitionPolicy]] = None,
+        interval_hours: float = 24.0,
+        fetch_size: int = 10000,
+        leader_check: Optional[Callable[[], bool]] = None,
+        standby_poll_seconds: float = 60.0
+    ):
+        """
+        Initialize maintenance job
+
+        Args:
+            db_manager: DatabaseStateManager (uses transaction()/get_connection())
+            archive_dir: Root directory for Parquet archives
+            months_ahead: Months of future partitions to keep created
+            policies: Per-table retention (defaults to DEFAULT_POLICIES)
+            interval_hours: Interval for background maintenance
+            fetch_size: Rows per server-side cursor fetch during archival
+            leader_check: Returns True when this instance may run background
+                          maintenance (None = always, single instance)
+            standby_poll_seconds: Leadership re-check interval while not leader
+        """
+        self.db = db_manager
+        self.archive_dir = archive_dir
+        self.months_ahead = months_ahead
+        self.policies = policies if policies is not None else DEFAULT_POLICIES
+        self.interval_seconds = interval_hours * 3600
+        self.fetch_size = fetch_size
+        self.leader_check = leader_check
+        self.standby_poll_seconds = standby_poll_seconds
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Background scheduling
+    # ------------------------------------------------------------------
+
+    def start_background_maintenance(self):
+        """Run maintenance now and then every interval_hours"""
+        if self._thread and self._thread.is_alive():
+            logger.warning("[PARTITION] Background maintenance already running")
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._maintenance_loop, daemon=True)
+        self._thread.start()
+        logger.info(f"[PARTITION] Background maintenance started (every {self.interval_seconds / 3600:.0f}h)")
+
+    def stop_background_maintenance(self):
+        """Stop background maintenance thread"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=10.0)
+        logger.info("[PARTITION] Background maintenance stopped")
+
+    def _is_leader(self) -> bool:
+        if self.leader_check is None:
+            return True
+        try:
+            return bool(self.leader_check())
+        except Exception as e:
+            logger.warning(f"[PARTITION] Leadership check failed, skipping run: {e}")
+            return False
+
+    def _maintenance_loop(self):
+        while not self._stop_event.is_set():
+            if not self._is_leader():
+                # Standby: another instance owns maintenance; re-check soon
+                if self._stop_event.wait(timeout=self.standby_poll_seconds):
+                    break
+                continue
+            try:
+                with get_latency_metrics().time(BACKGROUND_TASK_LATENCY, task='partition_maintenance'):
+                    self.run()
+            except Exception as e:
+                logger.error(f"[PARTITION] Maintenance run failed: {e}")
+            if self._stop_event.wait(timeout=self.interval_seconds):
+                break
+
+    # ------------------------------------------------------------------
+    # Maintenance pass
+    # ------------------------------------------------------------------
+
+    def run(self, today: Optional[date] = None, dry_run: bool = False) -> List[Dict]:
+        """
+        One maintenance pass over all policies
+
+        Args:
+            today: Reference date (defaults to today)
+            dry_run: Report what would be created/archived without changing anything
+
+        Returns:
+            Per-table result dicts: {table, created, archived, dropped, skipped}
+        """
+        today = today or date.today()
+        results = []
+
+        for policy in self.policies:
+            result = {'table': policy.table, 'created': [], 'archived': [], 'dropped': [], 'skipped': None}
+            try:
+                if not self.is_partitioned(policy.table):
+                    result['skipped'] = 'not partitioned'
+                    results.append(result)
+                    continue
+
+                result['created'] = self.ensure_future_partitions(policy.table, today, dry_run=dry_run)
+
+                cutoff = today - timedelta(days=policy.retention_days)
+                for name in self.expired_partitions(policy.table, cutoff):
+                    if dry_run:
+                        result['dropped'].append(name)
+                        continue
+                    if policy.archive:
+                        if not PYARROW_AVAILABLE:
+                            result['skipped'] = 'pyarrow not installed - expired partitions kept'
+                            logger.warning(f"[PARTITION] {result['skipped']} ({policy.table})")
+                            break
+                        path = self.archive_partition(name)
+                        result['archived'].append(path)
+                    self.drop_partition(policy.table, name)
+                    result['dropped'].append(name)
+            except Exception as e:
+                result['skipped'] = f"error: {e}"
+                logger.error(f"[PARTITION] Maintenance failed for {policy.table}: {e}")
+
+            if result['created'] or result['dropped']:
+                logger.info(
+                    f"[PARTITION] {policy.table}: created={len(result['created'])} "
+                    f"archived={len(result['archived'])} dropped={len(result['dropped'])}"
+                    f"{' (dry run)' if dry_run else ''}"
+                )
+            results.append(result)
+
+        return results
+
+    def is_partitioned(self, table: str) -> bool:
+        """True if table exists and is range-partitioned"""
+        with self.db.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT 1 FROM pg_partitioned_table
+                    WHERE partrelid = to_regclass(%s)
+                """, (table,))
+                return cur.fetchone() is not None
+
+    def list_partitions(self, table: str) -> List[str]:
+        """Names of attached partitions (schema-qualified if the parent is)"""
+        with self.db.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT c.relname
+                    FROM pg_inherits i
+                    JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = to_regclass(%s)
+                    ORDER BY c.relname
+                """, (table,))
+                schema = table.rsplit('.', 1)[0] + '.' if '.' in table else ''
+                return [schema + row[0] for row in cur.fetchall()]
+
+    def ensure_future_partitions(self, table: str, today: date, dry_run: bool = False) -> List[str]:
+        """Create partitions from the current month through months_ahead; returns names created"""
+        existing = set(self.list_partitions(table))
+        wanted = [add_months(month_start(today), i) for i in range(self.months_ahead + 1)]
+        created = []
+
+        for month in wanted:
+            name = partition_name(table, month)
+            if name in existing:
+                continue
+            created.append(name)
+            if dry_run:
+                continue
+            with self.db.transaction() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        sql.SQL("CREATE TABLE IF NOT EXISTS {} PARTITION OF {} FOR VALUES FROM (%s) TO (%s)").format(
+                            _identifier(name), _identifier(table)
+                        ),
+                        (month, add_months(month, 1))
+                    )
+        return created
+
+    def expired_partitions(self, table: str, cutoff: date) -> List[str]:
+        """Monthly partitions whose whole range is before cutoff, oldest first"""
+        expired = []
+        for name in self.list_partitions(table):
+            bounds = partition_bounds(name)
+            if bounds and bounds[1] <= cutoff:
+                expired.append((bounds[0], name))
+        return [name for _, name in sorted(expired)]
+
+    def archive_partition(self, partition: str) -> str:
+        """
+        Export a partition to zstd-compressed Parquet
+
+        Rows are streamed through a server-side cursor and written one row
+        group per fetch. The file is written under a temporary name and
+        renamed once complete.
+
+        Returns:
+            Path of the Parquet file
+        """
+        parent_dir = os.path.join(self.archive_dir, partition.rsplit('_p', 1)[0])
+        os.makedirs(parent_dir, exist_ok=True)
+        path = os.path.join(parent_dir, f"{partition}.parquet")
+        tmp_path = path + '.tmp'
+
+        rows_written = 0
+        writer = None
+        try:
+            with self.db.get_connection() as conn:
+                with conn.cursor(name=f"archive_{partition.replace('.', '_')}") as cur:
+                    cur.itersize = self.fetch_size
+                    cur.execute(sql.SQL("SELECT * FROM {}").format(_identifier(partition)))
+                    while True:
+                        rows = cur.fetchmany(self.fetch_size)
+                        if not rows:
+                            break
+                        if writer is None:
+                            schema = _arrow_schema(cur.description)
+                            writer = pq.ParquetWriter(tmp_path, schema, compression='zstd')
+                        writer.write_table(_to_arrow_table(schema, rows))
+                        rows_written += len(rows)
+                conn.rollback()  # end the read transaction held by the named cursor
+
+            if writer is None:
+                # Empty partition - still leave a marker so the archive is complete
+                pq.write_table(pa.table({}), tmp_path, compression='zstd')
+            else:
+                writer.close()
+                writer = None
+
+            archived_rows = pq.ParquetFile(tmp_path).metadata.num_rows
+            if archived_rows != rows_written:
+                raise IOError(f"Archive row count mismatch for {partition}: {archived_rows} != {rows_written}")
+
+            os.replace(tmp_path, path)
+        finally:
+            if writer is not None:
+                writer.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        logger.info(f"[PARTITION] Archived {partition}: {rows_written} rows -> {path}")
+        return path
+
+    def drop_partition(self, table: str, partition: str):
+        """Detach and drop a partition"""
+        with self.db.transaction() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql.SQL("ALTER TABLE {} DETACH PARTITION {}").format(
+                    _identifier(table), _identifier(partition)
+                ))
+                cur.execute(sql.SQL("DROP TABLE {}").format(_identifier(partition)))
+        logger.info(f"[PARTITION] Dropped {partition}")
+
+
+# Postgres type OID -> Arrow type (anything else is archived as text)
+_PG_NUMERIC_OID = 1700
+_ARROW_DECIMAL_MAX_PRECISION = 38
+
+_PG_ARROW_TYPES = {
+    16: 'bool',
+    20: 'int64', 21: 'int64', 23: 'int64',
+    700: 'float64', 701: 'float64',
+    1082: 'date32',
+    1114: 'timestamp',
+    1184: 'timestamptz',
+}
+
+
+def _arrow_schema(description) -> 'pa.Schema':
+    """Arrow schema from a psycopg2 cursor description"""
+    fields = []
+    for column in description:
+        if column.type_code == _PG_NUMERIC_OID:
+            # NUMERIC(p, s) stays exact; unconstrained NUMERIC is kept as text
+            precision, scale = getattr(column, 'precision', None), getattr(column, 'scale', None)
+            if precision and precision <= _ARROW_DECIMAL_MAX_PRECISION and scale is not None:
+                fields.append(pa.field(column.name, pa.decimal128(precision, scale)))
+            else:
+                fields.append(pa.field(column.name, pa.string()))
+            continue
+        kind = _PG_ARROW_TYPES.get(column.type_code, 'string')
+        if kind == 'timestamp':
+            arrow_type = pa.timestamp('us')
+        elif kind == 'timestamptz':
+            arrow_type = pa.timestamp('us', tz='UTC')
+        else:
+            arrow_type = getattr(pa, kind)()
+        fields.append(pa.field(column.name, arrow_type))
+    return pa.schema(fields)
+
+
+def _to_arrow_table(schema: 'pa.Schema', rows: List[tuple]) -> 'pa.Table':
+    """Column-wise conversion of fetched rows (JSONB and other types stored as text)"""
+    arrays = []
+    for i, field in enumerate(schema):
+        values = [row[i] for row in rows]
+        if pa.types.is_string(field.type):
+            values = [v if v is None or isinstance(v, str) else
+                      json.dumps(v, default=str) if isinstance(v, (dict, list)) else str(v)
+                      for v in values]
+        elif pa.types.is_floating(field.type):
+            values = [None if v is None else float(v) for v in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+# Global instance
+_partition_maintenance: Optional[PartitionMaintenance] = None
+
+
+def init_partition_maintenance(db_manager, **kwargs) -> PartitionMaintenance:
+    """Initialize global PartitionMaintenance instance"""
+    global _partition_maintenance
+    _partition_maintenance = PartitionMaintenance(db_manager, **kwargs)
+    return _partition_maintenance
+
+
+def get_partition_maintenance() -> Optional[PartitionMaintenance]:
+    """Get global PartitionMaintenance instance"""
+    return _partition_maintenance
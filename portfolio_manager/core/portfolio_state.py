@@ -53,6 +53,9 @@ class PortfolioStateManager:
         # Current state
         self.positions: Dict[str, Position] = {}
 
+        # Optional RiskEngine, notified on position changes (VaR gate)
+        self.risk_engine = None
+
         logger.info(f"Portfolio initialized: Capital=₹{initial_capital:,.0f}, Closed Equity=₹{self.closed_equity:,.0f}, Equity High=₹{self.equity_high:,.0f}")
 
     def get_current_state(self, current_time: datetime = None) -> PortfolioState:
@@ -252,6 +255,9 @@ class PortfolioStateManager:
             self.db_manager.save_portfolio_state(state, self.initial_capital, self.equity_high)
             logger.debug(f"Portfolio state saved after position add")
 
+        if self.risk_engine is not None:
+            self.risk_engine.on_positions_changed(self)
+
     def close_position(self, position_id: str, exit_price: float, exit_time: datetime) -> float:
         """
         Close position and update closed equity
@@ -327,6 +333,9 @@ class PortfolioStateManager:
         logger.info(f"Position closed: {position_id}, P&L=₹{pnl:,.0f}, "
                    f"New closed equity=₹{self.closed_equity:,.0f}")
 
+        if self.risk_engine is not None:
+            self.risk_engine.on_positions_changed(self)
+
         return pnl
 
     def update_position_unrealized_pnl(self, position_id: str, current_price: float):
@@ -353,7 +362,10 @@ class PortfolioStateManager:
     def check_portfolio_gate(
         self,
         new_position_risk: float,
-        new_position_vol: float
+        new_position_vol: float,
+        instrument: Optional[str] = None,
+        new_lots: float = 0,
+        price: Optional[float] = None
     ) -> Tuple[bool, str]:
         """
         Check if new position would exceed portfolio limits
@@ -361,6 +373,9 @@ class PortfolioStateManager:
         Args:
             new_position_risk: Risk of proposed position in Rs
             new_position_vol: Volatility of proposed position in Rs
+            instrument: Instrument of the proposed position (for the VaR gate)
+            new_lots: Lots of the proposed position (for the VaR gate)
+            price: Entry price of the proposed position (for the VaR gate)
 
         Returns:
             (allowed, reason)
@@ -385,5 +400,42 @@ class PortfolioStateManager:
             logger.warning(f"Portfolio gate BLOCKED: {reason}")
             return False, reason
 
+        if instrument is not None:
+            var_allowed, var_reason = self.check_var_gate(instrument, new_lots, price, state.equity)
+            if not var_allowed:
+                logger.warning(f"Portfolio gate BLOCKED: {var_reason}")
+                return False, var_reason
+
         logger.debug(f"Portfolio gate OPEN: Risk={projected_risk_pct:.1f}%, Vol={projected_vol_pct:.1f}%")
         return True, "Portfolio gates passed"
+
+    def check_var_gate(
+        self,
+        instrument: str,
+        new_lots: float,
+        price: Optional[float] = None,
+        equity: Optional[float] = None
+    ) -> Tuple[bool, str]:
+        """
+        Correlation-aware gate: projected portfolio VaR with the new lots.
+
+        Passes when no risk engine is attached, the gate is disabled
+        (max_portfolio_var_percent is None) or there is not enough history.
+
+        Returns:
+            (allowed, reason)
+        """
+        limit = getattr(self.config, 'max_portfolio_var_percent', None)
+        if self.risk_engine is None or limit is None:
+            return True, "VaR gate disabled"
+
+        projected_var = self.risk_engine.projected_var(instrument, new_lots, price)
+        if projected_var is None:
+            return True, "VaR gate skipped (insufficient history)"
+
+        if equity is None:
+            equity = self.get_current_state().equity
+        projected_var_pct = (projected_var / equity * 100) if equity > 0 else 0
+        if projected_var_pct > limit:
+            return False, f"Portfolio VaR would be {projected_var_pct:.1f}% (limit: {limit}%)"
+        return True, f"Portfolio VaR {projected_var_pct:.1f}%"
@@ -18,6 +18,7 @@ but NOT used in base entry sizing to match Pine Script behavior.
 import logging
 import math
 from typing import Tuple
+from core.tracing import traced
 from core.models import (
     Signal, InstrumentConfig, TomBassoConstraints,
     SignalType, InstrumentType
@@ -42,6 +43,7 @@ class TomBassoPositionSizer:
         self.margin_per_lot = instrument_config.margin_per_lot
         self.test_mode = test_mode
 
+    @traced('sizer.calculate_base_entry_size')
     def calculate_base_entry_size(
         self,
         signal: Signal,
@@ -127,6 +129,7 @@ class TomBassoPositionSizer:
             limiter=limiter
         )
 
+    @traced('sizer.calculate_pyramid_size')
     def calculate_pyramid_size(
         self,
         signal: Signal,
@@ -211,6 +214,7 @@ class TomBassoPositionSizer:
             limiter=limiter
         )
 
+    @traced('sizer.calculate_peel_off_size')
     def calculate_peel_off_size(
         self,
         position_risk: float,
@@ -170,6 +170,13 @@ class PyramidGateController:
         if projected_vol_pct > self.config.pyramid_vol_block:
             return False, f"Portfolio vol would be {projected_vol_pct:.1f}% (block at {self.config.pyramid_vol_block}%)"
 
+        # Correlation-aware VaR (no-op unless a risk engine and limit are configured)
+        var_allowed, var_reason = self.portfolio.check_var_gate(
+            signal.instrument, estimated_lots, signal.price, state.equity
+        )
+        if not var_allowed:
+            return False, var_reason
+
         return True, "Portfolio gate passed"
 
     def _check_profit_gate(self, instrument: str, current_price: float, point_value: float) -> tuple:
@@ -10,6 +10,10 @@ Key Features:
 - Retry logic with exponential backoff
 - Fallback mode support (preparation for database-only mode)
 - Health checking via ping()
+- Fast-failover mode (redis_config 'fast_failover': true): followers wake on
+  lease release/expiry notifications instead of polling, every lease carries
+  a monotonically increasing fencing token, and DB heartbeat / split-brain
+  work runs on its own coarser thread
 """
 import redis
 from redis.connection import ConnectionPool
@@ -17,12 +21,15 @@ import uuid
 import time
 import logging
 import os
+import queue
 import threading
 import socket
 from typing import Optional
 from datetime import datetime, timedelta
 from collections import deque
 
+from core.latency_metrics import get_latency_metrics, COORDINATOR_DB_SYNC_LATENCY
+
 logger = logging.getLogger(__name__)
 
 
@@ -68,6 +75,12 @@ class CoordinatorMetrics:
          - p95: 95th percentile - 95% of samples are below this value (outlier threshold)
          - p99: 99th percentile - 99% of samples are below this value (extreme outliers)
     
+    **Prometheus Export:**
+    Every sample is also observed into the fixed-bucket
+    pm_coordinator_db_sync_latency_ms histogram in the latency registry, so
+    GET /metrics never copies or sorts the window; get_stats() is for the
+    JSON status endpoints.
+    
     **Thread Safety:**
     All operations are protected by `_lock` to ensure thread-safe updates and reads
     in a multi-threaded environment (heartbeat loop, signal processing, etc.).
@@ -89,6 +102,7 @@ class CoordinatorMetrics:
         self.last_heartbeat_time: Optional[datetime] = None
         self._lock = threading.Lock()  # Thread-safe metrics updates
         self._leadership_change_times = deque(maxlen=100)  # Track timestamps of leadership changes
+        self.db_sync_histogram = get_latency_metrics().histogram(COORDINATOR_DB_SYNC_LATENCY)
     
     def record_db_sync(self, success: bool, latency_ms: float):
         """
@@ -109,6 +123,7 @@ class CoordinatorMetrics:
                 self.db_sync_failure_count += 1
             # Always record latency (even for failures) to track performance
             self.db_sync_latency_ms.append(latency_ms)
+        self.db_sync_histogram.observe(latency_ms)
     
     def record_leadership_change(self):
         """Record a leadership transition"""
@@ -121,6 +136,19 @@ class CoordinatorMetrics:
         with self._lock:
             self.last_heartbeat_time = datetime.now()
     
+    def get_counts(self) -> dict:
+        """
+        Get sync and leadership counters without computing latency statistics
+        
+        Used by GET /metrics on every scrape; latency comes from the histogram.
+        """
+        with self._lock:
+            return {
+                'db_sync_success': self.db_sync_success_count,
+                'db_sync_failure': self.db_sync_failure_count,
+                'leadership_changes': self.leadership_changes,
+            }
+    
     def _calculate_percentile(self, sorted_samples: list, percentile: float) -> float:
         """
         Calculate percentile value from sorted sample array
@@ -393,6 +421,15 @@ class RedisCoordinator:
     RENEWAL_INTERVAL_RATIO = 0.5  # Renew at TTL/2 (e.g., 5s for 10s TTL)
     ELECTION_INTERVAL = 2.5  # Seconds between election attempts when not leader
     
+    # Fast-failover mode
+    FENCING_KEY = "pm:leader:epoch"  # INCR'd on every acquisition -> fencing token
+    LEADER_EVENTS_CHANNEL = "pm:leader:events"  # Release notifications
+    FAST_LEADER_TTL = 3  # Shorter lease: crash failover is bounded by the TTL
+    FAST_ELECTION_INTERVAL = 1.0  # Backstop poll if a notification is missed
+    DB_HEARTBEAT_INTERVAL = 15.0  # Seconds between async DB heartbeat writes
+    SPLIT_BRAIN_CHECK_EVERY = 4  # DB heartbeats between split-brain checks (~60s)
+    LEASE_DRIFT_RATIO = 0.1  # Local lease ends this fraction of TTL before Redis expiry
+    
     def __init__(self, redis_config: dict, fallback_mode: bool = False, db_manager=None):
         """
         Initialize Redis coordinator with connection pooling
@@ -426,6 +463,21 @@ class RedisCoordinator:
         self._heartbeat_stop_event = threading.Event()
         self._heartbeat_iteration = 0  # Counter for periodic split-brain checks
         
+        # Fast-failover state
+        self.fast_failover = bool(redis_config.get('fast_failover', False)) and not fallback_mode
+        self._fencing_token: Optional[int] = None
+        self._lease_deadline = 0.0  # time.monotonic() after which our lease may have expired
+        self._election_wakeup = threading.Event()
+        self._lease_watch_thread: Optional[threading.Thread] = None
+        self._db_heartbeat_thread: Optional[threading.Thread] = None
+        self._db_queue: "queue.Queue[Optional[bool]]" = queue.Queue()
+        self._leadership_listeners = []
+        self.lease_notifications = 0
+        if self.fast_failover:
+            self.LEADER_TTL = redis_config.get('leader_ttl', self.FAST_LEADER_TTL)
+            self.ELECTION_INTERVAL = redis_config.get('election_interval', self.FAST_ELECTION_INTERVAL)
+            self.DB_HEARTBEAT_INTERVAL = redis_config.get('db_heartbeat_interval', self.DB_HEARTBEAT_INTERVAL)
+        
         # Metrics tracking
         self.metrics = CoordinatorMetrics()
         
@@ -673,7 +725,8 @@ class RedisCoordinator:
         """
         Thread-safe setter for leader status
         
-        Also syncs to PostgreSQL if db_manager is available and state changed.
+        Also syncs to PostgreSQL if db_manager is available and state changed,
+        then notifies leadership listeners.
         
         Args:
             value: New leader status
@@ -681,19 +734,54 @@ class RedisCoordinator:
         with self._is_leader_lock:
             old_value = self._is_leader
             self._is_leader = value
+            changed = old_value != value
             
             # Sync to database if state changed
-            if old_value != value:
+            if changed:
                 # Record leadership change in metrics
                 self.metrics.record_leadership_change()
-                self._sync_leader_status_to_db()
-                # Record in leadership history for audit trail
-                if self.db_manager:
-                    reason = 'election' if value else 'graceful_shutdown'  # Default reasons
-                    self.db_manager.record_leadership_transition(
-                        self.instance_id, value, reason, self._get_hostname_safe()
-                    )
+                if not value:
+                    self._fencing_token = None
+                    self._lease_deadline = 0.0
+                if self.fast_failover:
+                    # Off the failover path: the DB thread writes it
+                    self._db_queue.put(value)
+                else:
+                    self._sync_leader_status_to_db()
+                    # Record in leadership history for audit trail
+                    if self.db_manager:
+                        reason = 'election' if value else 'graceful_shutdown'  # Default reasons
+                        self.db_manager.record_leadership_transition(
+                            self.instance_id, value, reason, self._get_hostname_safe()
+                        )
+        
+        if changed:
+            for listener in list(self._leadership_listeners):
+                try:
+                    listener(value)
+                except Exception as e:
+                    logger.error(f"[{self.instance_id}] Leadership listener failed: {e}", exc_info=True)
     
+    def add_leadership_listener(self, callback):
+        """
+        Register callback(is_leader: bool) for leadership transitions
+        
+        Called on the thread that changed leadership (usually the heartbeat
+        thread) - callbacks must return quickly.
+        """
+        self._leadership_listeners.append(callback)
+
+    def attach_db_manager(self, db_manager):
+        """
+        Attach the DatabaseStateManager after construction
+
+        Used when Redis and PostgreSQL are connected concurrently at startup;
+        registers this instance in instance_metadata like __init__ would have.
+        """
+        self.db_manager = db_manager
+        if db_manager and self.redis_client is not None:
+            self._sync_leader_status_to_db()
+
     def _sync_leader_status_to_db(self):
         """
         Sync current leader status to PostgreSQL instance_metadata table
@@ -775,6 +863,9 @@ class RedisCoordinator:
         if self.fallback_mode or self.redis_client is None:
             return False
         
+        if self.fast_failover:
+            return self._elect_leader_fenced()
+        
         try:
             # Try to set leader key with our instance ID
             # SET key value NX EX seconds - atomic SETNX with expiration
@@ -809,6 +900,80 @@ class RedisCoordinator:
             logger.error(f"Redis error in leader election: {e}")
             return False
     
+    def _elect_leader_fenced(self) -> bool:
+        """
+        Fast-failover election: acquire the lease and take the next fencing
+        token in one atomic script
+        
+        Returns:
+            True if this instance became leader or is already leader, False otherwise
+        """
+        lua_script = """
+        if redis.call("set", KEYS[1], ARGV[1], "NX", "EX", ARGV[2]) then
+            return redis.call("incr", KEYS[2])
+        end
+        return 0
+        """
+        try:
+            started = time.monotonic()
+            token = self.redis_client.eval(
+                lua_script,
+                2,  # Number of keys
+                self.LEADER_KEY,  # KEYS[1]
+                self.FENCING_KEY,  # KEYS[2]
+                self.instance_id,  # ARGV[1]
+                self.LEADER_TTL  # ARGV[2]
+            )
+            if token:
+                with self._is_leader_lock:
+                    self._fencing_token = int(token)
+                    self._lease_deadline = started + self.LEADER_TTL * (1 - self.LEASE_DRIFT_RATIO)
+                self.is_leader = True
+                logger.error(
+                    f"🚨 [{self.instance_id}] BECAME LEADER (fencing token {token}) - Now processing signals"
+                )
+                return True
+            
+            if self.is_leader:
+                return self.renew_leadership()
+            return False
+        
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            logger.warning(f"Redis connection error in leader election: {e}")
+            return False
+        except redis.RedisError as e:
+            logger.error(f"Redis error in leader election: {e}")
+            return False
+    
+    @property
+    def fencing_token(self) -> Optional[int]:
+        """Fencing token of the current lease (None if not leader or not in fast-failover mode)"""
+        with self._is_leader_lock:
+            return self._fencing_token
+    
+    def fence_violation(self, token: Optional[int] = None) -> Optional[str]:
+        """
+        Check whether this instance may still place orders
+        
+        Purely local: a deposed leader is caught by the lease deadline even
+        before its next renewal notices the loss.
+        
+        Args:
+            token: Fencing token captured when the work started (None = current lease)
+        
+        Returns:
+            None if allowed, otherwise the reason for rejection
+        """
+        with self._is_leader_lock:
+            if not self._is_leader:
+                return 'not_leader'
+            if self.fast_failover:
+                if time.monotonic() >= self._lease_deadline:
+                    return 'lease_expired'
+                if token is not None and token != self._fencing_token:
+                    return f'stale_fencing_token {token} (current {self._fencing_token})'
+        return None
+    
     def try_become_leader(self) -> bool:
         """
         Attempt to become leader using atomic SETNX with TTL
@@ -840,6 +1005,7 @@ class RedisCoordinator:
             return False
         
         try:
+            started = time.monotonic()
             # Lua script for atomic renewal: only renew if we're still the leader
             lua_script = """
             if redis.call("get", KEYS[1]) == ARGV[1] then
@@ -860,6 +1026,8 @@ class RedisCoordinator:
             # Lua script returns 1 (truthy) on success, 0 (falsy) on failure
             # Check explicitly for 1 or True to handle edge cases
             if renewed == 1 or renewed is True:
+                with self._is_leader_lock:
+                    self._lease_deadline = started + self.LEADER_TTL * (1 - self.LEASE_DRIFT_RATIO)
                 return True
             else:
                 self.is_leader = False
@@ -989,6 +1157,9 @@ class RedisCoordinator:
             if released == 1 or released is True:
                 self.is_leader = False
                 logger.error(f"🚨 [{self.instance_id}] Released leadership gracefully")
+                if self.fast_failover:
+                    # Wake followers now instead of at their next election poll
+                    self.redis_client.publish(self.LEADER_EVENTS_CHANNEL, f"released:{self.instance_id}")
                 return True
             else:
                 # We're not the leader anymore
@@ -1033,6 +1204,22 @@ class RedisCoordinator:
             daemon=True
         )
         self._heartbeat_thread.start()
+        
+        if self.fast_failover:
+            self._election_wakeup.clear()
+            self._lease_watch_thread = threading.Thread(
+                target=self._lease_watch_loop,
+                name=f"RedisCoordinator-LeaseWatch-{self.instance_id}",
+                daemon=True
+            )
+            self._lease_watch_thread.start()
+            self._db_heartbeat_thread = threading.Thread(
+                target=self._db_heartbeat_loop,
+                name=f"RedisCoordinator-DBHeartbeat-{self.instance_id}",
+                daemon=True
+            )
+            self._db_heartbeat_thread.start()
+        
         logger.info(f"[{self.instance_id}] Heartbeat thread started")
         return True
     
@@ -1054,30 +1241,14 @@ class RedisCoordinator:
                 # Increment heartbeat iteration counter
                 self._heartbeat_iteration += 1
                 
-                # Update heartbeat in database periodically
-                self._update_heartbeat_in_db()
-                
-                # Periodic split-brain detection (every 10 iterations = ~50 seconds)
-                # This prevents excessive DB queries while ensuring timely detection
-                if self._heartbeat_iteration % 10 == 0:
-                    conflict = self.detect_split_brain()
-                    if conflict and conflict.get('conflict'):
-                        logger.error(
-                            f"🚨 SPLIT-BRAIN DETECTED: Redis={conflict.get('redis_leader')}, "
-                            f"DB={conflict.get('db_leader')}"
-                        )
-                        
-                        # If database says someone else is leader, self-demote immediately
-                        # This prevents duplicate signal processing (CRITICAL for trading)
-                        if conflict.get('db_leader') and conflict.get('db_leader') != self.instance_id:
-                            logger.critical(
-                                f"🚨 [{self.instance_id}] Self-demoting due to split-brain. "
-                                f"DB reports {conflict.get('db_leader')} as leader"
-                            )
-                            # Release Redis lock first (this will set is_leader = False internally)
-                            self.release_leadership()
-                            # Ensure state is correct (release_leadership sets it, but be explicit)
-                            self.is_leader = False
+                if not self.fast_failover:
+                    # Update heartbeat in database periodically
+                    self._update_heartbeat_in_db()
+                    
+                    # Periodic split-brain detection (every 10 iterations = ~50 seconds)
+                    # This prevents excessive DB queries while ensuring timely detection
+                    if self._heartbeat_iteration % 10 == 0:
+                        self._check_split_brain()
                 
                 if self.is_leader:
                     # We're the leader - renew the lease
@@ -1094,7 +1265,13 @@ class RedisCoordinator:
                         logger.error(f"🚨 [{self.instance_id}] Acquired leadership via heartbeat - Now processing signals")
                     
                     # Wait for election interval or stop event
-                    if self._heartbeat_stop_event.wait(timeout=election_interval):
+                    if self.fast_failover:
+                        # Lease notifications cut the wait short
+                        self._election_wakeup.wait(timeout=election_interval)
+                        self._election_wakeup.clear()
+                        if self._heartbeat_stop_event.is_set():
+                            break
+                    elif self._heartbeat_stop_event.wait(timeout=election_interval):
                         break  # Stop event was set
                         
             except (redis.ConnectionError, redis.TimeoutError) as e:
@@ -1115,6 +1292,140 @@ class RedisCoordinator:
         
         logger.info(f"[{self.instance_id}] Heartbeat loop stopped")
     
+    def _check_split_brain(self):
+        """Run split-brain detection and self-demote if the DB names another leader"""
+        conflict = self.detect_split_brain()
+        if conflict and conflict.get('conflict'):
+            logger.error(
+                f"🚨 SPLIT-BRAIN DETECTED: Redis={conflict.get('redis_leader')}, "
+                f"DB={conflict.get('db_leader')}"
+            )
+            
+            # If database says someone else is leader, self-demote immediately
+            # This prevents duplicate signal processing (CRITICAL for trading)
+            if conflict.get('db_leader') and conflict.get('db_leader') != self.instance_id:
+                logger.critical(
+                    f"🚨 [{self.instance_id}] Self-demoting due to split-brain. "
+                    f"DB reports {conflict.get('db_leader')} as leader"
+                )
+                # Release Redis lock first (this will set is_leader = False internally)
+                self.release_leadership()
+                # Ensure state is correct (release_leadership sets it, but be explicit)
+                self.is_leader = False
+    
+    def _enable_expiry_notifications(self):
+        """
+        Add expired/generic keyspace events to notify-keyspace-events (best effort)
+        
+        Managed Redis often forbids CONFIG SET; followers then rely on release
+        notifications and the election backstop poll.
+        """
+        try:
+            current = self.redis_client.config_get('notify-keyspace-events').get('notify-keyspace-events', '')
+            flags = set(current)
+            wanted = {'E', 'x', 'g'}
+            if not wanted <= flags:
+                self.redis_client.config_set('notify-keyspace-events', ''.join(sorted(flags | wanted)))
+            return True
+        except redis.RedisError as e:
+            logger.warning(f"[{self.instance_id}] Keyspace notifications unavailable ({e}); using release events + polling")
+            return False
+    
+    def _is_lease_event(self, message: Optional[dict]) -> bool:
+        """True if a pub/sub message means the leader lease is gone"""
+        if not message or message.get('type') not in ('message', 'pmessage'):
+            return False
+        if message.get('channel') == self.LEADER_EVENTS_CHANNEL:
+            return True
+        # __keyevent@<db>__:expired / :del carry the key name as data
+        return message.get('data') == self.LEADER_KEY
+    
+    def _lease_watch_loop(self):
+        """
+        Fast-failover: wake the election loop as soon as the lease is released,
+        deleted or expires
+        """
+        pubsub = None
+        try:
+            db = self.redis_client.connection_pool.connection_kwargs.get('db', 0)
+            channels = [self.LEADER_EVENTS_CHANNEL]
+            if self._enable_expiry_notifications():
+                channels += [f'__keyevent@{db}__:expired', f'__keyevent@{db}__:del']
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(*channels)
+            logger.info(f"[{self.instance_id}] Lease watch subscribed: {', '.join(channels)}")
+            
+            while not self._heartbeat_stop_event.is_set():
+                try:
+                    message = pubsub.get_message(timeout=0.5)
+                except (redis.ConnectionError, redis.TimeoutError) as e:
+                    logger.warning(f"[{self.instance_id}] Lease watch connection error: {e}")
+                    if self._heartbeat_stop_event.wait(timeout=1.0):
+                        break
+                    continue
+                if self._is_lease_event(message):
+                    self.lease_notifications += 1
+                    if not self.is_leader:
+                        self._election_wakeup.set()
+        except Exception as e:
+            logger.error(f"[{self.instance_id}] Lease watch stopped: {e}", exc_info=True)
+        finally:
+            if pubsub is not None:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass  # Best effort cleanup
+    
+    def _db_heartbeat_loop(self):
+        """
+        Fast-failover: leadership transitions, heartbeat writes and split-brain
+        checks on a separate thread at DB_HEARTBEAT_INTERVAL
+        """
+        next_heartbeat = time.monotonic()
+        heartbeats = 0
+        while not self._heartbeat_stop_event.is_set():
+            try:
+                value = self._db_queue.get(timeout=max(0.0, next_heartbeat - time.monotonic()))
+                if value is None:
+                    continue
+                self._sync_leader_status_to_db()
+                if self.db_manager:
+                    reason = 'election' if value else 'graceful_shutdown'
+                    self.db_manager.record_leadership_transition(
+                        self.instance_id, value, reason, self._get_hostname_safe()
+                    )
+                continue
+            except queue.Empty:
+                pass
+            except Exception as e:
+                logger.warning(f"[{self.instance_id}] Async leadership sync failed: {e}")
+                continue
+            
+            heartbeats += 1
+            next_heartbeat = time.monotonic() + self.DB_HEARTBEAT_INTERVAL
+            self._update_heartbeat_in_db()
+            if heartbeats % self.SPLIT_BRAIN_CHECK_EVERY == 0:
+                try:
+                    self._check_split_brain()
+                except Exception as e:
+                    logger.error(f"[{self.instance_id}] Split-brain check failed: {e}", exc_info=True)
+    
+    def _drain_db_queue(self):
+        """Write any queued leadership transitions (on shutdown)"""
+        while True:
+            try:
+                value = self._db_queue.get_nowait()
+            except queue.Empty:
+                return
+            if value is None:
+                continue
+            self._sync_leader_status_to_db()
+            if self.db_manager:
+                reason = 'election' if value else 'graceful_shutdown'
+                self.db_manager.record_leadership_transition(
+                    self.instance_id, value, reason, self._get_hostname_safe()
+                )
+    
     def stop_heartbeat(self, timeout: float = 5.0) -> bool:
         """
         Stop the heartbeat thread gracefully
@@ -1132,6 +1443,7 @@ class RedisCoordinator:
         
         # Signal thread to stop
         self._heartbeat_stop_event.set()
+        self._election_wakeup.set()
         
         # Release leadership if we're the leader
         if self.is_leader:
@@ -1139,6 +1451,15 @@ class RedisCoordinator:
         
         # Wait for thread to finish
         self._heartbeat_thread.join(timeout=timeout)
+        if self.fast_failover:
+            self._db_queue.put(None)  # Wake the DB thread
+        for thread in (self._lease_watch_thread, self._db_heartbeat_thread):
+            if thread is not None:
+                thread.join(timeout=timeout)
+        self._lease_watch_thread = None
+        self._db_heartbeat_thread = None
+        if self.fast_failover:
+            self._drain_db_queue()
         
         if self._heartbeat_thread.is_alive():
             logger.warning(f"[{self.instance_id}] Heartbeat thread did not stop within {timeout}s")
@@ -1194,6 +1515,9 @@ class RedisCoordinator:
             'is_leader': self.is_leader,
             'heartbeat_running': self.is_heartbeat_running(),
             'fallback_mode': self.fallback_mode,
+            'fast_failover': self.fast_failover,
+            'fencing_token': self.fencing_token,
+            'lease_notifications': self.lease_notifications,
             'alerts': alerts,  # Include alert status
             'overall_alert_status': alerts.get('overall_status', 'OK')
         })
@@ -0,0 +1,367 @@
+"""
+Scout Time-Series Store - Ring buffers for EOD_MONITOR and MARKET_DATA feeds
+
+Keeps the recent trajectory of every Scout feed per instrument (price, ATR,
+SuperTrend, ER, RSI, ADX, condition bits) together with signal and arrival
+times, so indicator paths, alert arrival jitter and feed gaps can be queried
+after the fact instead of being discarded once processed.
+
+Design:
+- One fixed-capacity ring per (feed, instrument): a column-major float64
+  array with one row per field; append is a single column write and two
+  integer updates, nothing is allocated on the hot path
+- Optional persistence: each ring lives in a memory-mapped file
+  ({store_dir}/{feed}_{instrument}.ring) and is reattached on restart
+- Range queries return oldest-first samples; downsampling keeps the last
+  sample of each time bucket
+- Gap statistics use arrival times (inter-arrival, gaps over a threshold)
+  and signal-to-arrival delay
+"""
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.models import EODMonitorSignal, MarketDataSignal
+
+logger = logging.getLogger(__name__)
+
+FEED_EOD_MONITOR = 'eod_monitor'
+FEED_MARKET_DATA = 'market_data'
+
+# Columns after the two time columns (signal time, arrival time)
+FEED_FIELDS: Dict[str, Tuple[str, ...]] = {
+    FEED_EOD_MONITOR: ('price', 'atr', 'supertrend', 'er', 'rsi', 'adx', 'ema', 'dc_upper', 'conditions'),
+    FEED_MARKET_DATA: ('price', 'atr', 'supertrend'),
+}
+
+# Bit positions of EODConditions flags in the 'conditions' field
+CONDITION_BITS: Tuple[str, ...] = (
+    'rsi_condition', 'ema_condition', 'dc_condition', 'adx_condition', 'er_condition',
+    'st_condition', 'not_doji', 'long_entry', 'long_exit'
+)
+
+DEFAULT_CAPACITY = 20000
+
+_RING_MAGIC = 0x53434f5554524e47  # "SCOUTRNG"
+_HEADER_WORDS = 4                 # magic, capacity, columns, total appended
+_HEADER_BYTES = _HEADER_WORDS * 8
+
+
+def encode_conditions(conditions) -> int:
+    """Pack EODConditions flags into an integer bitmask"""
+    bits = 0
+    for i, name in enumerate(CONDITION_BITS):
+        if getattr(conditions, name, False):
+            bits |= 1 << i
+    return bits
+
+
+def decode_conditions(bits: int) -> Dict[str, bool]:
+    """Unpack a condition bitmask into flag names"""
+    return {name: bool(bits & (1 << i)) for i, name in enumerate(CONDITION_BITS)}
+
+
+class RingSeries:
+    """
+    Fixed-capacity time series for one feed and instrument.
+
+    Row 0 is the signal timestamp, row 1 the arrival time (both epoch
+    seconds), followed by one row per field. Not thread-safe on its own;
+    ScoutTimeSeriesStore serializes access.
+    """
+
+    def __init__(self, fields: Sequence[str], capacity: int = DEFAULT_CAPACITY, path: Optional[str] = None):
+        self.fields: Tuple[str, ...] = tuple(fields)
+        self.columns = len(self.fields) + 2
+        self.path = path
+
+        if path:
+            self._header, self._data = self._open_mmap(path, capacity)
+        else:
+            self._header = np.array([_RING_MAGIC, capacity, self.columns, 0], dtype=np.int64)
+            self._data = np.full((self.columns, capacity), np.nan)
+        self.capacity = int(self._header[1])
+
+    def _open_mmap(self, path: str, capacity: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Attach to an existing ring file or create a new one"""
+        if os.path.exists(path):
+            header = np.memmap(path, dtype=np.int64, mode='r+', shape=(_HEADER_WORDS,))
+            if header[0] == _RING_MAGIC and header[2] == self.columns:
+                data = np.memmap(
+                    path, dtype=np.float64, mode='r+', offset=_HEADER_BYTES,
+                    shape=(self.columns, int(header[1]))
+                )
+                logger.info(f"[SCOUT-STORE] Reattached {path} ({min(int(header[3]), int(header[1]))} samples)")
+                return header, data
+            logger.warning(f"[SCOUT-STORE] Incompatible ring file {path}, recreating")
+            del header
+            os.remove(path)
+
+        with open(path, 'wb') as f:
+            f.truncate(_HEADER_BYTES + self.columns * capacity * 8)
+        header = np.memmap(path, dtype=np.int64, mode='r+', shape=(_HEADER_WORDS,))
+        header[:] = (_RING_MAGIC, capacity, self.columns, 0)
+        data = np.memmap(
+            path, dtype=np.float64, mode='r+', offset=_HEADER_BYTES, shape=(self.columns, capacity)
+        )
+        data[:] = np.nan
+        return header, data
+
+    @property
+    def total(self) -> int:
+        """Samples appended since creation (including overwritten ones)"""
+        return int(self._header[3])
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    def append(self, timestamp: float, received_at: float, values: Sequence[float]):
+        """Append one sample, overwriting the oldest when full"""
+        total = int(self._header[3])
+        column = self._data[:, total % self.capacity]
+        column[0] = timestamp
+        column[1] = received_at
+        column[2:] = values
+        self._header[3] = total + 1
+
+    def snapshot(self) -> np.ndarray:
+        """All retained samples as a (columns, n) array, oldest first"""
+        total = self.total
+        n = min(total, self.capacity)
+        if total <= self.capacity:
+            return np.array(self._data[:, :n])
+        start = total % self.capacity
+        return np.concatenate((self._data[:, start:], self._data[:, :start]), axis=1)
+
+    def flush(self):
+        """Flush a memory-mapped ring to disk"""
+        if isinstance(self._data, np.memmap):
+            self._data.flush()
+            self._header.flush()
+
+
+def _bucket_last(timestamps: np.ndarray, points: int) -> np.ndarray:
+    """Indices of the last sample in each of `points` equal time buckets"""
+    n = len(timestamps)
+    if points <= 0 or n <= points:
+        return np.arange(n)
+    span = timestamps[-1] - timestamps[0]
+    if span <= 0:
+        return np.array([n - 1])
+    buckets = np.minimum(((timestamps - timestamps[0]) / span * points).astype(np.int64), points - 1)
+    # Last index of each non-empty bucket
+    last = np.flatnonzero(np.diff(buckets, append=points))
+    return last
+
+
+class ScoutTimeSeriesStore:
+    """
+    Ring-buffer store for Scout feeds.
+
+    Usage:
+        store = ScoutTimeSeriesStore(store_dir='.scout_store')
+        store.record_market_data(signal)
+
+        series = store.query('market_data', 'GOLD_MINI', start=t0, points=200)
+        stats = store.gap_stats('market_data', 'GOLD_MINI')
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, store_dir: Optional[str] = None):
+        """
+        Initialize store.
+
+        Args:
+            capacity: Samples retained per feed and instrument
+            store_dir: Directory for memory-mapped ring files (None = in memory only)
+        """
+        self.capacity = capacity
+        self.store_dir = store_dir
+        self._series: Dict[Tuple[str, str], RingSeries] = {}
+        self._lock = threading.Lock()
+
+        if store_dir:
+            os.makedirs(store_dir, exist_ok=True)
+            self._reattach()
+
+    def _reattach(self):
+        """Open ring files left by a previous run"""
+        for name in sorted(os.listdir(self.store_dir)):
+            if not name.endswith('.ring'):
+                continue
+            stem = name[:-len('.ring')]
+            for feed in FEED_FIELDS:
+                if stem.startswith(feed + '_'):
+                    self._get_series(feed, stem[len(feed) + 1:])
+                    break
+
+    def _get_series(self, feed: str, instrument: str) -> RingSeries:
+        key = (feed, instrument)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.get(key)
+                if series is None:
+                    path = os.path.join(self.store_dir, f"{feed}_{instrument}.ring") if self.store_dir else None
+                    series = RingSeries(FEED_FIELDS[feed], self.capacity, path)
+                    self._series[key] = series
+        return series
+
+    def _append(self, feed: str, instrument: str, timestamp: float, received_at: Optional[float],
+                values: Sequence[float]):
+        series = self._get_series(feed, instrument)
+        with self._lock:
+            series.append(timestamp, received_at if received_at is not None else time.time(), values)
+
+    def record_eod_monitor(self, signal: EODMonitorSignal, received_at: Optional[float] = None):
+        """Append an EOD_MONITOR signal"""
+        ind = signal.indicators
+        self._append(FEED_EOD_MONITOR, signal.instrument, signal.timestamp.timestamp(), received_at, (
+            signal.price, ind.atr, ind.supertrend, ind.er, ind.rsi, ind.adx, ind.ema, ind.dc_upper,
+            encode_conditions(signal.conditions)
+        ))
+
+    def record_market_data(self, signal: MarketDataSignal, received_at: Optional[float] = None):
+        """Append a MARKET_DATA signal"""
+        self._append(FEED_MARKET_DATA, signal.instrument, signal.timestamp.timestamp(), received_at, (
+            signal.price, signal.atr, signal.supertrend
+        ))
+
+    def _snapshot(self, feed: str, instrument: str) -> Optional[np.ndarray]:
+        if feed not in FEED_FIELDS:
+            raise ValueError(f"Unknown feed: {feed}")
+        series = self._series.get((feed, instrument))
+        if series is None:
+            return None
+        with self._lock:
+            return series.snapshot()
+
+    def query(
+        self,
+        feed: str,
+        instrument: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        fields: Optional[Sequence[str]] = None,
+        points: int = 0
+    ) -> Dict[str, List]:
+        """
+        Range query over signal time.
+
+        Args:
+            feed: 'eod_monitor' or 'market_data'
+            instrument: Instrument name
+            start, end: Inclusive signal-time bounds (epoch seconds, None = open)
+            fields: Fields to return (default all)
+            points: Downsample to at most this many samples (0 = all)
+
+        Returns:
+            Dict of column lists: 'timestamp', 'received_at' and each field
+        """
+        all_fields = FEED_FIELDS.get(feed)
+        if all_fields is None:
+            raise ValueError(f"Unknown feed: {feed}")
+        fields = tuple(fields) if fields else all_fields
+        unknown = [f for f in fields if f not in all_fields]
+        if unknown:
+            raise ValueError(f"Unknown fields for {feed}: {', '.join(unknown)}")
+
+        data = self._snapshot(feed, instrument)
+        if data is None:
+            data = np.empty((len(all_fields) + 2, 0))
+
+        timestamps = data[0]
+        mask = np.ones(len(timestamps), dtype=bool)
+        if start is not None:
+            mask &= timestamps >= start
+        if end is not None:
+            mask &= timestamps <= end
+        data = data[:, mask]
+        data = data[:, _bucket_last(data[0], points)]
+
+        result = {'timestamp': data[0].tolist(), 'received_at': data[1].tolist()}
+        for name in fields:
+            column = data[all_fields.index(name) + 2]
+            result[name] = column.astype(np.int64).tolist() if name == 'conditions' else column.tolist()
+        return result
+
+    def gap_stats(self, feed: str, instrument: str, gap_threshold_seconds: Optional[float] = None) -> Dict:
+        """
+        Arrival gap and delay statistics for a feed.
+
+        Args:
+            feed: 'eod_monitor' or 'market_data'
+            instrument: Instrument name
+            gap_threshold_seconds: Inter-arrival above this counts as a gap
+                (default: 2x the median inter-arrival)
+
+        Returns:
+            Dict with sample count, inter-arrival and signal-to-arrival delay stats
+        """
+        data = self._snapshot(feed, instrument)
+        samples = 0 if data is None else data.shape[1]
+        stats = {'feed': feed, 'instrument': instrument, 'samples': samples}
+        if samples == 0:
+            return stats
+
+        timestamps, received = data[0], data[1]
+        stats['first_received_at'] = float(received[0])
+        stats['last_received_at'] = float(received[-1])
+
+        delay = received - timestamps
+        stats['delay_seconds'] = {
+            'mean': float(delay.mean()),
+            'p50': float(np.percentile(delay, 50)),
+            'p95': float(np.percentile(delay, 95)),
+            'max': float(delay.max()),
+        }
+
+        if samples > 1:
+            intervals = np.diff(received)
+            median = float(np.median(intervals))
+            threshold = gap_threshold_seconds if gap_threshold_seconds is not None else 2 * median
+            gaps = intervals > threshold
+            stats['interval_seconds'] = {
+                'mean': float(intervals.mean()),
+                'p50': median,
+                'p95': float(np.percentile(intervals, 95)),
+                'max': float(intervals.max()),
+                'jitter': float(intervals.std()),
+            }
+            stats['gap_threshold_seconds'] = threshold
+            stats['gaps'] = int(gaps.sum())
+            stats['gap_seconds_total'] = float(intervals[gaps].sum())
+        return stats
+
+    def get_summary(self) -> Dict[str, Dict[str, int]]:
+        """Retained sample count per feed and instrument"""
+        with self._lock:
+            summary: Dict[str, Dict[str, int]] = {}
+            for (feed, instrument), series in self._series.items():
+                summary.setdefault(feed, {})[instrument] = len(series)
+            return summary
+
+    def flush(self):
+        """Flush memory-mapped rings to disk"""
+        with self._lock:
+            for series in self._series.values():
+                series.flush()
+
+
+# Global instance
+_scout_store: Optional[ScoutTimeSeriesStore] = None
+
+
+def init_scout_store(capacity: int = DEFAULT_CAPACITY, store_dir: Optional[str] = None) -> ScoutTimeSeriesStore:
+    """Initialize global ScoutTimeSeriesStore instance"""
+    global _scout_store
+    _scout_store = ScoutTimeSeriesStore(capacity=capacity, store_dir=store_dir)
+    return _scout_store
+
+
+def get_scout_store() -> Optional[ScoutTimeSeriesStore]:
+    """Get global ScoutTimeSeriesStore instance"""
+    return _scout_store
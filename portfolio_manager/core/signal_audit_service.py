@@ -21,11 +21,15 @@ import logging
 import json
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Union
 from enum import Enum
 
 from psycopg2.extras import RealDictCursor
 
+from core.async_db_writer import QUEUED, _Queued
+from core.audit_read_model import get_audit_read_model
+from core.tracing import traced
+
 logger = logging.getLogger(__name__)
 
 
@@ -165,6 +169,18 @@ class SignalAuditRecord:
     processed_by_instance: Optional[str] = None
 
 
+_INSERT_AUDIT_SQL = """
+    INSERT INTO signal_audit (
+        signal_log_id, signal_fingerprint, instrument, signal_type,
+        position, signal_timestamp, received_at, outcome, outcome_reason,
+        validation_result, sizing_calculation, risk_assessment,
+        order_execution, processing_duration_ms, processed_by_instance
+    ) VALUES (
+        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+    )
+"""
+
+
 class SignalAuditService:
     """
     Service for managing signal audit trail.
@@ -189,17 +205,21 @@ class SignalAuditService:
         recent = audit_service.get_recent_signals(limit=10)
     """
 
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, writer=None):
         """
         Initialize with database manager.
 
         Args:
             db_manager: DatabaseStateManager instance with connection pool
+            writer: Optional AsyncDBWriter - when set, inserts/updates are queued
+                    and flushed in the background instead of written inline
         """
         self.db = db_manager
-        logger.info("[AUDIT] SignalAuditService initialized")
+        self.writer = writer
+        logger.info(f"[AUDIT] SignalAuditService initialized (async={writer is not None})")
 
-    def create_audit_record(self, record: SignalAuditRecord) -> Optional[int]:
+    @traced('audit.create_audit_record')
+    def create_audit_record(self, record: SignalAuditRecord) -> Union[int, _Queued, None]:
         """
         Insert a new signal audit record.
 
@@ -207,42 +227,39 @@ class SignalAuditService:
             record: SignalAuditRecord with all relevant data
 
         Returns:
-            Audit record ID if successful, None if failed
+            Audit record ID if successful, QUEUED if the insert was queued on
+            the background writer (ID not known until flushed), None if failed
         """
         try:
+            params = (
+                record.signal_log_id,
+                record.signal_fingerprint,
+                record.instrument,
+                record.signal_type,
+                record.position,
+                record.signal_timestamp,
+                record.received_at,
+                record.outcome.value,
+                record.outcome_reason,
+                json.dumps(record.validation_result.to_dict()) if record.validation_result else None,
+                json.dumps(record.sizing_calculation.to_dict()) if record.sizing_calculation else None,
+                json.dumps(record.risk_assessment.to_dict()) if record.risk_assessment else None,
+                json.dumps(record.order_execution.to_dict()) if record.order_execution else None,
+                record.processing_duration_ms,
+                record.processed_by_instance
+            )
+
+            if self.writer and self.writer.submit('signal_audit', _INSERT_AUDIT_SQL, params):
+                logger.debug(
+                    f"[AUDIT] Queued audit record: "
+                    f"{record.instrument} {record.signal_type} -> {record.outcome.value}"
+                )
+                self._publish_signal(record, QUEUED)
+                return QUEUED
+
             with self.db.transaction() as conn:
                 with conn.cursor() as cursor:
-                    query = """
-                        INSERT INTO signal_audit (
-                            signal_log_id, signal_fingerprint, instrument, signal_type,
-                            position, signal_timestamp, received_at, outcome, outcome_reason,
-                            validation_result, sizing_calculation, risk_assessment,
-                            order_execution, processing_duration_ms, processed_by_instance
-                        ) VALUES (
-                            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                        )
-                        RETURNING id
-                    """
-
-                    params = (
-                        record.signal_log_id,
-                        record.signal_fingerprint,
-                        record.instrument,
-                        record.signal_type,
-                        record.position,
-                        record.signal_timestamp,
-                        record.received_at,
-                        record.outcome.value,
-                        record.outcome_reason,
-                        json.dumps(record.validation_result.to_dict()) if record.validation_result else None,
-                        json.dumps(record.sizing_calculation.to_dict()) if record.sizing_calculation else None,
-                        json.dumps(record.risk_assessment.to_dict()) if record.risk_assessment else None,
-                        json.dumps(record.order_execution.to_dict()) if record.order_execution else None,
-                        record.processing_duration_ms,
-                        record.processed_by_instance
-                    )
-
-                    cursor.execute(query, params)
+                    cursor.execute(_INSERT_AUDIT_SQL + " RETURNING id", params)
                     result = cursor.fetchone()
                     audit_id = result[0] if result else None
 
@@ -252,12 +269,21 @@ class SignalAuditService:
                         f"[AUDIT] Created audit record {audit_id}: "
                         f"{record.instrument} {record.signal_type} -> {record.outcome.value}"
                     )
+                    self._publish_signal(record, audit_id)
                     return audit_id
 
         except Exception as e:
             logger.error(f"[AUDIT] Failed to create audit record: {e}")
             return None
 
+    @staticmethod
+    def _publish_signal(record: SignalAuditRecord, audit_id):
+        """Feed the in-memory read model used by the Telegram bot"""
+        read_model = get_audit_read_model()
+        if read_model is not None:
+            read_model.record_signal(record, audit_id)
+
+    @traced('audit.update_order_execution')
     def update_order_execution(
         self,
         audit_id: int,
@@ -276,26 +302,31 @@ class SignalAuditService:
             True if update successful
         """
         try:
-            with self.db.transaction() as conn:
-                with conn.cursor() as cursor:
-                    query = """
-                        UPDATE signal_audit
-                        SET order_execution = %s
-                        WHERE id = %s
-                    """
-                    cursor.execute(query, (
-                        json.dumps(order_execution.to_dict()),
-                        audit_id
-                    ))
-                    conn.commit()
-
-                    logger.debug(f"[AUDIT] Updated order execution for audit {audit_id}")
-                    return True
+            query = """
+                UPDATE signal_audit
+                SET order_execution = %s
+                WHERE id = %s
+            """
+            params = (json.dumps(order_execution.to_dict()), audit_id)
+
+            if not (self.writer and self.writer.submit('signal_audit', query, params)):
+                with self.db.transaction() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute(query, params)
+                        conn.commit()
+
+                logger.debug(f"[AUDIT] Updated order execution for audit {audit_id}")
+
+            read_model = get_audit_read_model()
+            if read_model is not None:
+                read_model.record_order_execution(audit_id, order_execution)
+            return True
 
         except Exception as e:
             logger.error(f"[AUDIT] Failed to update order execution: {e}")
             return False
 
+    @traced('audit.update_outcome')
     def update_outcome(
         self,
         audit_id: int,
@@ -316,18 +347,27 @@ class SignalAuditService:
             True if update successful
         """
         try:
-            with self.db.transaction() as conn:
-                with conn.cursor() as cursor:
-                    query = """
-                        UPDATE signal_audit
-                        SET outcome = %s, outcome_reason = %s
-                        WHERE id = %s
-                    """
-                    cursor.execute(query, (outcome.value, outcome_reason, audit_id))
-                    conn.commit()
-
-                    logger.info(f"[AUDIT] Updated outcome for audit {audit_id} to {outcome.value}")
-                    return True
+            query = """
+                UPDATE signal_audit
+                SET outcome = %s, outcome_reason = %s
+                WHERE id = %s
+            """
+            params = (outcome.value, outcome_reason, audit_id)
+
+            if self.writer and self.writer.submit('signal_audit', query, params):
+                logger.info(f"[AUDIT] Queued outcome update for audit {audit_id} to {outcome.value}")
+            else:
+                with self.db.transaction() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute(query, params)
+                        conn.commit()
+
+                logger.info(f"[AUDIT] Updated outcome for audit {audit_id} to {outcome.value}")
+
+            read_model = get_audit_read_model()
+            if read_model is not None:
+                read_model.record_outcome(audit_id, outcome, outcome_reason)
+            return True
 
         except Exception as e:
             logger.error(f"[AUDIT] Failed to update outcome: {e}")
@@ -385,7 +425,8 @@ class SignalAuditService:
         self,
         limit: int = 10,
         instrument: Optional[str] = None,
-        outcome: Optional[SignalOutcome] = None
+        outcome: Optional[SignalOutcome] = None,
+        lookback_days: int = 31
     ) -> List[Dict[str, Any]]:
         """
         Get recent signal audit records.
@@ -396,6 +437,8 @@ class SignalAuditService:
             limit: Maximum number of records to return
             instrument: Filter by instrument (optional)
             outcome: Filter by outcome (optional)
+            lookback_days: Only search this many days back (bounds the scan
+                           to the latest one or two monthly partitions)
 
         Returns:
             List of audit records (most recent first)
@@ -403,8 +446,8 @@ class SignalAuditService:
         try:
             with self.db.get_connection() as conn:
                 with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                    conditions = []
-                    params = []
+                    conditions = ["created_at > NOW() - make_interval(days => %s)"]
+                    params = [lookback_days]
 
                     if instrument:
                         conditions.append("instrument = %s")
@@ -414,9 +457,7 @@ class SignalAuditService:
                         conditions.append("outcome = %s")
                         params.append(outcome.value)
 
-                    where_clause = ""
-                    if conditions:
-                        where_clause = "WHERE " + " AND ".join(conditions)
+                    where_clause = "WHERE " + " AND ".join(conditions)
 
                     query = f"""
                         SELECT id, signal_fingerprint, instrument, signal_type,
@@ -454,7 +495,7 @@ class SignalAuditService:
                                position, signal_timestamp, outcome, outcome_reason,
                                processing_duration_ms, created_at
                         FROM signal_audit
-                        WHERE DATE(created_at) = CURRENT_DATE
+                        WHERE created_at >= CURRENT_DATE
                         ORDER BY created_at DESC
                     """)
                     rows = cursor.fetchall()
@@ -488,7 +529,7 @@ class SignalAuditService:
                             COUNT(DISTINCT instrument) as instruments,
                             AVG(processing_duration_ms) as avg_processing_ms
                         FROM signal_audit
-                        WHERE created_at > NOW() - INTERVAL '%s days'
+                        WHERE created_at > NOW() - make_interval(days => %s)
                     """, (days,))
 
                     row = cursor.fetchone()
@@ -524,21 +565,17 @@ class SignalAuditService:
         try:
             with self.db.get_connection() as conn:
                 with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                    # Single pass: total comes from a window over the grouped counts
                     cursor.execute("""
-                        WITH totals AS (
-                            SELECT COUNT(*) as total
-                            FROM signal_audit
-                            WHERE created_at > NOW() - INTERVAL '%s days'
-                        )
                         SELECT
                             outcome,
                             COUNT(*) as count,
-                            ROUND(COUNT(*)::numeric / NULLIF(t.total, 0) * 100, 1) as percentage
-                        FROM signal_audit, totals t
-                        WHERE created_at > NOW() - INTERVAL '%s days'
-                        GROUP BY outcome, t.total
+                            ROUND(COUNT(*)::numeric / SUM(COUNT(*)) OVER () * 100, 1) as percentage
+                        FROM signal_audit
+                        WHERE created_at > NOW() - make_interval(days => %s)
+                        GROUP BY outcome
                         ORDER BY count DESC
-                    """, (days, days))
+                    """, (days,))
 
                     rows = cursor.fetchall()
                     return [dict(row) for row in rows]
@@ -547,6 +584,42 @@ class SignalAuditService:
             logger.error(f"[AUDIT] Failed to get rejection reasons: {e}")
             return []
 
+    def get_daily_outcome_counts(self, days: int = 90) -> Optional[List[Dict[str, Any]]]:
+        """
+        Signal counts per day, instrument and outcome (one grouped scan).
+
+        Used once at startup to warm the Telegram read model.
+
+        Args:
+            days: Number of calendar days to include (today plus days-1 before)
+
+        Returns:
+            List of {day, instrument, outcome, count, total_processing_ms,
+            timed_count}, or None if the query failed
+        """
+        try:
+            with self.db.get_connection() as conn:
+                with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                    cursor.execute("""
+                        SELECT
+                            created_at::date as day,
+                            instrument,
+                            outcome,
+                            COUNT(*) as count,
+                            SUM(processing_duration_ms) as total_processing_ms,
+                            COUNT(processing_duration_ms) as timed_count
+                        FROM signal_audit
+                        WHERE created_at >= CURRENT_DATE - make_interval(days => %s)
+                        GROUP BY 1, 2, 3
+                    """, (days - 1,))
+
+                    rows = cursor.fetchall()
+                    return [dict(row) for row in rows]
+
+        except Exception as e:
+            logger.error(f"[AUDIT] Failed to get daily outcome counts: {e}")
+            return None
+
 
 # Convenience function for quick audit recording
 def record_signal_audit(
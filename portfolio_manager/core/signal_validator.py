@@ -16,6 +16,7 @@ from enum import Enum
 from core.models import Signal, SignalType, PortfolioState
 from core.portfolio_state import PortfolioStateManager
 from core.signal_validation_config import SignalValidationConfig
+from core.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -115,6 +116,7 @@ class SignalValidator:
         if self.config.max_signal_age_stale <= 0:
             raise ValueError("max_signal_age_stale must be positive")
 
+    @traced('validator.validate_conditions_with_signal_price')
     def validate_conditions_with_signal_price(
         self,
         signal: Signal,
@@ -328,6 +330,7 @@ class SignalValidator:
 
         return True, None
 
+    @traced('validator.validate_execution_price')
     def validate_execution_price(
         self,
         signal: Signal,
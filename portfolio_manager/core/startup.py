@@ -0,0 +1,226 @@
+"""
+Startup Pipeline - Early port bind, concurrent subsystem init, startup profile
+
+Live startup used to connect the database, Redis and the broker, load the
+holiday calendar, run crash recovery and reconciliation and start the
+schedulers one after another, and only then bind the webhook port. Until
+then TradingView and the frontend got "connection refused".
+
+Design:
+- The webhook port is bound first and served by WarmupGate, which answers
+  every request with 503 {"status": "warming", "phase": ...} until the Flask
+  app is handed over with ready()
+- Independent I/O-bound subsystems (DB pool, Redis ping, broker connection
+  check, holiday calendar) are initialized concurrently by run_concurrently();
+  each task keeps its own error handling and fallback
+- StartupProfiler records sequential phases (mark) and concurrent tasks
+  (phase) with wall time and the number of modules imported, and renders the
+  --profile-startup report
+"""
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STATE_WARMING = 'warming'
+STATE_READY = 'ready'
+
+
+@dataclass
+class StartupPhase:
+    """One timed step of startup"""
+    name: str
+    start: float          # Seconds since process start
+    duration: float = 0.0
+    modules: int = 0      # Modules imported while the phase ran (process-wide)
+    thread: str = 'main'
+    concurrent: bool = False
+
+
+class StartupProfiler:
+    """
+    Wall-clock profile of startup phases.
+
+    Sequential phases are checkpoints: mark('name') ends the running phase
+    and starts the next one, so long init code does not need re-indenting.
+    Concurrent tasks use the phase() context manager.
+    """
+
+    def __init__(self, started: Optional[float] = None):
+        """
+        Args:
+            started: time.perf_counter() at process start (default: now)
+        """
+        self.started = started if started is not None else time.perf_counter()
+        self.phases: List[StartupPhase] = []
+        self.current_phase: Optional[str] = None
+        self.ready_at: Optional[float] = None
+        self._open: Optional[StartupPhase] = None
+        self._open_modules = 0
+        self._lock = threading.Lock()
+
+    def _now(self) -> float:
+        return time.perf_counter() - self.started
+
+    def mark(self, name: str):
+        """End the running sequential phase and start `name`"""
+        self._close_open()
+        self._open = StartupPhase(name=name, start=self._now())
+        self._open_modules = len(sys.modules)
+        self.current_phase = name
+
+    def _close_open(self):
+        if self._open is None:
+            return
+        self._open.duration = self._now() - self._open.start
+        self._open.modules = len(sys.modules) - self._open_modules
+        with self._lock:
+            self.phases.append(self._open)
+        self._open = None
+
+    @contextmanager
+    def phase(self, name: str, concurrent: bool = False) -> Iterator[StartupPhase]:
+        """Time a block (used for tasks running in worker threads)"""
+        record = StartupPhase(
+            name=name, start=self._now(), thread=threading.current_thread().name, concurrent=concurrent
+        )
+        modules_before = len(sys.modules)
+        try:
+            yield record
+        finally:
+            record.duration = self._now() - record.start
+            record.modules = len(sys.modules) - modules_before
+            with self._lock:
+                self.phases.append(record)
+
+    def finish(self) -> float:
+        """Close the last phase and record time-to-ready (seconds since process start)"""
+        self._close_open()
+        self.ready_at = self._now()
+        self.current_phase = None
+        return self.ready_at
+
+    def report(self) -> List[str]:
+        """Startup report lines, in start order"""
+        lines = [f"{'phase':<28} {'start ms':>9} {'took ms':>9} {'modules':>8}  thread"]
+        for record in sorted(self.phases, key=lambda p: p.start):
+            name = f"  {record.name}" if record.concurrent else record.name
+            lines.append(
+                f"{name:<28} {record.start * 1000:>9.1f} {record.duration * 1000:>9.1f} "
+                f"{record.modules:>8}  {record.thread}"
+            )
+        if self.ready_at is not None:
+            lines.append(f"{'ready':<28} {self.ready_at * 1000:>9.1f}")
+        return lines
+
+    def log_report(self):
+        logger.info("=" * 60)
+        logger.info("STARTUP PROFILE")
+        logger.info("=" * 60)
+        for line in self.report():
+            logger.info(line)
+        logger.info("=" * 60)
+
+
+def run_concurrently(profiler: StartupProfiler, tasks: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    """
+    Run independent init tasks in parallel threads and wait for all of them.
+
+    Tasks are expected to handle their own failures (log + fallback value);
+    an exception that escapes a task is re-raised here after every other
+    task has finished.
+
+    Returns:
+        Dict of task name -> return value
+    """
+    def timed(name: str, task: Callable[[], Any]) -> Any:
+        with profiler.phase(name, concurrent=True):
+            return task()
+
+    with ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix='startup') as executor:
+        futures = {name: executor.submit(timed, name, task) for name, task in tasks.items()}
+    return {name: future.result() for name, future in futures.items()}
+
+
+class WarmupGate:
+    """
+    WSGI app bound to the webhook port before the Flask app exists.
+
+    Answers 503 (Retry-After: 1) with the current startup phase while
+    warming up, then forwards every request to the app passed to ready().
+    """
+
+    def __init__(self, profiler: Optional[StartupProfiler] = None):
+        self.profiler = profiler
+        self._app = None
+        self._started = time.monotonic()
+
+    @property
+    def state(self) -> str:
+        return STATE_READY if self._app is not None else STATE_WARMING
+
+    def ready(self, app):
+        """Start serving `app`"""
+        self._app = app
+
+    def __call__(self, environ, start_response):
+        app = self._app
+        if app is not None:
+            return app(environ, start_response)
+
+        body = json.dumps({
+            'status': STATE_WARMING,
+            'phase': self.profiler.current_phase if self.profiler else None,
+            'elapsed_seconds': round(time.monotonic() - self._started, 3),
+            'message': 'Portfolio manager is starting up, retry shortly'
+        }).encode()
+        start_response('503 SERVICE UNAVAILABLE', [
+            ('Content-Type', 'application/json'),
+            ('Content-Length', str(len(body))),
+            ('Retry-After', '1'),
+        ])
+        return [body]
+
+
+class EarlyBoundServer:
+    """Threaded werkzeug server serving a WarmupGate from a background thread"""
+
+    def __init__(self, host: str, port: int, gate: WarmupGate):
+        """Bind and listen immediately (raises OSError if the port is taken)"""
+        from werkzeug.serving import make_server
+
+        self.gate = gate
+        try:
+            self._server = make_server(host, port, gate, threaded=True)
+        except SystemExit:
+            # werkzeug reports "address already in use" by exiting
+            raise OSError(f"Port {port} is already in use") from None
+        self.port = self._server.server_port
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='webhook-server', daemon=True)
+        self._thread.start()
+        logger.info(f"Webhook port {self.port} bound (readiness: {self.gate.state})")
+
+    def wait(self):
+        """Block until the server stops or Ctrl-C"""
+        try:
+            while self._thread is not None and self._thread.is_alive():
+                self._thread.join(timeout=1.0)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._server.shutdown()
+        self._server.server_close()
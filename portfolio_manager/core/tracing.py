@@ -0,0 +1,264 @@
+"""
+Per-Signal Tracing - Lightweight request-scoped spans
+
+Answers "where did the time go?" for a single webhook signal: the root span
+is opened in /webhook with the existing request_id as trace_id, and child
+spans cover validation, sizing, broker quotes, executor attempts, broker
+HTTP calls and audit/execution-log DB writes.
+
+Design:
+- Current span is tracked in a contextvar, so Flask's threaded request
+  handling gets one independent span stack per request
+- When tracing is disabled, span() returns a shared no-op object and
+  @traced calls the wrapped function directly (one attribute check)
+- Finished traces are exported as one JSON line per trace; the span fields
+  follow OTLP naming (traceId/spanId/parentSpanId/startTimeUnixNano/...)
+  so the file can be replayed into an OTLP collector
+
+Usage:
+    init_tracing('logs/traces.jsonl')
+
+    with trace_span('webhook', trace_id=request_id, instrument='GOLD_MINI'):
+        ...
+
+    @traced('sizer.base_entry')
+    def calculate_base_entry_size(...):
+        ...
+
+Report:
+    python scripts/trace_report.py logs/traces.jsonl --top 10
+"""
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_current_span: contextvars.ContextVar[Optional['Span']] = contextvars.ContextVar(
+    'pm_current_span', default=None
+)
+
+
+class Span:
+    """Single timed operation within a trace"""
+
+    __slots__ = (
+        'name', 'trace_id', 'span_id', 'parent_span_id', 'attributes',
+        'start_ns', 'end_ns', 'status', 'children', '_token', '_tracer'
+    )
+
+    def __init__(self, tracer: 'Tracer', name: str, trace_id: str,
+                 parent: Optional['Span'], attributes: Dict[str, Any]):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_span_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.start_ns = 0
+        self.end_ns = 0
+        self.status = 'OK'
+        self.children: List['Span'] = []
+        self._token = None
+        if parent is not None:
+            parent.children.append(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def __enter__(self) -> 'Span':
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        if exc_type is not None:
+            self.status = 'ERROR'
+            self.attributes['error'] = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        if self.parent_span_id is None:
+            self._tracer._finish_trace(self)
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_span_id,
+            'name': self.name,
+            'startTimeUnixNano': self.start_ns,
+            'endTimeUnixNano': self.end_ns,
+            'durationMs': round(self.duration_ms, 3),
+            'status': self.status,
+            'attributes': self.attributes,
+        }
+
+    def iter_spans(self):
+        """Depth-first iteration over this span and all descendants"""
+        yield self
+        for child in self.children:
+            yield from child.iter_spans()
+
+
+class _NoopSpan:
+    """Shared no-op span returned when tracing is disabled or there is no active trace"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class FileSpanExporter:
+    """Append finished traces to a JSON Lines file (one trace per line)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, root: Span):
+        line = json.dumps({
+            'traceId': root.trace_id,
+            'name': root.name,
+            'startTimeUnixNano': root.start_ns,
+            'durationMs': round(root.duration_ms, 3),
+            'attributes': root.attributes,
+            'spans': [s.to_dict() for s in root.iter_spans()],
+        }, default=str)
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line + '\n')
+
+
+class Tracer:
+    """
+    Creates spans and hands finished traces to an exporter
+
+    Only root spans (opened with trace_id) start a trace. Child spans are
+    created only while a trace is active, so code paths reached outside a
+    webhook (schedulers, background sync) pay the no-op cost only.
+    """
+
+    def __init__(self, exporter=None, enabled: bool = False):
+        self.exporter = exporter
+        self.enabled = enabled and exporter is not None
+
+    def span(self, name: str, trace_id: Optional[str] = None, **attributes):
+        if not self.enabled:
+            return NOOP_SPAN
+        parent = _current_span.get()
+        if parent is None:
+            if trace_id is None:
+                return NOOP_SPAN
+            return Span(self, name, trace_id, None, attributes)
+        return Span(self, name, parent.trace_id, parent, attributes)
+
+    def _finish_trace(self, root: Span):
+        try:
+            self.exporter.export(root)
+        except Exception as e:
+            # Tracing must never break signal processing
+            logger.warning(f"[TRACE] Failed to export trace {root.trace_id}: {e}")
+
+
+# Global instance (disabled until init_tracing is called)
+_tracer = Tracer()
+
+
+def init_tracing(export_path: str) -> Tracer:
+    """Enable tracing with a JSON Lines file exporter"""
+    global _tracer
+    _tracer = Tracer(FileSpanExporter(export_path), enabled=True)
+    logger.info(f"[TRACE] Per-signal tracing enabled (export: {export_path})")
+    return _tracer
+
+
+def get_tracer() -> Tracer:
+    """Get global Tracer instance"""
+    return _tracer
+
+
+def trace_span(name: str, trace_id: Optional[str] = None, **attributes):
+    """Open a span on the global tracer (no-op when tracing is disabled)"""
+    return _tracer.span(name, trace_id=trace_id, **attributes)
+
+
+def traced(name: str) -> Callable:
+    """Decorator that wraps a function call in a child span"""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _tracer.enabled or _current_span.get() is None:
+                return func(*args, **kwargs)
+            with _tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def load_traces(path: str) -> List[Dict[str, Any]]:
+    """Load exported traces from a JSON Lines file (skips corrupt lines)"""
+    traces = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                traces.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return traces
+
+
+def format_trace_tree(trace: Dict[str, Any], bar_width: int = 40) -> List[str]:
+    """
+    Render one trace as an indented flame-style breakdown
+
+    Each line shows the span name, duration, share of the root span and a
+    bar scaled to the root duration.
+    """
+    spans = trace.get('spans', [])
+    children: Dict[Optional[str], List[Dict]] = {}
+    for s in spans:
+        children.setdefault(s.get('parentSpanId'), []).append(s)
+
+    root_ms = trace.get('durationMs') or 0.0
+    lines: List[str] = []
+
+    def walk(span: Dict, depth: int):
+        duration = span.get('durationMs', 0.0)
+        share = (duration / root_ms) if root_ms else 0.0
+        bar = '█' * max(1, int(round(share * bar_width))) if duration > 0 else ''
+        status = '' if span.get('status', 'OK') == 'OK' else f"  [{span['status']}]"
+        label = f"{'  ' * depth}{span['name']}"
+        lines.append(f"{label:<42} {duration:>10.1f}ms {share * 100:>5.1f}%  {bar}{status}")
+        for child in sorted(children.get(span['spanId'], []), key=lambda c: c['startTimeUnixNano']):
+            walk(child, depth + 1)
+
+    for root in children.get(None, []):
+        walk(root, 0)
+    return lines
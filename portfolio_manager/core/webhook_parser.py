@@ -66,6 +66,8 @@ class DuplicateDetector:
     - 60-second rolling window
     - Automatic cleanup of old entries
     - Memory-efficient (deque with maxlen)
+    - Optional change log: recorded/removed fingerprints are replicated to
+      HA standbys (core.state_replication)
     """
 
     def __init__(self, window_seconds: int = 60, max_history: int = 1000):
@@ -85,6 +87,7 @@ class DuplicateDetector:
             'duplicates_found': 0,
             'cleanups_performed': 0
         }
+        self.change_log = None  # StateReplicator while this instance is the HA leader
 
     def is_duplicate(self, signal: Signal) -> bool:
         """
@@ -115,6 +118,7 @@ class DuplicateDetector:
 
             # Not a duplicate, add to history
             self._history.append(fingerprint)
+            self._replicate('dedup_add', fingerprint)
 
             # Periodic cleanup (every 100 checks to avoid overhead)
             if self._stats['total_checked'] % 100 == 0:
@@ -155,10 +159,35 @@ class DuplicateDetector:
 
             if removed:
                 self._history = new_history
+                self._replicate('dedup_remove', fingerprint)
                 logger.debug(f"Removed failed signal from duplicate history: {signal.signal_type.value} {signal.position}")
 
             return removed
 
+    def apply_fingerprint(self, fingerprint: SignalFingerprint):
+        """Record a fingerprint replicated from the HA leader"""
+        with self._lock:
+            if not any(fingerprint.matches(fp, 0) for fp in self._history):
+                self._history.append(fingerprint)
+
+    def discard_fingerprint(self, fingerprint: SignalFingerprint):
+        """Remove a fingerprint the HA leader removed after a failed signal"""
+        with self._lock:
+            self._history = deque(
+                (fp for fp in self._history if not fingerprint.matches(fp, self.window_seconds)),
+                maxlen=self.max_history
+            )
+
+    def _replicate(self, kind: str, fingerprint: SignalFingerprint):
+        """Hand a history change to the change log (if attached)"""
+        if self.change_log is not None:
+            self.change_log.publish(kind, {
+                'instrument': fingerprint.instrument,
+                'signal_type': fingerprint.signal_type,
+                'position': fingerprint.position,
+                'timestamp': fingerprint.timestamp
+            })
+
     def _clean_old_entries(self):
         """
         Remove entries older than window_seconds
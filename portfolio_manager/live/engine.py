@@ -5,12 +5,15 @@ Uses same portfolio logic as backtest, but executes real trades via OpenAlgo
 """
 import logging
 import time
+from dataclasses import replace
 from typing import Dict, Optional, Tuple
 from datetime import datetime
 from core.models import Signal, SignalType, Position, InstrumentType, EODMonitorSignal, EODPositionStatus, MarketDataSignal
 from core.portfolio_state import PortfolioStateManager
 from core.eod_monitor import EODMonitor
+from core.indicators import Bar, IndicatorEngine
 from core.eod_executor import EODExecutor, EODExecutionContext, EODExecutionPhase
+from core.eod_prearm import EODPreArmer
 from core.position_sizer import TomBassoPositionSizer
 from core.pyramid_gate import PyramidGateController
 from core.stop_manager import TomBassoStopManager
@@ -18,6 +21,11 @@ from core.config import PortfolioConfig, get_instrument_config
 from core.signal_validator import SignalValidator, SignalValidationConfig, ValidationSeverity
 from core.order_executor import OrderExecutor, SimpleLimitExecutor, ProgressiveExecutor, ExecutionStatus, SyntheticFuturesExecutor
 from core.signal_validation_metrics import SignalValidationMetrics
+from core.latency_metrics import (
+    get_latency_metrics, BROKER_CALL_LATENCY, BACKGROUND_TASK_LATENCY, EOD_TRIGGER_TO_ACK_LATENCY
+)
+from core.tracing import traced
+from core.async_db_writer import QUEUED, get_async_db_writer
 from core.signal_audit_service import (
     SignalAuditService, SignalAuditRecord, SignalOutcome,
     ValidationResultData, SizingCalculationData, RiskAssessmentData, OrderExecutionData
@@ -100,11 +108,19 @@ class LiveTradingEngine:
             )
         }
 
+        # Local V9 indicators per instrument (PM-side MARKET_DATA when TV alerts drop)
+        self.indicator_engines: Dict[str, IndicatorEngine] = {}
+
         # Initialize pyramiding tracking (will be populated by CrashRecoveryManager on startup)
         # Track for pyramiding (SAME as backtest)
         self.last_pyramid_price = {}
         self.base_positions = {}
 
+        # Tenant identity when several engines share one process (core.engine_host):
+        # positions are tagged with strategy_id and their ids prefixed
+        self.strategy_id = 1
+        self.position_prefix = ''
+
         # Statistics
         self.stats = {
             'signals_received': 0,
@@ -135,11 +151,12 @@ class LiveTradingEngine:
 
         # Metrics collection
         self.metrics = SignalValidationMetrics(window_size=1000)
+        self.latency_metrics = get_latency_metrics()
 
         # Signal audit service for comprehensive signal logging
         self.audit_service: Optional[SignalAuditService] = None
         if db_manager:
-            self.audit_service = SignalAuditService(db_manager)
+            self.audit_service = SignalAuditService(db_manager, writer=get_async_db_writer())
             logger.info("[LIVE] Signal audit service initialized")
 
         # Order executor based on config
@@ -170,9 +187,18 @@ class LiveTradingEngine:
         # EOD (End-of-Day) Pre-Close Execution Components
         self.eod_monitor: Optional[EODMonitor] = None
         self.eod_executor: Optional[EODExecutor] = None
+        self.eod_prearmer: Optional[EODPreArmer] = None
+        self.eod_last_trigger_to_ack: Dict[str, Dict] = {}
+        self.eod_order_targets: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
         if self.config.eod_enabled:
             self.eod_monitor = EODMonitor(self.config)
             self.eod_executor = EODExecutor(self.config, self.openalgo)
+            if self.config.eod_prearm_enabled:
+                self.eod_prearmer = EODPreArmer(
+                    self.eod_executor,
+                    symbol_mapper=self.symbol_mapper,
+                    price_band_pct=self.config.eod_prearm_price_band_pct
+                )
             logger.info("[LIVE] EOD pre-close execution enabled")
 
         logger.info(
@@ -182,6 +208,7 @@ class LiveTradingEngine:
             f"EOD={'enabled' if self.config.eod_enabled else 'disabled'}"
         )
 
+    @traced('engine.broker_price')
     def _get_broker_price_with_timeout(
         self,
         instrument: str,
@@ -214,7 +241,8 @@ class LiveTradingEngine:
                 # Attempt to get quote with timeout
                 # Note: OpenAlgo client doesn't support timeout parameter directly
                 # This is a placeholder - actual implementation depends on client API
-                quote = self.openalgo.get_quote(instrument)
+                with self.latency_metrics.time(BROKER_CALL_LATENCY, call='quote', instrument=instrument):
+                    quote = self.openalgo.get_quote(instrument)
 
                 # Use mid-price (avg of bid/ask) for fair limit price
                 bid = quote.get('bid')
@@ -370,6 +398,8 @@ class LiveTradingEngine:
             audit_id = self.audit_service.create_audit_record(record)
             if audit_id:
                 logger.debug(f"[AUDIT] Signal logged: {outcome.value} - {signal.instrument} {signal.signal_type.value} (id={audit_id})")
+            elif audit_id is QUEUED:
+                logger.debug(f"[AUDIT] Signal queued: {outcome.value} - {signal.instrument} {signal.signal_type.value}")
             return audit_id
 
         except Exception as e:
@@ -377,6 +407,11 @@ class LiveTradingEngine:
             logger.error(f"[AUDIT] Failed to log signal audit: {e}")
             return None
 
+    def _position_id(self, instrument: str, position: str) -> str:
+        """Position ID for a signal's position (e.g. BANK_NIFTY_Long_1, prefixed for hosted tenants)"""
+        return f"{self.position_prefix}{instrument}_{position}"
+
+    @traced('engine.process_signal')
     def process_signal(self, signal: Signal, coordinator=None) -> Dict:
         """
         Process signal in live mode
@@ -523,6 +558,7 @@ class LiveTradingEngine:
         else:
             return {'status': 'error', 'reason': f'Unknown signal type'}
 
+    @traced('engine.base_entry')
     def _handle_base_entry_live(self, signal: Signal) -> Dict:
         """
         Handle base entry in live mode
@@ -592,7 +628,9 @@ class LiveTradingEngine:
         est_risk = (signal.price - signal.stop) * constraints.final_lots * inst_config.point_value
         est_vol = signal.atr * constraints.final_lots * inst_config.point_value
 
-        gate_allowed, gate_reason = self.portfolio.check_portfolio_gate(est_risk, est_vol)
+        gate_allowed, gate_reason = self.portfolio.check_portfolio_gate(
+            est_risk, est_vol, instrument=instrument, new_lots=constraints.final_lots, price=signal.price
+        )
 
         if not gate_allowed:
             self.stats['entries_blocked'] += 1
@@ -794,11 +832,12 @@ class LiveTradingEngine:
                 # ============================
                 # GOLD MINI: Use Standard Order Executor
                 # ============================
-                exec_result = self.order_executor.execute(
-                    signal=signal,
-                    lots=original_lots,
-                    limit_price=execution_price
-                )
+                with self.latency_metrics.time(BROKER_CALL_LATENCY, call='order_fill', instrument=signal.instrument):
+                    exec_result = self.order_executor.execute(
+                        signal=signal,
+                        lots=original_lots,
+                        limit_price=execution_price
+                    )
 
                 execution_time_ms = (time.time() - execution_start) * 1000
 
@@ -910,7 +949,7 @@ class LiveTradingEngine:
             strike = execution_result.get('order_details', {}).get('strike')
 
             position = Position(
-                position_id=f"{instrument}_{signal.position}",
+                position_id=self._position_id(instrument, signal.position),
                 instrument=instrument,
                 entry_timestamp=signal.timestamp,
                 entry_price=entry_price,  # For BN: synthetic price (Strike + CE - PE), for Gold: futures price
@@ -925,6 +964,7 @@ class LiveTradingEngine:
                 pe_entry_price=pe_entry_price,  # Store for rollover P&L calculation
                 ce_entry_price=ce_entry_price,  # Store for rollover P&L calculation
                 is_test=self.test_mode,  # Mark as test position if in test mode
+                strategy_id=self.strategy_id,
                 original_lots=calculated_lots if self.test_mode else None,  # Store original calculated lots
                 **{k: v for k, v in execution_result.get('order_details', {}).items()
                    if k not in ['pe_entry_price', 'ce_entry_price', 'order_id', 'fill_price', 'strike',
@@ -1037,11 +1077,12 @@ class LiveTradingEngine:
                 }
 
             # Execute synthetic futures entry
-            result = self.synthetic_executor.execute_entry(
-                instrument="BANK_NIFTY",
-                lots=lots,
-                current_price=signal.price
-            )
+            with self.latency_metrics.time(BROKER_CALL_LATENCY, call='order_fill', instrument="BANK_NIFTY"):
+                result = self.synthetic_executor.execute_entry(
+                    instrument="BANK_NIFTY",
+                    lots=lots,
+                    current_price=signal.price
+                )
 
             if result.status == ExecutionStatus.EXECUTED:
                 # Use actual executed symbols - they contain all info (strike, expiry in the name)
@@ -1111,12 +1152,13 @@ class LiveTradingEngine:
             logger.info(f"[OPENALGO] Gold Mini entry: {futures_symbol}")
 
             # Execute using standard order executor
-            exec_result = self.order_executor.execute(
-                signal=signal,
-                lots=lots,
-                limit_price=signal.price,
-                action="BUY"
-            )
+            with self.latency_metrics.time(BROKER_CALL_LATENCY, call='order_fill', instrument=signal.instrument):
+                exec_result = self.order_executor.execute(
+                    signal=signal,
+                    lots=lots,
+                    limit_price=signal.price,
+                    action="BUY"
+                )
 
             if exec_result.status == ExecutionStatus.EXECUTED:
                 return {
@@ -1134,6 +1176,7 @@ class LiveTradingEngine:
                     'error': exec_result.rejection_reason or 'execution_failed'
                 }
 
+    @traced('engine.pyramid')
     def _handle_pyramid_live(self, signal: Signal) -> Dict:
         """Handle pyramid in live mode (SAME logic as backtest)"""
         processing_start_time = datetime.now()
@@ -1450,11 +1493,12 @@ class LiveTradingEngine:
                 # ============================
                 # GOLD MINI: Use Standard Order Executor
                 # ============================
-                exec_result = self.order_executor.execute(
-                    signal=signal,
-                    lots=original_lots,
-                    limit_price=execution_price
-                )
+                with self.latency_metrics.time(BROKER_CALL_LATENCY, call='order_fill', instrument=signal.instrument):
+                    exec_result = self.order_executor.execute(
+                        signal=signal,
+                        lots=original_lots,
+                        limit_price=execution_price
+                    )
 
                 execution_time_ms = (time.time() - execution_start) * 1000
 
@@ -1562,7 +1606,7 @@ class LiveTradingEngine:
             strike = execution_result.get('order_details', {}).get('strike')
 
             position = Position(
-                position_id=f"{instrument}_{signal.position}",
+                position_id=self._position_id(instrument, signal.position),
                 instrument=instrument,
                 entry_timestamp=signal.timestamp,
                 entry_price=entry_price,  # For BN: synthetic price (Strike + CE - PE), for Gold: futures price
@@ -1576,6 +1620,7 @@ class LiveTradingEngine:
                 pe_entry_price=pe_entry_price,  # Store for rollover P&L calculation
                 ce_entry_price=ce_entry_price,  # Store for rollover P&L calculation
                 is_test=self.test_mode,  # Mark as test position if in test mode
+                strategy_id=self.strategy_id,
                 original_lots=calculated_lots if self.test_mode else None,  # Store original calculated lots
                 **{k: v for k, v in execution_result.get('order_details', {}).items()
                    if k not in ['pe_entry_price', 'ce_entry_price', 'order_id', 'fill_price', 'strike',
@@ -1649,13 +1694,14 @@ class LiveTradingEngine:
             'reason': 'unexpected_execution_state'
         }
 
+    @traced('engine.exit')
     def _handle_exit_live(self, signal: Signal) -> Dict:
         """Handle exit in live mode"""
         # Handle "EXIT ALL" - close all positions for this instrument
         if signal.position.upper() == "ALL":
             return self._handle_exit_all_live(signal)
 
-        position_id = f"{signal.instrument}_{signal.position}"
+        position_id = self._position_id(signal.instrument, signal.position)
 
         if position_id not in self.portfolio.positions:
             logger.warning(
@@ -1874,13 +1920,14 @@ class LiveTradingEngine:
 
             # Execute synthetic futures exit using stored symbols
             # current_price is not used when pe_symbol/ce_symbol are provided
-            result = self.synthetic_executor.execute_exit(
-                instrument="BANK_NIFTY",
-                lots=position.lots,
-                current_price=0,  # Not used when symbols are provided
-                pe_symbol=pe_symbol,
-                ce_symbol=ce_symbol
-            )
+            with self.latency_metrics.time(BROKER_CALL_LATENCY, call='order_fill', instrument="BANK_NIFTY"):
+                result = self.synthetic_executor.execute_exit(
+                    instrument="BANK_NIFTY",
+                    lots=position.lots,
+                    current_price=0,  # Not used when symbols are provided
+                    pe_symbol=pe_symbol,
+                    ce_symbol=ce_symbol
+                )
 
             if result.status == ExecutionStatus.EXECUTED:
                 # Calculate synthetic exit price from actual leg fills
@@ -1980,12 +2027,13 @@ class LiveTradingEngine:
             )
 
             # Execute using standard order executor with SELL action
-            exec_result = self.order_executor.execute(
-                signal=exit_signal,
-                lots=position.lots,
-                limit_price=exit_price,
-                action="SELL"
-            )
+            with self.latency_metrics.time(BROKER_CALL_LATENCY, call='order_fill', instrument=position.instrument):
+                exec_result = self.order_executor.execute(
+                    signal=exit_signal,
+                    lots=position.lots,
+                    limit_price=exit_price,
+                    action="SELL"
+                )
 
             if exec_result.status == ExecutionStatus.EXECUTED:
                 return {
@@ -2053,7 +2101,8 @@ class LiveTradingEngine:
         logger.info(f"Found {len(scan_result.candidates)} positions to roll")
 
         # Execute rollovers
-        result = self.rollover_executor.execute_rollovers(scan_result, dry_run=dry_run)
+        with self.latency_metrics.time(BACKGROUND_TASK_LATENCY, task='rollover'):
+            result = self.rollover_executor.execute_rollovers(scan_result, dry_run=dry_run)
 
         # Update statistics
         self.stats['rollovers_executed'] += result.successful
@@ -2114,6 +2163,7 @@ class LiveTradingEngine:
     # EOD (End-of-Day) Pre-Close Execution Methods
     # ============================================================
 
+    @traced('engine.eod_monitor')
     def process_eod_monitor_signal(self, eod_signal: EODMonitorSignal) -> Dict:
         """
         Process an incoming EOD_MONITOR signal from TradingView.
@@ -2153,14 +2203,35 @@ class LiveTradingEngine:
             f"action={action.value if action else 'None'}"
         )
 
+        # Re-arm the order ticket so T-30 only has to place it
+        armed = False
+        if self.eod_prearmer:
+            try:
+                in_position, pyramid_count = self._eod_db_position_state(instrument)
+                armed = self.eod_prearmer.arm(replace(
+                    eod_signal,
+                    position_status=EODPositionStatus(in_position=in_position, pyramid_count=pyramid_count)
+                )).valid
+            except Exception as e:
+                self.eod_prearmer.disarm(instrument)
+                logger.warning(f"[LIVE-EOD] Pre-arm failed for {instrument}: {e}")
+
         return {
             'status': 'accepted',
             'instrument': instrument,
             'price': eod_signal.price,
             'potential_action': action.value if action else None,
-            'conditions_met': eod_signal.conditions.all_entry_conditions_met()
+            'conditions_met': eod_signal.conditions.all_entry_conditions_met(),
+            'armed': armed
         }
 
+    def _eod_db_position_state(self, instrument: str) -> Tuple[bool, int]:
+        """(in_position, pyramid_count) for an instrument from PM state"""
+        portfolio_state = self.portfolio.get_current_state()
+        db_positions = portfolio_state.get_positions_for_instrument(instrument)
+        db_in_position = len(db_positions) > 0
+        return db_in_position, len(db_positions) - 1 if db_in_position else 0
+
     def eod_condition_check(self, instrument: str) -> Dict:
         """
         EOD condition check callback for EODScheduler.
@@ -2280,6 +2351,7 @@ class LiveTradingEngine:
         if not self.eod_monitor or not self.eod_executor or not self.config.eod_enabled:
             return {'success': False, 'reason': 'eod_disabled'}
 
+        triggered_at = time.perf_counter()
         logger.info(f"[LIVE-EOD] Executing order for {instrument}")
 
         # Get execution state
@@ -2317,10 +2389,7 @@ class LiveTradingEngine:
             }
 
         # Get fresh position state from database
-        portfolio_state = self.portfolio.get_current_state()
-        db_positions = portfolio_state.get_positions_for_instrument(instrument)
-        db_in_position = len(db_positions) > 0
-        db_pyramid_count = len(db_positions) - 1 if db_in_position else 0
+        db_in_position, db_pyramid_count = self._eod_db_position_state(instrument)
 
         # Log current database state at T-30
         logger.info(
@@ -2352,17 +2421,36 @@ class LiveTradingEngine:
                 'instrument': instrument
             }
 
-        # Prepare and execute order
-        context = self.eod_executor.prepare_execution(instrument, eod_signal, action)
-        if context.error:
-            logger.error(f"[LIVE-EOD] Prepare failed: {context.error}")
-            return {
-                'success': False,
-                'reason': context.error,
-                'instrument': instrument
-            }
+        # Fast path: place the pre-armed ticket if it was built from this
+        # signal and position state
+        context = None
+        armed = False
+        ticket = self.eod_prearmer.get_ticket(instrument) if self.eod_prearmer else None
+        if (ticket and ticket.valid and ticket.signal_type == action
+                and ticket.matches(eod_signal, db_in_position, db_pyramid_count)
+                and ticket.price_in_band(eod_signal.price)):
+            context = self.eod_executor.execute_ticket(ticket, eod_signal)
+            armed = True
+        elif ticket:
+            logger.info(f"[LIVE-EOD] Armed ticket stale for {instrument}, preparing order")
+
+        if context is None:
+            # Prepare and execute order
+            context = self.eod_executor.prepare_execution(instrument, eod_signal, action)
+            if context.error:
+                logger.error(f"[LIVE-EOD] Prepare failed: {context.error}")
+                return {
+                    'success': False,
+                    'reason': context.error,
+                    'instrument': instrument
+                }
+
+            context = self.eod_executor.execute_order(context)
+
+        if self.eod_prearmer:
+            self.eod_prearmer.disarm(instrument)
+        self._record_eod_trigger_to_ack(instrument, triggered_at, context, armed)
 
-        context = self.eod_executor.execute_order(context)
         if context.error and not context.order_id:
             logger.error(f"[LIVE-EOD] Order placement failed: {context.error}")
             return {
@@ -2374,6 +2462,7 @@ class LiveTradingEngine:
         # Mark order placed in monitor
         if context.order_id:
             self.eod_monitor.mark_order_placed(instrument, context.order_id)
+            self.eod_order_targets[instrument] = (context.symbol, context.exchange)
 
         return {
             'success': True,
@@ -2382,9 +2471,34 @@ class LiveTradingEngine:
             'order_id': context.order_id,
             'signal_type': action.value,
             'lots': context.lots,
-            'limit_price': context.limit_price
+            'limit_price': context.limit_price,
+            'armed': armed
         }
 
+    def _record_eod_trigger_to_ack(
+        self,
+        instrument: str,
+        triggered_at: float,
+        context: EODExecutionContext,
+        armed: bool
+    ):
+        """Record time from the T-30 trigger to the broker's order response"""
+        elapsed_ms = (time.perf_counter() - triggered_at) * 1000
+        path = 'armed' if armed else 'prepared'
+        self.latency_metrics.observe(
+            EOD_TRIGGER_TO_ACK_LATENCY, elapsed_ms, instrument=instrument, path=path
+        )
+        self.eod_last_trigger_to_ack[instrument] = {
+            'latency_ms': round(elapsed_ms, 3),
+            'path': path,
+            'acknowledged': context.order_id is not None,
+            'seconds_to_close': self.eod_monitor.get_seconds_to_close(instrument),
+            'at': datetime.now().isoformat()
+        }
+        logger.info(
+            f"[LIVE-EOD] {instrument}: trigger-to-ack {elapsed_ms:.1f}ms ({path})"
+        )
+
     def eod_track(self, instrument: str) -> Dict:
         """
         EOD order tracking callback for EODScheduler.
@@ -2435,6 +2549,8 @@ class LiveTradingEngine:
             started_at=state.order_placed_at
         )
         context.phase = EODExecutionPhase.ORDER_TRACKING
+        # Market fallback goes to the same contract as the limit order
+        context.symbol, context.exchange = self.eod_order_targets.pop(instrument, (None, None))
 
         # Track order
         context = self.eod_executor.track_order(context)
@@ -2509,6 +2625,7 @@ class LiveTradingEngine:
     # MARKET_DATA Signal Processing (PM-Side Stop Monitoring)
     # ============================================================
 
+    @traced('engine.market_data')
     def process_market_data_signal(self, signal: MarketDataSignal) -> Dict:
         """
         Process MARKET_DATA signal from Scout indicator for PM-side stop monitoring.
@@ -2529,6 +2646,8 @@ class LiveTradingEngine:
             Dict with processing result
         """
         instrument = signal.instrument
+        if self.portfolio.risk_engine is not None:
+            self.portfolio.risk_engine.on_price(instrument, signal.price, signal.timestamp)
         logger.debug(
             f"[PM-STOP] Processing MARKET_DATA for {instrument}: "
             f"price={signal.price:.2f}, atr={signal.atr:.2f}, supertrend={signal.supertrend:.2f}"
@@ -2595,6 +2714,39 @@ class LiveTradingEngine:
             'exits_triggered': exits_triggered
         }
 
+    def process_local_bar(self, instrument: str, bar: Bar) -> Dict:
+        """
+        Run PM-side stop monitoring from locally computed indicators.
+
+        Updates the instrument's IndicatorEngine with a completed bar (built
+        from broker quotes) and feeds the resulting price/ATR/SuperTrend to
+        process_market_data_signal, exactly as a Scout MARKET_DATA alert would.
+
+        Args:
+            instrument: Instrument name (e.g. "GOLD_MINI")
+            bar: Completed OHLC bar
+
+        Returns:
+            Dict with processing result ('warming_up' until ATR/SuperTrend exist)
+        """
+        indicators = self.indicator_engines.get(instrument)
+        if indicators is None:
+            indicators = IndicatorEngine(instrument)
+            self.indicator_engines[instrument] = indicators
+
+        snapshot = indicators.update_bar(bar)
+        signal = snapshot.to_market_data_signal(instrument)
+        if signal is None:
+            return {
+                'status': 'warming_up',
+                'instrument': instrument,
+                'bars_seen': indicators.bars_seen
+            }
+
+        result = self.process_market_data_signal(signal)
+        result['source'] = 'local'
+        return result
+
     def _execute_pm_initiated_exit(
         self,
         position: Position,
@@ -2779,7 +2931,16 @@ class LiveTradingEngine:
                     'completed': state.execution_completed if state else False,
                     'order_id': state.order_id if state else None,
                     'order_filled': state.order_filled if state else False
-                } if state else None
+                } if state else None,
+                'armed_ticket': self._eod_ticket_status(instrument),
+                'last_trigger_to_ack': self.eod_last_trigger_to_ack.get(instrument)
             }
 
         return status
+
+    def _eod_ticket_status(self, instrument: str) -> Optional[Dict]:
+        """Armed EOD order ticket for status output (None if not armed)"""
+        if not self.eod_prearmer:
+            return None
+        ticket = self.eod_prearmer.get_ticket(instrument)
+        return ticket.to_dict() if ticket else None
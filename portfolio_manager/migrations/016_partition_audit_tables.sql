@@ -0,0 +1,312 @@
+-- ============================================================================
+-- Migration 016: Monthly Range Partitioning for Audit Tables
+--
+-- Purpose: Convert the append-only audit tables to native monthly RANGE
+--          partitions so recent-window queries prune to one or two partitions
+--          and retention becomes DETACH/DROP instead of DELETE.
+--
+-- Tables (partition key):
+--   signal_audit        (created_at)
+--   order_execution_log (created_at)
+--   signal_log          (signal_timestamp)  -- keeps fingerprint dedup, see below
+--   leadership_history  (created_at)
+--
+-- Schema changes required by partitioning:
+--   * Primary keys become (id, <partition key>)
+--   * signal_log:   UNIQUE (fingerprint) -> UNIQUE (fingerprint, signal_timestamp).
+--                   The fingerprint already hashes the signal timestamp, so dedup
+--                   behaviour is unchanged. log_signal() uses the new conflict target.
+--   * signal_audit: UNIQUE (signal_fingerprint) -> plain index. REJECTED_DUPLICATE
+--                   audits legitimately share the original signal's fingerprint.
+--   * Foreign keys into partitioned tables are dropped (signal_audit.signal_log_id,
+--     order_execution_log.signal_audit_id, order_execution_log.parent_order_id).
+--     They were ON DELETE SET NULL links only; the columns are kept and indexed.
+--
+-- Maintenance: core/partition_maintenance.py creates future partitions and
+-- archives partitions past retention to Parquet before dropping them.
+-- Replaces the DELETE-based functions from migration 012.
+--
+-- Requires: PostgreSQL 13+
+-- Date: October 2026
+-- ============================================================================
+
+BEGIN;
+
+-- ============================================================================
+-- Helper functions
+-- ============================================================================
+
+-- Create the partition of `parent` covering the month containing `month_start`.
+-- Partition name: <parent>_pYYYYMM (same schema as parent)
+CREATE OR REPLACE FUNCTION create_monthly_partition(parent TEXT, month_start DATE)
+RETURNS TEXT AS $$
+DECLARE
+    lower_bound DATE := date_trunc('month', month_start)::DATE;
+    partition_name TEXT := parent || '_p' || to_char(lower_bound, 'YYYYMM');
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %s PARTITION OF %s FOR VALUES FROM (%L) TO (%L)',
+        partition_name, parent, lower_bound, (lower_bound + INTERVAL '1 month')::DATE
+    );
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION create_monthly_partition IS 'Creates <parent>_pYYYYMM for the month containing month_start (idempotent).';
+
+-- Ensure partitions exist from the current month through months_ahead months.
+CREATE OR REPLACE FUNCTION ensure_monthly_partitions(parent TEXT, months_ahead INTEGER DEFAULT 3)
+RETURNS INTEGER AS $$
+DECLARE
+    i INTEGER;
+BEGIN
+    FOR i IN 0..months_ahead LOOP
+        PERFORM create_monthly_partition(parent, (date_trunc('month', CURRENT_DATE) + make_interval(months => i))::DATE);
+    END LOOP;
+    RETURN months_ahead + 1;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION ensure_monthly_partitions IS 'Creates monthly partitions for the current month and the next months_ahead months.';
+
+-- Convert an existing table into a monthly range-partitioned table.
+-- Copies defaults, CHECK constraints and comments; moves all rows; re-parents
+-- the id sequence. Indexes and triggers are recreated by the caller (legacy
+-- index names are only free once the legacy table is dropped).
+CREATE OR REPLACE FUNCTION convert_to_monthly_partitions(tbl TEXT, key_column TEXT, months_ahead INTEGER DEFAULT 3)
+RETURNS BIGINT AS $$
+DECLARE
+    legacy TEXT := tbl || '_legacy';
+    seq_name TEXT;
+    first_month DATE;
+    m DATE;
+    moved BIGINT;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = tbl::regclass) THEN
+        RAISE NOTICE '% is already partitioned, skipping', tbl;
+        RETURN 0;
+    END IF;
+
+    seq_name := pg_get_serial_sequence(tbl, 'id');
+
+    EXECUTE format('ALTER TABLE %s RENAME TO %s', tbl, legacy);
+    EXECUTE format('UPDATE %s SET %I = CURRENT_TIMESTAMP WHERE %I IS NULL', legacy, key_column, key_column);
+    EXECUTE format(
+        'CREATE TABLE %s (LIKE %s INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING COMMENTS) PARTITION BY RANGE (%I)',
+        tbl, legacy, key_column
+    );
+    EXECUTE format('ALTER TABLE %s ALTER COLUMN %I SET NOT NULL', tbl, key_column);
+
+    -- Partitions for existing data, the current month and months_ahead
+    EXECUTE format('SELECT date_trunc(''month'', MIN(%I))::DATE FROM %s', key_column, legacy) INTO first_month;
+    m := LEAST(COALESCE(first_month, CURRENT_DATE), CURRENT_DATE);
+    m := date_trunc('month', m)::DATE;
+    WHILE m < date_trunc('month', CURRENT_DATE)::DATE LOOP
+        PERFORM create_monthly_partition(tbl, m);
+        m := (m + INTERVAL '1 month')::DATE;
+    END LOOP;
+    PERFORM ensure_monthly_partitions(tbl, months_ahead);
+
+    -- Catch-all for out-of-range keys (e.g. bad upstream timestamps)
+    EXECUTE format('CREATE TABLE IF NOT EXISTS %s_pdefault PARTITION OF %s DEFAULT', tbl, tbl);
+
+    EXECUTE format('INSERT INTO %s SELECT * FROM %s', tbl, legacy);
+    GET DIAGNOSTICS moved = ROW_COUNT;
+
+    IF seq_name IS NOT NULL THEN
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY %s.id', seq_name, tbl);
+    END IF;
+
+    EXECUTE format('DROP TABLE %s CASCADE', legacy);
+
+    -- After the drop so the <tbl>_pkey name is free again
+    EXECUTE format('ALTER TABLE %s ADD PRIMARY KEY (id, %I)', tbl, key_column);
+    RETURN moved;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION convert_to_monthly_partitions IS 'One-off conversion of a plain table to monthly RANGE partitions on key_column.';
+
+-- ============================================================================
+-- signal_log (partitioned on signal_timestamp to keep fingerprint dedup)
+-- ============================================================================
+
+SELECT convert_to_monthly_partitions('signal_log', 'signal_timestamp');
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_signal_log_fingerprint
+    ON signal_log(fingerprint, signal_timestamp);
+CREATE INDEX IF NOT EXISTS idx_signal_log_processed_at
+    ON signal_log(processed_at);
+CREATE INDEX IF NOT EXISTS idx_signal_log_instrument_timestamp
+    ON signal_log(instrument, signal_timestamp);
+
+-- ============================================================================
+-- signal_audit
+-- ============================================================================
+
+SELECT convert_to_monthly_partitions('signal_audit', 'created_at');
+
+CREATE INDEX IF NOT EXISTS idx_signal_audit_fingerprint
+    ON signal_audit(signal_fingerprint);
+CREATE INDEX IF NOT EXISTS idx_signal_audit_instrument_time
+    ON signal_audit(instrument, signal_timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_signal_audit_outcome
+    ON signal_audit(outcome);
+CREATE INDEX IF NOT EXISTS idx_signal_audit_created
+    ON signal_audit(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_signal_audit_type
+    ON signal_audit(signal_type);
+CREATE INDEX IF NOT EXISTS idx_signal_audit_instrument_outcome
+    ON signal_audit(instrument, outcome, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_signal_audit_signal_log
+    ON signal_audit(signal_log_id)
+    WHERE signal_log_id IS NOT NULL;
+
+-- ============================================================================
+-- order_execution_log
+-- ============================================================================
+
+SELECT convert_to_monthly_partitions('order_execution_log', 'created_at');
+
+CREATE INDEX IF NOT EXISTS idx_order_exec_signal
+    ON order_execution_log(signal_audit_id);
+CREATE INDEX IF NOT EXISTS idx_order_exec_position
+    ON order_execution_log(position_id);
+CREATE INDEX IF NOT EXISTS idx_order_exec_status
+    ON order_execution_log(order_status);
+CREATE INDEX IF NOT EXISTS idx_order_exec_time
+    ON order_execution_log(order_placed_at DESC);
+CREATE INDEX IF NOT EXISTS idx_order_exec_broker_id
+    ON order_execution_log(broker_order_id);
+CREATE INDEX IF NOT EXISTS idx_order_exec_parent
+    ON order_execution_log(parent_order_id)
+    WHERE parent_order_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_order_exec_instrument_status
+    ON order_execution_log(instrument, order_status, order_placed_at DESC);
+
+DROP TRIGGER IF EXISTS trg_order_execution_log_updated ON order_execution_log;
+CREATE TRIGGER trg_order_execution_log_updated
+    BEFORE UPDATE ON order_execution_log
+    FOR EACH ROW
+    EXECUTE FUNCTION update_order_execution_log_timestamp();
+
+-- ============================================================================
+-- leadership_history
+-- ============================================================================
+
+SELECT convert_to_monthly_partitions('leadership_history', 'created_at');
+
+CREATE INDEX IF NOT EXISTS idx_leadership_history_timeline
+    ON leadership_history(became_leader_at DESC, released_leader_at DESC);
+CREATE INDEX IF NOT EXISTS idx_leadership_history_instance
+    ON leadership_history(instance_id, became_leader_at DESC);
+
+-- ============================================================================
+-- Retention: replace DELETE-based cleanup from migrations 001/012
+-- ============================================================================
+
+-- signal_log retention is now partition-based (see core/partition_maintenance.py)
+DROP FUNCTION IF EXISTS cleanup_old_signals();
+
+-- Monthly partitions of `parent` whose upper bound is at or before `cutoff`
+CREATE OR REPLACE FUNCTION expired_monthly_partitions(parent TEXT, cutoff TIMESTAMP)
+RETURNS TABLE(partition_name TEXT, range_start TIMESTAMP, range_end TIMESTAMP) AS $$
+    SELECT c.oid::regclass::TEXT,
+           to_timestamp(substring(c.relname from '_p(\d{6})$'), 'YYYYMM')::TIMESTAMP,
+           (to_timestamp(substring(c.relname from '_p(\d{6})$'), 'YYYYMM') + INTERVAL '1 month')::TIMESTAMP
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = parent::regclass
+      AND c.relname ~ '_p\d{6}$'
+      AND (to_timestamp(substring(c.relname from '_p(\d{6})$'), 'YYYYMM') + INTERVAL '1 month') <= cutoff
+    ORDER BY 2;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION expired_monthly_partitions IS 'Lists monthly partitions entirely older than cutoff (candidates for archive + drop).';
+
+-- Keep cleanup_audit_trail() callable: it now drops whole expired partitions
+-- without archiving. Prefer scripts/partition_maintenance.py, which archives first.
+CREATE OR REPLACE FUNCTION cleanup_audit_trail(retention_days INTEGER DEFAULT 90)
+RETURNS TABLE(
+    table_name TEXT,
+    deleted_count BIGINT,
+    oldest_remaining TIMESTAMP
+) AS $$
+DECLARE
+    t TEXT;
+    p RECORD;
+    n BIGINT;
+    total BIGINT;
+    oldest TIMESTAMP;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['order_execution_log', 'signal_audit'] LOOP
+        total := 0;
+        FOR p IN SELECT * FROM expired_monthly_partitions(t, NOW()::TIMESTAMP - make_interval(days => retention_days)) LOOP
+            EXECUTE format('SELECT COUNT(*) FROM %s', p.partition_name) INTO n;
+            EXECUTE format('ALTER TABLE %s DETACH PARTITION %s', t, p.partition_name);
+            EXECUTE format('DROP TABLE %s', p.partition_name);
+            total := total + n;
+        END LOOP;
+        EXECUTE format('SELECT MIN(created_at) FROM %s', t) INTO oldest;
+        table_name := t;
+        deleted_count := total;
+        oldest_remaining := oldest;
+        RETURN NEXT;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION cleanup_audit_trail IS 'Drops audit partitions older than retention_days without archiving. Prefer scripts/partition_maintenance.py.';
+
+DROP FUNCTION IF EXISTS cleanup_old_signal_audits(INTEGER);
+DROP FUNCTION IF EXISTS cleanup_old_order_executions(INTEGER);
+
+-- ============================================================================
+-- Recreate monitoring view (dropped by CASCADE above)
+-- ============================================================================
+
+CREATE OR REPLACE VIEW audit_trail_stats AS
+SELECT
+    'signal_audit' AS table_name,
+    COUNT(*) AS total_records,
+    MIN(created_at) AS oldest_record,
+    MAX(created_at) AS newest_record,
+    COUNT(*) FILTER (WHERE created_at > NOW() - INTERVAL '1 day') AS records_today,
+    COUNT(*) FILTER (WHERE created_at > NOW() - INTERVAL '7 days') AS records_7days,
+    COUNT(*) FILTER (WHERE created_at > NOW() - INTERVAL '30 days') AS records_30days,
+    (SELECT pg_size_pretty(SUM(pg_total_relation_size(inhrelid)))
+     FROM pg_inherits WHERE inhparent = 'signal_audit'::regclass) AS table_size
+FROM signal_audit
+
+UNION ALL
+
+SELECT
+    'order_execution_log' AS table_name,
+    COUNT(*) AS total_records,
+    MIN(created_at) AS oldest_record,
+    MAX(created_at) AS newest_record,
+    COUNT(*) FILTER (WHERE created_at > NOW() - INTERVAL '1 day') AS records_today,
+    COUNT(*) FILTER (WHERE created_at > NOW() - INTERVAL '7 days') AS records_7days,
+    COUNT(*) FILTER (WHERE created_at > NOW() - INTERVAL '30 days') AS records_30days,
+    (SELECT pg_size_pretty(SUM(pg_total_relation_size(inhrelid)))
+     FROM pg_inherits WHERE inhparent = 'order_execution_log'::regclass) AS table_size
+FROM order_execution_log;
+
+COMMENT ON VIEW audit_trail_stats IS 'Statistics view for monitoring audit trail tables. Query: SELECT * FROM audit_trail_stats;';
+
+COMMIT;
+
+-- ============================================================================
+-- Verification
+-- ============================================================================
+--
+-- 1. List partitions:
+--    SELECT inhrelid::regclass FROM pg_inherits WHERE inhparent = 'signal_audit'::regclass ORDER BY 1;
+--
+-- 2. Confirm pruning on a recent-window query (should scan 1-2 partitions):
+--    EXPLAIN SELECT COUNT(*) FROM signal_audit WHERE created_at > NOW() - INTERVAL '7 days';
+--
+-- 3. Create partitions ahead (normally done by the maintenance job):
+--    SELECT ensure_monthly_partitions('signal_audit', 3);
+--
+-- ============================================================================
@@ -0,0 +1,68 @@
+-- ============================================================================
+-- Migration 017: Strategy-Scoped Portfolio State and Capital Ledger
+--
+-- Purpose: Let one PM process host several engines (one per strategy or
+--          account, see core/engine_host.py) that share the database but keep
+--          their own portfolio state, pyramiding state and capital ledger.
+--
+-- Schema changes:
+--   * portfolio_state:      one row per strategy, id = strategy_id. The
+--                           single_row CHECK is dropped; row 1 stays the
+--                           default (ITJ Trend Follow) book.
+--   * capital_transactions: strategy_id column, existing rows -> 1
+--   * pyramiding_state:     strategy_id column, primary key
+--                           instrument -> (strategy_id, instrument)
+--   * capital_summary:      one row per strategy (grouped by strategy_id)
+--
+-- portfolio_positions already carries strategy_id (migration 006).
+-- A single-engine PM keeps working on strategy 1 exactly as before.
+--
+-- Date: October 2026
+-- ============================================================================
+
+BEGIN;
+
+-- portfolio_state: one row per strategy
+ALTER TABLE portfolio_state DROP CONSTRAINT IF EXISTS single_row;
+ALTER TABLE portfolio_state
+    ADD CONSTRAINT portfolio_state_strategy_fk
+    FOREIGN KEY (id) REFERENCES trading_strategies(strategy_id);
+
+-- capital_transactions: ledger per strategy
+ALTER TABLE capital_transactions
+    ADD COLUMN IF NOT EXISTS strategy_id INTEGER NOT NULL DEFAULT 1
+    REFERENCES trading_strategies(strategy_id);
+
+CREATE INDEX IF NOT EXISTS idx_capital_transactions_strategy_created
+    ON capital_transactions(strategy_id, created_at DESC);
+
+-- pyramiding_state: per strategy and instrument
+ALTER TABLE pyramiding_state
+    ADD COLUMN IF NOT EXISTS strategy_id INTEGER NOT NULL DEFAULT 1
+    REFERENCES trading_strategies(strategy_id);
+
+ALTER TABLE pyramiding_state DROP CONSTRAINT IF EXISTS pyramiding_state_pkey;
+ALTER TABLE pyramiding_state ADD PRIMARY KEY (strategy_id, instrument);
+
+-- capital_summary: one row per strategy (same columns as migration 014)
+DROP VIEW IF EXISTS capital_summary;
+
+CREATE VIEW capital_summary AS
+SELECT
+    strategy_id,
+    COUNT(*) FILTER (WHERE transaction_type = 'DEPOSIT') AS deposit_count,
+    COALESCE(SUM(amount) FILTER (WHERE transaction_type = 'DEPOSIT'), 0) AS total_deposits,
+    COUNT(*) FILTER (WHERE transaction_type = 'WITHDRAW') AS withdraw_count,
+    COALESCE(ABS(SUM(amount) FILTER (WHERE transaction_type = 'WITHDRAW')), 0) AS total_withdrawals,
+    COUNT(*) FILTER (WHERE transaction_type = 'TRADING_PNL') AS trading_pnl_count,
+    COALESCE(SUM(amount) FILTER (WHERE transaction_type = 'TRADING_PNL'), 0) AS total_trading_pnl,
+    COALESCE(SUM(amount), 0) AS net_capital_change,
+    MIN(created_at) AS first_transaction,
+    MAX(created_at) AS last_transaction
+FROM capital_transactions
+GROUP BY strategy_id;
+
+COMMENT ON COLUMN capital_transactions.strategy_id IS 'Strategy whose ledger this entry belongs to (1 = ITJ Trend Follow)';
+COMMENT ON COLUMN pyramiding_state.strategy_id IS 'Strategy owning this pyramiding state (1 = ITJ Trend Follow)';
+
+COMMIT;
@@ -13,13 +13,18 @@ Usage:
 
     # Live trading with manual capital (overrides database)
     python portfolio_manager.py live --api-key YOUR_KEY --capital 5000000
+
+    # Print a per-phase startup report (time, modules imported, thread)
+    python portfolio_manager.py live --api-key YOUR_KEY --db-config db_config.json --profile-startup
 """
+import time
+PROCESS_STARTED = time.perf_counter()  # Reference point for --profile-startup
+
 import sys
 import os
 import argparse
 import logging
 import threading
-import time
 import uuid
 from pathlib import Path
 from datetime import datetime, timedelta
@@ -27,7 +32,9 @@ from logging.handlers import RotatingFileHandler
 from collections import defaultdict
 from functools import wraps
 from typing import Tuple
-from flask_cors import CORS
+
+# Heavy dependencies (Flask, psycopg2, redis, APScheduler, telegram, pandas)
+# are imported inside the mode that needs them
 
 # Setup logging with rotation (10MB per file, 5 backups)
 error_handler = RotatingFileHandler('webhook_errors.log', maxBytes=10*1024*1024, backupCount=5)
@@ -94,15 +101,17 @@ response_cache = ResponseCache()
 class RolloverScheduler:
     """Background scheduler for daily rollover checks"""
 
-    def __init__(self, engine, check_interval_hours: float = 1.0):
+    def __init__(self, engine, check_interval_hours: float = 1.0, order_fence=None):
         """
         Initialize scheduler
 
         Args:
             engine: LiveTradingEngine instance
             check_interval_hours: How often to check for rollovers (default: 1 hour)
+            order_fence: OrderFence; each check runs in its own fencing scope
         """
         self.engine = engine
+        self.order_fence = order_fence
         self.check_interval = check_interval_hours * 3600  # Convert to seconds
         self._stop_event = threading.Event()
         self._thread: threading.Thread = None
@@ -126,6 +135,13 @@ class RolloverScheduler:
             self._thread.join(timeout=5)
         logger.info("Rollover scheduler stopped")
 
+    def _rollover(self, dry_run: bool):
+        """Rollover check under the fencing token held when it starts"""
+        if self.order_fence is None:
+            return self.engine.check_and_rollover_positions(dry_run=dry_run)
+        with self.order_fence.scope():
+            return self.engine.check_and_rollover_positions(dry_run=dry_run)
+
     def _run(self):
         """Background thread main loop"""
         while not self._stop_event.is_set():
@@ -144,7 +160,7 @@ class RolloverScheduler:
 
                         logger.info("Running scheduled rollover check...")
                         try:
-                            result = self.engine.check_and_rollover_positions(dry_run=False)
+                            result = self._rollover(dry_run=False)
                             self._last_check = now
 
                             if result.total_positions > 0:
@@ -169,7 +185,7 @@ class RolloverScheduler:
     def force_check(self) -> dict:
         """Force an immediate rollover check (for manual trigger)"""
         logger.info("Forcing immediate rollover check...")
-        result = self.engine.check_and_rollover_positions(dry_run=False)
+        result = self._rollover(dry_run=False)
         self._last_check = datetime.now()
         return {
             'timestamp': self._last_check.isoformat(),
@@ -182,7 +198,7 @@ class RolloverScheduler:
     def dry_run_check(self) -> dict:
         """Run rollover check in dry-run mode (no actual orders)"""
         logger.info("Running dry-run rollover check...")
-        result = self.engine.check_and_rollover_positions(dry_run=True)
+        result = self._rollover(dry_run=True)
         return {
             'timestamp': datetime.now().isoformat(),
             'dry_run': True,
@@ -192,6 +208,10 @@ class RolloverScheduler:
 
 def run_backtest(args):
     """Run portfolio backtest"""
+    from core.startup import StartupProfiler
+    profiler = StartupProfiler(started=PROCESS_STARTED)
+    profiler.mark('imports')
+
     from backtest.engine import PortfolioBacktestEngine
     from backtest.signal_loader import SignalLoader
 
@@ -200,6 +220,7 @@ def run_backtest(args):
     logger.info("=" * 60)
 
     # Load signals
+    profiler.mark('load_signals')
     loader = SignalLoader()
 
     gold_signals = []
@@ -220,8 +241,10 @@ def run_backtest(args):
         return 1
 
     # Run backtest
+    profiler.mark('backtest')
     engine = PortfolioBacktestEngine(initial_capital=args.capital)
     results = engine.run_backtest(all_signals)
+    profiler.finish()
 
     # Display results
     logger.info("=" * 60)
@@ -237,12 +260,31 @@ def run_backtest(args):
         logger.info(f"  {key}: {value}")
     logger.info("=" * 60)
 
+    if getattr(args, 'profile_startup', False):
+        profiler.log_report()
+
     return 0
 
 def run_live(args):
     """Run live trading"""
+    from core.startup import StartupProfiler, WarmupGate, EarlyBoundServer, run_concurrently
+
+    # Bind the webhook port before anything else; until the Flask app below
+    # is ready every request gets 503 {"status": "warming", "phase": ...}
+    profiler = StartupProfiler(started=PROCESS_STARTED)
+    profiler.mark('bind')
+    gate = WarmupGate(profiler)
+    try:
+        server = EarlyBoundServer('0.0.0.0', args.port, gate)
+    except OSError as e:
+        logger.error(f"FATAL: Cannot bind webhook port {args.port}: {e}")
+        return 1
+    server.start()
+
+    profiler.mark('imports')
     from live.engine import LiveTradingEngine
-    from flask import Flask, request, jsonify
+    from flask import Flask, request, jsonify, g
+    from flask_cors import CORS
     from psycopg2.extras import RealDictCursor
     from core.webhook_parser import (
         DuplicateDetector, validate_json_structure, parse_webhook_signal,
@@ -251,6 +293,8 @@ def run_live(args):
     )
     from core.models import Signal, EODMonitorSignal, MarketDataSignal
     from core.eod_scheduler import EODScheduler
+    from core.latency_metrics import get_latency_metrics, WEBHOOK_STAGE_LATENCY, WEBHOOK_REQUESTS
+    from core.tracing import init_tracing, trace_span
     import json
 
     logger.info("=" * 60)
@@ -270,30 +314,202 @@ def run_live(args):
         logger.info("🔇 Non-critical alerts → Auto-dismiss notification (15s)")
     logger.info("=" * 60)
 
-    # Initialize database manager if config provided
-    db_manager = None
-    if args.db_config:
-        try:
-            from core.db_state_manager import DatabaseStateManager
+    # Per-signal tracing (spans exported as JSON Lines, see scripts/trace_report.py)
+    if getattr(args, 'trace_file', None):
+        init_tracing(args.trace_file)
+
+    # Subsystems that don't depend on each other connect concurrently:
+    # PostgreSQL pool, broker (+ connection check), holiday calendar, Redis
+    def connect_database():
+        # Initialize database manager if config provided
+        db_manager = None
+        if args.db_config:
+            try:
+                from core.db_state_manager import DatabaseStateManager
+
+                with open(args.db_config, 'r') as f:
+                    db_config = json.load(f)
+
+                # Use 'local' or 'production' environment
+                env = getattr(args, 'db_env', 'local')
+                connection_config = db_config.get(env, db_config.get('local', {}))
+
+                if connection_config:
+                    db_manager = DatabaseStateManager(connection_config)
+                    logger.info(f"Database persistence enabled ({env} environment)")
+                else:
+                    logger.warning(f"Database config not found for environment '{env}', continuing without persistence")
+            except Exception as e:
+                logger.error(f"Failed to initialize database: {e}")
+                logger.warning("Continuing without database persistence")
+                db_manager = None
+        else:
+            logger.info("Database persistence disabled (no --db-config provided)")
+        return db_manager
 
-            with open(args.db_config, 'r') as f:
-                db_config = json.load(f)
+    def connect_broker():
+        # Initialize broker client using factory
+        try:
+            from brokers.factory import create_broker_client
 
-            # Use 'local' or 'production' environment
-            env = getattr(args, 'db_env', 'local')
-            connection_config = db_config.get(env, db_config.get('local', {}))
+            # Load OpenAlgo config if available
+            openalgo_config_path = Path(__file__).parent / 'openalgo_config.json'
+            broker_config = {}
 
-            if connection_config:
-                db_manager = DatabaseStateManager(connection_config)
-                logger.info(f"Database persistence enabled ({env} environment)")
+            if openalgo_config_path.exists():
+                logger.info(f"Loading OpenAlgo config from {openalgo_config_path}")
+                with open(openalgo_config_path, 'r') as f:
+                    broker_config = json.load(f)
             else:
-                logger.warning(f"Database config not found for environment '{env}', continuing without persistence")
+                logger.warning(f"OpenAlgo config not found at {openalgo_config_path}")
+                logger.warning("Using command-line arguments for broker configuration")
+                # Fallback to command-line args
+                broker_config = {
+                    'openalgo_url': 'http://127.0.0.1:5000',
+                    'openalgo_api_key': args.api_key,
+                    'broker': args.broker,
+                    'execution_mode': 'analyzer'  # Default to analyzer for safety
+                }
+
+            # Determine broker type: use 'openalgo' for real broker, 'mock' for testing
+            broker_type = 'openalgo' if args.broker in ['zerodha', 'dhan'] else 'mock'
+
+            # Override API key from command line if provided
+            if args.api_key:
+                broker_config['openalgo_api_key'] = args.api_key
+
+            execution_mode = broker_config.get('execution_mode', 'live')
+            logger.info(f"Creating broker client: type={broker_type}, broker={args.broker}, execution_mode={execution_mode}")
+            openalgo = create_broker_client(broker_type, broker_config)
+            logger.info("✓ Broker client initialized successfully")
+
+            # Prominent warning for analyzer mode
+            if execution_mode == 'analyzer':
+                logger.warning("=" * 70)
+                logger.warning("⚠️  ANALYZER MODE: Orders will be SIMULATED, not executed!")
+                logger.warning("⚠️  Change execution_mode to 'live' in openalgo_config.json for real trading")
+                logger.warning("=" * 70)
+
         except Exception as e:
-            logger.error(f"Failed to initialize database: {e}")
-            logger.warning("Continuing without database persistence")
-            db_manager = None
-    else:
-        logger.info("Database persistence disabled (no --db-config provided)")
+            logger.error(f"Failed to initialize broker client: {e}", exc_info=True)
+            logger.error("Falling back to mock client for testing")
+            # Fallback to mock client
+            class MockOpenAlgoClient:
+                def get_funds(self):
+                    return {'availablecash': initial_capital}
+
+                def get_quote(self, symbol):
+                    return {'ltp': 52000, 'bid': 51990, 'ask': 52010}
+
+                def place_order(self, symbol, action, quantity, order_type="MARKET", price=0.0):
+                    return {'status': 'success', 'orderid': f'MOCK_{symbol}_{action}'}
+
+                def get_order_status(self, order_id):
+                    return {'status': 'COMPLETE', 'price': 52000}
+
+                def modify_order(self, order_id, new_price):
+                    return {'status': 'success'}
+
+                def cancel_order(self, order_id):
+                    return {'status': 'success'}
+
+            openalgo = MockOpenAlgoClient()
+
+        # Connectivity check up front instead of on the first signal
+        if hasattr(openalgo, 'check_connection'):
+            try:
+                broker_check = openalgo.check_connection()
+                if broker_check.get('connected'):
+                    logger.info("✓ Broker connection verified")
+                else:
+                    logger.warning(f"Broker connection check failed: {broker_check.get('error')}")
+            except Exception as e:
+                logger.warning(f"Broker connection check failed: {e}")
+        return openalgo
+
+    def load_holiday_calendar():
+        # Initialize Holiday Calendar (needed by expiry calendar and symbol mapper)
+        holiday_calendar = None
+        try:
+            from core.holiday_calendar import init_holiday_calendar
+            holiday_calendar = init_holiday_calendar(data_dir='.taskmaster/data')
+
+            # Add known 2025 holidays
+            from datetime import date as dt_date
+            holiday_calendar.add_holiday(dt_date(2025, 12, 25), "NSE", "Christmas")
+            holiday_calendar.add_holiday(dt_date(2025, 12, 25), "MCX", "Christmas")
+
+            # Check if today is a holiday
+            today = dt_date.today()
+            nse_holiday, nse_reason = holiday_calendar.is_holiday(today, "NSE")
+            mcx_holiday, mcx_reason = holiday_calendar.is_holiday(today, "MCX")
+
+            if nse_holiday or mcx_holiday:
+                logger.warning(f"[PM] TODAY IS HOLIDAY - NSE: {nse_reason}, MCX: {mcx_reason}")
+
+            logger.info(f"Holiday calendar initialized ({holiday_calendar.get_status()['total_holidays']} holidays loaded)")
+        except Exception as e:
+            logger.warning(f"Failed to initialize holiday calendar: {e}")
+        return holiday_calendar
+
+    def connect_redis():
+        if not getattr(args, 'redis_config', None):
+            logger.info("Redis coordinator disabled (no --redis-config provided)")
+            return None, None
+        try:
+            from core.redis_coordinator import RedisCoordinator
+
+            with open(args.redis_config, 'r') as f:
+                redis_config = json.load(f)
+
+            # db_manager is attached once the database task has finished
+            return redis_config, RedisCoordinator(redis_config)
+        except Exception as e:
+            logger.warning(f"Failed to initialize Redis coordinator: {e}")
+            logger.warning("Continuing without leader election (single instance mode)")
+            return None, None
+
+    profiler.mark('connect')
+    connected = run_concurrently(profiler, {
+        'database': connect_database,
+        'broker': connect_broker,
+        'holiday_calendar': load_holiday_calendar,
+        'redis': connect_redis,
+    })
+    db_manager = connected['database']
+    openalgo = connected['broker']
+    holiday_calendar = connected['holiday_calendar']
+    redis_config, coordinator = connected['redis']
+
+    profiler.mark('state')
+
+    # Background writer for audit/execution-log tables (off the webhook path)
+    audit_writer = None
+    if db_manager and not getattr(args, 'sync_audit_writes', False):
+        try:
+            from core.async_db_writer import init_async_db_writer
+            audit_writer = init_async_db_writer(
+                db_manager,
+                wal_path=getattr(args, 'audit_wal', None) or 'logs/audit_wal.jsonl'
+            )
+        except Exception as e:
+            logger.error(f"Failed to start async audit writer, writing inline: {e}")
+            audit_writer = None
+
+    # In-memory signal/order aggregates for the Telegram bot, fed by the audit
+    # writers; warmed here before any signal is processed
+    if db_manager:
+        try:
+            from core.audit_read_model import init_audit_read_model
+            from core.signal_audit_service import SignalAuditService
+            from core.order_execution_logger import OrderExecutionLogger
+            init_audit_read_model().warm(SignalAuditService(db_manager), OrderExecutionLogger(db_manager))
+        except Exception as e:
+            logger.warning(f"Failed to warm audit read model, bot queries use SQL: {e}")
+
+    # Ring-buffer history of the Scout EOD_MONITOR / MARKET_DATA feeds
+    from core.scout_store import init_scout_store
+    scout_store = init_scout_store(store_dir=getattr(args, 'scout_store_dir', None))
 
     # Initialize Strategy Manager for multi-strategy P&L tracking
     strategy_manager = None
@@ -305,6 +521,33 @@ def run_live(args):
         except Exception as e:
             logger.warning(f"Failed to initialize strategy manager: {e}")
 
+    # Multi-engine hosting: extra strategy/account engines share this process
+    # and need the per-strategy state and ledger of migration 017
+    from core.engine_host import (
+        EngineHost, BrokerPool, QuoteCache, DEFAULT_TENANT, DEFAULT_STRATEGY_ID, load_tenants_config
+    )
+    tenants, tenant_accounts = [], {}
+    if getattr(args, 'tenants_config', None):
+        try:
+            tenants, tenant_accounts = load_tenants_config(args.tenants_config)
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"FATAL: Invalid tenants config {args.tenants_config}: {e}")
+            return 1
+    engine_db = db_manager
+    if tenants:
+        if not db_manager:
+            logger.error("FATAL: --tenants-config requires a database connection (--db-config)")
+            return 1
+        try:
+            scoped_schema = db_manager.has_strategy_scoped_schema()
+        except Exception as e:
+            logger.error(f"FATAL: Could not check the database schema for --tenants-config: {e}")
+            return 1
+        if not scoped_schema:
+            logger.error("FATAL: --tenants-config requires migration 017_strategy_scoped_state.sql")
+            return 1
+        engine_db = db_manager.for_strategy(DEFAULT_STRATEGY_ID)
+
     # Get capital from ledger (REQUIRED - no CLI override allowed)
     # The capital ledger is the single source of truth
     if not db_manager:
@@ -316,7 +559,7 @@ def run_live(args):
         sys.exit(1)
 
     try:
-        equity_data = db_manager.get_current_equity_from_ledger()
+        equity_data = engine_db.get_current_equity_from_ledger()
         initial_capital = equity_data['current_equity']
         logger.info(f"✓ Equity loaded from ledger: ₹{initial_capital:,.0f}")
         logger.info(f"  Deposits: ₹{equity_data['total_deposits']:,.0f}, "
@@ -329,95 +572,7 @@ def run_live(args):
         logger.error("=" * 70)
         sys.exit(1)
 
-    # Initialize broker client using factory
-    try:
-        from brokers.factory import create_broker_client
-
-        # Load OpenAlgo config if available
-        openalgo_config_path = Path(__file__).parent / 'openalgo_config.json'
-        broker_config = {}
-
-        if openalgo_config_path.exists():
-            logger.info(f"Loading OpenAlgo config from {openalgo_config_path}")
-            with open(openalgo_config_path, 'r') as f:
-                broker_config = json.load(f)
-        else:
-            logger.warning(f"OpenAlgo config not found at {openalgo_config_path}")
-            logger.warning("Using command-line arguments for broker configuration")
-            # Fallback to command-line args
-            broker_config = {
-                'openalgo_url': 'http://127.0.0.1:5000',
-                'openalgo_api_key': args.api_key,
-                'broker': args.broker,
-                'execution_mode': 'analyzer'  # Default to analyzer for safety
-            }
-
-        # Determine broker type: use 'openalgo' for real broker, 'mock' for testing
-        broker_type = 'openalgo' if args.broker in ['zerodha', 'dhan'] else 'mock'
-
-        # Override API key from command line if provided
-        if args.api_key:
-            broker_config['openalgo_api_key'] = args.api_key
-
-        execution_mode = broker_config.get('execution_mode', 'live')
-        logger.info(f"Creating broker client: type={broker_type}, broker={args.broker}, execution_mode={execution_mode}")
-        openalgo = create_broker_client(broker_type, broker_config)
-        logger.info("✓ Broker client initialized successfully")
-
-        # Prominent warning for analyzer mode
-        if execution_mode == 'analyzer':
-            logger.warning("=" * 70)
-            logger.warning("⚠️  ANALYZER MODE: Orders will be SIMULATED, not executed!")
-            logger.warning("⚠️  Change execution_mode to 'live' in openalgo_config.json for real trading")
-            logger.warning("=" * 70)
-
-    except Exception as e:
-        logger.error(f"Failed to initialize broker client: {e}", exc_info=True)
-        logger.error("Falling back to mock client for testing")
-        # Fallback to mock client
-        class MockOpenAlgoClient:
-            def get_funds(self):
-                return {'availablecash': initial_capital}
-
-            def get_quote(self, symbol):
-                return {'ltp': 52000, 'bid': 51990, 'ask': 52010}
-
-            def place_order(self, symbol, action, quantity, order_type="MARKET", price=0.0):
-                return {'status': 'success', 'orderid': f'MOCK_{symbol}_{action}'}
-
-            def get_order_status(self, order_id):
-                return {'status': 'COMPLETE', 'price': 52000}
-
-            def modify_order(self, order_id, new_price):
-                return {'status': 'success'}
-
-            def cancel_order(self, order_id):
-                return {'status': 'success'}
-
-        openalgo = MockOpenAlgoClient()
-
-    # Initialize Holiday Calendar (needed by expiry calendar and symbol mapper)
-    holiday_calendar = None
-    try:
-        from core.holiday_calendar import init_holiday_calendar
-        holiday_calendar = init_holiday_calendar(data_dir='.taskmaster/data')
-
-        # Add known 2025 holidays
-        from datetime import date as dt_date
-        holiday_calendar.add_holiday(dt_date(2025, 12, 25), "NSE", "Christmas")
-        holiday_calendar.add_holiday(dt_date(2025, 12, 25), "MCX", "Christmas")
-
-        # Check if today is a holiday
-        today = dt_date.today()
-        nse_holiday, nse_reason = holiday_calendar.is_holiday(today, "NSE")
-        mcx_holiday, mcx_reason = holiday_calendar.is_holiday(today, "MCX")
-
-        if nse_holiday or mcx_holiday:
-            logger.warning(f"[PM] TODAY IS HOLIDAY - NSE: {nse_reason}, MCX: {mcx_reason}")
-
-        logger.info(f"Holiday calendar initialized ({holiday_calendar.get_status()['total_holidays']} holidays loaded)")
-    except Exception as e:
-        logger.warning(f"Failed to initialize holiday calendar: {e}")
+    profiler.mark('engine')
 
     # Initialize Expiry Calendar with Holiday Calendar (needed by symbol mapper)
     expiry_calendar = None
@@ -441,16 +596,30 @@ def run_live(args):
     except Exception as e:
         logger.warning(f"Failed to initialize symbol mapper: {e}")
 
+    # Orders go through the fence; it starts enforcing once a fast-failover
+    # coordinator is attached below
+    from core.fencing import OrderFence, FencedBrokerClient
+    order_fence = OrderFence()
+
+    # Multi-engine hosting: the default engine then only sees strategy 1 and
+    # quotes go through one cache
+    engine_broker = openalgo
+    broker_pool = None
+    if tenants:
+        broker_pool = BrokerPool(QuoteCache(ttl_seconds=1.0))
+        engine_broker = broker_pool.add(None, openalgo)
+
     # Initialize live engine with database manager
     # NOTE: Must be after symbol mapper init for SyntheticFuturesExecutor to work
     engine = LiveTradingEngine(
         initial_capital=initial_capital,
-        openalgo_client=openalgo,
-        db_manager=db_manager,
+        openalgo_client=FencedBrokerClient(engine_broker, order_fence),
+        db_manager=engine_db,
         test_mode=args.test_mode,
         strategy_manager=strategy_manager
     )
 
+    profiler.mark('notifiers')
     # Initialize voice announcer for trade notifications
     voice_announcer = None
     try:
@@ -526,32 +695,59 @@ def run_live(args):
     duplicate_detector = DuplicateDetector(window_seconds=60)
     logger.info("Duplicate detector initialized (60s window)")
 
-    # Initialize Redis coordinator for leader election (if Redis config available)
-    coordinator = None
-    if hasattr(args, 'redis_config') and args.redis_config:
-        try:
-            from core.redis_coordinator import RedisCoordinator
-            import json
-
-            with open(args.redis_config, 'r') as f:
-                redis_config = json.load(f)
+    host = EngineHost(order_fence=order_fence)
+    host.add(DEFAULT_TENANT, DEFAULT_STRATEGY_ID, engine, duplicate_detector)
 
-            coordinator = RedisCoordinator(redis_config, db_manager=db_manager)
+    # Start Redis leader election (coordinator connected concurrently above)
+    profiler.mark('coordination')
+    state_replicator = None
+    replication_start_id = '0-0'
+    if coordinator:
+        try:
+            coordinator.attach_db_manager(db_manager)
+            if coordinator.fast_failover:
+                order_fence.attach(coordinator)
             coordinator.start_heartbeat()
             logger.info("Redis coordinator initialized - leader election enabled")
+
+            # Warm standby: replicate the leader's state changes via a Redis Stream
+            if redis_config.get('state_replication', False) and db_manager:
+                from core.state_replication import StateReplicator
+                state_replicator = StateReplicator(
+                    coordinator.redis_client,
+                    coordinator.instance_id,
+                    fencing_token=lambda: coordinator.fencing_token
+                )
+                # Read before crash recovery so no change after the DB snapshot is missed
+                replication_start_id = state_replicator.stream_tail()
         except Exception as e:
             logger.warning(f"Failed to initialize Redis coordinator: {e}")
             logger.warning("Continuing without leader election (single instance mode)")
             coordinator = None
-    else:
-        logger.info("Redis coordinator disabled (no --redis-config provided)")
 
+    # Daily partition maintenance for audit tables (future partitions, archive + drop)
+    # With Redis coordination only the leader runs it; standbys re-check leadership
+    partition_maintenance = None
+    if db_manager and not getattr(args, 'disable_partition_maintenance', False):
+        try:
+            from core.partition_maintenance import init_partition_maintenance
+            partition_maintenance = init_partition_maintenance(
+                db_manager,
+                archive_dir=getattr(args, 'archive_dir', None) or 'archive/partitions',
+                leader_check=(lambda: coordinator.is_leader) if coordinator else None
+            )
+            partition_maintenance.start_background_maintenance()
+        except Exception as e:
+            logger.warning(f"Failed to start partition maintenance: {e}")
+            partition_maintenance = None
+
+    profiler.mark('recovery')
     # Crash Recovery: Load state from database if available
     if db_manager:
         try:
             from live.recovery import CrashRecoveryManager
 
-            recovery_manager = CrashRecoveryManager(db_manager)
+            recovery_manager = CrashRecoveryManager(engine_db)
             success, error_code = recovery_manager.load_state(
                 portfolio_manager=engine.portfolio,
                 trading_engine=engine,
@@ -602,6 +798,49 @@ def run_live(args):
     else:
         logger.info("Crash recovery skipped (database persistence disabled)")
 
+    # Hosted tenants: own ledger, state and duplicate detector; a tenant that
+    # cannot start (no deposit, failed recovery) is skipped, not fatal
+    for tenant in tenants:
+        try:
+            from live.recovery import CrashRecoveryManager
+
+            tenant_db = db_manager.for_strategy(tenant.strategy_id)
+            tenant_equity = tenant_db.get_current_equity_from_ledger()['current_equity']
+            tenant_engine = LiveTradingEngine(
+                initial_capital=tenant_equity,
+                openalgo_client=FencedBrokerClient(
+                    broker_pool.get(tenant.account, tenant_accounts.get(tenant.account)), order_fence
+                ),
+                db_manager=tenant_db,
+                test_mode=args.test_mode if tenant.test_mode is None else tenant.test_mode,
+                strategy_manager=strategy_manager
+            )
+            tenant_engine.position_prefix = f"{tenant.name}:"
+            success, error_code = CrashRecoveryManager(tenant_db).load_state(
+                portfolio_manager=tenant_engine.portfolio,
+                trading_engine=tenant_engine,
+                coordinator=coordinator
+            )
+            if not success:
+                logger.critical(f"[HOST] Tenant '{tenant.name}' not started: recovery failed ({error_code})")
+                continue
+            host.add(tenant.name, tenant.strategy_id, tenant_engine, DuplicateDetector(window_seconds=60))
+            logger.info(f"[HOST] Tenant '{tenant.name}' started: equity ₹{tenant_equity:,.0f}, "
+                        f"{len(tenant_engine.portfolio.positions)} open positions")
+        except Exception as e:
+            logger.error(f"[HOST] Tenant '{tenant.name}' not started: {e}")
+
+    if state_replicator:
+        try:
+            state_replicator.attach(engine, db_manager, duplicate_detector)
+            state_replicator.start(replication_start_id)
+            coordinator.add_leadership_listener(state_replicator.on_leadership_change)
+            state_replicator.on_leadership_change(coordinator.is_leader)
+        except Exception as e:
+            logger.warning(f"Failed to start state replication: {e} - takeover will use full recovery")
+            state_replicator = None
+
+    profiler.mark('reconciliation')
     # Perform startup reconciliation AFTER crash recovery has loaded positions
     if broker_sync:
         try:
@@ -615,12 +854,35 @@ def run_live(args):
         except Exception as e:
             logger.warning(f"Failed to perform startup reconciliation: {e}")
 
+    # Correlation-aware VaR/ES over the open book, seeded from Scout MARKET_DATA history
+    risk_engine = None
+    try:
+        from core.risk_engine import init_risk_engine
+        from core.scout_store import FEED_MARKET_DATA
+        risk_engine = init_risk_engine(
+            window=engine.config.var_window_days, confidence=engine.config.var_confidence
+        )
+        history = {}
+        for instrument in scout_store.get_summary().get(FEED_MARKET_DATA, {}):
+            series = scout_store.query(FEED_MARKET_DATA, instrument, fields=['price'])
+            history[instrument] = list(zip(series['timestamp'], series['price']))
+        risk_engine.seed(history)
+        engine.portfolio.risk_engine = risk_engine
+        risk_engine.on_positions_changed(engine.portfolio)
+    except Exception as e:
+        logger.warning(f"Failed to start risk engine: {e}")
+
+    profiler.mark('schedulers')
+    # One set of schedulers; with hosted tenants the host fans each job out
+    scheduled_engine = host if len(host) > 1 else engine
+
     # Initialize rollover scheduler
     rollover_scheduler = None
     if not args.disable_rollover:
         rollover_scheduler = RolloverScheduler(
-            engine=engine,
-            check_interval_hours=1.0  # Check every hour
+            engine=scheduled_engine,
+            check_interval_hours=1.0,  # Check every hour
+            order_fence=order_fence
         )
         rollover_scheduler.start()
 
@@ -629,10 +891,11 @@ def run_live(args):
     if engine.config.eod_enabled and not getattr(args, 'disable_eod', False):
         try:
             eod_scheduler = EODScheduler(engine.config)
+            # Each phase places / modifies orders under the token held when it starts
             eod_scheduler.set_callbacks(
-                condition_check=engine.eod_condition_check,
-                execution=engine.eod_execute,
-                tracking=engine.eod_track
+                condition_check=order_fence.fenced(scheduled_engine.eod_condition_check),
+                execution=order_fence.fenced(scheduled_engine.eod_execute),
+                tracking=order_fence.fenced(scheduled_engine.eod_track)
             )
             eod_scheduler.start()
             logger.info("EOD pre-close scheduler started")
@@ -641,6 +904,7 @@ def run_live(args):
         except Exception as e:
             logger.error(f"Failed to start EOD scheduler: {e}")
 
+    profiler.mark('routes')
     # Setup Flask webhook receiver
     app = Flask(__name__)
 
@@ -685,15 +949,74 @@ def run_live(args):
         rate_limit_store[ip_address].append(now)
         return True, ""
 
+    def takeover_complete() -> bool:
+        """After promotion, block until replicated state is verified (or fully reloaded)"""
+        return state_replicator is None or state_replicator.ensure_promoted()
+
+    def takeover_incomplete_response(request_id: str):
+        webhook_logger.error(f"[{request_id}] Rejecting signal - leader takeover did not complete")
+        return jsonify({
+            'status': 'rejected',
+            'reason': 'takeover_incomplete',
+            'request_id': request_id
+        }), 503
+
     def generate_request_id() -> str:
         """Generate unique request ID for correlation"""
         return str(uuid.uuid4())[:8]  # Short ID for readability
 
+    # Per-stage latency histograms (served on GET /metrics)
+    latency_metrics = get_latency_metrics()
+
+    def record_stage(stage: str, started: float, instrument: str, signal_type: str):
+        """Record elapsed time since `started` (perf_counter) for a webhook stage"""
+        latency_metrics.observe(
+            WEBHOOK_STAGE_LATENCY,
+            (time.perf_counter() - started) * 1000.0,
+            stage=stage,
+            instrument=instrument or 'unknown',
+            signal_type=signal_type or 'unknown'
+        )
+
+    def timed_webhook(view):
+        """Record end-to-end webhook latency and request count by outcome"""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            g.request_id = generate_request_id()
+            g.metric_instrument = 'unknown'
+            g.metric_signal_type = 'unknown'
+            # An unhandled exception still counts as a (500) request
+            status_code = 500
+            try:
+                # Root span for per-signal tracing (no-op unless --trace-file is set)
+                with trace_span('webhook', trace_id=g.request_id) as root_span:
+                    response = view(*args, **kwargs)
+                    status_code = response[1] if isinstance(response, tuple) else 200
+                    root_span.set_attribute('instrument', g.metric_instrument)
+                    root_span.set_attribute('signal_type', g.metric_signal_type)
+                    root_span.set_attribute('http_status', status_code)
+                return response
+            finally:
+                record_stage('total', started, g.metric_instrument, g.metric_signal_type)
+                latency_metrics.inc(
+                    WEBHOOK_REQUESTS,
+                    instrument=g.metric_instrument,
+                    signal_type=g.metric_signal_type,
+                    http_status=str(status_code)
+                )
+        return wrapper
+
     @app.route('/webhook', methods=['POST'])
-    def webhook():
+    @app.route('/webhook/<tenant>', methods=['POST'])
+    @timed_webhook
+    def webhook(tenant=None):
         """
         Receive TradingView webhooks
 
+        Routed to a hosted engine by path (/webhook/<tenant>) or the payload's
+        "tenant" field; the default engine otherwise.
+
         6-Step Processing Pipeline:
         1. Receive JSON - Get request.json, validate not None
         2. Validate structure - Call validate_json_structure()
@@ -702,8 +1025,8 @@ def run_live(args):
         5. Process signal - Call engine.process_signal(signal)
         6. Return response - Appropriate HTTP status and JSON
         """
-        # Generate request ID for correlation
-        request_id = generate_request_id()
+        # Request ID for correlation (generated by timed_webhook, also the trace ID)
+        request_id = g.request_id
         client_ip = request.remote_addr or 'unknown'
 
         # Rate limiting check
@@ -730,6 +1053,7 @@ def run_live(args):
         # Step 1: Receive JSON
         # Handle case where Flask couldn't parse JSON (returns None)
         # Use force=True because TradingView webhooks may not set Content-Type header
+        parse_started = time.perf_counter()
         try:
             data = request.get_json(force=True)
             if data is None:
@@ -762,6 +1086,24 @@ def run_live(args):
 
         logger.info(f"[{request_id}] Webhook received: {data.get('type')} {data.get('position')} @ {data.get('price')}")
 
+        # Tenant's engine and duplicate detector (shadow the default ones below)
+        try:
+            hosted = host.resolve(tenant, data)
+        except ValueError as e:
+            webhook_logger.warning(f"[{request_id}] {e}")
+            return jsonify({
+                'status': 'error',
+                'error_type': 'validation_error',
+                'message': str(e),
+                'request_id': request_id
+            }), 404
+        engine, duplicate_detector = hosted.engine, hosted.duplicate_detector
+
+        metric_instrument = str(data.get('instrument') or 'unknown') if isinstance(data, dict) else 'unknown'
+        metric_signal_type = str(data.get('type') or 'unknown') if isinstance(data, dict) else 'unknown'
+        g.metric_instrument = metric_instrument
+        g.metric_signal_type = metric_signal_type
+
         try:
             # Check if this is an EOD_MONITOR signal (different processing path)
             if is_eod_monitor_signal(data):
@@ -769,6 +1111,7 @@ def run_live(args):
 
                 # Parse EOD signal
                 eod_signal, eod_error = parse_eod_monitor_signal(data)
+                record_stage('parse', parse_started, metric_instrument, metric_signal_type)
                 if eod_signal is None:
                     webhook_logger.warning(f"[{request_id}] EOD signal parsing failed: {eod_error}")
                     return jsonify({
@@ -777,6 +1120,7 @@ def run_live(args):
                         'message': eod_error,
                         'request_id': request_id
                     }), 400
+                scout_store.record_eod_monitor(eod_signal)
 
                 # Leadership check for EOD signals
                 if coordinator and not coordinator.is_leader:
@@ -788,9 +1132,18 @@ def run_live(args):
                         'reason': 'not_leader',
                         'request_id': request_id
                     }), 200
-
-                # Process EOD signal through engine
-                result = engine.process_eod_monitor_signal(eod_signal)
+                if not takeover_complete():
+                    return takeover_incomplete_response(request_id)
+
+                # Process EOD signal through the addressed engine, or (no tenant
+                # given) the default engine and every tenant holding the instrument
+                stage_started = time.perf_counter()
+                targets = host.eod_monitor_targets(tenant, data, eod_signal.instrument)
+                results = {t.name: t.engine.process_eod_monitor_signal(eod_signal) for t in targets}
+                result = results[targets[0].name]
+                if len(targets) > 1:
+                    result = dict(result, tenants=results)
+                record_stage('process_signal', stage_started, metric_instrument, metric_signal_type)
 
                 return jsonify({
                     'status': 'processed',
@@ -805,6 +1158,7 @@ def run_live(args):
 
                 # Parse MARKET_DATA signal
                 market_signal, market_error = parse_market_data_signal(data)
+                record_stage('parse', parse_started, metric_instrument, metric_signal_type)
                 if market_signal is None:
                     webhook_logger.warning(f"[{request_id}] MARKET_DATA parsing failed: {market_error}")
                     return jsonify({
@@ -813,6 +1167,7 @@ def run_live(args):
                         'message': market_error,
                         'request_id': request_id
                     }), 400
+                scout_store.record_market_data(market_signal)
 
                 # Leadership check for MARKET_DATA signals
                 if coordinator and not coordinator.is_leader:
@@ -822,9 +1177,14 @@ def run_live(args):
                         'reason': 'not_leader',
                         'request_id': request_id
                     }), 200
+                if not takeover_complete():
+                    return takeover_incomplete_response(request_id)
 
                 # Process MARKET_DATA signal through engine
-                result = engine.process_market_data_signal(market_signal)
+                stage_started = time.perf_counter()
+                with order_fence.scope():
+                    result = engine.process_market_data_signal(market_signal)
+                record_stage('process_signal', stage_started, metric_instrument, metric_signal_type)
 
                 return jsonify({
                     'status': 'processed',
@@ -857,8 +1217,14 @@ def run_live(args):
                 }), 400
 
             logger.info(f"[{request_id}] Signal parsed: {signal.signal_type.value} {signal.position} @ ₹{signal.price}")
+            metric_instrument = signal.instrument
+            metric_signal_type = signal.signal_type.value
+            g.metric_instrument = metric_instrument
+            g.metric_signal_type = metric_signal_type
+            record_stage('parse', parse_started, metric_instrument, metric_signal_type)
 
             # Step 3.5: Initial leadership check (CRITICAL for trading - prevents duplicate execution)
+            stage_started = time.perf_counter()
             if coordinator and not coordinator.is_leader:
                 webhook_logger.warning(
                     f"[{request_id}] Rejecting signal - not leader (instance: {coordinator.instance_id})"
@@ -869,9 +1235,16 @@ def run_live(args):
                     'message': f'Signal rejected: instance {coordinator.instance_id} is not the leader',
                     'request_id': request_id
                 }), 200
+            if not takeover_complete():
+                return takeover_incomplete_response(request_id)
+
+            record_stage('leadership', stage_started, metric_instrument, metric_signal_type)
 
             # Step 4: Check duplicates
-            if duplicate_detector.is_duplicate(signal):
+            stage_started = time.perf_counter()
+            is_duplicate = duplicate_detector.is_duplicate(signal)
+            record_stage('dedup', stage_started, metric_instrument, metric_signal_type)
+            if is_duplicate:
                 webhook_logger.warning(
                     f"[{request_id}] Duplicate signal ignored: {signal.signal_type.value} {signal.position} "
                     f"@ {signal.timestamp.isoformat()}"
@@ -902,6 +1275,7 @@ def run_live(args):
                 }), 200
 
             # Step 4.6: SAFETY CHECK - Trading pause, market hours, price sanity
+            stage_started = time.perf_counter()
             if safety_manager:
                 # Check if trading is paused (kill switch)
                 paused, pause_reason = safety_manager.is_trading_paused()
@@ -935,10 +1309,16 @@ def run_live(args):
                         'request_id': request_id
                     }), 200
 
+            record_stage('safety', stage_started, metric_instrument, metric_signal_type)
+
             # Step 5: Process signal (pass coordinator for additional verification)
-            result = engine.process_signal(signal, coordinator=coordinator)
+            stage_started = time.perf_counter()
+            with order_fence.scope():
+                result = engine.process_signal(signal, coordinator=coordinator)
+            record_stage('process_signal', stage_started, metric_instrument, metric_signal_type)
 
             # Step 5.5: Log signal to database (audit trail)
+            stage_started = time.perf_counter()
             if db_manager:
                 import hashlib
                 # Create fingerprint for deduplication
@@ -959,6 +1339,7 @@ def run_live(args):
 
                 instance_id = coordinator.instance_id if coordinator else 'standalone'
                 db_manager.log_signal(signal_data, fingerprint, instance_id, result.get('status', 'unknown'))
+                record_stage('db_log', stage_started, metric_instrument, metric_signal_type)
 
             # Step 6: Return response
             if result.get('status') == 'executed':
@@ -1033,6 +1414,39 @@ def run_live(args):
             }
         }), 200
 
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """
+        Prometheus/OpenMetrics scrape endpoint
+
+        Serves per-stage latency histograms and counters from the latency
+        registry (including Redis coordinator DB sync latency), plus the
+        existing signal validation metrics and coordinator counters.
+        """
+        lines = [latency_metrics.render_prometheus().rstrip('\n')]
+        lines.extend(engine.metrics.export_prometheus_format())
+
+        if coordinator:
+            # Counters only; DB sync latency is the pm_coordinator_db_sync_latency_ms
+            # histogram already rendered from the registry above
+            coordinator_counts = coordinator.metrics.get_counts()
+            for key in ('db_sync_success', 'db_sync_failure', 'leadership_changes'):
+                lines.append(f'# TYPE pm_coordinator_{key}_total counter')
+                lines.append(f'pm_coordinator_{key}_total {coordinator_counts[key]}')
+            lines.append('# TYPE pm_coordinator_is_leader gauge')
+            lines.append(f'pm_coordinator_is_leader {1 if coordinator.is_leader else 0}')
+
+        if audit_writer:
+            writer_stats = audit_writer.get_stats()
+            for key in ('submitted', 'written', 'dropped', 'batch_failures', 'rejected_backpressure'):
+                lines.append(f'# TYPE pm_async_db_writer_{key}_total counter')
+                lines.append(f'pm_async_db_writer_{key}_total {writer_stats[key]}')
+            lines.append('# TYPE pm_async_db_writer_pending gauge')
+            lines.append(f'pm_async_db_writer_pending {writer_stats["pending"]}')
+
+        body = '\n'.join(line for line in lines if line) + '\n'
+        return body, 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
     @app.route('/db/status', methods=['GET'])
     def db_status():
         """Get database connection status"""
@@ -1069,6 +1483,13 @@ def run_live(args):
 
     # ===== CAPITAL MANAGEMENT ENDPOINTS =====
 
+    def requested_tenant():
+        """Hosted engine named by ?tenant= (default tenant when absent); ValueError if unknown"""
+        return host.resolve(request.args.get('tenant'))
+
+    def unknown_tenant_response(error: ValueError):
+        return jsonify({'status': 'error', 'message': str(error)}), 404
+
     @app.route('/capital/inject', methods=['POST'])
     def capital_inject():
         """
@@ -1083,6 +1504,9 @@ def run_live(args):
             "admin_password": "REQUIRED - set via PM_ADMIN_PASSWORD env var"
         }
 
+        Query params:
+        - tenant: Hosted engine whose ledger to change (default: default tenant)
+
         Returns:
         {
             "status": "success",
@@ -1142,8 +1566,13 @@ def run_live(args):
                     'message': 'amount must be a positive number'
                 }), 400
 
+            try:
+                hosted = requested_tenant()
+            except ValueError as e:
+                return unknown_tenant_response(e)
+
             # Execute the capital transaction
-            result = db_manager.record_capital_change(
+            result = hosted.engine.db_manager.record_capital_change(
                 transaction_type=transaction_type.upper(),
                 amount=float(amount),
                 notes=notes,
@@ -1151,7 +1580,7 @@ def run_live(args):
             )
 
             # Reload equity in PortfolioStateManager
-            engine.portfolio.reload_equity_from_db()
+            hosted.engine.portfolio.reload_equity_from_db()
 
             return jsonify({
                 'status': 'success',
@@ -1184,6 +1613,7 @@ def run_live(args):
         Query params:
         - limit: Maximum number of transactions (default 50)
         - type: Filter by DEPOSIT or WITHDRAW
+        - tenant: Hosted engine (default: default tenant)
         """
         if not db_manager:
             return jsonify({
@@ -1194,8 +1624,12 @@ def run_live(args):
         try:
             limit = request.args.get('limit', 50, type=int)
             transaction_type = request.args.get('type')
+            try:
+                hosted = requested_tenant()
+            except ValueError as e:
+                return unknown_tenant_response(e)
 
-            transactions = db_manager.get_capital_transactions(
+            transactions = hosted.engine.db_manager.get_capital_transactions(
                 limit=limit,
                 transaction_type=transaction_type.upper() if transaction_type else None
             )
@@ -1223,7 +1657,7 @@ def run_live(args):
 
     @app.route('/capital/summary', methods=['GET'])
     def capital_summary():
-        """Get summary of all capital transactions"""
+        """Get summary of all capital transactions (?tenant= selects a hosted engine)"""
         if not db_manager:
             return jsonify({
                 'status': 'error',
@@ -1231,7 +1665,11 @@ def run_live(args):
             }), 400
 
         try:
-            summary = db_manager.get_capital_summary()
+            try:
+                hosted = requested_tenant()
+            except ValueError as e:
+                return unknown_tenant_response(e)
+            summary = hosted.engine.db_manager.get_capital_summary()
             return jsonify({
                 'status': 'success',
                 'summary': summary
@@ -1246,9 +1684,16 @@ def run_live(args):
 
     @app.route('/status', methods=['GET'])
     def status():
-        """Get current portfolio status with full details (cached for 2 seconds)"""
+        """Get current portfolio status with full details (cached for 2 seconds, ?tenant= selects a hosted engine)"""
+        try:
+            hosted = requested_tenant()
+        except ValueError as e:
+            return unknown_tenant_response(e)
+        engine = hosted.engine
+        cache_key = 'status' if hosted.name == DEFAULT_TENANT else f'status:{hosted.name}'
+
         # Check cache first - reduces load during frontend polling
-        cached = response_cache.get('status', max_age_seconds=2.0)
+        cached = response_cache.get(cache_key, max_age_seconds=2.0)
         if cached:
             return jsonify(cached), 200
 
@@ -1288,13 +1733,17 @@ def run_live(args):
         }
 
         # Cache the response
-        response_cache.set('status', response_data)
+        response_cache.set(cache_key, response_data)
         return jsonify(response_data), 200
 
     @app.route('/positions', methods=['GET'])
     def positions():
-        """Get all open positions"""
-        state = engine.portfolio.get_current_state()
+        """Get all open positions (?tenant= selects a hosted engine)"""
+        try:
+            hosted = requested_tenant()
+        except ValueError as e:
+            return unknown_tenant_response(e)
+        state = hosted.engine.portfolio.get_current_state()
         positions_data = {}
         for pos_id, pos in state.get_open_positions().items():
             positions_data[pos_id] = {
@@ -1833,7 +2282,8 @@ def run_live(args):
             return jsonify(result), 200
         else:
             # Rollover disabled, run directly
-            batch_result = engine.check_and_rollover_positions(dry_run=dry_run)
+            with order_fence.scope():
+                batch_result = engine.check_and_rollover_positions(dry_run=dry_run)
             return jsonify({
                 'timestamp': datetime.now().isoformat(),
                 'dry_run': dry_run,
@@ -1858,6 +2308,88 @@ def run_live(args):
             'engine': engine_status
         }), 200
 
+    @app.route('/ha/replication', methods=['GET'])
+    def ha_replication_status():
+        """Warm-standby replication status (role, stream position, last takeover)"""
+        if not state_replicator:
+            return jsonify({'enabled': False}), 200
+        return jsonify(dict(state_replicator.get_status(), enabled=True)), 200
+
+    @app.route('/scout/series/<feed>/<instrument>', methods=['GET'])
+    def scout_series(feed, instrument):
+        """
+        Scout feed history for an instrument
+
+        Query params: start, end (epoch seconds), fields (comma-separated),
+        points (downsample to at most this many samples)
+        """
+        fields = request.args.get('fields')
+        try:
+            series = scout_store.query(
+                feed, instrument,
+                start=request.args.get('start', type=float),
+                end=request.args.get('end', type=float),
+                fields=fields.split(',') if fields else None,
+                points=request.args.get('points', 0, type=int)
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'feed': feed, 'instrument': instrument, 'series': series}), 200
+
+    @app.route('/scout/stats', methods=['GET'])
+    def scout_stats():
+        """Gap and arrival-delay statistics for every Scout feed"""
+        threshold = request.args.get('gap_threshold', type=float)
+        stats = []
+        for feed, instruments in scout_store.get_summary().items():
+            for instrument in instruments:
+                stats.append(scout_store.gap_stats(feed, instrument, threshold))
+        return jsonify({'feeds': stats}), 200
+
+    @app.route('/sizing/batch', methods=['POST'])
+    def sizing_batch():
+        """
+        What-if Tom Basso sizing for many rows in one call
+
+        Body: {"instrument": "BANK_NIFTY", "mode": "base" | "pyramid" | "peel_off",
+               "inputs": {"price": 52000, "stop": [51800, 51600, ...], ...}}
+        Scalars broadcast against lists; equity defaults to the live equity high.
+        """
+        from core.batch_sizer import MODE_BASE, what_if
+
+        data = request.get_json(silent=True) or {}
+        try:
+            result = what_if(
+                data.get('instrument', ''),
+                data.get('mode', MODE_BASE),
+                data.get('inputs') or {},
+                equity=engine.portfolio.equity_high,
+                test_mode=args.test_mode
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify(result), 200
+
+    @app.route('/risk', methods=['GET'])
+    def portfolio_risk():
+        """Latest VaR/ES, stress P&L and correlations of the open book (?refresh=1 recomputes)"""
+        if not risk_engine:
+            return jsonify({'enabled': False}), 200
+        snapshot = risk_engine.get_snapshot()
+        if snapshot is None or request.args.get('refresh'):
+            snapshot = risk_engine.refresh()
+        return jsonify(dict(snapshot.to_dict(), enabled=True,
+                            var_limit_percent=engine.config.max_portfolio_var_percent)), 200
+
+    @app.route('/tenants', methods=['GET'])
+    def hosted_tenants():
+        """Engines hosted in this process (default + --tenants-config)"""
+        return jsonify({
+            'tenants': host.get_status(),
+            'broker_accounts': [a or DEFAULT_TENANT for a in broker_pool.accounts] if broker_pool else [DEFAULT_TENANT],
+            'quote_cache': broker_pool.quote_cache.get_stats() if broker_pool else None
+        }), 200
+
     @app.route('/health', methods=['GET'])
     def health():
         """Health check endpoint with real service statuses"""
@@ -3439,6 +3971,7 @@ def run_live(args):
     logger.info("Endpoints:")
     logger.info("  POST /webhook          - TradingView webhook receiver")
     logger.info("  GET  /webhook/stats    - Webhook processing statistics")
+    logger.info("  GET  /metrics          - Prometheus metrics (stage latency histograms)")
     logger.info("  GET  /status           - Portfolio status")
     logger.info("  GET  /positions        - Open positions")
     logger.info("  GET  /signals          - Signal history (from database)")
@@ -3476,12 +4009,16 @@ def run_live(args):
     logger.info("  GET  /strategies/{id}/trades - Trade history for strategy")
     logger.info("  PUT  /positions/{id}/strategy - Reassign position to strategy")
     logger.info("=" * 60)
-    logger.info(f"Starting webhook server on port {args.port}...")
+    # The port has been listening since startup (threaded server, so webhook
+    # signals aren't blocked by dashboard polling); hand it the real app now
+    gate.ready(app)
+    ready_at = profiler.finish()
+    logger.info(f"Webhook server ready on port {args.port} ({ready_at:.2f}s after process start)")
+    if getattr(args, 'profile_startup', False):
+        profiler.log_report()
 
     try:
-        # Enable threading for concurrent request handling
-        # This ensures webhook signals aren't blocked by dashboard polling
-        app.run(host='0.0.0.0', port=args.port, threaded=True)
+        server.wait()
     finally:
         # Graceful shutdown
         logger.info("Shutting down...")
@@ -3502,6 +4039,19 @@ def run_live(args):
             eod_scheduler.shutdown()
             logger.info("EOD scheduler stopped")
 
+        if partition_maintenance:
+            partition_maintenance.stop_background_maintenance()
+
+        if audit_writer:
+            audit_writer.stop()
+            logger.info("Async audit writer flushed and stopped")
+
+        if state_replicator:
+            state_replicator.stop()
+            logger.info("State replication stopped")
+
+        scout_store.flush()
+
     return 0
 
 def main():
@@ -3518,6 +4068,8 @@ def main():
     backtest_parser.add_argument('--bn', type=str, help='Bank Nifty signals CSV path')
     backtest_parser.add_argument('--capital', type=float, default=5000000.0,
                                 help='Initial capital (default: 50L)')
+    backtest_parser.add_argument('--profile-startup', action='store_true',
+                                help='Log a per-phase timing report (imports, signal loading, backtest)')
 
     # Live mode
     live_parser = subparsers.add_parser('live', help='Run live trading')
@@ -3541,6 +4093,22 @@ def main():
                             help='Webhook server port (default: 5002)')
     live_parser.add_argument('--test-mode', action='store_true',
                             help='Test mode: place 1 lot only, log actual calculated lots. Positions marked as test.')
+    live_parser.add_argument('--trace-file', type=str,
+                            help='Enable per-signal tracing and append spans to this JSON Lines file')
+    live_parser.add_argument('--sync-audit-writes', action='store_true',
+                            help='Write signal_audit/order_execution_log/signal_log rows inline instead of via the background writer')
+    live_parser.add_argument('--audit-wal', type=str,
+                            help='Write-ahead file for queued audit writes (default: logs/audit_wal.jsonl)')
+    live_parser.add_argument('--archive-dir', type=str,
+                            help='Directory for Parquet archives of expired audit partitions (default: archive/partitions)')
+    live_parser.add_argument('--scout-store-dir', type=str,
+                            help='Persist Scout feed ring buffers as memory-mapped files in this directory')
+    live_parser.add_argument('--tenants-config', type=str,
+                            help='Host extra strategy/account engines in this process (see core/engine_host.py)')
+    live_parser.add_argument('--disable-partition-maintenance', action='store_true',
+                            help='Do not run the daily audit partition maintenance job')
+    live_parser.add_argument('--profile-startup', action='store_true',
+                            help='Log a per-phase startup report (wall time, modules imported, thread) once the webhook server is ready')
     live_parser.add_argument('--silent', action='store_true',
                             help='Silent mode: disable voice announcements, use visual alerts only. Critical errors show dialog, non-critical show auto-dismiss notifications.')
 
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Bulk-load historical positions, trades or capital transactions.
+
+Streams CSV/Parquet files through COPY into staging tables, merges them on
+natural keys (re-running the same file changes nothing) and rebuilds the
+equity ledger in one pass. See core/bulk_import.py for columns and keys.
+
+Usage:
+    python scripts/bulk_import.py --db-config database_config.json capital deposits.csv
+    python scripts/bulk_import.py --db-config database_config.json trades trades_2019_2025.parquet --ledger-from-trades
+    python scripts/bulk_import.py --db-config database_config.json positions positions.csv --strategy-id 3 --dry-run
+    python scripts/bulk_import.py --db-config database_config.json --rebuild-ledger-only --strategy-id 1
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.bulk_import import DATASETS, BulkLoader
+from core.db_state_manager import DatabaseStateManager
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Bulk historical import (COPY + set-based merge)')
+    parser.add_argument('dataset', nargs='?', choices=sorted(DATASETS), help='Target dataset')
+    parser.add_argument('files', nargs='*', help='CSV or Parquet files, imported in order')
+    parser.add_argument('--db-config', type=str, required=True, help='Path to database config JSON file')
+    parser.add_argument('--db-env', type=str, default='local', choices=['local', 'production'],
+                        help='Database environment (default: local)')
+    parser.add_argument('--strategy-id', type=int, default=1,
+                        help='Strategy for rows without a strategy_id column (default: 1)')
+    parser.add_argument('--ledger-from-trades', action='store_true',
+                        help='Add missing TRADING_PNL ledger entries for imported trades')
+    parser.add_argument('--no-ledger-rebuild', action='store_true',
+                        help='Do not recompute equity_before/after and portfolio_state')
+    parser.add_argument('--rebuild-ledger-only', action='store_true',
+                        help='Only rebuild the ledger of --strategy-id (no import)')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would change, then roll back')
+    args = parser.parse_args()
+
+    if not args.rebuild_ledger_only and (not args.dataset or not args.files):
+        parser.error('dataset and at least one file are required (or --rebuild-ledger-only)')
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+    with open(args.db_config, 'r') as f:
+        db_config = json.load(f)
+    connection_config = db_config.get(args.db_env, db_config.get('local', {}))
+
+    loader = BulkLoader(DatabaseStateManager(connection_config))
+
+    if args.rebuild_ledger_only:
+        changed = loader.rebuild_ledger([args.strategy_id], dry_run=args.dry_run)
+        print(f"Ledger rebuilt for strategy {args.strategy_id}: {changed} rows changed"
+              f"{' (dry run)' if args.dry_run else ''}")
+        return 0
+
+    for path in args.files:
+        try:
+            report = loader.load(
+                args.dataset, path,
+                strategy_id=args.strategy_id,
+                rebuild_ledger=not args.no_ledger_rebuild,
+                trades_to_ledger=args.ledger_from_trades,
+                dry_run=args.dry_run
+            )
+        except (OSError, RuntimeError, ValueError) as e:
+            print(f"{path}: FAILED - {e}")
+            return 1
+
+        print(f"{path}{' (dry run)' if report.dry_run else ''}")
+        print(f"  rows read       {report.rows_read:>10,}  ({report.rows_distinct:,} distinct keys)")
+        print(f"  inserted        {report.inserted:>10,}")
+        print(f"  updated         {report.updated:>10,}")
+        print(f"  unchanged       {report.unchanged:>10,}")
+        if report.ledger_entries_added:
+            print(f"  ledger entries  {report.ledger_entries_added:>10,}")
+        if report.ledger_rows_rebuilt:
+            print(f"  ledger rebuilt  {report.ledger_rows_rebuilt:>10,}  (strategies {report.strategies})")
+        print(f"  copy {report.copy_seconds:.2f}s, merge {report.merge_seconds:.2f}s, "
+              f"ledger {report.ledger_seconds:.2f}s, total {report.total_seconds:.2f}s "
+              f"= {report.rows_per_second:,.0f} rows/s")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Chaos benchmark: time-to-new-leader for RedisCoordinator failover.
+
+Runs N coordinator processes against a real Redis, repeatedly removes the
+current leader and measures how long it takes until another instance
+reports leadership. The removed instance is restarted as a follower.
+
+Failure modes:
+    crash    SIGKILL the leader process (lease must expire)
+    release  SIGTERM the leader; it releases the lease on the way out
+
+Usage:
+    python scripts/ha_failover_benchmark.py --rounds 20
+    python scripts/ha_failover_benchmark.py --mode release --classic
+    python scripts/ha_failover_benchmark.py --redis-config redis_config.json --env local
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import signal
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import redis
+
+
+def run_instance(redis_config: dict, events, stop_on_term: bool):
+    """Worker process: run a coordinator and report leadership changes"""
+    from core.redis_coordinator import RedisCoordinator
+
+    coordinator = RedisCoordinator(redis_config)
+
+    def on_term(signum, frame):
+        coordinator.stop_heartbeat(timeout=2.0)
+        os._exit(0)
+
+    if stop_on_term:
+        signal.signal(signal.SIGTERM, on_term)
+
+    coordinator.start_heartbeat()
+    was_leader = False
+    while True:
+        is_leader = coordinator.is_leader
+        if is_leader and not was_leader:
+            events.put((os.getpid(), time.time()))
+        was_leader = is_leader
+        time.sleep(0.002)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='HA failover chaos benchmark (requires Redis)')
+    parser.add_argument('--redis-config', type=str, help='Redis config JSON (default: localhost:6379)')
+    parser.add_argument('--env', type=str, help='Section of the config file to use (e.g. local)')
+    parser.add_argument('--instances', type=int, default=3, help='Coordinator processes (default: 3)')
+    parser.add_argument('--rounds', type=int, default=10, help='Leader removals to measure (default: 10)')
+    parser.add_argument('--mode', choices=('crash', 'release'), default='crash')
+    parser.add_argument('--classic', action='store_true', help='Disable fast failover (polling baseline)')
+    parser.add_argument('--timeout', type=float, default=30.0, help='Max seconds to wait for a new leader')
+    args = parser.parse_args()
+
+    redis_config = {'host': 'localhost', 'port': 6379, 'db': 0, 'enable_redis': True}
+    if args.redis_config:
+        with open(args.redis_config) as f:
+            loaded = json.load(f)
+        redis_config = loaded[args.env] if args.env else loaded
+    redis_config = dict(redis_config, fast_failover=not args.classic)
+
+    client = redis.Redis(
+        host=redis_config.get('host', 'localhost'), port=redis_config.get('port', 6379),
+        db=redis_config.get('db', 0), password=redis_config.get('password')
+    )
+    try:
+        client.ping()
+    except redis.RedisError as e:
+        print(f"Redis not reachable: {e}")
+        return 1
+    client.delete('pm:leader')
+
+    events = mp.Queue()
+    stop_on_term = args.mode == 'release'
+    processes = {}
+
+    def spawn():
+        proc = mp.Process(target=run_instance, args=(redis_config, events, stop_on_term), daemon=True)
+        proc.start()
+        processes[proc.pid] = proc
+
+    for _ in range(args.instances):
+        spawn()
+
+    leader_pid, _ = events.get(timeout=args.timeout)
+    samples = []
+    try:
+        for round_no in range(1, args.rounds + 1):
+            # Let the cluster settle so the leader has renewed at least once
+            time.sleep(1.0)
+            while not events.empty():
+                leader_pid, _ = events.get_nowait()
+
+            removed_at = time.time()
+            os.kill(leader_pid, signal.SIGKILL if args.mode == 'crash' else signal.SIGTERM)
+            processes.pop(leader_pid).join(timeout=5)
+
+            new_pid, acquired_at = events.get(timeout=args.timeout)
+            samples.append((acquired_at - removed_at) * 1000)
+            print(f"round {round_no:3d}: {leader_pid} -> {new_pid} in {samples[-1]:8.1f} ms")
+            leader_pid = new_pid
+            spawn()
+    finally:
+        for proc in processes.values():
+            proc.kill()
+
+    mode = 'classic' if args.classic else 'fast'
+    print(f"\n{mode} failover, {args.mode} mode, {len(samples)} rounds")
+    print(f"  p50 {statistics.median(samples):8.1f} ms")
+    print(f"  p95 {percentile(samples, 95):8.1f} ms")
+    print(f"  max {max(samples):8.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Create future audit partitions and archive/drop expired ones.
+
+Runs the same pass as the daily background job started by
+`portfolio_manager.py live`; use it from cron when PM is not running, or
+with --dry-run to preview.
+
+Usage:
+    python scripts/partition_maintenance.py --db-config database_config.json
+    python scripts/partition_maintenance.py --db-config database_config.json --dry-run
+    python scripts/partition_maintenance.py --db-config database_config.json --archive-dir /data/pm_archive
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.db_state_manager import DatabaseStateManager
+from core.partition_maintenance import PartitionMaintenance
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Audit table partition maintenance')
+    parser.add_argument('--db-config', type=str, required=True, help='Path to database config JSON file')
+    parser.add_argument('--db-env', type=str, default='local', choices=['local', 'production'],
+                        help='Database environment (default: local)')
+    parser.add_argument('--archive-dir', type=str, default='archive/partitions',
+                        help='Directory for Parquet archives (default: archive/partitions)')
+    parser.add_argument('--months-ahead', type=int, default=3, help='Future partitions to create (default: 3)')
+    parser.add_argument('--dry-run', action='store_true', help='Show what would change without changing it')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+    with open(args.db_config, 'r') as f:
+        db_config = json.load(f)
+    connection_config = db_config.get(args.db_env, db_config.get('local', {}))
+
+    db_manager = DatabaseStateManager(connection_config)
+    maintenance = PartitionMaintenance(
+        db_manager,
+        archive_dir=args.archive_dir,
+        months_ahead=args.months_ahead
+    )
+
+    results = maintenance.run(dry_run=args.dry_run)
+
+    failed = False
+    for result in results:
+        status = result['skipped'] or 'ok'
+        print(f"{result['table']:<36} {status}")
+        for name in result['created']:
+            print(f"  + {name}")
+        for name in result['dropped']:
+            print(f"  - {name}")
+        for path in result['archived']:
+            print(f"    archived -> {path}")
+        if status.startswith('error'):
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Print a flame-style breakdown of the slowest signals from a trace file.
+
+Reads the JSON Lines file written by `portfolio_manager.py live --trace-file`.
+
+Usage:
+    python scripts/trace_report.py logs/traces.jsonl
+    python scripts/trace_report.py logs/traces.jsonl --top 5 --date 2025-12-31
+    python scripts/trace_report.py logs/traces.jsonl --signal-type PYRAMID --all-days
+"""
+
+import argparse
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.tracing import load_traces, format_trace_tree
+
+
+def trace_date(trace: dict) -> date:
+    """Local calendar date the trace started on."""
+    return datetime.fromtimestamp(trace.get('startTimeUnixNano', 0) / 1e9).date()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Slowest-signal breakdown from PM trace file')
+    parser.add_argument('trace_file', help='Path to JSON Lines trace file')
+    parser.add_argument('--top', type=int, default=10, help='Number of slowest signals to show (default: 10)')
+    parser.add_argument('--date', type=str, help='Day to report (YYYY-MM-DD, default: today)')
+    parser.add_argument('--all-days', action='store_true', help='Ignore --date and report across the whole file')
+    parser.add_argument('--signal-type', type=str, help='Only include this signal type (e.g. PYRAMID)')
+    parser.add_argument('--instrument', type=str, help='Only include this instrument (e.g. GOLD_MINI)')
+    args = parser.parse_args()
+
+    if not Path(args.trace_file).exists():
+        print(f"Trace file not found: {args.trace_file}")
+        return 1
+
+    traces = load_traces(args.trace_file)
+
+    if not args.all_days:
+        day = datetime.strptime(args.date, '%Y-%m-%d').date() if args.date else date.today()
+        traces = [t for t in traces if trace_date(t) == day]
+    if args.signal_type:
+        traces = [t for t in traces if t.get('attributes', {}).get('signal_type') == args.signal_type]
+    if args.instrument:
+        traces = [t for t in traces if t.get('attributes', {}).get('instrument') == args.instrument]
+
+    if not traces:
+        print("No matching traces.")
+        return 0
+
+    slowest = sorted(traces, key=lambda t: t.get('durationMs', 0.0), reverse=True)[:args.top]
+
+    print(f"{len(traces)} traces, showing slowest {len(slowest)}")
+    for trace in slowest:
+        attrs = trace.get('attributes', {})
+        started = datetime.fromtimestamp(trace.get('startTimeUnixNano', 0) / 1e9)
+        print()
+        print("=" * 80)
+        print(
+            f"[{trace['traceId']}] {started:%Y-%m-%d %H:%M:%S} "
+            f"{attrs.get('signal_type', '?')} {attrs.get('instrument', '?')} "
+            f"HTTP {attrs.get('http_status', '?')} - {trace.get('durationMs', 0.0):.1f}ms"
+        )
+        print("-" * 80)
+        for line in format_trace_tree(trace):
+            print(line)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
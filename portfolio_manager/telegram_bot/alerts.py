@@ -8,12 +8,28 @@ Sends real-time alerts to Telegram for:
 - Heartbeat status
 
 Non-blocking design using asyncio queues.
+
+Delivery:
+- Critical alerts (order failed, system error) go out immediately on a
+  priority lane
+- Everything else is coalesced over a short window into one digest message
+  per chat, so a multi-position exit or a rollover batch is one send
+- A token bucket paces sends; when it is empty the publisher waits for a
+  token (alerts keep queueing and land in the next digest) instead of
+  dropping them
+- Alerts that cannot be queued or delivered (queue full, Telegram down,
+  shutdown with a backlog) go to a JSON Lines spill file and are re-queued
+  when the publisher is idle or restarts
 """
 
+import json
 import logging
 import asyncio
+import itertools
+import os
+import time
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
@@ -21,6 +37,17 @@ import httpx
 
 logger = logging.getLogger(__name__)
 
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+
+# Queue lanes (lower sorts first in the PriorityQueue)
+PRIORITY_LANE = 0
+BATCH_LANE = 1
+
+# Send outcomes
+SEND_OK = 'sent'
+SEND_RETRY = 'retry'    # Network error, 429 or 5xx - keep the alerts
+SEND_FAILED = 'failed'  # Rejected by Telegram (e.g. bad request) - drop
+
 
 class AlertType(Enum):
     """Alert type classification."""
@@ -36,6 +63,10 @@ class AlertType(Enum):
     HEARTBEAT = "heartbeat"
 
 
+# Alert types that bypass coalescing
+PRIORITY_ALERT_TYPES = frozenset({AlertType.ORDER_FAILED, AlertType.SYSTEM_ERROR})
+
+
 @dataclass
 class Alert:
     """Alert data structure."""
@@ -45,11 +76,87 @@ class Alert:
     data: Optional[Dict[str, Any]] = None
     timestamp: Optional[datetime] = None
     priority: int = 0  # Higher = more important
+    chat_id: Optional[str] = None  # None = publisher's default chat
 
     def __post_init__(self):
         if self.timestamp is None:
             self.timestamp = datetime.now()
 
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe dict (spill file)"""
+        return {
+            'alert_type': self.alert_type.value,
+            'title': self.title,
+            'message': self.message,
+            'data': self.data,
+            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
+            'priority': self.priority,
+            'chat_id': self.chat_id
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Alert":
+        timestamp = data.get('timestamp')
+        return cls(
+            alert_type=AlertType(data['alert_type']),
+            title=data['title'],
+            message=data['message'],
+            data=data.get('data'),
+            timestamp=datetime.fromisoformat(timestamp) if timestamp else None,
+            priority=data.get('priority', 0),
+            chat_id=data.get('chat_id')
+        )
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+
+    acquire() waits until a token is available instead of failing, so
+    bursts are delayed rather than dropped.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: int):
+        self.rate = rate_per_minute / 60.0  # Tokens per second
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self) -> float:
+        """Seconds until a token is available (0 = now)"""
+        now = time.monotonic()
+        self._refill(now)
+        wait = max(0.0, self._paused_until - now)
+        if self._tokens < 1:
+            wait = max(wait, (1 - self._tokens) / self.rate if self.rate > 0 else float('inf'))
+        return wait
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available now"""
+        if self.delay() > 0:
+            return False
+        self._tokens -= 1
+        return True
+
+    async def acquire(self) -> float:
+        """Wait for a token; returns seconds waited"""
+        waited = 0.0
+        while not self.try_acquire():
+            wait = self.delay()
+            await asyncio.sleep(wait)
+            waited += wait
+        return waited
+
+    def pause(self, seconds: float):
+        """Server asked us to back off (429 retry_after)"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
 
 class TelegramAlertPublisher:
     """
@@ -64,7 +171,10 @@ class TelegramAlertPublisher:
         chat_id: str,
         enabled: bool = True,
         queue_size: int = 100,
-        rate_limit_per_minute: int = 20
+        rate_limit_per_minute: int = 20,
+        batch_window_seconds: float = 2.0,
+        burst: int = 3,
+        spill_path: Optional[str] = None
     ):
         """
         Initialize alert publisher.
@@ -74,19 +184,41 @@ class TelegramAlertPublisher:
             chat_id: Telegram chat ID to send alerts to
             enabled: Whether alerts are enabled
             queue_size: Maximum queue size
-            rate_limit_per_minute: Max alerts per minute
+            rate_limit_per_minute: Sustained messages per minute (token refill rate)
+            batch_window_seconds: How long to collect non-critical alerts into
+                one digest (0 = send each alert on its own)
+            burst: Messages that may be sent back-to-back before pacing starts
+            spill_path: JSON Lines file for alerts that could not be queued or
+                delivered (None = drop them, as before)
         """
         self.bot_token = bot_token
         self.chat_id = chat_id
         self.enabled = enabled
         self.rate_limit = rate_limit_per_minute
+        self.batch_window = batch_window_seconds
+        self.spill_path = spill_path
 
-        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        # Items are (lane, sequence, alert): priority lane first, FIFO within a lane
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue(maxsize=queue_size)
+        self._sequence = itertools.count()
+        self._bucket = TokenBucket(rate_limit_per_minute, burst)
         self._running = False
         self._task: Optional[asyncio.Task] = None
-        self._sent_count = 0
-        self._last_rate_reset = datetime.now()
         self._http_client: Optional[httpx.AsyncClient] = None
+        self._inflight: List[Alert] = []
+
+        self.stats = {
+            'queued': 0,
+            'messages_sent': 0,
+            'alerts_sent': 0,
+            'alerts_coalesced': 0,
+            'priority_sent': 0,
+            'rate_limit_wait_seconds': 0.0,
+            'spilled': 0,
+            'restored': 0,
+            'dropped': 0,
+            'send_failures': 0
+        }
 
         # Alert type emoji mapping
         self._emoji_map = {
@@ -104,13 +236,28 @@ class TelegramAlertPublisher:
 
         logger.info(f"[TelegramAlerts] Publisher initialized, enabled={enabled}")
 
+    def _create_http_client(self) -> httpx.AsyncClient:
+        """Keep-alive client; HTTP/2 when the h2 package (httpx[http2]) is installed"""
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+        logger.info(f"[TelegramAlerts] HTTP client: {'HTTP/2' if http2 else 'HTTP/1.1 keep-alive'}")
+        return httpx.AsyncClient(
+            timeout=30.0,
+            http2=http2,
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=2, keepalive_expiry=300.0)
+        )
+
     async def start(self):
         """Start the alert publisher background task."""
         if self._running:
             return
 
-        self._http_client = httpx.AsyncClient(timeout=30.0)
+        self._http_client = self._create_http_client()
         self._running = True
+        self._restore_spill()
         self._task = asyncio.create_task(self._process_queue())
         logger.info("[TelegramAlerts] Publisher started")
 
@@ -129,6 +276,14 @@ class TelegramAlertPublisher:
             except asyncio.CancelledError:
                 pass
 
+        # Keep the backlog for the next start
+        backlog = list(self._inflight)
+        self._inflight = []
+        while not self._queue.empty():
+            backlog.append(self._queue.get_nowait()[2])
+        if backlog and not self._spill(backlog):
+            logger.warning(f"[TelegramAlerts] Discarding {len(backlog)} unsent alerts on shutdown")
+
         # Close HTTP client
         if self._http_client:
             await self._http_client.aclose()
@@ -136,6 +291,13 @@ class TelegramAlertPublisher:
 
         logger.info("[TelegramAlerts] Publisher stopped")
 
+    def _is_priority(self, alert: Alert) -> bool:
+        return alert.alert_type in PRIORITY_ALERT_TYPES
+
+    def _put(self, alert: Alert):
+        lane = PRIORITY_LANE if self._is_priority(alert) else BATCH_LANE
+        self._queue.put_nowait((lane, next(self._sequence), alert))
+
     def queue_alert(self, alert: Alert) -> bool:
         """
         Queue an alert for sending.
@@ -146,85 +308,220 @@ class TelegramAlertPublisher:
             alert: Alert to send
 
         Returns:
-            True if queued successfully
+            True if queued (or spilled to disk) successfully
         """
         if not self.enabled:
             return False
 
         try:
-            self._queue.put_nowait(alert)
+            self._put(alert)
+            self.stats['queued'] += 1
             logger.debug(f"[TelegramAlerts] Queued: {alert.alert_type.value}")
             return True
         except asyncio.QueueFull:
+            if self._spill([alert]):
+                logger.warning("[TelegramAlerts] Queue full, alert spilled to disk")
+                return True
+            self.stats['dropped'] += 1
             logger.warning("[TelegramAlerts] Queue full, dropping alert")
             return False
 
     async def _process_queue(self):
-        """Background task to process alert queue."""
+        """Background task: priority alerts immediately, the rest coalesced per chat."""
         while self._running:
             try:
                 # Wait for alert with timeout
                 try:
-                    alert = await asyncio.wait_for(
+                    lane, _sequence, alert = await asyncio.wait_for(
                         self._queue.get(),
                         timeout=1.0
                     )
                 except asyncio.TimeoutError:
+                    self._restore_spill()
                     continue
 
-                # Check rate limit
-                if not self._check_rate_limit():
-                    logger.warning("[TelegramAlerts] Rate limited, dropping alert")
+                if lane == PRIORITY_LANE:
+                    self._inflight = [alert]
+                    await self._deliver([alert])
                     continue
 
-                # Send alert
-                await self._send_alert(alert)
+                batch = await self._collect_batch(alert)
+                for chat_alerts in self._group_by_chat(batch):
+                    await self._deliver(chat_alerts)
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"[TelegramAlerts] Error processing queue: {e}")
 
-    def _check_rate_limit(self) -> bool:
-        """Check if we're within rate limit."""
-        now = datetime.now()
-
-        # Reset counter every minute
-        if (now - self._last_rate_reset).total_seconds() >= 60:
-            self._sent_count = 0
-            self._last_rate_reset = now
+    async def _collect_batch(self, first: Alert) -> List[Alert]:
+        """Collect non-critical alerts for the batch window; critical ones are sent on arrival"""
+        batch = [first]
+        self._inflight = batch  # Spilled by stop() if cancelled mid-window
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_window
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                lane, _sequence, alert = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            batch.append(alert)
+            if lane == PRIORITY_LANE:
+                await self._deliver([alert])
+        return batch
+
+    def _group_by_chat(self, alerts: List[Alert]) -> List[List[Alert]]:
+        """Split a batch into per-chat lists, keeping arrival order"""
+        groups: Dict[str, List[Alert]] = {}
+        for alert in alerts:
+            groups.setdefault(alert.chat_id or self.chat_id, []).append(alert)
+        return list(groups.values())
+
+    async def _deliver(self, alerts: List[Alert]):
+        """Send alerts for one chat (single message or digest chunks), pacing on the token bucket"""
+        chat_id = alerts[0].chat_id or self.chat_id
+        for text, chunk in self._build_messages(alerts):
+            self.stats['rate_limit_wait_seconds'] += await self._bucket.acquire()
+            outcome = await self._send_message(chat_id, text)
+            if outcome == SEND_OK:
+                self.stats['messages_sent'] += 1
+                self.stats['alerts_sent'] += len(chunk)
+                if len(chunk) > 1:
+                    self.stats['alerts_coalesced'] += len(chunk)
+                if self._is_priority(chunk[0]):
+                    self.stats['priority_sent'] += 1
+                logger.debug(f"[TelegramAlerts] Sent {len(chunk)} alert(s) to {chat_id}")
+            elif outcome == SEND_RETRY and self._spill(chunk):
+                logger.warning(f"[TelegramAlerts] {len(chunk)} alert(s) spilled for retry")
+            else:
+                self.stats['dropped'] += len(chunk)
+            # Delivered, spilled or dropped - no longer ours to keep on shutdown
+            done = {id(alert) for alert in chunk}
+            self._inflight[:] = [alert for alert in self._inflight if id(alert) not in done]
+
+    def _build_messages(self, alerts: List[Alert]) -> List[Tuple[str, List[Alert]]]:
+        """(text, alerts) per message: one alert as-is, several as digests under the size limit"""
+        if len(alerts) == 1:
+            return [(self._format_alert(alerts[0]), alerts)]
+
+        messages = []
+        chunk: List[Alert] = []
+        sections: List[str] = []
+        for alert in alerts:
+            section = self._format_digest_entry(alert)
+            if sections and len(self._format_digest(chunk + [alert], sections + [section])) > TELEGRAM_MAX_MESSAGE_LENGTH:
+                messages.append((self._format_digest(chunk, sections), chunk))
+                chunk, sections = [], []
+            chunk.append(alert)
+            sections.append(section)
+        if len(chunk) == 1:
+            messages.append((self._format_alert(chunk[0]), chunk))
+        elif chunk:
+            messages.append((self._format_digest(chunk, sections), chunk))
+        return messages
+
+    async def _send_message(self, chat_id: str, text: str) -> str:
+        """POST sendMessage; returns SEND_OK, SEND_RETRY or SEND_FAILED"""
+        if not self._http_client:
+            return SEND_RETRY
+
+        # Send via Telegram API using HTML parse mode (safer than Markdown)
+        url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
+        payload = {
+            "chat_id": chat_id,
+            "text": text,
+            "parse_mode": "HTML"
+        }
 
-        if self._sent_count >= self.rate_limit:
-            return False
+        try:
+            response = await self._http_client.post(url, json=payload)
+        except httpx.HTTPError as e:
+            self.stats['send_failures'] += 1
+            self._bucket.pause(5.0)
+            logger.error(f"[TelegramAlerts] Error sending alert: {e}")
+            return SEND_RETRY
 
-        self._sent_count += 1
-        return True
+        if response.status_code == 200:
+            return SEND_OK
 
-    async def _send_alert(self, alert: Alert):
-        """Send alert to Telegram."""
+        self.stats['send_failures'] += 1
+        logger.error(
+            f"[TelegramAlerts] Failed to send: {response.status_code} - {response.text}"
+        )
+        if response.status_code == 429:
+            try:
+                retry_after = response.json().get('parameters', {}).get('retry_after', 5)
+            except ValueError:
+                retry_after = 5
+            self._bucket.pause(float(retry_after))
+            return SEND_RETRY
+        if response.status_code >= 500:
+            self._bucket.pause(5.0)
+            return SEND_RETRY
+        return SEND_FAILED
+
+    def _spill(self, alerts: List[Alert]) -> bool:
+        """Append alerts to the spill file; False if spilling is disabled or fails"""
+        if not self.spill_path or not alerts:
+            return False
         try:
-            # Format message
-            message = self._format_alert(alert)
-
-            # Send via Telegram API using HTML parse mode (safer than Markdown)
-            url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
-            payload = {
-                "chat_id": self.chat_id,
-                "text": message,
-                "parse_mode": "HTML"
-            }
+            directory = os.path.dirname(self.spill_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.spill_path, 'a') as f:
+                for alert in alerts:
+                    f.write(json.dumps(alert.to_dict(), default=str) + '\n')
+            self.stats['spilled'] += len(alerts)
+            return True
+        except OSError as e:
+            logger.error(f"[TelegramAlerts] Failed to spill {len(alerts)} alerts: {e}")
+            return False
 
-            if self._http_client:
-                response = await self._http_client.post(url, json=payload)
-                if response.status_code != 200:
-                    logger.error(
-                        f"[TelegramAlerts] Failed to send: {response.status_code} - {response.text}"
-                    )
-                else:
-                    logger.debug(f"[TelegramAlerts] Sent: {alert.alert_type.value}")
+    def _restore_spill(self) -> int:
+        """Re-queue spilled alerts that fit in the queue; returns how many"""
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return 0
+        try:
+            with open(self.spill_path) as f:
+                lines = [line for line in f if line.strip()]
+        except OSError as e:
+            logger.error(f"[TelegramAlerts] Failed to read spill file: {e}")
+            return 0
+
+        restored = 0
+        remaining = []
+        for line in lines:
+            if self._queue.full():
+                remaining.append(line)
+                continue
+            try:
+                self._put(Alert.from_dict(json.loads(line)))
+                restored += 1
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"[TelegramAlerts] Skipping unreadable spilled alert: {e}")
 
-        except Exception as e:
-            logger.error(f"[TelegramAlerts] Error sending alert: {e}")
+        try:
+            if remaining:
+                tmp_path = f"{self.spill_path}.tmp"
+                with open(tmp_path, 'w') as f:
+                    f.writelines(remaining)
+                os.replace(tmp_path, self.spill_path)
+            else:
+                os.remove(self.spill_path)
+        except OSError as e:
+            logger.error(f"[TelegramAlerts] Failed to rewrite spill file: {e}")
+
+        if restored:
+            self.stats['restored'] += restored
+            logger.info(f"[TelegramAlerts] Re-queued {restored} spilled alerts ({len(remaining)} still on disk)")
+        return restored
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Publisher counters plus current queue depth."""
+        return dict(self.stats, queue_size=self._queue.qsize(), inflight=len(self._inflight))
 
     def _escape_html(self, text: str) -> str:
         """
@@ -275,6 +572,27 @@ class TelegramAlertPublisher:
 
         return '\n'.join(lines)
 
+    def _format_digest_entry(self, alert: Alert) -> str:
+        """One alert inside a digest: title line, message, data fields on one line."""
+        emoji = self._emoji_map.get(alert.alert_type, "")
+        timestamp = alert.timestamp.strftime('%H:%M:%S') if alert.timestamp else ""
+        lines = [
+            f"{emoji} <b>{self._escape_html(alert.title)}</b> <i>{timestamp}</i>",
+            self._escape_html(alert.message)
+        ]
+        if alert.data:
+            lines.append(", ".join(
+                f"{self._escape_html(key)}: {self._escape_html(value)}" for key, value in alert.data.items()
+            ))
+        return '\n'.join(lines)
+
+    def _format_digest(self, alerts: List[Alert], sections: List[str]) -> str:
+        """Several coalesced alerts as one message."""
+        first = alerts[0].timestamp.strftime('%H:%M:%S') if alerts[0].timestamp else ""
+        last = alerts[-1].timestamp.strftime('%H:%M:%S') if alerts[-1].timestamp else ""
+        header = f"<b>{len(alerts)} alerts</b> <i>{first} - {last}</i>"
+        return '\n\n'.join([header] + sections)
+
     # Convenience methods for common alerts
 
     def alert_signal_received(
@@ -10,6 +10,7 @@ Commands:
 - /orders [N] - Recent orders
 - /stats [days] - Signal statistics
 - /sizing <signal_id> - Position sizing breakdown
+- /sizing <instrument> <price> <stop> [er] [atr] [equity] - What-if sizing ladder
 - /positions - Current open positions
 """
 
@@ -44,7 +45,8 @@ class PortfolioManagerBot:
         audit_service,
         order_logger,
         portfolio_manager=None,
-        allowed_user_ids: List[int] = None
+        allowed_user_ids: List[int] = None,
+        read_model=None
     ):
         """
         Initialize Telegram bot.
@@ -55,11 +57,14 @@ class PortfolioManagerBot:
             order_logger: OrderExecutionLogger instance
             portfolio_manager: Optional PortfolioStateManager for positions
             allowed_user_ids: List of allowed Telegram user IDs (None = allow all)
+            read_model: Optional AuditReadModel - answers queries from memory
+                        once warmed, instead of aggregating with SQL
         """
         self.token = token
         self.audit_service = audit_service
         self.order_logger = order_logger
         self.portfolio_manager = portfolio_manager
+        self.read_model = read_model
         # Note: None means allow all, empty set means deny all
         self.allowed_user_ids = set(allowed_user_ids) if allowed_user_ids is not None else None
 
@@ -68,6 +73,28 @@ class PortfolioManagerBot:
 
         logger.info("[TelegramBot] Bot initialized")
 
+    @property
+    def _signals(self):
+        """Source for signal queries: warm read model, else the audit service (SQL)"""
+        if self.read_model is not None and self.read_model.is_warm:
+            return self.read_model
+        return self.audit_service
+
+    @property
+    def _orders(self):
+        """Source for order queries: warm read model, else the order logger (SQL)"""
+        if self.read_model is not None and self.read_model.is_warm:
+            return self.read_model
+        return self.order_logger
+
+    def _get_audit(self, audit_id: int) -> Optional[Dict[str, Any]]:
+        """Audit record from the read model's recent window, else from the database"""
+        if self.read_model is not None:
+            record = self.read_model.get_audit_by_id(audit_id)
+            if record is not None:
+                return record
+        return self.audit_service.get_audit_by_id(audit_id)
+
     async def _check_authorized(self, update: Update) -> bool:
         """
         Check if user is authorized to use the bot.
@@ -112,6 +139,7 @@ Commands:
 /signals 5 BANK_NIFTY - Filter by count/instrument
 /signal 39 - Full details for signal #39 (rejection reason, sizing, etc.)
 /sizing 25 - Position sizing breakdown
+/sizing BANK_NIFTY 52000 51600 0.8 - What-if sizing ladder
 /orders - Recent orders
 /stats 7 - Signal statistics (default 30 days)
 /positions - Open positions
@@ -125,7 +153,7 @@ Commands:
 
         try:
             # Get audit trail stats
-            stats = self.audit_service.get_signal_stats(days=1)
+            stats = self._signals.get_signal_stats(days=1)
 
             # Get system info
             status_lines = [
@@ -181,7 +209,7 @@ Commands:
                     instrument = context.args[0].upper()
 
             # Get recent signals
-            signals = self.audit_service.get_recent_signals(
+            signals = self._signals.get_recent_signals(
                 limit=limit,
                 instrument=instrument
             )
@@ -227,7 +255,7 @@ Commands:
                 limit = min(int(context.args[0]), 50)
 
             # Get recent orders
-            orders = self.order_logger.get_recent_orders(limit=limit)
+            orders = self._orders.get_recent_orders(limit=limit)
 
             if not orders:
                 await update.message.reply_text("No orders found.")
@@ -275,7 +303,7 @@ Commands:
                 days = min(int(context.args[0]), 90)  # Max 90 days
 
             # Get stats
-            stats = self.audit_service.get_signal_stats(days=days)
+            stats = self._signals.get_signal_stats(days=days)
 
             # Format output
             lines = [
@@ -300,7 +328,7 @@ Commands:
                 lines.append(f"  {instrument}: {count}")
 
             # Add slippage stats if available
-            slippage_stats = self.order_logger.get_slippage_stats(days=days)
+            slippage_stats = self._orders.get_slippage_stats(days=days)
             if slippage_stats.get('statistics'):
                 lines.append("")
                 lines.append("**Slippage (completed orders):**")
@@ -323,16 +351,22 @@ Commands:
             return
 
         try:
+            if context.args and len(context.args) >= 3 and not context.args[0].isdigit():
+                await update.message.reply_text(self._what_if_sizing(context.args))
+                return
+
             if not context.args or not context.args[0].isdigit():
                 await update.message.reply_text(
-                    "Usage: /sizing <signal_id>\nExample: /sizing 123"
+                    "Usage: /sizing <signal_id>\nExample: /sizing 123\n"
+                    "What-if: /sizing <instrument> <price> <stop> [er] [atr] [equity]\n"
+                    "Example: /sizing BANK_NIFTY 52000 51600 0.8"
                 )
                 return
 
             signal_id = int(context.args[0])
 
             # Get signal audit record
-            signal = self.audit_service.get_audit_by_id(signal_id)
+            signal = self._get_audit(signal_id)
 
             if not signal:
                 await update.message.reply_text(f"Signal #{signal_id} not found.")
@@ -395,6 +429,46 @@ Commands:
             logger.error(f"[TelegramBot] Error in sizing command: {e}")
             await update.message.reply_text(f"Error getting sizing details: {e}")
 
+    def _what_if_sizing(self, args: List[str]) -> str:
+        """Base entry sizing ladder around the given stop distance"""
+        from core.batch_sizer import MODE_BASE, stop_ladder, what_if
+
+        instrument = args[0].upper()
+        try:
+            price, stop = float(args[1]), float(args[2])
+            er = float(args[3]) if len(args) > 3 else 1.0
+            atr = float(args[4]) if len(args) > 4 else 0.0
+            equity = float(args[5]) if len(args) > 5 else getattr(self.portfolio_manager, 'equity_high', None)
+        except ValueError:
+            return "Price, stop, ER, ATR and equity must be numbers."
+        if equity is None:
+            return "Equity not available - pass it as the 6th argument."
+
+        stops = stop_ladder(price, stop)
+        try:
+            result = what_if(instrument, MODE_BASE, {'price': price, 'stop': stops, 'er': er, 'atr': atr},
+                             equity=equity)
+        except ValueError as e:
+            return str(e)
+
+        res = result['results']
+        lines = [
+            f"**What-if Sizing: {instrument}**",
+            f"Entry {price:,.2f} | ER {er:.2f} | Equity Rs {equity:,.0f}",
+            "",
+            "Stop (dist): Lot-R / Lot-M -> Final (limiter)",
+        ]
+        for i, row_stop in enumerate(stops):
+            marker = " *" if row_stop == stop else ""
+            lines.append(
+                f"  {row_stop:,.1f} ({price - row_stop:,.1f}): "
+                f"{res['lot_r'][i]:.2f} / {res['lot_m'][i]:.2f} -> "
+                f"{res['final_lots'][i]} ({res['limiter'][i]}){marker}"
+            )
+        if atr > 0:
+            lines.append(f"\nLot-V (reference): {res['lot_v'][0]:.2f}")
+        return '\n'.join(lines)
+
     async def signal_detail_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /signal <id> command - full signal details including rejection reason."""
         if not await self._check_authorized(update):
@@ -410,7 +484,7 @@ Commands:
             signal_id = int(context.args[0])
 
             # Get signal audit record
-            signal = self.audit_service.get_audit_by_id(signal_id)
+            signal = self._get_audit(signal_id)
 
             if not signal:
                 await update.message.reply_text(f"Signal #{signal_id} not found.")
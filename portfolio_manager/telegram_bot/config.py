@@ -37,6 +37,9 @@ class TelegramConfig:
     # Alert settings
     rate_limit_per_minute: int = 20
     alert_queue_size: int = 100
+    alert_batch_window_seconds: float = 2.0  # Coalesce non-critical alerts into one digest
+    alert_burst: int = 3  # Messages allowed back-to-back before rate pacing
+    alert_spill_path: str = "logs/telegram_alert_spill.jsonl"  # Empty = drop instead of spilling
 
     # Heartbeat settings
     heartbeat_interval_minutes: int = 60
@@ -154,6 +157,9 @@ def create_config_template(path: str = DEFAULT_CONFIG_PATH):
         "daily_report_enabled": True,
         "rate_limit_per_minute": 20,
         "alert_queue_size": 100,
+        "alert_batch_window_seconds": 2.0,
+        "alert_burst": 3,
+        "alert_spill_path": "logs/telegram_alert_spill.jsonl",
         "heartbeat_interval_minutes": 60,
         "daily_report_hour": 16,
         "daily_report_minute": 0,
@@ -225,6 +231,7 @@ class TelegramBotFactory:
             logger.info("[TelegramBotFactory] Bot disabled in config")
             return None
 
+        from core.audit_read_model import get_audit_read_model
         from telegram_bot.bot import PortfolioManagerBot
 
         audit_service = self.create_audit_service()
@@ -235,7 +242,8 @@ class TelegramBotFactory:
             audit_service=audit_service,
             order_logger=order_logger,
             portfolio_manager=self.portfolio_manager,
-            allowed_user_ids=self.config.allowed_user_ids or None
+            allowed_user_ids=self.config.allowed_user_ids or None,
+            read_model=get_audit_read_model()
         )
 
         logger.info("[TelegramBotFactory] Bot created")
@@ -262,7 +270,10 @@ class TelegramBotFactory:
             chat_id=self.config.chat_id,
             enabled=self.config.alerts_enabled,
             queue_size=self.config.alert_queue_size,
-            rate_limit_per_minute=self.config.rate_limit_per_minute
+            rate_limit_per_minute=self.config.rate_limit_per_minute,
+            batch_window_seconds=self.config.alert_batch_window_seconds,
+            burst=self.config.alert_burst,
+            spill_path=self.config.alert_spill_path or None
         )
 
         logger.info("[TelegramBotFactory] Alert publisher created")
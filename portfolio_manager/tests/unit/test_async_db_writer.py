@@ -0,0 +1,283 @@
+"""
+Unit tests for the background audit/execution-log writer
+
+Tests batching, ordering, backpressure fallback, WAL replay after a crash
+and the async paths of SignalAuditService / OrderExecutionLogger
+"""
+import json
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import psycopg2
+import pytest
+from psycopg2.extras import Json
+
+from core.async_db_writer import AsyncDBWriter, WriteOp, QUEUED
+from core.order_execution_logger import OrderExecutionLogger, OrderLogEntry
+from core.signal_audit_service import SignalAuditService, SignalAuditRecord, SignalOutcome
+
+
+class FakeDB:
+    """Records executed statements; can be made to fail"""
+
+    def __init__(self):
+        self.executed = []
+        self.batches = []
+        self.transactions = 0
+        self.fail = False
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def transaction(self):
+        if self.fail:
+            raise ConnectionError("db down")
+        with self.lock:
+            self.transactions += 1
+        self.pending = []
+        conn = MagicMock()
+        cursor = MagicMock()
+        cursor.execute.side_effect = self.record
+        conn.cursor.return_value.__enter__.return_value = cursor
+        yield conn
+        self.executed.extend(self.pending)  # commit only if no exception
+
+    def record(self, sql, params):
+        if params == ('bad',):
+            raise psycopg2.IntegrityError("duplicate key")
+        self.pending.append((sql, params))
+
+
+def fake_execute_batch(db):
+    """execute_batch replacement that records each row"""
+    def _execute_batch(cur, sql, params_list, page_size=100):
+        db.batches.append(len(params_list))
+        for params in params_list:
+            db.record(sql, params)
+    return _execute_batch
+
+
+@pytest.fixture
+def db():
+    return FakeDB()
+
+
+@pytest.fixture
+def writer_factory(db, tmp_path):
+    writers = []
+
+    def _make(**kwargs):
+        kwargs.setdefault('wal_path', str(tmp_path / 'audit_wal.jsonl'))
+        kwargs.setdefault('flush_interval_seconds', 0.01)
+        kwargs.setdefault('retry_delay_seconds', 0.01)
+        w = AsyncDBWriter(db, **kwargs)
+        writers.append(w)
+        return w
+
+    with patch('core.async_db_writer.execute_batch', side_effect=fake_execute_batch(db)):
+        yield _make
+
+    for w in writers:
+        if w._thread is not None:
+            w.stop(timeout=1)
+
+
+class TestAsyncDBWriter:
+    """Test queueing, batching and shutdown flush"""
+
+    def test_submit_before_start_returns_false(self, writer_factory):
+        """Caller falls back to sync write when writer isn't running"""
+        w = writer_factory()
+        assert w.submit('signal_log', 'INSERT 1', (1,)) is False
+
+    def test_batches_identical_statements_in_order(self, db, writer_factory):
+        """Consecutive identical SQL is grouped; order is preserved"""
+        w = writer_factory(batch_size=50, flush_interval_seconds=0.2)
+        w.start()
+        for i in range(5):
+            assert w.submit('signal_audit', 'INSERT A', (i,))
+        assert w.submit('signal_audit', 'UPDATE A', (99,))
+        assert w.flush(timeout=2)
+
+        assert [p[0] for _, p in db.executed] == [0, 1, 2, 3, 4, 99]
+        assert db.batches == [5]
+        assert db.transactions == 1
+
+    def test_stop_flushes_pending_writes(self, db, writer_factory):
+        """stop() drains the queue before returning"""
+        w = writer_factory(flush_interval_seconds=5)
+        w.start()
+        for i in range(3):
+            w.submit('order_execution_log', 'INSERT B', (i,))
+        assert w.stop(timeout=2)
+        assert len(db.executed) == 3
+        assert w.get_stats()['written'] == 3
+
+    def test_backpressure_returns_false_when_full(self, db, writer_factory):
+        """Full queue rejects after enqueue timeout so caller writes inline"""
+        db.fail = True
+        w = writer_factory(max_queue_size=2, enqueue_timeout_seconds=0.01, retry_delay_seconds=5)
+        w.start()
+        results = [w.submit('signal_log', 'INSERT C', (i,)) for i in range(4)]
+        assert results[:2] == [True, True]
+        assert False in results[2:]
+        assert w.get_stats()['rejected_backpressure'] >= 1
+
+    def test_failed_batch_is_retried(self, db, writer_factory):
+        """Writes survive a transient DB failure"""
+        db.fail = True
+        w = writer_factory()
+        w.start()
+        w.submit('signal_audit', 'INSERT D', (1,))
+        w.flush(timeout=0.1)
+        assert db.executed == []
+
+        db.fail = False
+        assert w.flush(timeout=2)
+        assert db.executed == [('INSERT D', (1,))]
+        assert w.get_stats()['batch_failures'] >= 1
+
+    def test_rejected_row_dropped_without_blocking_queue(self, db, writer_factory):
+        """A row the DB rejects is dropped; the rest of the batch is applied"""
+        w = writer_factory(flush_interval_seconds=0.2)
+        w.start()
+        for params in [(1,), ('bad',), (3,)]:
+            w.submit('signal_audit', 'INSERT G', params)
+        assert w.flush(timeout=2)
+
+        assert [p for _, p in db.executed] == [(1,), (3,)]
+        assert w.get_stats()['dropped'] == 1
+        # Rejected rows are not counted as written
+        assert w.get_stats()['written'] == 2
+
+
+class TestWriteAheadLog:
+    """Test crash safety of queued writes"""
+
+    def test_params_round_trip(self):
+        """datetime and Json parameters survive WAL encoding"""
+        ts = datetime(2025, 12, 1, 9, 15, 30)
+        op = WriteOp(7, 'order_execution_log', 'INSERT', (ts, Json({'a': 1}), 5, None))
+        restored = WriteOp.from_wal(json.loads(op.to_wal()))
+
+        assert restored.seq == 7
+        assert restored.params[0] == ts
+        assert restored.params[1].adapted == {'a': 1}
+        assert restored.params[2:] == (5, None)
+
+    def test_wal_truncated_when_drained(self, db, writer_factory, tmp_path):
+        """WAL is emptied once everything is committed"""
+        w = writer_factory()
+        w.start()
+        w.submit('signal_log', 'INSERT E', (1,))
+        assert w.flush(timeout=2)
+        w.stop()
+        assert (tmp_path / 'audit_wal.jsonl').read_text() == ''
+
+    def test_uncommitted_entries_replayed_on_start(self, db, writer_factory, tmp_path):
+        """Entries after the last commit marker are re-applied after a crash"""
+        wal = tmp_path / 'audit_wal.jsonl'
+        lines = [
+            WriteOp(1, 'signal_log', 'INSERT F', (1,)).to_wal(),
+            json.dumps({'committed': 1}),
+            WriteOp(2, 'signal_log', 'INSERT F', (2,)).to_wal(),
+            WriteOp(3, 'signal_log', 'INSERT F', (3,)).to_wal(),
+            '{"seq": 4, "tab',  # torn write
+        ]
+        wal.write_text('\n'.join(lines) + '\n')
+
+        w = writer_factory()
+        w.start()
+        assert w.flush(timeout=2)
+
+        assert [p for _, p in db.executed] == [(2,), (3,)]
+        assert w.get_stats()['replayed'] == 2
+        assert w._next_seq == 4
+
+
+class TestServiceIntegration:
+    """Test async paths of the audit services"""
+
+    def test_audit_record_queued_without_returning(self):
+        """create_audit_record queues an INSERT without RETURNING"""
+        writer = MagicMock()
+        writer.submit.return_value = True
+        db_manager = MagicMock()
+        service = SignalAuditService(db_manager, writer=writer)
+
+        record = SignalAuditRecord(
+            signal_fingerprint='fp1', instrument='GOLD_MINI', signal_type='BASE_ENTRY',
+            position='Long_1', signal_timestamp=datetime.now(), received_at=datetime.now(),
+            outcome=SignalOutcome.PROCESSED
+        )
+
+        assert service.create_audit_record(record) is QUEUED
+        table, sql, params = writer.submit.call_args[0]
+        assert table == 'signal_audit'
+        assert 'RETURNING' not in sql
+        assert len(params) == 15
+        db_manager.transaction.assert_not_called()
+
+    def test_audit_falls_back_to_sync_when_rejected(self):
+        """Rejected submit writes inline and returns the ID"""
+        writer = MagicMock()
+        writer.submit.return_value = False
+        db_manager = MagicMock()
+        cursor = db_manager.transaction.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = (42,)
+        service = SignalAuditService(db_manager, writer=writer)
+
+        assert service.update_outcome(42, SignalOutcome.FAILED_ORDER, 'broker down') is True
+        assert 'RETURNING' not in cursor.execute.call_args[0][0]
+
+        record = SignalAuditRecord(
+            signal_fingerprint='fp2', instrument='BANK_NIFTY', signal_type='EXIT',
+            position='ALL', signal_timestamp=datetime.now(), received_at=datetime.now(),
+            outcome=SignalOutcome.PROCESSED
+        )
+        assert service.create_audit_record(record) == 42
+        assert 'RETURNING id' in cursor.execute.call_args[0][0]
+
+    def test_synthetic_parent_written_inline_legs_queued(self):
+        """Synthetic parent needs its ID inline; legs are queued"""
+        writer = MagicMock()
+        writer.submit.return_value = True
+        db_manager = MagicMock()
+        cursor = db_manager.transaction.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = (7,)
+        exec_logger = OrderExecutionLogger(db_manager, writer=writer)
+
+        leg = MagicMock(order_id='L1', fill_price=100.0, success=True, error=None)
+        result = MagicMock(pe_result=leg, ce_result=leg, strike=52000,
+                           rollback_performed=False, rollback_success=False)
+        result.get_synthetic_price.return_value = 52010.0
+        result.status.value = 'executed'
+
+        parent_id = exec_logger.log_synthetic_execution(
+            signal_audit_id=None, position_id='BANK_NIFTY_Long_1', instrument='BANK_NIFTY',
+            lots=2, signal_price=52000.0, synthetic_result=result
+        )
+
+        assert parent_id == 7
+        assert cursor.execute.call_count == 1
+        assert writer.submit.call_count == 2
+        for call in writer.submit.call_args_list:
+            params = call[0][2]
+            assert params[20] == 7  # parent_order_id
+
+    def test_order_log_entry_queued(self):
+        """log_order returns QUEUED when queued, None when the write fails"""
+        writer = MagicMock()
+        writer.submit.return_value = True
+        db_manager = MagicMock()
+        exec_logger = OrderExecutionLogger(db_manager, writer=writer)
+
+        result = exec_logger.log_order(OrderLogEntry(order_id='X1', instrument='GOLD_MINI'))
+        assert result is QUEUED
+        assert not result
+        assert writer.submit.call_args[0][0] == 'order_execution_log'
+
+        writer.submit.return_value = False
+        db_manager.transaction.side_effect = psycopg2.OperationalError('db down')
+        assert exec_logger.log_order(OrderLogEntry(order_id='X2', instrument='GOLD_MINI')) is None
@@ -0,0 +1,193 @@
+"""
+Unit tests for the in-memory audit read model
+
+Tests incremental signal/order aggregation, outcome changes, warm-up from
+the database, slippage percentiles, the service write hooks, and the bot's
+fallback to SQL while the model is cold.
+"""
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+from core.audit_read_model import AuditReadModel
+from core.order_execution_logger import OrderExecutionLogger, OrderLogEntry
+from core.signal_audit_service import SignalAuditRecord, SignalAuditService, SignalOutcome, SizingCalculationData
+
+
+def audit_record(instrument='GOLD_MINI', outcome=SignalOutcome.PROCESSED, processing_ms=None, sizing=None):
+    return SignalAuditRecord(
+        signal_fingerprint=f"fp_{instrument}",
+        instrument=instrument,
+        signal_type="BASE_ENTRY",
+        position="LONG",
+        signal_timestamp=datetime.now(),
+        received_at=datetime.now(),
+        outcome=outcome,
+        processing_duration_ms=processing_ms,
+        sizing_calculation=sizing
+    )
+
+
+def completed_order(slippage_pct, instrument='GOLD_MINI', order_type='LIMIT', duration_ms=100):
+    return OrderLogEntry(
+        order_type=order_type, instrument=instrument, signal_price=100.0,
+        slippage_pct=slippage_pct, order_status='COMPLETE', execution_duration_ms=duration_ms
+    )
+
+
+class TestSignalAggregates:
+    """Counts maintained as audit records are written"""
+
+    def test_stats_match_sql_shape(self):
+        model = AuditReadModel()
+        model.record_signal(audit_record(processing_ms=10), audit_id=1)
+        model.record_signal(audit_record('BANK_NIFTY', SignalOutcome.REJECTED_RISK, processing_ms=30), audit_id=2)
+        model.record_signal(audit_record(outcome=SignalOutcome.FAILED_ORDER), audit_id=3)
+
+        stats = model.get_signal_stats(days=1)
+
+        assert stats['total_signals'] == 3
+        assert (stats['processed'], stats['rejected'], stats['failed']) == (1, 1, 1)
+        assert stats['instruments'] == 2
+        assert stats['avg_processing_ms'] == 20
+        assert stats['rejection_rate'] == pytest.approx(1 / 3)
+        assert stats['by_instrument'] == {'GOLD_MINI': 2, 'BANK_NIFTY': 1}
+
+    def test_outcome_update_moves_count(self):
+        model = AuditReadModel()
+        model.record_signal(audit_record(), audit_id=7)
+
+        model.record_outcome(7, SignalOutcome.FAILED_ORDER, 'broker_rejected')
+
+        stats = model.get_signal_stats(days=1)
+        assert stats['by_outcome'] == {'FAILED_ORDER': 1}
+        assert model.get_recent_signals(limit=1)[0]['outcome_reason'] == 'broker_rejected'
+        assert model.get_rejection_reasons(days=1) == [{'outcome': 'FAILED_ORDER', 'count': 1, 'percentage': 100.0}]
+
+    def test_recent_signals_filter_and_audit_lookup(self):
+        model = AuditReadModel(recent_limit=2)
+        sizing = SizingCalculationData(method="TOM_BASSO", final_lots=3)
+        model.record_signal(audit_record('GOLD_MINI'), audit_id=1)
+        model.record_signal(audit_record('BANK_NIFTY', sizing=sizing), audit_id=2)
+        model.record_signal(audit_record('GOLD_MINI'), audit_id=3)
+
+        assert [s['id'] for s in model.get_recent_signals(limit=10)] == [3, 2]
+        assert [s['id'] for s in model.get_recent_signals(instrument='BANK_NIFTY')] == [2]
+        assert model.get_audit_by_id(2)['sizing_calculation']['calculation']['final_lots'] == 3
+        assert model.get_audit_by_id(1) is None  # Evicted - caller falls back to SQL
+
+    def test_days_window_uses_day_buckets(self):
+        model = AuditReadModel()
+        model.record_signal(audit_record(), audit_id=1)
+        old = model._bucket(date.today() - timedelta(days=3))
+        old.by_outcome['PROCESSED'] += 5
+        old.by_instrument['GOLD_MINI'] += 5
+
+        assert model.get_signal_stats(days=3)['total_signals'] == 1
+        assert model.get_signal_stats(days=4)['total_signals'] == 6
+
+
+class TestOrderAggregates:
+    """Recent orders and slippage percentiles"""
+
+    def test_slippage_stats_with_percentiles(self):
+        model = AuditReadModel()
+        for i, slippage in enumerate([0.001, 0.002, 0.003, 0.004]):
+            model.record_order(completed_order(slippage, duration_ms=100 * (i + 1)), log_id=i)
+        model.record_order(OrderLogEntry(instrument='GOLD_MINI', order_status='PENDING'), log_id=9)
+
+        stat = model.get_slippage_stats(days=30)['statistics'][0]
+
+        assert stat['order_count'] == 4
+        assert stat['avg_slippage_pct'] == pytest.approx(0.0025)
+        assert (stat['min_slippage_pct'], stat['max_slippage_pct']) == (0.001, 0.004)
+        assert stat['p50_slippage_pct'] == 0.002 and stat['p95_slippage_pct'] == 0.004
+        assert stat['avg_duration_ms'] == 250
+        assert model.get_slippage_stats(instrument='BANK_NIFTY')['statistics'] == []
+
+    def test_status_update_to_complete_adds_sample(self):
+        model = AuditReadModel()
+        entry = OrderLogEntry(instrument='GOLD_MINI', order_status='OPEN', slippage_pct=0.002)
+        model.record_order(entry, log_id=5)
+        assert model.get_slippage_stats()['statistics'] == []
+
+        model.record_order_status(5, 'COMPLETE', fill_price=100.2)
+        model.record_order_status(5, 'COMPLETE')  # Repeat must not double-count
+
+        assert model.get_slippage_stats()['statistics'][0]['order_count'] == 1
+        assert model.get_recent_orders(status='COMPLETE')[0]['fill_price'] == 100.2
+
+
+class TestWarm:
+    """Startup load from the database"""
+
+    def test_warm_loads_aggregates_and_recent(self):
+        today = date.today()
+        audit_service = Mock()
+        audit_service.get_daily_outcome_counts.return_value = [
+            {'day': today, 'instrument': 'GOLD_MINI', 'outcome': 'PROCESSED', 'count': 4,
+             'total_processing_ms': 40, 'timed_count': 4},
+            {'day': today - timedelta(days=10), 'instrument': 'BANK_NIFTY', 'outcome': 'REJECTED_RISK',
+             'count': 2, 'total_processing_ms': None, 'timed_count': 0},
+        ]
+        audit_service.get_recent_signals.return_value = [
+            {'id': 12, 'instrument': 'GOLD_MINI', 'outcome': 'PROCESSED', 'created_at': datetime.now()}
+        ]
+        order_logger = Mock()
+        order_logger.get_slippage_samples.return_value = [
+            {'day': today, 'instrument': 'GOLD_MINI', 'order_type': 'LIMIT',
+             'slippage_pct': 0.001, 'execution_duration_ms': 80}
+        ]
+        order_logger.get_recent_orders.return_value = []
+        model = AuditReadModel()
+
+        assert model.warm(audit_service, order_logger) is True
+
+        assert model.is_warm
+        assert model.get_signal_stats(days=1)['total_signals'] == 4
+        assert model.get_signal_stats(days=30)['rejected'] == 2
+        assert model.get_recent_signals()[0]['id'] == 12
+        assert model.get_slippage_stats()['statistics'][0]['order_count'] == 1
+
+        model.record_outcome(12, SignalOutcome.FAILED_ORDER)
+        assert model.get_signal_stats(days=1)['failed'] == 1
+
+    def test_failed_warm_stays_cold(self):
+        audit_service = Mock()
+        audit_service.get_daily_outcome_counts.return_value = None
+        order_logger = Mock()
+        order_logger.get_slippage_samples.return_value = []
+
+        model = AuditReadModel()
+
+        assert model.warm(audit_service, order_logger) is False
+        assert not model.is_warm
+
+
+class TestServiceHooks:
+    """Writers feed the global read model"""
+
+    def test_queued_writes_are_published(self):
+        model = AuditReadModel()
+        writer = Mock()
+        writer.submit.return_value = True
+        with patch('core.signal_audit_service.get_audit_read_model', return_value=model), \
+                patch('core.order_execution_logger.get_audit_read_model', return_value=model):
+            SignalAuditService(MagicMock(), writer=writer).create_audit_record(audit_record())
+            OrderExecutionLogger(MagicMock(), writer=writer).log_order(completed_order(0.003))
+
+        assert model.get_signal_stats(days=1)['processed'] == 1
+        assert model.get_recent_signals()[0]['id'] is None
+        assert model.get_recent_orders()[0]['slippage_pct'] == 0.003
+
+    def test_bot_falls_back_to_sql_until_warm(self):
+        from telegram_bot.bot import PortfolioManagerBot
+
+        model = AuditReadModel()
+        audit_service = Mock()
+        bot = PortfolioManagerBot(token="t", audit_service=audit_service, order_logger=Mock(), read_model=model)
+
+        assert bot._signals is audit_service
+        model.is_warm = True
+        assert bot._signals is model and bot._orders is model
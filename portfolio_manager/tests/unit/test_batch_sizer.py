@@ -0,0 +1,124 @@
+"""
+Unit tests for batch what-if position sizing
+
+Checks row-by-row parity with TomBassoPositionSizer for base entries,
+pyramids and peel-offs, plus broadcasting and request validation.
+"""
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from core.batch_sizer import (
+    MODE_BASE, MODE_PEEL_OFF, MODE_PYRAMID, size_base_entries, size_peel_offs, size_pyramids, stop_ladder, what_if
+)
+from core.config import get_instrument_config
+from core.models import InstrumentType, Signal, SignalType
+from core.position_sizer import TomBassoPositionSizer
+
+
+def make_signal(signal_type, price, stop, atr=350.0, er=0.82):
+    return Signal(
+        timestamp=datetime(2025, 11, 15, 10, 30), instrument="BANK_NIFTY", signal_type=signal_type,
+        position="Long_1", price=price, stop=stop, suggested_lots=0, atr=atr, er=er, supertrend=stop
+    )
+
+
+@pytest.fixture
+def config():
+    return get_instrument_config(InstrumentType.BANK_NIFTY)
+
+
+class TestParity:
+    """Same numbers as the single-signal sizer"""
+
+    def test_base_entries_match_single_signal(self, config):
+        sizer = TomBassoPositionSizer(config)
+        price = 52000.0
+        stops = np.array([51900.0, 51650.0, 51000.0, 52000.0, 52100.0, 48000.0])
+        equities = np.array([5e6, 5e6, 2e7, 5e6, 5e6, 1e6])
+        atrs = np.array([350.0, 0.0, 350.0, 350.0, 350.0, 120.0])
+
+        batch = size_base_entries(config, price, stops, atrs, 0.82, equities, equities * 0.6)
+
+        for i, stop in enumerate(stops):
+            expected = sizer.calculate_base_entry_size(
+                make_signal(SignalType.BASE_ENTRY, price, stop, atr=atrs[i]), equities[i], equities[i] * 0.6
+            )
+            assert batch['lot_r'][i] == pytest.approx(expected.lot_r)
+            assert batch['lot_v'][i] == pytest.approx(expected.lot_v)
+            assert batch['lot_m'][i] == pytest.approx(expected.lot_m)
+            assert batch['final_lots'][i] == expected.final_lots
+            assert batch['limiter'][i] == expected.limiter
+
+    @pytest.mark.parametrize('test_mode', [False, True])
+    def test_pyramids_match_single_signal(self, config, test_mode):
+        sizer = TomBassoPositionSizer(config, test_mode=test_mode)
+        prices = np.array([52500.0, 52500.0, 52500.0, 52500.0, 52500.0])
+        stops = np.array([52000.0, 51000.0, 52600.0, 52400.0, 52000.0])
+        margins = np.array([3e6, 3e6, 3e6, 1e5, 3e6])
+        base = np.array([10, 10, 10, 10, 1])
+        profits = np.array([2e5, 5e3, 2e5, 2e5, 0.0])
+        counts = np.array([0, 1, 0, 2, 0])
+
+        batch = size_pyramids(config, prices, stops, margins, base, profits, counts, test_mode=test_mode)
+
+        for i in range(len(prices)):
+            expected = sizer.calculate_pyramid_size(
+                make_signal(SignalType.PYRAMID, prices[i], stops[i]), 0.0, margins[i],
+                int(base[i]), profits[i], int(counts[i])
+            )
+            assert (batch['lot_a'][i], batch['lot_b'][i], batch['lot_c'][i]) == (
+                expected.lot_r, expected.lot_v, expected.lot_m
+            )
+            assert batch['final_lots'][i] == expected.final_lots
+            assert batch['limiter'][i] == expected.limiter
+
+    def test_peel_offs_match_single_signal(self, config):
+        sizer = TomBassoPositionSizer(config)
+        risks = np.array([30000.0, 80000.0, 10000.0, 90000.0])
+        vols = np.array([20000.0, 20000.0, 50000.0, 60000.0])
+
+        batch = size_peel_offs(config, risks, vols, 5e6, 10)
+
+        for i in range(len(risks)):
+            lots, reason = sizer.calculate_peel_off_size(risks[i], vols[i], 5e6, 10)
+            assert batch['lots_to_peel'][i] == lots
+            assert batch['reason'][i] == reason
+
+
+class TestWhatIf:
+    """Request-level helper used by the endpoint and /sizing"""
+
+    def test_scalars_broadcast_and_defaults(self):
+        stops = stop_ladder(52000.0, 51600.0, multipliers=(0.5, 1.0, 2.0))
+
+        result = what_if('BANK_NIFTY', MODE_BASE, {'price': 52000, 'stop': stops.tolist(), 'er': 0.8}, equity=5e6)
+
+        assert result['rows'] == 3
+        assert result['inputs']['stop'] == [51800.0, 51600.0, 51200.0]
+        assert result['inputs']['available_margin'] == [3e6] * 3
+        lots = result['results']['final_lots']
+        assert lots == sorted(lots, reverse=True) and isinstance(lots[0], int)
+
+    def test_pyramid_and_peel_off_modes(self):
+        pyramid = what_if('GOLD_MINI', MODE_PYRAMID, {
+            'price': [78500, 79000], 'stop': 78000, 'base_position_size': 8, 'profit_after_base_risk': 1e5
+        }, equity=5e6)
+        peel = what_if('GOLD_MINI', MODE_PEEL_OFF, {
+            'position_risk': 90000, 'position_vol': 20000, 'current_lots': 5
+        }, equity=5e6)
+
+        assert pyramid['results']['lot_b'] == [4.0, 4.0]
+        assert peel['results']['lots_to_peel'][0] > 0
+
+    @pytest.mark.parametrize('instrument,mode,inputs,message', [
+        ('NIFTY', MODE_BASE, {'price': 1, 'stop': 0}, 'Unknown instrument'),
+        ('BANK_NIFTY', 'grid', {'price': 1, 'stop': 0}, 'Unknown mode'),
+        ('BANK_NIFTY', MODE_BASE, {'price': 1}, 'Missing inputs'),
+        ('BANK_NIFTY', MODE_BASE, {'price': 1, 'stop': 0, 'lots': 3}, 'Unknown inputs'),
+        ('BANK_NIFTY', MODE_BASE, {'price': [1, 2], 'stop': [0, 0, 0]}, 'Invalid sizing inputs'),
+    ])
+    def test_invalid_requests(self, instrument, mode, inputs, message):
+        with pytest.raises(ValueError, match=message):
+            what_if(instrument, mode, inputs, equity=5e6)
@@ -0,0 +1,203 @@
+"""
+Unit tests for the bulk historical importer
+
+Tests row validation and defaults, the COPY stream format, natural-key merge
+SQL, CSV/Parquet input and the loader's statement order and dry-run rollback.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from core.bulk_import import (
+    DATASETS, LEDGER_REBUILD_SQL, PYARROW_AVAILABLE, BulkLoader, CopyStream, merge_sql, normalize_row, read_rows
+)
+
+POSITIONS = DATASETS['positions']
+CAPITAL = DATASETS['capital']
+
+
+def as_dict(dataset, values):
+    return dict(zip(dataset.column_names, values))
+
+
+class TestNormalizeRow:
+    """Validation and defaults"""
+
+    def test_position_defaults(self):
+        row = as_dict(POSITIONS, normalize_row(POSITIONS, {
+            'position_id': 'GOLD_MINI_Long_4', 'instrument': 'GOLD_MINI', 'entry_timestamp': '2025-11-20T10:15:00Z',
+            'entry_price': '78000', 'lots': '3', 'initial_stop': '76500', 'exit_timestamp': '2025-11-27 15:30:00',
+            'exit_price': '78350.5', 'realized_pnl': '10733'
+        }, strategy_id=3))
+
+        assert row['status'] == 'closed'
+        assert row['quantity'] == 300
+        assert row['current_stop'] == 76500.0 and row['highest_close'] == 78000.0
+        assert row['strategy_id'] == 3 and row['is_base_position'] is True
+        assert row['entry_timestamp'] == '2025-11-20T10:15:00+00:00'
+
+    def test_withdrawals_are_negative_and_deposits_positive(self):
+        withdraw = as_dict(CAPITAL, normalize_row(CAPITAL, {
+            'transaction_type': 'withdraw', 'amount': '250000', 'created_at': datetime(2025, 12, 1, 9, 0)
+        }))
+        deposit = as_dict(CAPITAL, normalize_row(CAPITAL, {
+            'transaction_type': 'DEPOSIT', 'amount': '-5000000', 'created_at': '2025-11-01 09:00:00', 'notes': ''
+        }))
+
+        assert withdraw['amount'] == -250000.0 and withdraw['transaction_type'] == 'WITHDRAW'
+        assert deposit['amount'] == 5000000.0 and deposit['notes'] is None
+        assert deposit['created_by'] == 'IMPORT' and deposit['strategy_id'] == 1
+
+    @pytest.mark.parametrize('raw,message', [
+        ({'transaction_type': 'DEPOSIT', 'amount': '1'}, 'missing created_at'),
+        ({'transaction_type': 'BONUS', 'amount': '1', 'created_at': '2025-01-01'}, 'invalid transaction_type'),
+        ({'transaction_type': 'DEPOSIT', 'amount': 'lots', 'created_at': '2025-01-01'}, 'invalid amount'),
+        ({'transaction_type': 'DEPOSIT', 'amount': '1', 'created_at': '2025-01-01', 'equity': '1'}, 'unknown columns'),
+    ])
+    def test_invalid_rows(self, raw, message):
+        with pytest.raises(ValueError, match=f'line 7: {message}'):
+            normalize_row(CAPITAL, raw, line=7)
+
+
+class TestCopyStream:
+    """CSV fed to COPY ... FROM STDIN"""
+
+    def test_nulls_booleans_and_quoting(self):
+        seen = []
+        stream = CopyStream([('a', None, True), ('b, "c"', 1.5, False)], on_row=seen.append)
+
+        data = b''
+        while True:
+            chunk = stream.read(8)
+            if not chunk:
+                break
+            data += chunk
+
+        assert data.decode() == 'a,,t\n"b, ""c""",1.5,f\n'
+        assert stream.rows == 2 and len(seen) == 2
+
+
+class TestMergeSql:
+    """Set-based, idempotent merge"""
+
+    def test_capital_merge_keys(self):
+        dedup, update, insert = merge_sql(CAPITAL, 'bulk_capital')
+
+        assert 'DISTINCT ON (strategy_id, transaction_type, created_at, position_id)' in dedup
+        assert "COALESCE(t.position_id, '') = COALESCE(s.position_id, '')" in update
+        assert 'IS DISTINCT FROM' in update
+        assert 'NOT EXISTS' in insert and 'equity_before, equity_after' in insert
+
+    def test_positions_update_bumps_version(self):
+        _, update, _ = merge_sql(POSITIONS, 'bulk_positions')
+
+        assert 'version = t.version + 1' in update
+        assert 't.position_id = s.position_id' in update
+
+
+class TestReadRows:
+    """CSV and Parquet input"""
+
+    def test_csv(self, tmp_path):
+        path = tmp_path / 'capital.csv'
+        path.write_text('transaction_type,amount,created_at\nDEPOSIT,5000000,2025-11-01 09:00:00\n')
+
+        assert list(read_rows(str(path))) == [
+            {'transaction_type': 'DEPOSIT', 'amount': '5000000', 'created_at': '2025-11-01 09:00:00'}
+        ]
+
+    @pytest.mark.skipif(not PYARROW_AVAILABLE, reason="pyarrow not installed")
+    def test_parquet(self, tmp_path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        path = str(tmp_path / 'capital.parquet')
+        pq.write_table(pa.table({
+            'transaction_type': ['DEPOSIT'], 'amount': [5e6], 'created_at': [datetime(2025, 11, 1, 9)]
+        }), path)
+
+        row = as_dict(CAPITAL, normalize_row(CAPITAL, next(read_rows(path))))
+
+        assert row['amount'] == 5e6 and row['created_at'] == '2025-11-01T09:00:00'
+
+
+class TestBulkLoader:
+    """Statement order, counts and transactions"""
+
+    def make_loader(self, rowcounts):
+        cursor = MagicMock()
+        counts = iter(rowcounts)
+
+        def execute(sql, params=None):
+            cursor.rowcount = next(counts, 0)
+
+        cursor.execute.side_effect = execute
+        cursor.copy_expert.side_effect = lambda sql, stream: stream.read(1 << 20)
+        conn = Mock()
+        conn.cursor.return_value = cursor
+        db = Mock()
+
+        @contextmanager
+        def connection():
+            yield conn
+
+        db.get_connection = connection
+        return BulkLoader(db), db, conn, cursor
+
+    def capital_rows(self):
+        return [
+            {'transaction_type': 'DEPOSIT', 'amount': '5000000', 'created_at': '2025-11-01 09:00:00'},
+            {'transaction_type': 'DEPOSIT', 'amount': '5000000', 'created_at': '2025-11-01 09:00:00'},
+            {'transaction_type': 'WITHDRAW', 'amount': '100000', 'created_at': '2025-12-01 09:00:00'},
+        ]
+
+    def test_capital_import_merges_and_rebuilds_ledger(self):
+        # create, dedup=2 keys, update=0, insert=2, ledger rebuild=2, portfolio_state
+        loader, db, conn, cursor = self.make_loader([0, 2, 0, 2, 2, 1])
+
+        report = loader.load('capital', 'capital.csv', rows=self.capital_rows())
+
+        assert (report.rows_read, report.rows_distinct, report.inserted, report.unchanged) == (3, 2, 2, 0)
+        assert report.ledger_rows_rebuilt == 2 and report.strategies == [1]
+        assert cursor.execute.call_args_list[4][0] == (LEDGER_REBUILD_SQL, ([1],))
+        conn.commit.assert_called_once()
+        db.invalidate_portfolio_state_cache.assert_called_once()
+        assert report.to_dict()['rows_per_second'] > 0
+
+    def test_dry_run_rolls_back(self):
+        loader, db, conn, _ = self.make_loader([0, 2, 1, 0, 1, 1])
+
+        report = loader.load('capital', 'capital.csv', rows=self.capital_rows(), dry_run=True)
+
+        assert report.updated == 1 and report.unchanged == 1
+        conn.rollback.assert_called_once()
+        conn.commit.assert_not_called()
+        db.invalidate_portfolio_state_cache.assert_not_called()
+
+    def test_invalid_row_writes_nothing(self):
+        loader, _, conn, _ = self.make_loader([0])
+
+        with pytest.raises(ValueError, match='line 3: missing created_at'):
+            loader.load('capital', 'capital.csv', rows=[self.capital_rows()[0], {'transaction_type': 'DEPOSIT',
+                                                                                 'amount': '1'}])
+
+        conn.rollback.assert_called_once()
+        conn.commit.assert_not_called()
+
+    def test_trades_without_ledger_option_leave_ledger_alone(self):
+        loader, _, _, cursor = self.make_loader([0, 1, 0, 1, 1])
+
+        report = loader.load('trades', 'trades.csv', rows=[{
+            'position_id': 'BANK_NIFTY_Long_3', 'instrument': 'BANK_NIFTY', 'realized_pnl': '-105000',
+            'closed_at': '2025-11-21 15:30:00'
+        }])
+
+        assert report.inserted == 1 and report.ledger_rows_rebuilt == 0
+        assert not any(LEDGER_REBUILD_SQL == c[0][0] for c in cursor.execute.call_args_list)
+
+    def test_unknown_dataset(self):
+        loader, _, _, _ = self.make_loader([])
+
+        with pytest.raises(ValueError, match='Unknown dataset'):
+            loader.load('orders', 'orders.csv', rows=[])
@@ -604,6 +604,14 @@ class TestSignalDeduplication:
         is_duplicate = db_manager.check_duplicate_signal(fingerprint)
         assert is_duplicate is True
 
+    def test_log_signal_requires_timestamp(self, db_manager):
+        """Signal without a timestamp is rejected (no wall-clock dedup key)"""
+        signal_data = {'instrument': 'BANK_NIFTY', 'type': 'BASE_ENTRY', 'position': 'Long_1'}
+        fingerprint = "no_timestamp_fingerprint"
+
+        assert db_manager.log_signal(signal_data, fingerprint, "instance_1", "executed") is False
+        assert db_manager.check_duplicate_signal(fingerprint) is False
+
     def test_log_signal_duplicate_detection(self, db_manager):
         """Test duplicate signal logging"""
         signal_data = {
@@ -0,0 +1,262 @@
+"""
+Unit tests for multi-engine hosting
+
+Tests tenant config validation, webhook routing, the shared quote cache and
+broker sessions, scheduler fan-out and strategy-scoped database views.
+"""
+import json
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from core.db_state_manager import DatabaseStateManager
+from core.engine_host import (
+    DEFAULT_TENANT, BrokerPool, EngineHost, QuoteCache, load_tenants_config
+)
+from core.fencing import OrderFence
+from live.rollover_executor import BatchRolloverResult
+
+
+def make_engine(positions=0, equity=1e6):
+    engine = Mock()
+    engine.portfolio.positions = {f'p{i}': None for i in range(positions)}
+    engine.portfolio.closed_equity = equity
+    engine.portfolio.equity_high = equity
+    engine.stats = {'signals_received': 0}
+    engine.test_mode = False
+    return engine
+
+
+@pytest.fixture
+def host():
+    host = EngineHost()
+    host.add(DEFAULT_TENANT, 1, make_engine(), Mock())
+    host.add('swing', 3, make_engine(), Mock())
+    return host
+
+
+class TestTenantsConfig:
+    """Config file validation"""
+
+    def write(self, tmp_path, tenants, accounts=None):
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps({'tenants': tenants, 'accounts': accounts or {}}))
+        return str(path)
+
+    def test_valid_config(self, tmp_path):
+        path = self.write(tmp_path, [{'name': 'Swing', 'strategy_id': 3, 'account': 'dhan2'}],
+                          {'dhan2': {'broker': 'dhan'}})
+
+        tenants, accounts = load_tenants_config(path)
+
+        assert tenants[0].name == 'swing' and tenants[0].strategy_id == 3
+        assert 'dhan2' in accounts
+
+    @pytest.mark.parametrize('tenants,message', [
+        ([{'name': 'a very long tenant', 'strategy_id': 3}], 'Invalid tenant name'),
+        ([{'name': 'default', 'strategy_id': 3}], 'Duplicate tenant'),
+        ([{'name': 'swing', 'strategy_id': 1}], 'already hosted'),
+        ([{'name': 'swing', 'strategy_id': 3, 'account': 'nope'}], 'unknown account'),
+    ])
+    def test_invalid_config(self, tmp_path, tenants, message):
+        with pytest.raises(ValueError, match=message):
+            load_tenants_config(self.write(tmp_path, tenants))
+
+
+class TestRouting:
+    """Path, payload field, default"""
+
+    def test_path_then_payload_then_default(self, host):
+        assert host.resolve('swing', {'tenant': 'default'}).name == 'swing'
+        assert host.resolve(None, {'tenant': 'SWING'}).name == 'swing'
+        assert host.resolve(None, {'type': 'BASE_ENTRY'}).name == DEFAULT_TENANT
+
+    def test_unknown_tenant(self, host):
+        with pytest.raises(ValueError, match='Unknown tenant'):
+            host.resolve('intraday')
+
+    def test_eod_monitor_goes_to_default_and_holders(self, host):
+        host.get('swing').engine.portfolio.positions = {'swing:GOLD_MINI_Long_1': SimpleNamespace(instrument='GOLD_MINI')}
+        host.add('carry', 4, make_engine(), Mock())
+
+        assert [h.name for h in host.eod_monitor_targets(None, {}, 'GOLD_MINI')] == [DEFAULT_TENANT, 'swing']
+        assert [h.name for h in host.eod_monitor_targets(None, {}, 'BANK_NIFTY')] == [DEFAULT_TENANT]
+        assert [h.name for h in host.eod_monitor_targets(None, {'tenant': 'carry'}, 'GOLD_MINI')] == ['carry']
+
+    def test_engines_get_identity(self, host):
+        assert host.get('swing').engine.position_prefix == 'swing:'
+        assert host.get('swing').engine.strategy_id == 3
+        assert host.primary.engine.position_prefix == ''
+
+
+class TestSharedBroker:
+    """Quote cache and per-server sessions"""
+
+    def test_quotes_cached_within_ttl(self):
+        now = [0.0]
+        cache = QuoteCache(ttl_seconds=1.0, clock=lambda: now[0])
+        pool = BrokerPool(cache)
+        client = Mock(spec=['get_quote'])
+        client.get_quote.return_value = {'ltp': 52000}
+        first = pool.add(None, client)
+        second = pool.add('acct2', client)
+
+        first.get_quote('BANK_NIFTY')
+        second.get_quote('BANK_NIFTY')
+        now[0] = 1.5
+        first.get_quote('BANK_NIFTY')
+
+        assert client.get_quote.call_count == 2
+        assert cache.get_stats()['hits'] == 1
+
+    def test_errors_not_cached(self):
+        cache = QuoteCache()
+        client = Mock(spec=['get_quote'])
+        client.get_quote.return_value = {'error': 'timeout'}
+        cached = BrokerPool(cache).add(None, client)
+
+        cached.get_quote('GOLD_MINI')
+        cached.get_quote('GOLD_MINI')
+
+        assert client.get_quote.call_count == 2
+
+    def test_clients_for_same_server_share_session(self):
+        factory = Mock(side_effect=lambda broker_type, config: Mock(
+            spec=['base_url', 'session', 'get_quote'], base_url=config['openalgo_url'], session=Mock()
+        ))
+        pool = BrokerPool(QuoteCache(), client_factory=factory)
+
+        a = pool.get('a', {'broker': 'dhan', 'openalgo_url': 'http://oa:5000'})
+        b = pool.get('b', {'broker': 'zerodha', 'openalgo_url': 'http://oa:5000'})
+        c = pool.get('c', {'broker': 'dhan', 'openalgo_url': 'http://oa2:5000'})
+
+        assert a.session is b.session and a.session is not c.session
+        assert pool.get('a') is a
+        assert factory.call_args_list[0][0][0] == 'openalgo'
+
+
+class TestSchedulerFanOut:
+    """One scheduler drives every engine"""
+
+    def test_rollover_results_merged_and_failures_isolated(self, host):
+        host.primary.engine.check_and_rollover_positions.return_value = BatchRolloverResult(
+            total_positions=2, successful=2, failed=0, total_rollover_cost=150.0
+        )
+        host.get('swing').engine.check_and_rollover_positions.side_effect = RuntimeError('broker down')
+        host.add('carry', 4, make_engine(), Mock()).engine.check_and_rollover_positions.return_value = \
+            BatchRolloverResult(total_positions=1, successful=0, failed=1)
+
+        result = host.check_and_rollover_positions(dry_run=True)
+
+        assert (result.total_positions, result.successful, result.failed) == (3, 2, 1)
+        assert result.total_rollover_cost == 150.0
+
+    def test_eod_success_if_any_tenant_succeeds(self, host):
+        host.primary.engine.eod_execute.return_value = {'success': False, 'reason': 'no_signal'}
+        host.get('swing').engine.eod_execute.return_value = {'success': True}
+
+        result = host.eod_execute('BANK_NIFTY')
+
+        assert result['success'] is True and result['reason'] == 'no_signal'
+        assert result['tenants']['swing'] == {'success': True}
+
+    def test_eod_tenants_run_concurrently_under_job_token(self):
+        coordinator = Mock(instance_id='pm-1', fencing_token=7)
+        fence = OrderFence()
+        fence.attach(coordinator)
+        host = EngineHost(order_fence=fence)
+        barrier = threading.Barrier(2, timeout=5)
+        seen = {}
+
+        def execute(name):
+            def run(instrument):
+                barrier.wait()  # both tenants inside eod_execute at once
+                seen[name] = fence._local.token
+                return {'success': True}
+            return run
+
+        for name, strategy_id in ((DEFAULT_TENANT, 1), ('swing', 3)):
+            host.add(name, strategy_id, make_engine(), Mock()).engine.eod_execute.side_effect = execute(name)
+
+        result = fence.fenced(host.eod_execute)('GOLD_MINI')
+
+        assert result['success'] is True
+        assert seen == {DEFAULT_TENANT: 7, 'swing': 7}
+
+    def test_status(self, host):
+        assert host.get_status()['swing']['strategy_id'] == 3
+
+
+class TestStrategyScopedDatabase:
+    """DatabaseStateManager.for_strategy views"""
+
+    def make_db(self):
+        db = DatabaseStateManager.__new__(DatabaseStateManager)
+        db._position_cache = {}
+        db._portfolio_state_cache = None
+        db.change_log = None
+        db.pool = Mock()
+        cursor = MagicMock()
+        cursor.fetchall.return_value = []
+        cursor.fetchone.return_value = None
+
+        @contextmanager
+        def connection():
+            conn = Mock()
+            conn.cursor.return_value = cursor
+            yield conn
+
+        db.get_connection = connection
+        return db, cursor
+
+    def test_view_shares_pool_with_own_cache(self):
+        db, _ = self.make_db()
+        db._portfolio_state_cache = {'closed_equity': 1}
+
+        view = db.for_strategy(3)
+
+        assert view.pool is db.pool and view._root is db
+        assert view._portfolio_state_cache is None and db.strategy_id is None
+        assert view.for_strategy(4)._root is db
+
+    def test_queries_scoped_to_strategy(self):
+        db, cursor = self.make_db()
+        view = db.for_strategy(3)
+
+        view.get_all_open_positions()
+        view.get_pyramiding_state()
+        view.get_portfolio_state()
+
+        sql, params = cursor.execute.call_args_list[0][0]
+        assert 'strategy_id = %s' in sql and params == (3,)
+        assert cursor.execute.call_args_list[1][0][1] == (3,)
+        assert cursor.execute.call_args_list[2][0][1] == (3,)
+
+    def test_default_book_loads_every_open_position(self):
+        db, cursor = self.make_db()
+
+        db.get_all_open_positions()
+        db.get_portfolio_state()
+
+        sql, params = cursor.execute.call_args_list[0][0]
+        assert 'strategy_id' not in sql and params == ()
+        assert cursor.execute.call_args_list[1][0][1] == (1,)
+
+    def test_default_book_runs_without_strategy_scoped_schema(self):
+        db, cursor = self.make_db()
+
+        db.get_pyramiding_state()
+        db.get_capital_summary()
+
+        assert cursor.execute.call_args_list[0][0] == ('SELECT * FROM pyramiding_state', ())
+        assert cursor.execute.call_args_list[1][0] == ('SELECT * FROM capital_summary', ())
+
+    def test_ledger_insert_tags_strategy_on_views_only(self):
+        db, _ = self.make_db()
+        entry = {'transaction_type': 'DEPOSIT', 'amount': 1.0}
+
+        assert 'strategy_id' not in db._ledger_insert_sql(dict(entry))
+        assert '%(strategy_id)s' in db.for_strategy(3)._ledger_insert_sql(dict(entry))
@@ -0,0 +1,173 @@
+"""
+Unit tests for pre-armed EOD order tickets
+
+Tests ticket arming (validation, sizing, price band, symbol resolution),
+ticket execution with the final price check, and the engine's armed T-30
+path with trigger-to-ack latency recording.
+"""
+from datetime import date, datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from core.config import PortfolioConfig
+from core.eod_executor import EODExecutionPhase, EODExecutor
+from core.eod_prearm import EODPreArmer
+from core.latency_metrics import EOD_TRIGGER_TO_ACK_LATENCY
+from core.models import (
+    EODConditions, EODIndicators, EODMonitorSignal, EODPositionStatus, EODSizing, SignalType
+)
+from core.symbol_mapper import OrderLeg, TranslatedSymbol
+
+
+def make_signal(instrument='GOLD_MINI', price=78000.0, entry=True, in_position=False, lots=2):
+    flags = dict(
+        rsi_condition=entry, ema_condition=entry, dc_condition=entry, adx_condition=entry,
+        er_condition=entry, st_condition=entry, not_doji=entry, long_entry=entry
+    )
+    return EODMonitorSignal(
+        timestamp=datetime.now(),
+        instrument=instrument,
+        price=price,
+        conditions=EODConditions(**flags),
+        indicators=EODIndicators(atr=400.0, supertrend=price - 800),
+        position_status=EODPositionStatus(in_position=in_position),
+        sizing=EODSizing(suggested_lots=lots)
+    )
+
+
+def gold_mapper():
+    mapper = MagicMock()
+    mapper.translate.return_value = TranslatedSymbol(
+        instrument='GOLD_MINI', exchange='MCX', symbols=['GOLDM05FEB26FUT'],
+        expiry_date=date(2026, 2, 5),
+        order_legs=[OrderLeg('GOLDM05FEB26FUT', 'MCX', 'BUY', 'FUT')]
+    )
+    return mapper
+
+
+@pytest.fixture
+def openalgo():
+    client = MagicMock()
+    client.place_order.return_value = {'status': 'success', 'orderid': 'EOD123'}
+    return client
+
+
+class TestArming:
+    """EODPreArmer.arm"""
+
+    def test_entry_ticket_is_fully_built(self, openalgo):
+        config = PortfolioConfig()
+        armer = EODPreArmer(EODExecutor(config, openalgo), gold_mapper(), price_band_pct=0.25)
+
+        ticket = armer.arm(make_signal())
+
+        assert ticket.valid and ticket.reason is None
+        assert ticket.signal_type == SignalType.BASE_ENTRY
+        assert ticket.action == 'BUY'
+        assert ticket.lots == 2
+        assert ticket.limit_price == round(78000 * (1 + config.eod_limit_buffer_pct / 100), 2)
+        assert (ticket.band_low, ticket.band_high) == (77805.0, 78195.0)
+        assert (ticket.symbol, ticket.exchange) == ('GOLDM05FEB26FUT', 'MCX')
+        assert armer.get_ticket('GOLD_MINI') is ticket
+        openalgo.place_order.assert_not_called()
+
+    def test_rearm_replaces_ticket(self, openalgo):
+        armer = EODPreArmer(EODExecutor(PortfolioConfig(), openalgo), gold_mapper())
+        armer.arm(make_signal(price=78000.0))
+        ticket = armer.arm(make_signal(price=78100.0, lots=3))
+
+        assert armer.get_ticket('GOLD_MINI') is ticket
+        assert ticket.lots == 3 and ticket.reference_price == 78100.0
+
+    @pytest.mark.parametrize('signal, reason', [
+        (make_signal(entry=False), 'no_action'),
+        (make_signal(lots=0), 'Invalid lot size'),
+    ])
+    def test_unexecutable_signal_arms_invalid_ticket(self, openalgo, signal, reason):
+        ticket = EODPreArmer(EODExecutor(PortfolioConfig(), openalgo), gold_mapper()).arm(signal)
+        assert not ticket.valid
+        assert ticket.reason == reason
+
+    def test_synthetic_instrument_is_not_armed(self, openalgo):
+        mapper = MagicMock()
+        mapper.translate.return_value = TranslatedSymbol(
+            instrument='BANK_NIFTY', exchange='NFO', symbols=['BANKNIFTY26FEB2652000PE', 'BANKNIFTY26FEB2652000CE'],
+            expiry_date=date(2026, 2, 26), is_synthetic=True
+        )
+        ticket = EODPreArmer(EODExecutor(PortfolioConfig(), openalgo), mapper).arm(
+            make_signal('BANK_NIFTY', price=52000.0)
+        )
+        assert not ticket.valid
+        assert ticket.reason == 'multi_leg_instrument'
+
+
+class TestExecuteTicket:
+    """EODExecutor.execute_ticket"""
+
+    def test_places_single_order_on_resolved_contract(self, openalgo):
+        executor = EODExecutor(PortfolioConfig(), openalgo)
+        signal = make_signal()
+        ticket = EODPreArmer(executor, gold_mapper()).arm(signal)
+
+        context = executor.execute_ticket(ticket, signal)
+
+        assert context.order_id == 'EOD123'
+        assert context.phase == EODExecutionPhase.ORDER_TRACKING
+        openalgo.place_order.assert_called_once_with(
+            symbol='GOLDM05FEB26FUT', exchange='MCX', action='BUY', quantity=2,
+            order_type='LIMIT', price=ticket.limit_price
+        )
+
+    def test_price_outside_band_is_not_placed(self, openalgo):
+        executor = EODExecutor(PortfolioConfig(), openalgo)
+        signal = make_signal()
+        ticket = EODPreArmer(executor, gold_mapper(), price_band_pct=0.25).arm(signal)
+
+        context = executor.execute_ticket(ticket, signal, last_price=78400.0)
+
+        assert context.order_id is None
+        assert 'outside armed band' in context.error
+        openalgo.place_order.assert_not_called()
+
+
+class TestEngineArmedPath:
+    """LiveTradingEngine EOD_MONITOR arming and T-30 execution"""
+
+    @pytest.fixture
+    def engine(self, openalgo):
+        from live.engine import LiveTradingEngine
+
+        engine = LiveTradingEngine(initial_capital=5000000.0, openalgo_client=openalgo)
+        engine.eod_prearmer.symbol_mapper = gold_mapper()
+        return engine
+
+    def test_armed_ticket_is_placed_and_latency_recorded(self, engine, openalgo):
+        result = engine.process_eod_monitor_signal(make_signal())
+        assert result['armed'] is True
+
+        engine.eod_monitor.prepare_for_execution('GOLD_MINI')
+        result = engine.eod_execute('GOLD_MINI')
+
+        assert result['success'] and result['armed'] is True
+        assert openalgo.place_order.call_args.kwargs['symbol'] == 'GOLDM05FEB26FUT'
+        assert engine.eod_prearmer.get_ticket('GOLD_MINI') is None
+        assert engine.eod_order_targets['GOLD_MINI'] == ('GOLDM05FEB26FUT', 'MCX')
+
+        last = engine.eod_last_trigger_to_ack['GOLD_MINI']
+        assert last['path'] == 'armed' and last['acknowledged']
+        assert f'{EOD_TRIGGER_TO_ACK_LATENCY}_count' in engine.latency_metrics.render_prometheus()
+        assert engine.get_eod_status()['instruments']['GOLD_MINI']['last_trigger_to_ack'] == last
+
+    def test_position_change_after_arming_uses_prepared_path(self, engine, openalgo):
+        engine.process_eod_monitor_signal(make_signal())
+        engine.eod_monitor.prepare_for_execution('GOLD_MINI')
+        engine._eod_db_position_state = MagicMock(return_value=(True, 0))
+
+        result = engine.eod_execute('GOLD_MINI')
+
+        # Ticket was armed flat (BASE_ENTRY); now in position it is a pyramid
+        assert result['success'] and result['armed'] is False
+        assert result['signal_type'] == SignalType.PYRAMID.value
+        assert openalgo.place_order.call_count == 1
+        assert engine.eod_last_trigger_to_ack['GOLD_MINI']['path'] == 'prepared'
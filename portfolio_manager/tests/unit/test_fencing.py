@@ -0,0 +1,172 @@
+"""
+Unit tests for fast-failover leadership and order fencing
+
+Tests fenced election (lease + fencing token in one script), local lease
+deadline and stale-token checks, asynchronous DB transition writes, lease
+notification filtering, and the FencedBrokerClient order gate.
+"""
+import time
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+from core.fencing import FencedBrokerClient, OrderFence
+from core.latency_metrics import FENCED_ORDERS, get_latency_metrics
+from core.redis_coordinator import RedisCoordinator
+
+
+@pytest.fixture
+def redis_client():
+    with patch('core.redis_coordinator.ConnectionPool'), \
+         patch('core.redis_coordinator.redis.Redis') as mock_redis_class:
+        client = Mock()
+        client.ping.return_value = True
+        client.eval.return_value = 7  # Fencing token from INCR
+        mock_redis_class.return_value = client
+        yield client
+
+
+def make_coordinator(db_manager=None, **config):
+    return RedisCoordinator(dict({'enable_redis': True, 'fast_failover': True}, **config), db_manager=db_manager)
+
+
+class TestFastFailoverCoordinator:
+    """RedisCoordinator with fast_failover enabled"""
+
+    def test_fast_mode_uses_short_lease(self, redis_client):
+        assert make_coordinator().LEADER_TTL == RedisCoordinator.FAST_LEADER_TTL
+        assert make_coordinator(leader_ttl=2).LEADER_TTL == 2
+        assert RedisCoordinator({'enable_redis': True}).fast_failover is False
+
+    def test_election_takes_fencing_token(self, redis_client):
+        coordinator = make_coordinator()
+
+        assert coordinator.elect_leader() is True
+        assert coordinator.is_leader is True
+        assert coordinator.fencing_token == 7
+        assert coordinator.fence_violation() is None
+        assert coordinator.fence_violation(7) is None
+        keys = redis_client.eval.call_args.args[2:4]
+        assert keys == (coordinator.LEADER_KEY, coordinator.FENCING_KEY)
+
+    def test_lost_election_has_no_token(self, redis_client):
+        redis_client.eval.return_value = 0
+        coordinator = make_coordinator()
+
+        assert coordinator.elect_leader() is False
+        assert coordinator.fencing_token is None
+        assert coordinator.fence_violation() == 'not_leader'
+
+    def test_expired_lease_and_stale_token_are_fenced(self, redis_client):
+        coordinator = make_coordinator()
+        coordinator.elect_leader()
+
+        assert coordinator.fence_violation(6).startswith('stale_fencing_token 6')
+        coordinator._lease_deadline = time.monotonic() - 0.01
+        assert coordinator.fence_violation() == 'lease_expired'
+
+    def test_demotion_clears_token(self, redis_client):
+        coordinator = make_coordinator()
+        coordinator.elect_leader()
+
+        coordinator.is_leader = False
+
+        assert coordinator.fencing_token is None
+        assert coordinator.get_metrics()['fencing_token'] is None
+
+    def test_leadership_transition_is_not_written_inline(self, redis_client):
+        db_manager = Mock()
+        coordinator = make_coordinator(db_manager=db_manager)
+        db_manager.reset_mock()  # Instance registration on init
+
+        coordinator.elect_leader()
+
+        db_manager.upsert_instance_metadata.assert_not_called()
+        db_manager.record_leadership_transition.assert_not_called()
+
+        coordinator._drain_db_queue()
+        assert db_manager.upsert_instance_metadata.call_args.kwargs['is_leader'] is True
+        db_manager.record_leadership_transition.assert_called_once()
+
+    def test_release_publishes_event(self, redis_client):
+        coordinator = make_coordinator()
+        coordinator.elect_leader()
+        redis_client.eval.return_value = 1
+
+        assert coordinator.release_leadership() is True
+        redis_client.publish.assert_called_once_with(
+            coordinator.LEADER_EVENTS_CHANNEL, f'released:{coordinator.instance_id}'
+        )
+
+    @pytest.mark.parametrize('message, expected', [
+        (None, False),
+        ({'type': 'message', 'channel': 'pm:leader:events', 'data': 'released:x'}, True),
+        ({'type': 'message', 'channel': '__keyevent@0__:expired', 'data': 'pm:leader'}, True),
+        ({'type': 'message', 'channel': '__keyevent@0__:del', 'data': 'other:key'}, False),
+        ({'type': 'subscribe', 'channel': 'pm:leader:events', 'data': 1}, False),
+    ])
+    def test_lease_event_filter(self, redis_client, message, expected):
+        assert make_coordinator()._is_lease_event(message) is expected
+
+
+class TestOrderFence:
+    """OrderFence and FencedBrokerClient"""
+
+    @pytest.fixture
+    def broker(self):
+        broker = MagicMock()
+        broker.place_order.return_value = {'status': 'success', 'orderid': 'A1'}
+        return broker
+
+    def test_unattached_fence_allows_orders(self, broker):
+        client = FencedBrokerClient(broker, OrderFence())
+
+        assert client.place_order(symbol='GOLDM', action='BUY', quantity=1)['status'] == 'success'
+        broker.place_order.assert_called_once()
+
+    def test_rejects_when_coordinator_reports_violation(self, broker):
+        coordinator = Mock(instance_id='pm-2', fencing_token=None)
+        coordinator.fence_violation.return_value = 'lease_expired'
+        fence = OrderFence()
+        fence.attach(coordinator)
+        client = FencedBrokerClient(broker, fence)
+
+        result = client.modify_order(order_id='A1', price=100.0)
+
+        assert result == {'status': 'error', 'error': 'fenced: lease_expired'}
+        broker.modify_order.assert_not_called()
+        assert FENCED_ORDERS in get_latency_metrics().render_prometheus()
+
+    def test_scope_captures_token_and_reads_pass_through(self, broker):
+        coordinator = Mock(instance_id='pm-1', fencing_token=3)
+        coordinator.fence_violation.return_value = None
+        fence = OrderFence()
+        fence.attach(coordinator)
+        client = FencedBrokerClient(broker, fence)
+
+        with fence.scope() as token:
+            client.place_order(symbol='GOLDM', action='BUY', quantity=1)
+        client.get_positions()
+
+        assert token == 3
+        coordinator.fence_violation.assert_called_once_with(3)
+        broker.get_positions.assert_called_once()
+        assert fence.violation() is None
+        coordinator.fence_violation.assert_called_with(None)
+
+    def test_fenced_job_runs_in_its_own_scope(self, broker):
+        coordinator = Mock(instance_id='pm-1', fencing_token=4)
+        coordinator.fence_violation.side_effect = lambda token: 'stale' if token == 4 else None
+        fence = OrderFence()
+        fence.attach(coordinator)
+        client = FencedBrokerClient(broker, fence)
+
+        def eod_execute(instrument):
+            coordinator.fencing_token = 5  # lost and re-acquired leadership mid-job
+            return client.place_order(symbol=instrument, action='BUY', quantity=1)
+
+        result = fence.fenced(eod_execute)('GOLDM')
+
+        assert result == {'status': 'error', 'error': 'fenced: stale'}
+        broker.place_order.assert_not_called()
+        assert fence.violation() is None
@@ -0,0 +1,218 @@
+"""
+Unit tests for the streaming V9 indicator engine
+
+Tests Pine semantics of each indicator, parity between the streaming,
+vectorized and warm-up paths, the bar builder, and PM-side stop monitoring
+driven by local bars.
+"""
+import math
+from datetime import datetime, time
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from core.indicators import (
+    Bar, BarBuilder, IndicatorEngine, IndicatorParams, compute_indicators, get_indicator_params
+)
+
+SERIES_KEYS = (
+    'atr', 'supertrend', 'direction', 'rsi', 'ema', 'dc_upper', 'dc_lower',
+    'di_plus', 'di_minus', 'adx', 'er', 'roc'
+)
+
+
+def random_ohlc(n=600, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 50000 + np.cumsum(rng.normal(5, 60, n))
+    open_ = close + rng.normal(0, 25, n)
+    high = np.maximum(open_, close) + rng.uniform(0, 40, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 40, n)
+    return open_, high, low, close
+
+
+def stream(engine, o, h, l, c):
+    return [engine.update(o[i], h[i], l[i], c[i]) for i in range(len(c))]
+
+
+class TestPineSemantics:
+    """Indicator values against direct transcriptions of the Pine formulas"""
+
+    def test_atr_is_wilder_smoothing_seeded_with_sma(self):
+        params = IndicatorParams(atr_period=3)
+        engine = IndicatorEngine('BANK_NIFTY', params)
+        bars = [(10, 12, 9, 11), (11, 13, 10, 12), (12, 15, 11, 14), (14, 14, 12, 13)]
+        snaps = [engine.update(*bar) for bar in bars]
+
+        # TR: first bar high-low, then max(h-l, |h-pc|, |l-pc|)
+        tr = [3, 3, 4, 2]
+        assert snaps[1].atr is None
+        assert snaps[2].atr == pytest.approx(sum(tr[:3]) / 3)
+        assert snaps[3].atr == pytest.approx((snaps[2].atr * 2 + tr[3]) / 3)
+
+    def test_donchian_excludes_current_bar(self):
+        params = IndicatorParams(dc_period=3)
+        engine = IndicatorEngine('BANK_NIFTY', params)
+        highs = [10, 12, 11, 20, 13]
+        snaps = [engine.update(h - 1, h, h - 2, h - 1) for h in highs]
+
+        assert snaps[2].dc_upper is None
+        assert snaps[3].dc_upper == 12        # bars 0-2, not the 20 on bar 3
+        assert snaps[4].dc_upper == 20
+        assert snaps[4].dc_lower == 9         # lows 9, 18, 11
+
+    def test_efficiency_ratio(self):
+        params = IndicatorParams(er_period=3)
+        engine = IndicatorEngine('BANK_NIFTY', params)
+        closes = [100, 102, 101, 104, 104]
+        snaps = [engine.update(c, c + 1, c - 1, c) for c in closes]
+
+        assert snaps[2].er is None
+        assert snaps[3].er == pytest.approx(4 / (2 + 1 + 3))
+        assert snaps[4].er == pytest.approx(2 / (1 + 3 + 0))
+
+    def test_efficiency_ratio_flat_is_zero(self):
+        engine = IndicatorEngine('BANK_NIFTY', IndicatorParams(er_period=3))
+        snaps = [engine.update(100, 101, 99, 100) for _ in range(5)]
+        assert snaps[-1].er == 0.0
+
+    def test_rsi_extremes(self):
+        engine = IndicatorEngine('BANK_NIFTY', IndicatorParams(rsi_period=6))
+        snaps = [engine.update(c, c + 1, c - 1, c) for c in range(100, 110)]
+        assert snaps[5].rsi is None
+        assert snaps[6].rsi == 100.0
+
+    def test_roc_and_doji(self):
+        engine = IndicatorEngine('BANK_NIFTY', IndicatorParams(roc_period=2))
+        engine.update(100, 101, 99, 100)
+        engine.update(100, 111, 99, 110)
+        snap = engine.update(110.5, 125, 105, 111)
+
+        assert snap.roc == pytest.approx(11.0)
+        assert snap.is_doji                   # body 0.5 of range 20
+
+    def test_supertrend_matches_reference(self):
+        """ta.supertrend reference implementation from the Pine manual"""
+        o, h, l, c = random_ohlc(300)
+        params = IndicatorParams()
+        engine = IndicatorEngine('GOLD_MINI', params)
+        snaps = stream(engine, o, h, l, c)
+
+        atrs = [s.atr for s in snaps]
+        prev_upper = prev_lower = 0.0
+        prev_st = None
+        for i, snap in enumerate(snaps):
+            if atrs[i] is None:
+                assert snap.supertrend is None
+                continue
+            hl2 = (h[i] + l[i]) / 2
+            upper = hl2 + params.st_multiplier * atrs[i]
+            lower = hl2 - params.st_multiplier * atrs[i]
+            pc = c[i - 1] if i > 0 else math.nan
+            lower = lower if (lower > prev_lower or pc < prev_lower) else prev_lower
+            upper = upper if (upper < prev_upper or pc > prev_upper) else prev_upper
+            if i == 0 or atrs[i - 1] is None:
+                direction = 1
+            elif prev_st == prev_upper:
+                direction = -1 if c[i] > upper else 1
+            else:
+                direction = 1 if c[i] < lower else -1
+            prev_st = lower if direction == -1 else upper
+            prev_upper, prev_lower = upper, lower
+
+            assert snap.direction == direction
+            assert snap.supertrend == pytest.approx(prev_st)
+
+    def test_instrument_adx_thresholds(self):
+        assert get_indicator_params('GOLD_MINI').adx_threshold == 15.0
+        assert get_indicator_params('SILVER_MINI').adx_threshold == 25.0
+        assert get_indicator_params('BANK_NIFTY').adx_threshold == 25.0
+
+
+class TestParity:
+    """Streaming, vectorized and warm-up paths agree"""
+
+    def test_streaming_matches_vectorized(self):
+        o, h, l, c = random_ohlc()
+        series = compute_indicators(o, h, l, c)
+        snaps = stream(IndicatorEngine('BANK_NIFTY'), o, h, l, c)
+
+        for key in SERIES_KEYS:
+            streamed = np.array([np.nan if getattr(s, key) is None else getattr(s, key) for s in snaps])
+            np.testing.assert_allclose(streamed, series[key], rtol=1e-9, equal_nan=True, err_msg=key)
+        assert [s.is_doji for s in snaps] == series['is_doji'].tolist()
+
+    def test_all_indicators_ready_after_warmup_bars(self):
+        o, h, l, c = random_ohlc()
+        params = IndicatorParams()
+        snaps = stream(IndicatorEngine('BANK_NIFTY', params), o, h, l, c)
+        assert not snaps[params.warmup_bars - 2].ready
+        assert snaps[params.warmup_bars - 1].ready
+
+    @pytest.mark.parametrize('history', [50, 400])
+    def test_warm_up_then_stream_matches_full_stream(self, history):
+        """Vectorized seeding (long history) and replay (short) both continue exactly"""
+        o, h, l, c = random_ohlc()
+        full = stream(IndicatorEngine('SILVER_MINI'), o, h, l, c)
+
+        engine = IndicatorEngine('SILVER_MINI')
+        engine.warm_up(o[:history], h[:history], l[:history], c[:history])
+        tail = [engine.update(o[i], h[i], l[i], c[i]) for i in range(history, len(c))]
+
+        assert engine.bars_seen == len(c)
+        for got, want in zip(tail, full[history:]):
+            for key in SERIES_KEYS:
+                a, b = getattr(got, key), getattr(want, key)
+                assert (a is None) == (b is None), key
+                if a is not None:
+                    assert a == pytest.approx(b, rel=1e-9), key
+
+    def test_conditions_and_market_data(self):
+        o, h, l, c = random_ohlc()
+        snap = stream(IndicatorEngine('GOLD_MINI'), o, h, l, c)[-1]
+
+        conditions = snap.to_conditions()
+        assert conditions.st_condition == (snap.close > snap.supertrend)
+        assert conditions.adx_condition == (snap.adx < 15.0)
+        assert conditions.long_exit == (snap.close < snap.supertrend)
+        assert conditions.long_entry == conditions.all_entry_conditions_met()
+
+        signal = snap.to_market_data_signal('GOLD_MINI', datetime(2025, 12, 29, 14, 0))
+        assert signal.price == snap.close
+        assert signal.atr == snap.atr
+        assert signal.supertrend == snap.supertrend
+
+
+class TestBarBuilder:
+    """Tick aggregation into session-anchored bars"""
+
+    def test_bank_nifty_75_minute_bars(self):
+        builder = BarBuilder(75, time(9, 15))
+        assert builder.on_tick(100, datetime(2025, 12, 29, 9, 20)) is None
+        assert builder.on_tick(105, datetime(2025, 12, 29, 10, 0)) is None
+        assert builder.on_tick(98, datetime(2025, 12, 29, 10, 29)) is None
+
+        bar = builder.on_tick(101, datetime(2025, 12, 29, 10, 30))
+        assert bar == Bar(datetime(2025, 12, 29, 9, 15), 100, 105, 98, 98)
+        assert builder.flush().timestamp == datetime(2025, 12, 29, 10, 30)
+
+
+class TestLocalStopMonitoring:
+    """LiveTradingEngine.process_local_bar"""
+
+    def test_local_bars_drive_market_data_processing(self):
+        from live.engine import LiveTradingEngine
+
+        engine = LiveTradingEngine(initial_capital=5000000.0, openalgo_client=MagicMock())
+        engine.process_market_data_signal = MagicMock(return_value={'status': 'processed'})
+        o, h, l, c = random_ohlc(12)
+        results = [
+            engine.process_local_bar('GOLD_MINI', Bar(datetime(2025, 12, 29, 9, 0), o[i], h[i], l[i], c[i]))
+            for i in range(12)
+        ]
+
+        assert results[0]['status'] == 'warming_up'
+        assert results[-1] == {'status': 'processed', 'source': 'local'}
+        signal = engine.process_market_data_signal.call_args[0][0]
+        assert signal.instrument == 'GOLD_MINI'
+        assert signal.price == c[-1]
@@ -0,0 +1,141 @@
+"""
+Unit tests for latency metrics registry
+
+Tests fixed-bucket histograms, counters and Prometheus text rendering
+used by GET /metrics
+"""
+import threading
+
+import pytest
+
+from core.latency_metrics import (
+    Histogram, LatencyMetricsRegistry, get_latency_metrics,
+    WEBHOOK_STAGE_LATENCY, BROKER_CALL_LATENCY
+)
+
+
+class TestHistogram:
+    """Test single histogram series"""
+
+    def test_observe_places_value_in_bucket(self):
+        """Values land in the first bucket whose bound is >= value"""
+        hist = Histogram(buckets=(1, 10, 100))
+        hist.observe(0.5)
+        hist.observe(1)
+        hist.observe(50)
+        hist.observe(5000)
+
+        counts, total, count = hist.snapshot()
+        assert counts == [2, 0, 1, 1]  # last slot is +Inf
+        assert count == 4
+        assert total == pytest.approx(5051.5)
+
+    def test_percentile_interpolates_within_bucket(self):
+        """Percentile uses linear interpolation inside the bucket"""
+        hist = Histogram(buckets=(10, 20))
+        for _ in range(10):
+            hist.observe(15)
+
+        # All samples in (10, 20] bucket - p50 is halfway through it
+        assert hist.percentile(50.0) == pytest.approx(15.0)
+        assert hist.percentile(100.0) == pytest.approx(20.0)
+
+    def test_percentile_empty(self):
+        """Empty histogram reports zero"""
+        assert Histogram().percentile(95.0) == 0.0
+
+    def test_percentile_overflow_reports_largest_bound(self):
+        """Samples above the last bound report the largest finite bound"""
+        hist = Histogram(buckets=(1, 10))
+        hist.observe(1000)
+        assert hist.percentile(99.0) == 10.0
+
+    def test_concurrent_observe(self):
+        """Concurrent observations are not lost"""
+        hist = Histogram(buckets=(1, 10))
+
+        def worker():
+            for _ in range(1000):
+                hist.observe(5)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        _, _, count = hist.snapshot()
+        assert count == 8000
+
+
+class TestLatencyMetricsRegistry:
+    """Test labelled registry and exposition format"""
+
+    def test_same_labels_return_same_series(self):
+        """Label order does not create duplicate series"""
+        registry = LatencyMetricsRegistry()
+        a = registry.histogram('x', stage='parse', instrument='GOLD_MINI')
+        b = registry.histogram('x', instrument='GOLD_MINI', stage='parse')
+        assert a is b
+
+    def test_time_context_manager_records_on_exception(self):
+        """Elapsed time is recorded even when the block raises"""
+        registry = LatencyMetricsRegistry()
+        with pytest.raises(ValueError):
+            with registry.time(BROKER_CALL_LATENCY, call='quote', instrument='BANK_NIFTY'):
+                raise ValueError("broker down")
+
+        _, _, count = registry.histogram(
+            BROKER_CALL_LATENCY, call='quote', instrument='BANK_NIFTY'
+        ).snapshot()
+        assert count == 1
+
+    def test_render_prometheus_histogram(self):
+        """Histogram renders cumulative buckets, sum and count"""
+        registry = LatencyMetricsRegistry(buckets=(1, 10))
+        registry.describe(WEBHOOK_STAGE_LATENCY, 'Stage latency')
+        registry.observe(WEBHOOK_STAGE_LATENCY, 0.5, stage='parse', instrument='GOLD_MINI')
+        registry.observe(WEBHOOK_STAGE_LATENCY, 5, stage='parse', instrument='GOLD_MINI')
+
+        text = registry.render_prometheus()
+        name = WEBHOOK_STAGE_LATENCY
+        assert f'# HELP {name} Stage latency' in text
+        assert f'# TYPE {name} histogram' in text
+        assert f'{name}_bucket{{instrument="GOLD_MINI",stage="parse",le="1"}} 1' in text
+        assert f'{name}_bucket{{instrument="GOLD_MINI",stage="parse",le="10"}} 2' in text
+        assert f'{name}_bucket{{instrument="GOLD_MINI",stage="parse",le="+Inf"}} 2' in text
+        assert f'{name}_sum{{instrument="GOLD_MINI",stage="parse"}} 5.5' in text
+        assert f'{name}_count{{instrument="GOLD_MINI",stage="parse"}} 2' in text
+
+    def test_render_prometheus_counter(self):
+        """Counter renders TYPE line and value"""
+        registry = LatencyMetricsRegistry()
+        registry.inc('requests_total', signal_type='PYRAMID', http_status='200')
+        registry.inc('requests_total', signal_type='PYRAMID', http_status='200')
+
+        text = registry.render_prometheus()
+        assert '# TYPE requests_total counter' in text
+        assert 'requests_total{http_status="200",signal_type="PYRAMID"} 2' in text
+
+    def test_label_values_are_escaped(self):
+        """Quotes in label values are escaped"""
+        registry = LatencyMetricsRegistry()
+        registry.inc('c', reason='bad "quote"')
+        assert 'c{reason="bad \\"quote\\""} 1' in registry.render_prometheus()
+
+    def test_get_stats(self):
+        """get_stats summarises each series"""
+        registry = LatencyMetricsRegistry(buckets=(10, 100))
+        registry.observe('h', 50, stage='db_log')
+
+        stats = registry.get_stats('h')
+        assert stats['{stage="db_log"}']['count'] == 1
+        assert stats['{stage="db_log"}']['avg_ms'] == 50
+
+    def test_empty_registry_renders_empty(self):
+        """No metrics renders an empty body"""
+        assert LatencyMetricsRegistry().render_prometheus() == ''
+
+    def test_global_registry_singleton(self):
+        """get_latency_metrics returns the same instance"""
+        assert get_latency_metrics() is get_latency_metrics()
@@ -0,0 +1,114 @@
+"""
+Unit tests for the OHLC strategy simulator
+
+Tests the Tom Basso per-bar state machine, signal generation from bars,
+CSV loading and feeding PortfolioBacktestEngine.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.engine import PortfolioBacktestEngine
+from backtest.ohlc_simulator import (
+    EVENT_ENTRY, EVENT_EXIT, EVENT_PYRAMID, OHLCStrategySimulator, StrategyRules,
+    _simulate_kernel, get_strategy_rules, load_ohlc_csv, simulate_signals
+)
+from core.models import SignalType
+
+
+def trending_bars(n=1500, seed=3, start=50000.0):
+    rng = np.random.default_rng(seed)
+    close = start * np.exp(np.cumsum(rng.normal(0.0006, 0.006, n)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.002, n))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.002, n))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2020-01-01 09:15', periods=n, freq='75min'),
+        'open': open_, 'high': high, 'low': low, 'close': close,
+    })
+
+
+def run_kernel(close, entry, rules=StrategyRules(), atr=10.0):
+    close = np.asarray(close, dtype=float)
+    return [
+        tuple(event) for event in zip(*(a.tolist() for a in _simulate_kernel(
+            close, np.full(len(close), atr), np.asarray(entry, dtype=bool),
+            rules.max_pyramids, rules.atr_pyramid_threshold,
+            rules.basso_initial_atr_mult, rules.basso_trailing_atr_mult
+        )))
+    ]
+
+
+class TestKernel:
+    """Per-bar state machine (ATR fixed at 10, initial stop 1 ATR, trail 2 ATR)"""
+
+    def test_entry_pyramid_and_independent_exits(self):
+        close = [100, 105, 111, 116, 121, 100]
+        events = run_kernel(close, [True] + [False] * 5)
+
+        assert events[0] == (0, EVENT_ENTRY, 0, 90.0)
+        # Bar 1: +5 is not > 1R (10); bar 2: +11 > 1R and 1.1 ATR from last entry
+        # Pyramid stop is the base layer's stop before this bar's trailing update
+        assert events[1] == (2, EVENT_PYRAMID, 1, 90.0)
+        assert events[2] == (3, EVENT_PYRAMID, 2, 91.0)
+        assert events[3] == (4, EVENT_PYRAMID, 3, 96.0)
+        # Bar 5 closes below every layer's trailing stop
+        assert [e[1:3] for e in events[-4:]] == [(EVENT_EXIT, 0), (EVENT_EXIT, 1), (EVENT_EXIT, 2), (EVENT_EXIT, 3)]
+
+    def test_no_entry_while_in_position(self):
+        events = run_kernel([100, 101, 102], [True, True, True])
+        assert [e[1] for e in events] == [EVENT_ENTRY]
+
+    def test_stop_only_moves_up(self):
+        events = run_kernel([100, 130, 115, 109], [True, False, False, False],
+                            StrategyRules(max_pyramids=0))
+        # Highest close 130 -> stop 110; the dip to 115 keeps it, 109 exits
+        assert events[-1] == (3, EVENT_EXIT, 0, 110.0)
+
+    def test_pyramid_count_capped(self):
+        close = np.arange(100, 400, 10)
+        events = run_kernel(close, [True] + [False] * (len(close) - 1), get_strategy_rules('GOLD_MINI'))
+        assert sum(1 for e in events if e[1] == EVENT_PYRAMID) == 3
+
+
+class TestSimulateSignals:
+    """Signals generated from bars"""
+
+    def test_signals_are_consistent(self):
+        signals = simulate_signals('BANK_NIFTY', trending_bars())
+
+        assert signals, "trending series should produce trades"
+        assert signals[0].signal_type == SignalType.BASE_ENTRY
+        open_layers = set()
+        for signal in signals:
+            if signal.signal_type == SignalType.EXIT:
+                assert signal.position in open_layers
+                assert signal.reason == 'TOM_BASSO_STOP'
+                open_layers.remove(signal.position)
+            else:
+                assert signal.position not in open_layers
+                assert 0 < signal.stop < signal.price
+                open_layers.add(signal.position)
+
+    def test_load_ohlc_csv_epoch_seconds(self, tmp_path):
+        path = tmp_path / 'bars.csv'
+        path.write_text('time,open,high,low,close\n1700000300,2,3,1,2\n1700000000,1,2,0.5,1.5\n')
+
+        bars = load_ohlc_csv(str(path))
+
+        assert bars['close'].tolist() == [1.5, 2]
+        assert bars['timestamp'][0] == pd.Timestamp(1700000000, unit='s')
+
+
+class TestEngineFeed:
+    """OHLCStrategySimulator.run with PortfolioBacktestEngine"""
+
+    def test_run_sizes_pyramids_from_base_position(self):
+        engine = PortfolioBacktestEngine(initial_capital=5000000.0)
+        simulator = OHLCStrategySimulator()
+        bars = {'BANK_NIFTY': trending_bars(), 'GOLD_MINI': trending_bars(seed=5, start=70000.0)}
+
+        result = simulator.run(engine, bars)
+
+        assert result['stats']['signals_processed'] == len(simulator.generate_signals(bars))
+        assert result['stats']['entries_executed'] > 0
@@ -0,0 +1,266 @@
+"""
+Unit tests for audit table partition maintenance
+
+Tests month arithmetic, future partition creation, retention cutoffs and
+Parquet archival before drop, against an in-memory fake of the catalog
+"""
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+import time
+
+import pytest
+from psycopg2 import sql
+
+from core.partition_maintenance import (
+    PartitionMaintenance, PartitionPolicy, add_months, partition_bounds, partition_name
+)
+
+Column = namedtuple('Column', ['name', 'type_code', 'precision', 'scale'], defaults=(None, None))
+
+
+def render(query) -> str:
+    """Render a psycopg2.sql object without a connection"""
+    if isinstance(query, sql.Composed):
+        return ''.join(render(part) for part in query.seq)
+    if isinstance(query, sql.Identifier):
+        return '.'.join(query.strings)
+    if isinstance(query, sql.SQL):
+        return query.string
+    return str(query)
+
+
+class FakeCursor:
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.result = []
+        self.description = None
+        self.itersize = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        text = render(query)
+        self.catalog.statements.append((text, params))
+        if 'pg_partitioned_table' in text:
+            self.result = [(1,)] if params[0] in self.catalog.partitions else []
+        elif 'pg_inherits' in text:
+            names = self.catalog.partitions.get(params[0], [])
+            self.result = [(name.rsplit('.', 1)[-1],) for name in names]
+        elif text.startswith('CREATE TABLE IF NOT EXISTS'):
+            parent = text.split(' PARTITION OF ')[1].split(' ')[0]
+            self.catalog.partitions[parent].append(text.split()[5])
+        elif text.startswith('ALTER TABLE') and 'DETACH PARTITION' in text:
+            parent, child = text.split()[2], text.split()[5]
+            self.catalog.partitions[parent].remove(child)
+        elif text.startswith('SELECT * FROM'):
+            partition = text.split()[-1]
+            self.description = self.catalog.columns
+            self.result = list(self.catalog.rows.get(partition, []))
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def fetchall(self):
+        return list(self.result)
+
+    def fetchmany(self, size):
+        batch, self.result = self.result[:size], self.result[size:]
+        return batch
+
+
+class FakeDB:
+    """DatabaseStateManager stand-in backed by a dict catalog"""
+
+    def __init__(self, partitions, rows=None):
+        self.partitions = partitions
+        self.rows = rows or {}
+        self.columns = [Column('id', 20), Column('created_at', 1114), Column('payload', 3802)]
+        self.statements = []
+
+    @contextmanager
+    def get_connection(self):
+        conn = self
+        yield conn
+
+    transaction = get_connection
+
+    def cursor(self, name=None, cursor_factory=None):
+        return FakeCursor(self)
+
+    def rollback(self):
+        pass
+
+
+class TestPartitionNaming:
+    """Test month arithmetic and name parsing"""
+
+    def test_add_months_wraps_year(self):
+        assert add_months(date(2026, 11, 15), 2) == date(2027, 1, 1)
+        assert add_months(date(2026, 1, 31), -1) == date(2025, 12, 1)
+
+    def test_partition_bounds(self):
+        assert partition_name('signal_audit', date(2026, 3, 1)) == 'signal_audit_p202603'
+        assert partition_bounds('margin_monitor.margin_snapshots_p202612') == (
+            date(2026, 12, 1), date(2027, 1, 1)
+        )
+        assert partition_bounds('signal_audit_pdefault') is None
+
+
+class TestPartitionMaintenance:
+    """Test maintenance passes"""
+
+    def test_creates_missing_future_partitions(self, tmp_path):
+        """Current month plus months_ahead are created; existing ones kept"""
+        db = FakeDB({'signal_audit': ['signal_audit_p202610', 'signal_audit_pdefault']})
+        maintenance = PartitionMaintenance(
+            db, archive_dir=str(tmp_path), months_ahead=2,
+            policies=[PartitionPolicy('signal_audit', retention_days=90)]
+        )
+
+        results = maintenance.run(today=date(2026, 10, 18))
+
+        assert results[0]['created'] == ['signal_audit_p202611', 'signal_audit_p202612']
+        assert 'signal_audit_p202612' in db.partitions['signal_audit']
+
+    def test_unpartitioned_table_skipped(self, tmp_path):
+        """Tables without migration 016 applied are reported, not touched"""
+        db = FakeDB({})
+        maintenance = PartitionMaintenance(
+            db, archive_dir=str(tmp_path), policies=[PartitionPolicy('leadership_history', 365)]
+        )
+
+        results = maintenance.run(today=date(2026, 10, 18))
+
+        assert results[0]['skipped'] == 'not partitioned'
+        assert len(db.statements) == 1
+
+    def test_expired_partitions_respect_whole_month(self, tmp_path):
+        """A partition is only expired once its entire month is past the cutoff"""
+        db = FakeDB({'signal_log': [
+            'signal_log_p202608', 'signal_log_p202609', 'signal_log_p202610', 'signal_log_pdefault'
+        ]})
+        maintenance = PartitionMaintenance(db, archive_dir=str(tmp_path))
+
+        assert maintenance.expired_partitions('signal_log', date(2026, 10, 1)) == [
+            'signal_log_p202608', 'signal_log_p202609'
+        ]
+        assert maintenance.expired_partitions('signal_log', date(2026, 9, 30)) == ['signal_log_p202608']
+
+    def test_dry_run_changes_nothing(self, tmp_path):
+        """Dry run reports creations and drops without executing DDL"""
+        db = FakeDB({'signal_log': ['signal_log_p202601']})
+        maintenance = PartitionMaintenance(
+            db, archive_dir=str(tmp_path), months_ahead=0,
+            policies=[PartitionPolicy('signal_log', retention_days=7)]
+        )
+
+        results = maintenance.run(today=date(2026, 10, 18), dry_run=True)
+
+        assert results[0]['created'] == ['signal_log_p202610']
+        assert results[0]['dropped'] == ['signal_log_p202601']
+        assert db.partitions['signal_log'] == ['signal_log_p202601']
+
+
+class TestLeadership:
+    """Test background maintenance gating on leadership"""
+
+    def test_standby_does_not_run(self, tmp_path):
+        """Background loop runs a pass only while leader_check returns True"""
+        db = FakeDB({'signal_log': []})
+        leader = {'value': False}
+        maintenance = PartitionMaintenance(
+            db, archive_dir=str(tmp_path), months_ahead=0, standby_poll_seconds=0.01,
+            policies=[PartitionPolicy('signal_log', retention_days=7)],
+            leader_check=lambda: leader['value']
+        )
+
+        maintenance.start_background_maintenance()
+        try:
+            deadline = time.time() + 0.2
+            while time.time() < deadline:
+                time.sleep(0.01)
+            assert db.statements == []
+
+            leader['value'] = True
+            deadline = time.time() + 2.0
+            while not db.statements and time.time() < deadline:
+                time.sleep(0.01)
+            assert db.statements
+        finally:
+            maintenance.stop_background_maintenance()
+
+
+class TestArchival:
+    """Test Parquet export before drop"""
+
+    def test_archive_then_drop(self, tmp_path):
+        """Expired partition is written to Parquet, verified, then detached"""
+        pq = pytest.importorskip('pyarrow.parquet')
+
+        rows = [(i, datetime(2026, 6, 1, 9, 15), {'outcome': 'PROCESSED', 'n': i}) for i in range(25)]
+        db = FakeDB(
+            {'signal_audit': ['signal_audit_p202606', 'signal_audit_p202610']},
+            rows={'signal_audit_p202606': rows}
+        )
+        maintenance = PartitionMaintenance(
+            db, archive_dir=str(tmp_path), months_ahead=0, fetch_size=10,
+            policies=[PartitionPolicy('signal_audit', retention_days=90)]
+        )
+
+        results = maintenance.run(today=date(2026, 10, 18))
+
+        path = tmp_path / 'signal_audit' / 'signal_audit_p202606.parquet'
+        assert results[0]['archived'] == [str(path)]
+        assert results[0]['dropped'] == ['signal_audit_p202606']
+        assert db.partitions['signal_audit'] == ['signal_audit_p202610']
+
+        table = pq.read_table(str(path))
+        assert table.num_rows == 25
+        assert table.column('payload')[3].as_py() == '{"outcome": "PROCESSED", "n": 3}'
+        assert any(s.startswith('DROP TABLE signal_audit_p202606') for s, _ in db.statements)
+
+    def test_numeric_columns_archived_exactly(self, tmp_path):
+        """NUMERIC(p, s) becomes decimal128, unconstrained NUMERIC becomes text"""
+        pa = pytest.importorskip('pyarrow')
+        pq = pytest.importorskip('pyarrow.parquet')
+
+        rows = [(1, Decimal('52012.35'), Decimal('0.1000000000000000000001'))]
+        db = FakeDB(
+            {'order_execution_log': ['order_execution_log_p202606', 'order_execution_log_p202610']},
+            rows={'order_execution_log_p202606': rows}
+        )
+        db.columns = [Column('id', 20), Column('fill_price', 1700, 12, 2), Column('ratio', 1700)]
+        maintenance = PartitionMaintenance(
+            db, archive_dir=str(tmp_path), months_ahead=0,
+            policies=[PartitionPolicy('order_execution_log', retention_days=90)]
+        )
+
+        maintenance.run(today=date(2026, 10, 18))
+
+        table = pq.read_table(str(tmp_path / 'order_execution_log' / 'order_execution_log_p202606.parquet'))
+        assert table.schema.field('fill_price').type == pa.decimal128(12, 2)
+        assert table.column('fill_price')[0].as_py() == Decimal('52012.35')
+        assert table.column('ratio')[0].as_py() == '0.1000000000000000000001'
+
+    def test_missing_pyarrow_keeps_partitions(self, tmp_path, monkeypatch):
+        """Without pyarrow nothing is dropped"""
+        import core.partition_maintenance as pm
+        monkeypatch.setattr(pm, 'PYARROW_AVAILABLE', False)
+
+        db = FakeDB({'signal_audit': ['signal_audit_p202601', 'signal_audit_p202610']})
+        maintenance = PartitionMaintenance(
+            db, archive_dir=str(tmp_path), months_ahead=0,
+            policies=[PartitionPolicy('signal_audit', retention_days=90)]
+        )
+
+        results = maintenance.run(today=date(2026, 10, 18))
+
+        assert results[0]['dropped'] == []
+        assert 'pyarrow' in results[0]['skipped']
+        assert 'signal_audit_p202601' in db.partitions['signal_audit']
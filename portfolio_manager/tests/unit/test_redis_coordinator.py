@@ -162,6 +162,31 @@ class TestRedisCoordinatorInitialization:
         assert coordinator.redis_client is None
         assert coordinator.connection_pool is None
 
+    @patch('core.redis_coordinator.ConnectionPool')
+    @patch('core.redis_coordinator.redis.Redis')
+    def test_attach_db_manager_registers_instance(self, mock_redis_class, mock_pool_class):
+        """Test that a DB manager attached after init (concurrent startup) registers the instance"""
+        mock_client = Mock()
+        mock_client.ping.return_value = True
+        mock_redis_class.return_value = mock_client
+        db_manager = Mock()
+
+        coordinator = RedisCoordinator({'enable_redis': True})
+        coordinator.attach_db_manager(db_manager)
+
+        assert coordinator.db_manager is db_manager
+        assert db_manager.upsert_instance_metadata.call_args.kwargs['instance_id'] == coordinator.instance_id
+
+    def test_attach_db_manager_fallback_mode(self):
+        """Test that attaching a DB manager in fallback mode does not register"""
+        db_manager = Mock()
+        coordinator = RedisCoordinator({'enable_redis': True}, fallback_mode=True)
+
+        coordinator.attach_db_manager(db_manager)
+
+        assert coordinator.db_manager is db_manager
+        db_manager.upsert_instance_metadata.assert_not_called()
+
 
 class TestRedisCoordinatorPing:
     """Tests for ping method"""
@@ -1759,6 +1784,20 @@ class TestCoordinatorMetrics:
         assert stats['db_sync_p50_latency_ms'] == 50.5
         assert stats['db_sync_latency_samples'] == 1
     
+    def test_metrics_observed_in_histogram(self):
+        """Sync latency also lands in the fixed-bucket /metrics histogram"""
+        metrics = CoordinatorMetrics()
+        _, _, before = metrics.db_sync_histogram.snapshot()
+        
+        metrics.record_db_sync(True, 12.0)
+        metrics.record_db_sync(False, 30.0)
+        
+        _, _, after = metrics.db_sync_histogram.snapshot()
+        assert after - before == 2
+        assert metrics.get_counts() == {
+            'db_sync_success': 1, 'db_sync_failure': 1, 'leadership_changes': 0
+        }
+    
     def test_metrics_record_failure(self):
         """Test recording failed sync with latency"""
         metrics = CoordinatorMetrics()
@@ -0,0 +1,158 @@
+"""
+Unit tests for the portfolio risk engine
+
+Tests daily return rows and incremental covariance, historical and
+parametric VaR/ES, stress scenarios, position change notification, the
+correlation-aware VaR gate and per-tick compute time.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from core.config import PortfolioConfig
+from core.models import Position
+from core.portfolio_state import PortfolioStateManager
+from core.risk_engine import MIN_OBSERVATIONS, RiskEngine, RollingReturns
+
+DAY0 = datetime(2025, 6, 2, 15, 0)
+
+
+def position(position_id, instrument, lots, entry_price):
+    return Position(
+        position_id=position_id, instrument=instrument, entry_timestamp=DAY0, entry_price=entry_price,
+        lots=lots, quantity=lots, initial_stop=entry_price * 0.97, current_stop=entry_price * 0.97,
+        highest_close=entry_price
+    )
+
+
+def feed_days(engine, prices_by_instrument):
+    """One price per instrument per day, then roll into the next day"""
+    days = len(next(iter(prices_by_instrument.values())))
+    for d in range(days):
+        for instrument, prices in prices_by_instrument.items():
+            engine.on_price(instrument, prices[d], DAY0 + timedelta(days=d))
+    engine.on_price(instrument, prices[-1], DAY0 + timedelta(days=days))  # Close the last day
+
+
+def random_walk(rng, start, n, vol=0.01):
+    return start * np.exp(np.cumsum(rng.normal(0, vol, n)))
+
+
+class TestRollingReturns:
+    """Daily rows and running moments"""
+
+    def test_last_price_of_day_closes_row(self):
+        returns = RollingReturns(('BANK_NIFTY', 'GOLD_MINI'), window=10)
+        returns.add_price('BANK_NIFTY', 100.0, DAY0.date())
+        returns.add_price('GOLD_MINI', 50.0, DAY0.date())
+        returns.add_price('BANK_NIFTY', 110.0, (DAY0 + timedelta(days=1)).date())
+        returns.add_price('BANK_NIFTY', 121.0, (DAY0 + timedelta(days=1)).date())
+        assert len(returns) == 0
+
+        assert returns.add_price('BANK_NIFTY', 121.0, (DAY0 + timedelta(days=2)).date()) is True
+
+        # GOLD_MINI had no price on day 1 -> 0 return
+        assert returns.matrix()[0] == pytest.approx([np.log(1.21), 0.0])
+        assert returns.add_price('GOLD_MINI', 49.0, DAY0.date()) is False  # Past day ignored
+
+    def test_incremental_covariance_matches_numpy(self):
+        rng = np.random.default_rng(7)
+        returns = RollingReturns(('A', 'B', 'C'), window=30)
+        for _ in range(95):  # Wraps the ring and crosses resyncs
+            returns._push(rng.normal(0, 0.01, 3))
+
+        assert len(returns) == 30
+        assert returns.covariance() == pytest.approx(np.cov(returns.matrix(), rowvar=False), abs=1e-12)
+
+
+class TestVaR:
+    """Historical, parametric and stress numbers"""
+
+    @pytest.fixture
+    def engine(self):
+        rng = np.random.default_rng(42)
+        engine = RiskEngine(window=250, confidence=0.99)
+        feed_days(engine, {
+            'BANK_NIFTY': random_walk(rng, 52000, 260),
+            'GOLD_MINI': random_walk(rng, 78000, 260, vol=0.008),
+        })
+        return engine
+
+    def test_var_and_es_for_open_book(self, engine):
+        portfolio = PortfolioStateManager(5_000_000)
+        portfolio.risk_engine = engine
+        portfolio.add_position(position('BN_Long_1', 'BANK_NIFTY', 4, 52000.0))
+
+        snapshot = engine.get_snapshot()
+
+        exposure = snapshot.exposures['BANK_NIFTY']
+        assert exposure == pytest.approx(4 * 30.0 * engine._prices[engine.returns.index['BANK_NIFTY']])
+        assert snapshot.observations == 250
+        # ~1% daily vol, 99% one-day VaR ~ 2.33% of exposure
+        assert 0.015 * exposure < snapshot.param_var < 0.035 * exposure
+        assert snapshot.hist_es >= snapshot.hist_var > 0
+        assert snapshot.param_es > snapshot.param_var
+        assert snapshot.stress['equity_crash'] == pytest.approx(-0.08 * exposure)
+        assert snapshot.stress['metals_crash'] == 0
+        assert snapshot.var_percent == pytest.approx(
+            max(snapshot.hist_var, snapshot.param_var) / snapshot.equity * 100
+        )
+
+    def test_diversification_lowers_parametric_var(self, engine):
+        engine._lots[:] = 0
+        bn = engine.projected_var('BANK_NIFTY', 4)
+        gold = engine.projected_var('GOLD_MINI', 25)
+        engine._lots[engine.returns.index['BANK_NIFTY']] = 4
+
+        combined = engine.projected_var('GOLD_MINI', 25)
+
+        assert combined < bn + gold
+
+    def test_too_little_history_reports_none(self):
+        engine = RiskEngine()
+        engine._lots[0] = 1
+
+        snapshot = engine.compute()
+
+        assert snapshot.observations < MIN_OBSERVATIONS
+        assert snapshot.hist_var is None and snapshot.param_var is None
+        assert engine.projected_var('BANK_NIFTY', 1) is None
+
+    def test_subscribers_receive_each_recompute_under_a_millisecond(self, engine):
+        received = []
+        engine.subscribe(received.append)
+        engine._lots[:] = [4, 10, 0, 0]
+
+        engine.on_price('BANK_NIFTY', 52500.0, DAY0 + timedelta(days=300))
+        engine.on_price('GOLD_MINI', 78500.0, DAY0 + timedelta(days=300))
+
+        assert len(received) == 2
+        assert min(s.compute_ms for s in received) < 1.0
+
+
+class TestVaRGate:
+    """Optional correlation-aware entry gate"""
+
+    def make_portfolio(self, limit):
+        rng = np.random.default_rng(3)
+        config = PortfolioConfig()
+        config.max_portfolio_var_percent = limit
+        portfolio = PortfolioStateManager(5_000_000, config)
+        engine = RiskEngine(window=100)
+        feed_days(engine, {'BANK_NIFTY': random_walk(rng, 52000, 110, vol=0.02)})
+        portfolio.risk_engine = engine
+        return portfolio
+
+    def test_gate_blocks_above_limit(self):
+        portfolio = self.make_portfolio(limit=1.0)
+
+        allowed, reason = portfolio.check_portfolio_gate(1000, 500, instrument='BANK_NIFTY', new_lots=20, price=52000)
+
+        assert not allowed and 'VaR' in reason
+
+    def test_gate_off_by_default_and_allows_small_entries(self):
+        assert self.make_portfolio(limit=None).check_var_gate('BANK_NIFTY', 50)[0]
+        assert self.make_portfolio(limit=5.0).check_portfolio_gate(
+            1000, 500, instrument='BANK_NIFTY', new_lots=1, price=52000
+        )[0]
@@ -0,0 +1,127 @@
+"""
+Unit tests for the Scout feed time-series store
+
+Tests ring-buffer append and wrap-around, memory-mapped persistence across
+restarts, range/field/downsample queries, condition bit packing, and
+arrival gap/delay statistics.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from core.models import EODConditions, EODIndicators, EODMonitorSignal, MarketDataSignal
+from core.scout_store import (
+    FEED_EOD_MONITOR, FEED_MARKET_DATA, RingSeries, ScoutTimeSeriesStore,
+    decode_conditions, encode_conditions
+)
+
+T0 = datetime(2025, 12, 29, 9, 0)
+
+
+def market_data(i, instrument='GOLD_MINI'):
+    return MarketDataSignal(
+        timestamp=T0 + timedelta(hours=i), instrument=instrument,
+        price=78000.0 + i, atr=400.0, supertrend=77000.0 + i
+    )
+
+
+def fill(store, n, delay=2.0, instrument='GOLD_MINI'):
+    for i in range(n):
+        signal = market_data(i, instrument)
+        store.record_market_data(signal, received_at=signal.timestamp.timestamp() + delay)
+
+
+class TestRingSeries:
+    """Fixed-capacity ring semantics"""
+
+    def test_wraps_and_keeps_newest_in_order(self):
+        ring = RingSeries(('price',), capacity=4)
+        for i in range(6):
+            ring.append(float(i), float(i) + 0.5, (100.0 + i,))
+
+        data = ring.snapshot()
+        assert len(ring) == 4 and ring.total == 6
+        assert data[0].tolist() == [2.0, 3.0, 4.0, 5.0]
+        assert data[2].tolist() == [102.0, 103.0, 104.0, 105.0]
+
+    def test_memory_mapped_ring_survives_restart(self, tmp_path):
+        store = ScoutTimeSeriesStore(capacity=8, store_dir=str(tmp_path))
+        fill(store, 5)
+        store.flush()
+        del store
+
+        reopened = ScoutTimeSeriesStore(capacity=8, store_dir=str(tmp_path))
+        assert reopened.get_summary() == {FEED_MARKET_DATA: {'GOLD_MINI': 5}}
+        fill(reopened, 1)
+        assert reopened.query(FEED_MARKET_DATA, 'GOLD_MINI')['price'][-1] == 78000.0
+
+
+class TestQueries:
+    """Range, field and downsample queries"""
+
+    def test_range_and_fields(self):
+        store = ScoutTimeSeriesStore(capacity=100)
+        fill(store, 10)
+        start = (T0 + timedelta(hours=3)).timestamp()
+        end = (T0 + timedelta(hours=5)).timestamp()
+
+        series = store.query(FEED_MARKET_DATA, 'GOLD_MINI', start=start, end=end, fields=['price'])
+
+        assert set(series) == {'timestamp', 'received_at', 'price'}
+        assert series['price'] == [78003.0, 78004.0, 78005.0]
+
+    def test_downsample_keeps_last_of_each_bucket(self):
+        store = ScoutTimeSeriesStore(capacity=1000)
+        fill(store, 101)
+
+        series = store.query(FEED_MARKET_DATA, 'GOLD_MINI', points=10)
+
+        assert len(series['price']) == 10
+        assert series['price'][-1] == 78100.0
+        assert np.all(np.diff(series['timestamp']) > 0)
+
+    def test_unknown_feed_or_field_rejected(self):
+        store = ScoutTimeSeriesStore()
+        with pytest.raises(ValueError):
+            store.query('ticks', 'GOLD_MINI')
+        with pytest.raises(ValueError):
+            store.query(FEED_MARKET_DATA, 'GOLD_MINI', fields=['rsi'])
+        assert store.query(FEED_MARKET_DATA, 'COPPER')['price'] == []
+
+    def test_eod_monitor_condition_bits(self):
+        conditions = EODConditions(rsi_condition=True, st_condition=True, long_exit=True)
+        assert decode_conditions(encode_conditions(conditions))['st_condition']
+
+        store = ScoutTimeSeriesStore()
+        store.record_eod_monitor(EODMonitorSignal(
+            timestamp=T0, instrument='BANK_NIFTY', price=52000.0, conditions=conditions,
+            indicators=EODIndicators(rsi=72.0, er=0.85, atr=350.0)
+        ))
+        series = store.query(FEED_EOD_MONITOR, 'BANK_NIFTY', fields=['rsi', 'er', 'conditions'])
+
+        assert series['rsi'] == [72.0] and series['er'] == [0.85]
+        assert series['conditions'] == [encode_conditions(conditions)]
+
+
+class TestGapStats:
+    """Inter-arrival gaps and signal-to-arrival delay"""
+
+    def test_gaps_and_delay(self):
+        store = ScoutTimeSeriesStore()
+        for i in list(range(5)) + [8, 9]:      # three missing hourly bars
+            signal = market_data(i)
+            store.record_market_data(signal, received_at=signal.timestamp.timestamp() + 1.5)
+
+        stats = store.gap_stats(FEED_MARKET_DATA, 'GOLD_MINI')
+
+        assert stats['samples'] == 7
+        assert stats['delay_seconds']['max'] == pytest.approx(1.5)
+        assert stats['interval_seconds']['p50'] == 3600.0
+        assert stats['gaps'] == 1
+        assert stats['gap_seconds_total'] == 4 * 3600.0
+
+    def test_empty_feed(self):
+        assert ScoutTimeSeriesStore().gap_stats(FEED_MARKET_DATA, 'GOLD_MINI') == {
+            'feed': FEED_MARKET_DATA, 'instrument': 'GOLD_MINI', 'samples': 0
+        }
@@ -0,0 +1,142 @@
+"""
+Unit tests for the live startup pipeline
+
+Tests phase profiling, concurrent subsystem init, the warming gate served
+before the Flask app exists, and the early-bound webhook server.
+"""
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+from flask import Flask
+from werkzeug.test import Client
+
+from core.startup import (
+    STATE_READY, STATE_WARMING, EarlyBoundServer, StartupProfiler, WarmupGate, run_concurrently
+)
+
+
+def make_app():
+    app = Flask(__name__)
+
+    @app.route('/health')
+    def health():
+        return {'status': 'healthy'}
+
+    return app
+
+
+class TestStartupProfiler:
+    """Sequential marks and concurrent phases"""
+
+    def test_marks_close_previous_phase(self):
+        profiler = StartupProfiler()
+        profiler.mark('imports')
+        import core.startup  # noqa: F401 (already loaded, must not be counted)
+        profiler.mark('connect')
+        assert profiler.current_phase == 'connect'
+
+        ready_at = profiler.finish()
+
+        assert [p.name for p in profiler.phases] == ['imports', 'connect']
+        assert profiler.phases[0].modules == 0
+        assert profiler.current_phase is None
+        assert ready_at >= profiler.phases[-1].start + profiler.phases[-1].duration
+
+    def test_report_lists_phases_in_start_order(self):
+        profiler = StartupProfiler()
+        profiler.mark('bind')
+        with profiler.phase('database', concurrent=True):
+            pass
+        profiler.finish()
+
+        report = profiler.report()
+
+        assert report[1].startswith('bind')
+        assert report[2].startswith('  database')
+        assert report[-1].startswith('ready')
+
+
+class TestRunConcurrently:
+    """Independent init tasks"""
+
+    def test_tasks_run_in_parallel(self):
+        profiler = StartupProfiler()
+        barrier = threading.Barrier(2, timeout=5)
+
+        def task(value):
+            barrier.wait()  # Deadlocks (BrokenBarrierError) if run one after another
+            return value
+
+        results = run_concurrently(profiler, {'database': lambda: task(1), 'broker': lambda: task(2)})
+
+        assert results == {'database': 1, 'broker': 2}
+        assert {p.name for p in profiler.phases} == {'database', 'broker'}
+        assert all(p.concurrent and p.thread.startswith('startup') for p in profiler.phases)
+
+    def test_escaped_exception_is_raised_after_all_tasks(self):
+        finished = []
+
+        def failing():
+            raise RuntimeError('boom')
+
+        with pytest.raises(RuntimeError, match='boom'):
+            run_concurrently(StartupProfiler(), {'redis': failing, 'holidays': lambda: finished.append(1)})
+        assert finished == [1]
+
+
+class TestWarmupGate:
+    """503 while warming, pass-through once ready"""
+
+    def test_warming_response_reports_phase(self):
+        profiler = StartupProfiler()
+        profiler.mark('recovery')
+        gate = WarmupGate(profiler)
+
+        response = Client(gate).post('/webhook', json={'type': 'BASE_ENTRY'})
+
+        assert gate.state == STATE_WARMING
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+        body = json.loads(response.data)
+        assert body['status'] == STATE_WARMING and body['phase'] == 'recovery'
+
+    def test_ready_forwards_to_app(self):
+        gate = WarmupGate()
+        gate.ready(make_app())
+
+        response = Client(gate).get('/health')
+
+        assert gate.state == STATE_READY
+        assert response.status_code == 200
+        assert json.loads(response.data) == {'status': 'healthy'}
+
+
+class TestEarlyBoundServer:
+    """Port bound before the app exists"""
+
+    def test_serves_warming_then_app(self):
+        gate = WarmupGate()
+        server = EarlyBoundServer('127.0.0.1', 0, gate)
+        server.start()
+        url = f'http://127.0.0.1:{server.port}/health'
+        try:
+            with pytest.raises(urllib.error.HTTPError) as excinfo:
+                urllib.request.urlopen(url, timeout=5)
+            assert excinfo.value.code == 503
+
+            gate.ready(make_app())
+            with urllib.request.urlopen(url, timeout=5) as response:
+                assert json.loads(response.read()) == {'status': 'healthy'}
+        finally:
+            server.stop()
+
+    def test_port_in_use_fails_at_bind(self):
+        server = EarlyBoundServer('127.0.0.1', 0, WarmupGate())
+        try:
+            with pytest.raises(OSError):
+                EarlyBoundServer('127.0.0.1', server.port, WarmupGate())
+        finally:
+            server.stop()
@@ -0,0 +1,285 @@
+"""
+Unit tests for warm-standby state replication
+
+Tests the leader change log (position upserts, stop ratchets, pyramiding,
+dedup fingerprints, EOD state, pending orders) applied by a follower to its
+own engine, stale fencing-token filtering, and promotion with the DB version
+check (hot takeover vs full recovery).
+"""
+import itertools
+from dataclasses import replace
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from core.config import PortfolioConfig
+from core.db_state_manager import DatabaseStateManager
+from core.eod_monitor import EODMonitor
+from core.fencing import FencedBrokerClient, OrderFence
+from core.latency_metrics import HA_TAKEOVER_LATENCY, get_latency_metrics
+from core.models import (
+    EODConditions, EODIndicators, EODMonitorSignal, Position, Signal, SignalType
+)
+from core.state_replication import StateReplicator
+from core.webhook_parser import DuplicateDetector
+
+
+class FakeStreamRedis:
+    """In-memory XADD/XREAD/XREVRANGE for a single process"""
+
+    def __init__(self):
+        self.entries = []
+        self._seq = itertools.count(1)
+
+    def xadd(self, key, fields, maxlen=None, approximate=True):
+        entry_id = f"{next(self._seq)}-0"
+        self.entries.append((entry_id, dict(fields)))
+        return entry_id
+
+    def xread(self, streams, count=None, block=None):
+        (key, last_id), = streams.items()
+        last = int(last_id.split('-')[0])
+        new = [(i, f) for i, f in self.entries if int(i.split('-')[0]) > last][:count]
+        return [(key, new)] if new else []
+
+    def xrevrange(self, key, count=None):
+        return list(reversed(self.entries))[:count]
+
+    def pipeline(self, transaction=False):
+        redis = self
+
+        class Pipeline:
+            def __init__(self):
+                self.calls = []
+
+            def xadd(self, *args, **kwargs):
+                self.calls.append((args, kwargs))
+
+            def execute(self):
+                return [redis.xadd(*a, **k) for a, k in self.calls]
+
+        return Pipeline()
+
+
+def offline_db(versions=None):
+    """DatabaseStateManager without a pool (conversion/cache helpers only)"""
+    db = DatabaseStateManager.__new__(DatabaseStateManager)
+    db._position_cache = {}
+    db._portfolio_state_cache = None
+    db.change_log = None
+    db.get_state_versions = Mock(return_value=versions or {'positions': {}, 'portfolio': 1})
+    return db
+
+
+def make_position(position_id='Long_1', stop=77000.0):
+    return Position(
+        position_id=position_id, instrument='GOLD_MINI', entry_timestamp=datetime(2026, 1, 5, 10, 0),
+        entry_price=78000.0, lots=2, quantity=200, initial_stop=76500.0, current_stop=stop,
+        highest_close=78500.0, atr=400.0, is_base_position=True
+    )
+
+
+def pump(leader):
+    """Send the leader's queued changes synchronously"""
+    batch = []
+    while not leader._outbox.empty():
+        batch.append(leader._outbox.get_nowait())
+    if batch:
+        leader._send(batch)
+
+
+@pytest.fixture
+def cluster():
+    """Leader and follower engines sharing one stream"""
+    from live.engine import LiveTradingEngine
+
+    redis = FakeStreamRedis()
+    leader_engine = LiveTradingEngine(initial_capital=5000000.0, openalgo_client=MagicMock())
+    follower_engine = LiveTradingEngine(initial_capital=5000000.0, openalgo_client=MagicMock())
+    leader_db, follower_db = offline_db(), offline_db()
+
+    leader = StateReplicator(redis, 'pm-a', fencing_token=lambda: 4)
+    leader.attach(leader_engine, leader_db, DuplicateDetector())
+    leader.seed_versions()
+    leader._become_leader()
+
+    follower = StateReplicator(redis, 'pm-b')
+    follower.attach(follower_engine, follower_db, DuplicateDetector())
+    follower.seed_versions()
+    return leader, follower
+
+
+class TestChangeLog:
+    """Leader publish -> follower apply"""
+
+    def test_positions_stops_and_pyramiding_replicate(self, cluster):
+        leader, follower = cluster
+        db = leader.db_manager
+        position = make_position()
+
+        leader.publish('position', {'row': db._position_to_dict(position), 'version': 1})
+        leader.publish('pyramid', {'instrument': 'GOLD_MINI', 'last_pyramid_price': 78000.0,
+                                   'base_position_id': 'Long_1'})
+        ratcheted = replace(position, current_stop=77400.0, highest_close=78900.0)
+        leader.publish('position', {'row': db._position_to_dict(ratcheted), 'version': 2})
+        leader.publish('portfolio', {'closed_equity': 5100000.0, 'equity_high': 5100000.0, 'version': 3})
+        pump(leader)
+        follower._read_and_apply()
+
+        kinds = [fields['kind'] for _id, fields in follower.redis.entries]
+        assert kinds == ['position', 'pyramid', 'stop', 'portfolio']
+
+        engine = follower.engine
+        replicated = engine.portfolio.positions['Long_1']
+        assert replicated.current_stop == 77400.0 and replicated.highest_close == 78900.0
+        assert replicated.entry_timestamp == position.entry_timestamp
+        assert engine.base_positions['GOLD_MINI'] is replicated
+        assert engine.last_pyramid_price['GOLD_MINI'] == 78000.0
+        assert engine.portfolio.closed_equity == 5100000.0
+        assert follower.position_versions == {'Long_1': 2}
+        assert follower.portfolio_version == 3
+
+    def test_closed_position_and_cleared_pyramid_are_removed(self, cluster):
+        leader, follower = cluster
+        db = leader.db_manager
+        position = make_position()
+        leader.publish('position', {'row': db._position_to_dict(position), 'version': 1})
+        leader.publish('pyramid', {'instrument': 'GOLD_MINI', 'last_pyramid_price': 78000.0,
+                                   'base_position_id': 'Long_1'})
+        leader.publish('position', {'row': db._position_to_dict(replace(position, status='closed')), 'version': 2})
+        leader.publish('pyramid_cleared', {'instrument': 'GOLD_MINI'})
+        pump(leader)
+        follower._read_and_apply()
+
+        assert follower.engine.portfolio.positions == {}
+        assert follower.engine.base_positions == {}
+        assert follower.position_versions == {}
+
+    def test_dedup_fingerprints_replicate(self, cluster):
+        leader, follower = cluster
+        signal = Signal(
+            timestamp=datetime.now(), instrument='GOLD_MINI', signal_type=SignalType.BASE_ENTRY,
+            position='Long_1', price=78000.0, stop=77000.0, suggested_lots=2, atr=400.0,
+            er=0.8, supertrend=77000.0
+        )
+        assert leader.duplicate_detector.is_duplicate(signal) is False
+        pump(leader)
+        follower._read_and_apply()
+
+        assert follower.duplicate_detector.is_duplicate(signal) is True
+
+    def test_eod_state_replicates_mid_execution(self, cluster):
+        leader, follower = cluster
+        monitor = leader.engine.eod_monitor
+        signal = EODMonitorSignal(
+            timestamp=datetime.now(), instrument='GOLD_MINI', price=78000.0,
+            conditions=EODConditions(long_entry=True), indicators=EODIndicators(atr=400.0, roc=1.5)
+        )
+        monitor.update_signal(signal)
+        monitor.get_execution_state('GOLD_MINI').mark_execution_started()
+        monitor.mark_order_placed('GOLD_MINI', 'EOD42')
+        pump(leader)
+        follower._read_and_apply()
+
+        state = follower.engine.eod_monitor.get_execution_state('GOLD_MINI')
+        assert state.execution_started and state.order_id == 'EOD42'
+        assert state.latest_signal.indicators.roc == 1.5
+        assert state.latest_signal.timestamp == signal.timestamp
+
+    def test_previous_day_eod_state_is_ignored(self):
+        monitor = EODMonitor(PortfolioConfig())
+        yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        assert monitor.restore_state({'instrument': 'GOLD_MINI', 'date': yesterday}) is False
+
+    def test_pending_orders_tracked_until_terminal(self, cluster):
+        leader, follower = cluster
+        broker = MagicMock()
+        broker.place_order.return_value = {'status': 'success', 'orderid': 'A1'}
+        broker.get_order_status.side_effect = [{'order_status': 'open'}, {'order_status': 'complete'}]
+        client = FencedBrokerClient(broker, OrderFence())
+        client.change_log = leader
+
+        client.place_order('GOLDM05FEB26FUT', 'BUY', 2, exchange='MCX')
+        pump(leader)
+        follower._read_and_apply()
+        assert follower.pending_orders['A1']['symbol'] == 'GOLDM05FEB26FUT'
+
+        client.get_order_status('A1')
+        client.get_order_status('A1')
+        pump(leader)
+        follower._read_and_apply()
+        assert follower.pending_orders == {}
+
+    def test_follower_does_not_publish(self, cluster):
+        _leader, follower = cluster
+        follower.publish('pyramid_cleared', {'instrument': 'GOLD_MINI'})
+        assert follower._outbox.empty()
+
+    def test_entries_from_deposed_leader_are_skipped(self, cluster):
+        leader, follower = cluster
+        db = leader.db_manager
+        new_leader = StateReplicator(leader.redis, 'pm-c', fencing_token=lambda: 5)
+        new_leader.attach(leader.engine, db)
+        new_leader._become_leader()
+
+        new_leader.publish('position', {'row': db._position_to_dict(make_position(stop=77200.0)), 'version': 3})
+        pump(new_leader)
+        leader.publish('pyramid', {'instrument': 'GOLD_MINI', 'last_pyramid_price': 1.0,
+                                   'base_position_id': None})
+        pump(leader)
+        follower._read_and_apply()
+
+        assert follower.stats['skipped_stale'] == 1
+        assert 'GOLD_MINI' not in follower.engine.last_pyramid_price
+        assert follower.engine.portfolio.positions['Long_1'].current_stop == 77200.0
+
+
+class TestPromotion:
+    """Follower -> leader takeover"""
+
+    def test_hot_takeover_when_versions_match(self, cluster):
+        leader, follower = cluster
+        db = leader.db_manager
+        leader.publish('position', {'row': db._position_to_dict(make_position()), 'version': 1})
+        pump(leader)
+        follower.db_manager.get_state_versions.return_value = {'positions': {'Long_1': 1}, 'portfolio': 1}
+        follower._cold_recover = Mock()
+
+        result = follower.promote()
+
+        assert result['mode'] == 'hot'
+        follower._cold_recover.assert_not_called()
+        assert follower.engine.portfolio.positions['Long_1'].current_stop == 77000.0
+        assert follower.db_manager.change_log is follower
+        assert follower.engine.eod_monitor.change_log is follower
+        assert f'{HA_TAKEOVER_LATENCY}_count' in get_latency_metrics().render_prometheus()
+
+    def test_missing_change_falls_back_to_full_recovery(self, cluster):
+        leader, follower = cluster
+        db = leader.db_manager
+        leader.publish('position', {'row': db._position_to_dict(make_position()), 'version': 1})
+        pump(leader)
+        # DB has a newer version than anything published (leader died before publishing)
+        follower.db_manager.get_state_versions.return_value = {'positions': {'Long_1': 2}, 'portfolio': 1}
+        follower._cold_recover = Mock()
+
+        result = follower.promote()
+
+        assert result['mode'] == 'cold'
+        assert result['reason'] == 'position_versions:Long_1'
+        follower._cold_recover.assert_called_once()
+        assert follower.ensure_promoted() is True
+        follower._cold_recover.assert_called_once()
+
+    def test_demoted_leader_stops_publishing(self, cluster):
+        leader, _follower = cluster
+        leader.publish('pyramid_cleared', {'instrument': 'GOLD_MINI'})
+        pump(leader)
+
+        leader.demote()
+        leader._stop_following()
+
+        assert leader.role == 'follower'
+        assert leader.db_manager.change_log is None
+        assert leader.last_applied_id == leader.last_published_id
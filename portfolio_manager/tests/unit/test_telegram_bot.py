@@ -4,6 +4,7 @@ Tests for Telegram Bot Components
 Tests:
 - Alert types and Alert dataclass
 - TelegramAlertPublisher (mocked HTTP)
+- Alert coalescing, priority lane, token bucket and spill file
 - HeartbeatScheduler logic
 - TelegramConfig loading
 - TelegramBotFactory
@@ -18,7 +19,8 @@ from telegram_bot.alerts import (
     Alert,
     AlertType,
     TelegramAlertPublisher,
-    SyncAlertPublisher
+    SyncAlertPublisher,
+    TokenBucket
 )
 from telegram_bot.heartbeat import HeartbeatScheduler, DailyReportScheduler
 from telegram_bot.config import TelegramConfig, TelegramBotFactory
@@ -180,6 +182,127 @@ class TestTelegramAlertPublisher:
         assert publisher._queue.qsize() == 5
 
 
+def run_publisher(publisher, alerts, seconds=0.3, status_code=200):
+    """Run the publisher loop against a mocked Telegram API; returns the HTTP mock"""
+    async def scenario():
+        client = AsyncMock()
+        client.post.return_value = Mock(status_code=status_code, text='', json=Mock(return_value={}))
+        for alert in alerts:
+            publisher.queue_alert(alert)
+        publisher._http_client = client
+        publisher._running = True
+        task = asyncio.create_task(publisher._process_queue())
+        await asyncio.sleep(seconds)
+        publisher._running = False
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return client
+
+    return asyncio.run(scenario())
+
+
+def make_alert(alert_type=AlertType.POSITION_CLOSED, title="GOLD_MINI Position Closed", chat_id=None):
+    return Alert(alert_type=alert_type, title=title, message="Long_1 2 lots", chat_id=chat_id)
+
+
+class TestAlertDelivery:
+    """Coalescing, priority lane, rate limiting and spill file."""
+
+    def test_batch_is_one_message_per_chat(self):
+        """Test alerts within the window become one digest per chat."""
+        publisher = TelegramAlertPublisher(bot_token="t", chat_id="123", batch_window_seconds=0.05)
+
+        client = run_publisher(publisher, [
+            make_alert(title="Long_1 Closed"),
+            make_alert(title="Long_2 Closed"),
+            make_alert(title="Ops", chat_id="999"),
+        ])
+
+        payloads = [call.kwargs['json'] for call in client.post.call_args_list]
+        assert [p['chat_id'] for p in payloads] == ["123", "999"]
+        assert "2 alerts" in payloads[0]['text']
+        assert "Long_1 Closed" in payloads[0]['text'] and "Long_2 Closed" in payloads[0]['text']
+        assert publisher.stats['alerts_coalesced'] == 2
+        assert publisher.stats['alerts_sent'] == 3
+
+    def test_critical_alert_bypasses_batch_window(self):
+        """Test order failures / system errors are sent without waiting for the window."""
+        publisher = TelegramAlertPublisher(bot_token="t", chat_id="123", batch_window_seconds=5.0)
+
+        client = run_publisher(publisher, [
+            make_alert(),
+            make_alert(AlertType.SYSTEM_ERROR, "System Error: broker"),
+        ], seconds=0.2)
+
+        client.post.assert_called_once()
+        assert "System Error: broker" in client.post.call_args.kwargs['json']['text']
+        assert publisher.stats['priority_sent'] == 1
+
+    def test_token_bucket_delays_instead_of_dropping(self):
+        """Test an empty bucket makes acquire() wait for the next token."""
+        bucket = TokenBucket(rate_per_minute=600, capacity=1)  # 1 token per 0.1s
+
+        async def take_two():
+            return await bucket.acquire(), await bucket.acquire()
+
+        first, second = asyncio.run(take_two())
+        assert first == 0.0
+        assert 0.05 < second < 0.5
+
+        bucket.pause(30.0)
+        assert bucket.delay() > 29.0
+
+    def test_queue_full_spills_to_disk(self, tmp_path):
+        """Test a full queue spills instead of dropping."""
+        spill_path = tmp_path / "spill.jsonl"
+        publisher = TelegramAlertPublisher(bot_token="t", chat_id="123", queue_size=1, spill_path=str(spill_path))
+
+        assert publisher.queue_alert(make_alert(title="first")) is True
+        assert publisher.queue_alert(make_alert(title="second")) is True
+
+        assert publisher._queue.qsize() == 1
+        assert len(spill_path.read_text().splitlines()) == 1
+
+    def test_failed_send_is_restored_after_restart(self, tmp_path):
+        """Test alerts Telegram could not take survive in the spill file."""
+        spill_path = str(tmp_path / "spill.jsonl")
+        publisher = TelegramAlertPublisher(
+            bot_token="t", chat_id="123", batch_window_seconds=0.0, spill_path=spill_path
+        )
+
+        run_publisher(publisher, [make_alert(title="Long_1 Closed")], status_code=502)
+        assert publisher.stats['spilled'] == 1
+
+        restarted = TelegramAlertPublisher(bot_token="t", chat_id="123", spill_path=spill_path)
+        assert restarted._restore_spill() == 1
+        _lane, _sequence, alert = restarted._queue.get_nowait()
+        assert alert.title == "Long_1 Closed"
+        assert alert.alert_type == AlertType.POSITION_CLOSED
+        assert not (tmp_path / "spill.jsonl").exists()
+
+    def test_stop_spills_unsent_backlog(self, tmp_path):
+        """Test alerts still in the batch window on shutdown are kept."""
+        spill_path = tmp_path / "spill.jsonl"
+        publisher = TelegramAlertPublisher(
+            bot_token="t", chat_id="123", batch_window_seconds=5.0, spill_path=str(spill_path)
+        )
+
+        async def scenario():
+            await publisher.start()
+            publisher.queue_alert(make_alert(title="in window"))
+            await asyncio.sleep(0.05)
+            publisher.queue_alert(make_alert(title="also in window"))
+            await asyncio.sleep(0.05)
+            await publisher.stop()
+
+        asyncio.run(scenario())
+
+        assert len(spill_path.read_text().splitlines()) == 2
+
+
 class TestSyncAlertPublisher:
     """Test SyncAlertPublisher wrapper."""
 
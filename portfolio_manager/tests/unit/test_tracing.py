@@ -0,0 +1,132 @@
+"""
+Unit tests for per-signal tracing
+
+Tests span nesting, no-op behaviour when disabled, JSON Lines export and
+the flame-style report formatting
+"""
+import pytest
+
+import core.tracing as tracing
+from core.tracing import (
+    Tracer, FileSpanExporter, NOOP_SPAN, traced, load_traces, format_trace_tree
+)
+
+
+class ListExporter:
+    """Collects finished root spans in memory"""
+
+    def __init__(self):
+        self.traces = []
+
+    def export(self, root):
+        self.traces.append(root)
+
+
+@pytest.fixture
+def tracer(monkeypatch):
+    """Enable a global tracer with an in-memory exporter"""
+    exporter = ListExporter()
+    t = Tracer(exporter, enabled=True)
+    monkeypatch.setattr(tracing, '_tracer', t)
+    return t
+
+
+class TestTracer:
+    """Test span creation and nesting"""
+
+    def test_disabled_tracer_returns_noop(self):
+        """Disabled tracer never allocates spans"""
+        t = Tracer()
+        assert t.span('webhook', trace_id='abc') is NOOP_SPAN
+
+    def test_child_without_active_trace_is_noop(self, tracer):
+        """Child spans outside a trace (e.g. schedulers) are no-ops"""
+        assert tracer.span('broker.get_quote') is NOOP_SPAN
+
+    def test_nested_spans_share_trace_id(self, tracer):
+        """Children inherit trace_id and link to their parent"""
+        with tracer.span('webhook', trace_id='req12345') as root:
+            with tracer.span('engine.process_signal') as child:
+                with tracer.span('broker.get_quote') as grandchild:
+                    pass
+
+        assert tracer.exporter.traces == [root]
+        assert child.trace_id == 'req12345'
+        assert child.parent_span_id == root.span_id
+        assert grandchild.parent_span_id == child.span_id
+        assert [s.name for s in root.iter_spans()] == [
+            'webhook', 'engine.process_signal', 'broker.get_quote'
+        ]
+
+    def test_exception_marks_span_error(self, tracer):
+        """Exceptions propagate and mark the span as ERROR"""
+        with pytest.raises(RuntimeError):
+            with tracer.span('webhook', trace_id='req1') as root:
+                raise RuntimeError("boom")
+
+        assert root.status == 'ERROR'
+        assert 'boom' in root.attributes['error']
+        assert tracer.exporter.traces == [root]
+
+    def test_traced_decorator(self, tracer):
+        """@traced creates a child span only inside an active trace"""
+        @traced('sizer.base_entry')
+        def size():
+            return 3
+
+        assert size() == 3  # no active trace - plain call
+
+        with tracer.span('webhook', trace_id='req2') as root:
+            assert size() == 3
+
+        assert [c.name for c in root.children] == ['sizer.base_entry']
+
+    def test_export_failure_does_not_raise(self, monkeypatch):
+        """Exporter errors are logged, never raised into signal processing"""
+        class BrokenExporter:
+            def export(self, root):
+                raise IOError("disk full")
+
+        t = Tracer(BrokenExporter(), enabled=True)
+        with t.span('webhook', trace_id='req3'):
+            pass
+
+
+class TestFileExportAndReport:
+    """Test JSON Lines export and report formatting"""
+
+    def test_file_round_trip(self, tmp_path):
+        """Exported traces can be loaded back with all spans"""
+        path = str(tmp_path / 'traces' / 'traces.jsonl')
+        t = Tracer(FileSpanExporter(path), enabled=True)
+
+        with t.span('webhook', trace_id='req4', instrument='GOLD_MINI'):
+            with t.span('engine.pyramid'):
+                pass
+
+        with open(path, 'a') as f:
+            f.write('not json\n')
+
+        traces = load_traces(path)
+        assert len(traces) == 1
+        assert traces[0]['traceId'] == 'req4'
+        assert traces[0]['attributes'] == {'instrument': 'GOLD_MINI'}
+        assert [s['name'] for s in traces[0]['spans']] == ['webhook', 'engine.pyramid']
+
+    def test_format_trace_tree_indents_children(self):
+        """Report indents children and shows share of root duration"""
+        trace = {
+            'traceId': 'req5',
+            'durationMs': 100.0,
+            'spans': [
+                {'spanId': 'a', 'parentSpanId': None, 'name': 'webhook',
+                 'startTimeUnixNano': 0, 'durationMs': 100.0, 'status': 'OK'},
+                {'spanId': 'b', 'parentSpanId': 'a', 'name': 'broker.get_quote',
+                 'startTimeUnixNano': 1, 'durationMs': 25.0, 'status': 'OK'},
+            ]
+        }
+
+        lines = format_trace_tree(trace)
+        assert lines[0].startswith('webhook')
+        assert lines[1].startswith('  broker.get_quote')
+        assert '25.0%' in lines[1]
@@ -0,0 +1,142 @@
+"""
+Unit tests for the bridge StateManager journal
+
+Tests snapshot + journal replay, torn-tail truncation, idempotent replay
+after a crash between snapshot and truncate, compaction and dedup expiry.
+"""
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Add repo root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import bridge_state
+from bridge_state import StateManager
+
+
+@pytest.fixture
+def state_file(tmp_path):
+    return str(tmp_path / 'position_state.json')
+
+
+def open_manager(state_file, **kwargs):
+    kwargs.setdefault('fsync_policy', 'never')
+    return StateManager(state_file=state_file, **kwargs)
+
+
+def position(lots, status='open'):
+    return {'instrument': 'GOLD_MINI', 'lots': lots, 'status': status}
+
+
+class TestReplay:
+    """Snapshot plus journal"""
+
+    def test_snapshot_plus_journal_replay(self, state_file):
+        sm = open_manager(state_file)
+        sm.add_position('GOLD_MINI_Long_1', position(3))
+        sm.add_position('GOLD_MINI_Long_2', position(2))
+        sm.save_state()
+        sm.update_position_field('GOLD_MINI_Long_1', 'lots', 5)
+        sm.remove_position('GOLD_MINI_Long_2')
+        sm.add_position('BANK_NIFTY_Long_1', position(1))
+
+        reloaded = open_manager(state_file)
+
+        assert reloaded.positions == sm.positions
+        assert reloaded.get_position('GOLD_MINI_Long_1')['lots'] == 5
+        assert 'GOLD_MINI_Long_2' not in reloaded.positions
+
+    def test_torn_last_line_dropped_and_truncated(self, state_file):
+        sm = open_manager(state_file)
+        sm.add_position('GOLD_MINI_Long_1', position(3))
+        journal = Path(sm.journal_file)
+        valid = journal.read_bytes()
+        with open(journal, 'ab') as f:
+            f.write(b'{"op":"put","id":"GOLD_MINI_Long_2","data":{"lo')
+
+        reloaded = open_manager(state_file)
+
+        assert list(reloaded.positions) == ['GOLD_MINI_Long_1']
+        assert journal.read_bytes() == valid
+
+        # Appends continue on a clean line boundary
+        reloaded.add_position('GOLD_MINI_Long_2', position(2))
+        assert set(open_manager(state_file).positions) == {'GOLD_MINI_Long_1', 'GOLD_MINI_Long_2'}
+
+    def test_crash_between_snapshot_and_truncate_replays_to_same_state(self, state_file):
+        sm = open_manager(state_file)
+        sm.add_position('GOLD_MINI_Long_1', position(3))
+        sm.add_position('GOLD_MINI_Long_2', position(2))
+        sm.update_position_field('GOLD_MINI_Long_1', 'lots', 4)
+        sm.remove_position('GOLD_MINI_Long_2')
+        journal = Path(sm.journal_file)
+        before_compaction = journal.read_bytes()
+
+        sm.save_state()
+        # os.replace happened, truncate did not: the old journal is still there
+        journal.write_bytes(before_compaction)
+
+        reloaded = open_manager(state_file)
+
+        assert reloaded.positions == {'GOLD_MINI_Long_1': position(4)}
+
+
+class TestCompaction:
+    """Journal folded into the snapshot"""
+
+    def test_compacts_every_n_entries(self, state_file):
+        sm = open_manager(state_file, compact_every=3)
+        journal = Path(sm.journal_file)
+
+        sm.add_position('GOLD_MINI_Long_1', position(3))
+        sm.add_position('GOLD_MINI_Long_2', position(2))
+        assert len(journal.read_text().splitlines()) == 2
+        assert not Path(state_file).exists()
+
+        sm.update_position_field('GOLD_MINI_Long_1', 'lots', 4)
+        assert journal.stat().st_size == 0
+        assert open_manager(state_file).positions == sm.positions
+
+        sm.remove_position('GOLD_MINI_Long_2')
+        assert len(journal.read_text().splitlines()) == 1
+
+    def test_close_compacts(self, state_file):
+        sm = open_manager(state_file)
+        sm.add_position('GOLD_MINI_Long_1', position(3))
+
+        sm.close()
+
+        assert Path(sm.journal_file).stat().st_size == 0
+        assert open_manager(state_file).positions == {'GOLD_MINI_Long_1': position(3)}
+
+
+class TestDuplicateWindow:
+    """Signal dedup survives restarts and expires"""
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        class Clock(datetime):
+            offset = timedelta(0)
+
+            @classmethod
+            def now(cls, tz=None):
+                return datetime.now(tz) + cls.offset
+
+        monkeypatch.setattr(bridge_state, 'datetime', Clock)
+        return Clock
+
+    def test_dedup_window_expiry(self, state_file, clock):
+        signal = {'type': 'BASE_ENTRY', 'position': 'Long_1', 'timestamp': '2025-11-20T10:15:00Z'}
+        sm = open_manager(state_file, duplicate_window=60)
+
+        assert sm.is_duplicate_signal(signal) is False
+        assert sm.is_duplicate_signal(signal) is True
+        assert open_manager(state_file, duplicate_window=60).is_duplicate_signal(signal) is True
+
+        clock.offset = timedelta(seconds=61)
+
+        assert open_manager(state_file, duplicate_window=60).recent_signals == []
+        assert sm.is_duplicate_signal(signal) is False